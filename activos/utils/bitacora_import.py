@@ -10,7 +10,6 @@ from typing import Any, BinaryIO
 
 from django.db import transaction
 
-from openpyxl import load_workbook
 
 from activos.models import Activo, BitacoraMantenimiento, OrdenMantenimiento
 
@@ -184,6 +183,8 @@ def _normalize_header(value: Any) -> str:
 
 
 def _build_source_rows(archivo: str | Path | BinaryIO, sheet_name: str) -> dict[str, Any]:
+    from openpyxl import load_workbook
+
     source_name = _get_source_name(archivo)
     ext = Path(source_name).suffix.lower()
 
@@ -12,7 +12,6 @@ from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
-from openpyxl import Workbook
 from rest_framework.authentication import SessionAuthentication, TokenAuthentication
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -756,6 +755,8 @@ def _export_bitacora_template_csv() -> HttpResponse:
 
 
 def _export_bitacora_template_xlsx() -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "bitacora"
@@ -818,6 +819,8 @@ def _export_bitacora_runs_csv(runs) -> HttpResponse:
 
 
 def _export_bitacora_runs_xlsx(runs) -> HttpResponse:
+    from openpyxl import Workbook
+
     timestamp = timezone.localtime().strftime("%Y%m%d_%H%M")
     wb = Workbook()
     ws = wb.active
@@ -884,6 +887,8 @@ def _export_bitacora_runs_xlsx(runs) -> HttpResponse:
 
 
 def _export_activos_depuracion_xlsx(rows: list[dict]) -> HttpResponse:
+    from openpyxl import Workbook
+
     timestamp = timezone.localtime().strftime("%Y%m%d_%H%M")
     wb = Workbook()
     ws = wb.active
@@ -950,6 +955,8 @@ def _export_planes_csv(planes_rows: list[PlanMantenimiento]) -> HttpResponse:
 
 
 def _export_planes_xlsx(planes_rows: list[PlanMantenimiento]) -> HttpResponse:
+    from openpyxl import Workbook
+
     timestamp = timezone.localtime().strftime("%Y%m%d_%H%M")
     wb = Workbook()
     ws = wb.active
@@ -1051,6 +1058,8 @@ def _export_ordenes_csv(ordenes_rows: list[OrdenMantenimiento]) -> HttpResponse:
 
 
 def _export_ordenes_xlsx(ordenes_rows: list[OrdenMantenimiento]) -> HttpResponse:
+    from openpyxl import Workbook
+
     timestamp = timezone.localtime().strftime("%Y%m%d_%H%M")
     wb = Workbook()
     ws = wb.active
@@ -1156,6 +1165,8 @@ def _export_reportes_servicio_csv(rows: list[dict]) -> HttpResponse:
 
 
 def _export_reportes_servicio_xlsx(rows: list[dict]) -> HttpResponse:
+    from openpyxl import Workbook
+
     timestamp = timezone.localtime().strftime("%Y%m%d_%H%M")
     wb = Workbook()
     ws = wb.active
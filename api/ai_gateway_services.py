@@ -41,8 +41,9 @@ from pos_bridge.tasks.run_daily_sales_sync import run_daily_sales_sync
 from pos_bridge.tasks.run_inventory_sync import run_inventory_sync
 from pos_bridge.tasks.run_product_recipe_sync import run_product_recipe_sync
 from pos_bridge.utils.helpers import safe_slug
-from maestros.models import CostoInsumo, Insumo, InsumoAlias
+from maestros.models import CostoInsumo, Insumo
 from maestros.utils.canonical_catalog import canonical_insumo, canonical_insumo_by_id, canonical_member_ids
+from maestros.utils.catalog_search import buscar_insumos, buscar_productos_point, buscar_recetas
 from recetas.models import PlanProduccion, PlanProduccionItem, Receta, RecetaCostoVersion
 from recetas.utils.normalizacion import normalizar_nombre
 from reportes.bi_utils import compute_bi_snapshot, serialize_bi_for_api
@@ -766,42 +767,8 @@ INPUT_COST_STOPWORDS = {
 }
 
 
-def _input_cost_search_tokens(query: str) -> list[str]:
-    normalized = normalizar_nombre(query)
-    tokens = []
-    for token in normalized.split():
-        if token in INPUT_COST_STOPWORDS:
-            continue
-        if len(token) < 3:
-            continue
-        tokens.append(token)
-    return tokens[:6]
-
-
-def _score_input_candidate(*, insumo: Insumo, query: str, exact_alias_ids: set[int]) -> int:
-    normalized_query = normalizar_nombre(query)
-    normalized_name = insumo.nombre_normalizado or normalizar_nombre(insumo.nombre)
-    normalized_point_name = normalizar_nombre(insumo.nombre_point or "")
-    normalized_code = normalizar_nombre(insumo.codigo or "")
-    normalized_point_code = normalizar_nombre(insumo.codigo_point or "")
+def _input_cost_preference(insumo: Insumo) -> int:
     score = 0
-    if insumo.id in exact_alias_ids:
-        score = max(score, 980)
-    if normalized_name == normalized_query:
-        score = max(score, 1000)
-    if normalized_point_name and normalized_point_name == normalized_query:
-        score = max(score, 960)
-    if normalized_code and normalized_code == normalized_query:
-        score = max(score, 930)
-    if normalized_point_code and normalized_point_code == normalized_query:
-        score = max(score, 930)
-    if normalized_query and normalized_name.startswith(normalized_query):
-        score = max(score, 850)
-    if normalized_query and normalized_query in normalized_name:
-        score = max(score, 650)
-    tokens = _input_cost_search_tokens(query)
-    if tokens and all(token in normalized_name or token in normalized_point_name for token in tokens):
-        score = max(score, 500 + (len(tokens) * 20))
     if insumo.tipo_item == Insumo.TIPO_MATERIA_PRIMA:
         score += 40
     if insumo.unidad_base_id:
@@ -810,33 +777,8 @@ def _score_input_candidate(*, insumo: Insumo, query: str, exact_alias_ids: set[i
 
 
 def _resolve_input_cost_candidates(query: str, *, limit: int) -> list[Insumo]:
-    normalized_query = normalizar_nombre(query)
-    exact_alias_ids = set(
-        InsumoAlias.objects.filter(nombre_normalizado=normalized_query, insumo__activo=True).values_list("insumo_id", flat=True)
-    )
-    q_filter = Q(pk__in=exact_alias_ids)
-    if normalized_query:
-        q_filter |= (
-            Q(nombre_normalizado__icontains=normalized_query)
-            | Q(nombre_point__icontains=query)
-            | Q(codigo__iexact=query)
-            | Q(codigo_point__iexact=query)
-        )
-    tokens = _input_cost_search_tokens(query)
-    for token in tokens:
-        q_filter |= Q(nombre_normalizado__icontains=token) | Q(nombre_point__icontains=token)
-    candidates = list(
-        Insumo.objects.select_related("unidad_base", "proveedor_principal")
-        .filter(q_filter, activo=True)
-        .distinct()[: max(limit * 8, 40)]
-    )
-    ranked = [
-        (candidate, _score_input_candidate(insumo=candidate, query=query, exact_alias_ids=exact_alias_ids))
-        for candidate in candidates
-    ]
-    ranked = [(candidate, score) for candidate, score in ranked if score > 0]
-    ranked.sort(key=lambda item: (-item[1], item[0].nombre.lower(), item[0].id))
-    return [candidate for candidate, _score in ranked[:limit]]
+    results = buscar_insumos(query, limit=limit, stopwords=INPUT_COST_STOPWORDS, ajuste=_input_cost_preference)
+    return [result.objeto for result in results]
 
 
 def _serialize_input_cost_candidate(insumo: Insumo) -> dict[str, Any]:
@@ -1014,20 +956,14 @@ def _score_promotion_product(product: PointProduct, query: str) -> int:
 
 
 def _resolve_promotion_product(query: str) -> PointProduct | None:
-    normalized_query = _normalize_promotion_text(query)
-    q_filter = Q(active=True)
-    search = Q()
-    if normalized_query:
-        search |= Q(normalized_name__icontains=normalized_query)
-    if query:
-        search |= Q(name__icontains=query) | Q(sku__iexact=query) | Q(external_id__iexact=query)
-    for token in _promotion_tokens(query):
-        search |= Q(normalized_name__icontains=token)
-    candidates = list(PointProduct.objects.filter(q_filter & search).distinct())
-    ranked = [(candidate, _score_promotion_product(candidate, query)) for candidate in candidates]
-    ranked = [(candidate, score) for candidate, score in ranked if score > 0]
-    ranked.sort(key=lambda item: (-item[1], item[0].name.lower(), item[0].id))
-    return ranked[0][0] if ranked else None
+    results = buscar_productos_point(
+        query,
+        limit=1,
+        normalizar=_normalize_promotion_text,
+        tokens=_promotion_tokens(query),
+        puntuar=lambda product: _score_promotion_product(product, query),
+    )
+    return results[0].objeto if results else None
 
 
 def _is_rebanada_mix_query(query: str) -> bool:
@@ -1057,10 +993,8 @@ def _resolve_product_recipe(product: PointProduct | None, query: str) -> Receta
         ).order_by("id").first()
         if receta is not None:
             return receta
-    normalized_query = normalizar_nombre(query)
-    if not normalized_query:
-        return None
-    return Receta.objects.filter(nombre_normalizado__icontains=normalized_query).order_by("id").first()
+    results = buscar_recetas(query, limit=1)
+    return results[0].objeto if results else None
 
 
 def _promotion_sales_totals(
@@ -68,6 +68,7 @@ from logistica.services_contexto_operativo import (
     contexto_operativo_dict,
     validar_contexto_operativo,
 )
+from logistica.services_ruta_estado import estados_rutas
 from logistica.services_rutas_control import (
     LiberacionRutaError,
     liberar_ruta_con_turno,
@@ -2049,6 +2050,7 @@ class LogisticaRutasControlView(_LogisticaBaseView):
                         "paradas_visitadas": row["paradas_visitadas"],
                         "eventos_alerta": row["eventos_alerta"],
                         "gps_minutos": row["gps_minutos"],
+                        "estado_vivo": row["estado_vivo"],
                     }
                     for row in data["rutas"]
                 ],
@@ -2057,6 +2059,25 @@ class LogisticaRutasControlView(_LogisticaBaseView):
         )
 
 
+class LogisticaRutasEstadoVivoView(_LogisticaBaseView):
+    """Posición, siguiente parada y ETA de las rutas en curso desde el estado vivo, sin leer el historial GPS."""
+
+    def get(self, request):
+        if not can_view_submodule(request.user, "logistica", "rutas"):
+            return Response({"detail": "No tienes permisos para consultar control de rutas."}, status=status.HTTP_403_FORBIDDEN)
+
+        rutas = list(
+            RutaEntrega.objects.filter(fecha_ruta=timezone.localdate(), estatus=RutaEntrega.ESTATUS_EN_RUTA)
+            .order_by("id")
+            .values("id", "folio", "nombre")
+        )
+        estados = estados_rutas(row["id"] for row in rutas)
+        return Response(
+            {"rutas": [{**row, "estado_vivo": estados.get(row["id"])} for row in rutas]},
+            status=status.HTTP_200_OK,
+        )
+
+
 class LogisticaRutaTrackingView(_LogisticaBaseView):
     def get(self, request, ruta_id: int):
         ruta = get_object_or_404(RutaEntrega, pk=ruta_id)
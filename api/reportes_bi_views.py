@@ -6,6 +6,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from core.access import can_view_reportes
+from core.db_routing import replica_view
 from reportes.bi_utils import compute_bi_snapshot, serialize_bi_for_api
 
 
@@ -20,6 +21,7 @@ class ReportesBIDashboardView(APIView):
             parsed = default
         return max(min_value, min(parsed, max_value))
 
+    @replica_view("analytics")
     def get(self, request):
         if not can_view_reportes(request.user):
             return Response({"detail": "No tienes permisos para consultar reportes."}, status=status.HTTP_403_FORBIDDEN)
@@ -7,12 +7,14 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from core.access import can_view_reportes
+from core.db_routing import replica_view
 from reportes.services_dashboard_charts import build_dashboard_charts_payload
 
 
 class ReportesDashboardChartsView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @replica_view("analytics")
     def get(self, request):
         if not can_view_reportes(request.user):
             return Response({"detail": "No tienes permisos para consultar reportes."}, status=status.HTTP_403_FORBIDDEN)
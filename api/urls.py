@@ -1,90 +1,8 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from .ai_gateway_views import (
-    AIGatewayApprovalDecisionView,
-    AIGatewayApprovalExecuteView,
-    AIGatewayApprovalListView,
-    AIGatewayApprovalRequestView,
-    AIGatewayManifestView,
-    AIGatewayOpenAPIView,
-    AIGatewayToolDetailView,
-    AIGatewayToolInvokeView,
-    AIGatewayToolsView,
-)
-from .views import (
-    ApiTokenAuthView,
-    ApiAuthMeView,
-    ApiTokenRevokeView,
-    ApiTokenRotateView,
-    AuditLogListView,
-    MasterDataDuplicatesView,
-    MasterDataNormalizeView,
-    ComprasOrdenesListView,
-    ComprasRecepcionesListView,
-    ComprasSolicitudesImportConfirmView,
-    ComprasSolicitudesImportPreviewView,
-    ComprasSolicitudesListView,
-    ComprasSolicitudCrearOrdenView,
-    ComprasSolicitudCreateView,
-    ComprasSolicitudStatusUpdateView,
-    ComprasOrdenCreateRecepcionView,
-    ComprasOrdenStatusUpdateView,
-    ComprasRecepcionStatusUpdateView,
-    ForecastBacktestView,
-    ForecastEstadisticoGuardarView,
-    ForecastInsightsView,
-    ForecastEstadisticoView,
-    ControlDiscrepanciasView,
-    ControlMermasPosBulkUpsertView,
-    ControlMermasPosImportConfirmView,
-    ControlMermasPosImportPreviewView,
-    ControlVentasPosBulkUpsertView,
-    ControlVentasPosImportConfirmView,
-    ControlVentasPosImportPreviewView,
-    ActivosCalendarioMantenimientoView,
-    ActivosDisponibilidadView,
-    ActivosOrdenesView,
-    ActivosOrdenStatusUpdateView,
-    InventarioAjustesView,
-    InventarioAliasesListCreateView,
-    InventarioAliasesMassReassignView,
-    InventarioAliasesPendientesView,
-    InventarioAliasesPendientesUnificadosView,
-    InventarioAliasesPendientesUnificadosResolveView,
-    IntegracionPointResumenView,
-    IntegracionesDeactivateIdleClientsView,
-    IntegracionesMaintenanceRunView,
-    IntegracionesOperationsHistoryView,
-    IntegracionesPurgeApiLogsView,
-    InventarioPointPendingResolveView,
-    InventarioAjusteDecisionView,
-    InventarioSugerenciasCompraView,
-    MRPExplodeView,
-    PlanProduccionDetailView,
-    PlanProduccionItemCreateView,
-    PlanProduccionItemDetailView,
-    PlanProduccionListCreateView,
-    MRPRequerimientosView,
-    PlanDesdePronosticoCreateView,
-    PronosticoVentaImportConfirmView,
-    PronosticoVentaImportPreviewView,
-    PronosticoVentaBulkUpsertView,
-    PresupuestosConsolidadoView,
-    RecetaCostoHistoricoView,
-    RecetaVersionesView,
-    SolicitudVentaAplicarForecastView,
-    SolicitudVentaListView,
-    SolicitudVentaBulkUpsertView,
-    SolicitudVentaImportConfirmView,
-    SolicitudVentaImportPreviewView,
-    SolicitudVentaUpsertView,
-    PronosticoVentaListView,
-    VentasPipelineResumenView,
-    VentaHistoricaListView,
-    VentaHistoricaBulkUpsertView,
-    VentaHistoricaImportPreviewView,
-    VentaHistoricaImportConfirmView,
-)
+
+from core.lazy_urls import lazy_views
+
 from .crm_views import (
     CRMClienteDetailView,
     CRMClienteDireccionesView,
@@ -166,6 +84,7 @@ from .logistica_views import (
     LogisticaRutaParadaRecargaCedisView,
     LogisticaRutaRecepcionPointSyncView,
     LogisticaRutasControlView,
+    LogisticaRutasEstadoVivoView,
     LogisticaRutaEntregasView,
     LogisticaRutaEventosView,
     LogisticaRutaStatusView,
@@ -214,29 +133,34 @@ from .special_hours_views import (
     SpecialHoursValidateView,
 )
 
+# El gateway de IA y api.views arrastran compras/views.py y recetas/views/*;
+# se importan con la primera petición (core/lazy_urls.py).
+ai_gateway_views = lazy_views("api.ai_gateway_views")
+views = lazy_views("api.views")
+
 urlpatterns = [
-    path("ai-gateway/manifest/", AIGatewayManifestView.as_view(), name="api_ai_gateway_manifest"),
-    path("ai-gateway/openapi/", AIGatewayOpenAPIView.as_view(), name="api_ai_gateway_openapi"),
-    path("ai-gateway/tools/", AIGatewayToolsView.as_view(), name="api_ai_gateway_tools"),
-    path("ai-gateway/tools/<path:tool_key>/invoke/", AIGatewayToolInvokeView.as_view(), name="api_ai_gateway_tool_invoke"),
+    path("ai-gateway/manifest/", ai_gateway_views.AIGatewayManifestView.as_view(), name="api_ai_gateway_manifest"),
+    path("ai-gateway/openapi/", ai_gateway_views.AIGatewayOpenAPIView.as_view(), name="api_ai_gateway_openapi"),
+    path("ai-gateway/tools/", ai_gateway_views.AIGatewayToolsView.as_view(), name="api_ai_gateway_tools"),
+    path("ai-gateway/tools/<path:tool_key>/invoke/", ai_gateway_views.AIGatewayToolInvokeView.as_view(), name="api_ai_gateway_tool_invoke"),
     path(
         "ai-gateway/tools/<path:tool_key>/request-approval/",
-        AIGatewayApprovalRequestView.as_view(),
+        ai_gateway_views.AIGatewayApprovalRequestView.as_view(),
         name="api_ai_gateway_tool_request_approval",
     ),
-    path("ai-gateway/tools/<path:tool_key>/", AIGatewayToolDetailView.as_view(), name="api_ai_gateway_tool_detail"),
-    path("ai-gateway/approvals/", AIGatewayApprovalListView.as_view(), name="api_ai_gateway_approvals"),
+    path("ai-gateway/tools/<path:tool_key>/", ai_gateway_views.AIGatewayToolDetailView.as_view(), name="api_ai_gateway_tool_detail"),
+    path("ai-gateway/approvals/", ai_gateway_views.AIGatewayApprovalListView.as_view(), name="api_ai_gateway_approvals"),
     path(
         "ai-gateway/approvals/<int:suggestion_id>/execute/",
-        AIGatewayApprovalExecuteView.as_view(),
+        ai_gateway_views.AIGatewayApprovalExecuteView.as_view(),
         name="api_ai_gateway_approval_execute",
     ),
     path(
         "ai-gateway/approvals/<int:suggestion_id>/<str:decision>/",
-        AIGatewayApprovalDecisionView.as_view(),
+        ai_gateway_views.AIGatewayApprovalDecisionView.as_view(),
         name="api_ai_gateway_approval_decision",
     ),
-    path("auth/token/", ApiTokenAuthView.as_view(), name="api_auth_token"),
+    path("auth/token/", views.ApiTokenAuthView.as_view(), name="api_auth_token"),
     path(
         "auth/driver-identity/",
         PublicDriverIdentityLoginView.as_view(),
@@ -247,64 +171,64 @@ urlpatterns = [
         PublicDriverIdentityStatusView.as_view(),
         name="api_public_driver_identity_status",
     ),
-    path("auth/token/rotate/", ApiTokenRotateView.as_view(), name="api_auth_token_rotate"),
-    path("auth/token/revoke/", ApiTokenRevokeView.as_view(), name="api_auth_token_revoke"),
-    path("auth/me/", ApiAuthMeView.as_view(), name="api_auth_me"),
-    path("audit/logs/", AuditLogListView.as_view(), name="api_audit_logs"),
-    path("master/normalize/", MasterDataNormalizeView.as_view(), name="api_master_normalize"),
-    path("master/duplicates/", MasterDataDuplicatesView.as_view(), name="api_master_duplicates"),
-    path("mrp/explode/", MRPExplodeView.as_view(), name="api_mrp_explode"),
-    path("mrp/planes/", PlanProduccionListCreateView.as_view(), name="api_mrp_planes"),
-    path("mrp/planes/<int:plan_id>/", PlanProduccionDetailView.as_view(), name="api_mrp_plan_detail"),
-    path("mrp/planes/<int:plan_id>/items/", PlanProduccionItemCreateView.as_view(), name="api_mrp_plan_item_create"),
-    path("mrp/planes/items/<int:item_id>/", PlanProduccionItemDetailView.as_view(), name="api_mrp_plan_item_detail"),
-    path("mrp/calcular-requerimientos/", MRPRequerimientosView.as_view(), name="api_mrp_calcular_requerimientos"),
-    path("mrp/generar-plan-pronostico/", PlanDesdePronosticoCreateView.as_view(), name="api_mrp_generar_plan_pronostico"),
-    path("ventas/pronostico-backtest/", ForecastBacktestView.as_view(), name="api_ventas_pronostico_backtest"),
-    path("ventas/pronostico-insights/", ForecastInsightsView.as_view(), name="api_ventas_pronostico_insights"),
-    path("ventas/historial/", VentaHistoricaListView.as_view(), name="api_ventas_historial"),
-    path("ventas/pronostico/", PronosticoVentaListView.as_view(), name="api_ventas_pronostico"),
-    path("ventas/pipeline/resumen/", VentasPipelineResumenView.as_view(), name="api_ventas_pipeline_resumen"),
-    path("ventas/solicitud/list/", SolicitudVentaListView.as_view(), name="api_ventas_solicitudes"),
-    path("ventas/pronostico/bulk/", PronosticoVentaBulkUpsertView.as_view(), name="api_ventas_pronostico_bulk"),
-    path("ventas/pronostico/import-preview/", PronosticoVentaImportPreviewView.as_view(), name="api_ventas_pronostico_import_preview"),
-    path("ventas/pronostico/import-confirm/", PronosticoVentaImportConfirmView.as_view(), name="api_ventas_pronostico_import_confirm"),
-    path("ventas/pronostico-estadistico/", ForecastEstadisticoView.as_view(), name="api_ventas_pronostico_estadistico"),
-    path("ventas/pronostico-estadistico/guardar/", ForecastEstadisticoGuardarView.as_view(), name="api_ventas_pronostico_estadistico_guardar"),
-    path("ventas/historial/bulk/", VentaHistoricaBulkUpsertView.as_view(), name="api_ventas_historial_bulk"),
-    path("ventas/historial/import-preview/", VentaHistoricaImportPreviewView.as_view(), name="api_ventas_historial_import_preview"),
-    path("ventas/historial/import-confirm/", VentaHistoricaImportConfirmView.as_view(), name="api_ventas_historial_import_confirm"),
-    path("ventas/solicitud/", SolicitudVentaUpsertView.as_view(), name="api_ventas_solicitud"),
-    path("ventas/solicitud/bulk/", SolicitudVentaBulkUpsertView.as_view(), name="api_ventas_solicitud_bulk"),
-    path("ventas/solicitud/import-preview/", SolicitudVentaImportPreviewView.as_view(), name="api_ventas_solicitud_import_preview"),
-    path("ventas/solicitud/import-confirm/", SolicitudVentaImportConfirmView.as_view(), name="api_ventas_solicitud_import_confirm"),
-    path("ventas/solicitud/aplicar-forecast/", SolicitudVentaAplicarForecastView.as_view(), name="api_ventas_solicitud_aplicar_forecast"),
-    path("inventario/ajustes/", InventarioAjustesView.as_view(), name="api_inventario_ajustes"),
-    path("inventario/ajustes/<int:ajuste_id>/decision/", InventarioAjusteDecisionView.as_view(), name="api_inventario_ajuste_decision"),
-    path("inventario/aliases/", InventarioAliasesListCreateView.as_view(), name="api_inventario_aliases"),
-    path("inventario/aliases/reasignar/", InventarioAliasesMassReassignView.as_view(), name="api_inventario_aliases_reasignar"),
-    path("inventario/aliases/pendientes/", InventarioAliasesPendientesView.as_view(), name="api_inventario_aliases_pendientes"),
-    path("inventario/aliases/pendientes-unificados/", InventarioAliasesPendientesUnificadosView.as_view(), name="api_inventario_aliases_pendientes_unificados"),
-    path("inventario/aliases/pendientes-unificados/resolver/", InventarioAliasesPendientesUnificadosResolveView.as_view(), name="api_inventario_aliases_pendientes_unificados_resolver"),
-    path("integraciones/point/resumen/", IntegracionPointResumenView.as_view(), name="api_integraciones_point_resumen"),
+    path("auth/token/rotate/", views.ApiTokenRotateView.as_view(), name="api_auth_token_rotate"),
+    path("auth/token/revoke/", views.ApiTokenRevokeView.as_view(), name="api_auth_token_revoke"),
+    path("auth/me/", views.ApiAuthMeView.as_view(), name="api_auth_me"),
+    path("audit/logs/", views.AuditLogListView.as_view(), name="api_audit_logs"),
+    path("master/normalize/", views.MasterDataNormalizeView.as_view(), name="api_master_normalize"),
+    path("master/duplicates/", views.MasterDataDuplicatesView.as_view(), name="api_master_duplicates"),
+    path("mrp/explode/", views.MRPExplodeView.as_view(), name="api_mrp_explode"),
+    path("mrp/planes/", views.PlanProduccionListCreateView.as_view(), name="api_mrp_planes"),
+    path("mrp/planes/<int:plan_id>/", views.PlanProduccionDetailView.as_view(), name="api_mrp_plan_detail"),
+    path("mrp/planes/<int:plan_id>/items/", views.PlanProduccionItemCreateView.as_view(), name="api_mrp_plan_item_create"),
+    path("mrp/planes/items/<int:item_id>/", views.PlanProduccionItemDetailView.as_view(), name="api_mrp_plan_item_detail"),
+    path("mrp/calcular-requerimientos/", views.MRPRequerimientosView.as_view(), name="api_mrp_calcular_requerimientos"),
+    path("mrp/generar-plan-pronostico/", views.PlanDesdePronosticoCreateView.as_view(), name="api_mrp_generar_plan_pronostico"),
+    path("ventas/pronostico-backtest/", views.ForecastBacktestView.as_view(), name="api_ventas_pronostico_backtest"),
+    path("ventas/pronostico-insights/", views.ForecastInsightsView.as_view(), name="api_ventas_pronostico_insights"),
+    path("ventas/historial/", views.VentaHistoricaListView.as_view(), name="api_ventas_historial"),
+    path("ventas/pronostico/", views.PronosticoVentaListView.as_view(), name="api_ventas_pronostico"),
+    path("ventas/pipeline/resumen/", views.VentasPipelineResumenView.as_view(), name="api_ventas_pipeline_resumen"),
+    path("ventas/solicitud/list/", views.SolicitudVentaListView.as_view(), name="api_ventas_solicitudes"),
+    path("ventas/pronostico/bulk/", views.PronosticoVentaBulkUpsertView.as_view(), name="api_ventas_pronostico_bulk"),
+    path("ventas/pronostico/import-preview/", views.PronosticoVentaImportPreviewView.as_view(), name="api_ventas_pronostico_import_preview"),
+    path("ventas/pronostico/import-confirm/", views.PronosticoVentaImportConfirmView.as_view(), name="api_ventas_pronostico_import_confirm"),
+    path("ventas/pronostico-estadistico/", views.ForecastEstadisticoView.as_view(), name="api_ventas_pronostico_estadistico"),
+    path("ventas/pronostico-estadistico/guardar/", views.ForecastEstadisticoGuardarView.as_view(), name="api_ventas_pronostico_estadistico_guardar"),
+    path("ventas/historial/bulk/", views.VentaHistoricaBulkUpsertView.as_view(), name="api_ventas_historial_bulk"),
+    path("ventas/historial/import-preview/", views.VentaHistoricaImportPreviewView.as_view(), name="api_ventas_historial_import_preview"),
+    path("ventas/historial/import-confirm/", views.VentaHistoricaImportConfirmView.as_view(), name="api_ventas_historial_import_confirm"),
+    path("ventas/solicitud/", views.SolicitudVentaUpsertView.as_view(), name="api_ventas_solicitud"),
+    path("ventas/solicitud/bulk/", views.SolicitudVentaBulkUpsertView.as_view(), name="api_ventas_solicitud_bulk"),
+    path("ventas/solicitud/import-preview/", views.SolicitudVentaImportPreviewView.as_view(), name="api_ventas_solicitud_import_preview"),
+    path("ventas/solicitud/import-confirm/", views.SolicitudVentaImportConfirmView.as_view(), name="api_ventas_solicitud_import_confirm"),
+    path("ventas/solicitud/aplicar-forecast/", views.SolicitudVentaAplicarForecastView.as_view(), name="api_ventas_solicitud_aplicar_forecast"),
+    path("inventario/ajustes/", views.InventarioAjustesView.as_view(), name="api_inventario_ajustes"),
+    path("inventario/ajustes/<int:ajuste_id>/decision/", views.InventarioAjusteDecisionView.as_view(), name="api_inventario_ajuste_decision"),
+    path("inventario/aliases/", views.InventarioAliasesListCreateView.as_view(), name="api_inventario_aliases"),
+    path("inventario/aliases/reasignar/", views.InventarioAliasesMassReassignView.as_view(), name="api_inventario_aliases_reasignar"),
+    path("inventario/aliases/pendientes/", views.InventarioAliasesPendientesView.as_view(), name="api_inventario_aliases_pendientes"),
+    path("inventario/aliases/pendientes-unificados/", views.InventarioAliasesPendientesUnificadosView.as_view(), name="api_inventario_aliases_pendientes_unificados"),
+    path("inventario/aliases/pendientes-unificados/resolver/", views.InventarioAliasesPendientesUnificadosResolveView.as_view(), name="api_inventario_aliases_pendientes_unificados_resolver"),
+    path("integraciones/point/resumen/", views.IntegracionPointResumenView.as_view(), name="api_integraciones_point_resumen"),
     path(
         "integraciones/point/clientes/desactivar-inactivos/",
-        IntegracionesDeactivateIdleClientsView.as_view(),
+        views.IntegracionesDeactivateIdleClientsView.as_view(),
         name="api_integraciones_deactivate_idle_clients",
     ),
     path(
         "integraciones/point/logs/purgar/",
-        IntegracionesPurgeApiLogsView.as_view(),
+        views.IntegracionesPurgeApiLogsView.as_view(),
         name="api_integraciones_purge_api_logs",
     ),
     path(
         "integraciones/point/mantenimiento/ejecutar/",
-        IntegracionesMaintenanceRunView.as_view(),
+        views.IntegracionesMaintenanceRunView.as_view(),
         name="api_integraciones_run_maintenance",
     ),
     path(
         "integraciones/point/operaciones/historial/",
-        IntegracionesOperationsHistoryView.as_view(),
+        views.IntegracionesOperationsHistoryView.as_view(),
         name="api_integraciones_operations_history",
     ),
     path(
@@ -347,19 +271,19 @@ urlpatterns = [
         SpecialHoursCancelView.as_view(),
         name="api_integraciones_special_hours_cancel",
     ),
-    path("inventario/point-pendientes/resolver/", InventarioPointPendingResolveView.as_view(), name="api_inventario_point_pendientes_resolver"),
-    path("inventario/sugerencias-compra/", InventarioSugerenciasCompraView.as_view(), name="api_inventario_sugerencias_compra"),
-    path("activos/disponibilidad/", ActivosDisponibilidadView.as_view(), name="api_activos_disponibilidad"),
-    path("activos/calendario-mantenimiento/", ActivosCalendarioMantenimientoView.as_view(), name="api_activos_calendario_mantenimiento"),
-    path("activos/ordenes/", ActivosOrdenesView.as_view(), name="api_activos_ordenes"),
-    path("activos/ordenes/<int:orden_id>/estatus/", ActivosOrdenStatusUpdateView.as_view(), name="api_activos_orden_estatus"),
-    path("control/discrepancias/", ControlDiscrepanciasView.as_view(), name="api_control_discrepancias"),
-    path("control/ventas-pos/import-preview/", ControlVentasPosImportPreviewView.as_view(), name="api_control_ventas_pos_import_preview"),
-    path("control/ventas-pos/import-confirm/", ControlVentasPosImportConfirmView.as_view(), name="api_control_ventas_pos_import_confirm"),
-    path("control/ventas-pos/bulk/", ControlVentasPosBulkUpsertView.as_view(), name="api_control_ventas_pos_bulk"),
-    path("control/mermas-pos/import-preview/", ControlMermasPosImportPreviewView.as_view(), name="api_control_mermas_pos_import_preview"),
-    path("control/mermas-pos/import-confirm/", ControlMermasPosImportConfirmView.as_view(), name="api_control_mermas_pos_import_confirm"),
-    path("control/mermas-pos/bulk/", ControlMermasPosBulkUpsertView.as_view(), name="api_control_mermas_pos_bulk"),
+    path("inventario/point-pendientes/resolver/", views.InventarioPointPendingResolveView.as_view(), name="api_inventario_point_pendientes_resolver"),
+    path("inventario/sugerencias-compra/", views.InventarioSugerenciasCompraView.as_view(), name="api_inventario_sugerencias_compra"),
+    path("activos/disponibilidad/", views.ActivosDisponibilidadView.as_view(), name="api_activos_disponibilidad"),
+    path("activos/calendario-mantenimiento/", views.ActivosCalendarioMantenimientoView.as_view(), name="api_activos_calendario_mantenimiento"),
+    path("activos/ordenes/", views.ActivosOrdenesView.as_view(), name="api_activos_ordenes"),
+    path("activos/ordenes/<int:orden_id>/estatus/", views.ActivosOrdenStatusUpdateView.as_view(), name="api_activos_orden_estatus"),
+    path("control/discrepancias/", views.ControlDiscrepanciasView.as_view(), name="api_control_discrepancias"),
+    path("control/ventas-pos/import-preview/", views.ControlVentasPosImportPreviewView.as_view(), name="api_control_ventas_pos_import_preview"),
+    path("control/ventas-pos/import-confirm/", views.ControlVentasPosImportConfirmView.as_view(), name="api_control_ventas_pos_import_confirm"),
+    path("control/ventas-pos/bulk/", views.ControlVentasPosBulkUpsertView.as_view(), name="api_control_ventas_pos_bulk"),
+    path("control/mermas-pos/import-preview/", views.ControlMermasPosImportPreviewView.as_view(), name="api_control_mermas_pos_import_preview"),
+    path("control/mermas-pos/import-confirm/", views.ControlMermasPosImportConfirmView.as_view(), name="api_control_mermas_pos_import_confirm"),
+    path("control/mermas-pos/bulk/", views.ControlMermasPosBulkUpsertView.as_view(), name="api_control_mermas_pos_bulk"),
     path("crm/dashboard/", CRMDashboardView.as_view(), name="api_crm_dashboard"),
     path("crm/clientes/", CRMClientesView.as_view(), name="api_crm_clientes"),
     path("crm/clientes/<int:pk>/", CRMClienteDetailView.as_view(), name="api_crm_cliente_detail"),
@@ -419,6 +343,7 @@ urlpatterns = [
     path("logistica/repartidores-disponibles/", LogisticaRepartidoresDisponiblesView.as_view(), name="api_logistica_repartidores_disponibles"),
     path("logistica/domicilios/<int:solicitud_id>/asignar/", LogisticaDomicilioAsignarView.as_view(), name="api_logistica_domicilio_asignar"),
     path("logistica/rutas/control/", LogisticaRutasControlView.as_view(), name="api_logistica_rutas_control"),
+    path("logistica/rutas/estado-vivo/", LogisticaRutasEstadoVivoView.as_view(), name="api_logistica_rutas_estado_vivo"),
     path("logistica/rutas/<int:ruta_id>/carga-checklist/", LogisticaRutaCargaChecklistView.as_view(), name="api_logistica_ruta_carga_checklist"),
     path(
         "logistica/rutas/<int:ruta_id>/carga-checklist/sucursales/<int:parada_id>/guardar/",
@@ -591,18 +516,18 @@ urlpatterns = [
         PublicOmnichannelDeliveryStatusView.as_view(),
         name="api_public_omnichannel_delivery_status",
     ),
-    path("compras/solicitudes/", ComprasSolicitudesListView.as_view(), name="api_compras_solicitudes"),
-    path("compras/solicitudes/import-preview/", ComprasSolicitudesImportPreviewView.as_view(), name="api_compras_solicitudes_import_preview"),
-    path("compras/solicitudes/import-confirm/", ComprasSolicitudesImportConfirmView.as_view(), name="api_compras_solicitudes_import_confirm"),
-    path("compras/ordenes/", ComprasOrdenesListView.as_view(), name="api_compras_ordenes"),
-    path("compras/recepciones/", ComprasRecepcionesListView.as_view(), name="api_compras_recepciones"),
-    path("compras/solicitud/", ComprasSolicitudCreateView.as_view(), name="api_compras_solicitud"),
-    path("compras/solicitud/<int:solicitud_id>/estatus/", ComprasSolicitudStatusUpdateView.as_view(), name="api_compras_solicitud_estatus"),
-    path("compras/solicitud/<int:solicitud_id>/crear-orden/", ComprasSolicitudCrearOrdenView.as_view(), name="api_compras_solicitud_crear_orden"),
-    path("compras/orden/<int:orden_id>/estatus/", ComprasOrdenStatusUpdateView.as_view(), name="api_compras_orden_estatus"),
-    path("compras/orden/<int:orden_id>/recepciones/", ComprasOrdenCreateRecepcionView.as_view(), name="api_compras_orden_recepciones"),
-    path("compras/recepcion/<int:recepcion_id>/estatus/", ComprasRecepcionStatusUpdateView.as_view(), name="api_compras_recepcion_estatus"),
-    path("presupuestos/consolidado/<str:periodo>/", PresupuestosConsolidadoView.as_view(), name="api_presupuestos_consolidado"),
-    path("recetas/<int:receta_id>/versiones/", RecetaVersionesView.as_view(), name="api_receta_versiones"),
-    path("recetas/<int:receta_id>/costo-historico/", RecetaCostoHistoricoView.as_view(), name="api_receta_costo_historico"),
+    path("compras/solicitudes/", views.ComprasSolicitudesListView.as_view(), name="api_compras_solicitudes"),
+    path("compras/solicitudes/import-preview/", views.ComprasSolicitudesImportPreviewView.as_view(), name="api_compras_solicitudes_import_preview"),
+    path("compras/solicitudes/import-confirm/", views.ComprasSolicitudesImportConfirmView.as_view(), name="api_compras_solicitudes_import_confirm"),
+    path("compras/ordenes/", views.ComprasOrdenesListView.as_view(), name="api_compras_ordenes"),
+    path("compras/recepciones/", views.ComprasRecepcionesListView.as_view(), name="api_compras_recepciones"),
+    path("compras/solicitud/", views.ComprasSolicitudCreateView.as_view(), name="api_compras_solicitud"),
+    path("compras/solicitud/<int:solicitud_id>/estatus/", views.ComprasSolicitudStatusUpdateView.as_view(), name="api_compras_solicitud_estatus"),
+    path("compras/solicitud/<int:solicitud_id>/crear-orden/", views.ComprasSolicitudCrearOrdenView.as_view(), name="api_compras_solicitud_crear_orden"),
+    path("compras/orden/<int:orden_id>/estatus/", views.ComprasOrdenStatusUpdateView.as_view(), name="api_compras_orden_estatus"),
+    path("compras/orden/<int:orden_id>/recepciones/", views.ComprasOrdenCreateRecepcionView.as_view(), name="api_compras_orden_recepciones"),
+    path("compras/recepcion/<int:recepcion_id>/estatus/", views.ComprasRecepcionStatusUpdateView.as_view(), name="api_compras_recepcion_estatus"),
+    path("presupuestos/consolidado/<str:periodo>/", views.PresupuestosConsolidadoView.as_view(), name="api_presupuestos_consolidado"),
+    path("recetas/<int:receta_id>/versiones/", views.RecetaVersionesView.as_view(), name="api_receta_versiones"),
+    path("recetas/<int:receta_id>/costo-historico/", views.RecetaCostoHistoricoView.as_view(), name="api_receta_costo_historico"),
 ]
@@ -1,62 +1,79 @@
-# Backward-compatible re-exports — api/urls.py imports without changes
-from .auth import (
-    ApiTokenAuthView, ApiAuthMeView, ApiTokenRevokeView, ApiTokenRotateView,
-    AuditLogListView,
-)
-from .maestros import (
-    MasterDataNormalizeView, MasterDataDuplicatesView,
-)
-from .compras import (
-    ComprasOrdenesListView, ComprasRecepcionesListView,
-    ComprasSolicitudesImportConfirmView, ComprasSolicitudesImportPreviewView,
-    ComprasSolicitudesListView, ComprasSolicitudCrearOrdenView,
-    ComprasSolicitudCreateView, ComprasSolicitudStatusUpdateView,
-    ComprasOrdenCreateRecepcionView, ComprasOrdenStatusUpdateView,
-    ComprasRecepcionStatusUpdateView,
-)
-from .produccion import (
-    ForecastBacktestView, ForecastInsightsView,
-    MRPRequerimientosView,
-    PlanProduccionListCreateView, PlanProduccionDetailView,
-    PlanProduccionItemCreateView, PlanProduccionItemDetailView,
-    PlanDesdePronosticoCreateView,
-)
-from .ventas import (
-    ForecastEstadisticoView, ForecastEstadisticoGuardarView,
-    VentaHistoricaListView, VentaHistoricaBulkUpsertView,
-    VentaHistoricaImportPreviewView, VentaHistoricaImportConfirmView,
-    PronosticoVentaListView, PronosticoVentaImportConfirmView,
-    PronosticoVentaImportPreviewView, PronosticoVentaBulkUpsertView,
-    VentasPipelineResumenView,
-    SolicitudVentaListView, SolicitudVentaBulkUpsertView,
-    SolicitudVentaImportConfirmView, SolicitudVentaImportPreviewView,
-    SolicitudVentaUpsertView, SolicitudVentaAplicarForecastView,
-)
-from .recetas import (
-    MRPExplodeView, RecetaVersionesView, RecetaCostoHistoricoView,
-)
-from .inventario import (
-    InventarioSugerenciasCompraView,
-    InventarioAliasesListCreateView, InventarioAliasesMassReassignView,
-    InventarioAliasesPendientesView, InventarioAliasesPendientesUnificadosView,
-    InventarioAliasesPendientesUnificadosResolveView,
-    InventarioPointPendingResolveView,
-    InventarioAjustesView, InventarioAjusteDecisionView,
-)
-from .integraciones import (
-    IntegracionesDeactivateIdleClientsView, IntegracionesPurgeApiLogsView,
-    IntegracionesMaintenanceRunView, IntegracionesOperationsHistoryView,
-    IntegracionPointResumenView,
-)
-from .presupuestos import PresupuestosConsolidadoView
-from .activos import (
-    ActivosCalendarioMantenimientoView, ActivosDisponibilidadView,
-    ActivosOrdenesView, ActivosOrdenStatusUpdateView,
-)
-from .control import (
-    ControlDiscrepanciasView,
-    ControlMermasPosBulkUpsertView, ControlMermasPosImportConfirmView,
-    ControlMermasPosImportPreviewView,
-    ControlVentasPosBulkUpsertView, ControlVentasPosImportConfirmView,
-    ControlVentasPosImportPreviewView,
-)
+# Re-exports diferidos: cada submódulo se importa con el primer acceso a una de
+# sus vistas (ver core/lazy_urls.py); ``from api.views import X`` sigue igual.
+
+from importlib import import_module
+
+_EXPORTS = {
+    "auth": (
+        "ApiTokenAuthView", "ApiAuthMeView", "ApiTokenRevokeView", "ApiTokenRotateView",
+        "AuditLogListView",
+    ),
+    "maestros": (
+        "MasterDataNormalizeView", "MasterDataDuplicatesView",
+    ),
+    "compras": (
+        "ComprasOrdenesListView", "ComprasRecepcionesListView",
+        "ComprasSolicitudesImportConfirmView", "ComprasSolicitudesImportPreviewView",
+        "ComprasSolicitudesListView", "ComprasSolicitudCrearOrdenView",
+        "ComprasSolicitudCreateView", "ComprasSolicitudStatusUpdateView",
+        "ComprasOrdenCreateRecepcionView", "ComprasOrdenStatusUpdateView",
+        "ComprasRecepcionStatusUpdateView",
+    ),
+    "produccion": (
+        "ForecastBacktestView", "ForecastInsightsView", "MRPRequerimientosView",
+        "PlanProduccionListCreateView", "PlanProduccionDetailView", "PlanProduccionItemCreateView",
+        "PlanProduccionItemDetailView", "PlanDesdePronosticoCreateView",
+    ),
+    "ventas": (
+        "ForecastEstadisticoView", "ForecastEstadisticoGuardarView", "VentaHistoricaListView",
+        "VentaHistoricaBulkUpsertView", "VentaHistoricaImportPreviewView",
+        "VentaHistoricaImportConfirmView", "PronosticoVentaListView",
+        "PronosticoVentaImportConfirmView", "PronosticoVentaImportPreviewView",
+        "PronosticoVentaBulkUpsertView", "VentasPipelineResumenView", "SolicitudVentaListView",
+        "SolicitudVentaBulkUpsertView", "SolicitudVentaImportConfirmView",
+        "SolicitudVentaImportPreviewView", "SolicitudVentaUpsertView",
+        "SolicitudVentaAplicarForecastView",
+    ),
+    "recetas": (
+        "MRPExplodeView", "RecetaVersionesView", "RecetaCostoHistoricoView",
+    ),
+    "inventario": (
+        "InventarioSugerenciasCompraView", "InventarioAliasesListCreateView",
+        "InventarioAliasesMassReassignView", "InventarioAliasesPendientesView",
+        "InventarioAliasesPendientesUnificadosView",
+        "InventarioAliasesPendientesUnificadosResolveView", "InventarioPointPendingResolveView",
+        "InventarioAjustesView", "InventarioAjusteDecisionView",
+    ),
+    "integraciones": (
+        "IntegracionesDeactivateIdleClientsView", "IntegracionesPurgeApiLogsView",
+        "IntegracionesMaintenanceRunView", "IntegracionesOperationsHistoryView",
+        "IntegracionPointResumenView",
+    ),
+    "presupuestos": (
+        "PresupuestosConsolidadoView",
+    ),
+    "activos": (
+        "ActivosCalendarioMantenimientoView", "ActivosDisponibilidadView", "ActivosOrdenesView",
+        "ActivosOrdenStatusUpdateView",
+    ),
+    "control": (
+        "ControlDiscrepanciasView", "ControlMermasPosBulkUpsertView",
+        "ControlMermasPosImportConfirmView", "ControlMermasPosImportPreviewView",
+        "ControlVentasPosBulkUpsertView", "ControlVentasPosImportConfirmView",
+        "ControlVentasPosImportPreviewView",
+    ),
+}
+_MODULE_BY_NAME = {name: module for module, names in _EXPORTS.items() for name in names}
+
+
+def __getattr__(name):
+    module = _MODULE_BY_NAME.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_MODULE_BY_NAME})
@@ -4,6 +4,8 @@ from collections import defaultdict
 from datetime import date
 from decimal import Decimal
 
+from core.bulk_upsert import bulk_upsert
+from core.db_routing import pin_to_primary
 from ventas.services.sales_read_service import get_point_sales_category_totals
 
 from .models import BonoVentasEmpleado, ConfigBonoVentasPeriodo, VentaCategoriaSucursal
@@ -39,6 +41,8 @@ def _ventas_por_sucursal_categoria(start: date, end: date, sucursal_id: int | No
     return totals
 
 
+# Persiste lo que lee: siempre del primario, aunque lo llame una vista marcada para la réplica.
+@pin_to_primary()
 def sync_ventas_categorias(periodo: ConfigBonoVentasPeriodo, sucursal_id: int | None = None) -> int:
     start, end = _month_range(periodo.anio, periodo.mes)
     prev_start, prev_end = _month_range(periodo.anio - 1, periodo.mes)
@@ -46,20 +50,33 @@ def sync_ventas_categorias(periodo: ConfigBonoVentasPeriodo, sucursal_id: int |
     anteriores = _ventas_por_sucursal_categoria(prev_start, prev_end, sucursal_id=sucursal_id)
     keys = sorted(set(actuales) | set(anteriores))
 
-    updated = 0
+    rows = []
     for sucursal_pk, categoria in keys:
-        VentaCategoriaSucursal.objects.update_or_create(
+        venta = VentaCategoriaSucursal(
             periodo=periodo,
             sucursal_id=sucursal_pk,
             categoria=categoria,
-            defaults={
-                "cantidad_actual": actuales.get((sucursal_pk, categoria), Decimal("0.000")),
-                "cantidad_anterior": anteriores.get((sucursal_pk, categoria), Decimal("0.000")),
-                "fuente": VentaCategoriaSucursal.FUENTE_POS_BRIDGE,
-            },
+            cantidad_actual=actuales.get((sucursal_pk, categoria), Decimal("0.000")),
+            cantidad_anterior=anteriores.get((sucursal_pk, categoria), Decimal("0.000")),
+            fuente=VentaCategoriaSucursal.FUENTE_POS_BRIDGE,
         )
-        updated += 1
-    return updated
+        # ``bulk_upsert`` no pasa por ``save()``: el crecimiento se calcula aquí.
+        venta.calcular_crecimiento()
+        rows.append(venta)
+    result = bulk_upsert(
+        VentaCategoriaSucursal,
+        rows,
+        unique_fields=["periodo", "sucursal", "categoria"],
+        update_fields=[
+            "cantidad_actual",
+            "cantidad_anterior",
+            "fuente",
+            "pct_crecimiento",
+            "activo_bono",
+            "monto_bono_categoria",
+        ],
+    )
+    return len(result.ids_by_key)
 
 
 def sync_dias_repartidor(periodo: ConfigBonoVentasPeriodo) -> dict[str, int]:
@@ -1,8 +1,12 @@
 from django.urls import path
 
-from . import views
+from core.lazy_urls import lazy_views
+
 from . import views_departamentales
 
+# compras/views.py (10k líneas) se importa con su primera petición.
+views = lazy_views("compras.views")
+
 app_name = "compras"
 
 urlpatterns = [
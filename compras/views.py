@@ -25,10 +25,10 @@ from django.views.decorators.http import require_POST
 from openpyxl import Workbook, load_workbook
 
 from core.access import can_manage_compras, can_view_compras
-from core.audit import log_event
+from core.audit import audit_batch, log_event
 from inventario.models import ExistenciaInsumo, MovimientoInventario
 from inventario.services_existencias import aplicar_delta
-from maestros.models import CostoInsumo, Insumo, Proveedor
+from maestros.models import CostoInsumo, Insumo, InsumoReadinessProfile, Proveedor
 from maestros.utils.canonical_catalog import (
     canonical_insumo,
     canonical_insumo_by_id,
@@ -37,6 +37,7 @@ from maestros.utils.canonical_catalog import (
     latest_costo_canonico,
     usage_maps_for_insumo_ids,
 )
+from maestros.utils.readiness_profile import article_class_key
 from recetas.models import LineaReceta, PlanProduccion, SolicitudVenta, VentaHistorica
 from recetas.utils.matching import match_insumo
 from recetas.utils.normalizacion import normalizar_nombre
@@ -2541,14 +2542,17 @@ def _enterprise_blocker_action_for_missing(insumo: Insumo | None, missing_field:
     return meta["label"], meta["url"]
 
 
+_ARTICLE_CLASS_LABELS = {
+    InsumoReadinessProfile.CLASE_DESCONOCIDA: "Sin catálogo",
+    Insumo.TIPO_EMPAQUE: "Empaque",
+    Insumo.TIPO_INTERNO: "Insumo interno",
+    Insumo.TIPO_MATERIA_PRIMA: "Materia prima",
+}
+
+
 def _enterprise_article_class(insumo: Insumo | None) -> dict[str, str]:
-    if not insumo:
-        return {"key": "unknown", "label": "Sin catálogo"}
-    if insumo.tipo_item == Insumo.TIPO_EMPAQUE:
-        return {"key": Insumo.TIPO_EMPAQUE, "label": "Empaque"}
-    if insumo.tipo_item == Insumo.TIPO_INTERNO or (insumo.codigo or "").startswith("DERIVADO:RECETA:"):
-        return {"key": Insumo.TIPO_INTERNO, "label": "Insumo interno"}
-    return {"key": Insumo.TIPO_MATERIA_PRIMA, "label": "Materia prima"}
+    key = article_class_key(insumo)
+    return {"key": key, "label": _ARTICLE_CLASS_LABELS[key]}
 
 
 def _missing_field_filter_key(missing_field: str | None) -> str | None:
@@ -2564,6 +2568,15 @@ def _missing_field_filter_key(missing_field: str | None) -> str | None:
     return mapping.get((missing_field or "").strip().lower())
 
 
+def _persisted_readiness_profile(insumo: Insumo | None) -> InsumoReadinessProfile | None:
+    if insumo is None:
+        return None
+    try:
+        return insumo.readiness_profile
+    except InsumoReadinessProfile.DoesNotExist:
+        return None
+
+
 def _enterprise_blocker_details_for_solicitud(solicitud) -> list[dict[str, object]]:
     original_insumo = getattr(solicitud, "insumo", None)
     if original_insumo is None and getattr(solicitud, "insumo_id", None):
@@ -2571,8 +2584,23 @@ def _enterprise_blocker_details_for_solicitud(solicitud) -> list[dict[str, objec
             original_insumo = Insumo.objects.filter(id=solicitud.insumo_id).first()
         except Exception:
             original_insumo = None
-    canonical = canonical_insumo_by_id(solicitud.insumo_id) if getattr(solicitud, "insumo_id", None) else None
-    insumo = canonical or original_insumo
+    # El perfil persistido ya trae canónico, faltantes y costo vigente; sin él
+    # (aún no calculado) se resuelve en línea como antes.
+    readiness = _persisted_readiness_profile(original_insumo)
+    if readiness is not None:
+        canonical = readiness.canonical
+        insumo = canonical
+        is_variant = readiness.es_variante
+        profile = {"missing": list(readiness.missing or []), "readiness_label": readiness.readiness_label}
+        has_cost = not readiness.sin_costo
+        has_main_provider = readiness.tiene_proveedor_principal
+    else:
+        canonical = canonical_insumo_by_id(solicitud.insumo_id) if getattr(solicitud, "insumo_id", None) else None
+        insumo = canonical or original_insumo
+        is_variant = bool(original_insumo and canonical and original_insumo.id != canonical.id)
+        profile = enterprise_readiness_profile(insumo) if insumo else {}
+        has_cost = None
+        has_main_provider = bool(insumo.proveedor_principal_id) if insumo else False
     if not insumo:
         action_meta = _enterprise_blocker_action_meta(None, "catalogo")
         return [
@@ -2589,9 +2617,8 @@ def _enterprise_blocker_details_for_solicitud(solicitud) -> list[dict[str, objec
             }
         ]
 
-    profile = enterprise_readiness_profile(insumo)
     blockers: list[dict[str, object]] = []
-    if original_insumo and canonical and original_insumo.id != canonical.id:
+    if is_variant:
         action_meta = _enterprise_blocker_action_meta(canonical, "catálogo canónico")
         blockers.append(
             {
@@ -2651,8 +2678,10 @@ def _enterprise_blocker_details_for_solicitud(solicitud) -> list[dict[str, objec
                 }
             )
 
-    latest_cost = latest_costo_canonico(insumo_id=insumo.id)
-    if latest_cost is None or latest_cost <= 0:
+    if has_cost is None:
+        latest_cost = latest_costo_canonico(insumo_id=insumo.id)
+        has_cost = latest_cost is not None and latest_cost > 0
+    if not has_cost:
         blockers.append(
             {
                 "key": "sin_costo",
@@ -2667,8 +2696,7 @@ def _enterprise_blocker_details_for_solicitud(solicitud) -> list[dict[str, objec
             }
         )
 
-    proveedor = solicitud.proveedor_sugerido or insumo.proveedor_principal
-    if not proveedor:
+    if not (solicitud.proveedor_sugerido_id or has_main_provider):
         action_meta = _enterprise_blocker_action_meta(insumo, "proveedor principal")
         blockers.append(
             {
@@ -4150,6 +4178,55 @@ def _filter_recepciones_by_scope(recepciones_qs, source_filter: str, plan_filter
     return recepciones_qs
 
 
+_READINESS_MISSING_FIELD_LOOKUPS = {
+    "unidad": {"falta_unidad_base": True},
+    "proveedor": {"tiene_proveedor_principal": False},
+    "categoria": {"falta_categoria": True},
+    "codigo_point": {"falta_codigo_point": True},
+    "canonico": {"es_variante": True},
+}
+_READINESS_BLOCKER_KEY_LOOKUPS = {
+    "sin_costo": {"sin_costo": True},
+    "sin_proveedor": {"tiene_proveedor_principal": False},
+    "maestro_incompleto": {"readiness_label": "Incompleto"},
+    "articulo_inactivo": {"readiness_label": "Inactivo"},
+    "no_canonico": {"es_variante": True},
+}
+
+
+def _readiness_prefilter(prefix: str, lookups: dict[str, object]) -> Q:
+    """Condición sobre el perfil persistido del insumo en ``prefix``.
+
+    Los documentos cuyo insumo aún no tiene perfil pasan el pre-filtro y se
+    evalúan en Python como antes, así que el filtro nunca pierde documentos.
+    """
+    return Q(**{f"{prefix}readiness_profile__{field}": value for field, value in lookups.items()}) | Q(
+        **{f"{prefix}readiness_profile__isnull": True}
+    )
+
+
+def _master_blocker_readiness_q(prefix: str, article_class_filter: str, missing_field_filter: str) -> Q | None:
+    article_class_filter = (article_class_filter or "all").strip()
+    missing_field_filter = (missing_field_filter or "all").strip()
+    lookups: dict[str, object] = {}
+    if article_class_filter not in {"all", InsumoReadinessProfile.CLASE_DESCONOCIDA}:
+        lookups.update(clase_articulo=article_class_filter, activo=True)
+    lookups.update(_READINESS_MISSING_FIELD_LOOKUPS.get(missing_field_filter, {}))
+    return _readiness_prefilter(prefix, lookups) if lookups else None
+
+
+def _solicitud_blocker_key_q(blocker_key: str) -> Q | None:
+    if blocker_key == "sin_catalogo":
+        return Q(insumo__isnull=True)
+    lookups = _READINESS_BLOCKER_KEY_LOOKUPS.get(blocker_key)
+    if not lookups:
+        return None
+    condition = _readiness_prefilter("insumo__", lookups)
+    if blocker_key == "sin_proveedor":
+        condition &= Q(proveedor_sugerido__isnull=True)
+    return condition
+
+
 def _filter_documents_by_master_blockers(documents, article_class_filter: str, missing_field_filter: str):
     article_class_filter = (article_class_filter or "all").strip()
     missing_field_filter = (missing_field_filter or "all").strip()
@@ -6159,6 +6236,9 @@ def _filtered_solicitudes(
     periodo_tipo_raw: str,
     periodo_mes_raw: str,
     q_filter_raw: str = "",
+    *,
+    master_class_raw: str = "all",
+    master_missing_raw: str = "all",
 ):
     source_filter = (source_filter_raw or "all").lower()
     if source_filter not in {"all", "manual", "plan"}:
@@ -6169,7 +6249,12 @@ def _filtered_solicitudes(
     q_filter = (q_filter_raw or "").strip()
     periodo_tipo, periodo_mes, periodo_label = _parse_period_filters(periodo_tipo_raw, periodo_mes_raw)
 
-    solicitudes_qs = SolicitudCompra.objects.select_related("insumo", "insumo__unidad_base", "proveedor_sugerido").all()
+    solicitudes_qs = SolicitudCompra.objects.select_related(
+        "insumo",
+        "insumo__unidad_base",
+        "insumo__readiness_profile__canonical",
+        "proveedor_sugerido",
+    ).all()
     if source_filter == "plan":
         solicitudes_qs = solicitudes_qs.filter(area__startswith="PLAN_PRODUCCION:")
     elif source_filter == "manual":
@@ -6202,6 +6287,14 @@ def _filtered_solicitudes(
     valid_statuses = {choice[0] for choice in SolicitudCompra.STATUS_CHOICES}
     if estatus_filter in valid_statuses:
         solicitudes_qs = solicitudes_qs.filter(estatus=estatus_filter)
+    # Pre-filtros por bloqueo de maestro en SQL; la verificación exacta sigue abajo.
+    readiness_conditions = [
+        _solicitud_blocker_key_q((blocker_key_raw or "all").strip().lower()),
+        _master_blocker_readiness_q("insumo__", master_class_raw, master_missing_raw),
+    ]
+    for condition in readiness_conditions:
+        if condition is not None:
+            solicitudes_qs = solicitudes_qs.filter(condition)
 
     solicitudes = list(solicitudes_qs)
     if not solicitudes:
@@ -7697,9 +7790,14 @@ def solicitudes(request: HttpRequest) -> HttpResponse:
             request.GET.get("periodo_tipo"),
             request.GET.get("periodo_mes"),
             q_filter,
+            master_class_raw=master_class_filter,
+            master_missing_raw=master_missing_filter,
         )
         for solicitud in solicitudes:
-            solicitud.enterprise_master_blocker_details = _enterprise_blocker_details_for_solicitud(solicitud)
+            # _filtered_solicitudes ya calculó los bloqueos al enriquecer el flujo.
+            solicitud.enterprise_master_blocker_details = getattr(solicitud, "workflow_blocker_details", None)
+            if solicitud.enterprise_master_blocker_details is None:
+                solicitud.enterprise_master_blocker_details = _enterprise_blocker_details_for_solicitud(solicitud)
         if closure_key_filter != "all":
             solicitudes = [
                 solicitud
@@ -8151,6 +8249,7 @@ def guardar_presupuesto_categoria(request: HttpRequest) -> HttpResponse:
 
 @login_required
 @require_POST
+@audit_batch()
 def importar_presupuestos_periodo(request: HttpRequest) -> HttpResponse:
     if not can_manage_compras(request.user):
         raise PermissionDenied("No tienes permisos para importar presupuesto.")
@@ -8581,6 +8680,7 @@ def importar_solicitudes(request: HttpRequest) -> HttpResponse:
 
 @login_required
 @require_POST
+@audit_batch()
 def confirmar_importacion_solicitudes(request: HttpRequest) -> HttpResponse:
     if not can_manage_compras(request.user):
         raise PermissionDenied("No tienes permisos para importar solicitudes.")
@@ -9524,7 +9624,10 @@ def ordenes(request: HttpRequest) -> HttpResponse:
             session=request.session,
         )
 
-    ordenes = list(ordenes_qs[:200])
+    master_readiness_q = _master_blocker_readiness_q("solicitud__insumo__", master_class_filter, master_missing_filter)
+    if master_readiness_q is not None:
+        ordenes_qs = ordenes_qs.filter(master_readiness_q)
+    ordenes = list(ordenes_qs.select_related("solicitud__insumo__readiness_profile__canonical")[:200])
     plan_ids = {
         int(plan_id)
         for plan_id in {
@@ -9848,7 +9951,12 @@ def recepciones(request: HttpRequest) -> HttpResponse:
             session=request.session,
         )
 
-    recepciones = list(recepciones_qs[:200])
+    master_readiness_q = _master_blocker_readiness_q(
+        "orden__solicitud__insumo__", master_class_filter, master_missing_filter
+    )
+    if master_readiness_q is not None:
+        recepciones_qs = recepciones_qs.filter(master_readiness_q)
+    recepciones = list(recepciones_qs.select_related("orden__solicitud__insumo__readiness_profile__canonical")[:200])
     plan_ids: set[int] = set()
     for recepcion in recepciones:
         solicitud_area = getattr(getattr(recepcion.orden, "solicitud", None), "area", "")
@@ -8,9 +8,8 @@ import xml.etree.ElementTree as ET
 from dataclasses import asdict, dataclass
 from datetime import date, datetime, time, timedelta
 from decimal import Decimal, InvalidOperation
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import pandas as pd
 from django.db.models import Count, Max, Min, Q, Sum
 from django.db.models.functions import TruncDate
 from django.db import transaction
@@ -26,6 +25,9 @@ from core.models import Sucursal
 from sat_client.models import CfdiDescargado, CfdiPagoRelacionado
 from syncfy_client.models import CuentaBancaria, MovimientoBancario
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 MAX_PREVIEW_ROWS = 50
 MAX_IMPORT_ROWS = 3000
@@ -1184,6 +1186,8 @@ def _periodo_label(*, year: int, month: int) -> str:
 
 
 def _read_dataframe(content: bytes, suffix: str) -> pd.DataFrame:
+    import pandas as pd
+
     buffer = io.BytesIO(content)
     if suffix == "csv":
         return _read_csv_dataframe(content)
@@ -1205,6 +1209,8 @@ def _read_csv_dataframe(content: bytes) -> pd.DataFrame:
 
 
 def _read_csv_with_header(content: bytes) -> pd.DataFrame:
+    import pandas as pd
+
     try:
         return pd.read_csv(io.BytesIO(content))
     except UnicodeDecodeError:
@@ -1237,6 +1243,8 @@ def _dataframe_has_bank_columns(dataframe: pd.DataFrame) -> bool:
 
 
 def _read_bajio_detallado_csv(content: bytes) -> pd.DataFrame:
+    import pandas as pd
+
     try:
         raw = pd.read_csv(io.BytesIO(content), header=None, encoding="latin-1")
     except UnicodeDecodeError:
@@ -1263,6 +1271,8 @@ def _read_bajio_detallado_csv(content: bytes) -> pd.DataFrame:
 
 
 def _read_pdf_dataframe(content: bytes) -> pd.DataFrame:
+    import pandas as pd
+
     try:
         import pdfplumber
     except ImportError as exc:
@@ -1574,6 +1584,8 @@ def _bajio_detallado_has_amount(row) -> bool:
 
 
 def _read_xml_dataframe(content: bytes) -> pd.DataFrame:
+    import pandas as pd
+
     try:
         root = ET.fromstring(content)
     except ET.ParseError as exc:
@@ -1604,6 +1616,8 @@ def _read_xml_dataframe(content: bytes) -> pd.DataFrame:
 
 
 def _read_xml_table_dataframe(root: ET.Element) -> pd.DataFrame:
+    import pandas as pd
+
     tables: list[list[list[str]]] = []
     for element in root.iter():
         row_elements = [child for child in list(element) if _xml_tag(child.tag).lower() == "row"]
@@ -1633,6 +1647,8 @@ def _is_bajio_statement_cfdi(root: ET.Element) -> bool:
 
 
 def _read_bajio_statement_cfdi_dataframe(root: ET.Element) -> pd.DataFrame:
+    import pandas as pd
+
     root_fecha = _xml_attr(root, "Fecha")
     rows: list[dict[str, Any]] = []
     for concepto in root.iter():
@@ -1933,6 +1949,8 @@ def _manual_transaction_id(*, cuenta: CuentaBancaria, movimiento: MovimientoNorm
 
 
 def _parse_fecha(value: Any) -> datetime:
+    import pandas as pd
+
     if value in (None, ""):
         raise ImportacionBancariaError("falta fecha.")
     if isinstance(value, datetime):
@@ -2024,6 +2042,8 @@ def _decimal(value: Any) -> Decimal:
 
 
 def _clean_value(value: Any) -> Any:
+    import pandas as pd
+
     if pd.isna(value):
         return ""
     return value
@@ -14,9 +14,6 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.decorators.http import require_http_methods
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill
-from openpyxl.utils import get_column_letter
 
 from conciliacion.services.importador import (
     ImportacionBancariaError,
@@ -479,6 +476,8 @@ def _export_paquete_contabilidad_desktop_csv(paquete: dict) -> HttpResponse:
 
 
 def _export_paquete_xlsx(paquete: dict) -> HttpResponse:
+    from openpyxl import Workbook
+
     workbook = Workbook()
     resumen = workbook.active
     resumen.title = "Resumen"
@@ -804,6 +803,8 @@ def _cuenta_contrapartida_sugerida(movimiento: MovimientoBancario) -> str:
 
 
 def _write_key_values(sheet, rows: list[tuple[str, object]]) -> None:
+    from openpyxl.styles import Font
+
     sheet["A1"] = "Paquete mensual de conciliacion"
     sheet["A1"].font = Font(bold=True, size=14)
     for idx, (key, value) in enumerate(rows, start=3):
@@ -812,6 +813,8 @@ def _write_key_values(sheet, rows: list[tuple[str, object]]) -> None:
 
 
 def _write_table(sheet, start_row: int, headers: list[str], rows: list[list[object]]) -> None:
+    from openpyxl.styles import Font, PatternFill
+
     for col, header in enumerate(headers, start=1):
         cell = sheet.cell(row=start_row, column=col, value=header)
         cell.font = Font(bold=True)
@@ -830,6 +833,8 @@ def _write_dict_table(sheet, rows: list[dict[str, str]]) -> None:
 
 
 def _autosize_sheet(sheet) -> None:
+    from openpyxl.utils import get_column_letter
+
     for column in sheet.columns:
         max_length = 0
         letter = get_column_letter(column[0].column)
@@ -0,0 +1,117 @@
+"""
+Telemetría de colas de Celery para ``manage.py celery_queue_report``.
+
+- Al publicar, cada mensaje lleva el header ``published_at`` (epoch), para medir
+  la antigüedad del mensaje más viejo de cada cola.
+- Al terminar, el worker guarda la duración de la tarea en el backend de
+  resultados (Redis) en una lista acotada por nombre de tarea.
+
+Si el broker o el backend no son Redis, el reporte simplemente omite esos datos.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import statistics
+import time
+from typing import Any
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+
+logger = logging.getLogger(__name__)
+
+RUNTIME_KEY_PREFIX = "erp:celery:runtime:"
+PUBLISHED_AT_HEADER = "published_at"
+
+_started_at: dict[str, float] = {}
+
+
+def _runtime_samples_limit() -> int:
+    from django.conf import settings
+
+    return max(int(getattr(settings, "CELERY_QUEUE_RUNTIME_SAMPLES", 200) or 200), 1)
+
+
+def _redis_client(backend) -> Any | None:
+    return getattr(backend, "client", None)
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **_kwargs) -> None:
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def mark_task_started(task_id=None, **_kwargs) -> None:
+    if task_id:
+        _started_at[task_id] = time.monotonic()
+
+
+@task_postrun.connect
+def record_task_runtime(task_id=None, task=None, state=None, **_kwargs) -> None:
+    started = _started_at.pop(task_id, None) if task_id else None
+    if started is None or task is None:
+        return
+    client = _redis_client(task.backend)
+    if client is None:
+        return
+    sample = json.dumps({"s": round(time.monotonic() - started, 3), "state": state, "at": int(time.time())})
+    key = f"{RUNTIME_KEY_PREFIX}{task.name}"
+    try:
+        pipe = client.pipeline()
+        pipe.lpush(key, sample)
+        pipe.ltrim(key, 0, _runtime_samples_limit() - 1)
+        pipe.execute()
+    except Exception:
+        logger.debug("No se pudo registrar la duración de %s", task.name, exc_info=True)
+
+
+def queue_snapshot(channel_client, queue_name: str, *, now: float | None = None) -> dict[str, Any]:
+    """
+    Profundidad y antigüedad del mensaje más viejo de una cola en Redis.
+
+    Kombu publica con LPUSH y consume por la derecha: el más viejo está en -1.
+    """
+    now = time.time() if now is None else now
+    depth = int(channel_client.llen(queue_name) or 0)
+    oldest_age = None
+    if depth:
+        raw = channel_client.lindex(queue_name, -1)
+        try:
+            message = json.loads(raw)
+            published_at = (message.get("headers") or {}).get(PUBLISHED_AT_HEADER)
+            if published_at:
+                oldest_age = max(now - float(published_at), 0.0)
+        except (TypeError, ValueError):
+            oldest_age = None
+    return {"queue": queue_name, "depth": depth, "oldest_age_seconds": oldest_age}
+
+
+def runtime_stats(client, task_names) -> list[dict[str, Any]]:
+    rows = []
+    for task_name in task_names:
+        samples = []
+        failures = 0
+        for raw in client.lrange(f"{RUNTIME_KEY_PREFIX}{task_name}", 0, -1) or []:
+            try:
+                item = json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            samples.append(float(item.get("s") or 0))
+            failures += 1 if item.get("state") not in (None, "SUCCESS") else 0
+        if not samples:
+            continue
+        ordered = sorted(samples)
+        rows.append(
+            {
+                "task": task_name,
+                "runs": len(ordered),
+                "failures": failures,
+                "p50_seconds": round(statistics.median(ordered), 3),
+                "p95_seconds": round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 3),
+                "max_seconds": round(ordered[-1], 3),
+            }
+        )
+    return rows
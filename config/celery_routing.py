@@ -0,0 +1,202 @@
+"""
+Topología de colas de Celery.
+
+Las tareas se reparten en cuatro carriles para que un backfill de horas o la
+descarga SAT no retrasen lo sensible a latencia (inventario en tiempo real,
+notificaciones, webhooks):
+
+- ``realtime``: segundos; expira si se queda en cola más de lo útil.
+- ``interactive``: disparadas por usuarios o alertas de la mañana.
+- ``batch``: sincronizaciones con sistemas externos (Point, SAT, Hikvision).
+- ``heavy``: cierres, pronósticos y recálculos intensivos de CPU/BD.
+
+Este módulo es la única fuente de verdad: ``config/settings.py`` construye
+``CELERY_TASK_QUEUES``, ``CELERY_TASK_ROUTES`` y ``CELERY_TASK_ANNOTATIONS`` a
+partir de estas tablas. Una tarea nueva sin entrada cae en ``interactive``.
+
+Los límites de tiempo se aplican vía anotaciones, así que una entrada en
+``TASK_LIMITS`` sustituye lo que diga el decorador de la tarea. Celery solo los
+hace cumplir con ``--pool=prefork``: con ``--pool=solo`` una tarea colgada no se
+corta nunca. Por eso cada carril corre en su propio worker prefork (ver
+docker-compose) y un cierre ``heavy`` de horas no detiene las sincronizaciones
+``batch``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+QUEUE_REALTIME = "realtime"
+QUEUE_INTERACTIVE = "interactive"
+QUEUE_BATCH = "batch"
+QUEUE_HEAVY = "heavy"
+
+
+@dataclass(frozen=True)
+class Lane:
+    queue: str
+    soft_time_limit: int
+    time_limit: int
+    # Prefetch es por worker: cada carril corre en su propio worker
+    # (ver docker-compose) con este ``--prefetch-multiplier``.
+    prefetch_multiplier: int
+    acks_late: bool = False
+    # Segundos tras los cuales un mensaje sin consumir se descarta.
+    expires: int | None = None
+
+
+LANES: dict[str, Lane] = {
+    QUEUE_REALTIME: Lane(QUEUE_REALTIME, soft_time_limit=90, time_limit=120, prefetch_multiplier=4, expires=10 * 60),
+    QUEUE_INTERACTIVE: Lane(QUEUE_INTERACTIVE, soft_time_limit=5 * 60, time_limit=6 * 60, prefetch_multiplier=2),
+    QUEUE_BATCH: Lane(QUEUE_BATCH, soft_time_limit=55 * 60, time_limit=60 * 60, prefetch_multiplier=1, acks_late=True),
+    QUEUE_HEAVY: Lane(QUEUE_HEAVY, soft_time_limit=3 * 60 * 60, time_limit=3 * 60 * 60 + 5 * 60, prefetch_multiplier=1, acks_late=True),
+}
+
+DEFAULT_QUEUE = QUEUE_INTERACTIVE
+
+TASK_LANES: dict[str, str] = {
+    # --- realtime ---
+    "pos_bridge.realtime_inventory_sync": QUEUE_REALTIME,
+    "pos_bridge.ecommerce_webhook_delivery": QUEUE_REALTIME,
+    "logistica.tasks.detectar_gps_perdido_rutas": QUEUE_REALTIME,
+    "logistica.tasks.notificar_desvio_ruta_automatico": QUEUE_REALTIME,
+    "logistica.tasks.procesar_ubicacion_ruta": QUEUE_REALTIME,
+    "logistica.tasks.notificar_reporte_nuevo": QUEUE_REALTIME,
+    "fallas.tasks.notificar_nuevo_reporte": QUEUE_REALTIME,
+    "fallas.tasks.notificar_cambio_estatus": QUEUE_REALTIME,
+    # --- interactive ---
+    "core.tasks.persist_audit_events": QUEUE_INTERACTIVE,
+    "horarios_especiales.execute_request": QUEUE_INTERACTIVE,
+    "orquestacion.run_rule": QUEUE_INTERACTIVE,
+    "logistica.tasks.alertar_documentos_por_vencer": QUEUE_INTERACTIVE,
+    "logistica.tasks.alertar_servicios_proximos": QUEUE_INTERACTIVE,
+    "logistica.tasks.alertar_lavados_pendientes": QUEUE_INTERACTIVE,
+    "logistica.tasks.escalar_tickets_sin_respuesta": QUEUE_INTERACTIVE,
+    "logistica.tasks.auditar_ticket_combustible": QUEUE_INTERACTIVE,
+    "logistica.tasks.procesar_recarga_cedis_automatica": QUEUE_INTERACTIVE,
+    "rrhh.tasks.alertar_cuotas_quincena": QUEUE_INTERACTIVE,
+    "rrhh.tasks.alertar_he_pendientes": QUEUE_INTERACTIVE,
+    "seguimiento.recordatorios_calendario": QUEUE_INTERACTIVE,
+    "reportes.alerta_produccion_sin_registros": QUEUE_INTERACTIVE,
+    "reportes.enviar_reporte_diario": QUEUE_INTERACTIVE,
+    "rentabilidad.tasks_rentabilidad.analizar_sucursal_con_ia": QUEUE_INTERACTIVE,
+    # --- batch: integraciones externas ---
+    "pos_bridge.inventory_sync": QUEUE_BATCH,
+    "pos_bridge.daily_sales_sync": QUEUE_BATCH,
+    "pos_bridge.production_sync": QUEUE_BATCH,
+    "pos_bridge.waste_sync": QUEUE_BATCH,
+    "pos_bridge.transfer_sync": QUEUE_BATCH,
+    "pos_bridge.open_transfer_sync": QUEUE_BATCH,
+    "pos_bridge.conversion_sync": QUEUE_BATCH,
+    "pos_bridge.delivery_note_sync": QUEUE_BATCH,
+    "pos_bridge.attendance_sync": QUEUE_BATCH,
+    "pos_bridge.catalog_recipe_sync": QUEUE_BATCH,
+    "pos_bridge.product_recipe_sync": QUEUE_BATCH,
+    "pos_bridge.purchase_resale_cost_sync": QUEUE_BATCH,
+    "pos_bridge.sync_product_prices_task": QUEUE_BATCH,
+    "pos_bridge.retry_failed_jobs": QUEUE_BATCH,
+    "pos_bridge.recipe_gap_audit": QUEUE_BATCH,
+    "pos_bridge.weekly_cost_snapshot": QUEUE_BATCH,
+    "sat_client.ejecutar_descarga_sat_nocturna": QUEUE_BATCH,
+    "rrhh.tasks.sync_asistencia_point": QUEUE_BATCH,
+    "rrhh.tasks.sync_asistencia_hikvision_isapi": QUEUE_BATCH,
+    "ventas.sync_ventas_autoritativas": QUEUE_BATCH,
+    "seguimiento.importar_agente_dg": QUEUE_BATCH,
+    "rentabilidad.tasks_rentabilidad.analizar_rentabilidad_periodo_con_ia": QUEUE_BATCH,
+    "reportes.operations_automation_cycle": QUEUE_BATCH,
+    "reportes.visible_cut_refresh_cycle": QUEUE_BATCH,
+    "reportes.refresh_dg_operacion_snapshot": QUEUE_BATCH,
+    "reportes.refresh_investment_snapshots": QUEUE_BATCH,
+    "reportes.erp_doctor_daily_report": QUEUE_BATCH,
+    "reportes.monitoreo_variacion_costos_reventa": QUEUE_BATCH,
+    "reportes.precompute_executive_panels": QUEUE_BATCH,
+    "pos_bridge.prepare_month_closure_stages": QUEUE_BATCH,
+    "pos_bridge.month_closure_stage_unit": QUEUE_BATCH,
+    "pos_bridge.monthly_product_closure_failed": QUEUE_BATCH,
+    "recetas.consolidado_nocturno_cedis": QUEUE_BATCH,
+    "recetas.inventario_final_cierre_email": QUEUE_BATCH,
+    "rrhh.tasks.consumir_goce_vacaciones_completado": QUEUE_BATCH,
+    "rrhh.tasks.evaluar_asistencia_diaria": QUEUE_BATCH,
+    "rrhh.tasks.auditar_vacaciones_diaria": QUEUE_BATCH,
+    "logistica.tasks.auditar_entregas_ruta_task": QUEUE_BATCH,
+    "logistica.tasks.aprender_tramos_rutas": QUEUE_BATCH,
+    "core.tasks.verificar_datos_mes": QUEUE_BATCH,
+    # --- heavy: cierres y recálculos ---
+    "core.tasks.cerrar_mes_anterior": QUEUE_HEAVY,
+    "pos_bridge.monthly_product_closure": QUEUE_HEAVY,
+    "inventario.generar_consumos_bom_dia_anterior": QUEUE_HEAVY,
+    "proyecciones.generar_forecast_quincenal": QUEUE_HEAVY,
+    "proyecciones.generar_proyeccion_dia_siguiente": QUEUE_HEAVY,
+    "proyecciones.generar_proyeccion_semana_siguiente": QUEUE_HEAVY,
+    "ventas.tasks.calcular_y_guardar_pronostico": QUEUE_HEAVY,
+    "rentabilidad.tasks_rentabilidad.recalcular_rentabilidad_mensual": QUEUE_HEAVY,
+    "rentabilidad.tasks_rentabilidad.recalcular_rentabilidad_periodo_actual": QUEUE_HEAVY,
+    "reportes.cierre_produccion_nocturno": QUEUE_HEAVY,
+    "reportes.analytics_refresh_cycle": QUEUE_HEAVY,
+    "reportes.snapshot_historical_costing_task": QUEUE_HEAVY,
+    "reportes.consolidar_presupuesto_real": QUEUE_HEAVY,
+    "reportes.conciliar_combustible_mensual": QUEUE_HEAVY,
+    "rrhh.tasks.reconciliar_bonos_asistencia_periodo_actual": QUEUE_HEAVY,
+}
+
+# Límites propios (soft, hard) en segundos; sustituyen los del carril.
+TASK_LIMITS: dict[str, tuple[int, int]] = {
+    "orquestacion.run_rule": (840, 900),
+    "seguimiento.importar_agente_dg": (840, 900),
+    "ventas.tasks.calcular_y_guardar_pronostico": (270, 300),
+    "pos_bridge.realtime_inventory_sync": (4 * 60, 5 * 60),
+    "sat_client.ejecutar_descarga_sat_nocturna": (3 * 60 * 60, 3 * 60 * 60 + 5 * 60),
+}
+
+# Tareas que golpean sistemas externos: tope de ejecuciones por worker.
+EXTERNAL_RATE_LIMITS: dict[str, str] = {
+    "pos_bridge.inventory_sync": "6/m",
+    "pos_bridge.daily_sales_sync": "2/m",
+    "pos_bridge.production_sync": "2/m",
+    "pos_bridge.waste_sync": "2/m",
+    "pos_bridge.transfer_sync": "2/m",
+    "pos_bridge.open_transfer_sync": "2/m",
+    "pos_bridge.conversion_sync": "2/m",
+    "pos_bridge.delivery_note_sync": "2/m",
+    "pos_bridge.attendance_sync": "2/m",
+    "pos_bridge.catalog_recipe_sync": "1/m",
+    "pos_bridge.product_recipe_sync": "1/m",
+    "pos_bridge.purchase_resale_cost_sync": "1/m",
+    "pos_bridge.sync_product_prices_task": "1/m",
+    "pos_bridge.realtime_inventory_sync": "12/m",
+    "pos_bridge.ecommerce_webhook_delivery": "60/m",
+    "sat_client.ejecutar_descarga_sat_nocturna": "1/m",
+    "rrhh.tasks.sync_asistencia_hikvision_isapi": "4/m",
+    "rrhh.tasks.sync_asistencia_point": "2/m",
+    "rentabilidad.tasks_rentabilidad.analizar_sucursal_con_ia": "20/m",
+}
+
+
+def lane_for_task(task_name: str) -> Lane:
+    return LANES[TASK_LANES.get(task_name, DEFAULT_QUEUE)]
+
+
+def build_task_queues():
+    from kombu import Queue
+
+    return tuple(Queue(lane.queue, routing_key=lane.queue) for lane in LANES.values())
+
+
+def build_task_routes() -> dict[str, dict[str, str]]:
+    return {task_name: {"queue": queue} for task_name, queue in TASK_LANES.items()}
+
+
+def build_task_annotations() -> dict[str, dict]:
+    annotations: dict[str, dict] = {}
+    for task_name in set(TASK_LANES) | set(TASK_LIMITS) | set(EXTERNAL_RATE_LIMITS):
+        lane = lane_for_task(task_name)
+        soft, hard = TASK_LIMITS.get(task_name, (lane.soft_time_limit, lane.time_limit))
+        options: dict = {"soft_time_limit": soft, "time_limit": hard}
+        if lane.acks_late:
+            options["acks_late"] = True
+        if lane.expires:
+            options["expires"] = lane.expires
+        if task_name in EXTERNAL_RATE_LIMITS:
+            options["rate_limit"] = EXTERNAL_RATE_LIMITS[task_name]
+        annotations[task_name] = options
+    return annotations
@@ -2,10 +2,13 @@
 import os
 import socket
 import sys
+import tempfile
 
 import dj_database_url
 from celery.schedules import crontab
 
+from config import celery_routing
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
@@ -88,6 +91,8 @@ POINT_LINK_FINGERPRINT_KEY_FALLBACKS = env_list(
 LOCAL_DEV_HOST_PORT = os.getenv("WEB_HOST_PORT", "8011")
 CANONICAL_LOCAL_HOST = os.getenv("CANONICAL_LOCAL_HOST", f"localhost:{LOCAL_DEV_HOST_PORT}")
 AI_GATEWAY_OPENAPI_SERVER_URL = os.getenv("AI_GATEWAY_OPENAPI_SERVER_URL", "").strip()
+# Búsquedas de catálogo (gateway de IA y autocompletes) más lentas que esto se registran como warning.
+CATALOG_SEARCH_SLOW_MS = env_int("CATALOG_SEARCH_SLOW_MS", 200)
 ONYX_PORTAL_URL = os.getenv("ONYX_PORTAL_URL", "https://ai.pollyanasdolce.com").strip()
 GOOGLE_SERVER_API_KEY = os.getenv("GOOGLE_SERVER_API_KEY", "").strip()
 GOOGLE_ROUTES_TIMEOUT_SECONDS = env_int("GOOGLE_ROUTES_TIMEOUT_SECONDS", 10)
@@ -95,6 +100,17 @@ GOOGLE_ROADS_TIMEOUT_SECONDS = env_int("GOOGLE_ROADS_TIMEOUT_SECONDS", 10)
 GOOGLE_ROADS_SNAP_ENABLED = env_bool("GOOGLE_ROADS_SNAP_ENABLED", default=False)
 GOOGLE_ROADS_SNAP_MAX_POINTS = env_int("GOOGLE_ROADS_SNAP_MAX_POINTS", 100)
 LOGISTICA_FALLBACK_SPEED_KMH = env_int("LOGISTICA_FALLBACK_SPEED_KMH", 35)
+# Caché de tramos de ruta: 3 decimales ≈ 110 m; franjas de 3 h para tiempos de traslado.
+LOGISTICA_TRAMO_PRECISION_DECIMALES = env_int("LOGISTICA_TRAMO_PRECISION_DECIMALES", 3)
+LOGISTICA_TRAMO_FRANJA_HORAS = env_int("LOGISTICA_TRAMO_FRANJA_HORAS", 3)
+LOGISTICA_TRAMO_CACHE_DIAS = env_int("LOGISTICA_TRAMO_CACHE_DIAS", 30)
+LOGISTICA_TRAMO_MIN_OBSERVACIONES = env_int("LOGISTICA_TRAMO_MIN_OBSERVACIONES", 2)
+# Estado vivo de rutas: con ASINCRONO las geocercas de cada señal se procesan en
+# la cola realtime y la aceptación del GPS solo guarda la ubicación.
+LOGISTICA_RUTA_ESTADO_ASINCRONO = env_bool("LOGISTICA_RUTA_ESTADO_ASINCRONO", default=False)
+LOGISTICA_RUTA_ESTADO_TTL_SECONDS = env_int("LOGISTICA_RUTA_ESTADO_TTL_SECONDS", 18 * 60 * 60)
+# Margen de la marca de agua del checklist de carga contra transacciones de Point aún abiertas.
+LOGISTICA_CARGA_POINT_MARGEN_SEGUNDOS = env_int("LOGISTICA_CARGA_POINT_MARGEN_SEGUNDOS", 300)
 # Ventana absoluta y corta para vaciar colas offline creadas por la PWA v59.
 # Definirla vacia deshabilita la compatibilidad inmediatamente.
 LOGISTICA_PWA_V59_COMPAT_UNTIL = os.getenv(
@@ -172,6 +188,7 @@ MIDDLEWARE = [
     "core.middleware.RepartidorOnlyMiddleware",
     "core.middleware.MermasOnlyMiddleware",
     "core.middleware.PerformanceLoggingMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -247,6 +264,31 @@ elif DEBUG:
 else:
     raise ValueError("DATABASE_URL or DB_HOST must be set when DEBUG=False")
 
+# Réplica de lectura para analítica, API de BI y exportes (core/db_routing.py).
+# Sin DATABASE_REPLICA_URL no hay alias y todo se lee del primario. En tests la
+# réplica es una segunda conexión a la misma base (espejo de default) y el ruteo
+# queda apagado salvo en las pruebas que lo encienden.
+DATABASE_REPLICA_ALIAS = "replica"
+DATABASE_REPLICA_URL = (os.getenv("DATABASE_REPLICA_URL") or "").strip()
+if DATABASE_REPLICA_URL:
+    DATABASES[DATABASE_REPLICA_ALIAS] = dj_database_url.config(
+        default=DATABASE_REPLICA_URL,
+        conn_max_age=600,
+        ssl_require=False,
+    )
+elif RUNNING_TESTS:
+    DATABASES[DATABASE_REPLICA_ALIAS] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+DATABASE_ROUTERS = ["core.db_routing.ReplicaRouter"]
+DATABASE_REPLICA_ENABLED = env_bool("DATABASE_REPLICA_ENABLED", default=bool(DATABASE_REPLICA_URL))
+# Retraso máximo aceptado por tipo de lectura (segundos); arriba de eso se lee del primario.
+DATABASE_REPLICA_LAG_TOLERANCES = {
+    "default": env_int("DATABASE_REPLICA_MAX_LAG_SECONDS", 30),
+    "analytics": env_int("DATABASE_REPLICA_ANALYTICS_MAX_LAG_SECONDS", 300),
+    "exports": env_int("DATABASE_REPLICA_EXPORTS_MAX_LAG_SECONDS", 120),
+}
+DATABASE_REPLICA_LAG_CHECK_SECONDS = env_int("DATABASE_REPLICA_LAG_CHECK_SECONDS", 5)
+DATABASE_REPLICA_PIN_SECONDS = env_int("DATABASE_REPLICA_PIN_SECONDS", 15)
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -335,6 +377,13 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_IMPORTS = ("pos_bridge.tasks", "sat_client.tasks")
+# Carriles realtime / interactive / batch / heavy (ver config/celery_routing.py).
+CELERY_TASK_QUEUES = celery_routing.build_task_queues()
+CELERY_TASK_DEFAULT_QUEUE = celery_routing.DEFAULT_QUEUE
+CELERY_TASK_ROUTES = celery_routing.build_task_routes()
+CELERY_TASK_ANNOTATIONS = celery_routing.build_task_annotations()
+CELERY_WORKER_PREFETCH_MULTIPLIER = env_int("CELERY_WORKER_PREFETCH_MULTIPLIER", 1)
+CELERY_QUEUE_RUNTIME_SAMPLES = env_int("CELERY_QUEUE_RUNTIME_SAMPLES", 200)
 CELERY_BEAT_SCHEDULE = {
     "logistica-alertar-documentos-por-vencer": {
         "task": "logistica.tasks.alertar_documentos_por_vencer",
@@ -376,6 +425,11 @@ CELERY_BEAT_SCHEDULE = {
         "schedule": 5 * 60,
         "kwargs": {"umbral_minutos": 10},
     },
+    "logistica-aprender-tramos-rutas": {
+        "task": "logistica.tasks.aprender_tramos_rutas",
+        "schedule": crontab(hour=23, minute=50),
+        "options": {"timezone": TIME_ZONE},
+    },
     # --- Sync diario de ventas Point ---
     "pos_bridge: sync ventas diario": {
         "task": "pos_bridge.daily_sales_sync",
@@ -412,6 +466,16 @@ CELERY_BEAT_SCHEDULE = {
         "schedule": crontab(hour=6, minute=0, day_of_month="6"),
         # Día 6 de cada mes — después del cierre automático (día 5)
     },
+    "rentabilidad: analisis IA mensual": {
+        "task": "rentabilidad.tasks_rentabilidad.analizar_rentabilidad_periodo_con_ia",
+        "schedule": crontab(hour=7, minute=0, day_of_month="6"),
+        # Una hora después del recálculo; solo re-analiza sucursales cuyos números cambiaron
+    },
+    # --- Precálculo de paneles ejecutivos de BI (solo recalcula los vencidos) ---
+    "reportes: precalculo paneles ejecutivos": {
+        "task": "reportes.precompute_executive_panels",
+        "schedule": 10 * 60,
+    },
     # --- Monitoreo variación de costos de reventa ---
     "reportes: monitoreo variacion costos reventa": {
         "task": "reportes.monitoreo_variacion_costos_reventa",
@@ -469,6 +533,8 @@ RESEND_TIMEOUT_SECONDS = float(os.getenv("RESEND_TIMEOUT_SECONDS", "30"))
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 POS_BRIDGE_AGENT_MODEL = os.getenv("POS_BRIDGE_AGENT_MODEL", "gpt-4o-mini")
+# Traslape de ``?changed_since=`` para filas que se confirman tarde con un ``updated_at`` anterior.
+POS_BRIDGE_API_CHANGED_SINCE_MARGIN_SECONDS = env_int("POS_BRIDGE_API_CHANGED_SINCE_MARGIN_SECONDS", 120)
 
 LOGIN_URL = "/login/"
 LOGIN_REDIRECT_URL = "/dashboard/"
@@ -488,9 +554,32 @@ LOGGING = {
 ERP_PERF_LOGGING_ENABLED = env_bool("ERP_PERF_LOGGING_ENABLED", default=DEBUG and not RUNNING_TESTS)
 ERP_SLOW_ENDPOINT_MS = env_int("ERP_SLOW_ENDPOINT_MS", 1000)
 ERP_SLOW_QUERY_MS = env_int("ERP_SLOW_QUERY_MS", 200)
+# Presupuesto de importación al arrancar web y Celery (manage.py check_import_budget).
+# Los módulos diferidos sólo deben cargarse en el camino que los usa.
+ERP_IMPORT_BUDGET_TOTAL_MS = env_int("ERP_IMPORT_BUDGET_TOTAL_MS", 4000)
+ERP_IMPORT_BUDGET_MODULE_MS = env_int("ERP_IMPORT_BUDGET_MODULE_MS", 250)
+ERP_IMPORT_DEFERRED_MODULES = [
+    "pandas",
+    "openpyxl",
+    "prophet",
+    "statsmodels",
+    "playwright",
+    "rapidfuzz",
+    "openai",
+    "recetas.views.plan",
+    "recetas.views.mrp",
+    "recetas.views.reabasto",
+    "compras.views",
+    "api.ai_gateway_services",
+]
 ERP_AUTO_PURCHASE_ENABLED = env_bool("ERP_AUTO_PURCHASE_ENABLED", default=True)
 ERP_AUTO_PURCHASE_MIN_SHORTAGE = os.getenv("ERP_AUTO_PURCHASE_MIN_SHORTAGE", "0.001")
 ERP_OPERATION_ALERTS_ENABLED = env_bool("ERP_OPERATION_ALERTS_ENABLED", default=True)
+# Paneles ejecutivos de BI: se sirve el último resultado bueno y los vencidos se
+# recalculan en Celery (reportes/panel_precompute.py). En tests se construyen en línea.
+REPORTES_PANEL_PRECOMPUTE_ENABLED = env_bool("REPORTES_PANEL_PRECOMPUTE_ENABLED", default=not RUNNING_TESTS)
+REPORTES_PANEL_MAX_AGE_SECONDS = env_int("REPORTES_PANEL_MAX_AGE_SECONDS", 6 * 60 * 60)
+REPORTES_PANEL_REFRESH_LOCK_SECONDS = env_int("REPORTES_PANEL_REFRESH_LOCK_SECONDS", 600)
 
 IS_SECURE_ENV = not DEBUG and APP_ENV in {"staging", "production"}
 if IS_SECURE_ENV:
@@ -538,6 +627,22 @@ POINT_DELIVERY_SYNC_STALE_SECONDS = max(
 )
 
 ORQUESTACION_POINTDAILYSALE_GUARD_ENABLED = env_bool("ORQUESTACION_POINTDAILYSALE_GUARD_ENABLED", default=True)
+# Cierre mensual de producto por etapa y sucursal (pos_bridge/services/product_month_closure_stages.py).
+PRODUCT_MONTH_CLOSURE_STAGE_CACHE_ENABLED = env_bool("PRODUCT_MONTH_CLOSURE_STAGE_CACHE_ENABLED", default=not RUNNING_TESTS)
+PRODUCT_MONTH_CLOSURE_STAGE_CACHE_SECONDS = env_int("PRODUCT_MONTH_CLOSURE_STAGE_CACHE_SECONDS", 7 * 24 * 60 * 60)
+PRODUCT_MONTH_CLOSURE_OFFICIAL_REPORT_CACHE_SECONDS = env_int("PRODUCT_MONTH_CLOSURE_OFFICIAL_REPORT_CACHE_SECONDS", 15 * 60)
+PRODUCT_MONTH_CLOSURE_PARALLEL_STAGES = env_bool("PRODUCT_MONTH_CLOSURE_PARALLEL_STAGES", default=True)
+# Libros de presupuesto leídos, por hash de archivo (reportes/services_budget_workbook.py).
+# El caché vive fuera del repositorio: son pickles regenerables, no datos.
+BUDGET_WORKBOOK_CACHE_ENABLED = env_bool("BUDGET_WORKBOOK_CACHE_ENABLED", default=not RUNNING_TESTS)
+BUDGET_WORKBOOK_CACHE_ROOT = os.getenv(
+    "BUDGET_WORKBOOK_CACHE_ROOT",
+    os.path.join(os.getenv("XDG_CACHE_HOME") or tempfile.gettempdir(), "pastelerias_erp", "budget_workbooks"),
+)
+BUDGET_WORKBOOK_MAX_WORKERS = max(1, env_int("BUDGET_WORKBOOK_MAX_WORKERS", 4))
+# Backtest rolling-origin de forecast (reportes/forecast_backtest_service.py). En
+# tests las series se ajustan en el mismo proceso.
+FORECAST_BACKTEST_MAX_WORKERS = max(1, env_int("FORECAST_BACKTEST_MAX_WORKERS", 1 if RUNNING_TESTS else 4))
 
 # SAT Web Service - Descarga Masiva CFDI.
 SAT_DESCARGA_ENABLED = env_bool("SAT_DESCARGA_ENABLED", default=False)
@@ -571,3 +676,5 @@ RENT_MARGEN_BRUTO_MIN = 55.0
 RENT_MARGEN_NETO_MIN = 15.0
 RENT_ROI_OBJETIVO = 25.0
 RENT_PAYBACK_MAX_MESES = 36
+RENT_AGENTE_MAX_WORKERS = env_int("RENT_AGENTE_MAX_WORKERS", 4)
+RENT_AGENTE_TIMEOUT_SEGUNDOS = env_int("RENT_AGENTE_TIMEOUT_SEGUNDOS", 60)
@@ -13,31 +13,28 @@ GOOGLE_SERVER_API_KEY = ""
 # settings_test debe reutilizar PostgreSQL cuando exista DATABASE_URL o DB_HOST.
 TEST_DATABASE_URL = (os.getenv("TEST_DATABASE_URL") or os.getenv("DATABASE_URL") or "").strip()
 
+# Sólo se reemplaza ``default``: el espejo ``replica`` de config/settings.py se conserva.
 if TEST_DATABASE_URL:
-    DATABASES = {
-        "default": dj_database_url.config(
-            default=TEST_DATABASE_URL,
-            conn_max_age=0,
-            ssl_require=False,
-        )
-    }
+    DATABASES["default"] = dj_database_url.config(
+        default=TEST_DATABASE_URL,
+        conn_max_age=0,
+        ssl_require=False,
+    )
     if DATABASES["default"].get("ENGINE") == "django.db.backends.postgresql":
         DATABASES["default"]["TEST"] = {
             "NAME": os.getenv("TEST_DB_NAME", "test_pastelerias_erp"),
         }
 elif os.getenv("DB_HOST"):
-    DATABASES = {
-        "default": {
-            "ENGINE": "django.db.backends.postgresql",
-            "NAME": os.getenv("DB_NAME", "pastelerias_erp"),
-            "USER": os.getenv("DB_USER", "postgres"),
-            "PASSWORD": os.getenv("DB_PASSWORD", "postgres"),
-            "HOST": os.getenv("DB_HOST", "localhost"),
-            "PORT": os.getenv("DB_PORT", "5432"),
-            "TEST": {
-                "NAME": os.getenv("TEST_DB_NAME", "test_pastelerias_erp"),
-            },
-        }
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.getenv("DB_NAME", "pastelerias_erp"),
+        "USER": os.getenv("DB_USER", "postgres"),
+        "PASSWORD": os.getenv("DB_PASSWORD", "postgres"),
+        "HOST": os.getenv("DB_HOST", "localhost"),
+        "PORT": os.getenv("DB_PORT", "5432"),
+        "TEST": {
+            "NAME": os.getenv("TEST_DB_NAME", "test_pastelerias_erp"),
+        },
     }
 else:
     raise ValueError(
@@ -45,6 +42,9 @@ else:
         "SQLite ya no es una ruta valida para la suite de pruebas del ERP."
     )
 
+# ``PYTEST_CURRENT_TEST`` aún no existe al cargar settings: el caché de libros se apaga aquí.
+BUDGET_WORKBOOK_CACHE_ENABLED = False
+
 # Entorno de pruebas local: evita dependencia de whitenoise en la venv local.
 MIDDLEWARE = [m for m in MIDDLEWARE if m != "whitenoise.middleware.WhiteNoiseMiddleware"]
 if "STATICFILES_STORAGE" in globals():
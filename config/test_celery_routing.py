@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import importlib
+import json
+from importlib.util import find_spec
+
+from django.apps import apps
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from config import celery_routing
+from config.celery import app
+from config.celery_monitoring import PUBLISHED_AT_HEADER, RUNTIME_KEY_PREFIX, queue_snapshot, runtime_stats
+
+
+class FakeRedis:
+    def __init__(self, lists: dict[str, list]):
+        self.lists = lists
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def lindex(self, key, index):
+        return self.lists[key][index]
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])
+
+
+def _import_task_modules() -> None:
+    modules = list(settings.CELERY_IMPORTS)
+    modules += [f"{config.name}.tasks" for config in apps.get_app_configs()]
+    for module in modules:
+        if find_spec(module) is not None:
+            importlib.import_module(module)
+
+
+class CeleryRoutingTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        _import_task_modules()
+
+    def test_every_registered_task_has_explicit_lane(self):
+        registered = {name for name in app.tasks if not name.startswith("celery.")}
+
+        self.assertEqual(sorted(registered - set(celery_routing.TASK_LANES)), [])
+        self.assertEqual(sorted(set(celery_routing.EXTERNAL_RATE_LIMITS) - registered), [])
+        self.assertEqual(sorted(set(celery_routing.TASK_LIMITS) - registered), [])
+
+    def test_latency_sensitive_tasks_do_not_share_queue_with_backfills(self):
+        router = app.amqp.router
+
+        def queue_for(name):
+            return router.route({}, name)["queue"].name
+
+        self.assertEqual(queue_for("pos_bridge.realtime_inventory_sync"), "realtime")
+        self.assertEqual(queue_for("sat_client.ejecutar_descarga_sat_nocturna"), "batch")
+        self.assertEqual(queue_for("core.tasks.cerrar_mes_anterior"), "heavy")
+        self.assertEqual(queue_for("tarea.sin.registrar"), settings.CELERY_TASK_DEFAULT_QUEUE)
+
+    def test_annotations_apply_lane_limits_and_rate_limits(self):
+        task = app.tasks["pos_bridge.realtime_inventory_sync"]
+        self.assertEqual((task.soft_time_limit, task.time_limit), (240, 300))
+        self.assertEqual(task.rate_limit, "12/m")
+        self.assertEqual(task.expires, celery_routing.LANES["realtime"].expires)
+
+        heavy = app.tasks["core.tasks.cerrar_mes_anterior"]
+        self.assertTrue(heavy.acks_late)
+        self.assertEqual(heavy.time_limit, celery_routing.LANES["heavy"].time_limit)
+
+    def test_queue_snapshot_reports_depth_and_oldest_age(self):
+        oldest = json.dumps({"headers": {PUBLISHED_AT_HEADER: 1000.0}})
+        newest = json.dumps({"headers": {PUBLISHED_AT_HEADER: 1090.0}})
+        client = FakeRedis({"batch": [newest, oldest]})
+
+        snapshot = queue_snapshot(client, "batch", now=1100.0)
+
+        self.assertEqual(snapshot, {"queue": "batch", "depth": 2, "oldest_age_seconds": 100.0})
+        self.assertEqual(queue_snapshot(client, "realtime")["oldest_age_seconds"], None)
+
+    def test_runtime_stats_from_backend_samples(self):
+        samples = [json.dumps({"s": value, "state": "SUCCESS"}) for value in (1, 2, 3, 4)]
+        samples.append(json.dumps({"s": 50, "state": "FAILURE"}))
+        client = FakeRedis({f"{RUNTIME_KEY_PREFIX}pos_bridge.daily_sales_sync": samples})
+
+        rows = runtime_stats(client, ["pos_bridge.daily_sales_sync", "pos_bridge.waste_sync"])
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["runs"], 5)
+        self.assertEqual(rows[0]["failures"], 1)
+        self.assertEqual(rows[0]["p50_seconds"], 3.0)
+        self.assertEqual(rows[0]["max_seconds"], 50.0)
@@ -7,7 +7,6 @@ from datetime import date
 from django.conf import settings
 from django.db.models import Sum
 from django.utils import timezone
-from openai import OpenAI
 
 from rentabilidad.agente_rentabilidad import _construir_contexto
 from rentabilidad.models import SucursalRentabilidad
@@ -251,6 +250,8 @@ def _llamar_rol(system_prompt: str, contexto_usuario: str) -> dict:
     """Mismo patrón que rentabilidad/agente_rentabilidad.py: JSON forzado por
     prompt, con fallback si el JSON sale inválido o la llamada falla — un rol
     fallido no debe tumbar toda la consulta."""
+    from openai import OpenAI
+
     client = OpenAI(api_key=settings.OPENAI_API_KEY)
     try:
         response = client.chat.completions.create(
@@ -26,7 +26,7 @@ def _mock_openai_response(content: str):
 
 
 class LlamarRolTests(TestCase):
-    @patch("consejo_ia.services.OpenAI")
+    @patch("openai.OpenAI")
     def test_json_valido_se_parsea(self, mock_openai_cls):
         mock_client = MagicMock()
         mock_client.chat.completions.create.return_value = _mock_openai_response(
@@ -38,7 +38,7 @@ class LlamarRolTests(TestCase):
 
         self.assertEqual(resultado["analisis"], "todo bien")
 
-    @patch("consejo_ia.services.OpenAI")
+    @patch("openai.OpenAI")
     def test_json_invalido_cae_a_fallback(self, mock_openai_cls):
         mock_client = MagicMock()
         mock_client.chat.completions.create.return_value = _mock_openai_response("no es json")
@@ -48,7 +48,7 @@ class LlamarRolTests(TestCase):
 
         self.assertIn("error", resultado)
 
-    @patch("consejo_ia.services.OpenAI")
+    @patch("openai.OpenAI")
     def test_excepcion_cae_a_fallback(self, mock_openai_cls):
         mock_client = MagicMock()
         mock_client.chat.completions.create.side_effect = RuntimeError("boom")
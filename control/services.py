@@ -4,14 +4,14 @@ from datetime import date, timedelta
 from decimal import Decimal
 from typing import Any
 
-from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.db.models import Q, Sum
 from django.utils import timezone
 
 from inventario.models import ExistenciaInsumo
+from maestros.models import Insumo
 from maestros.utils.canonical_catalog import canonicalized_active_insumos
-from recetas.models import PlanProduccionItem
-
-from .models import MermaPOS, VentaPOS
+from reportes.consumo_teorico_service import ensure_consumo_teorico
+from reportes.models import FactConsumoTeoricoDiario
 
 
 def _canonical_member_maps(limit: int = 2000) -> tuple[dict[int, int], dict[int, Any]]:
@@ -25,15 +25,6 @@ def _canonical_member_maps(limit: int = 2000) -> tuple[dict[int, int], dict[int,
     return member_to_canonical, canonical_rows
 
 
-def _canonicalize_totals(raw: dict[int, Decimal]) -> dict[int, Decimal]:
-    member_to_canonical, canonical_rows = _canonical_member_maps()
-    result: dict[int, Decimal] = {}
-    for insumo_id, amount in raw.items():
-        canonical_id = member_to_canonical.get(insumo_id, insumo_id)
-        result[canonical_id] = result.get(canonical_id, Decimal("0")) + Decimal(str(amount or 0))
-    return result
-
-
 def _month_bounds(year: int, month: int) -> tuple[date, date]:
     start = date(year, month, 1)
     if month == 12:
@@ -89,72 +80,29 @@ def resolve_period_range(
     return start, end, f"{today.year:04d}-{today.month:02d}"
 
 
-def _aggregate_plan_to_insumo(date_from: date, date_to: date) -> dict[int, Decimal]:
-    amount_expr = ExpressionWrapper(
-        F("cantidad") * F("receta__lineas__cantidad"),
-        output_field=DecimalField(max_digits=24, decimal_places=6),
-    )
-    rows = (
-        PlanProduccionItem.objects.filter(
-            plan__fecha_produccion__gte=date_from,
-            plan__fecha_produccion__lte=date_to,
-            receta__lineas__insumo_id__isnull=False,
-            receta__lineas__cantidad__isnull=False,
-        )
-        .values("receta__lineas__insumo_id")
-        .annotate(total=Sum(amount_expr))
-    )
-    result: dict[int, Decimal] = {}
-    for row in rows:
-        insumo_id = int(row["receta__lineas__insumo_id"])
-        result[insumo_id] = Decimal(str(row.get("total") or 0))
-    return _canonicalize_totals(result)
-
-
-def _aggregate_ventas_to_insumo(date_from: date, date_to: date, sucursal_id: int | None) -> dict[int, Decimal]:
-    amount_expr = ExpressionWrapper(
-        F("cantidad") * F("receta__lineas__cantidad"),
-        output_field=DecimalField(max_digits=24, decimal_places=6),
-    )
-    qs = VentaPOS.objects.filter(
-        fecha__gte=date_from,
-        fecha__lte=date_to,
-        receta__isnull=False,
-        receta__lineas__insumo_id__isnull=False,
-        receta__lineas__cantidad__isnull=False,
-    )
-    if sucursal_id:
-        qs = qs.filter(sucursal_id=sucursal_id)
-    rows = qs.values("receta__lineas__insumo_id").annotate(total=Sum(amount_expr))
-
-    result: dict[int, Decimal] = {}
-    for row in rows:
-        insumo_id = int(row["receta__lineas__insumo_id"])
-        result[insumo_id] = Decimal(str(row.get("total") or 0))
-    return _canonicalize_totals(result)
-
-
-def _aggregate_mermas_to_insumo(date_from: date, date_to: date, sucursal_id: int | None) -> dict[int, Decimal]:
-    amount_expr = ExpressionWrapper(
-        F("cantidad") * F("receta__lineas__cantidad"),
-        output_field=DecimalField(max_digits=24, decimal_places=6),
-    )
-    qs = MermaPOS.objects.filter(
-        fecha__gte=date_from,
-        fecha__lte=date_to,
-        receta__isnull=False,
-        receta__lineas__insumo_id__isnull=False,
-        receta__lineas__cantidad__isnull=False,
-    )
+def _aggregate_consumo_teorico(
+    date_from: date,
+    date_to: date,
+    sucursal_id: int | None,
+    member_to_canonical: dict[int, int],
+) -> dict[str, dict[int, Decimal]]:
+    """Consumo explotado por fuente e insumo canónico desde ``FactConsumoTeoricoDiario``.
+
+    El hecho guarda insumos hoja; se canonicalizan aquí con el mismo mapa que
+    las existencias para que teórico y real caigan en el mismo renglón.
+    El plan de producción no tiene sucursal: siempre cuenta completo, igual que
+    antes; ventas y mermas se filtran por la sucursal pedida.
+    """
+    ensure_consumo_teorico(date_from=date_from, date_to=date_to)
+    qs = FactConsumoTeoricoDiario.objects.filter(fecha__gte=date_from, fecha__lte=date_to)
     if sucursal_id:
-        qs = qs.filter(sucursal_id=sucursal_id)
-    rows = qs.values("receta__lineas__insumo_id").annotate(total=Sum(amount_expr))
-
-    result: dict[int, Decimal] = {}
-    for row in rows:
-        insumo_id = int(row["receta__lineas__insumo_id"])
-        result[insumo_id] = Decimal(str(row.get("total") or 0))
-    return _canonicalize_totals(result)
+        qs = qs.filter(Q(fuente=FactConsumoTeoricoDiario.FUENTE_PLAN) | Q(sucursal_id=sucursal_id))
+    result: dict[str, dict[int, Decimal]] = {fuente: {} for fuente, _ in FactConsumoTeoricoDiario.FUENTE_CHOICES}
+    for row in qs.order_by().values("fuente", "insumo_id").annotate(total=Sum("cantidad")):
+        canonical_id = member_to_canonical.get(row["insumo_id"], row["insumo_id"])
+        totals = result[row["fuente"]]
+        totals[canonical_id] = totals.get(canonical_id, Decimal("0")) + Decimal(str(row.get("total") or 0))
+    return result
 
 
 def build_discrepancias_report(
@@ -172,26 +120,30 @@ def build_discrepancias_report(
     if threshold < 0:
         threshold = Decimal("0")
 
-    plan_map = _aggregate_plan_to_insumo(date_from, date_to)
-    ventas_map = _aggregate_ventas_to_insumo(date_from, date_to, sucursal_id)
-    mermas_map = _aggregate_mermas_to_insumo(date_from, date_to, sucursal_id)
     member_to_canonical, canonical_rows = _canonical_member_maps()
+    consumo = _aggregate_consumo_teorico(date_from, date_to, sucursal_id, member_to_canonical)
+    plan_map = consumo[FactConsumoTeoricoDiario.FUENTE_PLAN]
+    ventas_map = consumo[FactConsumoTeoricoDiario.FUENTE_VENTA]
+    mermas_map = consumo[FactConsumoTeoricoDiario.FUENTE_MERMA]
 
     insumo_ids = set(plan_map.keys()) | set(ventas_map.keys()) | set(mermas_map.keys())
-    existencia_qs = ExistenciaInsumo.objects.select_related("insumo")
-    existencia_raw = {}
-    for e in existencia_qs:
-        canonical_id = member_to_canonical.get(e.insumo_id, e.insumo_id)
-        bucket = existencia_raw.get(canonical_id)
-        canonical_insumo = canonical_rows.get(canonical_id, {}).get("canonical", e.insumo)
-        if bucket is None:
-            existencia_raw[canonical_id] = {
-                "insumo": canonical_insumo,
-                "stock_actual": Decimal(str(e.stock_actual or 0)),
-            }
-        else:
-            bucket["stock_actual"] += Decimal(str(e.stock_actual or 0))
-    existencia_map = existencia_raw
+    stock_by_canonical: dict[int, Decimal] = {}
+    for row in ExistenciaInsumo.objects.order_by().values("insumo_id").annotate(total=Sum("stock_actual")):
+        canonical_id = member_to_canonical.get(row["insumo_id"], row["insumo_id"])
+        stock_by_canonical[canonical_id] = stock_by_canonical.get(canonical_id, Decimal("0")) + Decimal(
+            str(row.get("total") or 0)
+        )
+    # Solo se cargan los insumos que no vienen ya resueltos en el catálogo canónico.
+    missing_ids = [insumo_id for insumo_id in stock_by_canonical if insumo_id not in canonical_rows]
+    insumos_by_id = {
+        insumo.id: insumo
+        for insumo in Insumo.objects.filter(id__in=missing_ids).select_related("unidad_base")
+    }
+    existencia_map = {}
+    for canonical_id, stock in stock_by_canonical.items():
+        insumo = canonical_rows.get(canonical_id, {}).get("canonical") or insumos_by_id.get(canonical_id)
+        if insumo is not None:
+            existencia_map[canonical_id] = {"insumo": insumo, "stock_actual": stock}
     insumo_ids |= set(existencia_map.keys())
 
     rows = []
@@ -0,0 +1,153 @@
+"""
+Perfil de acceso calculado por usuario para la UI (menú, banderas de plantilla).
+
+Cada render HTML evaluaba ~30 helpers ``can_view_*``/``can_manage_*``. El perfil
+se calcula una sola vez a partir de una consulta combinada de grupos + permisos
+explícitos, se memoiza en el request y se guarda en el cache compartido con una
+versión por usuario (scope ``user_access:<id>``) que se incrementa cuando cambian
+sus grupos, ``UserModuleAccess``, perfil o estado de "Ver como".
+
+El perfil solo alimenta la UI. Las vistas siguen autorizando con ``core.access``
+contra la BD, así que una versión atrasada nunca concede permisos reales.
+"""
+
+from __future__ import annotations
+
+from django.contrib.auth.models import AbstractBaseUser, Group
+from django.db.models import CharField, F, Value
+
+from core import access
+from core.cache_versions import bump_cache_scopes, get_or_set_versioned_cache
+
+
+ACCESS_PROFILE_TTL_SECONDS = 60 * 60
+REQUEST_PROFILE_ATTR = "_ui_access_profile"
+REQUEST_NAV_ATTR = "_ui_nav_groups"
+
+UI_ACCESS_FLAGS = {
+    "can_view_maestros": access.can_view_maestros,
+    "can_view_recetas": access.can_view_recetas,
+    "can_view_compras": access.can_view_compras,
+    "can_manage_compras": access.can_manage_compras,
+    "can_view_inventario": access.can_view_inventario,
+    "can_manage_inventario": access.can_manage_inventario,
+    "can_view_activos": access.can_view_activos,
+    "can_view_control": access.can_view_control,
+    "can_view_sistema": access.can_view_sistema,
+    "can_view_reportes": access.can_view_reportes,
+    "can_view_rentabilidad": access.can_view_rentabilidad,
+    "can_manage_rentabilidad": access.can_manage_rentabilidad,
+    "can_view_audit": access.can_view_audit,
+    "can_view_orquestacion": access.can_view_orquestacion,
+    "can_manage_orquestacion": access.can_manage_orquestacion,
+    "can_manage_users": access.can_manage_users,
+    "can_view_crm": access.can_view_crm,
+    "can_manage_crm": access.can_manage_crm,
+    "can_view_logistica": access.can_view_logistica,
+    "can_manage_logistica": access.can_manage_logistica,
+    "can_view_rrhh": access.can_view_rrhh,
+    "can_manage_rrhh": access.can_manage_rrhh,
+    "can_capture_piso": access.can_capture_piso,
+    "can_view_ventas": access.can_view_ventas,
+    "can_view_ventas_eventos": access.can_view_ventas_eventos,
+    "can_manage_ventas_eventos": access.can_manage_ventas_eventos,
+    "can_view_fallas": lambda user: access.can_view_module(user, "fallas"),
+    "can_view_mermas": lambda user: access.can_view_module(user, "mermas"),
+    "branch_capture_only": access.is_branch_capture_only,
+    "repartidor_only": access.is_repartidor_only,
+}
+
+
+def user_access_scope(user_id: int) -> str:
+    return f"user_access:{user_id}"
+
+
+def bump_user_access_version(*user_ids: int | None) -> dict[str, int]:
+    return bump_cache_scopes(*[user_access_scope(user_id) for user_id in user_ids if user_id])
+
+
+def prime_user_access_caches(user: AbstractBaseUser) -> None:
+    """
+    Llena ``_group_names_cache`` y ``_module_access_map_cache`` del usuario con
+    una sola consulta (UNION de grupos y permisos explícitos), para que los
+    helpers de ``core.access`` no vuelvan a ir a la BD en este request.
+    """
+    if not access._is_active_user(user):
+        return
+    if getattr(user, "_group_names_cache", None) is not None and getattr(user, "_module_access_map_cache", None) is not None:
+        return
+    from core.models import UserModuleAccess
+
+    groups_qs = (
+        Group.objects.filter(user=user)
+        .annotate(
+            row_kind=Value("group", output_field=CharField()),
+            row_key=F("name"),
+            row_value=Value("", output_field=CharField()),
+        )
+        .values_list("row_kind", "row_key", "row_value")
+    )
+    access_qs = (
+        UserModuleAccess.objects.filter(user=user)
+        .annotate(
+            row_kind=Value("module", output_field=CharField()),
+            row_key=F("module"),
+            row_value=F("access"),
+        )
+        .values_list("row_kind", "row_key", "row_value")
+    )
+    group_names: set[str] = set()
+    access_map: dict[str, str] = {}
+    for row_kind, row_key, row_value in groups_qs.union(access_qs, all=True):
+        if row_kind == "group":
+            group_names.add(str(row_key))
+        else:
+            access_map[row_key] = access._normalize_access(row_value)
+    setattr(user, "_group_names_cache", frozenset(group_names))
+    setattr(user, "_module_access_map_cache", access_map)
+
+
+def build_access_profile(user: AbstractBaseUser) -> dict:
+    prime_user_access_caches(user)
+    flags = {name: bool(check(user)) for name, check in UI_ACCESS_FLAGS.items()}
+    flags["role_label"] = access._get_role_label(user)
+    return {"ui_access": flags}
+
+
+def get_access_profile(user: AbstractBaseUser, request=None) -> dict:
+    """Perfil de UI del usuario: memo del request → cache compartido versionado → cálculo."""
+    if request is not None:
+        cached = getattr(request, REQUEST_PROFILE_ATTR, None)
+        if cached is not None and cached[0] == getattr(user, "pk", None):
+            return cached[1]
+
+    if not access._is_active_user(user) or not getattr(user, "pk", None):
+        profile = build_access_profile(user)
+    else:
+        profile = get_or_set_versioned_cache(
+            key_parts=("core", "access_profile", user.pk),
+            scopes=[user_access_scope(user.pk)],
+            builder=lambda: build_access_profile(user),
+            timeout=ACCESS_PROFILE_TTL_SECONDS,
+        )
+
+    if request is not None:
+        setattr(request, REQUEST_PROFILE_ATTR, (getattr(user, "pk", None), profile))
+    return profile
+
+
+def get_request_nav_groups(request, user: AbstractBaseUser, current_path: str) -> list[dict]:
+    """
+    El menú incluye contadores vivos (notificaciones, autorizaciones), así que
+    no se comparte entre requests; solo se memoiza dentro del request.
+    """
+    from core.navigation import build_nav_groups
+
+    cache_key = (getattr(user, "pk", None), current_path)
+    cached = getattr(request, REQUEST_NAV_ATTR, None)
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+    prime_user_access_caches(user)
+    nav_groups = build_nav_groups(user, current_path)
+    setattr(request, REQUEST_NAV_ATTR, (cache_key, nav_groups))
+    return nav_groups
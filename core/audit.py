@@ -1,18 +1,284 @@
+"""
+Bitácora de auditoría (``AuditLog``).
+
+``log_event`` escribe de inmediato, salvo dentro de ``audit_batch()``: ahí los
+eventos se juntan y se insertan con un solo ``bulk_create`` al salir del lote.
+Los eventos registrados dentro de una transacción o savepoint que hizo rollback
+se descartan; los demás se insertan en la transacción vigente (o ya confirmada),
+así que llegan si y solo si el cambio de negocio se confirmó.
+
+Para procesos masivos, ``audit_batch(async_delivery=True)`` entrega los eventos
+a Celery (``core.tasks.persist_audit_events``) solo cuando la transacción
+confirma, sin cargar el insert en la transacción del caller.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import ContextDecorator
 from typing import Any
 
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from core.models import AuditLog
 
+logger = logging.getLogger(__name__)
+
+AUDIT_BATCH_MAX_EVENTS = int(getattr(settings, "AUDIT_BATCH_MAX_EVENTS", 5000) or 5000)
+AUDIT_BULK_CREATE_SIZE = 500
+
+_local = threading.local()
+_metrics_lock = threading.Lock()
+_metrics = {
+    "queue_depth": 0,
+    "max_queue_depth": 0,
+    "events_flushed": 0,
+    "events_dropped": 0,
+    "events_handed_off": 0,
+    "flushes": 0,
+    "last_flush_ms": 0.0,
+    "max_flush_ms": 0.0,
+    "total_flush_ms": 0.0,
+}
+
+
+def _metric_queue(delta: int) -> None:
+    with _metrics_lock:
+        _metrics["queue_depth"] = max(0, _metrics["queue_depth"] + delta)
+        _metrics["max_queue_depth"] = max(_metrics["max_queue_depth"], _metrics["queue_depth"])
+
+
+def _metric_flush(*, flushed: int, dropped: int, elapsed_ms: float) -> None:
+    with _metrics_lock:
+        _metrics["events_flushed"] += flushed
+        _metrics["events_dropped"] += dropped
+        _metrics["flushes"] += 1
+        _metrics["last_flush_ms"] = round(elapsed_ms, 3)
+        _metrics["max_flush_ms"] = round(max(_metrics["max_flush_ms"], elapsed_ms), 3)
+        _metrics["total_flush_ms"] = round(_metrics["total_flush_ms"] + elapsed_ms, 3)
+
+
+def audit_sink_metrics() -> dict[str, float | int]:
+    """Profundidad de cola (eventos en lotes abiertos) y latencia de los flush."""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    snapshot["avg_flush_ms"] = round(snapshot["total_flush_ms"] / snapshot["flushes"], 3) if snapshot["flushes"] else 0.0
+    return snapshot
+
+
+def reset_audit_sink_metrics() -> None:
+    with _metrics_lock:
+        for key in _metrics:
+            _metrics[key] = 0.0 if key.endswith("_ms") else 0
+
+
+class _Segment:
+    """
+    Eventos registrados bajo el mismo estado transaccional. Se registra como
+    callback ``on_commit``: Django lo descarta si el savepoint/transacción hace
+    rollback y lo ejecuta (``committed=True``) al confirmar.
+    """
+
+    __slots__ = ("hooks", "savepoint_ids", "in_atomic", "committed", "events")
+
+    def __init__(self, connection):
+        self.hooks = connection.run_on_commit
+        self.savepoint_ids = tuple(connection.savepoint_ids)
+        self.in_atomic = connection.in_atomic_block
+        self.committed = False
+        self.events: list[AuditLog] = []
+
+    def __call__(self) -> None:
+        self.committed = True
+
+    def matches(self, connection) -> bool:
+        return (
+            self.in_atomic == connection.in_atomic_block
+            and self.hooks is connection.run_on_commit
+            and self.savepoint_ids == tuple(connection.savepoint_ids)
+        )
+
+    def is_alive(self, connection) -> bool:
+        if self.committed:
+            return True
+        return any(entry[1] is self for entry in connection.run_on_commit)
+
+
+class audit_batch(ContextDecorator):
+    """
+    Agrupa los ``log_event`` del bloque en un solo ``bulk_create``.
+
+    Uso::
+
+        with audit_batch():
+            for fila in filas:
+                ...
+                log_event(user, "IMPORT", "compras.SolicitudCompra", fila.id)
+
+    También funciona como decorador (``@audit_batch()``): cada llamada abre su
+    propio lote, así que la función decorada es reentrante y segura entre
+    hilos. Los lotes anidados se unen al exterior. ``async_delivery=True`` manda
+    los eventos a Celery al confirmar la transacción en lugar de insertarlos en
+    ella.
+    """
+
+    def __init__(self, *, async_delivery: bool = False):
+        self.async_delivery = async_delivery
+        self._segments: list[_Segment] = []
+        self._size = 0
+
+    def _recreate_cm(self):
+        # ``ContextDecorator`` reutiliza la misma instancia en cada llamada; el
+        # lote guarda estado, así que cada llamada decorada usa uno nuevo.
+        return type(self)(async_delivery=self.async_delivery)
+
+    def __enter__(self):
+        stack = getattr(_local, "batches", None)
+        if stack is None:
+            stack = _local.batches = []
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stack = _local.batches
+        stack.pop()
+        if self in stack:
+            # La misma instancia sigue abierta más afuera: conserva sus eventos.
+            return False
+        if stack:
+            outer = stack[-1]
+            outer._segments.extend(self._segments)
+            outer._size += self._size
+            self._segments, self._size = [], 0
+            return False
+        self.flush(after_error=exc_type is not None)
+        return False
+
+    def add(self, event: AuditLog) -> None:
+        connection = transaction.get_connection()
+        segment = self._segments[-1] if self._segments else None
+        if segment is None or not segment.matches(connection):
+            segment = _Segment(connection)
+            self._segments.append(segment)
+            transaction.on_commit(segment)
+        segment.events.append(event)
+        self._size += 1
+        _metric_queue(1)
+        if self._size >= AUDIT_BATCH_MAX_EVENTS:
+            self.flush()
+
+    def flush(self, *, after_error: bool = False) -> int:
+        if not self._segments:
+            return 0
+        connection = transaction.get_connection()
+        started_at = time.perf_counter()
+        pending: list[AuditLog] = []
+        dropped = 0
+        for segment in self._segments:
+            if segment.is_alive(connection):
+                pending.extend(segment.events)
+            else:
+                dropped += len(segment.events)
+        queued = self._size
+        self._segments, self._size = [], 0
+        _metric_queue(-queued)
+
+        handed_off = 0
+        if pending and self.async_delivery:
+            payload = [_serialize_event(event) for event in pending]
+            transaction.on_commit(lambda: _hand_off(payload))
+            handed_off, pending = len(payload), []
+        if pending:
+            try:
+                if after_error and connection.in_atomic_block:
+                    # La transacción puede estar abortada; si el savepoint
+                    # falla, la bitácora corre la misma suerte que el negocio.
+                    with transaction.atomic():
+                        AuditLog.objects.bulk_create(pending, batch_size=AUDIT_BULK_CREATE_SIZE)
+                else:
+                    AuditLog.objects.bulk_create(pending, batch_size=AUDIT_BULK_CREATE_SIZE)
+            except DatabaseError:
+                if not after_error:
+                    raise
+                logger.warning("No se pudo guardar la bitácora de un lote fallido (%s eventos).", len(pending))
+                dropped, pending = dropped + len(pending), []
+
+        elapsed_ms = (time.perf_counter() - started_at) * 1000.0
+        _metric_flush(flushed=len(pending), dropped=dropped, elapsed_ms=elapsed_ms)
+        logger.debug(
+            "audit_batch flush: %s insertados, %s programados a Celery, %s descartados en %.1f ms",
+            len(pending),
+            handed_off,
+            dropped,
+            elapsed_ms,
+        )
+        return len(pending) + handed_off
+
+
+def _current_batch() -> audit_batch | None:
+    stack = getattr(_local, "batches", None)
+    return stack[-1] if stack else None
+
+
+def _serialize_event(event: AuditLog) -> dict[str, Any]:
+    return {
+        "timestamp": event.timestamp.isoformat(),
+        "user_id": event.user_id,
+        "action": event.action,
+        "model": event.model,
+        "object_id": event.object_id,
+        "payload": event.payload,
+    }
+
+
+def persist_serialized_events(events: list[dict[str, Any]]) -> int:
+    rows = [
+        AuditLog(
+            timestamp=parse_datetime(item.get("timestamp") or "") or timezone.now(),
+            user_id=item.get("user_id"),
+            action=item.get("action") or "",
+            model=item.get("model") or "",
+            object_id=item.get("object_id") or "",
+            payload=item.get("payload") or {},
+        )
+        for item in events
+    ]
+    AuditLog.objects.bulk_create(rows, batch_size=AUDIT_BULK_CREATE_SIZE)
+    return len(rows)
+
+
+def _hand_off(payload: list[dict[str, Any]]) -> None:
+    from core.tasks import persist_audit_events
+
+    with _metrics_lock:
+        _metrics["events_handed_off"] += len(payload)
+    try:
+        persist_audit_events.delay(payload)
+    except Exception:
+        # Sin broker no se pierde la bitácora: se escribe en línea.
+        logger.warning("Celery no disponible para la bitácora; se guarda en línea.", exc_info=True)
+        persist_serialized_events(payload)
+
 
 def log_event(user: AbstractBaseUser | None, action: str, model: str, object_id: str, payload: dict[str, Any] | None = None) -> None:
     # object_id es varchar(64); un identificador largo (p.ej. una ruta de
     # archivo en imports) no debe tumbar el flujo de negocio con DataError.
     max_length = AuditLog._meta.get_field("object_id").max_length
-    AuditLog.objects.create(
+    event = AuditLog(
         user=user if getattr(user, "is_authenticated", False) else None,
         action=action,
         model=model,
         object_id=str(object_id)[:max_length],
         payload=payload or {},
     )
+    batch = _current_batch()
+    if batch is None:
+        event.save(force_insert=True)
+        return
+    batch.add(event)
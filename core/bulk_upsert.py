@@ -0,0 +1,197 @@
+"""
+Upsert masivo por conjuntos con detección de cambios.
+
+``bulk_upsert`` reemplaza el patrón ``update_or_create`` por fila: cada lote
+es un solo ``INSERT ... ON CONFLICT DO UPDATE ... WHERE (...) IS DISTINCT FROM
+(...)``, así que las filas que ya tienen los mismos valores no se reescriben
+(ni cambian ``auto_now``) y una sincronización sin cambios cuesta una
+sentencia por lote. La misma sentencia devuelve qué ids se crearon, cuáles se
+actualizaron y cuáles quedaron igual.
+
+Los valores pasan por la conversión del campo (``get_db_prep_save``), igual que
+``save()``. En bases que no son PostgreSQL se usa un camino por fila con la
+misma semántica, sin la ganancia de round-trips.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.db import connections, models, router, transaction
+
+from core.audit import audit_batch, log_event
+from core.cache_versions import bump_cache_scopes
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class UpsertResult:
+    created: list[int] = field(default_factory=list)
+    updated: list[int] = field(default_factory=list)
+    unchanged: list[int] = field(default_factory=list)
+    # Clave única (tupla de valores de ``unique_fields``) -> pk, para enlazar hijos.
+    ids_by_key: dict[tuple, int] = field(default_factory=dict)
+
+    @property
+    def changed(self) -> list[int]:
+        return self.created + self.updated
+
+    def as_counts(self) -> dict[str, int]:
+        return {"created": len(self.created), "updated": len(self.updated), "unchanged": len(self.unchanged)}
+
+
+def _instance(model: type[models.Model], row: Any) -> models.Model:
+    if isinstance(row, model):
+        return row
+    if isinstance(row, Mapping):
+        return model(**row)
+    raise TypeError(f"bulk_upsert espera instancias de {model.__name__} o dicts, no {type(row).__name__}")
+
+
+def _resolve_fields(model, unique_fields, update_fields):
+    meta = model._meta
+    concrete = [f for f in meta.concrete_fields if not f.primary_key]
+    by_name = {f.name: f for f in concrete}
+    by_name.update({f.attname: f for f in concrete})
+    unique = [by_name[name] for name in unique_fields]
+    touch = [f for f in concrete if getattr(f, "auto_now", False)]
+    if update_fields is None:
+        update = [
+            f for f in concrete
+            if f not in unique and f not in touch and not getattr(f, "auto_now_add", False)
+        ]
+    else:
+        update = [by_name[name] for name in update_fields if by_name[name] not in touch]
+    return concrete, unique, update, touch
+
+
+def _key(instance, unique_fields) -> tuple:
+    return tuple(getattr(instance, f.attname) for f in unique_fields)
+
+
+def _dedupe(instances, unique_fields):
+    # Igual que varias llamadas seguidas a ``update_or_create``: gana la última fila por clave.
+    latest: dict[tuple, models.Model] = {}
+    for instance in instances:
+        latest[_key(instance, unique_fields)] = instance
+    return list(latest.values())
+
+
+def _cast_type(model_field, connection) -> str:
+    db_type = model_field.db_type(connection)
+    # CAST a varchar(n) trunca en silencio; sin longitud, el INSERT conserva el error por exceso.
+    return "varchar" if db_type.startswith("varchar(") else db_type
+
+
+def _postgres_chunk(model, instances, connection, concrete, unique, update, touch):
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    pk_column = qn(model._meta.pk.column)
+    columns = ", ".join(qn(f.column) for f in concrete)
+    # Los VALUES llegan sin tipo; el CAST al tipo de la columna evita depender de la inferencia.
+    row_sql = "(" + ", ".join(f"CAST(%s AS {_cast_type(f, connection)})" for f in concrete) + ")"
+    params: list[Any] = []
+    for instance in instances:
+        params.extend(f.get_db_prep_save(f.pre_save(instance, add=True), connection) for f in concrete)
+    key_columns = [qn(f.column) for f in unique]
+    if update:
+        assignments = ", ".join(f"{qn(f.column)} = EXCLUDED.{qn(f.column)}" for f in update + touch)
+        current = ", ".join(f"{table}.{qn(f.column)}" for f in update)
+        incoming = ", ".join(f"EXCLUDED.{qn(f.column)}" for f in update)
+        on_conflict = f"DO UPDATE SET {assignments} WHERE ROW({current}) IS DISTINCT FROM ROW({incoming})"
+    else:
+        on_conflict = "DO NOTHING"
+    returned_keys = ", ".join(f"{table}.{column}" for column in key_columns)
+    sql = (
+        f"WITH i ({columns}) AS (VALUES {', '.join([row_sql] * len(instances))}), "
+        f"u AS (INSERT INTO {table} ({columns}) SELECT {columns} FROM i "
+        f"ON CONFLICT ({', '.join(key_columns)}) {on_conflict} "
+        f"RETURNING {table}.{pk_column} AS pk, (xmax = 0) AS inserted, {returned_keys}) "
+        f"SELECT pk, CASE WHEN inserted THEN 'c' ELSE 'u' END, {', '.join(key_columns)} FROM u "
+        f"UNION ALL "
+        f"SELECT t.{pk_column}, 'n', {', '.join(f't.{column}' for column in key_columns)} "
+        f"FROM {table} t JOIN i ON {' AND '.join(f't.{column} = i.{column}' for column in key_columns)} "
+        f"WHERE t.{pk_column} NOT IN (SELECT pk FROM u)"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(pk, status, tuple(key)) for pk, status, *key in cursor.fetchall()]
+
+
+def _generic_chunk(model, instances, using, unique, update, touch):
+    rows = []
+    manager = model._base_manager.using(using)
+    for instance in instances:
+        key = _key(instance, unique)
+        current = manager.filter(**{f.attname: value for f, value in zip(unique, key)}).first()
+        if current is None:
+            manager.bulk_create([instance])
+            rows.append((instance.pk, "c", key))
+            continue
+        if any(f.get_prep_value(getattr(current, f.attname)) != f.get_prep_value(getattr(instance, f.attname))
+               for f in update):
+            values = {f.attname: getattr(instance, f.attname) for f in update}
+            values.update({f.attname: f.pre_save(instance, add=False) for f in touch})
+            manager.filter(pk=current.pk).update(**values)
+            rows.append((current.pk, "u", key))
+        else:
+            rows.append((current.pk, "n", key))
+    return rows
+
+
+def bulk_upsert(
+    model: type[models.Model],
+    rows: Iterable[models.Model | Mapping[str, Any]],
+    *,
+    unique_fields: Sequence[str],
+    update_fields: Sequence[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    using: str | None = None,
+    audit_user=None,
+    audit_action: str | None = None,
+    cache_scopes: Sequence[str] = (),
+) -> UpsertResult:
+    """
+    Inserta o actualiza ``rows`` por ``unique_fields`` y clasifica cada id.
+
+    ``update_fields`` limita qué columnas se sobrescriben y se comparan (por
+    defecto todas salvo la clave, ``auto_now_add`` y ``auto_now``); los campos
+    ``auto_now`` sólo avanzan en filas que de verdad cambiaron. ``unique_fields``
+    debe corresponder a una restricción única de la tabla.
+
+    Como ``bulk_create``, no llama ``save()`` ni emite ``post_save``. Si se
+    indica ``audit_action`` se registra un ``AuditLog`` por fila creada o
+    actualizada, y ``cache_scopes`` se invalida sólo cuando algo cambió.
+    """
+    concrete, unique, update, touch = _resolve_fields(model, unique_fields, update_fields)
+    instances = _dedupe([_instance(model, row) for row in rows], unique)
+    result = UpsertResult()
+    if not instances:
+        return result
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    buckets = {"c": result.created, "u": result.updated, "n": result.unchanged}
+    with transaction.atomic(using=using):
+        for start in range(0, len(instances), batch_size):
+            chunk = instances[start:start + batch_size]
+            if connection.vendor == "postgresql":
+                outcome = _postgres_chunk(model, chunk, connection, concrete, unique, update, touch)
+            else:
+                outcome = _generic_chunk(model, chunk, using, unique, update, touch)
+            for pk, status, key in outcome:
+                buckets[status].append(pk)
+                result.ids_by_key[key] = pk
+
+        if audit_action and result.changed:
+            label = f"{model._meta.app_label}.{model.__name__}"
+            with audit_batch():
+                for pk in result.created:
+                    log_event(audit_user, audit_action, label, str(pk), {"upsert": "created"})
+                for pk in result.updated:
+                    log_event(audit_user, audit_action, label, str(pk), {"upsert": "updated"})
+    if cache_scopes and result.changed:
+        bump_cache_scopes(*cache_scopes)
+    return result
@@ -5,6 +5,8 @@ from collections.abc import Callable, Iterable, Mapping
 from django.conf import settings
 from django.core.cache import cache
 
+from core.db_routing import pin_to_primary
+
 
 DEFAULT_SCOPE_VERSION = 1
 DEFAULT_VERSIONED_CACHE_TTL = int(getattr(settings, "ERP_VERSIONED_CACHE_TTL_SECONDS", 900) or 900)
@@ -76,7 +78,10 @@ def get_or_set_versioned_cache(
             runtime_cache[key] = cached_value
         return cached_value
 
-    value = builder()
+    # El valor se guarda bajo la versión vigente: leerlo de una réplica atrasada
+    # guardaría datos previos al último ``bump_cache_scopes`` por todo el TTL.
+    with pin_to_primary():
+        value = builder()
     try:
         cache.set(key, value, timeout=timeout or DEFAULT_VERSIONED_CACHE_TTL)
     except Exception:
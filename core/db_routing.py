@@ -0,0 +1,201 @@
+"""
+Ruteo de lecturas analíticas a la réplica de PostgreSQL.
+
+Los tableros ejecutivos, la API de BI, las gráficas del dashboard y los
+exportes XLSX compiten con las escrituras del sync POS y los bloqueos de
+inventario. Esos caminos se marcan para leer de la réplica:
+
+- ``replica_reads(tolerancia)``: context manager y decorador para bloques de
+  sólo lectura. La tolerancia es un número de segundos o una llave de
+  ``DATABASE_REPLICA_LAG_TOLERANCES``. Se marca la vista o el exporte, no el
+  servicio compartido: los mismos lectores alimentan flujos que persisten.
+- ``replica_view(tolerancia)``: decorador de vistas; sólo aplica a GET/HEAD.
+- ``pin_to_primary()``: context manager y decorador que fuerza el primario.
+  ``get_or_set_versioned_cache`` construye sus valores así, para no guardar
+  bajo la versión vigente datos que la réplica aún no alcanza.
+
+``ReplicaRouter`` lee de la réplica sólo dentro de un bloque marcado y cuando
+no hay pin, no hay transacción abierta en el primario, no hubo escritura
+reciente en el mismo contexto y el retraso de replicación no rebasa la
+tolerancia. Las escrituras siempre van al primario.
+``core.middleware.ReplicaRoutingMiddleware`` deja una cookie corta tras una
+petición que escribe para que las siguientes peticiones del usuario lean lo
+recién escrito del primario.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD"})
+PIN_COOKIE_NAME = "erp_db_primary"
+
+_tolerance: ContextVar[float | None] = ContextVar("erp_replica_tolerance", default=None)
+_pinned: ContextVar[bool] = ContextVar("erp_replica_pinned", default=False)
+_last_write: ContextVar[float | None] = ContextVar("erp_replica_last_write", default=None)
+
+_lag_lock = threading.Lock()
+_lag_sample: dict[str, float] = {"checked_at": -math.inf, "lag": math.inf}
+
+# En un primario (o en la réplica de pruebas, que es la misma base) no hay
+# recuperación y el retraso es cero; en una réplica al día también, aunque la
+# última transacción reproducida sea vieja.
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+def replica_alias() -> str:
+    return getattr(settings, "DATABASE_REPLICA_ALIAS", "replica")
+
+
+def replica_enabled() -> bool:
+    return bool(getattr(settings, "DATABASE_REPLICA_ENABLED", False)) and replica_alias() in settings.DATABASES
+
+
+def _resolve_tolerance(max_lag_seconds: float | str | None) -> float:
+    tolerances = getattr(settings, "DATABASE_REPLICA_LAG_TOLERANCES", {}) or {}
+    if isinstance(max_lag_seconds, str):
+        max_lag_seconds = tolerances.get(max_lag_seconds)
+    if max_lag_seconds is None:
+        max_lag_seconds = tolerances.get("default", 30)
+    return max(float(max_lag_seconds), 0.0)
+
+
+def replica_lag_seconds(*, refresh: bool = False) -> float:
+    """
+    Retraso de la réplica en segundos; ``inf`` si no responde.
+
+    La medición se comparte en el proceso y se repite a lo más cada
+    ``DATABASE_REPLICA_LAG_CHECK_SECONDS``.
+    """
+    interval = float(getattr(settings, "DATABASE_REPLICA_LAG_CHECK_SECONDS", 5))
+    now = time.monotonic()
+    with _lag_lock:
+        if not refresh and now - _lag_sample["checked_at"] < interval:
+            return _lag_sample["lag"]
+        try:
+            with connections[replica_alias()].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                row = cursor.fetchone()
+            lag = float(row[0]) if row and row[0] is not None else math.inf
+        except Exception:
+            logger.warning("No se pudo medir el retraso de la réplica %s; se lee del primario.", replica_alias(), exc_info=True)
+            lag = math.inf
+        _lag_sample.update(checked_at=now, lag=lag)
+        return lag
+
+
+def reset_replica_lag_sample() -> None:
+    with _lag_lock:
+        _lag_sample.update(checked_at=-math.inf, lag=math.inf)
+
+
+def mark_primary_write() -> None:
+    _last_write.set(time.monotonic())
+
+
+def _recent_write() -> bool:
+    last_write = _last_write.get()
+    if last_write is None:
+        return False
+    return time.monotonic() - last_write < float(getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 15))
+
+
+@contextmanager
+def replica_reads(max_lag_seconds: float | str | None = None):
+    """Lecturas del bloque a la réplica si el retraso cabe en la tolerancia."""
+    token = _tolerance.set(_resolve_tolerance(max_lag_seconds))
+    try:
+        yield
+    finally:
+        _tolerance.reset(token)
+
+
+@contextmanager
+def pin_to_primary():
+    """Lecturas del bloque al primario, aunque haya bloques de réplica anidados."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+@contextmanager
+def request_scope(*, pinned: bool = False):
+    """Aísla pin y última escritura de una petición; regresa si hubo escritura."""
+    pinned_token = _pinned.set(pinned)
+    write_token = _last_write.set(None)
+    state = {"wrote": False}
+    try:
+        yield state
+    finally:
+        state["wrote"] = _last_write.get() is not None
+        _last_write.reset(write_token)
+        _pinned.reset(pinned_token)
+
+
+def replica_view(max_lag_seconds: float | str | None = None):
+    """Decorador de vistas (funciones o métodos de APIView) que leen de la réplica en GET/HEAD."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            request = next((arg for arg in args[:2] if hasattr(arg, "method") and hasattr(arg, "COOKIES")), None)
+            if request is None or request.method not in SAFE_METHODS:
+                return view(*args, **kwargs)
+            with replica_reads(max_lag_seconds):
+                return view(*args, **kwargs)
+
+        return wrapped
+
+    return decorator
+
+
+def current_read_alias() -> str:
+    """Alias que usaría una lectura en este punto; útil para diagnóstico y pruebas."""
+    tolerance = _tolerance.get()
+    if tolerance is None or _pinned.get() or not replica_enabled():
+        return DEFAULT_DB_ALIAS
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block or _recent_write():
+        return DEFAULT_DB_ALIAS
+    if replica_lag_seconds() > tolerance:
+        return DEFAULT_DB_ALIAS
+    return replica_alias()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = current_read_alias()
+        return alias if alias != DEFAULT_DB_ALIAS else None
+
+    def db_for_write(self, model, **hints):
+        mark_primary_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
@@ -0,0 +1,147 @@
+"""
+Costo de importación al arrancar un proceso del ERP.
+
+Cada objetivo se mide en un intérprete nuevo con ``python -X importtime`` para
+que lo ya importado por el proceso que pregunta no esconda el costo:
+
+- ``web``: ``django.setup()`` más el URLconf completo, como un worker de
+  gunicorn antes de su primera petición.
+- ``celery``: la app de Celery con el autodiscover de tareas.
+
+``evaluate_budget`` compara el perfil contra el presupuesto total, el de cada
+módulo del proyecto y la lista de módulos que deben cargarse en diferido
+(pandas, openpyxl, las vistas de 20k líneas...).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+
+BOOT_SCRIPTS = {
+    "web": (
+        "import django\n"
+        "django.setup()\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().reverse_dict\n"
+    ),
+    "celery": (
+        "import django\n"
+        "django.setup()\n"
+        "from config.celery import app\n"
+        "app.loader.import_default_modules()\n"
+    ),
+}
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ImportEntry:
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    target: str
+    entries: list[ImportEntry]
+    wall_ms: float
+    modules: set[str] = field(default_factory=set)
+
+    def __post_init__(self):
+        self.modules = {entry.module for entry in self.entries}
+
+    @property
+    def import_ms(self) -> float:
+        return sum(entry.cumulative_ms for entry in self.entries if entry.depth == 0)
+
+    def top(self, limit: int = 25, *, project_only: bool = False) -> list[ImportEntry]:
+        entries = [entry for entry in self.entries if not project_only or is_project_module(entry.module)]
+        return sorted(entries, key=lambda entry: entry.self_ms, reverse=True)[:limit]
+
+    def by_package(self) -> dict[str, float]:
+        """Tiempo propio agregado por paquete raíz (``recetas``, ``pandas``...)."""
+        totals: dict[str, float] = defaultdict(float)
+        for entry in self.entries:
+            totals[entry.module.split(".")[0]] += entry.self_ms
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def parse_importtime(output: str) -> list[ImportEntry]:
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append(
+            ImportEntry(
+                module=module,
+                self_ms=int(self_us) / 1000,
+                cumulative_ms=int(cumulative_us) / 1000,
+                depth=max(len(indent) - 1, 0) // 2,
+            )
+        )
+    return entries
+
+
+def is_project_module(module: str) -> bool:
+    root = module.split(".")[0]
+    return (Path(settings.BASE_DIR) / root).is_dir() and root not in {"static", "staticfiles", "templates"}
+
+
+def profile_boot(target: str, *, timeout: int = 180) -> ImportProfile:
+    if target not in BOOT_SCRIPTS:
+        raise ValueError(f"Objetivo desconocido: {target}")
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE") or settings.SETTINGS_MODULE}
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPTS[target]],
+        cwd=str(settings.BASE_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        tail = "\n".join(line for line in completed.stderr.splitlines() if not line.startswith("import time:"))[-2000:]
+        raise RuntimeError(f"El arranque '{target}' falló:\n{tail}")
+    return ImportProfile(target=target, entries=parse_importtime(completed.stderr), wall_ms=wall_ms)
+
+
+def evaluate_budget(
+    profile: ImportProfile,
+    *,
+    total_ms: float | None = None,
+    module_ms: float | None = None,
+    deferred_modules: list[str] | tuple[str, ...] = (),
+) -> list[str]:
+    """Violaciones del presupuesto; lista vacía si el arranque cabe."""
+    violations = []
+    if total_ms and profile.import_ms > total_ms:
+        violations.append(
+            f"{profile.target}: importar tomó {profile.import_ms:.0f} ms (presupuesto {total_ms:.0f} ms)."
+        )
+    if module_ms:
+        for entry in profile.top(limit=len(profile.entries), project_only=True):
+            if entry.self_ms <= module_ms:
+                break
+            violations.append(
+                f"{profile.target}: {entry.module} tomó {entry.self_ms:.0f} ms (presupuesto por módulo {module_ms:.0f} ms)."
+            )
+    for module in deferred_modules:
+        if module in profile.modules:
+            violations.append(f"{profile.target}: {module} se importa al arrancar y debe cargarse en diferido.")
+    return violations
@@ -0,0 +1,98 @@
+"""
+Carga diferida de módulos de vistas desde el URLconf.
+
+``recetas/views/plan.py``, ``mrp.py`` y ``reabasto.py`` pasan de 20k líneas,
+``compras/views.py`` de 10k y las vistas de API arrastran los servicios del
+gateway de IA. Importarlos al armar el URLconf hace lentos el arranque de cada
+worker de gunicorn y los comandos de manage.py que corren checks.
+
+``lazy_views("recetas.views")`` regresa un proxy del módulo: ``views.plan_produccion``
+es una vista que importa ``recetas.views`` (y, con su ``__getattr__``, sólo el
+submódulo que la define) en la primera petición. Para vistas de clase,
+``views.MiVista.as_view()`` difiere también el ``as_view``.
+"""
+
+from __future__ import annotations
+
+import sys
+from importlib import import_module
+from threading import Lock
+
+# Atributos que Django y DRF consultan al armar el resolver (``lookup_str``,
+# ``ResolverMatch``). Mientras la vista no se cargue se reportan ausentes para
+# no importar todos los módulos en el primer ``reverse``.
+_CLASS_VIEW_ATTRS = frozenset({"view_class", "view_initkwargs", "cls", "initkwargs"})
+
+
+class LazyView:
+    def __init__(self, module_path: str, attr: str, initkwargs: dict | None = None):
+        self._module_path = module_path
+        self._attr = attr
+        self._initkwargs = initkwargs
+        self._view = None
+        self._lock = Lock()
+        self.__module__ = module_path
+        self.__name__ = attr
+        self.__qualname__ = attr
+
+    @property
+    def loaded(self) -> bool:
+        if self._initkwargs is not None:
+            return self._view is not None
+        module = sys.modules.get(self._module_path)
+        return module is not None and self._attr in vars(module)
+
+    def resolve(self):
+        """Vista real; importa el módulo la primera vez."""
+        target = getattr(import_module(self._module_path), self._attr)
+        if self._initkwargs is None:
+            # Sin caché: un ``patch`` sobre el módulo se respeta en cada petición.
+            return target
+        if self._view is None:
+            with self._lock:
+                if self._view is None:
+                    self._view = target.as_view(**self._initkwargs)
+        return self._view
+
+    def as_view(self, **initkwargs) -> "LazyView":
+        return LazyView(self._module_path, self._attr, initkwargs)
+
+    def __call__(self, request, *args, **kwargs):
+        return self.resolve()(request, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name in _CLASS_VIEW_ATTRS and not self.loaded:
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __repr__(self) -> str:
+        suffix = ".as_view()" if self._initkwargs is not None else ""
+        return f"<LazyView {self._module_path}.{self._attr}{suffix}>"
+
+
+class LazyViewModule:
+    def __init__(self, module_path: str):
+        self._module_path = module_path
+
+    def __getattr__(self, name: str) -> LazyView:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return LazyView(self._module_path, name)
+
+    def __repr__(self) -> str:
+        return f"<LazyViewModule {self._module_path}>"
+
+
+def lazy_views(module_path: str) -> LazyViewModule:
+    return LazyViewModule(module_path)
+
+
+def iter_lazy_views(patterns):
+    """Recorre un URLconf y regresa las ``LazyView`` registradas."""
+    for pattern in patterns:
+        if hasattr(pattern, "url_patterns"):
+            yield from iter_lazy_views(pattern.url_patterns)
+        elif isinstance(pattern.callback, LazyView):
+            yield pattern.callback
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+
+from django.core.management import BaseCommand, CommandError
+from kombu.exceptions import OperationalError
+
+from config import celery_routing
+from config.celery_monitoring import queue_snapshot, runtime_stats
+
+
+def _format_seconds(value) -> str:
+    if value is None:
+        return "-"
+    if value >= 3600:
+        return f"{value / 3600:.1f}h"
+    if value >= 60:
+        return f"{value / 60:.1f}m"
+    return f"{value:.1f}s"
+
+
+class Command(BaseCommand):
+    help = (
+        "Reporta profundidad por cola, antigüedad del mensaje más viejo y duración "
+        "de tareas (p50/p95/max) registrada en el backend de resultados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="Imprime el reporte como JSON.")
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=0,
+            help="Falla si el mensaje más viejo de realtime/interactive supera estos segundos.",
+        )
+
+    def _collect(self) -> dict:
+        from config.celery import app
+
+        queues = [lane.queue for lane in celery_routing.LANES.values()]
+        try:
+            with app.connection_for_read() as connection:
+                channel = connection.default_channel
+                client = getattr(channel, "client", None)
+                if client is None:
+                    raise CommandError("El broker configurado no es Redis; no se puede inspeccionar la profundidad de cola.")
+                queue_rows = [queue_snapshot(client, queue_name) for queue_name in queues]
+        except OperationalError as exc:
+            raise CommandError(f"No se pudo conectar al broker de Celery: {exc}") from exc
+
+        backend_client = getattr(app.backend, "client", None)
+        task_names = sorted(name for name in app.tasks if not name.startswith("celery."))
+        runtime_rows = runtime_stats(backend_client, task_names) if backend_client is not None else []
+        for row in runtime_rows:
+            row["queue"] = celery_routing.lane_for_task(row["task"]).queue
+        return {"queues": queue_rows, "runtimes": runtime_rows}
+
+    def handle(self, *args, **options):
+        from config.celery import app
+
+        app.loader.import_default_modules()
+        report = self._collect()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            self.stdout.write("Colas")
+            for row in report["queues"]:
+                self.stdout.write(
+                    f"  {row['queue']:<12} depth={row['depth']:<6} oldest={_format_seconds(row['oldest_age_seconds'])}"
+                )
+            self.stdout.write("Duración de tareas (últimas ejecuciones)")
+            if not report["runtimes"]:
+                self.stdout.write("  Sin muestras en el backend de resultados.")
+            for row in sorted(report["runtimes"], key=lambda item: item["p95_seconds"], reverse=True):
+                self.stdout.write(
+                    f"  [{row['queue']}] {row['task']}: runs={row['runs']} fallas={row['failures']} "
+                    f"p50={_format_seconds(row['p50_seconds'])} p95={_format_seconds(row['p95_seconds'])} "
+                    f"max={_format_seconds(row['max_seconds'])}"
+                )
+
+        max_age = int(options.get("max_age") or 0)
+        if max_age:
+            stale = [
+                row["queue"]
+                for row in report["queues"]
+                if row["queue"] in {celery_routing.QUEUE_REALTIME, celery_routing.QUEUE_INTERACTIVE}
+                and (row["oldest_age_seconds"] or 0) > max_age
+            ]
+            if stale:
+                raise CommandError("Colas con mensajes atrasados: " + ", ".join(stale))
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.import_profile import BOOT_SCRIPTS, evaluate_budget, profile_boot
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo de importación al arrancar (web y Celery) por módulo y falla si "
+        "se rebasa el presupuesto o si se importa al arrancar un módulo que debe ser diferido."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            choices=sorted(BOOT_SCRIPTS),
+            help="Arranque a medir; repetible. Por defecto, todos.",
+        )
+        parser.add_argument("--top", type=int, default=15, help="Módulos más costosos a mostrar.")
+        parser.add_argument(
+            "--total-ms",
+            type=int,
+            default=None,
+            help="Presupuesto total de importación (default ERP_IMPORT_BUDGET_TOTAL_MS).",
+        )
+        parser.add_argument(
+            "--module-ms",
+            type=int,
+            default=None,
+            help="Presupuesto de tiempo propio por módulo del proyecto (default ERP_IMPORT_BUDGET_MODULE_MS).",
+        )
+        parser.add_argument("--report-only", action="store_true", help="Reporta sin fallar por presupuesto.")
+        parser.add_argument("--json", action="store_true", help="Imprime el reporte como JSON.")
+
+    def handle(self, *args, **options):
+        total_ms = options["total_ms"] if options["total_ms"] is not None else settings.ERP_IMPORT_BUDGET_TOTAL_MS
+        module_ms = options["module_ms"] if options["module_ms"] is not None else settings.ERP_IMPORT_BUDGET_MODULE_MS
+        deferred = list(getattr(settings, "ERP_IMPORT_DEFERRED_MODULES", []))
+        top = max(options["top"], 0)
+
+        report = []
+        violations = []
+        for target in options["target"] or sorted(BOOT_SCRIPTS):
+            try:
+                profile = profile_boot(target)
+            except RuntimeError as exc:
+                raise CommandError(str(exc)) from exc
+            target_violations = evaluate_budget(profile, total_ms=total_ms, module_ms=module_ms, deferred_modules=deferred)
+            violations.extend(target_violations)
+            report.append(
+                {
+                    "target": target,
+                    "import_ms": round(profile.import_ms, 1),
+                    "wall_ms": round(profile.wall_ms, 1),
+                    "modules": len(profile.entries),
+                    "top_modules": [
+                        {"module": entry.module, "self_ms": round(entry.self_ms, 1), "cumulative_ms": round(entry.cumulative_ms, 1)}
+                        for entry in profile.top(top)
+                    ],
+                    "packages": [
+                        {"package": package, "self_ms": round(value, 1)}
+                        for package, value in list(profile.by_package().items())[:top]
+                    ],
+                    "deferred_loaded": sorted(module for module in deferred if module in profile.modules),
+                    "violations": target_violations,
+                }
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"total_ms": total_ms, "module_ms": module_ms, "targets": report}, indent=2))
+        else:
+            for row in report:
+                self.stdout.write(
+                    f"[{row['target']}] importación {row['import_ms']:.0f} ms de {total_ms} ms · "
+                    f"proceso {row['wall_ms']:.0f} ms · {row['modules']} módulos"
+                )
+                self.stdout.write("  Paquetes (tiempo propio):")
+                for item in row["packages"]:
+                    self.stdout.write(f"    {item['self_ms']:>8.1f} ms  {item['package']}")
+                self.stdout.write("  Módulos (tiempo propio / acumulado):")
+                for item in row["top_modules"]:
+                    self.stdout.write(f"    {item['self_ms']:>8.1f} / {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+                if row["deferred_loaded"]:
+                    self.stdout.write(f"  Diferidos cargados al arrancar: {', '.join(row['deferred_loaded'])}")
+
+        if violations and not options["report_only"]:
+            for violation in violations:
+                self.stderr.write(violation)
+            raise CommandError(f"El arranque rebasa el presupuesto de importación ({len(violations)} violación(es)).")
+        if not options["json"]:
+            self.stdout.write(self.style.SUCCESS("Importación al arrancar dentro de presupuesto."))
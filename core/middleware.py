@@ -19,6 +19,13 @@ from core.access import (
     is_mermas_only,
     is_repartidor_only,
 )
+from core.db_routing import (
+    PIN_COOKIE_NAME,
+    SAFE_METHODS as REPLICA_SAFE_METHODS,
+    replica_enabled,
+    replica_reads,
+    request_scope,
+)
 from core.superuser_preview import MANAGEMENT_PREFIX, SESSION_KEY
 
 
@@ -361,3 +368,44 @@ class PerformanceLoggingMiddleware:
                 sample.sql,
             )
         return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Alcance de ruteo por petición.
+
+    Los GET de exportes (``?export=xlsx``) leen de la réplica con la tolerancia
+    ``exports``. Una petición que escribe deja la cookie ``erp_db_primary`` por
+    ``DATABASE_REPLICA_PIN_SECONDS`` y las peticiones con la cookie leen del
+    primario.
+    """
+
+    EXPORT_FORMATS = {"xlsx", "excel", "csv"}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_enabled():
+            return self.get_response(request)
+
+        pinned = bool(request.COOKIES.get(PIN_COOKIE_NAME))
+        is_export = (
+            request.method in REPLICA_SAFE_METHODS
+            and (request.GET.get("export") or request.GET.get("format") or "").lower() in self.EXPORT_FORMATS
+        )
+        with request_scope(pinned=pinned) as state:
+            if is_export:
+                with replica_reads("exports"):
+                    response = self.get_response(request)
+            else:
+                response = self.get_response(request)
+        if state["wrote"]:
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                "1",
+                max_age=int(getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 15)),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.db import transaction
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
 from compras.models import OrdenCompra, PresupuestoCompraPeriodo, RecepcionCompra, SolicitudCompra
 from control.models import MermaPOS
 from inventario.models import AjusteInventario, AlmacenSyncRun, ExistenciaInsumo, MovimientoInventario
+from logistica.models import Repartidor
 from maestros.models import CostoInsumo, Insumo
 from pos_bridge.models import (
     PointDailyBranchIndicator,
@@ -19,15 +22,82 @@ from pos_bridge.models import (
     PointTransferLine,
     PointWasteLine,
 )
-from recetas.models import LineaReceta, PlanProduccion, PlanProduccionItem, RecetaPresentacionDerivada, SolicitudVenta, VentaHistorica
+from recetas.models import (
+    LineaReceta,
+    PlanProduccion,
+    PlanProduccionItem,
+    Receta,
+    RecetaCodigoPointAlias,
+    RecetaEquivalencia,
+    RecetaPresentacionDerivada,
+    SolicitudVenta,
+    VentaHistorica,
+)
+from reportes.models import (
+    EmpresaResultadoMensual,
+    PresupuestoImport,
+    PresupuestoLineaMensual,
+    PresupuestoResumenMensual,
+    ProductoPricingDecisionMensual,
+    ProductoSucursalContribucionMensual,
+)
 
+from core.access_profile import bump_user_access_version
 from core.cache_versions import bump_cache_scopes
+from core.models import UserModuleAccess, UserProfile
 
 
 def _bump_on_commit(*scopes: str) -> None:
     transaction.on_commit(lambda: bump_cache_scopes(*scopes))
 
 
+def _bump_user_access(*user_ids) -> None:
+    # Se invalida ya (el propio request ve el cambio) y otra vez al confirmar,
+    # por si un request concurrente volvió a cachear el estado previo al commit.
+    ids = [user_id for user_id in user_ids if user_id]
+    if ids:
+        bump_user_access_version(*ids)
+        transaction.on_commit(lambda: bump_user_access_version(*ids))
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def _invalidate_user_access_on_user_change(sender, instance, update_fields=None, **_kwargs) -> None:
+    # El login solo toca last_login; no cambia permisos.
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    _bump_user_access(instance.pk)
+
+
+@receiver(post_save, sender=UserModuleAccess)
+@receiver(post_delete, sender=UserModuleAccess)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=Repartidor)
+@receiver(post_delete, sender=Repartidor)
+def _invalidate_user_access_scope(sender, instance, **_kwargs) -> None:
+    _bump_user_access(instance.user_id)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def _invalidate_user_access_on_groups(sender, instance, action, reverse, pk_set, **_kwargs) -> None:
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        _bump_user_access(instance.pk)
+        return
+    # group.user_set.add/remove/clear: afecta a los usuarios tocados (o a todos si es clear).
+    user_ids = list(pk_set or instance.user_set.values_list("pk", flat=True))
+    _bump_user_access(*user_ids)
+
+
+@receiver(post_save, sender=Group)
+def _invalidate_user_access_on_group_rename(sender, instance, created, **_kwargs) -> None:
+    if created:
+        return
+    _bump_user_access(*instance.user_set.values_list("pk", flat=True))
+
+
 @receiver(post_save, sender=Insumo)
 @receiver(post_delete, sender=Insumo)
 @receiver(post_save, sender=CostoInsumo)
@@ -98,3 +168,33 @@ def _invalidate_sales_scope(**_kwargs) -> None:
 @receiver(post_delete, sender=RecetaPresentacionDerivada)
 def _invalidate_recipe_operational_scope(**_kwargs) -> None:
     _bump_on_commit("dashboard")
+
+
+@receiver(post_save, sender=Receta)
+@receiver(post_delete, sender=Receta)
+@receiver(post_save, sender=RecetaCodigoPointAlias)
+@receiver(post_delete, sender=RecetaCodigoPointAlias)
+@receiver(post_save, sender=RecetaEquivalencia)
+@receiver(post_delete, sender=RecetaEquivalencia)
+@receiver(post_save, sender=RecetaPresentacionDerivada)
+@receiver(post_delete, sender=RecetaPresentacionDerivada)
+def _invalidate_closure_catalog_scope(**_kwargs) -> None:
+    # Homologación Point -> receta padre de las entradas del cierre mensual.
+    _bump_on_commit("cierre_catalogo")
+
+
+@receiver(post_save, sender=PresupuestoImport)
+@receiver(post_delete, sender=PresupuestoImport)
+@receiver(post_save, sender=PresupuestoLineaMensual)
+@receiver(post_delete, sender=PresupuestoLineaMensual)
+@receiver(post_save, sender=PresupuestoResumenMensual)
+@receiver(post_delete, sender=PresupuestoResumenMensual)
+@receiver(post_save, sender=EmpresaResultadoMensual)
+@receiver(post_delete, sender=EmpresaResultadoMensual)
+@receiver(post_save, sender=ProductoPricingDecisionMensual)
+@receiver(post_delete, sender=ProductoPricingDecisionMensual)
+@receiver(post_save, sender=ProductoSucursalContribucionMensual)
+@receiver(post_delete, sender=ProductoSucursalContribucionMensual)
+def _invalidate_budget_scope(**_kwargs) -> None:
+    # Paneles de presupuesto y contribución por sucursal (reportes/executive_panels.py).
+    _bump_on_commit("presupuesto", "dashboard")
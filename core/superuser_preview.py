@@ -7,6 +7,7 @@ from django.shortcuts import get_object_or_404, redirect
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.views.decorators.http import require_GET, require_POST
 
+from core.access_profile import bump_user_access_version
 from core.audit import log_event
 from rrhh.models import Empleado
 
@@ -89,7 +90,9 @@ def preview_start(request):
         eligible_preview_employees(),
         usuario_erp_id=request.POST.get("user_id"),
     )
+    previous_target_id = request.session.get(SESSION_KEY)
     request.session[SESSION_KEY] = employee.usuario_erp_id
+    bump_user_access_version(actor.pk, previous_target_id, employee.usuario_erp_id)
     log_event(
         actor,
         "SUPERUSER_PREVIEW_START",
@@ -111,6 +114,7 @@ def preview_stop(request):
         return HttpResponseForbidden("Esta opción es exclusiva para superusuarios.")
 
     target_id = request.session.pop(SESSION_KEY, None)
+    bump_user_access_version(actor.pk, target_id)
     if target_id:
         target = get_user_model().objects.filter(pk=target_id).first()
         log_event(
@@ -266,3 +266,15 @@ def verificar_datos_mes():
         logger.exception("No se pudo enviar alerta de datos mensuales.")
         status["email_error"] = str(exc)
     return {"period": status["period"], "ok": False, "email_sent": email_sent, "status": status}
+
+
+@shared_task(name="core.tasks.persist_audit_events", bind=True, max_retries=5, default_retry_delay=30)
+def persist_audit_events(self, events):
+    """Inserta en bloque eventos de bitácora entregados por ``audit_batch(async_delivery=True)``."""
+    from core.audit import persist_serialized_events
+
+    try:
+        return {"ok": True, "inserted": persist_serialized_events(events or [])}
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("No se pudo persistir lote de bitácora (%s eventos).", len(events or []))
+        raise self.retry(exc=exc)
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.access import ROLE_COMPRAS, ROLE_LECTURA
+from core.access_profile import UI_ACCESS_FLAGS, build_access_profile, get_access_profile, prime_user_access_caches
+from core.context_processors import ui_access
+from core.models import UserModuleAccess, UserProfile
+
+
+class AccessProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.compras_group, _ = Group.objects.get_or_create(name=ROLE_COMPRAS)
+        self.user = get_user_model().objects.create_user(username="perfil.compras", password="test-password")
+        self.user.groups.add(self.compras_group)
+        self.factory = RequestFactory()
+
+    def _fresh_user(self):
+        return get_user_model().objects.get(pk=self.user.pk)
+
+    def test_profile_matches_individual_access_helpers(self):
+        UserModuleAccess.objects.create(user=self.user, module="rrhh", access=UserModuleAccess.ACCESS_VIEW)
+        user = self._fresh_user()
+
+        profile = build_access_profile(user)["ui_access"]
+
+        expected_user = self._fresh_user()
+        for name, check in UI_ACCESS_FLAGS.items():
+            self.assertEqual(profile[name], bool(check(expected_user)), name)
+        self.assertTrue(profile["can_manage_compras"])
+        self.assertTrue(profile["can_view_rrhh"])
+        self.assertFalse(profile["can_manage_rrhh"])
+        self.assertEqual(profile["role_label"], "Compras")
+
+    def test_prime_loads_groups_and_module_access_in_one_query(self):
+        UserModuleAccess.objects.create(user=self.user, module="rrhh", access=UserModuleAccess.ACCESS_MANAGE)
+        user = self._fresh_user()
+
+        with CaptureQueriesContext(connection) as queries:
+            prime_user_access_caches(user)
+        self.assertEqual(len(queries), 1)
+
+        self.assertEqual(user._group_names_cache, frozenset({ROLE_COMPRAS}))
+        self.assertEqual(user._module_access_map_cache, {"rrhh": UserModuleAccess.ACCESS_MANAGE})
+
+    def test_profile_is_served_from_shared_cache_and_request_memo(self):
+        get_access_profile(self._fresh_user())
+
+        request = self.factory.get("/dashboard/")
+        user = self._fresh_user()
+        with CaptureQueriesContext(connection) as queries:
+            first = get_access_profile(user, request)
+            second = get_access_profile(user, request)
+        self.assertEqual(len(queries), 0)
+        self.assertIs(first, second)
+
+    def test_group_and_module_access_changes_bump_profile_version(self):
+        self.assertFalse(get_access_profile(self._fresh_user())["ui_access"]["can_view_rrhh"])
+
+        UserModuleAccess.objects.create(user=self.user, module="rrhh", access=UserModuleAccess.ACCESS_VIEW)
+        self.assertTrue(get_access_profile(self._fresh_user())["ui_access"]["can_view_rrhh"])
+
+        lectura_group, _ = Group.objects.get_or_create(name=ROLE_LECTURA)
+        self.user.groups.set([lectura_group])
+        profile = get_access_profile(self._fresh_user())["ui_access"]
+        self.assertFalse(profile["can_manage_compras"])
+        self.assertEqual(profile["role_label"], "Solo lectura")
+
+        UserProfile.objects.create(user=self.user, lock_rrhh=True)
+        self.assertFalse(get_access_profile(self._fresh_user())["ui_access"]["can_view_rrhh"])
+
+    def test_context_processor_is_lazy_until_template_reads_it(self):
+        request = self.factory.get("/compras/")
+        request.user = self._fresh_user()
+
+        with CaptureQueriesContext(connection) as queries:
+            context = ui_access(request)
+        self.assertEqual(len(queries), 0)
+
+        self.assertTrue(context["ui_access"]["can_view_compras"])
+        self.assertEqual(context["ui_access"]["role_label"], "Compras")
@@ -0,0 +1,150 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.audit import _current_batch, audit_batch, audit_sink_metrics, log_event, reset_audit_sink_metrics
+from core.models import AuditLog
+
+
+class AuditBatchTests(TestCase):
+    def setUp(self):
+        reset_audit_sink_metrics()
+        self.user = get_user_model().objects.create_user(username="audit.batch", password="test-password")
+
+    def test_log_event_without_batch_writes_immediately(self):
+        log_event(self.user, "UPDATE", "core.Test", "1", {"a": 1})
+
+        self.assertEqual(AuditLog.objects.filter(model="core.Test").count(), 1)
+
+    def test_batch_inserts_all_events_with_single_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            with audit_batch():
+                for index in range(25):
+                    log_event(self.user, "IMPORT", "core.Test", str(index))
+                self.assertEqual(AuditLog.objects.filter(model="core.Test").count(), 0)
+
+        inserts = [q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "core_auditlog"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(AuditLog.objects.filter(model="core.Test").count(), 25)
+        metrics = audit_sink_metrics()
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertEqual(metrics["max_queue_depth"], 25)
+        self.assertEqual(metrics["events_flushed"], 25)
+        self.assertEqual(metrics["flushes"], 1)
+
+    def test_events_from_rolled_back_savepoint_are_dropped(self):
+        with audit_batch():
+            log_event(self.user, "IMPORT", "core.Test", "kept")
+            try:
+                with transaction.atomic():
+                    log_event(self.user, "IMPORT", "core.Test", "rolled-back")
+                    raise ValueError("fila inválida")
+            except ValueError:
+                pass
+            with transaction.atomic():
+                log_event(self.user, "IMPORT", "core.Test", "released")
+
+        self.assertEqual(
+            set(AuditLog.objects.filter(model="core.Test").values_list("object_id", flat=True)),
+            {"kept", "released"},
+        )
+        self.assertEqual(audit_sink_metrics()["events_dropped"], 1)
+
+    def test_nested_batches_flush_once_at_outermost_exit(self):
+        with audit_batch():
+            with audit_batch():
+                log_event(self.user, "IMPORT", "core.Test", "inner")
+            self.assertEqual(AuditLog.objects.filter(model="core.Test").count(), 0)
+            log_event(self.user, "IMPORT", "core.Test", "outer")
+
+        self.assertEqual(AuditLog.objects.filter(model="core.Test").count(), 2)
+        self.assertEqual(audit_sink_metrics()["flushes"], 1)
+
+    def test_decorator_form(self):
+        @audit_batch()
+        def importar():
+            for index in range(3):
+                log_event(self.user, "IMPORT", "core.Test", str(index))
+            return AuditLog.objects.filter(model="core.Test").count()
+
+        self.assertEqual(importar(), 0)
+        self.assertEqual(AuditLog.objects.filter(model="core.Test").count(), 3)
+
+    def test_decorated_function_is_reentrant(self):
+        @audit_batch()
+        def importar(depth):
+            log_event(self.user, "IMPORT", "core.Test", f"depth-{depth}")
+            if depth < 2:
+                importar(depth + 1)
+
+        importar(0)
+
+        self.assertEqual(
+            set(AuditLog.objects.filter(model="core.Test").values_list("object_id", flat=True)),
+            {"depth-0", "depth-1", "depth-2"},
+        )
+        self.assertEqual(audit_sink_metrics()["flushes"], 1)
+
+    def test_same_instance_nested_keeps_events(self):
+        batch = audit_batch()
+        with batch:
+            log_event(self.user, "IMPORT", "core.Test", "outer")
+            with batch:
+                log_event(self.user, "IMPORT", "core.Test", "inner")
+            self.assertEqual(AuditLog.objects.filter(model="core.Test").count(), 0)
+
+        self.assertEqual(AuditLog.objects.filter(model="core.Test").count(), 2)
+
+    def test_decorated_function_keeps_batches_per_thread(self):
+        inside = threading.Barrier(2)
+        seen = {}
+
+        @audit_batch()
+        def importar(name):
+            log_event(None, "IMPORT", "core.Test", f"{name}-1")
+            inside.wait(timeout=5)
+            log_event(None, "IMPORT", "core.Test", f"{name}-2")
+            seen[name] = [event.object_id for segment in _current_batch()._segments for event in segment.events]
+
+        with mock.patch("core.models.AuditLog.objects.bulk_create") as bulk_create:
+            threads = [threading.Thread(target=importar, args=(name,)) for name in ("a", "b")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(seen, {"a": ["a-1", "a-2"], "b": ["b-1", "b-2"]})
+        flushed = sorted(sorted(event.object_id for event in call.args[0]) for call in bulk_create.call_args_list)
+        self.assertEqual(flushed, [["a-1", "a-2"], ["b-1", "b-2"]])
+
+    def test_batch_inside_rolled_back_transaction_leaves_no_events(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                with audit_batch():
+                    log_event(self.user, "IMPORT", "core.Test", "1")
+                raise RuntimeError("rollback")
+
+        self.assertFalse(AuditLog.objects.filter(model="core.Test").exists())
+
+    def test_async_delivery_hands_off_only_after_commit(self):
+        with mock.patch("core.tasks.persist_audit_events.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    with audit_batch(async_delivery=True):
+                        log_event(self.user, "IMPORT", "core.Test", "1")
+                        log_event(self.user, "IMPORT", "core.Test", "2")
+                    delay.assert_not_called()
+                with self.assertRaises(RuntimeError):
+                    with transaction.atomic():
+                        with audit_batch(async_delivery=True):
+                            log_event(self.user, "IMPORT", "core.Test", "3")
+                        raise RuntimeError("rollback")
+
+        delay.assert_called_once()
+        (payload,), _kwargs = delay.call_args
+        self.assertEqual([item["object_id"] for item in payload], ["1", "2"])
+        self.assertEqual(audit_sink_metrics()["events_handed_off"], 2)
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.bulk_upsert import bulk_upsert
+from core.cache_versions import get_cache_scope_version
+from core.models import AuditLog
+from pos_bridge.models import PointProduct
+
+
+def _rows(*names, category="Pasteles"):
+    return [
+        {"external_id": f"BU-{index}", "name": name, "category": category, "metadata": {"n": index}}
+        for index, name in enumerate(names)
+    ]
+
+
+class BulkUpsertTests(TestCase):
+    def test_clasifica_creados_actualizados_y_sin_cambio(self):
+        first = bulk_upsert(PointProduct, _rows("Uno", "Dos", "Tres"), unique_fields=["external_id"])
+        self.assertEqual(first.as_counts(), {"created": 3, "updated": 0, "unchanged": 0})
+        self.assertEqual(set(first.ids_by_key), {("BU-0",), ("BU-1",), ("BU-2",)})
+
+        stamps = dict(PointProduct.objects.values_list("external_id", "updated_at"))
+        rows = _rows("Uno", "Dos cambiado", "Tres") + [{"external_id": "BU-9", "name": "Nuevo"}]
+        second = bulk_upsert(PointProduct, rows, unique_fields=["external_id"])
+
+        self.assertEqual(second.as_counts(), {"created": 1, "updated": 1, "unchanged": 2})
+        self.assertEqual(second.updated, [first.ids_by_key[("BU-1",)]])
+        self.assertEqual(PointProduct.objects.get(external_id="BU-1").name, "Dos cambiado")
+        self.assertEqual(PointProduct.objects.get(external_id="BU-0").updated_at, stamps["BU-0"])
+        self.assertNotEqual(PointProduct.objects.get(external_id="BU-1").updated_at, stamps["BU-1"])
+
+    def test_lote_sin_cambios_es_una_sentencia_por_chunk(self):
+        rows = _rows(*[f"Producto {index}" for index in range(7)])
+        bulk_upsert(PointProduct, rows, unique_fields=["external_id"])
+
+        with CaptureQueriesContext(connection) as queries:
+            result = bulk_upsert(PointProduct, rows, unique_fields=["external_id"], batch_size=3)
+
+        statements = [q for q in queries.captured_queries if "ON CONFLICT" in q["sql"]]
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(len(result.unchanged), 7)
+        self.assertLessEqual(len(queries), 5)
+
+    def test_update_fields_conserva_columnas_ajenas_y_la_ultima_fila_gana(self):
+        bulk_upsert(PointProduct, _rows("Uno"), unique_fields=["external_id"])
+        PointProduct.objects.filter(external_id="BU-0").update(precio=Decimal("45.50"))
+
+        result = bulk_upsert(
+            PointProduct,
+            _rows("Primera versión") + _rows("Segunda versión"),
+            unique_fields=["external_id"],
+            update_fields=["name"],
+        )
+
+        product = PointProduct.objects.get(external_id="BU-0")
+        self.assertEqual(result.as_counts(), {"created": 0, "updated": 1, "unchanged": 0})
+        self.assertEqual(product.name, "Segunda versión")
+        self.assertEqual(product.precio, Decimal("45.50"))
+
+    def test_auditoria_y_cache_solo_cuando_hay_cambios(self):
+        before = get_cache_scope_version("dashboard")
+        hooks = {"audit_action": "UPSERT", "cache_scopes": ["dashboard"]}
+        bulk_upsert(PointProduct, _rows("Uno", "Dos"), unique_fields=["external_id"], **hooks)
+        after_create = get_cache_scope_version("dashboard")
+        bulk_upsert(PointProduct, _rows("Uno", "Dos"), unique_fields=["external_id"], **hooks)
+
+        self.assertEqual(AuditLog.objects.filter(model="pos_bridge.PointProduct", action="UPSERT").count(), 2)
+        self.assertEqual(after_create, before + 1)
+        self.assertEqual(get_cache_scope_version("dashboard"), after_create)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import math
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.cache_versions import get_or_set_versioned_cache
+from core.db_routing import (
+    PIN_COOKIE_NAME,
+    ReplicaRouter,
+    current_read_alias,
+    pin_to_primary,
+    replica_lag_seconds,
+    replica_reads,
+    replica_view,
+    request_scope,
+    reset_replica_lag_sample,
+)
+from bonos_ventas.models import ConfigBonoVentasPeriodo
+from bonos_ventas.services import sync_ventas_categorias
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import Sucursal
+from ventas.services.sales_read_service import get_point_sales_category_totals
+
+
+@override_settings(
+    DATABASE_REPLICA_ENABLED=True,
+    DATABASE_REPLICA_LAG_TOLERANCES={"default": 30, "analytics": 300, "exports": 120},
+)
+class ReplicaRoutingTests(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        reset_replica_lag_sample()
+        self.addCleanup(reset_replica_lag_sample)
+        self.factory = RequestFactory()
+
+    def test_sin_bloque_de_replica_se_lee_del_primario(self):
+        with request_scope():
+            self.assertEqual(current_read_alias(), "default")
+
+    @override_settings(DATABASE_REPLICA_ENABLED=False)
+    def test_ruteo_apagado_ignora_los_bloques(self):
+        with request_scope(), replica_reads("analytics"):
+            self.assertEqual(current_read_alias(), "default")
+
+    def test_lectura_marcada_va_a_la_replica(self):
+        replica_conn = connections["replica"]
+        # TestCase abre una transacción en default; fuera de ella el ruteo aplica.
+        with patch.object(connections["default"], "in_atomic_block", False):
+            with request_scope(), replica_reads("analytics"):
+                self.assertEqual(current_read_alias(), "replica")
+                with CaptureQueriesContext(replica_conn) as captured:
+                    list(Sucursal.objects.values_list("id", flat=True)[:1])
+        self.assertTrue(any("core_sucursal" in query["sql"] for query in captured.captured_queries))
+
+    def test_retraso_mayor_a_la_tolerancia_regresa_al_primario(self):
+        with patch.object(connections["default"], "in_atomic_block", False), request_scope():
+            with patch("core.db_routing.replica_lag_seconds", return_value=45.0):
+                with replica_reads("analytics"):
+                    self.assertEqual(current_read_alias(), "replica")
+                with replica_reads():
+                    self.assertEqual(current_read_alias(), "default")
+                with replica_reads(60):
+                    self.assertEqual(current_read_alias(), "replica")
+            with patch("core.db_routing.replica_lag_seconds", return_value=math.inf):
+                with replica_reads("analytics"):
+                    self.assertEqual(current_read_alias(), "default")
+
+    def test_retraso_de_la_replica_de_pruebas_es_cero_y_se_cachea(self):
+        self.assertEqual(replica_lag_seconds(refresh=True), 0.0)
+        with CaptureQueriesContext(connections["replica"]) as captured:
+            replica_lag_seconds()
+        self.assertEqual(len(captured.captured_queries), 0)
+
+    def test_pin_al_primario_y_transaccion_abierta_ganan_a_la_replica(self):
+        with patch.object(connections["default"], "in_atomic_block", False), request_scope():
+            with replica_reads("analytics"), pin_to_primary():
+                self.assertEqual(current_read_alias(), "default")
+
+        with request_scope(), replica_reads("analytics"), transaction.atomic():
+            self.assertEqual(current_read_alias(), "default")
+
+    def test_escritura_fija_las_lecturas_siguientes_al_primario(self):
+        router = ReplicaRouter()
+        with patch.object(connections["default"], "in_atomic_block", False):
+            with request_scope() as state, replica_reads("analytics"):
+                self.assertEqual(router.db_for_read(Sucursal), "replica")
+                self.assertEqual(router.db_for_write(Sucursal), "default")
+                self.assertIsNone(router.db_for_read(Sucursal))
+            self.assertTrue(state["wrote"])
+            # El alcance siguiente empieza limpio.
+            with request_scope() as state, replica_reads("analytics"):
+                self.assertEqual(router.db_for_read(Sucursal), "replica")
+            self.assertFalse(state["wrote"])
+
+    def test_replica_no_recibe_migraciones(self):
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate("replica", "core"))
+        self.assertIsNone(router.allow_migrate("default", "core"))
+
+    def test_decorador_de_vista_solo_aplica_a_lecturas(self):
+        seen = []
+
+        @replica_view("analytics")
+        def view(request):
+            seen.append(current_read_alias())
+            return HttpResponse("ok")
+
+        with patch.object(connections["default"], "in_atomic_block", False), request_scope():
+            view(self.factory.get("/reportes/bi/"))
+            view(self.factory.post("/reportes/bi/"))
+        self.assertEqual(seen, ["replica", "default"])
+
+    def test_lectores_de_ventas_solo_usan_la_replica_dentro_de_un_bloque(self):
+        with patch.object(connections["default"], "in_atomic_block", False), request_scope():
+            with CaptureQueriesContext(connections["replica"]) as captured:
+                get_point_sales_category_totals(start_date=date(2026, 5, 1), end_date=date(2026, 6, 1))
+        self.assertEqual(captured.captured_queries, [])
+
+    def test_sync_de_bonos_lee_del_primario_aunque_lo_llame_una_vista_marcada(self):
+        periodo = ConfigBonoVentasPeriodo.objects.create(mes=5, anio=2026)
+        seen = []
+
+        def reader(**kwargs):
+            seen.append(current_read_alias())
+            return get_point_sales_category_totals(**kwargs)
+
+        with patch.object(connections["default"], "in_atomic_block", False), request_scope():
+            with replica_reads("analytics"), CaptureQueriesContext(connections["replica"]) as captured:
+                with patch("bonos_ventas.services.get_point_sales_category_totals", side_effect=reader), patch(
+                    "bonos_ventas.services.bulk_upsert"
+                ) as upsert:
+                    sync_ventas_categorias(periodo)
+                self.assertEqual(current_read_alias(), "replica")
+        self.assertEqual(seen, ["default", "default"])
+        # En la réplica sólo se mide el retraso; las ventas se leen del primario.
+        self.assertFalse(any("pos_bridge_" in query["sql"] for query in captured.captured_queries))
+        upsert.assert_called_once()
+
+    def test_cache_versionado_se_construye_desde_el_primario(self):
+        seen = []
+
+        def builder():
+            seen.append(current_read_alias())
+            return {"ok": True}
+
+        with patch.object(connections["default"], "in_atomic_block", False), request_scope():
+            with replica_reads("analytics"):
+                get_or_set_versioned_cache(
+                    key_parts=("db-routing-test", id(self)), scopes=("dashboard",), builder=builder
+                )
+                self.assertEqual(current_read_alias(), "replica")
+        self.assertEqual(seen, ["default"])
+
+    def test_middleware_fija_cookie_tras_escritura_y_la_respeta(self):
+        seen = []
+
+        def get_response(request):
+            seen.append(current_read_alias())
+            if request.method == "POST":
+                User.objects.create_user(username="replica_writer", password="x")
+            return HttpResponse("ok")
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        post_response = middleware(self.factory.post("/maestros/insumos/"))
+        with patch.object(connections["default"], "in_atomic_block", False):
+            export_response = middleware(self.factory.get("/reportes/costo-receta/", {"export": "xlsx"}))
+            pinned_request = self.factory.get("/reportes/costo-receta/", {"export": "xlsx"})
+            pinned_request.COOKIES[PIN_COOKIE_NAME] = "1"
+            middleware(pinned_request)
+
+        self.assertEqual(seen, ["default", "replica", "default"])
+        self.assertNotIn(PIN_COOKIE_NAME, export_response.cookies)
+        self.assertIn(PIN_COOKIE_NAME, post_response.cookies)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import sys
+import types
+from unittest.mock import patch
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.urls import get_resolver, resolve, reverse
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.import_profile import ImportProfile, evaluate_budget, parse_importtime, profile_boot
+from core.lazy_urls import LazyView, iter_lazy_views, lazy_views
+
+FAKE_MODULE = "core._lazy_urls_fake_views"
+
+IMPORTTIME_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       2500 | django.urls
+import time:       300 |        300 |     pandas.util
+import time:     40000 |      45000 |   pandas
+import time:    300000 |     390000 | recetas.views.plan
+"""
+
+
+def _fake_function_view(request, pk=None):
+    return HttpResponse(f"real:{pk}")
+
+
+class _FakeApiView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        return Response({"ok": True})
+
+
+class LazyViewTests(SimpleTestCase):
+    def setUp(self):
+        sys.modules.pop(FAKE_MODULE, None)
+        self.addCleanup(sys.modules.pop, FAKE_MODULE, None)
+        self.factory = RequestFactory()
+
+    def _install_fake_module(self):
+        module = types.ModuleType(FAKE_MODULE)
+        module.detail = _fake_function_view
+        module.FakeApiView = _FakeApiView
+        sys.modules[FAKE_MODULE] = module
+        return module
+
+    def test_no_importa_hasta_la_primera_peticion(self):
+        view = lazy_views(FAKE_MODULE).detail
+
+        self.assertIsInstance(view, LazyView)
+        self.assertEqual(f"{view.__module__}.{view.__qualname__}", f"{FAKE_MODULE}.detail")
+        self.assertFalse(view.loaded)
+        # El resolver pregunta por ``view_class``; sin cargar no debe importar.
+        self.assertFalse(hasattr(view, "view_class"))
+
+        self._install_fake_module()
+        response = view(self.factory.get("/x/"), pk=7)
+
+        self.assertEqual(response.content, b"real:7")
+        self.assertTrue(view.loaded)
+
+    def test_respeta_patch_sobre_el_modulo(self):
+        module = self._install_fake_module()
+        view = lazy_views(FAKE_MODULE).detail
+
+        with patch.object(module, "detail", lambda request, pk=None: HttpResponse("patched")):
+            self.assertEqual(view(self.factory.get("/x/")).content, b"patched")
+        self.assertEqual(view(self.factory.get("/x/"), pk=1).content, b"real:1")
+
+    def test_vista_de_clase_difiere_as_view_y_lo_reutiliza(self):
+        view = lazy_views(FAKE_MODULE).FakeApiView.as_view()
+        self.assertFalse(hasattr(view, "cls"))
+
+        self._install_fake_module()
+        response = view(self.factory.get("/x/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(view.resolve(), view.resolve())
+        self.assertIs(view.cls, _FakeApiView)
+        self.assertTrue(view.csrf_exempt)
+
+    def test_urlconf_solo_referencia_vistas_existentes(self):
+        lazy = list(iter_lazy_views(get_resolver().url_patterns))
+
+        self.assertGreater(len(lazy), 100)
+        for view in lazy:
+            with self.subTest(view=repr(view)):
+                self.assertTrue(callable(view.resolve()))
+
+    def test_reverse_y_resolve_de_rutas_diferidas(self):
+        url = reverse("recetas:plan_produccion")
+        match = resolve(url)
+
+        self.assertIsInstance(match.func, LazyView)
+        self.assertEqual(match._func_path, "recetas.views.plan_produccion")
+
+
+class ImportBudgetTests(SimpleTestCase):
+    def test_parsea_importtime_con_profundidad(self):
+        entries = parse_importtime(IMPORTTIME_SAMPLE)
+
+        self.assertEqual([entry.module for entry in entries], ["_io", "django.urls", "pandas.util", "pandas", "recetas.views.plan"])
+        self.assertEqual([entry.depth for entry in entries], [1, 0, 2, 1, 0])
+        self.assertEqual(entries[3].self_ms, 40.0)
+        profile = ImportProfile(target="web", entries=entries, wall_ms=500.0)
+        self.assertEqual(profile.import_ms, 392.5)
+        self.assertEqual(profile.by_package()["pandas"], 40.3)
+
+    def test_evalua_presupuesto_total_por_modulo_y_diferidos(self):
+        profile = ImportProfile(target="web", entries=parse_importtime(IMPORTTIME_SAMPLE), wall_ms=500.0)
+
+        self.assertEqual(evaluate_budget(profile, total_ms=1000, module_ms=400), [])
+        violations = evaluate_budget(
+            profile,
+            total_ms=100,
+            module_ms=250,
+            deferred_modules=["pandas", "openpyxl"],
+        )
+        self.assertEqual(len(violations), 3)
+        self.assertIn("392 ms", violations[0])
+        self.assertIn("recetas.views.plan", violations[1])
+        self.assertIn("pandas se importa al arrancar", violations[2])
+
+    def test_arranque_web_no_importa_modulos_diferidos(self):
+        profile = profile_boot("web")
+
+        self.assertGreater(len(profile.entries), 100)
+        self.assertEqual(
+            evaluate_budget(profile, deferred_modules=settings.ERP_IMPORT_DEFERRED_MODULES),
+            [],
+        )
@@ -56,6 +56,7 @@ from core.access import (
     is_branch_capture_only,
 )
 from core.cache_versions import get_or_set_versioned_cache
+from core.db_routing import replica_view
 from maestros.models import Proveedor, PointPendingMatch
 from maestros.models import CostoInsumo, Insumo
 from maestros.utils.canonical_catalog import (
@@ -2794,6 +2795,7 @@ def home_redirect(request: HttpRequest) -> HttpResponse:
     return redirect("login")
 
 
+@replica_view()
 def dashboard(request: HttpRequest) -> HttpResponse:
     if not request.user.is_authenticated:
         return redirect("/login/")
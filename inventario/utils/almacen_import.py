@@ -7,13 +7,11 @@ from decimal import Decimal, InvalidOperation
 from pathlib import Path
 from typing import Any
 
-import pandas as pd
-from rapidfuzz import fuzz, process
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
-from core.audit import log_event
+from core.audit import audit_batch, log_event
 from inventario.models import ExistenciaInsumo, MovimientoInventario
 from inventario.services_existencias import aplicar_delta, establecer_stock
 from inventario.stock_trace import TRACE_IMPORTED_MOVEMENT, TRACE_IMPORT_INVENTORY, set_stock_trace
@@ -122,6 +120,8 @@ class CatalogMatcher:
             self.by_alias.setdefault(alias.nombre_normalizado, alias.insumo)
 
     def resolve(self, raw_name: str, fuzzy_threshold: int = 96) -> MatchResult:
+        from rapidfuzz import fuzz, process
+
         norm = normalizar_nombre(raw_name)
         if _is_ignored_name(norm):
             return MatchResult(insumo=None, metodo="IGNORED", score=0, nombre_normalizado=norm)
@@ -162,6 +162,8 @@ class CatalogMatcher:
 
 
 def _to_decimal(value: Any, default: str = "0") -> Decimal:
+    import pandas as pd
+
     try:
         if value is None:
             return Decimal(default)
@@ -188,6 +190,8 @@ def _as_text(value: Any) -> str:
 
 
 def _to_datetime(fecha_raw: Any, hora_raw: Any = None) -> datetime:
+    import pandas as pd
+
     if fecha_raw is None:
         return timezone.now()
 
@@ -304,6 +308,8 @@ def _get_or_create_missing_insumo(raw_name: str, unidad_texto: str) -> tuple[Ins
 
 
 def _read_inventory_rows(folder: Path) -> list[StockRow]:
+    import pandas as pd
+
     path = folder / INVENTARIO_FILE
     if not path.exists():
         return []
@@ -354,6 +360,8 @@ def _read_inventory_rows(folder: Path) -> list[StockRow]:
 
 
 def _read_entradas_rows(folder: Path) -> list[MovementRow]:
+    import pandas as pd
+
     path = folder / ENTRADAS_FILE
     if not path.exists():
         return []
@@ -396,6 +404,8 @@ def _read_entradas_rows(folder: Path) -> list[MovementRow]:
 
 
 def _read_salidas_rows(folder: Path) -> list[MovementRow]:
+    import pandas as pd
+
     path = folder / SALIDAS_FILE
     if not path.exists():
         return []
@@ -434,6 +444,8 @@ def _read_salidas_rows(folder: Path) -> list[MovementRow]:
 
 
 def _read_merma_rows(folder: Path) -> list[MovementRow]:
+    import pandas as pd
+
     path = folder / MERMA_FILE
     if not path.exists():
         return []
@@ -643,6 +655,7 @@ def _build_source_hash_stable(
 
 
 @transaction.atomic
+@audit_batch()
 def import_folder(
     folderpath: str,
     include_sources: set[str] | None = None,
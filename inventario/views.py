@@ -26,7 +26,6 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
-from openpyxl import Workbook, load_workbook
 
 from core.access import (
     ROLE_ADMIN,
@@ -499,6 +498,8 @@ def _map_alias_import_header(raw: str) -> str:
 
 
 def _read_alias_import_rows(uploaded: UploadedFile) -> list[dict]:
+    from openpyxl import load_workbook
+
     ext = Path(uploaded.name or "").suffix.lower()
     rows: list[dict] = []
 
@@ -1010,6 +1011,8 @@ def _export_cross_pending_csv(cross_unified_rows: list[dict]) -> HttpResponse:
 
 
 def _export_cross_pending_xlsx(cross_unified_rows: list[dict]) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "catalogo_pendientes"
@@ -1063,6 +1066,8 @@ def _export_cross_pending_xlsx(cross_unified_rows: list[dict]) -> HttpResponse:
 
 
 def _export_alias_template(export_format: str) -> HttpResponse:
+    from openpyxl import Workbook
+
     headers = ["alias", "insumo"]
     sample_rows = [
         ["Harina pastelera 25kg", "Harina Pastelera"],
@@ -1110,6 +1115,8 @@ def _export_aliases_catalog_csv(aliases_qs) -> HttpResponse:
 
 
 def _export_aliases_catalog_xlsx(aliases_qs) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "aliases_catalogo"
@@ -1153,6 +1160,8 @@ def _export_alias_import_preview_csv(preview_rows: list[dict]) -> HttpResponse:
 
 
 def _export_alias_import_preview_xlsx(preview_rows: list[dict]) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "aliases_import_preview"
@@ -2108,6 +2117,8 @@ def _export_master_duplicates_csv(groups: list[dict[str, object]]) -> HttpRespon
 
 
 def _export_master_duplicates_xlsx(groups: list[dict[str, object]]) -> HttpResponse:
+    from openpyxl import Workbook
+
     workbook = Workbook()
     sheet = workbook.active
     sheet.title = "duplicates"
@@ -6272,6 +6283,8 @@ def conteo_fisico_cerrar(request: HttpRequest, conteo_id: int) -> HttpResponse:
 
 @login_required
 def conteo_fisico_export(request: HttpRequest, conteo_id: int) -> HttpResponse:
+    from openpyxl import Workbook
+
     if not can_view_inventario(request.user):
         raise PermissionDenied("No tienes permisos para exportar conteo físico.")
     conteo = get_object_or_404(ConteoFisicoMensual, pk=conteo_id)
@@ -3,9 +3,6 @@ from __future__ import annotations
 from decimal import Decimal
 from io import BytesIO
 
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill
-
 
 VINO = "8B2252"
 DORADO = "C9A84C"
@@ -27,6 +24,8 @@ def _value(value):
 
 
 def _sheet(workbook, title, headers, rows):
+    from openpyxl.styles import Alignment, Font, PatternFill
+
     sheet = workbook.create_sheet(title)
     sheet.append(headers)
     for row in rows:
@@ -44,6 +43,8 @@ def _sheet(workbook, title, headers, rows):
 
 
 def build_indicadores_abasto_xlsx(report, filters):
+    from openpyxl import Workbook
+
     workbook = Workbook()
     workbook.remove(workbook.active)
     totals = report["totals"]
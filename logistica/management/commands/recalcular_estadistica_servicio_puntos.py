@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from logistica.services_estadistica_servicio import recalcular_estadisticas_servicio
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye EstadisticaServicioPunto (tiempo de surtido por punto) desde el "
+        "historial de paradas. Usar una vez tras el despliegue o para reparar deriva."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--punto", type=int, action="append", dest="puntos", help="Solo este punto (repetible)")
+
+    def handle(self, *args, **options):
+        puntos = options.get("puntos") or None
+        total = recalcular_estadisticas_servicio(puntos)
+        self.stdout.write(self.style.SUCCESS(f"Estadísticas de servicio recalculadas para {total} punto(s)."))
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistica', '0051_alter_solicituddomicilio_canal_origen'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paradaruta',
+            name='servicio_punto_contabilizado_id',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='paradaruta',
+            name='servicio_segundos_contabilizados',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='EstadisticaServicioPunto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('muestras', models.PositiveIntegerField(default=0)),
+                ('suma_segundos', models.FloatField(default=0)),
+                ('suma_cuadrados', models.FloatField(default=0)),
+                ('media_reciente_segundos', models.FloatField(blank=True, null=True)),
+                ('histograma', models.JSONField(blank=True, default=list)),
+                ('ultima_muestra_en', models.DateTimeField(blank=True, null=True)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('punto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='estadistica_servicio', to='logistica.puntologistico')),
+            ],
+            options={
+                'verbose_name': 'Estadística de servicio por punto',
+                'verbose_name_plural': 'Estadísticas de servicio por punto',
+            },
+        ),
+    ]
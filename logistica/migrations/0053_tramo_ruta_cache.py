@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistica', '0052_estadistica_servicio_punto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TramoRuta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origen_lat_clave', models.IntegerField()),
+                ('origen_lng_clave', models.IntegerField()),
+                ('destino_lat_clave', models.IntegerField()),
+                ('destino_lng_clave', models.IntegerField()),
+                ('franja_horaria', models.PositiveSmallIntegerField()),
+                ('distancia_metros', models.PositiveIntegerField(default=0)),
+                ('polyline', models.TextField(blank=True, default='')),
+                ('duracion_proveedor_segundos', models.PositiveIntegerField(blank=True, null=True)),
+                ('proveedor_consultado_en', models.DateTimeField(blank=True, null=True)),
+                ('observaciones', models.PositiveIntegerField(default=0)),
+                ('duracion_observada_segundos', models.FloatField(blank=True, null=True)),
+                ('observado_en', models.DateTimeField(blank=True, null=True)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tramo de ruta',
+                'verbose_name_plural': 'Tramos de ruta',
+            },
+        ),
+        migrations.AddField(
+            model_name='rutaentrega',
+            name='tramos_aprendidos_en',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='tramoruta',
+            constraint=models.UniqueConstraint(fields=('origen_lat_clave', 'origen_lng_clave', 'destino_lat_clave', 'destino_lng_clave', 'franja_horaria'), name='tramoruta_clave_franja_unica'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistica', '0053_tramo_ruta_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rutacargachecklist',
+            name='point_marca_agua',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='rutacargachecklist',
+            name='point_marca_agua_alcance',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+    ]
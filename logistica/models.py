@@ -70,6 +70,7 @@ class RutaEntrega(models.Model):
     ruta_programada_duracion_segundos = models.PositiveIntegerField(default=0)
     ruta_programada_fuente = models.CharField(max_length=20, blank=True, default="")
     ruta_programada_actualizada_en = models.DateTimeField(null=True, blank=True)
+    tramos_aprendidos_en = models.DateTimeField(null=True, blank=True, editable=False)
 
     total_entregas = models.PositiveIntegerField(default=0)
     entregas_completadas = models.PositiveIntegerField(default=0)
@@ -370,6 +371,10 @@ class ParadaRuta(models.Model):
     revision_entrega_resolucion = models.TextField(blank=True)
     distancia_llegada_metros = models.PositiveIntegerField(null=True, blank=True)
     notas = models.TextField(blank=True, default="")
+    # Lo que esta parada aporta hoy a EstadisticaServicioPunto, para aplicar
+    # solo la diferencia cuando se corrigen sus horas o cambia de punto.
+    servicio_segundos_contabilizados = models.FloatField(null=True, blank=True, editable=False)
+    servicio_punto_contabilizado_id = models.BigIntegerField(null=True, blank=True, editable=False)
     creado_en = models.DateTimeField(auto_now_add=True)
     actualizado_en = models.DateTimeField(auto_now=True)
 
@@ -399,6 +404,32 @@ class ParadaRuta(models.Model):
         super().save(*args, **kwargs)
 
 
+class EstadisticaServicioPunto(models.Model):
+    """
+    Tiempo de surtido (llegada → salida) acumulado por punto logístico.
+
+    Se mantiene incrementalmente desde ``ParadaRuta`` (ver
+    ``services_estadistica_servicio``) para leer promedio, desviación,
+    media reciente y percentiles sin recorrer el historial de paradas.
+    """
+
+    punto = models.OneToOneField(PuntoLogistico, on_delete=models.CASCADE, related_name="estadistica_servicio")
+    muestras = models.PositiveIntegerField(default=0)
+    suma_segundos = models.FloatField(default=0)
+    suma_cuadrados = models.FloatField(default=0)
+    media_reciente_segundos = models.FloatField(null=True, blank=True)
+    histograma = models.JSONField(default=list, blank=True)
+    ultima_muestra_en = models.DateTimeField(null=True, blank=True)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Estadística de servicio por punto"
+        verbose_name_plural = "Estadísticas de servicio por punto"
+
+    def __str__(self) -> str:
+        return f"{self.punto} · {self.muestras} muestras"
+
+
 class RutaCargaChecklist(models.Model):
     ESTATUS_PENDIENTE = "PENDIENTE"
     ESTATUS_EN_REVISION = "EN_REVISION"
@@ -423,6 +454,11 @@ class RutaCargaChecklist(models.Model):
         related_name="checklists_carga_ruta",
     )
     sincronizado_en = models.DateTimeField(null=True, blank=True)
+    # Marca de agua de la sincronización incremental con Point: toda PointTransferLine
+    # con updated_at anterior ya está aplicada; el alcance es la huella de
+    # fecha/sucursales/paradas que cubre.
+    point_marca_agua = models.DateTimeField(null=True, blank=True, editable=False)
+    point_marca_agua_alcance = models.CharField(max_length=40, blank=True, default="", editable=False)
     confirmado_por = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -780,6 +816,53 @@ class UbicacionRuta(models.Model):
         return f"{self.ruta.folio} · {self.timestamp_servidor:%Y-%m-%d %H:%M}"
 
 
+class TramoRuta(models.Model):
+    """
+    Caché de un tramo origen→destino entre paradas.
+
+    La clave son las coordenadas redondeadas (``LOGISTICA_TRAMO_PRECISION_DECIMALES``
+    decimales, guardadas como enteros) y la franja horaria de salida. Guarda la
+    geometría y duración del proveedor de ruteo y, aparte, la duración aprendida
+    de recorridos reales (``UbicacionRuta``) como media exponencial.
+    """
+
+    origen_lat_clave = models.IntegerField()
+    origen_lng_clave = models.IntegerField()
+    destino_lat_clave = models.IntegerField()
+    destino_lng_clave = models.IntegerField()
+    franja_horaria = models.PositiveSmallIntegerField()
+    distancia_metros = models.PositiveIntegerField(default=0)
+    polyline = models.TextField(blank=True, default="")
+    duracion_proveedor_segundos = models.PositiveIntegerField(null=True, blank=True)
+    proveedor_consultado_en = models.DateTimeField(null=True, blank=True)
+    observaciones = models.PositiveIntegerField(default=0)
+    duracion_observada_segundos = models.FloatField(null=True, blank=True)
+    observado_en = models.DateTimeField(null=True, blank=True)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Tramo de ruta"
+        verbose_name_plural = "Tramos de ruta"
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "origen_lat_clave",
+                    "origen_lng_clave",
+                    "destino_lat_clave",
+                    "destino_lng_clave",
+                    "franja_horaria",
+                ],
+                name="tramoruta_clave_franja_unica",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"({self.origen_lat_clave},{self.origen_lng_clave})→"
+            f"({self.destino_lat_clave},{self.destino_lng_clave}) franja {self.franja_horaria}"
+        )
+
+
 class EventoRuta(models.Model):
     TIPO_SALIDA = "SALIDA"
     TIPO_LLEGADA_GEOFENCE = "LLEGADA_GEOFENCE"
@@ -6,10 +6,11 @@ from decimal import Decimal, InvalidOperation
 import hashlib
 import json
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
-from django.db.models import Count, Prefetch, Q
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
@@ -315,22 +316,62 @@ def _superar_lineas_point_canceladas(
     return superadas
 
 
+def _fechas_point_ruta(fecha) -> list:
+    return [fecha - timedelta(days=1), fecha]
+
+
+def _alcance_marca_agua_point(ruta: RutaEntrega, paradas_by_branch: dict[int, ParadaRuta]) -> str:
+    contenido = ruta.fecha_ruta.isoformat() + "|" + ",".join(
+        f"{branch_id}:{parada.id}" for branch_id, parada in sorted(paradas_by_branch.items())
+    )
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+def _nueva_marca_agua_point():
+    # updated_at se fija al guardar, no al confirmar la transacción del sync de Point;
+    # la marca se queda atrás por un margen para no saltar líneas aún no visibles.
+    return timezone.now() - timedelta(seconds=settings.LOGISTICA_CARGA_POINT_MARGEN_SEGUNDOS)
+
+
 def _sincronizar_lineas_point_para_ruta(*, ruta: RutaEntrega, checklist: RutaCargaChecklist, solo_abiertas: bool = False) -> tuple[int, int, int]:
     paradas_by_branch = _paradas_por_sucursal(ruta)
     if not paradas_by_branch:
         return 0, 0, 0
 
     branch_ids = set(paradas_by_branch)
+    fechas = _fechas_point_ruta(ruta.fecha_ruta)
+    alcance = _alcance_marca_agua_point(ruta, paradas_by_branch)
+    marca_agua = _nueva_marca_agua_point()
     candidates_qs = (
         PointTransferLine.objects.select_related("erp_origin_branch", "erp_destination_branch", "origin_branch", "destination_branch")
         .filter(
             is_cancelled=False,
             is_current_snapshot=True,
-            registered_at__date__in=[ruta.fecha_ruta - timedelta(days=1), ruta.fecha_ruta],
+            registered_at__date__in=fechas,
         )
         .filter(erp_destination_branch_id__in=branch_ids)
         .order_by("transfer_external_id", "detail_external_id", "id")
     )
+    if checklist.point_marca_agua and checklist.point_marca_agua_alcance == alcance:
+        # Sincronización incremental: sólo líneas Point que cambiaron desde la marca,
+        # más las que otra ruta liberó al archivar su reserva.
+        desde = checklist.point_marca_agua
+        candidates_qs = candidates_qs.filter(
+            Q(updated_at__gte=desde)
+            | Q(
+                id__in=RutaCargaChecklistLinea.objects.filter(
+                    estatus=RutaCargaChecklistLinea.ESTATUS_SUPERADA,
+                    actualizado_en__gte=desde,
+                    point_transfer_line__isnull=False,
+                ).values("point_transfer_line_id")
+            )
+        )
+        if (
+            not candidates_qs.exists()
+            and not checklist.lineas.filter(point_transfer_line__updated_at__gte=desde).exists()
+        ):
+            _guardar_marca_agua_point(checklist, marca_agua=marca_agua, alcance=alcance)
+            return 0, 0, 0
 
     # _actualizar_checklist_carga_desde_point abre la transacción que contiene esta
     # función. Bloquear primero las líneas Point serializa dos rutas que intenten
@@ -658,30 +699,47 @@ def _sincronizar_lineas_point_para_ruta(*, ruta: RutaEntrega, checklist: RutaCar
     actualizadas += _superar_lineas_point_canceladas(
         lineas=checklist_lines,
     )
+    _guardar_marca_agua_point(checklist, marca_agua=marca_agua, alcance=alcance)
     return creadas, actualizadas, omitidas
 
 
+def _guardar_marca_agua_point(checklist: RutaCargaChecklist, *, marca_agua, alcance: str) -> None:
+    checklist.point_marca_agua = marca_agua
+    checklist.point_marca_agua_alcance = alcance
+    checklist.save(update_fields=["point_marca_agua", "point_marca_agua_alcance", "actualizado_en"])
+
+
 def ruta_tiene_movimiento_point_nuevo(*, fecha, puntos: list[PuntoLogistico]) -> bool:
     branch_ids = {punto.sucursal_id for punto in puntos if punto.tipo != PuntoLogistico.TIPO_CEDIS and punto.sucursal_id}
     if not branch_ids:
         return True
+    # Mismo criterio que point_transfer_enviada, expresado en SQL.
     base_qs = (
         PointTransferLine.objects.filter(
             is_cancelled=False,
             is_current_snapshot=True,
-            registered_at__date__in=[fecha - timedelta(days=1), fecha],
+            registered_at__date__in=_fechas_point_ruta(fecha),
         )
-        .exclude(source_hash__in=RutaCargaChecklistLinea.objects.exclude(source_hash="").values("source_hash"))
+        .filter(Q(sent_at__isnull=False) | Q(raw_payload__transfer__isEnviado=True))
+        .exclude(Exists(RutaCargaChecklistLinea.objects.filter(source_hash=OuterRef("source_hash"))))
     )
-    sucursales_con_movimiento = set()
-    for linea in base_qs.iterator():
-        if not point_transfer_enviada(linea):
-            continue
-        if linea.erp_origin_branch_id:
-            sucursales_con_movimiento.add(linea.erp_origin_branch_id)
-        if linea.erp_destination_branch_id:
-            sucursales_con_movimiento.add(linea.erp_destination_branch_id)
-    return branch_ids.issubset(sucursales_con_movimiento)
+    checklists_del_dia = RutaCargaChecklist.objects.filter(ruta__fecha_ruta=fecha).exclude(
+        ruta__estatus=RutaEntrega.ESTATUS_CANCELADA
+    )
+    for branch_id in branch_ids:
+        # Lo que ya quedó bajo la marca de agua de un checklist de la sucursal fue
+        # revisado por esa sincronización; sólo lo posterior cuenta como movimiento nuevo.
+        marcas = set(
+            checklists_del_dia.filter(ruta__paradas__punto__sucursal_id=branch_id).values_list(
+                "point_marca_agua", flat=True
+            )
+        )
+        destino = Q(erp_destination_branch_id=branch_id)
+        if marcas and None not in marcas:
+            destino &= Q(updated_at__gte=min(marcas))
+        if not base_qs.filter(destino | Q(erp_origin_branch_id=branch_id)).exists():
+            return False
+    return True
 
 
 def _sincronizar_lineas_consolidado_para_ruta(*, ruta: RutaEntrega, checklist: RutaCargaChecklist) -> tuple[int, int, int]:
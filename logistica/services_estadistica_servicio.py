@@ -0,0 +1,267 @@
+"""
+Estadísticas de tiempo de surtido por punto logístico.
+
+Cada ``ParadaRuta`` con llegada y salida reales aporta una muestra
+(segundos entre ambas) a ``EstadisticaServicioPunto`` de su punto. La tabla se
+mantiene incrementalmente: al guardar una parada se aplica solo la diferencia
+contra lo que ya tenía contabilizado (``servicio_segundos_contabilizados``), y
+al borrarla se retira su muestra.
+
+Se guardan conteo, suma, suma de cuadrados, una media exponencial (más peso a
+lo reciente) y un histograma de buckets fijos para percentiles. Con eso el
+resumen de ruta, las ETAs y el despacho leen promedio/percentiles en O(1).
+
+La media reciente solo avanza cuando una parada se contabiliza por primera
+vez; las correcciones posteriores ajustan conteo, suma e histograma.
+``recalcular_estadisticas_servicio`` reconstruye todo desde el historial.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from .models import EstadisticaServicioPunto, ParadaRuta
+
+ALFA_MEDIA_RECIENTE = 0.2
+# Límite superior (minutos) de cada bucket; el último recoge todo lo mayor.
+LIMITES_HISTOGRAMA_MINUTOS = (1, 2, 3, 5, 7, 10, 12, 15, 20, 25, 30, 40, 50, 60, 90, 120, 180, 240)
+
+
+@dataclass(frozen=True)
+class ServicioPunto:
+    muestras: int
+    promedio_segundos: float
+    desviacion_segundos: float
+    media_reciente_segundos: float | None
+    p50_segundos: float | None
+    p90_segundos: float | None
+
+    @property
+    def promedio_minutos(self) -> int:
+        return max(int(round(self.promedio_segundos / 60)), 0)
+
+
+def duracion_servicio_segundos(parada: ParadaRuta) -> float | None:
+    if not parada.hora_llegada_real or not parada.hora_salida_real:
+        return None
+    segundos = (parada.hora_salida_real - parada.hora_llegada_real).total_seconds()
+    return segundos if segundos > 0 else None
+
+
+def _indice_bucket(segundos: float) -> int:
+    minutos = segundos / 60
+    for index, limite in enumerate(LIMITES_HISTOGRAMA_MINUTOS):
+        if minutos <= limite:
+            return index
+    return len(LIMITES_HISTOGRAMA_MINUTOS)
+
+
+def _histograma_vacio() -> list[int]:
+    return [0] * (len(LIMITES_HISTOGRAMA_MINUTOS) + 1)
+
+
+def _aplicar_muestra(estadistica: EstadisticaServicioPunto, segundos: float, signo: int) -> None:
+    histograma = list(estadistica.histograma or [])
+    if len(histograma) != len(LIMITES_HISTOGRAMA_MINUTOS) + 1:
+        histograma = _histograma_vacio()
+    index = _indice_bucket(segundos)
+    histograma[index] = max(histograma[index] + signo, 0)
+    estadistica.histograma = histograma
+    estadistica.muestras = max(estadistica.muestras + signo, 0)
+    if estadistica.muestras == 0:
+        estadistica.suma_segundos = 0.0
+        estadistica.suma_cuadrados = 0.0
+        estadistica.media_reciente_segundos = None
+        return
+    estadistica.suma_segundos = max(estadistica.suma_segundos + signo * segundos, 0.0)
+    estadistica.suma_cuadrados = max(estadistica.suma_cuadrados + signo * segundos * segundos, 0.0)
+
+
+def _avanzar_media_reciente(estadistica: EstadisticaServicioPunto, segundos: float) -> None:
+    previa = estadistica.media_reciente_segundos
+    estadistica.media_reciente_segundos = (
+        segundos if previa is None else ALFA_MEDIA_RECIENTE * segundos + (1 - ALFA_MEDIA_RECIENTE) * previa
+    )
+
+
+def _estadistica_bloqueada(punto_id: int) -> EstadisticaServicioPunto:
+    estadistica, _ = EstadisticaServicioPunto.objects.select_for_update().get_or_create(
+        punto_id=punto_id,
+        defaults={"histograma": _histograma_vacio()},
+    )
+    return estadistica
+
+
+def sincronizar_parada(parada: ParadaRuta) -> None:
+    """Aplica a las estadísticas el cambio en la duración de ``parada``."""
+    nueva = duracion_servicio_segundos(parada)
+    nuevo_punto = parada.punto_id if nueva is not None else None
+    if nueva == parada.servicio_segundos_contabilizados and nuevo_punto == parada.servicio_punto_contabilizado_id:
+        return
+
+    with transaction.atomic():
+        previa, previo_punto = (
+            ParadaRuta.objects.select_for_update()
+            .filter(pk=parada.pk)
+            .values_list("servicio_segundos_contabilizados", "servicio_punto_contabilizado_id")
+            .first()
+            or (None, None)
+        )
+        if previa == nueva and previo_punto == nuevo_punto:
+            return
+        misma_muestra_corregida = previa is not None and nueva is not None and nuevo_punto == previo_punto
+        if previa is not None and previo_punto:
+            estadistica = _estadistica_bloqueada(previo_punto)
+            _aplicar_muestra(estadistica, previa, -1)
+            if misma_muestra_corregida:
+                _aplicar_muestra(estadistica, nueva, +1)
+            estadistica.save()
+        if nueva is not None and not misma_muestra_corregida:
+            estadistica = _estadistica_bloqueada(nuevo_punto)
+            _aplicar_muestra(estadistica, nueva, +1)
+            _avanzar_media_reciente(estadistica, nueva)
+            if estadistica.ultima_muestra_en is None or parada.hora_salida_real > estadistica.ultima_muestra_en:
+                estadistica.ultima_muestra_en = parada.hora_salida_real
+            estadistica.save()
+        ParadaRuta.objects.filter(pk=parada.pk).update(
+            servicio_segundos_contabilizados=nueva,
+            servicio_punto_contabilizado_id=nuevo_punto,
+        )
+    parada.servicio_segundos_contabilizados = nueva
+    parada.servicio_punto_contabilizado_id = nuevo_punto
+
+
+def retirar_parada(parada: ParadaRuta) -> None:
+    """Quita la muestra de una parada que se borra."""
+    if parada.servicio_segundos_contabilizados is None or not parada.servicio_punto_contabilizado_id:
+        return
+    with transaction.atomic():
+        estadistica = (
+            EstadisticaServicioPunto.objects.select_for_update()
+            .filter(punto_id=parada.servicio_punto_contabilizado_id)
+            .first()
+        )
+        if estadistica is None:
+            return
+        _aplicar_muestra(estadistica, parada.servicio_segundos_contabilizados, -1)
+        estadistica.save()
+
+
+def _percentil(histograma: list[int], total: int, cuantil: float) -> float | None:
+    if total <= 0:
+        return None
+    objetivo = cuantil * total
+    acumulado = 0
+    limite_inferior = 0.0
+    for index, cantidad in enumerate(histograma):
+        limite_superior = (
+            LIMITES_HISTOGRAMA_MINUTOS[index] * 60.0
+            if index < len(LIMITES_HISTOGRAMA_MINUTOS)
+            else LIMITES_HISTOGRAMA_MINUTOS[-1] * 60.0 * 1.5
+        )
+        if cantidad and acumulado + cantidad >= objetivo:
+            fraccion = (objetivo - acumulado) / cantidad
+            return limite_inferior + fraccion * (limite_superior - limite_inferior)
+        acumulado += cantidad
+        limite_inferior = limite_superior
+    return limite_inferior
+
+
+def resumen_servicio(
+    estadistica: EstadisticaServicioPunto | None,
+    *,
+    excluir_segundos: float | None = None,
+) -> ServicioPunto | None:
+    """
+    Resumen de una estadística. ``excluir_segundos`` descuenta una muestra ya
+    contabilizada (p. ej. la parada que se está mostrando).
+    """
+    if estadistica is None:
+        return None
+    muestras = estadistica.muestras
+    suma = estadistica.suma_segundos
+    cuadrados = estadistica.suma_cuadrados
+    histograma = list(estadistica.histograma or [])
+    if excluir_segundos is not None and muestras > 0:
+        muestras -= 1
+        suma -= excluir_segundos
+        cuadrados -= excluir_segundos * excluir_segundos
+        if len(histograma) == len(LIMITES_HISTOGRAMA_MINUTOS) + 1:
+            index = _indice_bucket(excluir_segundos)
+            histograma[index] = max(histograma[index] - 1, 0)
+    if muestras <= 0:
+        return None
+    promedio = max(suma / muestras, 0.0)
+    varianza = max(cuadrados / muestras - promedio * promedio, 0.0)
+    return ServicioPunto(
+        muestras=muestras,
+        promedio_segundos=promedio,
+        desviacion_segundos=math.sqrt(varianza),
+        media_reciente_segundos=estadistica.media_reciente_segundos,
+        p50_segundos=_percentil(histograma, muestras, 0.5),
+        p90_segundos=_percentil(histograma, muestras, 0.9),
+    )
+
+
+def estadisticas_por_punto(punto_ids: Iterable[int]) -> dict[int, EstadisticaServicioPunto]:
+    ids = {punto_id for punto_id in punto_ids if punto_id}
+    if not ids:
+        return {}
+    return {item.punto_id: item for item in EstadisticaServicioPunto.objects.filter(punto_id__in=ids)}
+
+
+def recalcular_estadisticas_servicio(punto_ids: Iterable[int] | None = None, *, chunk_size: int = 2000) -> int:
+    """
+    Reconstruye las estadísticas desde el historial de paradas (backfill o
+    reparación). Devuelve el número de puntos recalculados.
+    """
+    if punto_ids is not None:
+        punto_ids = list(punto_ids)
+    paradas = ParadaRuta.objects.all()
+    if punto_ids is not None:
+        paradas = paradas.filter(punto_id__in=punto_ids)
+
+    estadisticas: dict[int, EstadisticaServicioPunto] = {}
+    contabilizadas: list[ParadaRuta] = []
+    rows = paradas.order_by("punto_id", "hora_salida_real", "id").values_list(
+        "id",
+        "punto_id",
+        "hora_llegada_real",
+        "hora_salida_real",
+        "servicio_segundos_contabilizados",
+        "servicio_punto_contabilizado_id",
+    )
+    for parada_id, punto_id, llegada, salida, previa, previo_punto in rows.iterator(chunk_size=chunk_size):
+        estadistica = estadisticas.get(punto_id)
+        if estadistica is None:
+            estadistica = estadisticas[punto_id] = EstadisticaServicioPunto(punto_id=punto_id, histograma=_histograma_vacio())
+        segundos = None
+        if llegada and salida:
+            segundos = (salida - llegada).total_seconds()
+            segundos = segundos if segundos > 0 else None
+        if segundos is not None:
+            _aplicar_muestra(estadistica, segundos, +1)
+            _avanzar_media_reciente(estadistica, segundos)
+            estadistica.ultima_muestra_en = salida
+        nuevo_punto = punto_id if segundos is not None else None
+        if previa != segundos or previo_punto != nuevo_punto:
+            contabilizadas.append(
+                ParadaRuta(pk=parada_id, servicio_segundos_contabilizados=segundos, servicio_punto_contabilizado_id=nuevo_punto)
+            )
+
+    existentes = EstadisticaServicioPunto.objects.all()
+    if punto_ids is not None:
+        existentes = existentes.filter(punto_id__in=punto_ids)
+    with transaction.atomic():
+        existentes.delete()
+        EstadisticaServicioPunto.objects.bulk_create(list(estadisticas.values()), batch_size=500)
+        ParadaRuta.objects.bulk_update(
+            contabilizadas,
+            ["servicio_segundos_contabilizados", "servicio_punto_contabilizado_id"],
+            batch_size=chunk_size,
+        )
+    return len(estadisticas)
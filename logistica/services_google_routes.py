@@ -8,7 +8,15 @@ from django.conf import settings
 from django.utils import timezone
 
 from .models import RutaEntrega
-from .services_rutas_control import distancia_metros
+from .services_tramos_ruta import (
+    FUENTE_FALLBACK,
+    Proveedor,
+    TramoProveedor,
+    TramoResuelto,
+    codificar_polyline,
+    decodificar_polyline,
+    resolver_tramos,
+)
 
 
 @dataclass(frozen=True)
@@ -41,21 +49,8 @@ def _fallback_polyline(coords: list[tuple[float, float]]) -> str:
     return "|".join(f"{lat:.6f},{lng:.6f}" for lat, lng in coords)
 
 
-def _fallback_route(coords: list[tuple[float, float]]) -> RutaProgramadaResult:
-    distancia = 0
-    for origin, destination in zip(coords, coords[1:]):
-        distancia += distancia_metros(Decimal(str(origin[0])), Decimal(str(origin[1])), Decimal(str(destination[0])), Decimal(str(destination[1])))
-    velocidad_kmh = max(int(getattr(settings, "LOGISTICA_FALLBACK_SPEED_KMH", 35) or 35), 1)
-    duracion_segundos = int(round((distancia / 1000) / velocidad_kmh * 3600)) if distancia else 0
-    return RutaProgramadaResult(
-        polyline=_fallback_polyline(coords),
-        distancia_metros=distancia,
-        duracion_segundos=duracion_segundos,
-        fuente="FALLBACK",
-    )
-
-
-def _google_route(coords: list[tuple[float, float]]) -> RutaProgramadaResult | None:
+def _google_route_legs(coords: list[tuple[float, float]]) -> list[TramoProveedor] | None:
+    """Pide a Google Routes la ruta por ``coords`` y devuelve un dato por tramo."""
     api_key = getattr(settings, "GOOGLE_SERVER_API_KEY", "")
     if not api_key or len(coords) < 2:
         return None
@@ -77,7 +72,7 @@ def _google_route(coords: list[tuple[float, float]]) -> RutaProgramadaResult | N
     headers = {
         "Content-Type": "application/json",
         "X-Goog-Api-Key": api_key,
-        "X-Goog-FieldMask": "routes.duration,routes.distanceMeters,routes.polyline.encodedPolyline",
+        "X-Goog-FieldMask": "routes.legs.duration,routes.legs.distanceMeters,routes.legs.polyline.encodedPolyline",
     }
 
     try:
@@ -96,21 +91,72 @@ def _google_route(coords: list[tuple[float, float]]) -> RutaProgramadaResult | N
     routes = data.get("routes") or []
     if not routes:
         return None
-    route = routes[0]
+    legs = routes[0].get("legs") or []
+    if len(legs) != len(coords) - 1:
+        return None
+    return [
+        TramoProveedor(
+            distancia_metros=int(leg.get("distanceMeters") or 0),
+            duracion_segundos=_duration_seconds(leg.get("duration")),
+            polyline=((leg.get("polyline") or {}).get("encodedPolyline") or ""),
+        )
+        for leg in legs
+    ]
+
+
+def _proveedor_configurado() -> Proveedor | None:
+    return _google_route_legs if getattr(settings, "GOOGLE_SERVER_API_KEY", "") else None
+
+
+def _ensamblar_ruta(tramos: list[TramoResuelto]) -> RutaProgramadaResult:
+    """
+    Une los tramos. Si todos traen geometría del proveedor la polyline sale
+    codificada (``GOOGLE``); si no, como lista ``lat,lng|...`` con los puntos
+    conocidos y línea recta en los tramos sin geometría.
+    """
+    puntos: list[tuple[float, float]] = []
+    for tramo in tramos:
+        segmento = decodificar_polyline(tramo.polyline) if tramo.tiene_geometria else [tramo.origen, tramo.destino]
+        if puntos and segmento and puntos[-1] == segmento[0]:
+            segmento = segmento[1:]
+        puntos.extend(segmento)
+
+    if all(tramo.tiene_geometria for tramo in tramos):
+        polyline, fuente = codificar_polyline(puntos), "GOOGLE"
+    else:
+        polyline = _fallback_polyline(puntos)
+        sin_cache = all(tramo.fuente_duracion == FUENTE_FALLBACK and not tramo.tiene_geometria for tramo in tramos)
+        fuente = "FALLBACK" if sin_cache else "CACHE"
     return RutaProgramadaResult(
-        polyline=((route.get("polyline") or {}).get("encodedPolyline") or _fallback_polyline(coords)),
-        distancia_metros=int(route.get("distanceMeters") or 0),
-        duracion_segundos=_duration_seconds(route.get("duration")),
-        fuente="GOOGLE",
+        polyline=polyline,
+        distancia_metros=sum(tramo.distancia_metros for tramo in tramos),
+        duracion_segundos=sum(tramo.duracion_segundos for tramo in tramos),
+        fuente=fuente,
     )
 
 
-def recalcular_ruta_programada(ruta: RutaEntrega) -> RutaProgramadaResult:
+def _momento_ruta(ruta: RutaEntrega):
+    if ruta.hora_inicio_real:
+        return ruta.hora_inicio_real
+    primera = ruta.paradas.exclude(hora_estimada__isnull=True).order_by("orden", "id").values_list("hora_estimada", flat=True).first()
+    return primera or timezone.now()
+
+
+def recalcular_ruta_programada(ruta: RutaEntrega, *, proveedor: Proveedor | None = None) -> RutaProgramadaResult:
+    """
+    Recalcula geometría y duración de la ruta armándola desde la caché de
+    tramos; solo consulta al proveedor (Google por defecto) los tramos que faltan.
+    """
     coords = _coords_for_ruta(ruta)
     if len(coords) < 2:
         result = RutaProgramadaResult(polyline=_fallback_polyline(coords), distancia_metros=0, duracion_segundos=0, fuente="FALLBACK")
     else:
-        result = _google_route(coords) or _fallback_route(coords)
+        tramos = resolver_tramos(
+            coords,
+            momento=_momento_ruta(ruta),
+            proveedor=proveedor or _proveedor_configurado(),
+        )
+        result = _ensamblar_ruta(tramos)
 
     ruta.ruta_programada_polyline = result.polyline
     ruta.ruta_programada_distancia_metros = result.distancia_metros
@@ -0,0 +1,279 @@
+"""
+Estado vivo de rutas en curso alimentado por las señales GPS.
+
+Cada ruta guarda en caché (Redis en producción) dos piezas:
+
+- ``posicion``: última señal aceptada, si fue confiable y la velocidad móvil.
+  La escribe la aceptación de la señal al confirmar la transacción y sirve
+  para validar saltos de la siguiente señal sin consultar el historial.
+- ``geocerca``: parada candidata con su temporizador de permanencia, siguiente
+  parada pendiente con ETA y los últimos eventos emitidos (llegada, salida,
+  visita). La escribe el procesador de geocercas.
+
+Con ``LOGISTICA_RUTA_ESTADO_ASINCRONO`` la aceptación solo guarda la
+``UbicacionRuta`` con sus alertas de confiabilidad y encola
+``logistica.tasks.procesar_ubicacion_ruta``. El procesador evalúa geocercas y
+solo escribe en base los eventos durables (llegada, visita, desvío, recarga
+CEDIS); el temporizador de permanencia evita buscar la llegada en base hasta
+que la parada candidata cumplió los minutos requeridos. Sin la bandera todo
+corre en línea como antes y el estado vivo se actualiza igual para el mapa.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .domain_ruta import parada_resuelta_operativamente
+from .models import ParadaRuta, RutaEntrega, UbicacionRuta
+from .services_rutas_control import (
+    GEOCERCA_PERMANENCIA_VISITA_MINUTOS,
+    distancia_metros,
+    evaluar_geocercas,
+    procesar_geocercas_ubicacion,
+)
+
+logger = logging.getLogger(__name__)
+
+ESTADO_CACHE_PREFIX = "erp:ruta-estado"
+ALFA_VELOCIDAD = 0.4
+# Debajo de esto la unidad está detenida; el ETA usa la velocidad de respaldo.
+VELOCIDAD_MINIMA_MOVIMIENTO_KMH = 5
+MAX_EVENTOS_ESTADO = 20
+
+EVENTO_LLEGADA = "llegada"
+EVENTO_SALIDA = "salida"
+EVENTO_VISITA = "visita"
+
+
+def procesamiento_asincrono_habilitado() -> bool:
+    return bool(getattr(settings, "LOGISTICA_RUTA_ESTADO_ASINCRONO", False))
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "LOGISTICA_RUTA_ESTADO_TTL_SECONDS", 18 * 60 * 60) or 18 * 60 * 60)
+
+
+def _clave(ruta_id: int, pieza: str) -> str:
+    return f"{ESTADO_CACHE_PREFIX}:{ruta_id}:{pieza}"
+
+
+def _leer(claves: list[str]) -> dict:
+    try:
+        return cache.get_many(claves)
+    except Exception:
+        logger.warning("No se pudo leer el estado vivo de rutas", exc_info=True)
+        return {}
+
+
+def _guardar(clave: str, valor: dict) -> None:
+    try:
+        cache.set(clave, valor, timeout=_ttl())
+    except Exception:
+        logger.warning("No se pudo guardar el estado vivo %s", clave, exc_info=True)
+
+
+def _momento(ubicacion: UbicacionRuta) -> datetime:
+    return ubicacion.timestamp_dispositivo or ubicacion.timestamp_servidor
+
+
+def posicion_previa(ruta_id: int) -> tuple | None:
+    """``(latitud, longitud, momento)`` de la última señal conocida en el estado vivo."""
+    clave = _clave(ruta_id, "posicion")
+    posicion = _leer([clave]).get(clave)
+    if not posicion:
+        return None
+    return (
+        Decimal(posicion["latitud"]),
+        Decimal(posicion["longitud"]),
+        datetime.fromisoformat(posicion["momento"]),
+    )
+
+
+def registrar_posicion(ubicacion: UbicacionRuta, *, confiable: bool) -> None:
+    """Actualiza la última posición y la velocidad móvil al confirmar la señal."""
+
+    def guardar():
+        clave = _clave(ubicacion.ruta_id, "posicion")
+        previa = _leer([clave]).get(clave) or {}
+        momento = _momento(ubicacion)
+        velocidad = previa.get("velocidad_kmh")
+        if confiable and previa.get("confiable"):
+            segundos = (momento - datetime.fromisoformat(previa["momento"])).total_seconds()
+            if segundos > 0:
+                metros = distancia_metros(previa["latitud"], previa["longitud"], ubicacion.latitud, ubicacion.longitud)
+                muestra = (metros / 1000) / (segundos / 3600)
+                velocidad = muestra if velocidad is None else velocidad + ALFA_VELOCIDAD * (muestra - velocidad)
+        elif velocidad is None and ubicacion.velocidad_kmh is not None:
+            velocidad = float(ubicacion.velocidad_kmh)
+        _guardar(
+            clave,
+            {
+                "ubicacion_id": ubicacion.id,
+                "latitud": str(ubicacion.latitud),
+                "longitud": str(ubicacion.longitud),
+                "momento": momento.isoformat(),
+                "confiable": confiable,
+                "velocidad_kmh": round(velocidad, 1) if velocidad is not None else None,
+            },
+        )
+
+    transaction.on_commit(guardar)
+
+
+def encolar_geocercas_ubicacion(*, ubicacion: UbicacionRuta, user, contexto: dict) -> None:
+    user_id = getattr(user, "id", None)
+
+    def encolar():
+        from .tasks import procesar_ubicacion_ruta
+
+        try:
+            procesar_ubicacion_ruta.delay(ubicacion.id, user_id=user_id, contexto=contexto)
+        except Exception:
+            logger.exception(
+                "No se pudo encolar procesar_ubicacion_ruta para ubicación %s; se procesa en línea.",
+                ubicacion.id,
+            )
+            procesar_ubicacion_pendiente(ubicacion.id, user_id=user_id, contexto=contexto)
+
+    transaction.on_commit(encolar)
+
+
+def procesar_ubicacion_pendiente(ubicacion_id: int, *, user_id: int | None = None, contexto: dict) -> dict:
+    """Procesa una señal encolada con la ruta bloqueada, como lo haría la aceptación en línea."""
+    with transaction.atomic():
+        ubicacion = UbicacionRuta.objects.filter(pk=ubicacion_id).first()
+        if ubicacion is None:
+            return {"estado": "no_encontrada", "ubicacion_id": ubicacion_id}
+        ruta = RutaEntrega.objects.select_for_update().get(pk=ubicacion.ruta_id)
+        if ruta.estatus != RutaEntrega.ESTATUS_EN_RUTA:
+            return {"estado": "ruta_no_activa", "ubicacion_id": ubicacion_id, "ruta_id": ruta.id}
+        user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+        estado = procesar_ubicacion(ruta=ruta, ubicacion=ubicacion, user=user, asincrono=True, **contexto)
+    return {
+        "estado": "fuera_de_orden" if estado.get("ubicacion_id") != ubicacion_id else "procesada",
+        "ubicacion_id": ubicacion_id,
+        "ruta_id": ruta.id,
+        "eventos": [evento["tipo"] for evento in estado.get("eventos_nuevos", [])],
+    }
+
+
+def _eta_siguiente(parada: ParadaRuta | None, ubicacion: UbicacionRuta, velocidad_kmh, momento: datetime) -> dict | None:
+    if parada is None:
+        return None
+    distancia = distancia_metros(ubicacion.latitud, ubicacion.longitud, parada.latitud_geocerca, parada.longitud_geocerca)
+    if velocidad_kmh is None or velocidad_kmh < VELOCIDAD_MINIMA_MOVIMIENTO_KMH:
+        velocidad_kmh = max(int(getattr(settings, "LOGISTICA_FALLBACK_SPEED_KMH", 35) or 35), 1)
+    segundos = int(round((distancia / 1000) / velocidad_kmh * 3600))
+    return {
+        "parada_id": parada.id,
+        "orden": parada.orden,
+        "nombre": parada.punto_nombre_snapshot,
+        "distancia_metros": distancia,
+        "velocidad_kmh": round(float(velocidad_kmh), 1),
+        "eta_minutos": math.ceil(segundos / 60),
+        "eta_en": (momento + timedelta(seconds=segundos)).isoformat(),
+    }
+
+
+def procesar_ubicacion(
+    *,
+    ruta: RutaEntrega,
+    ubicacion: UbicacionRuta,
+    user,
+    ubicacion_confiable: bool,
+    tracking_origen: str,
+    fuera_de_ruta_confirmado: bool = False,
+    desvio_motivo: str = "",
+    asincrono: bool = False,
+) -> dict:
+    """Aplica geocercas a una señal guardada y devuelve el estado vivo resultante.
+
+    En modo asíncrono una señal más vieja que la última procesada se descarta, y
+    la búsqueda de la llegada en base espera a que la parada candidata cumpla
+    la permanencia según el estado vivo.
+    """
+    clave_geocerca = _clave(ruta.id, "geocerca")
+    clave_posicion = _clave(ruta.id, "posicion")
+    guardado = _leer([clave_geocerca, clave_posicion])
+    estado = guardado.get(clave_geocerca) or {}
+    if asincrono and estado.get("ubicacion_id", 0) > ubicacion.id:
+        return estado
+
+    paradas = list(ruta.paradas.select_related("punto").order_by("orden", "id"))
+    resultado = evaluar_geocercas(ruta, ubicacion.latitud, ubicacion.longitud, paradas=paradas)
+    momento = _momento(ubicacion)
+    dentro = resultado.parada if resultado.parada and resultado.dentro and ubicacion_confiable else None
+
+    eventos = []
+    candidata = estado.get("candidata")
+    if candidata and ubicacion_confiable and (dentro is None or candidata["parada_id"] != dentro.id):
+        eventos.append({"tipo": EVENTO_SALIDA, "parada_id": candidata["parada_id"], "en": momento.isoformat()})
+        candidata = None
+    if dentro is not None and candidata is None:
+        candidata = {"parada_id": dentro.id, "desde": momento.isoformat()}
+        eventos.append({"tipo": EVENTO_LLEGADA, "parada_id": dentro.id, "en": momento.isoformat()})
+
+    verificar_permanencia = True
+    if asincrono and candidata is not None:
+        limite = momento - timedelta(minutes=GEOCERCA_PERMANENCIA_VISITA_MINUTOS)
+        verificar_permanencia = datetime.fromisoformat(candidata["desde"]) <= limite
+    ya_visitada = dentro is not None and dentro.estado == ParadaRuta.ESTADO_VISITADA
+
+    procesar_geocercas_ubicacion(
+        ruta=ruta,
+        ubicacion=ubicacion,
+        user=user,
+        resultado=resultado,
+        ubicacion_confiable=ubicacion_confiable,
+        tracking_origen=tracking_origen,
+        fuera_de_ruta_confirmado=fuera_de_ruta_confirmado,
+        desvio_motivo=desvio_motivo,
+        paradas=paradas,
+        verificar_permanencia=verificar_permanencia,
+    )
+    if dentro is not None and not ya_visitada and dentro.estado == ParadaRuta.ESTADO_VISITADA:
+        eventos.append({"tipo": EVENTO_VISITA, "parada_id": dentro.id, "en": momento.isoformat()})
+
+    velocidad = (guardado.get(clave_posicion) or {}).get("velocidad_kmh")
+    siguiente = next((parada for parada in paradas if not parada_resuelta_operativamente(parada)), None)
+    nuevo = {
+        "ubicacion_id": ubicacion.id,
+        "candidata": candidata,
+        "siguiente_parada": _eta_siguiente(siguiente, ubicacion, velocidad, momento),
+        "paradas_pendientes": sum(1 for parada in paradas if not parada_resuelta_operativamente(parada)),
+        "eventos": (list(reversed(eventos)) + estado.get("eventos", []))[:MAX_EVENTOS_ESTADO],
+        "actualizado_en": timezone.now().isoformat(),
+    }
+    transaction.on_commit(lambda: _guardar(clave_geocerca, nuevo))
+    return {**nuevo, "eventos_nuevos": eventos}
+
+
+def estados_rutas(ruta_ids) -> dict[int, dict]:
+    """Estado vivo de varias rutas en una sola lectura de caché, para el mapa."""
+    ruta_ids = list(ruta_ids)
+    claves = {ruta_id: (_clave(ruta_id, "posicion"), _clave(ruta_id, "geocerca")) for ruta_id in ruta_ids}
+    guardado = _leer([clave for par in claves.values() for clave in par])
+    estados = {}
+    for ruta_id, (clave_posicion, clave_geocerca) in claves.items():
+        posicion = guardado.get(clave_posicion)
+        geocerca = guardado.get(clave_geocerca) or {}
+        if not posicion and not geocerca:
+            continue
+        estados[ruta_id] = {
+            "posicion": posicion,
+            "candidata": geocerca.get("candidata"),
+            "siguiente_parada": geocerca.get("siguiente_parada"),
+            "paradas_pendientes": geocerca.get("paradas_pendientes"),
+            "eventos": geocerca.get("eventos", []),
+            "actualizado_en": geocerca.get("actualizado_en") or (posicion or {}).get("momento"),
+        }
+    return estados
@@ -309,13 +309,15 @@ def distancia_metros(lat1, lon1, lat2, lon2) -> int:
     return int(round(radius * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))))
 
 
-def evaluar_geocercas(ruta: RutaEntrega, latitud, longitud) -> GeocercaResultado:
+def evaluar_geocercas(ruta: RutaEntrega, latitud, longitud, *, paradas=None) -> GeocercaResultado:
     elegible_mas_cercana: ParadaRuta | None = None
     distancia_elegible: int | None = None
     planeada_mas_cercana: ParadaRuta | None = None
     distancia_planeada: int | None = None
     dentro_geocerca_planeada = False
-    for parada in ruta.paradas.select_related("punto").all():
+    if paradas is None:
+        paradas = ruta.paradas.select_related("punto").all()
+    for parada in paradas:
         distance = distancia_metros(latitud, longitud, parada.latitud_geocerca, parada.longitud_geocerca)
         if distancia_planeada is None or distance < distancia_planeada:
             planeada_mas_cercana = parada
@@ -420,13 +422,12 @@ def _marcar_visitada_por_permanencia(
     parada: ParadaRuta,
     ubicacion_actual: UbicacionRuta,
     distancia_metros_value: int | None,
+    paradas=None,
 ) -> bool:
+    if paradas is None:
+        paradas = ruta.paradas.select_related("punto").order_by("orden", "id")
     primera_pendiente = next(
-        (
-            candidata
-            for candidata in ruta.paradas.select_related("punto").order_by("orden", "id")
-            if not parada_resuelta_operativamente(candidata)
-        ),
+        (candidata for candidata in paradas if not parada_resuelta_operativamente(candidata)),
         None,
     )
     if not primera_pendiente or primera_pendiente.id != parada.id:
@@ -733,12 +734,22 @@ def _precision_confiable(precision_metros) -> tuple[bool, str]:
     return True, ""
 
 
-def _salto_fisico_confiable(ruta: RutaEntrega, latitud, longitud, timestamp_dispositivo) -> tuple[bool, str, int | None]:
-    previous = ruta.ubicaciones.order_by("-timestamp_servidor", "-id").first()
-    if not previous:
-        return True, "", None
-    distance = distancia_metros(previous.latitud, previous.longitud, latitud, longitud)
-    previous_time = previous.timestamp_dispositivo or previous.timestamp_servidor
+def _salto_fisico_confiable(
+    ruta: RutaEntrega,
+    latitud,
+    longitud,
+    timestamp_dispositivo,
+    *,
+    previa: tuple | None = None,
+) -> tuple[bool, str, int | None]:
+    """``previa`` es ``(latitud, longitud, momento)`` de la última señal si ya se conoce."""
+    if previa is None:
+        previous = ruta.ubicaciones.order_by("-timestamp_servidor", "-id").first()
+        if not previous:
+            return True, "", None
+        previa = (previous.latitud, previous.longitud, previous.timestamp_dispositivo or previous.timestamp_servidor)
+    previous_lat, previous_lng, previous_time = previa
+    distance = distancia_metros(previous_lat, previous_lng, latitud, longitud)
     current_time = timestamp_dispositivo or timezone.now()
     delta_seconds = (current_time - previous_time).total_seconds()
     if delta_seconds <= 0 and distance > 80:
@@ -753,6 +764,15 @@ def _salto_fisico_confiable(ruta: RutaEntrega, latitud, longitud, timestamp_disp
 
 @transaction.atomic
 def registrar_ubicacion_ruta(*, user, ruta: RutaEntrega, payload: dict, ip_registro: str | None = None) -> UbicacionRuta:
+    # Import local: services_ruta_estado depende de este módulo.
+    from .services_ruta_estado import (
+        encolar_geocercas_ubicacion,
+        posicion_previa,
+        procesamiento_asincrono_habilitado,
+        procesar_ubicacion,
+        registrar_posicion,
+    )
+
     if ruta.estatus != RutaEntrega.ESTATUS_EN_RUTA:
         raise ValidationError("La ruta debe estar en estatus En ruta para registrar seguimiento.")
     if not ruta_es_operativa_hoy(ruta):
@@ -790,10 +810,16 @@ def registrar_ubicacion_ruta(*, user, ruta: RutaEntrega, payload: dict, ip_regis
         return duplicate
 
     tracking_origen = payload.get("tracking_origen") or "automatico_geocerca"
-    automatico_pwa = tracking_origen == "automatico_pwa"
+    asincrono = procesamiento_asincrono_habilitado()
     timestamp_ok, timestamp_reason = _timestamp_dispositivo_confiable(timestamp_dispositivo)
     precision_ok, precision_reason = _precision_confiable(_payload_value(payload, "precision_metros"))
-    salto_ok, salto_reason, salto_distancia = _salto_fisico_confiable(ruta, latitud, longitud, timestamp_dispositivo)
+    salto_ok, salto_reason, salto_distancia = _salto_fisico_confiable(
+        ruta,
+        latitud,
+        longitud,
+        timestamp_dispositivo,
+        previa=posicion_previa(ruta.id) if asincrono else None,
+    )
     alertas_tracking = []
 
     ubicacion = UbicacionRuta.objects.create(
@@ -855,15 +881,45 @@ def registrar_ubicacion_ruta(*, user, ruta: RutaEntrega, payload: dict, ip_regis
 
     ubicacion_confiable = timestamp_ok and precision_ok and salto_ok
 
-    resultado = evaluar_geocercas(ruta, ubicacion.latitud, ubicacion.longitud)
+    contexto = {
+        "tracking_origen": tracking_origen,
+        "ubicacion_confiable": ubicacion_confiable,
+        "fuera_de_ruta_confirmado": payload.get("fuera_de_ruta_confirmado") is True,
+        "desvio_motivo": payload.get("desvio_motivo") or "",
+    }
+    registrar_posicion(ubicacion, confiable=ubicacion_confiable)
+    if asincrono:
+        encolar_geocercas_ubicacion(ubicacion=ubicacion, user=user, contexto=contexto)
+    else:
+        procesar_ubicacion(ruta=ruta, ubicacion=ubicacion, user=user, **contexto)
+
+    ubicacion._alertas_tracking = alertas_tracking
+    return ubicacion
+
+
+def procesar_geocercas_ubicacion(
+    *,
+    ruta: RutaEntrega,
+    ubicacion: UbicacionRuta,
+    user,
+    resultado: GeocercaResultado,
+    ubicacion_confiable: bool,
+    tracking_origen: str,
+    fuera_de_ruta_confirmado: bool = False,
+    desvio_motivo: str = "",
+    paradas=None,
+    verificar_permanencia: bool = True,
+) -> None:
+    """Eventos durables de una señal ya guardada: llegada, visita, desvío y recarga CEDIS."""
+    automatico_pwa = tracking_origen == "automatico_pwa"
     if resultado.parada and resultado.dentro and ubicacion_confiable:
         metadata_llegada = {
             "origen_servicio": "registrar_ubicacion_ruta",
             "ubicacion_confiable": True,
             "tracking_origen": tracking_origen,
             "ruta_id": ruta.id,
-            "repartidor_id": repartidor.id,
-            "unidad_id": unidad.id,
+            "repartidor_id": ubicacion.repartidor_id,
+            "unidad_id": ubicacion.unidad_id,
         }
         evento_llegada = crear_evento_ruta_once(
             ruta=ruta,
@@ -907,18 +963,19 @@ def registrar_ubicacion_ruta(*, user, ruta: RutaEntrega, payload: dict, ip_regis
                     metadata=metadata_llegada,
                     creado_por=user,
                 )
-        if resultado.parada.estado != ParadaRuta.ESTADO_VISITADA:
+        if verificar_permanencia and resultado.parada.estado != ParadaRuta.ESTADO_VISITADA:
             _marcar_visitada_por_permanencia(
                 ruta=ruta,
                 parada=resultado.parada,
                 ubicacion_actual=ubicacion,
                 distancia_metros_value=resultado.distancia_metros,
+                paradas=paradas,
             )
-    elif ruta.paradas.exists() and not resultado.dentro_geocerca_planeada:
+    elif resultado.parada_planeada_mas_cercana is not None and not resultado.dentro_geocerca_planeada:
         ubicacion.fuera_de_geocerca = True
         ubicacion.save(update_fields=["fuera_de_geocerca"])
-        confirmado = payload.get("fuera_de_ruta_confirmado") is True
-        motivo = (payload.get("desvio_motivo") or "").strip()
+        confirmado = fuera_de_ruta_confirmado
+        motivo = (desvio_motivo or "").strip()
         descripcion_desvio = (
             "Desvío confirmado fuera del corredor autorizado de la ruta."
             if confirmado
@@ -976,9 +1033,6 @@ def registrar_ubicacion_ruta(*, user, ruta: RutaEntrega, payload: dict, ip_regis
             user=user,
         )
 
-    ubicacion._alertas_tracking = alertas_tracking
-    return ubicacion
-
 
 def detectar_gps_perdido(ruta: RutaEntrega, *, umbral_minutos: int = 10) -> EventoRuta | None:
     if ruta.estatus != RutaEntrega.ESTATUS_EN_RUTA:
@@ -1048,6 +1102,10 @@ def resumen_control_rutas(*, fecha=None, limit: int = 50) -> dict:
         .filter(fecha_ruta=fecha)
         .order_by("-estatus", "-id")[:limit]
     )
+    from .services_ruta_estado import estados_rutas
+
+    rutas = list(rutas)
+    estados = estados_rutas(ruta.id for ruta in rutas)
     rows = []
     for ruta in rutas:
         latest = ruta.ubicaciones.order_by("-timestamp_servidor").first()
@@ -1063,6 +1121,7 @@ def resumen_control_rutas(*, fecha=None, limit: int = 50) -> dict:
                 "eventos_alerta": eventos_abiertos,
                 "gps_minutos": gps_minutos,
                 "gps_atrasado": gps_atrasado,
+                "estado_vivo": estados.get(ruta.id),
             }
         )
     return {
@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from .models import ParadaRuta, RutaEntrega
+from .services_estadistica_servicio import estadisticas_por_punto, resumen_servicio
 
 
 @dataclass(frozen=True)
@@ -33,31 +34,28 @@ def permanencia_real_minutos(parada: ParadaRuta) -> int | None:
     return _minutos_redondeados(segundos)
 
 
+def _promedio_minutos(estadistica, parada: ParadaRuta | None) -> int | None:
+    # La parada propia no cuenta en su promedio histórico.
+    excluir = None
+    if parada is not None and parada.servicio_punto_contabilizado_id == parada.punto_id:
+        excluir = parada.servicio_segundos_contabilizados
+    resumen = resumen_servicio(estadistica, excluir_segundos=excluir)
+    return resumen.promedio_minutos if resumen else None
+
+
 def promedio_surtido_punto_minutos(punto_id: int, *, exclude_parada_id: int | None = None) -> int | None:
-    qs = ParadaRuta.objects.filter(
-        punto_id=punto_id,
-        hora_llegada_real__isnull=False,
-        hora_salida_real__isnull=False,
-    )
-    if exclude_parada_id:
-        qs = qs.exclude(pk=exclude_parada_id)
-
-    duraciones = []
-    for llegada, salida in qs.values_list("hora_llegada_real", "hora_salida_real"):
-        segundos = (salida - llegada).total_seconds()
-        if segundos > 0:
-            duraciones.append(segundos)
-    if not duraciones:
-        return None
-    return _minutos_redondeados(sum(duraciones) / len(duraciones))
+    parada = ParadaRuta.objects.filter(pk=exclude_parada_id).first() if exclude_parada_id else None
+    return _promedio_minutos(estadisticas_por_punto([punto_id]).get(punto_id), parada)
 
 
 def resumen_tiempos_ruta(ruta: RutaEntrega) -> ResumenTiemposRuta:
     rows = []
     surtido_estimado = 0
-    for parada in ruta.paradas.select_related("punto").order_by("orden", "id"):
+    paradas = list(ruta.paradas.select_related("punto").order_by("orden", "id"))
+    estadisticas = estadisticas_por_punto(parada.punto_id for parada in paradas)
+    for parada in paradas:
         real = permanencia_real_minutos(parada)
-        promedio = promedio_surtido_punto_minutos(parada.punto_id, exclude_parada_id=parada.id)
+        promedio = _promedio_minutos(estadisticas.get(parada.punto_id), parada)
         rows.append(ParadaTiempo(parada=parada, permanencia_real_minutos=real, promedio_surtido_minutos=promedio))
         if promedio is not None:
             surtido_estimado += promedio
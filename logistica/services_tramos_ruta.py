@@ -0,0 +1,411 @@
+"""
+Caché local de tramos entre paradas para el ruteo programado.
+
+Una ruta se arma con los tramos consecutivos de sus paradas. Cada tramo se
+busca en ``TramoRuta`` por coordenadas redondeadas y franja horaria de
+salida; solo los tramos faltantes (o con duración vencida) se piden al
+proveedor, agrupando los contiguos en una sola consulta.
+
+La duración preferida es la aprendida de recorridos reales
+(``aprender_tramos_ruta`` sobre ``UbicacionRuta``), así el ruteo funciona sin
+proveedor y con ETAs de la operación real. Sin caché ni proveedor, un tramo cae
+a línea recta con ``LOGISTICA_FALLBACK_SPEED_KMH``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ParadaRuta, RutaEntrega, TramoRuta, UbicacionRuta
+from .services_rutas_control import distancia_metros
+
+Coordenada = tuple[float, float]
+ClaveTramo = tuple[int, int, int, int]
+
+ALFA_DURACION_OBSERVADA = 0.3
+# Un tramo entre paradas consecutivas que tarda más que esto no es un traslado.
+MAX_DURACION_TRAMO_SEGUNDOS = 4 * 60 * 60
+
+FUENTE_PROVEEDOR = "PROVEEDOR"
+FUENTE_APRENDIDO = "APRENDIDO"
+FUENTE_FALLBACK = "FALLBACK"
+
+
+@dataclass(frozen=True)
+class TramoProveedor:
+    distancia_metros: int
+    duracion_segundos: int
+    polyline: str
+
+
+Proveedor = Callable[[Sequence[Coordenada]], list[TramoProveedor] | None]
+
+
+@dataclass(frozen=True)
+class TramoResuelto:
+    origen: Coordenada
+    destino: Coordenada
+    distancia_metros: int
+    duracion_segundos: int
+    polyline: str
+    fuente_duracion: str
+
+    @property
+    def tiene_geometria(self) -> bool:
+        return bool(self.polyline)
+
+
+def _precision() -> int:
+    return int(getattr(settings, "LOGISTICA_TRAMO_PRECISION_DECIMALES", 3))
+
+
+def _franja_horas() -> int:
+    return max(int(getattr(settings, "LOGISTICA_TRAMO_FRANJA_HORAS", 3) or 3), 1)
+
+
+def _min_observaciones() -> int:
+    return max(int(getattr(settings, "LOGISTICA_TRAMO_MIN_OBSERVACIONES", 2) or 1), 1)
+
+
+def _vigencia_proveedor() -> timedelta:
+    return timedelta(days=max(int(getattr(settings, "LOGISTICA_TRAMO_CACHE_DIAS", 30) or 30), 1))
+
+
+def clave_coordenada(coord: Coordenada) -> tuple[int, int]:
+    factor = 10 ** _precision()
+    return int(round(coord[0] * factor)), int(round(coord[1] * factor))
+
+
+def clave_tramo(origen: Coordenada, destino: Coordenada) -> ClaveTramo:
+    return (*clave_coordenada(origen), *clave_coordenada(destino))
+
+
+def franja_para(momento: datetime) -> int:
+    return timezone.localtime(momento).hour // _franja_horas()
+
+
+def _clave_de_fila(row: TramoRuta) -> ClaveTramo:
+    return (row.origen_lat_clave, row.origen_lng_clave, row.destino_lat_clave, row.destino_lng_clave)
+
+
+def _filtro_claves(claves: set[ClaveTramo]) -> Q:
+    return reduce(
+        or_,
+        (
+            Q(origen_lat_clave=clave[0], origen_lng_clave=clave[1], destino_lat_clave=clave[2], destino_lng_clave=clave[3])
+            for clave in claves
+        ),
+    )
+
+
+# --- Polyline codificada (algoritmo de Google) ---
+
+
+def decodificar_polyline(value: str) -> list[Coordenada]:
+    puntos: list[Coordenada] = []
+    index = lat = lng = 0
+    while index < len(value):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(value[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        puntos.append((lat / 1e5, lng / 1e5))
+    return puntos
+
+
+def codificar_polyline(puntos: Sequence[Coordenada]) -> str:
+    salida = []
+    prev_lat = prev_lng = 0
+    for lat, lng in puntos:
+        lat_e5, lng_e5 = int(round(lat * 1e5)), int(round(lng * 1e5))
+        for delta in (lat_e5 - prev_lat, lng_e5 - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                salida.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            salida.append(chr(value + 63))
+        prev_lat, prev_lng = lat_e5, lng_e5
+    return "".join(salida)
+
+
+# --- Resolución de tramos ---
+
+
+def _distancia_recta(origen: Coordenada, destino: Coordenada) -> int:
+    return distancia_metros(
+        Decimal(str(origen[0])), Decimal(str(origen[1])), Decimal(str(destino[0])), Decimal(str(destino[1]))
+    )
+
+
+def _duracion_recta(distancia: int) -> int:
+    velocidad_kmh = max(int(getattr(settings, "LOGISTICA_FALLBACK_SPEED_KMH", 35) or 35), 1)
+    return int(round((distancia / 1000) / velocidad_kmh * 3600)) if distancia else 0
+
+
+def _aprendida(row: TramoRuta | None) -> float | None:
+    if row is None or row.duracion_observada_segundos is None or row.observaciones < _min_observaciones():
+        return None
+    return row.duracion_observada_segundos
+
+
+def _proveedor_vigente(row: TramoRuta | None, ahora: datetime) -> bool:
+    return bool(
+        row is not None
+        and row.proveedor_consultado_en
+        and row.duracion_proveedor_segundos is not None
+        and ahora - row.proveedor_consultado_en <= _vigencia_proveedor()
+    )
+
+
+def _distancia_franja(a: int, b: int) -> int:
+    total = 24 // _franja_horas() + (1 if 24 % _franja_horas() else 0)
+    diff = abs(a - b)
+    return min(diff, total - diff)
+
+
+def _resolver(
+    origen: Coordenada,
+    destino: Coordenada,
+    franja: int,
+    filas: list[TramoRuta],
+    ahora: datetime,
+) -> tuple[TramoResuelto, bool]:
+    """Arma el tramo con lo que hay en caché; el bool indica si falta el proveedor."""
+    exacta = next((row for row in filas if row.franja_horaria == franja), None)
+    por_cercania = sorted(filas, key=lambda row: _distancia_franja(row.franja_horaria, franja))
+    geometria = next((row for row in por_cercania if row.polyline and row.proveedor_consultado_en), None)
+
+    if geometria is not None:
+        distancia = geometria.distancia_metros
+        polyline = geometria.polyline
+    else:
+        distancia = _distancia_recta(origen, destino)
+        polyline = ""
+
+    duracion: float | None = _aprendida(exacta)
+    fuente = FUENTE_APRENDIDO
+    if duracion is None and _proveedor_vigente(exacta, ahora):
+        duracion, fuente = exacta.duracion_proveedor_segundos, FUENTE_PROVEEDOR
+    duracion_en_franja = duracion is not None
+    if duracion is None:
+        duracion = next((value for value in map(_aprendida, por_cercania) if value is not None), None)
+        fuente = FUENTE_APRENDIDO
+    if duracion is None and geometria is not None and geometria.duracion_proveedor_segundos is not None:
+        duracion, fuente = geometria.duracion_proveedor_segundos, FUENTE_PROVEEDOR
+    if duracion is None:
+        duracion, fuente = _duracion_recta(distancia), FUENTE_FALLBACK
+
+    falta_proveedor = geometria is None or not duracion_en_franja
+    tramo = TramoResuelto(
+        origen=origen,
+        destino=destino,
+        distancia_metros=int(distancia),
+        duracion_segundos=int(round(duracion)),
+        polyline=polyline,
+        fuente_duracion=fuente,
+    )
+    return tramo, falta_proveedor
+
+
+def _segmentos_faltantes(faltantes: list[bool]) -> list[tuple[int, int]]:
+    """Rangos ``[inicio, fin)`` de tramos contiguos que hay que pedir."""
+    segmentos = []
+    inicio = None
+    for index, falta in enumerate(faltantes + [False]):
+        if falta and inicio is None:
+            inicio = index
+        elif not falta and inicio is not None:
+            segmentos.append((inicio, index))
+            inicio = None
+    return segmentos
+
+
+def _guardar_proveedor(clave: ClaveTramo, franja: int, dato: TramoProveedor, ahora: datetime) -> None:
+    TramoRuta.objects.update_or_create(
+        origen_lat_clave=clave[0],
+        origen_lng_clave=clave[1],
+        destino_lat_clave=clave[2],
+        destino_lng_clave=clave[3],
+        franja_horaria=franja,
+        defaults={
+            "distancia_metros": max(int(dato.distancia_metros), 0),
+            "polyline": dato.polyline or "",
+            "duracion_proveedor_segundos": max(int(dato.duracion_segundos), 0),
+            "proveedor_consultado_en": ahora,
+        },
+    )
+
+
+def resolver_tramos(
+    coords: Sequence[Coordenada],
+    *,
+    momento: datetime | None = None,
+    proveedor: Proveedor | None = None,
+) -> list[TramoResuelto]:
+    """
+    Devuelve un ``TramoResuelto`` por cada par consecutivo de ``coords``.
+
+    Lee la caché en una consulta; si hay ``proveedor``, le pide solo los
+    tramos faltantes y los guarda para la franja de ``momento``.
+    """
+    pares = [(origen, destino) for origen, destino in zip(coords, coords[1:])]
+    if not pares:
+        return []
+    ahora = timezone.now()
+    franja = franja_para(momento or ahora)
+    claves = [clave_tramo(origen, destino) for origen, destino in pares]
+
+    filas_por_clave: dict[ClaveTramo, list[TramoRuta]] = {}
+    for row in TramoRuta.objects.filter(_filtro_claves(set(claves))):
+        filas_por_clave.setdefault(_clave_de_fila(row), []).append(row)
+
+    resueltos = []
+    faltantes = []
+    for (origen, destino), clave in zip(pares, claves):
+        tramo, falta = _resolver(origen, destino, franja, filas_por_clave.get(clave, []), ahora)
+        resueltos.append(tramo)
+        faltantes.append(falta)
+
+    if proveedor is None:
+        return resueltos
+
+    for inicio, fin in _segmentos_faltantes(faltantes):
+        datos = proveedor(list(coords[inicio : fin + 1]))
+        if not datos or len(datos) != fin - inicio:
+            continue
+        for offset, dato in enumerate(datos):
+            index = inicio + offset
+            _guardar_proveedor(claves[index], franja, dato, ahora)
+        filas = TramoRuta.objects.filter(_filtro_claves(set(claves[inicio:fin])))
+        filas_por_clave = {}
+        for row in filas:
+            filas_por_clave.setdefault(_clave_de_fila(row), []).append(row)
+        for index in range(inicio, fin):
+            origen, destino = pares[index]
+            resueltos[index], _ = _resolver(origen, destino, franja, filas_por_clave.get(claves[index], []), ahora)
+    return resueltos
+
+
+# --- Aprendizaje desde recorridos reales ---
+
+
+def _dentro(lat: float, lng: float, parada: ParadaRuta) -> bool:
+    return (
+        distancia_metros(Decimal(str(lat)), Decimal(str(lng)), parada.latitud_geocerca, parada.longitud_geocerca)
+        <= parada.radio_geocerca_metros
+    )
+
+
+def recorridos_observados(ruta: RutaEntrega) -> list[tuple[ParadaRuta, ParadaRuta, datetime, float]]:
+    """
+    Tramos recorridos según el GPS: ``(origen, destino, salida, segundos)``.
+
+    La salida es el último punto GPS dentro de la geocerca del origen antes del
+    primero dentro de la del destino; se recorren las paradas en su orden.
+    """
+    paradas = list(ruta.paradas.order_by("orden", "id"))
+    if len(paradas) < 2:
+        return []
+    pings = [
+        (float(lat), float(lng), ts_dispositivo or ts_servidor)
+        for lat, lng, ts_dispositivo, ts_servidor in UbicacionRuta.objects.filter(ruta=ruta)
+        .order_by("timestamp_servidor", "id")
+        .values_list("latitud", "longitud", "timestamp_dispositivo", "timestamp_servidor")
+        .iterator(chunk_size=2000)
+    ]
+    pings.sort(key=lambda item: item[2])
+    observados = []
+    cursor = 0
+    for origen, destino in zip(paradas, paradas[1:]):
+        while cursor < len(pings) and not _dentro(pings[cursor][0], pings[cursor][1], origen):
+            cursor += 1
+        if cursor >= len(pings):
+            break
+        ultimo_en_origen = cursor
+        siguiente = cursor
+        while siguiente < len(pings) and not _dentro(pings[siguiente][0], pings[siguiente][1], destino):
+            if _dentro(pings[siguiente][0], pings[siguiente][1], origen):
+                ultimo_en_origen = siguiente
+            siguiente += 1
+        if siguiente >= len(pings):
+            break
+        salida = pings[ultimo_en_origen][2]
+        segundos = (pings[siguiente][2] - salida).total_seconds()
+        if 0 < segundos <= MAX_DURACION_TRAMO_SEGUNDOS:
+            observados.append((origen, destino, salida, segundos))
+        cursor = siguiente
+    return observados
+
+
+def _registrar_observacion(clave: ClaveTramo, franja: int, segundos: float, momento: datetime) -> None:
+    row, _ = TramoRuta.objects.select_for_update().get_or_create(
+        origen_lat_clave=clave[0],
+        origen_lng_clave=clave[1],
+        destino_lat_clave=clave[2],
+        destino_lng_clave=clave[3],
+        franja_horaria=franja,
+    )
+    previa = row.duracion_observada_segundos
+    row.duracion_observada_segundos = (
+        segundos if previa is None else ALFA_DURACION_OBSERVADA * segundos + (1 - ALFA_DURACION_OBSERVADA) * previa
+    )
+    row.observaciones += 1
+    row.observado_en = momento
+    row.save(update_fields=["duracion_observada_segundos", "observaciones", "observado_en", "actualizado_en"])
+
+
+def aprender_tramos_ruta(ruta: RutaEntrega) -> int:
+    """
+    Incorpora los tramos recorridos de ``ruta`` a la caché. Idempotente: una
+    ruta ya aprendida (``tramos_aprendidos_en``) no vuelve a contar.
+    """
+    with transaction.atomic():
+        ruta = RutaEntrega.objects.select_for_update().get(pk=ruta.pk)
+        if ruta.tramos_aprendidos_en is not None:
+            return 0
+        registrados = 0
+        for origen, destino, salida, segundos in recorridos_observados(ruta):
+            clave = clave_tramo(
+                (float(origen.latitud_geocerca), float(origen.longitud_geocerca)),
+                (float(destino.latitud_geocerca), float(destino.longitud_geocerca)),
+            )
+            if clave[:2] == clave[2:]:
+                continue
+            _registrar_observacion(clave, franja_para(salida), segundos, salida)
+            registrados += 1
+        ruta.tramos_aprendidos_en = timezone.now()
+        ruta.save(update_fields=["tramos_aprendidos_en", "updated_at"])
+    return registrados
+
+
+def aprender_tramos_rutas_cerradas(*, dias: int = 3) -> dict[str, int]:
+    desde = timezone.localdate() - timedelta(days=max(dias, 0))
+    rutas = RutaEntrega.objects.filter(
+        estatus=RutaEntrega.ESTATUS_COMPLETADA,
+        tramos_aprendidos_en__isnull=True,
+        fecha_ruta__gte=desde,
+    ).order_by("fecha_ruta", "id")
+    resumen = {"rutas": 0, "tramos": 0}
+    for ruta in rutas:
+        resumen["tramos"] += aprender_tramos_ruta(ruta)
+        resumen["rutas"] += 1
+    return resumen
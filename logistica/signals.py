@@ -1,7 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import ReporteUnidad
+from .models import ParadaRuta, ReporteUnidad
+from .services_estadistica_servicio import retirar_parada, sincronizar_parada
 from .tasks import notificar_reporte_nuevo
 
 
@@ -9,3 +10,15 @@ from .tasks import notificar_reporte_nuevo
 def reporte_unidad_post_save(sender, instance, created, **kwargs):
     if created:
         notificar_reporte_nuevo.delay(instance.id)
+
+
+@receiver(post_save, sender=ParadaRuta)
+def parada_ruta_estadistica_servicio(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sincronizar_parada(instance)
+
+
+@receiver(post_delete, sender=ParadaRuta)
+def parada_ruta_retirar_estadistica_servicio(sender, instance, **kwargs):
+    retirar_parada(instance)
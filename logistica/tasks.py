@@ -41,6 +41,8 @@ from .services_rutas_control import (
     _reclamar_lease_recarga_para_procesar,
     detectar_gps_perdido,
 )
+from .services_ruta_estado import procesar_ubicacion_pendiente
+from .services_tramos_ruta import aprender_tramos_rutas_cerradas
 
 logger = logging.getLogger(__name__)
 
@@ -110,6 +112,16 @@ def detectar_gps_perdido_rutas(umbral_minutos: int = 10):
     }
 
 
+@shared_task(
+    name="logistica.tasks.procesar_ubicacion_ruta",
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=3,
+)
+def procesar_ubicacion_ruta(ubicacion_id: int, user_id: int | None = None, contexto: dict | None = None):
+    return procesar_ubicacion_pendiente(ubicacion_id, user_id=user_id, contexto=contexto or {})
+
+
 @shared_task(
     name="logistica.tasks.procesar_recarga_cedis_automatica",
     autoretry_for=(OperationalError,),
@@ -266,6 +278,12 @@ def auditar_entregas_ruta_task(ruta_id: int | None = None, fecha: str | None = N
     }
 
 
+@shared_task(name="logistica.tasks.aprender_tramos_rutas")
+def aprender_tramos_rutas(dias: int = 3):
+    """Incorpora a la caché de tramos los recorridos GPS de rutas cerradas."""
+    return aprender_tramos_rutas_cerradas(dias=dias)
+
+
 @shared_task
 def notificar_reporte_nuevo(reporte_id):
     try:
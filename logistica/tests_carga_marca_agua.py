@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Sucursal
+from pos_bridge.models import PointBranch, PointTransferLine
+
+from .models import ParadaRuta, PuntoLogistico, RutaCargaChecklistLinea, RutaEntrega
+from .services_carga_ruta import ruta_tiene_movimiento_point_nuevo, sincronizar_checklist_carga_desde_point
+
+
+@override_settings(LOGISTICA_CARGA_POINT_MARGEN_SEGUNDOS=60)
+class ChecklistCargaMarcaAguaTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="marca.agua", password="x")
+        self.sucursal = Sucursal.objects.create(codigo="MAG", nombre="Sucursal marca agua", activa=True)
+        self.punto = PuntoLogistico.objects.create(
+            sucursal=self.sucursal,
+            nombre="Sucursal marca agua",
+            tipo=PuntoLogistico.TIPO_SUCURSAL,
+            latitud="25.570000",
+            longitud="-108.470000",
+            radio_geocerca_metros=120,
+        )
+        self.origen = PointBranch.objects.create(external_id="CEDIS-MAG", name="CEDIS")
+        self.destino = PointBranch.objects.create(
+            external_id="SUC-MAG",
+            name=self.sucursal.nombre,
+            erp_branch=self.sucursal,
+        )
+        self.ruta = RutaEntrega.objects.create(nombre="Ruta marca agua", fecha_ruta=timezone.localdate())
+        ParadaRuta.objects.create(ruta=self.ruta, punto=self.punto, orden=1)
+
+    def _transferencia(self, clave: str, *, sent="4.000") -> PointTransferLine:
+        return PointTransferLine.objects.create(
+            origin_branch=self.origen,
+            destination_branch=self.destino,
+            erp_destination_branch=self.sucursal,
+            transfer_external_id=f"T-{clave}",
+            detail_external_id=f"D-{clave}",
+            source_hash=f"mag-{clave}",
+            registered_at=timezone.now(),
+            sent_at=timezone.now(),
+            item_name=f"Pastel {clave}",
+            item_code=clave,
+            unit="pz",
+            requested_quantity=sent,
+            sent_quantity=sent,
+            is_open=True,
+        )
+
+    def _sincronizar(self):
+        return sincronizar_checklist_carga_desde_point(ruta=self.ruta, user=self.user, ejecutar_sync=False)
+
+    def _envejecer(self, checklist, *, horas=2):
+        """Simula que todo lo aplicado ocurrió horas antes de la marca de agua."""
+        antes = timezone.now() - timedelta(hours=horas)
+        PointTransferLine.objects.update(updated_at=antes)
+        RutaCargaChecklistLinea.objects.update(actualizado_en=antes)
+        checklist.point_marca_agua = antes + timedelta(hours=1)
+        checklist.save(update_fields=["point_marca_agua"])
+
+    def test_solo_aplica_lineas_point_posteriores_a_la_marca(self):
+        primera = self._transferencia("A")
+        checklist = self._sincronizar().checklist
+        checklist.refresh_from_db()
+        self.assertLess(checklist.point_marca_agua, timezone.now() - timedelta(seconds=59))
+        self._envejecer(checklist)
+
+        # Un cambio que no mueve updated_at queda bajo la marca y no se relee.
+        PointTransferLine.objects.filter(pk=primera.pk).update(sent_quantity="9.000")
+        resumen = self._sincronizar()
+        self.assertEqual((resumen.creadas, resumen.actualizadas), (0, 0))
+        self.assertEqual(
+            checklist.lineas.get(point_transfer_line=primera).cantidad_enviada_esperada,
+            4,
+        )
+
+        segunda = self._transferencia("B", sent="2.000")
+        resumen = self._sincronizar()
+        self.assertEqual((resumen.creadas, resumen.actualizadas), (1, 0))
+        self.assertTrue(checklist.lineas.filter(point_transfer_line=segunda).exists())
+
+        self._envejecer(checklist)
+        primera.refresh_from_db()
+        primera.save()
+        resumen = self._sincronizar()
+        self.assertEqual(resumen.actualizadas, 1)
+        self.assertEqual(checklist.lineas.get(point_transfer_line=primera).cantidad_enviada_esperada, 9)
+
+    def test_cancelacion_posterior_supera_la_linea_del_checklist(self):
+        linea_point = self._transferencia("C")
+        checklist = self._sincronizar().checklist
+        self._envejecer(checklist)
+
+        linea_point.is_cancelled = True
+        linea_point.save()
+        self._sincronizar()
+
+        self.assertEqual(
+            checklist.lineas.get(point_transfer_line=linea_point).estatus,
+            RutaCargaChecklistLinea.ESTATUS_SUPERADA,
+        )
+
+    def test_cambio_de_paradas_fuerza_sincronizacion_completa(self):
+        otra = Sucursal.objects.create(codigo="MAG2", nombre="Otra marca agua", activa=True)
+        otro_punto = PuntoLogistico.objects.create(
+            sucursal=otra,
+            nombre="Otra marca agua",
+            tipo=PuntoLogistico.TIPO_SUCURSAL,
+            latitud="25.580000",
+            longitud="-108.480000",
+            radio_geocerca_metros=120,
+        )
+        checklist = self._sincronizar().checklist
+        antigua = PointTransferLine.objects.create(
+            origin_branch=self.origen,
+            destination_branch=PointBranch.objects.create(external_id="SUC-MAG2", name=otra.nombre, erp_branch=otra),
+            erp_destination_branch=otra,
+            transfer_external_id="T-OTRA",
+            detail_external_id="D-OTRA",
+            source_hash="mag-otra",
+            registered_at=timezone.now(),
+            sent_at=timezone.now(),
+            item_name="Pastel otra",
+            item_code="OTRA",
+            requested_quantity="1.000",
+            sent_quantity="1.000",
+            is_open=True,
+        )
+        self._envejecer(checklist)
+
+        ParadaRuta.objects.create(ruta=self.ruta, punto=otro_punto, orden=2)
+        resumen = self._sincronizar()
+
+        self.assertEqual(resumen.creadas, 1)
+        self.assertTrue(checklist.lineas.filter(point_transfer_line=antigua).exists())
+
+    def test_movimiento_nuevo_usa_la_marca_del_checklist(self):
+        self._transferencia("D")
+        checklist = self._sincronizar().checklist
+        omitida = self._transferencia("E")
+        # Bajo la marca: la sincronización ya revisó esta línea.
+        self._envejecer(checklist, horas=3)
+        PointTransferLine.objects.filter(pk=omitida.pk).update(updated_at=timezone.now() - timedelta(hours=4))
+        self.assertFalse(ruta_tiene_movimiento_point_nuevo(fecha=self.ruta.fecha_ruta, puntos=[self.punto]))
+
+        self._transferencia("F")
+        self.assertTrue(ruta_tiene_movimiento_point_nuevo(fecha=self.ruta.fecha_ruta, puntos=[self.punto]))
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import Sucursal
+
+from .models import EstadisticaServicioPunto, ParadaRuta, PuntoLogistico, RutaEntrega
+from .services_estadistica_servicio import estadisticas_por_punto, resumen_servicio
+from .services_tiempos_ruta import resumen_tiempos_ruta
+
+
+class EstadisticaServicioPuntoTests(TestCase):
+    def setUp(self):
+        self.sucursal = Sucursal.objects.create(codigo="EST-SRV", nombre="Sucursal Estadística")
+        self.punto = PuntoLogistico.objects.create(
+            sucursal=self.sucursal,
+            nombre="Punto Estadística",
+            tipo=PuntoLogistico.TIPO_SUCURSAL,
+            latitud="25.570000",
+            longitud="-108.470000",
+            radio_geocerca_metros=120,
+        )
+        self.base = timezone.now() - timedelta(days=3)
+
+    def _parada(self, minutos: int | None, *, dia: int = 0) -> ParadaRuta:
+        ruta = RutaEntrega.objects.create(nombre=f"Ruta estadística {dia}", fecha_ruta=(self.base + timedelta(days=dia)).date())
+        llegada = self.base + timedelta(days=dia)
+        return ParadaRuta.objects.create(
+            ruta=ruta,
+            punto=self.punto,
+            orden=1,
+            hora_llegada_real=llegada if minutos is not None else None,
+            hora_salida_real=llegada + timedelta(minutes=minutos) if minutos is not None else None,
+        )
+
+    def _estadistica(self) -> EstadisticaServicioPunto:
+        return EstadisticaServicioPunto.objects.get(punto=self.punto)
+
+    def test_cierre_de_parada_actualiza_estadistica_incrementalmente(self):
+        self._parada(10, dia=0)
+        self._parada(20, dia=1)
+        pendiente = self._parada(None, dia=2)
+
+        estadistica = self._estadistica()
+        self.assertEqual(estadistica.muestras, 2)
+        self.assertEqual(estadistica.suma_segundos, 1800)
+        self.assertEqual(estadistica.suma_cuadrados, 600**2 + 1200**2)
+        self.assertEqual(sum(estadistica.histograma), 2)
+
+        pendiente.hora_llegada_real = self.base + timedelta(days=2)
+        pendiente.hora_salida_real = pendiente.hora_llegada_real + timedelta(minutes=30)
+        pendiente.save(update_fields=["hora_llegada_real", "hora_salida_real", "actualizado_en"])
+
+        resumen = resumen_servicio(self._estadistica())
+        self.assertEqual(resumen.muestras, 3)
+        self.assertEqual(resumen.promedio_minutos, 20)
+        self.assertAlmostEqual(resumen.media_reciente_segundos, 0.2 * 1800 + 0.8 * (0.2 * 1200 + 0.8 * 600))
+        self.assertTrue(600 <= resumen.p50_segundos <= 1500)
+
+    def test_correccion_y_borrado_aplican_solo_la_diferencia(self):
+        parada = self._parada(10)
+        self._parada(20, dia=1)
+
+        parada.hora_salida_real = parada.hora_llegada_real + timedelta(minutes=40)
+        parada.save()
+        estadistica = self._estadistica()
+        self.assertEqual(estadistica.muestras, 2)
+        self.assertEqual(estadistica.suma_segundos, 3600)
+
+        parada.delete()
+        estadistica = self._estadistica()
+        self.assertEqual(estadistica.muestras, 1)
+        self.assertEqual(estadistica.suma_segundos, 1200)
+
+    def test_resumen_de_ruta_lee_estadisticas_en_una_consulta(self):
+        self._parada(24, dia=0)
+        ruta = RutaEntrega.objects.create(nombre="Ruta actual", fecha_ruta=timezone.localdate())
+        for orden in range(1, 4):
+            punto = PuntoLogistico.objects.create(
+                sucursal=self.sucursal,
+                nombre=f"Punto extra {orden}",
+                tipo=PuntoLogistico.TIPO_SUCURSAL,
+                latitud="25.570000",
+                longitud="-108.470000",
+                radio_geocerca_metros=120,
+            )
+            ParadaRuta.objects.create(ruta=ruta, punto=punto if orden > 1 else self.punto, orden=orden)
+
+        with CaptureQueriesContext(connection) as queries:
+            resumen = resumen_tiempos_ruta(ruta)
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(resumen.paradas[0].promedio_surtido_minutos, 24)
+        self.assertIsNone(resumen.paradas[1].promedio_surtido_minutos)
+
+    def test_comando_reconstruye_desde_historial(self):
+        self._parada(10, dia=0)
+        self._parada(30, dia=1)
+        EstadisticaServicioPunto.objects.all().delete()
+        ParadaRuta.objects.update(servicio_segundos_contabilizados=None, servicio_punto_contabilizado_id=None)
+
+        call_command("recalcular_estadistica_servicio_puntos", stdout=StringIO())
+
+        estadistica = estadisticas_por_punto([self.punto.id])[self.punto.id]
+        self.assertEqual(estadistica.muestras, 2)
+        self.assertEqual(estadistica.suma_segundos, 2400)
+        self.assertAlmostEqual(estadistica.media_reciente_segundos, 0.2 * 1800 + 0.8 * 600)
+        self.assertEqual(
+            set(ParadaRuta.objects.values_list("servicio_segundos_contabilizados", flat=True)),
+            {600.0, 1800.0},
+        )
@@ -0,0 +1,169 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Sucursal
+
+from .models import (
+    BitacoraSalidaLlegada,
+    EventoRuta,
+    ParadaRuta,
+    PuntoLogistico,
+    Repartidor,
+    RutaEntrega,
+    UbicacionRuta,
+    Unidad,
+)
+from .services_ruta_estado import estados_rutas, procesar_ubicacion_pendiente
+from .services_rutas_control import registrar_ubicacion_ruta
+
+
+@override_settings(LOGISTICA_FALLBACK_SPEED_KMH=30)
+class RutaEstadoVivoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="ruta.estado", password="pass123")
+        self.user.groups.add(Group.objects.get_or_create(name="repartidor")[0])
+        self.user.groups.add(Group.objects.get_or_create(name="LOGISTICA")[0])
+        self.sucursal = Sucursal.objects.create(codigo="EST-LOG", nombre="Estado Logística", activa=True)
+        self.unidad = Unidad.objects.create(codigo="EST-01", descripcion="Unidad estado", sucursal=self.sucursal)
+        self.repartidor = Repartidor.objects.create(user=self.user, sucursal=self.sucursal, unidad_asignada=self.unidad)
+        bitacora = BitacoraSalidaLlegada.objects.create(
+            repartidor=self.repartidor,
+            unidad=self.unidad,
+            km_salida=1000,
+            nivel_gas_salida="lleno",
+            foto_tablero_salida=SimpleUploadedFile("tablero.gif", b"gif", content_type="image/gif"),
+        )
+        self.ruta = RutaEntrega.objects.create(
+            nombre="Ruta Estado",
+            fecha_ruta=timezone.localdate(),
+            estatus=RutaEntrega.ESTATUS_EN_RUTA,
+            repartidor=self.repartidor,
+            unidad_operativa=self.unidad,
+            bitacora_salida=bitacora,
+        )
+        self.paradas = []
+        for orden, (lat, lng) in enumerate((("25.570000", "-108.470000"), ("25.600000", "-108.470000")), start=1):
+            punto = PuntoLogistico.objects.create(
+                sucursal=self.sucursal,
+                nombre=f"Sucursal Estado {orden}",
+                tipo=PuntoLogistico.TIPO_SUCURSAL,
+                latitud=lat,
+                longitud=lng,
+                radio_geocerca_metros=120,
+            )
+            self.paradas.append(ParadaRuta.objects.create(ruta=self.ruta, punto=punto, orden=orden))
+
+    def _registrar(self, latitud, longitud, minutos_atras=0):
+        with self.captureOnCommitCallbacks(execute=True):
+            return registrar_ubicacion_ruta(
+                user=self.user,
+                ruta=self.ruta,
+                payload={
+                    "latitud": latitud,
+                    "longitud": longitud,
+                    "precision_metros": 5,
+                    "timestamp_dispositivo": timezone.now() - timedelta(minutes=minutos_atras),
+                },
+            )
+
+    def _estado(self):
+        return estados_rutas([self.ruta.id])[self.ruta.id]
+
+    def test_en_linea_emite_llegada_salida_y_eta_de_siguiente_parada(self):
+        self._registrar("25.560000", "-108.470000", minutos_atras=3)
+        estado = self._estado()
+        self.assertIsNone(estado["candidata"])
+        self.assertEqual(estado["siguiente_parada"]["parada_id"], self.paradas[0].id)
+        self.assertEqual(estado["siguiente_parada"]["velocidad_kmh"], 30.0)
+        self.assertEqual(estado["siguiente_parada"]["eta_minutos"], 3)
+
+        self._registrar("25.570010", "-108.470010", minutos_atras=1)
+        estado = self._estado()
+        self.assertEqual(estado["candidata"]["parada_id"], self.paradas[0].id)
+        self.assertEqual(estado["eventos"][0]["tipo"], "llegada")
+        self.assertGreater(estado["posicion"]["velocidad_kmh"], 30)
+        self.assertTrue(
+            EventoRuta.objects.filter(
+                ruta=self.ruta, parada=self.paradas[0], tipo=EventoRuta.TIPO_LLEGADA_GEOFENCE
+            ).exists()
+        )
+
+        self._registrar("25.585000", "-108.470000")
+        estado = self._estado()
+        self.assertIsNone(estado["candidata"])
+        self.assertEqual([evento["tipo"] for evento in estado["eventos"][:2]], ["salida", "llegada"])
+        self.assertEqual(estado["paradas_pendientes"], 2)
+
+    @override_settings(LOGISTICA_RUTA_ESTADO_ASINCRONO=True)
+    def test_asincrono_acepta_la_senal_y_procesa_geocercas_en_la_cola(self):
+        with patch("logistica.tasks.procesar_ubicacion_ruta.delay") as delay:
+            ubicacion = self._registrar("25.570010", "-108.470010")
+
+        self.assertFalse(EventoRuta.objects.filter(tipo=EventoRuta.TIPO_LLEGADA_GEOFENCE).exists())
+        self.assertEqual(self._estado()["posicion"]["ubicacion_id"], ubicacion.id)
+        args, kwargs = delay.call_args
+        self.assertEqual(args, (ubicacion.id,))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resultado = procesar_ubicacion_pendiente(ubicacion.id, **kwargs)
+        self.assertEqual(resultado["estado"], "procesada")
+        self.assertEqual(resultado["eventos"], ["llegada"])
+        self.assertTrue(EventoRuta.objects.filter(ubicacion=ubicacion, tipo=EventoRuta.TIPO_LLEGADA_GEOFENCE).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inexistente = procesar_ubicacion_pendiente(ubicacion.id - 1, **kwargs)
+        self.assertEqual(inexistente["estado"], "no_encontrada")
+
+    @override_settings(LOGISTICA_RUTA_ESTADO_ASINCRONO=True)
+    def test_asincrono_espera_la_permanencia_del_estado_antes_de_marcar_visita(self):
+        contexto = {"tracking_origen": "automatico_pwa", "ubicacion_confiable": True}
+        ubicaciones = []
+        for minutos_atras in (6, 0):
+            ubicaciones.append(
+                UbicacionRuta.objects.create(
+                    ruta=self.ruta,
+                    repartidor=self.repartidor,
+                    unidad=self.unidad,
+                    latitud="25.570010",
+                    longitud="-108.470010",
+                    timestamp_dispositivo=timezone.now() - timedelta(minutes=minutos_atras),
+                )
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            procesar_ubicacion_pendiente(ubicaciones[0].id, user_id=self.user.id, contexto=contexto)
+        EventoRuta.objects.filter(tipo=EventoRuta.TIPO_LLEGADA_GEOFENCE).update(
+            creado_en=timezone.now() - timedelta(minutes=6)
+        )
+        self.paradas[0].refresh_from_db()
+        self.assertEqual(self.paradas[0].estado, ParadaRuta.ESTADO_PENDIENTE)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resultado = procesar_ubicacion_pendiente(ubicaciones[1].id, user_id=self.user.id, contexto=contexto)
+        self.paradas[0].refresh_from_db()
+        self.assertEqual(self.paradas[0].estado, ParadaRuta.ESTADO_VISITADA)
+        self.assertEqual(resultado["eventos"], ["visita"])
+        self.assertEqual(self._estado()["siguiente_parada"]["parada_id"], self.paradas[1].id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            fuera_de_orden = procesar_ubicacion_pendiente(ubicaciones[0].id, user_id=self.user.id, contexto=contexto)
+        self.assertEqual(fuera_de_orden["estado"], "fuera_de_orden")
+
+    def test_mapa_en_vivo_lee_el_estado_sin_historial(self):
+        self._registrar("25.560000", "-108.470000")
+        self.client.force_login(self.user)
+        with patch("api.logistica_views.can_view_submodule", return_value=True):
+            response = self.client.get(reverse("api_logistica_rutas_estado_vivo"))
+
+        self.assertEqual(response.status_code, 200)
+        ruta = response.json()["rutas"][0]
+        self.assertEqual(ruta["id"], self.ruta.id)
+        self.assertEqual(ruta["estado_vivo"]["siguiente_parada"]["parada_id"], self.paradas[0].id)
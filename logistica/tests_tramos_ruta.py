@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Sucursal
+
+from .models import ParadaRuta, PuntoLogistico, Repartidor, RutaEntrega, TramoRuta, UbicacionRuta, Unidad
+from .services_google_routes import recalcular_ruta_programada
+from .services_tramos_ruta import (
+    TramoProveedor,
+    aprender_tramos_ruta,
+    codificar_polyline,
+    decodificar_polyline,
+    franja_para,
+)
+
+
+class ProveedorFalso:
+    """Proveedor local: 1 km y 5 min por tramo; registra cada consulta."""
+
+    def __init__(self):
+        self.consultas: list[list[tuple[float, float]]] = []
+
+    def __call__(self, coords):
+        self.consultas.append(list(coords))
+        return [
+            TramoProveedor(distancia_metros=1000, duracion_segundos=300, polyline=codificar_polyline([origen, destino]))
+            for origen, destino in zip(coords, coords[1:])
+        ]
+
+
+@override_settings(GOOGLE_SERVER_API_KEY="", LOGISTICA_TRAMO_MIN_OBSERVACIONES=2)
+class TramoRutaCacheTests(TestCase):
+    def setUp(self):
+        self.sucursal = Sucursal.objects.create(codigo="TRM", nombre="Sucursal Tramos")
+        self.puntos = [
+            PuntoLogistico.objects.create(
+                sucursal=self.sucursal,
+                nombre=f"Punto tramo {index}",
+                tipo=PuntoLogistico.TIPO_SUCURSAL,
+                latitud=f"25.{570 + index * 10:03d}000",
+                longitud="-108.470000",
+                radio_geocerca_metros=100,
+            )
+            for index in range(4)
+        ]
+        self.momento = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def _ruta(self, puntos, **extra) -> RutaEntrega:
+        ruta = RutaEntrega.objects.create(nombre="Ruta tramos", fecha_ruta=timezone.localdate(), **extra)
+        for orden, punto in enumerate(puntos, start=1):
+            ParadaRuta.objects.create(ruta=ruta, punto=punto, orden=orden, hora_estimada=self.momento)
+        return ruta
+
+    def test_polyline_codificada_ida_y_vuelta(self):
+        puntos = [(25.57, -108.47), (25.58123, -108.4699), (25.5, -108.5)]
+        self.assertEqual(codificar_polyline([(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]), "_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+        self.assertEqual(decodificar_polyline(codificar_polyline(puntos)), puntos)
+
+    def test_solo_pide_al_proveedor_los_tramos_faltantes(self):
+        proveedor = ProveedorFalso()
+        ruta = self._ruta(self.puntos[:3])
+        result = recalcular_ruta_programada(ruta, proveedor=proveedor)
+
+        self.assertEqual(len(proveedor.consultas), 1)
+        self.assertEqual(len(proveedor.consultas[0]), 3)
+        self.assertEqual(result.fuente, "GOOGLE")
+        self.assertEqual((result.distancia_metros, result.duracion_segundos), (2000, 600))
+        self.assertEqual(len(decodificar_polyline(result.polyline)), 3)
+        self.assertEqual(TramoRuta.objects.count(), 2)
+
+        # Misma ruta: todo sale de la caché.
+        recalcular_ruta_programada(ruta, proveedor=proveedor)
+        self.assertEqual(len(proveedor.consultas), 1)
+
+        # Se agrega una parada al final: solo el tramo nuevo va al proveedor.
+        ParadaRuta.objects.create(ruta=ruta, punto=self.puntos[3], orden=4, hora_estimada=self.momento)
+        result = recalcular_ruta_programada(ruta, proveedor=proveedor)
+        self.assertEqual(len(proveedor.consultas), 2)
+        self.assertEqual(len(proveedor.consultas[1]), 2)
+        self.assertEqual(result.duracion_segundos, 900)
+
+    def test_sin_proveedor_usa_tiempos_aprendidos_del_gps(self):
+        user = get_user_model().objects.create_user(username="repartidor_tramos", password="x")
+        unidad = Unidad.objects.create(codigo="TRM-01", descripcion="Unidad tramos", sucursal=self.sucursal)
+        repartidor = Repartidor.objects.create(user=user, sucursal=self.sucursal, unidad_asignada=unidad)
+
+        for dia, minutos in ((1, 12), (2, 18)):
+            ruta = self._ruta(self.puntos[:2], estatus=RutaEntrega.ESTATUS_COMPLETADA)
+            salida = self.momento - timedelta(days=dia)
+            for offset, punto in ((0, self.puntos[0]), (minutos, self.puntos[1])):
+                UbicacionRuta.objects.create(
+                    ruta=ruta,
+                    repartidor=repartidor,
+                    unidad=unidad,
+                    latitud=punto.latitud,
+                    longitud=punto.longitud,
+                    timestamp_dispositivo=salida + timedelta(minutes=offset),
+                )
+            self.assertEqual(aprender_tramos_ruta(ruta), 1)
+            self.assertEqual(aprender_tramos_ruta(ruta), 0)
+
+        tramo = TramoRuta.objects.get()
+        self.assertEqual(tramo.observaciones, 2)
+        self.assertEqual(tramo.franja_horaria, franja_para(self.momento))
+        self.assertAlmostEqual(tramo.duracion_observada_segundos, 0.3 * 18 * 60 + 0.7 * 12 * 60)
+
+        result = recalcular_ruta_programada(self._ruta(self.puntos[:2]))
+        self.assertEqual(result.fuente, "CACHE")
+        self.assertEqual(result.duracion_segundos, round(0.3 * 18 * 60 + 0.7 * 12 * 60))
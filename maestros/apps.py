@@ -4,3 +4,6 @@ class MaestrosConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "maestros"
     verbose_name = "Catálogos (Maestros)"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,23 @@
+"""
+Reconstruye el perfil de preparación persistido de los insumos.
+
+Los signals lo mantienen al día; este comando sirve para la carga inicial o
+después de importaciones hechas con ``update()``/SQL que no disparan signals.
+"""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from maestros.utils.readiness_profile import refresh_readiness_profiles
+
+
+class Command(BaseCommand):
+    help = "Recalcula InsumoReadinessProfile para todo el catálogo o para los ids indicados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--insumo-id", action="append", type=int, dest="insumo_ids", default=[])
+
+    def handle(self, *args, **options):
+        insumo_ids = options["insumo_ids"] or None
+        total = refresh_readiness_profiles(insumo_ids)
+        self.stdout.write(self.style.SUCCESS(f"Perfiles de preparación actualizados: {total}"))
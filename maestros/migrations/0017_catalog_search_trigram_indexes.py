@@ -0,0 +1,47 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:30
+
+from django.db import migrations
+
+
+# pg_trgm puede no estar instalado en el servidor (o faltar permisos para
+# crearlo). Sin la extensión la búsqueda de catálogo funciona igual, solo que
+# los icontains vuelven a recorrer la tabla.
+CREATE_TRIGRAM_EXTENSION = """
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    END IF;
+EXCEPTION WHEN insufficient_privilege THEN
+    RAISE NOTICE 'pg_trgm no instalado: %', SQLERRM;
+END $$;
+"""
+
+
+def trigram_index(*, table: str, name: str, column: str):
+    # Misma expresión que genera Django para icontains: UPPER(col::text) LIKE UPPER(%s).
+    return migrations.RunSQL(
+        sql=f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (UPPER({column}::text) gin_trgm_ops);
+            END IF;
+        END $$;
+        """,
+        reverse_sql=f"DROP INDEX IF EXISTS {name}",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("maestros", "0016_alter_insumo_tipo_item"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_TRIGRAM_EXTENSION, reverse_sql=migrations.RunSQL.noop),
+        trigram_index(table="maestros_insumo", name="insumo_nombre_norm_trgm", column="nombre_normalizado"),
+        trigram_index(table="maestros_insumo", name="insumo_nombre_point_trgm", column="nombre_point"),
+        trigram_index(table="maestros_insumo", name="insumo_nombre_trgm", column="nombre"),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maestros', '0017_catalog_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InsumoReadinessProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('es_variante', models.BooleanField(db_index=True, default=False)),
+                ('activo', models.BooleanField(default=True)),
+                ('clase_articulo', models.CharField(db_index=True, default='unknown', max_length=20)),
+                ('falta_unidad_base', models.BooleanField(default=False)),
+                ('falta_proveedor_principal', models.BooleanField(default=False)),
+                ('tiene_proveedor_principal', models.BooleanField(default=False)),
+                ('falta_categoria', models.BooleanField(default=False)),
+                ('falta_codigo_point', models.BooleanField(default=False)),
+                ('sin_costo', models.BooleanField(default=False)),
+                ('missing', models.JSONField(blank=True, default=list)),
+                ('readiness_label', models.CharField(default='', max_length=40)),
+                ('readiness_level', models.CharField(default='', max_length=20)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('canonical', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='maestros.insumo')),
+                ('insumo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='readiness_profile', to='maestros.insumo')),
+            ],
+            options={
+                'verbose_name': 'Perfil de preparación de insumo',
+                'verbose_name_plural': 'Perfiles de preparación de insumos',
+                'indexes': [models.Index(fields=['readiness_label', 'clase_articulo'], name='maestros_ready_label_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:00
+
+from django.db import migrations
+
+
+def upper_index(*, table: str, name: str, column: str):
+    # Misma expresión que genera Django para iexact: UPPER(col::text) = UPPER(%s).
+    # Sin ella el OR con los icontains de trigramas no puede armar un BitmapOr
+    # y el planeador recorre la tabla completa.
+    return migrations.RunSQL(
+        sql=f"CREATE INDEX IF NOT EXISTS {name} ON {table} (UPPER({column}::text))",
+        reverse_sql=f"DROP INDEX IF EXISTS {name}",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("maestros", "0018_insumo_readiness_profile"),
+    ]
+
+    operations = [
+        upper_index(table="maestros_insumo", name="insumo_codigo_upper", column="codigo"),
+        upper_index(table="maestros_insumo", name="insumo_codigo_point_upper", column="codigo_point"),
+    ]
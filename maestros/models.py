@@ -152,6 +152,47 @@ class CostoInsumo(models.Model):
         return f"{self.insumo.nombre} - {self.costo_unitario} {self.moneda}"
 
 
+class InsumoReadinessProfile(models.Model):
+    """Perfil de preparación del insumo canónico, persistido por cada variante.
+
+    Lo recalcula ``maestros.utils.readiness_profile`` cuando cambia el insumo, su
+    unidad, su proveedor o su costo; compras lo une por ``insumo`` para filtrar
+    documentos por faltante en SQL.
+    """
+
+    CLASE_DESCONOCIDA = "unknown"
+
+    insumo = models.OneToOneField(Insumo, on_delete=models.CASCADE, related_name="readiness_profile")
+    canonical = models.ForeignKey(Insumo, on_delete=models.CASCADE, related_name="+")
+    es_variante = models.BooleanField(default=False, db_index=True)
+    activo = models.BooleanField(default=True)
+    clase_articulo = models.CharField(max_length=20, default=CLASE_DESCONOCIDA, db_index=True)
+    falta_unidad_base = models.BooleanField(default=False)
+    falta_proveedor_principal = models.BooleanField(default=False)
+    tiene_proveedor_principal = models.BooleanField(default=False)
+    falta_categoria = models.BooleanField(default=False)
+    falta_codigo_point = models.BooleanField(default=False)
+    sin_costo = models.BooleanField(default=False)
+    missing = models.JSONField(default=list, blank=True)
+    readiness_label = models.CharField(max_length=40, default="")
+    readiness_level = models.CharField(max_length=20, default="")
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Perfil de preparación de insumo"
+        verbose_name_plural = "Perfiles de preparación de insumos"
+        indexes = [
+            models.Index(fields=["readiness_label", "clase_articulo"], name="maestros_ready_label_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.insumo_id} -> {self.canonical_id}: {self.readiness_label}"
+
+    @property
+    def is_ready(self) -> bool:
+        return self.readiness_label == "Lista para operar"
+
+
 class PointPendingMatch(models.Model):
     TIPO_PROVEEDOR = "PROVEEDOR"
     TIPO_INSUMO = "INSUMO"
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from maestros.models import CostoInsumo, Insumo, Proveedor, UnidadMedida
+from maestros.utils.readiness_profile import schedule_readiness_refresh
+
+
+@receiver(post_save, sender=Insumo, dispatch_uid="maestros_readiness_on_insumo_save")
+def _refresh_readiness_on_insumo_save(sender, instance: Insumo, **_kwargs) -> None:
+    schedule_readiness_refresh([instance.id])
+
+
+@receiver(post_delete, sender=Insumo, dispatch_uid="maestros_readiness_on_insumo_delete")
+def _refresh_readiness_on_insumo_delete(sender, instance: Insumo, **_kwargs) -> None:
+    # El perfil del insumo borrado se va en cascada; su grupo puede cambiar de canónico.
+    schedule_readiness_refresh(
+        Insumo.objects.filter(nombre_normalizado=instance.nombre_normalizado)
+        .exclude(pk=instance.pk)
+        .values_list("id", flat=True)
+    )
+
+
+@receiver(post_save, sender=CostoInsumo, dispatch_uid="maestros_readiness_on_costo_save")
+@receiver(post_delete, sender=CostoInsumo, dispatch_uid="maestros_readiness_on_costo_delete")
+def _refresh_readiness_on_costo(sender, instance: CostoInsumo, **_kwargs) -> None:
+    schedule_readiness_refresh([instance.insumo_id])
+
+
+@receiver(post_save, sender=UnidadMedida, dispatch_uid="maestros_readiness_on_unidad_save")
+@receiver(pre_delete, sender=UnidadMedida, dispatch_uid="maestros_readiness_on_unidad_delete")
+def _refresh_readiness_on_unidad(sender, instance: UnidadMedida, created: bool = False, **_kwargs) -> None:
+    if created:
+        return
+    schedule_readiness_refresh(Insumo.objects.filter(unidad_base_id=instance.pk).values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Proveedor, dispatch_uid="maestros_readiness_on_proveedor_save")
+@receiver(pre_delete, sender=Proveedor, dispatch_uid="maestros_readiness_on_proveedor_delete")
+def _refresh_readiness_on_proveedor(sender, instance: Proveedor, created: bool = False, **_kwargs) -> None:
+    if created:
+        return
+    schedule_readiness_refresh(Insumo.objects.filter(proveedor_principal_id=instance.pk).values_list("id", flat=True))
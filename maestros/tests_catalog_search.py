@@ -0,0 +1,108 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from maestros.models import Insumo, InsumoAlias
+from maestros.utils.catalog_search import (
+    ENTIDAD_INSUMO,
+    ENTIDAD_PRODUCTO_POINT,
+    ENTIDAD_RECETA,
+    SCORE_ALIAS,
+    SCORE_EXACTO,
+    buscar_catalogo,
+    buscar_insumos,
+    buscar_productos_point,
+    buscar_recetas,
+)
+from pos_bridge.models import PointProduct
+from recetas.models import Receta
+
+
+class CatalogSearchTests(TestCase):
+    def setUp(self):
+        self.harina = Insumo.objects.create(nombre="Harina de trigo", codigo="HAR-01")
+        self.integral = Insumo.objects.create(nombre="Harina integral", nombre_point="HARINA INTEGRAL 1KG")
+        self.azucar = Insumo.objects.create(nombre="Azucar refinada")
+        Insumo.objects.create(nombre="Harina de arroz", activo=False)
+        InsumoAlias.objects.create(nombre="Harina 000", insumo=self.harina)
+
+    def test_insumos_rankea_exacto_alias_codigo_y_tokens(self):
+        self.assertEqual(buscar_insumos("harina de trigo")[0].objeto, self.harina)
+        self.assertEqual(buscar_insumos("harina de trigo")[0].score, SCORE_EXACTO)
+
+        alias = buscar_insumos("Harina 000")
+        self.assertEqual([(r.objeto, r.score) for r in alias], [(self.harina, SCORE_ALIAS)])
+
+        self.assertEqual(buscar_insumos("har-01")[0].objeto, self.harina)
+        self.assertEqual([r.objeto for r in buscar_insumos("integral harina")], [self.integral])
+        nombres = [r.objeto.nombre for r in buscar_insumos("harina")]
+        self.assertEqual(nombres, ["Harina de trigo", "Harina integral"])
+        self.assertEqual(buscar_insumos("   "), [])
+
+    def test_ajuste_del_llamador_reordena_empates(self):
+        resultados = buscar_insumos("harina", ajuste=lambda insumo: 5 if insumo == self.integral else 0)
+
+        self.assertEqual(resultados[0].objeto, self.integral)
+
+    def test_recetas_y_productos_point_comparten_el_ranking(self):
+        receta = Receta.objects.create(nombre="Pastel de chocolate", hash_contenido="cs-1", codigo_point="PCH")
+        Receta.objects.create(nombre="Chocolate caliente", hash_contenido="cs-2")
+        producto = PointProduct.objects.create(external_id="P-1", sku="PCH-G", name="Pastel Chocolate Grande")
+        PointProduct.objects.create(external_id="P-2", sku="OLD", name="Pastel Chocolate Viejo", active=False)
+
+        self.assertEqual(buscar_recetas("pastel de chocolate")[0].objeto, receta)
+        self.assertEqual(buscar_recetas("pch")[0].objeto, receta)
+        self.assertEqual([r.objeto for r in buscar_productos_point("pastel chocolate")], [producto])
+        self.assertEqual(buscar_productos_point("pch-g")[0].objeto, producto)
+
+        entidades = {r.entidad for r in buscar_catalogo("chocolate")}
+        self.assertLessEqual({ENTIDAD_RECETA, ENTIDAD_PRODUCTO_POINT}, entidades)
+        self.assertEqual(buscar_catalogo("azucar refinada")[0].entidad, ENTIDAD_INSUMO)
+
+    @override_settings(CATALOG_SEARCH_SLOW_MS=0)
+    def test_registra_latencia_de_cada_busqueda(self):
+        with self.assertLogs("maestros.utils.catalog_search", level="WARNING") as logs:
+            buscar_insumos("harina")
+            buscar_recetas("harina")
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(logs.records[0].entidad, ENTIDAD_INSUMO)
+        self.assertGreaterEqual(logs.records[0].duracion_ms, 0)
+
+    def test_indices_de_trigramas_si_hay_pg_trgm(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM pg_extension WHERE extname = 'pg_trgm'")
+            tiene_trgm = cursor.fetchone()[0] == 1
+            cursor.execute(
+                "SELECT COUNT(*) FROM pg_indexes WHERE indexname IN %s",
+                [("insumo_nombre_norm_trgm", "receta_nombre_norm_trgm", "pbprod_norm_name_trgm")],
+            )
+            self.assertEqual(cursor.fetchone()[0], 3 if tiene_trgm else 0)
+
+    def test_indices_de_codigos_para_iexact(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes WHERE indexname IN %s",
+                [
+                    (
+                        "insumo_codigo_upper",
+                        "insumo_codigo_point_upper",
+                        "receta_codigo_point_upper",
+                        "pbprod_sku_upper",
+                        "pbprod_external_id_upper",
+                    )
+                ],
+            )
+            self.assertEqual(len(cursor.fetchall()), 5)
+
+    def test_productos_point_se_recortan_en_sql_conservando_los_mejores(self):
+        for index in range(60):
+            PointProduct.objects.create(external_id=f"PZ-{index}", sku=f"PZ{index}", name=f"Pastel Sabor {index}")
+        grande = PointProduct.objects.create(external_id="PZ-G", sku="PZG", name="Pastel Chocolate Grande")
+
+        with CaptureQueriesContext(connection) as captured:
+            resultados = buscar_productos_point("pastel chocolate grande", limit=1)
+
+        self.assertEqual(resultados[0].objeto, grande)
+        sql = next(query["sql"] for query in captured.captured_queries if "pos_bridge_products" in query["sql"])
+        self.assertIn("LIMIT 40", sql)
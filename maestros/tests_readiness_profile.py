@@ -0,0 +1,111 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from compras.models import SolicitudCompra
+from compras.views import _enterprise_blocker_details_for_solicitud, _master_blocker_readiness_q, _solicitud_blocker_key_q
+from maestros.models import CostoInsumo, Insumo, InsumoReadinessProfile, Proveedor, UnidadMedida
+from maestros.utils.readiness_profile import refresh_readiness_profiles
+
+
+class InsumoReadinessProfileTests(TestCase):
+    def setUp(self):
+        self.unidad = UnidadMedida.objects.create(
+            codigo="kg-ready",
+            nombre="Kilogramo readiness",
+            tipo=UnidadMedida.TIPO_MASA,
+            factor_to_base=Decimal("1000"),
+        )
+        self.proveedor = Proveedor.objects.create(nombre="Proveedor readiness")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.canonical = Insumo.objects.create(
+                nombre="Harina Readiness",
+                unidad_base=self.unidad,
+                codigo_point="READY-001",
+                activo=True,
+            )
+            self.variant = Insumo.objects.create(nombre="HARINA READINESS", activo=True)
+            CostoInsumo.objects.create(
+                insumo=self.variant,
+                costo_unitario=Decimal("12"),
+                source_hash="ready-cost-variant",
+            )
+
+    def _solicitud(self, insumo, **extra):
+        return SolicitudCompra.objects.create(
+            area="Compras",
+            solicitante="admin",
+            insumo=insumo,
+            cantidad=Decimal("2"),
+            fecha_requerida=date(2026, 5, 4),
+            **extra,
+        )
+
+    def test_perfil_por_variante_apunta_al_canonico_del_grupo(self):
+        profile = InsumoReadinessProfile.objects.get(insumo=self.variant)
+
+        self.assertEqual(profile.canonical_id, self.canonical.id)
+        self.assertTrue(profile.es_variante)
+        self.assertFalse(profile.sin_costo)
+        self.assertEqual(profile.missing, ["proveedor principal"])
+        self.assertTrue(profile.falta_proveedor_principal)
+        self.assertEqual(profile.readiness_label, "Incompleto")
+        self.assertEqual(profile.clase_articulo, Insumo.TIPO_MATERIA_PRIMA)
+        self.assertFalse(InsumoReadinessProfile.objects.get(insumo=self.canonical).es_variante)
+
+    def test_cambio_de_proveedor_y_costo_recalcula_el_grupo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.canonical.proveedor_principal = self.proveedor
+            self.canonical.save()
+        for profile in InsumoReadinessProfile.objects.filter(insumo__in=[self.canonical, self.variant]):
+            self.assertTrue(profile.tiene_proveedor_principal)
+            self.assertEqual(profile.readiness_label, "Lista para operar")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CostoInsumo.objects.filter(insumo=self.variant).delete()
+        self.assertTrue(InsumoReadinessProfile.objects.get(insumo=self.canonical).sin_costo)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.proveedor.delete()
+        self.assertFalse(InsumoReadinessProfile.objects.get(insumo=self.variant).tiene_proveedor_principal)
+
+    def test_bloqueos_desde_el_perfil_coinciden_con_el_calculo_en_linea(self):
+        solicitud = self._solicitud(self.variant)
+        InsumoReadinessProfile.objects.all().delete()
+        expected = _enterprise_blocker_details_for_solicitud(SolicitudCompra.objects.get(pk=solicitud.pk))
+
+        refresh_readiness_profiles()
+        loaded = SolicitudCompra.objects.select_related("insumo__readiness_profile__canonical").get(pk=solicitud.pk)
+        with self.assertNumQueries(0):
+            details = _enterprise_blocker_details_for_solicitud(loaded)
+        self.assertEqual(details, expected)
+        self.assertEqual(
+            [item["key"] for item in details],
+            ["no_canonico", "maestro_incompleto", "missing_proveedor_principal", "sin_proveedor"],
+        )
+
+    def test_prefiltro_sql_por_faltante_y_bloqueo(self):
+        sin_proveedor = self._solicitud(self.variant)
+        con_proveedor = self._solicitud(self.variant, proveedor_sugerido=self.proveedor)
+        with self.captureOnCommitCallbacks(execute=True):
+            empaque = Insumo.objects.create(
+                nombre="Etiqueta readiness",
+                tipo_item=Insumo.TIPO_EMPAQUE,
+                unidad_base=self.unidad,
+                proveedor_principal=self.proveedor,
+                codigo_point="READY-EMP",
+                activo=True,
+            )
+        solicitud_empaque = self._solicitud(empaque)
+        sin_perfil = self._solicitud(Insumo.objects.create(nombre="Sin perfil readiness", activo=True))
+
+        by_missing = SolicitudCompra.objects.filter(
+            _master_blocker_readiness_q("insumo__", Insumo.TIPO_MATERIA_PRIMA, "proveedor")
+        )
+        self.assertEqual(set(by_missing), {sin_proveedor, con_proveedor, sin_perfil})
+        by_class = SolicitudCompra.objects.filter(_master_blocker_readiness_q("insumo__", Insumo.TIPO_EMPAQUE, "all"))
+        self.assertEqual(set(by_class), {solicitud_empaque, sin_perfil})
+        by_key = SolicitudCompra.objects.filter(_solicitud_blocker_key_q("sin_proveedor"))
+        self.assertEqual(set(by_key), {sin_proveedor, sin_perfil})
+        self.assertIsNone(_master_blocker_readiness_q("insumo__", "all", "other"))
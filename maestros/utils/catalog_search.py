@@ -0,0 +1,322 @@
+"""Búsqueda rankeada del catálogo compartida por el gateway de IA y los autocompletes.
+
+Cubre insumos (con sus aliases exactos), recetas y productos Point. Los
+``icontains`` se apoyan en índices GIN de trigramas sobre ``UPPER(col)``
+(``maestros 0017``, ``recetas 0042`` y ``pos_bridge 0022``, solo si el servidor
+tiene pg_trgm) y los ``iexact`` de códigos en índices btree sobre ``UPPER(col)``
+(``maestros 0019``, ``recetas 0043`` y ``pos_bridge 0023``): cada rama del ``OR``
+tiene índice y el planeador puede combinarlas en un BitmapOr. Antes de recortar, los candidatos se ordenan en SQL por el mismo
+criterio grueso del ranking (exacto, prefijo, contiene), de modo que el recorte
+conserva los más parecidos. El ranking final usa los escalones del gateway:
+exacto, alias, nombre secundario, código, prefijo, contiene y cobertura de tokens.
+
+Cada búsqueda registra su latencia; las que superan
+``CATALOG_SEARCH_SLOW_MS`` se reportan como warning.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from functools import reduce
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+
+from maestros.models import Insumo, InsumoAlias
+from pos_bridge.models import PointProduct
+from recetas.models import Receta
+from recetas.utils.normalizacion import normalizar_nombre
+
+logger = logging.getLogger(__name__)
+
+ENTIDAD_INSUMO = "insumo"
+ENTIDAD_RECETA = "receta"
+ENTIDAD_PRODUCTO_POINT = "producto_point"
+
+SCORE_EXACTO = 1000
+SCORE_ALIAS = 980
+SCORE_NOMBRE_SECUNDARIO = 960
+SCORE_CODIGO = 930
+SCORE_PREFIJO = 850
+SCORE_CONTIENE = 650
+SCORE_TOKENS_BASE = 500
+SCORE_POR_TOKEN = 20
+
+
+@dataclass(frozen=True)
+class ResultadoBusqueda:
+    entidad: str
+    objeto: Any
+    score: int
+
+    @property
+    def id(self) -> int:
+        return self.objeto.pk
+
+
+def tokens_busqueda(
+    consulta: str,
+    *,
+    stopwords: Iterable[str] = (),
+    normalizar: Callable[[str], str] = normalizar_nombre,
+    min_len: int = 3,
+    max_tokens: int = 6,
+) -> list[str]:
+    excluidos = set(stopwords)
+    tokens = [token for token in normalizar(consulta).split() if token not in excluidos and len(token) >= min_len]
+    return tokens[:max_tokens]
+
+
+def puntuar_texto(
+    consulta_normalizada: str,
+    *,
+    nombre: str,
+    secundario: str = "",
+    codigos: Iterable[str] = (),
+    tokens: Iterable[str] = (),
+    es_alias: bool = False,
+) -> int:
+    """Escalón de coincidencia de un candidato; 0 si no coincide en nada."""
+    score = SCORE_ALIAS if es_alias else 0
+    if not consulta_normalizada:
+        return score
+    if nombre == consulta_normalizada:
+        score = max(score, SCORE_EXACTO)
+    if secundario and secundario == consulta_normalizada:
+        score = max(score, SCORE_NOMBRE_SECUNDARIO)
+    if any(codigo and codigo == consulta_normalizada for codigo in codigos):
+        score = max(score, SCORE_CODIGO)
+    if nombre.startswith(consulta_normalizada):
+        score = max(score, SCORE_PREFIJO)
+    if consulta_normalizada in nombre:
+        score = max(score, SCORE_CONTIENE)
+    tokens = list(tokens)
+    if tokens and all(token in nombre or token in secundario for token in tokens):
+        score = max(score, SCORE_TOKENS_BASE + len(tokens) * SCORE_POR_TOKEN)
+    return score
+
+
+def _rango_sql(campo: str, normalizada: str, *, alias_ids: Iterable[int] = (), exactos: Q | None = None) -> Case:
+    """Orden grueso en SQL: exacto, alias o código, prefijo, contiene y el resto (tokens)."""
+    exacto = Q(**{campo: normalizada}) | Q(pk__in=list(alias_ids))
+    if exactos is not None:
+        exacto |= exactos
+    return Case(
+        When(exacto, then=Value(0)),
+        When(**{f"{campo}__startswith": normalizada}, then=Value(1)),
+        When(**{f"{campo}__contains": normalizada}, then=Value(2)),
+        default=Value(3),
+        output_field=IntegerField(),
+    )
+
+
+def _tokens_sql(campo: str, tokens: Iterable[str]):
+    """Cuántos tokens contiene ``campo``; desempata el recorte por cobertura."""
+    conteos = [
+        Case(When(**{f"{campo}__contains": token}, then=Value(1)), default=Value(0), output_field=IntegerField())
+        for token in tokens
+    ]
+    return reduce(lambda total, conteo: total + conteo, conteos) if conteos else Value(0, output_field=IntegerField())
+
+
+def _registrar_latencia(entidad: str, consulta: str, inicio: float, *, candidatos: int, resultados: int) -> None:
+    duracion_ms = (time.monotonic() - inicio) * 1000
+    umbral_ms = getattr(settings, "CATALOG_SEARCH_SLOW_MS", 200)
+    nivel = logging.WARNING if duracion_ms >= umbral_ms else logging.DEBUG
+    logger.log(
+        nivel,
+        "catalog_search entidad=%s consulta=%r candidatos=%s resultados=%s duracion_ms=%.1f",
+        entidad,
+        consulta,
+        candidatos,
+        resultados,
+        duracion_ms,
+        extra={"entidad": entidad, "duracion_ms": round(duracion_ms, 1)},
+    )
+
+
+def _rankear(
+    entidad: str,
+    candidatos: list,
+    puntuar: Callable[[Any], int],
+    *,
+    limit: int | None,
+    desempate: Callable[[Any], Any],
+) -> list[ResultadoBusqueda]:
+    rankeados = [(candidato, puntuar(candidato)) for candidato in candidatos]
+    rankeados = [(candidato, score) for candidato, score in rankeados if score > 0]
+    rankeados.sort(key=lambda item: (-item[1], desempate(item[0])))
+    if limit is not None:
+        rankeados = rankeados[:limit]
+    return [ResultadoBusqueda(entidad=entidad, objeto=candidato, score=score) for candidato, score in rankeados]
+
+
+def puntuar_insumo(insumo: Insumo, consulta: str, *, alias_ids: set[int], tokens: Iterable[str]) -> int:
+    return puntuar_texto(
+        normalizar_nombre(consulta),
+        nombre=insumo.nombre_normalizado or normalizar_nombre(insumo.nombre),
+        secundario=normalizar_nombre(insumo.nombre_point or ""),
+        codigos=(normalizar_nombre(insumo.codigo or ""), normalizar_nombre(insumo.codigo_point or "")),
+        tokens=tokens,
+        es_alias=insumo.id in alias_ids,
+    )
+
+
+def buscar_insumos(
+    consulta: str,
+    *,
+    limit: int = 10,
+    stopwords: Iterable[str] = (),
+    ajuste: Callable[[Insumo], int] | None = None,
+    queryset: QuerySet | None = None,
+) -> list[ResultadoBusqueda]:
+    """Insumos activos que coinciden por nombre, nombre Point, código o alias exacto.
+
+    ``ajuste`` suma puntos propios del llamador (p. ej. preferir materia prima)
+    sobre el escalón de coincidencia.
+    """
+    inicio = time.monotonic()
+    consulta = (consulta or "").strip()
+    normalizada = normalizar_nombre(consulta)
+    if not normalizada:
+        _registrar_latencia(ENTIDAD_INSUMO, consulta, inicio, candidatos=0, resultados=0)
+        return []
+    alias_ids = set(
+        InsumoAlias.objects.filter(nombre_normalizado=normalizada, insumo__activo=True).values_list("insumo_id", flat=True)
+    )
+    tokens = tokens_busqueda(consulta, stopwords=stopwords)
+    filtro = (
+        Q(pk__in=alias_ids)
+        | Q(nombre_normalizado__icontains=normalizada)
+        | Q(nombre_point__icontains=consulta)
+        | Q(codigo__iexact=consulta)
+        | Q(codigo_point__iexact=consulta)
+    )
+    for token in tokens:
+        filtro |= Q(nombre_normalizado__icontains=token) | Q(nombre_point__icontains=token)
+    base = queryset if queryset is not None else Insumo.objects.select_related("unidad_base", "proveedor_principal")
+    candidatos = list(
+        base.filter(filtro, activo=True)
+        .annotate(rango=_rango_sql("nombre_normalizado", normalizada, alias_ids=alias_ids))
+        .order_by("rango", "id")[: max(limit * 8, 40)]
+    )
+
+    def puntuar(insumo: Insumo) -> int:
+        score = puntuar_insumo(insumo, consulta, alias_ids=alias_ids, tokens=tokens)
+        return score + (ajuste(insumo) if ajuste else 0)
+
+    resultados = _rankear(
+        ENTIDAD_INSUMO,
+        candidatos,
+        puntuar,
+        limit=limit,
+        desempate=lambda insumo: (insumo.nombre.lower(), insumo.id),
+    )
+    _registrar_latencia(ENTIDAD_INSUMO, consulta, inicio, candidatos=len(candidatos), resultados=len(resultados))
+    return resultados
+
+
+def buscar_recetas(consulta: str, *, limit: int = 10) -> list[ResultadoBusqueda]:
+    inicio = time.monotonic()
+    consulta = (consulta or "").strip()
+    normalizada = normalizar_nombre(consulta)
+    if not normalizada:
+        _registrar_latencia(ENTIDAD_RECETA, consulta, inicio, candidatos=0, resultados=0)
+        return []
+    tokens = tokens_busqueda(consulta)
+    filtro = Q(nombre_normalizado__icontains=normalizada) | Q(codigo_point__iexact=consulta)
+    for token in tokens:
+        filtro |= Q(nombre_normalizado__icontains=token)
+    candidatos = list(
+        Receta.objects.filter(filtro)
+        .annotate(rango=_rango_sql("nombre_normalizado", normalizada))
+        .order_by("rango", "id")[: max(limit * 8, 40)]
+    )
+    resultados = _rankear(
+        ENTIDAD_RECETA,
+        candidatos,
+        lambda receta: puntuar_texto(
+            normalizada,
+            nombre=receta.nombre_normalizado,
+            codigos=(normalizar_nombre(receta.codigo_point or ""),),
+            tokens=tokens,
+        ),
+        limit=limit,
+        desempate=lambda receta: receta.id,
+    )
+    _registrar_latencia(ENTIDAD_RECETA, consulta, inicio, candidatos=len(candidatos), resultados=len(resultados))
+    return resultados
+
+
+def buscar_productos_point(
+    consulta: str,
+    *,
+    limit: int | None = 10,
+    normalizar: Callable[[str], str] = normalizar_nombre,
+    tokens: Iterable[str] | None = None,
+    puntuar: Callable[[PointProduct], int] | None = None,
+) -> list[ResultadoBusqueda]:
+    """Productos Point activos por nombre, SKU o id externo.
+
+    El gateway pasa su propio ``normalizar``/``puntuar`` para promociones
+    (sinónimos de tamaño, vaso, rebanada); sin ellos se usan los escalones comunes.
+    """
+    inicio = time.monotonic()
+    consulta = (consulta or "").strip()
+    normalizada = normalizar(consulta)
+    tokens = list(tokens) if tokens is not None else tokens_busqueda(consulta, normalizar=normalizar)
+    if not consulta:
+        _registrar_latencia(ENTIDAD_PRODUCTO_POINT, consulta, inicio, candidatos=0, resultados=0)
+        return []
+    codigos = Q(sku__iexact=consulta) | Q(external_id__iexact=consulta)
+    filtro = Q(name__icontains=consulta) | codigos
+    if normalizada:
+        filtro |= Q(normalized_name__icontains=normalizada)
+    for token in tokens:
+        filtro |= Q(normalized_name__icontains=token)
+    # Igual que en insumos: se ordena por el criterio grueso y se recorta en SQL.
+    # El ``puntuar`` del gateway premia la cobertura de tokens, así que también
+    # se ordena por ella antes del recorte.
+    candidatos = list(
+        PointProduct.objects.filter(filtro, active=True)
+        .annotate(
+            rango=_rango_sql("normalized_name", normalizada, exactos=codigos),
+            tokens_cubiertos=_tokens_sql("normalized_name", tokens),
+        )
+        .order_by("rango", "-tokens_cubiertos", "id")[: max((limit or 10) * 8, 40)]
+    )
+    if puntuar is None:
+
+        def puntuar(product: PointProduct) -> int:
+            return puntuar_texto(
+                normalizada,
+                nombre=normalizar(product.normalized_name or product.name),
+                codigos=(normalizar(product.sku or ""), normalizar(product.external_id or "")),
+                tokens=tokens,
+            )
+
+    resultados = _rankear(
+        ENTIDAD_PRODUCTO_POINT,
+        candidatos,
+        puntuar,
+        limit=limit,
+        desempate=lambda product: (product.name.lower(), product.id),
+    )
+    _registrar_latencia(
+        ENTIDAD_PRODUCTO_POINT, consulta, inicio, candidatos=len(candidatos), resultados=len(resultados)
+    )
+    return resultados
+
+
+def buscar_catalogo(consulta: str, *, limit: int = 10) -> list[ResultadoBusqueda]:
+    """Insumos, recetas y productos Point mezclados por score."""
+    resultados = [
+        *buscar_insumos(consulta, limit=limit),
+        *buscar_recetas(consulta, limit=limit),
+        *buscar_productos_point(consulta, limit=limit),
+    ]
+    resultados.sort(key=lambda resultado: -resultado.score)
+    return resultados[:limit]
@@ -0,0 +1,192 @@
+"""
+Perfil de preparación persistido (``InsumoReadinessProfile``).
+
+Compras evaluaba por documento el canónico, ``enterprise_readiness_profile`` y
+el último costo del grupo. Aquí se calcula una sola vez por grupo canónico
+(mismo ``nombre_normalizado``) y se guarda una fila por variante apuntando a su
+canónico, así que un bloqueo por faltante es un ``JOIN`` y no una pasada en
+Python por documento.
+
+El canónico se elige con la misma prioridad que el catálogo canónico
+(``duplicate_priority``) pero sobre los grupos afectados, sin reconstruir el
+catálogo completo. Un insumo inactivo fuera de grupo queda como su propio
+canónico y sin costo vigente, igual que ``latest_costo_canonico``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import DecimalField, OuterRef, Subquery
+
+from maestros.models import CostoInsumo, Insumo, InsumoReadinessProfile
+from maestros.utils.canonical_catalog import duplicate_priority, enterprise_readiness_profile
+
+_NAME_CHUNK = 500
+_PROFILE_FIELDS = [
+    "canonical",
+    "es_variante",
+    "activo",
+    "clase_articulo",
+    "falta_unidad_base",
+    "falta_proveedor_principal",
+    "tiene_proveedor_principal",
+    "falta_categoria",
+    "falta_codigo_point",
+    "sin_costo",
+    "missing",
+    "readiness_label",
+    "readiness_level",
+    "actualizado_en",
+]
+
+
+def article_class_key(insumo: Insumo | None) -> str:
+    if not insumo:
+        return InsumoReadinessProfile.CLASE_DESCONOCIDA
+    if insumo.tipo_item == Insumo.TIPO_EMPAQUE:
+        return Insumo.TIPO_EMPAQUE
+    if insumo.tipo_item == Insumo.TIPO_INTERNO or (insumo.codigo or "").startswith("DERIVADO:RECETA:"):
+        return Insumo.TIPO_INTERNO
+    return Insumo.TIPO_MATERIA_PRIMA
+
+
+def _latest_cost_subquery(field: str):
+    return Subquery(CostoInsumo.objects.filter(insumo=OuterRef("pk")).order_by("-fecha", "-id").values(field)[:1])
+
+
+def _insumos_with_latest_cost(queryset):
+    return queryset.annotate(
+        latest_costo_unitario=Subquery(
+            CostoInsumo.objects.filter(insumo=OuterRef("pk")).order_by("-fecha", "-id").values("costo_unitario")[:1],
+            output_field=DecimalField(max_digits=18, decimal_places=6),
+        ),
+        latest_costo_fecha=_latest_cost_subquery("fecha"),
+        latest_costo_id=_latest_cost_subquery("id"),
+    )
+
+
+def _group_latest_cost(items: list[Insumo]) -> Decimal | None:
+    dated = [item for item in items if item.latest_costo_id is not None]
+    if not dated:
+        return None
+    latest = max(dated, key=lambda item: (item.latest_costo_fecha, item.latest_costo_id))
+    return Decimal(str(latest.latest_costo_unitario))
+
+
+def _profile_row(insumo: Insumo, canonical: Insumo, latest_cost: Decimal | None) -> InsumoReadinessProfile:
+    profile = enterprise_readiness_profile(canonical)
+    missing = list(profile["missing"])
+    return InsumoReadinessProfile(
+        insumo_id=insumo.id,
+        canonical_id=canonical.id,
+        es_variante=canonical.id != insumo.id,
+        activo=bool(canonical.activo),
+        clase_articulo=article_class_key(canonical),
+        falta_unidad_base="unidad base" in missing,
+        falta_proveedor_principal="proveedor principal" in missing,
+        tiene_proveedor_principal=bool(canonical.proveedor_principal_id),
+        falta_categoria="categoría" in missing,
+        falta_codigo_point="código Point" in missing,
+        sin_costo=latest_cost is None or latest_cost <= 0,
+        missing=missing,
+        readiness_label=profile["readiness_label"],
+        readiness_level=profile["readiness_level"],
+    )
+
+
+def _build_rows(names: list[str], extra_ids: set[int]) -> list[InsumoReadinessProfile]:
+    rows: list[InsumoReadinessProfile] = []
+    grouped: dict[str, list[Insumo]] = {}
+    for insumo in _insumos_with_latest_cost(Insumo.objects.filter(activo=True, nombre_normalizado__in=names)):
+        grouped.setdefault(insumo.nombre_normalizado, []).append(insumo)
+    seen: set[int] = set()
+    for items in grouped.values():
+        canonical = max(items, key=lambda item: (duplicate_priority(item), item.id))
+        latest_cost = _group_latest_cost(items)
+        for item in items:
+            rows.append(_profile_row(item, canonical, latest_cost))
+            seen.add(item.id)
+    inactive_ids = extra_ids - seen
+    if inactive_ids:
+        for insumo in Insumo.objects.filter(id__in=inactive_ids).exclude(activo=True):
+            rows.append(_profile_row(insumo, insumo, None))
+    return rows
+
+
+def _save_rows(rows: list[InsumoReadinessProfile]) -> None:
+    if not rows:
+        return
+    InsumoReadinessProfile.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["insumo"],
+        update_fields=_PROFILE_FIELDS,
+    )
+
+
+def affected_insumo_ids(insumo_ids: Iterable[int]) -> set[int]:
+    """Variantes cuyo perfil depende de ``insumo_ids``: su grupo actual y el grupo que tenían antes."""
+    ids = {int(insumo_id) for insumo_id in insumo_ids if insumo_id}
+    if not ids:
+        return set()
+    names = set(Insumo.objects.filter(id__in=ids).values_list("nombre_normalizado", flat=True))
+    previous_canonicals = set(
+        InsumoReadinessProfile.objects.filter(insumo_id__in=ids).values_list("canonical_id", flat=True)
+    )
+    affected = set(ids)
+    affected.update(Insumo.objects.filter(nombre_normalizado__in=names).values_list("id", flat=True))
+    affected.update(
+        InsumoReadinessProfile.objects.filter(canonical_id__in=previous_canonicals).values_list("insumo_id", flat=True)
+    )
+    return affected
+
+
+def refresh_readiness_profiles(insumo_ids: Iterable[int] | None = None) -> int:
+    """Recalcula perfiles de los grupos afectados por ``insumo_ids`` (``None`` = catálogo completo)."""
+    if insumo_ids is None:
+        target_ids = set(Insumo.objects.values_list("id", flat=True))
+    else:
+        target_ids = affected_insumo_ids(insumo_ids)
+    if not target_ids:
+        return 0
+    names = sorted(set(Insumo.objects.filter(id__in=target_ids).values_list("nombre_normalizado", flat=True)))
+    rows: list[InsumoReadinessProfile] = []
+    for start in range(0, len(names), _NAME_CHUNK):
+        chunk = names[start : start + _NAME_CHUNK]
+        chunk_ids = set(
+            Insumo.objects.filter(id__in=target_ids, nombre_normalizado__in=chunk).values_list("id", flat=True)
+        )
+        rows.extend(_build_rows(chunk, chunk_ids))
+    with transaction.atomic():
+        _save_rows(rows)
+    return len(rows)
+
+
+class _PendingRefresh:
+    def __init__(self):
+        self.ids: set[int] = set()
+        self.done = False
+
+    def __call__(self) -> None:
+        self.done = True
+        refresh_readiness_profiles(self.ids)
+
+
+def schedule_readiness_refresh(insumo_ids: Iterable[int]) -> None:
+    """Acumula ids en un solo callback por transacción y recalcula al confirmar."""
+    ids = {int(insumo_id) for insumo_id in insumo_ids if insumo_id}
+    if not ids:
+        return
+    # Django no expone la cola de on_commit; se revisa aquí para que una carga
+    # masiva de insumos recalcule sus grupos una vez y no por cada save.
+    for entry in getattr(connection, "run_on_commit", ()):
+        if isinstance(entry[1], _PendingRefresh) and not entry[1].done:
+            entry[1].ids.update(ids)
+            return
+    callback = _PendingRefresh()
+    callback.ids.update(ids)
+    transaction.on_commit(callback)
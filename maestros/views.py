@@ -20,9 +20,9 @@ from django.db.models import Count, DateField, DecimalField, OuterRef, Q, Subque
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.utils import timezone
-from openpyxl import Workbook
 from core.access import ROLE_ADMIN, ROLE_COMPRAS, can_view_maestros, has_any_role
 from core.audit import log_event
+from core.db_routing import replica_view
 from recetas.models import LineaReceta, Receta, RecetaCodigoPointAlias, VentaHistorica, normalizar_codigo_point
 from recetas.services.costing_contract import CostContext, resolve_recipe_cost_map
 from recetas.utils.normalizacion import normalizar_nombre
@@ -3235,6 +3235,8 @@ def _export_point_pending_csv(tipo: str, q: str, score_min: float, qs):
 
 
 def _export_point_pending_xlsx(tipo: str, q: str, score_min: float, qs):
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "point_pendientes"
@@ -3963,6 +3965,7 @@ def point_pending_review(request):
 # ─── Costos de adquisición (reventa + insumos) ────────────────────────────────
 
 @login_required
+@replica_view()
 def costos_adquisicion(request):
     """
     Catálogo de costos de adquisición para todos los productos vendidos.
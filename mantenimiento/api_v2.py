@@ -9,7 +9,9 @@ from mantenimiento.services_access import (
     authorized_fallas, authorized_orders, authorized_repairs, authorized_unit_reports,
     authorized_unit_services, can_view_costs,
 )
-from mantenimiento.services_history import inbox_rows, item_detail, unified_history_rows
+from mantenimiento.services_history import (
+    decode_cursor, encode_cursor, inbox_counts, inbox_rows, item_detail, unified_history_rows,
+)
 from mantenimiento.serializers import MaintenanceHistoryEventSerializer
 from mantenimiento.views import AUTH, EsMantenimiento
 
@@ -35,6 +37,17 @@ def _positive_int(raw, default):
     return value if value > 0 else None
 
 
+def _cursor(request):
+    """Cursor keyset opcional; ``False`` si viene mal formado."""
+    raw = (request.query_params.get("cursor") or "").strip()
+    if not raw:
+        return None
+    try:
+        return decode_cursor(raw)
+    except ValueError:
+        return False
+
+
 @api_view(["GET"])
 @authentication_classes(AUTH)
 @permission_classes([EsMantenimiento])
@@ -52,28 +65,21 @@ def bandeja_v2(request):
         return Response({"error": "Paginación no válida."}, status=400)
     page_size = min(page_size, 100)
 
-    period_rows = inbox_rows(request.user, period=period, origin=origin)
-    open_rows = inbox_rows(request.user, period="todo", origin=origin)
-    closed_rows = period_rows
-    counts = {
-        "abiertos": sum(row["estado"] in {"abierto", "en_proceso", "programado"} for row in open_rows),
-        "en_proceso": sum(row["estado"] == "en_proceso" for row in open_rows),
-        "criticos": (sum(row["critico"] and row["estado"] in {"abierto", "en_proceso", "programado"} for row in open_rows)
-                     + sum(row["critico"] and row["estado"] == "cerrado" for row in closed_rows)),
-        "cerrados": sum(row["estado"] == "cerrado" for row in closed_rows),
-    }
-    rows = period_rows
-    if state == "abiertos":
-        rows = [row for row in open_rows if row["estado"] in {"abierto", "en_proceso", "programado"}]
-    elif state == "cerrados":
-        rows = [row for row in rows if row["estado"] == "cerrado"]
-    else:
-        rows = ([row for row in open_rows if row["estado"] in {"abierto", "en_proceso", "programado"}]
-                + [row for row in closed_rows if row["estado"] == "cerrado"])
-    rows.sort(key=lambda row: (row["fecha_evento"] is not None, row["fecha_evento"] or "", row["uid"]), reverse=True)
-    total = len(rows)
-    start = (page - 1) * page_size
-    results = rows[start:start + page_size]
+    cursor = _cursor(request)
+    if cursor is False:
+        return Response({"error": "Cursor no válido."}, status=400)
+
+    counts = inbox_counts(request.user, period=period, origin=origin)
+    total = {"abiertos": counts["abiertos"], "cerrados": counts["cerrados"]}.get(
+        state, counts["abiertos"] + counts["cerrados"]
+    )
+    start = 0 if cursor else (page - 1) * page_size
+    results = inbox_rows(
+        request.user, period=period, origin=origin, state=state,
+        limit=page_size + 1, offset=start, cursor=cursor,
+    )
+    has_next, results = len(results) > page_size, results[:page_size]
+    next_cursor = encode_cursor(results[-1]["fecha_evento"], results[-1]["uid"]) if has_next else None
     for row in results:
         row["fecha_evento"] = row["fecha_evento"].isoformat() if row["fecha_evento"] else None
     return Response({
@@ -82,7 +88,7 @@ def bandeja_v2(request):
         "results": results,
         "pagination": {
             "page": page, "page_size": page_size, "total": total,
-            "has_next": start + page_size < total,
+            "has_next": has_next, "next_cursor": next_cursor,
         },
     })
 
@@ -108,6 +114,9 @@ def historial_v2(request):
     if page is None or page_size is None:
         return Response({"error": "Paginación no válida."}, status=400)
     page_size = min(page_size, 100)
+    cursor = _cursor(request)
+    if cursor is False:
+        return Response({"error": "Cursor no válido."}, status=400)
     sql_filters = {
         "tipo": filters["tipo"], "estado": filters["estado"],
         "sucursal": request.query_params.get("sucursal"), "activo": request.query_params.get("activo"),
@@ -118,29 +127,17 @@ def historial_v2(request):
         if sql_filters[key]:
             try: sql_filters[key] = int(sql_filters[key])
             except ValueError: return Response({"error": f"{key.capitalize()} no válido."}, status=400)
+    start = 0 if cursor else (page - 1) * page_size
     rows, total = unified_history_rows(
         request.user, period=filters["periodo"], include_costs=can_view_costs(request.user),
-        filters=sql_filters, candidate_limit=page * page_size,
+        filters=sql_filters, limit=page_size + 1, offset=start, cursor=cursor,
     )
-    tipo = filters["tipo"]
-    if tipo != "todo":
-        rows = [row for row in rows if row["tipo"] == tipo]
-    if filters["estado"] != "todo": rows = [row for row in rows if row["estado"] == filters["estado"]]
-    for key, field in (("sucursal", "sucursal"), ("activo", "activo_id"), ("unidad", "unidad_id")):
-        raw = request.query_params.get(key)
-        if raw:
-            try: wanted = int(raw)
-            except ValueError: return Response({"error": f"{key.capitalize()} no válido."}, status=400)
-            rows = [row for row in rows if (row[field]["id"] if field == "sucursal" else row[field]) == wanted]
-    query = (request.query_params.get("q") or "").strip().casefold()
-    if query:
-        rows = [row for row in rows if query in " ".join((row["titulo"], row["descripcion"], (row["sujeto"] or {}).get("label", ""), row["actor"]["label"])).casefold()]
-    rows.sort(key=lambda row: (
-        row["fecha_evento"], row["uid"].split(":", 1)[0], int(row["uid"].split(":", 1)[1])
-    ), reverse=True)
-    start = (page - 1) * page_size
-    results = MaintenanceHistoryEventSerializer(rows[start:start + page_size], many=True).data
-    return Response({"schema_version": 2, "results": results, "pagination": {"page": page, "page_size": page_size, "total": total, "has_next": start + page_size < total}})
+    has_next, rows = len(rows) > page_size, rows[:page_size]
+    next_cursor = encode_cursor(rows[-1]["fecha_evento"], rows[-1]["uid"]) if has_next else None
+    results = MaintenanceHistoryEventSerializer(rows, many=True).data
+    return Response({"schema_version": 2, "results": results, "pagination": {
+        "page": page, "page_size": page_size, "total": total, "has_next": has_next, "next_cursor": next_cursor,
+    }})
 
 
 @api_view(["GET"])
@@ -0,0 +1,39 @@
+"""
+Reconstruye el índice ``EventoMantenimiento`` de bandeja e historial.
+
+Los signals lo mantienen al día; este comando sirve para la carga inicial o
+después de correcciones con ``update()``/SQL que no disparan signals.
+"""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from mantenimiento.models import EventoMantenimiento
+from mantenimiento.services_event_index import rebuild_event_index
+
+
+class Command(BaseCommand):
+    help = "Recalcula EventoMantenimiento para todas las fuentes o para las indicadas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fuente",
+            action="append",
+            dest="fuentes",
+            default=[],
+            choices=[value for value, _label in EventoMantenimiento.FUENTE_CHOICES],
+        )
+        parser.add_argument(
+            "--only-empty",
+            action="store_true",
+            help="No hace nada si el índice ya tiene filas (carga inicial al arrancar).",
+        )
+
+    def handle(self, *args, **options):
+        if options["only_empty"] and EventoMantenimiento.objects.exists():
+            self.stdout.write("Índice de mantenimiento ya poblado; sin cambios.")
+            return
+        totals = rebuild_event_index(options["fuentes"] or None)
+        for fuente, total in totals.items():
+            self.stdout.write(f"{fuente}={total}")
+        self.stdout.write(self.style.SUCCESS(f"Eventos de mantenimiento indexados: {sum(totals.values())}"))
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_expand_user_module_access_catalog'),
+        ('mantenimiento', '0005_proveedorservicio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoMantenimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uid', models.CharField(max_length=40, unique=True)),
+                ('fuente', models.CharField(choices=[('falla', 'Reporte de falla'), ('orden', 'Orden de mantenimiento'), ('reporte_unidad', 'Reporte de unidad'), ('reparacion', 'Reparación de unidad'), ('servicio_unidad', 'Servicio de unidad')], max_length=20)),
+                ('fuente_id', models.PositiveIntegerField()),
+                ('tipo', models.CharField(max_length=20)),
+                ('origen', models.CharField(blank=True, default='', max_length=20)),
+                ('estado', models.CharField(max_length=12)),
+                ('fecha_evento', models.DateTimeField(blank=True, null=True)),
+                ('bandeja_origen', models.CharField(blank=True, default='', max_length=12)),
+                ('estado_bandeja', models.CharField(blank=True, default='', max_length=12)),
+                ('fecha_bandeja', models.DateTimeField(blank=True, null=True)),
+                ('critico', models.BooleanField(default=False)),
+                ('sucursal_nombre', models.CharField(blank=True, default='', max_length=200)),
+                ('activo_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('unidad_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('sujeto_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('sujeto_nombre', models.CharField(blank=True, default='', max_length=200)),
+                ('actor_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('actor_nombre', models.CharField(blank=True, default='', max_length=200)),
+                ('titulo', models.TextField(blank=True, default='')),
+                ('descripcion', models.TextField(blank=True, default='')),
+                ('costo', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('parent_uid', models.CharField(blank=True, default='', max_length=40)),
+                ('captura_directa', models.BooleanField(default=False)),
+                ('factura', models.JSONField(blank=True, null=True)),
+                ('foto_inicial', models.JSONField(blank=True, null=True)),
+                ('texto_busqueda', models.TextField(blank=True, default='')),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('sucursal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.sucursal')),
+            ],
+            options={
+                'verbose_name': 'Evento de mantenimiento',
+                'verbose_name_plural': 'Eventos de mantenimiento',
+                'ordering': ['-fecha_evento', '-fuente', '-fuente_id'],
+                'indexes': [models.Index(fields=['-fecha_evento', '-fuente', '-fuente_id'], name='mant_evento_hist_idx'), models.Index(fields=['sucursal', '-fecha_evento'], name='mant_evento_suc_idx'), models.Index(fields=['estado_bandeja', '-fecha_bandeja'], name='mant_evento_bandeja_idx'), models.Index(fields=['fuente', 'fuente_id'], name='mant_evento_fuente_idx'), models.Index(fields=['actor_id'], name='mant_evento_actor_idx'), models.Index(fields=['activo_id'], name='mant_evento_activo_idx'), models.Index(fields=['unidad_id'], name='mant_evento_unidad_idx')],
+            },
+        ),
+    ]
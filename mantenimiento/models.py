@@ -73,3 +73,74 @@ class SolicitudCancelacion(models.Model):
 
     def __str__(self):
         return f"{self.get_tipo_display()} #{self.objeto_id} · {self.estatus}"
+
+
+class EventoMantenimiento(models.Model):
+    """Índice desnormalizado: una fila por hecho de mantenimiento (falla, orden, unidad).
+
+    Lo mantienen los signals de ``mantenimiento.signals``; bandeja e historial v2
+    leen sólo de aquí. ``fecha_evento``/``estado`` siguen las reglas del
+    historial y ``fecha_bandeja``/``estado_bandeja`` las de la bandeja (que
+    conserva ``programado`` y fecha la orden abierta por su creación).
+    """
+
+    FUENTE_FALLA = "falla"
+    FUENTE_ORDEN = "orden"
+    FUENTE_REPORTE_UNIDAD = "reporte_unidad"
+    FUENTE_REPARACION = "reparacion"
+    FUENTE_SERVICIO_UNIDAD = "servicio_unidad"
+    FUENTE_CHOICES = [
+        (FUENTE_FALLA, "Reporte de falla"),
+        (FUENTE_ORDEN, "Orden de mantenimiento"),
+        (FUENTE_REPORTE_UNIDAD, "Reporte de unidad"),
+        (FUENTE_REPARACION, "Reparación de unidad"),
+        (FUENTE_SERVICIO_UNIDAD, "Servicio de unidad"),
+    ]
+
+    uid = models.CharField(max_length=40, unique=True)
+    fuente = models.CharField(max_length=20, choices=FUENTE_CHOICES)
+    fuente_id = models.PositiveIntegerField()
+    tipo = models.CharField(max_length=20)
+    origen = models.CharField(max_length=20, blank=True, default="")
+    estado = models.CharField(max_length=12)
+    fecha_evento = models.DateTimeField(null=True, blank=True)
+    bandeja_origen = models.CharField(max_length=12, blank=True, default="")
+    estado_bandeja = models.CharField(max_length=12, blank=True, default="")
+    fecha_bandeja = models.DateTimeField(null=True, blank=True)
+    critico = models.BooleanField(default=False)
+    sucursal = models.ForeignKey(
+        "core.Sucursal", on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    sucursal_nombre = models.CharField(max_length=200, blank=True, default="")
+    activo_id = models.PositiveIntegerField(null=True, blank=True)
+    unidad_id = models.PositiveIntegerField(null=True, blank=True)
+    sujeto_id = models.PositiveIntegerField(null=True, blank=True)
+    sujeto_nombre = models.CharField(max_length=200, blank=True, default="")
+    actor_id = models.PositiveIntegerField(null=True, blank=True)
+    actor_nombre = models.CharField(max_length=200, blank=True, default="")
+    titulo = models.TextField(blank=True, default="")
+    descripcion = models.TextField(blank=True, default="")
+    costo = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    parent_uid = models.CharField(max_length=40, blank=True, default="")
+    captura_directa = models.BooleanField(default=False)
+    factura = models.JSONField(null=True, blank=True)
+    foto_inicial = models.JSONField(null=True, blank=True)
+    texto_busqueda = models.TextField(blank=True, default="")
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-fecha_evento", "-fuente", "-fuente_id"]
+        verbose_name = "Evento de mantenimiento"
+        verbose_name_plural = "Eventos de mantenimiento"
+        indexes = [
+            models.Index(fields=["-fecha_evento", "-fuente", "-fuente_id"], name="mant_evento_hist_idx"),
+            models.Index(fields=["sucursal", "-fecha_evento"], name="mant_evento_suc_idx"),
+            models.Index(fields=["estado_bandeja", "-fecha_bandeja"], name="mant_evento_bandeja_idx"),
+            models.Index(fields=["fuente", "fuente_id"], name="mant_evento_fuente_idx"),
+            models.Index(fields=["actor_id"], name="mant_evento_actor_idx"),
+            models.Index(fields=["activo_id"], name="mant_evento_activo_idx"),
+            models.Index(fields=["unidad_id"], name="mant_evento_unidad_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.uid} · {self.estado}"
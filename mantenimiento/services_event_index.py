@@ -0,0 +1,256 @@
+"""Mantenimiento del índice ``EventoMantenimiento``.
+
+Cada fuente (fallas, órdenes, reportes/reparaciones/servicios de unidad) se
+normaliza aquí una sola vez por escritura: estado canónico, fecha efectiva,
+sucursal, sujeto, actor, costo y el texto de búsqueda. Bandeja e historial
+v2 consultan sólo el índice, así que leer ya no depende del número de
+fuentes ni del volumen acumulado.
+
+Los signals llaman ``reindex_events`` con los ids tocados; el comando
+``rebuild_maintenance_event_index`` cubre la carga inicial y los cambios
+hechos con ``update()``/SQL que no disparan signals.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from django.db.models import Exists, OuterRef
+
+from activos.models import OrdenMantenimiento, SolicitudFalla
+from fallas.models import ReporteFalla
+from logistica.models import ReparacionUnidad, ReporteUnidad, ServicioRealizadoUnidad
+from mantenimiento.models import EventoMantenimiento
+from mantenimiento.services_history import (
+    _aware_date, _evidence_payload, _history_actor, _invoice, canonical_status,
+)
+
+
+_ID_CHUNK = 1000
+_UPDATE_FIELDS = [
+    field.name for field in EventoMantenimiento._meta.concrete_fields
+    if field.name not in {"id", "uid"}
+]
+
+FALLA_STATES = {
+    ReporteFalla.ESTATUS_ABIERTO: "abierto",
+    ReporteFalla.ESTATUS_REVISION: "en_proceso",
+    ReporteFalla.ESTATUS_PROCESO: "en_proceso",
+    ReporteFalla.ESTATUS_RESUELTO: "cerrado",
+    ReporteFalla.ESTATUS_CERRADO: "cerrado",
+    ReporteFalla.ESTATUS_CANCELADO: "cancelado",
+}
+
+
+def _full_name(first_name, last_name):
+    return " ".join(filter(None, [first_name, last_name]))
+
+
+def _event(*, fuente, pk, tipo, origen, estado, fecha_evento, estado_bandeja="", fecha_bandeja=None,
+           bandeja_origen="", critico=False, sucursal_id, sucursal_nombre, sujeto_id=None, sujeto_nombre="",
+           actor, titulo, descripcion, activo_id=None, unidad_id=None, costo=None, parent_uid="",
+           captura_directa=False, factura=None, foto_inicial=None):
+    titulo = titulo or ""
+    descripcion = descripcion or ""
+    sujeto_nombre = sujeto_nombre or ""
+    # Mismo texto contra el que el historial filtraba ``q`` en Python.
+    texto = " ".join((titulo, descripcion, sujeto_nombre if sujeto_id else "", actor["label"]))
+    return EventoMantenimiento(
+        uid=f"{fuente}:{pk}", fuente=fuente, fuente_id=pk, tipo=tipo, origen=origen, estado=estado,
+        fecha_evento=_aware_date(fecha_evento), estado_bandeja=estado_bandeja,
+        fecha_bandeja=_aware_date(fecha_bandeja), bandeja_origen=bandeja_origen, critico=critico,
+        sucursal_id=sucursal_id, sucursal_nombre=sucursal_nombre or "", activo_id=activo_id,
+        unidad_id=unidad_id, sujeto_id=sujeto_id, sujeto_nombre=sujeto_nombre, actor_id=actor["id"],
+        actor_nombre=actor["label"], titulo=titulo, descripcion=descripcion, costo=costo,
+        parent_uid=parent_uid or "", captura_directa=captura_directa, factura=factura,
+        foto_inicial=foto_inicial, texto_busqueda=texto.casefold(),
+    )
+
+
+def _falla_events(ids):
+    rows = ReporteFalla.objects.filter(id__in=ids).values(
+        "id", "titulo", "descripcion", "prioridad", "estatus", "fecha_reporte", "fecha_resolucion",
+        "fecha_cierre", "foto_evidencia", "costo_estimado", "costo_real", "sucursal_id", "sucursal__nombre",
+        "activo_relacionado_id", "activo_relacionado__nombre",
+        "reportado_por_id", "reportado_por__first_name", "reportado_por__last_name", "reportado_por__username",
+    )
+    for row in rows:
+        state = FALLA_STATES[row["estatus"]]
+        event = (row["fecha_cierre"] or row["fecha_resolucion"]) if state == "cerrado" else row["fecha_reporte"]
+        yield _event(
+            fuente=EventoMantenimiento.FUENTE_FALLA, pk=row["id"], tipo="reporte", origen="falla",
+            estado=state, fecha_evento=event,
+            estado_bandeja="" if state == "cancelado" else state, fecha_bandeja=event,
+            bandeja_origen="sucursales", critico=row["prioridad"] == ReporteFalla.PRIORIDAD_CRITICA,
+            sucursal_id=row["sucursal_id"], sucursal_nombre=row["sucursal__nombre"],
+            sujeto_id=row["activo_relacionado_id"], sujeto_nombre=row["activo_relacionado__nombre"],
+            actor=_history_actor(
+                row["reportado_por_id"],
+                _full_name(row["reportado_por__first_name"], row["reportado_por__last_name"]),
+                row["reportado_por__username"],
+            ),
+            titulo=row["titulo"], descripcion=row["descripcion"], activo_id=row["activo_relacionado_id"],
+            costo=row["costo_real"] if row["costo_real"] is not None else row["costo_estimado"],
+            foto_inicial=_evidence_payload("falla_inicial", row["id"], row["foto_evidencia"]),
+        )
+
+
+def _order_events(ids):
+    rows = OrdenMantenimiento.objects.filter(id__in=ids).annotate(
+        has_linked_request=Exists(SolicitudFalla.objects.filter(orden_atencion_id=OuterRef("pk")))
+    ).values(
+        "id", "folio", "descripcion", "prioridad", "estatus", "creado_en", "fecha_programada", "fecha_cierre",
+        "origen", "plan_ref_id", "has_linked_request", "numero_factura", "factura_archivo",
+        "costo_repuestos", "costo_mano_obra", "costo_otros",
+        "activo_ref_id", "activo_ref__nombre", "activo_ref__sucursal_id", "activo_ref__sucursal__nombre",
+        "creado_por_id", "creado_por__first_name", "creado_por__last_name", "creado_por__username",
+    )
+    for row in rows:
+        state = canonical_status("orden", row["estatus"])
+        unreported = (
+            row["origen"] in {OrdenMantenimiento.ORIGEN_EMERGENCIA, OrdenMantenimiento.ORIGEN_INICIATIVA}
+            and not row["plan_ref_id"] and not row["has_linked_request"]
+        )
+        yield _event(
+            fuente=EventoMantenimiento.FUENTE_ORDEN, pk=row["id"], tipo="sin_reporte" if unreported else "orden",
+            origen="sin_reporte" if unreported else row["origen"].lower(), estado=state,
+            fecha_evento=(row["fecha_cierre"] if state == "cerrado" and row["fecha_cierre"]
+                          else row["fecha_programada"]),
+            estado_bandeja="" if state == "cancelado" else state,
+            fecha_bandeja=row["fecha_cierre"] if state == "cerrado" else row["creado_en"],
+            bandeja_origen="sucursales", critico=row["prioridad"] == OrdenMantenimiento.PRIORIDAD_CRITICA,
+            sucursal_id=row["activo_ref__sucursal_id"], sucursal_nombre=row["activo_ref__sucursal__nombre"],
+            sujeto_id=row["activo_ref_id"], sujeto_nombre=row["activo_ref__nombre"],
+            actor=_history_actor(
+                row["creado_por_id"],
+                _full_name(row["creado_por__first_name"], row["creado_por__last_name"]),
+                row["creado_por__username"],
+            ),
+            titulo=row["folio"], descripcion=row["descripcion"], activo_id=row["activo_ref_id"],
+            costo=(row["costo_repuestos"] or 0) + (row["costo_mano_obra"] or 0) + (row["costo_otros"] or 0),
+            captura_directa=unreported,
+            factura=_invoice("orden_factura", row["id"], row["factura_archivo"], row["numero_factura"]),
+        )
+
+
+def _unit_report_events(ids):
+    rows = ReporteUnidad.objects.filter(id__in=ids).values(
+        "id", "tipo", "descripcion", "severidad", "estatus", "fecha_reporte", "fecha_cierre",
+        "repartidor__user_id", "repartidor__user__first_name", "repartidor__user__last_name",
+        "repartidor__user__username", "unidad_id", "unidad__codigo", "unidad__sucursal_id",
+        "unidad__sucursal__nombre",
+    )
+    for row in rows:
+        state = canonical_status("reporte_unidad", row["estatus"])
+        # Los reportes cerrados antes de existir ``fecha_cierre`` se fechan por su reporte.
+        event = row["fecha_cierre"] if state == "cerrado" and row["fecha_cierre"] else row["fecha_reporte"]
+        yield _event(
+            fuente=EventoMantenimiento.FUENTE_REPORTE_UNIDAD, pk=row["id"], tipo="reporte",
+            origen="reporte_unidad", estado="en_proceso" if state == "programado" else state,
+            fecha_evento=event, estado_bandeja="" if state == "cancelado" else state, fecha_bandeja=event,
+            bandeja_origen="logistica", critico=row["severidad"] == ReporteUnidad.SEVERIDAD_CRITICO,
+            sucursal_id=row["unidad__sucursal_id"], sucursal_nombre=row["unidad__sucursal__nombre"],
+            sujeto_id=row["unidad_id"], sujeto_nombre=row["unidad__codigo"],
+            actor=_history_actor(
+                row["repartidor__user_id"],
+                _full_name(row["repartidor__user__first_name"], row["repartidor__user__last_name"]),
+                row["repartidor__user__username"],
+            ),
+            titulo=row["tipo"], descripcion=row["descripcion"], unidad_id=row["unidad_id"],
+        )
+
+
+def _unit_fact_actor(obj):
+    user = obj.registrado_por
+    return _history_actor(
+        obj.registrado_por_id, user.get_full_name() if user else "", user.get_username() if user else ""
+    )
+
+
+def _repair_events(ids):
+    queryset = ReparacionUnidad.objects.filter(id__in=ids).select_related(
+        "registrado_por", "unidad", "unidad__sucursal"
+    )
+    for obj in queryset:
+        yield _event(
+            fuente=EventoMantenimiento.FUENTE_REPARACION, pk=obj.pk, tipo="reparacion", origen="reparacion",
+            estado="cerrado", fecha_evento=obj.fecha_ingreso,
+            sucursal_id=obj.unidad.sucursal_id, sucursal_nombre=obj.unidad.sucursal.nombre,
+            sujeto_id=obj.unidad_id, sujeto_nombre=obj.unidad.codigo, actor=_unit_fact_actor(obj),
+            titulo=obj.descripcion_falla, descripcion=obj.notas or obj.descripcion_reparacion,
+            unidad_id=obj.unidad_id, costo=obj.costo_total,
+            parent_uid=f"reporte_unidad:{obj.reporte_origen_id}" if obj.reporte_origen_id else "",
+            captura_directa=not obj.reporte_origen_id,
+            factura=_invoice("reparacion_factura", obj.pk, obj.archivo_factura),
+        )
+
+
+def _unit_service_events(ids):
+    # Los servicios anulados conservan su auditoría pero salen del historial.
+    queryset = ServicioRealizadoUnidad.objects.vigentes().filter(id__in=ids).select_related(
+        "registrado_por", "unidad", "unidad__sucursal", "tipo_servicio"
+    )
+    for obj in queryset:
+        yield _event(
+            fuente=EventoMantenimiento.FUENTE_SERVICIO_UNIDAD, pk=obj.pk, tipo="servicio_unidad",
+            origen="servicio_unidad", estado="cerrado", fecha_evento=obj.fecha_servicio,
+            sucursal_id=obj.unidad.sucursal_id, sucursal_nombre=obj.unidad.sucursal.nombre,
+            sujeto_id=obj.unidad_id, sujeto_nombre=obj.unidad.codigo, actor=_unit_fact_actor(obj),
+            titulo=obj.tipo_servicio.nombre, descripcion=obj.notas, unidad_id=obj.unidad_id,
+            costo=obj.costo, captura_directa=True,
+            factura=_invoice("servicio_unidad_factura", obj.pk, obj.archivo_factura),
+        )
+
+
+SOURCES = {
+    EventoMantenimiento.FUENTE_FALLA: (ReporteFalla, _falla_events),
+    EventoMantenimiento.FUENTE_ORDEN: (OrdenMantenimiento, _order_events),
+    EventoMantenimiento.FUENTE_REPORTE_UNIDAD: (ReporteUnidad, _unit_report_events),
+    EventoMantenimiento.FUENTE_REPARACION: (ReparacionUnidad, _repair_events),
+    EventoMantenimiento.FUENTE_SERVICIO_UNIDAD: (ServicioRealizadoUnidad, _unit_service_events),
+}
+
+
+def reindex_events(fuente: str, ids: Iterable[int]) -> int:
+    """Recalcula las filas de ``fuente`` para ``ids``; las que ya no aplican se borran."""
+    ids = sorted({int(pk) for pk in ids if pk})
+    if not ids:
+        return 0
+    _model, build = SOURCES[fuente]
+    written = 0
+    for start in range(0, len(ids), _ID_CHUNK):
+        chunk = ids[start:start + _ID_CHUNK]
+        events = list(build(chunk))
+        EventoMantenimiento.objects.filter(fuente=fuente, fuente_id__in=chunk).exclude(
+            fuente_id__in=[event.fuente_id for event in events]
+        ).delete()
+        if events:
+            EventoMantenimiento.objects.bulk_create(
+                events, update_conflicts=True, unique_fields=["uid"], update_fields=_UPDATE_FIELDS,
+            )
+        written += len(events)
+    return written
+
+
+def reindex_indexed(queryset) -> int:
+    """Recalcula las filas ya indexadas que cumplen ``queryset`` (p. ej. por actor o unidad)."""
+    grouped: dict[str, set[int]] = {}
+    for fuente, fuente_id in queryset.values_list("fuente", "fuente_id"):
+        grouped.setdefault(fuente, set()).add(fuente_id)
+    return sum(reindex_events(fuente, ids) for fuente, ids in grouped.items())
+
+
+def remove_event(fuente: str, pk: int) -> None:
+    EventoMantenimiento.objects.filter(uid=f"{fuente}:{pk}").delete()
+
+
+def rebuild_event_index(fuentes: Iterable[str] | None = None) -> dict[str, int]:
+    """Reconstruye el índice completo (o las fuentes indicadas) y purga huérfanos."""
+    totals = {}
+    for fuente in fuentes or SOURCES:
+        model, _build = SOURCES[fuente]
+        EventoMantenimiento.objects.filter(fuente=fuente).exclude(
+            fuente_id__in=model.objects.values("id")
+        ).delete()
+        totals[fuente] = reindex_events(fuente, model.objects.values_list("id", flat=True).iterator())
+    return totals
@@ -1,16 +1,16 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 from django.utils import timezone
-from django.db.models import Case, Exists, F, OuterRef, Prefetch, Q, When
-from django.db.models.functions import Coalesce
+from django.db.models import Count, F, Prefetch, Q
 from django.http import Http404
 
-from activos.models import OrdenMantenimiento
 from fallas.models import BitacoraFalla, EvidenciaSeguimientoFalla, ReporteFalla
-from logistica.models import ReparacionUnidad, ReporteUnidad, ServicioRealizadoUnidad
+from mantenimiento.models import EventoMantenimiento
 from mantenimiento.services_access import (
-    authorized_fallas, authorized_orders, authorized_repairs, authorized_unit_reports,
+    authorized_branch_ids, authorized_fallas, authorized_orders, authorized_repairs, authorized_unit_reports,
     authorized_unit_services,
 )
 
@@ -74,76 +74,108 @@ def _aware_date(value):
     return datetime.combine(value, datetime.min.time(), MAZATLAN)
 
 
-def _in_period(value, start, end):
-    event = _aware_date(value)
-    if event is None:
-        return start is None
-    return (start is None or event >= start) and event < end
+OPEN_INBOX_STATES = ("abierto", "en_proceso", "programado")
+INBOX_ORDER = (F("fecha_bandeja").desc(nulls_last=True), "-fuente", "-fuente_id")
+HISTORY_ORDER = ("-fecha_evento", "-fuente", "-fuente_id")
+
+
+def authorized_events(user):
+    """Eventos del índice visibles para ``user`` con la misma política por sucursal."""
+    branch_ids = authorized_branch_ids(user)
+    queryset = EventoMantenimiento.objects.all()
+    if branch_ids is None:
+        return queryset
+    return queryset.filter(sucursal_id__in=branch_ids)
+
+
+def encode_cursor(event_date, uid):
+    fuente, pk = uid.split(":", 1)
+    raw = f"{event_date.isoformat() if event_date else ''}|{fuente}|{int(pk)}"
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Devuelve ``(fecha, fuente, id)``; ``ValueError`` si el cursor no es válido."""
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        event_date, fuente, pk = raw.split("|")
+        event_date = datetime.fromisoformat(event_date) if event_date else None
+        pk = int(pk)
+    except (TypeError, UnicodeDecodeError, binascii.Error) as exc:
+        raise ValueError("Cursor no válido") from exc
+    if fuente not in dict(EventoMantenimiento.FUENTE_CHOICES) or (event_date and not timezone.is_aware(event_date)):
+        raise ValueError("Cursor no válido")
+    return event_date, fuente, pk
+
+
+def _after_cursor(date_field, cursor):
+    """Keyset sobre ``(fecha desc nulls last, fuente desc, fuente_id desc)``.
+
+    El ``fecha <= cursor`` redundante deja el brazo fechado como un rango del
+    índice; las filas sin fecha van en su propio brazo ``IS NULL``.
+    """
+    event_date, fuente, pk = cursor
+    tie = Q(fuente__lt=fuente) | Q(fuente=fuente, fuente_id__lt=pk)
+    if event_date is None:
+        return Q(**{f"{date_field}__isnull": True}) & tie
+    dated = Q(**{f"{date_field}__lte": event_date}) & (
+        Q(**{f"{date_field}__lt": event_date}) | (Q(**{date_field: event_date}) & tie)
+    )
+    return dated | Q(**{f"{date_field}__isnull": True})
+
+
+def _date_range_q(date_field, start, end, *, include_undated=False):
+    query = Q(**{f"{date_field}__lt": end})
+    if start:
+        return query & Q(**{f"{date_field}__gte": start})
+    if include_undated:
+        query |= Q(**{f"{date_field}__isnull": True})
+    return query
 
 
-def inbox_rows(user, *, period, origin):
-    """Return authorized, normalized inbox rows with a fixed query count."""
+def _inbox_scope(user, *, period, origin):
+    """Base de la bandeja: abiertos de todo el tiempo y cerrados dentro de ``period``."""
     start, end = period_bounds(period)
-    rows = []
-    if origin in {"sucursales", "todos"}:
-        fallas = authorized_fallas(user).exclude(estatus=ReporteFalla.ESTATUS_CANCELADO).values(
-            "id", "titulo", "descripcion", "prioridad", "estatus", "fecha_reporte",
-            "fecha_resolucion", "fecha_cierre", "foto_evidencia", "sucursal_id", "sucursal__nombre",
-        )
-        for row in fallas:
-            state = {
-                ReporteFalla.ESTATUS_ABIERTO: "abierto",
-                ReporteFalla.ESTATUS_REVISION: "en_proceso",
-                ReporteFalla.ESTATUS_PROCESO: "en_proceso",
-                ReporteFalla.ESTATUS_RESUELTO: "cerrado",
-                ReporteFalla.ESTATUS_CERRADO: "cerrado",
-            }.get(row["estatus"])
-            event = (row["fecha_cierre"] or row["fecha_resolucion"]) if state == "cerrado" else row["fecha_reporte"]
-            if state and _in_period(event, start, end):
-                rows.append(_row_payload(
-                    uid=f"falla:{row['id']}", pk=row["id"], kind="falla", origin="sucursales",
-                    state=state, critical=row["prioridad"] == ReporteFalla.PRIORIDAD_CRITICA,
-                    event=event, title=row["titulo"], description=row["descripcion"],
-                    branch_id=row["sucursal_id"], branch_name=row["sucursal__nombre"],
-                    initial_photo=_evidence_payload("falla_inicial", row["id"], row["foto_evidencia"]),
-                ))
-
-        orders = authorized_orders(user).exclude(estatus=OrdenMantenimiento.ESTATUS_CANCELADA).values(
-            "id", "folio", "descripcion", "prioridad", "estatus", "creado_en", "fecha_cierre",
-            "activo_ref__sucursal_id", "activo_ref__sucursal__nombre", "activo_ref_id", "activo_ref__nombre",
-        )
-        for row in orders:
-            state = canonical_status("orden", row["estatus"])
-            event = row["fecha_cierre"] if state == "cerrado" else row["creado_en"]
-            if _in_period(event, start, end):
-                rows.append(_row_payload(
-                    uid=f"orden:{row['id']}", pk=row["id"], kind="orden", origin="sucursales",
-                    state=state, critical=row["prioridad"] == OrdenMantenimiento.PRIORIDAD_CRITICA,
-                    event=event, title=row["folio"], description=row["descripcion"],
-                    branch_id=row["activo_ref__sucursal_id"], branch_name=row["activo_ref__sucursal__nombre"],
-                    subject_id=row["activo_ref_id"], subject=row["activo_ref__nombre"],
-                ))
-
-    if origin in {"logistica", "todos"}:
-        reports = authorized_unit_reports(user).values(
-            "id", "tipo", "descripcion", "severidad", "estatus", "fecha_reporte",
-            "fecha_cierre",
-            "unidad_id", "unidad__codigo", "unidad__sucursal_id", "unidad__sucursal__nombre",
-        )
-        for row in reports:
-            state = canonical_status("reporte_unidad", row["estatus"])
-            # Historical rows created before ``fecha_cierre`` existed must remain
-            # visible.  Their report timestamp is the only trustworthy event date.
-            event = (row["fecha_cierre"] or row["fecha_reporte"]) if state == "cerrado" else row["fecha_reporte"]
-            if state != "cancelado" and _in_period(event, start, end):
-                rows.append(_row_payload(
-                    uid=f"reporte_unidad:{row['id']}", pk=row["id"], kind="reporte_unidad", origin="logistica",
-                    state=state, critical=row["severidad"] == ReporteUnidad.SEVERIDAD_CRITICO,
-                    event=event, title=row["tipo"], description=row["descripcion"],
-                    branch_id=row["unidad__sucursal_id"], branch_name=row["unidad__sucursal__nombre"],
-                    subject_id=row["unidad_id"], subject=row["unidad__codigo"],
-                ))
-    return rows
+    _todo_start, todo_end = period_bounds("todo")
+    queryset = authorized_events(user).exclude(estado_bandeja="")
+    if origin != "todos":
+        queryset = queryset.filter(bandeja_origen=origin)
+    open_q = Q(estado_bandeja__in=OPEN_INBOX_STATES) & _date_range_q(
+        "fecha_bandeja", None, todo_end, include_undated=True
+    )
+    closed_q = Q(estado_bandeja="cerrado") & _date_range_q("fecha_bandeja", start, end, include_undated=True)
+    return queryset, open_q, closed_q
+
+
+def inbox_counts(user, *, period, origin):
+    """Conteos de la bandeja en una sola consulta agregada."""
+    queryset, open_q, closed_q = _inbox_scope(user, period=period, origin=origin)
+    return queryset.aggregate(
+        abiertos=Count("id", filter=open_q),
+        en_proceso=Count("id", filter=open_q & Q(estado_bandeja="en_proceso")),
+        criticos=Count("id", filter=(open_q | closed_q) & Q(critico=True)),
+        cerrados=Count("id", filter=closed_q),
+    )
+
+
+def inbox_rows(user, *, period, origin, state="todos", limit=None, offset=0, cursor=None):
+    """Página de la bandeja ya ordenada y recortada en SQL."""
+    queryset, open_q, closed_q = _inbox_scope(user, period=period, origin=origin)
+    queryset = queryset.filter({"abiertos": open_q, "cerrados": closed_q}.get(state, open_q | closed_q))
+    if cursor:
+        queryset = queryset.filter(_after_cursor("fecha_bandeja", cursor))
+    queryset = queryset.order_by(*INBOX_ORDER)
+    if limit is not None:
+        queryset = queryset[offset:offset + limit]
+    return [_row_payload(
+        uid=event.uid, pk=event.fuente_id, kind=event.fuente, origin=event.bandeja_origen,
+        state=event.estado_bandeja, critical=event.critico, event=event.fecha_bandeja,
+        title=event.titulo, description=event.descripcion,
+        branch_id=event.sucursal_id, branch_name=event.sucursal_nombre,
+        # La bandeja nunca mostró el activo relacionado de una falla.
+        subject_id=None if event.fuente == EventoMantenimiento.FUENTE_FALLA else event.sujeto_id,
+        subject=event.sujeto_nombre, initial_photo=event.foto_inicial,
+    ) for event in queryset]
 
 
 def _history_actor(user_id, full_name, username):
@@ -152,223 +184,52 @@ def _history_actor(user_id, full_name, username):
     return {"id": user_id, "label": (full_name or username or "Usuario")}
 
 
-def unified_history_rows(user, *, period, include_costs=False, filters=None, candidate_limit=None):
-    """Normalize authorized maintenance facts; one database row becomes one UID."""
+def history_events(user, *, period, filters=None):
+    """Eventos autorizados del historial con todos los filtros resueltos en SQL."""
     start, end = period_bounds(period)
     filters = filters or {}
-    rows = []
-    total = 0
-
-    fallas = authorized_fallas(user).select_related("reportado_por")
-    if filters.get("tipo") not in {None, "todo", "reporte"}:
-        fallas = fallas.none()
-    if filters.get("sucursal"): fallas = fallas.filter(sucursal_id=filters["sucursal"])
-    if filters.get("activo"): fallas = fallas.filter(activo_relacionado_id=filters["activo"])
-    if filters.get("autor"): fallas = fallas.filter(reportado_por_id=filters["autor"])
-    if filters.get("q"):
-        fallas = fallas.filter(
-            Q(titulo__icontains=filters["q"]) |
-            Q(descripcion__icontains=filters["q"]) |
-            Q(reportado_por__first_name__icontains=filters["q"]) |
-            Q(reportado_por__last_name__icontains=filters["q"]) |
-            Q(reportado_por__username__icontains=filters["q"])
-        )
-    falla_statuses = {"abierto": [ReporteFalla.ESTATUS_ABIERTO], "en_proceso": [ReporteFalla.ESTATUS_REVISION, ReporteFalla.ESTATUS_PROCESO], "cerrado": [ReporteFalla.ESTATUS_RESUELTO, ReporteFalla.ESTATUS_CERRADO], "cancelado": [ReporteFalla.ESTATUS_CANCELADO]}
-    if filters.get("estado") not in {None, "todo"}: fallas = fallas.filter(estatus__in=falla_statuses[filters["estado"]])
-    closed = [ReporteFalla.ESTATUS_RESUELTO, ReporteFalla.ESTATUS_CERRADO]
-    fq = Q(estatus__in=closed, fecha_cierre__gte=start, fecha_cierre__lt=end) if start else Q(estatus__in=closed, fecha_cierre__lt=end)
-    rq = Q(estatus__in=closed, fecha_cierre__isnull=True, fecha_resolucion__gte=start, fecha_resolucion__lt=end) if start else Q(estatus__in=closed, fecha_cierre__isnull=True, fecha_resolucion__lt=end)
-    oq = Q(fecha_reporte__gte=start, fecha_reporte__lt=end) if start else Q(fecha_reporte__lt=end)
-    fallas = fallas.filter(fq | rq | (~Q(estatus__in=closed) & oq))
-    total += fallas.count()
-    fallas = fallas.annotate(effective_event=Case(
-        When(estatus__in=closed, then=Coalesce("fecha_cierre", "fecha_resolucion", "fecha_reporte")),
-        default=F("fecha_reporte"),
-    )).order_by("-effective_event", "-id").values(
-        "id", "titulo", "descripcion", "estatus", "fecha_reporte", "fecha_resolucion", "fecha_cierre",
-        "costo_estimado", "costo_real",
-        "sucursal_id", "sucursal__nombre", "activo_relacionado_id", "activo_relacionado__nombre",
-        "reportado_por_id", "reportado_por__first_name", "reportado_por__last_name", "reportado_por__username",
-    )[:candidate_limit]
-    falla_states = {
-        ReporteFalla.ESTATUS_ABIERTO: "abierto", ReporteFalla.ESTATUS_REVISION: "en_proceso",
-        ReporteFalla.ESTATUS_PROCESO: "en_proceso", ReporteFalla.ESTATUS_RESUELTO: "cerrado",
-        ReporteFalla.ESTATUS_CERRADO: "cerrado", ReporteFalla.ESTATUS_CANCELADO: "cancelado",
-    }
-    for item in fallas:
-        state = falla_states[item["estatus"]]
-        event = ((item["fecha_cierre"] or item.get("fecha_resolucion"))
-                 if state == "cerrado" else item["fecha_reporte"])
-        if _in_period(event, start, end):
-            rows.append(_history_payload(
-                uid=f"falla:{item['id']}", event=event, kind="reporte", state=state,
-                branch_id=item["sucursal_id"], branch=item["sucursal__nombre"],
-                subject_id=item["activo_relacionado_id"], subject=item["activo_relacionado__nombre"] or "",
-                actor=_history_actor(item["reportado_por_id"], " ".join(filter(None, [item["reportado_por__first_name"], item["reportado_por__last_name"]])), item["reportado_por__username"]),
-                origin="falla", title=item["titulo"], description=item["descripcion"],
-                asset_id=item["activo_relacionado_id"],
-                cost=((item["costo_real"] if item["costo_real"] is not None else item["costo_estimado"])
-                      if include_costs else None),
-            ))
-
-    from activos.models import SolicitudFalla
-    orders = authorized_orders(user).select_related("creado_por").annotate(
-        has_linked_request=Exists(SolicitudFalla.objects.filter(orden_atencion_id=OuterRef("pk")))
-    )
-    if filters.get("tipo") not in {None, "todo", "orden", "sin_reporte"}: orders = orders.none()
-    if filters.get("sucursal"): orders = orders.filter(activo_ref__sucursal_id=filters["sucursal"])
-    if filters.get("activo"): orders = orders.filter(activo_ref_id=filters["activo"])
-    if filters.get("autor"): orders = orders.filter(creado_por_id=filters["autor"])
-    if filters.get("q"):
-        orders = orders.filter(
-            Q(folio__icontains=filters["q"]) |
-            Q(descripcion__icontains=filters["q"]) |
-            Q(activo_ref__nombre__icontains=filters["q"]) |
-            Q(creado_por__first_name__icontains=filters["q"]) |
-            Q(creado_por__last_name__icontains=filters["q"]) |
-            Q(creado_por__username__icontains=filters["q"])
-        )
-    unreported = Q(origen__in=[OrdenMantenimiento.ORIGEN_EMERGENCIA, OrdenMantenimiento.ORIGEN_INICIATIVA], plan_ref__isnull=True, has_linked_request=False)
-    if filters.get("tipo") == "sin_reporte": orders = orders.filter(unreported)
-    elif filters.get("tipo") == "orden": orders = orders.exclude(unreported)
-    order_statuses = {"abierto": [OrdenMantenimiento.ESTATUS_PENDIENTE], "en_proceso": [OrdenMantenimiento.ESTATUS_EN_PROCESO], "cerrado": [OrdenMantenimiento.ESTATUS_CERRADA], "cancelado": [OrdenMantenimiento.ESTATUS_CANCELADA]}
-    if filters.get("estado") not in {None, "todo"}: orders = orders.filter(estatus__in=order_statuses[filters["estado"]])
-    cq = Q(estatus=OrdenMantenimiento.ESTATUS_CERRADA, fecha_cierre__gte=start.date(), fecha_cierre__lt=end.date()) if start else Q(estatus=OrdenMantenimiento.ESTATUS_CERRADA, fecha_cierre__lt=end.date())
-    nq = Q(fecha_programada__gte=start.date(), fecha_programada__lt=end.date()) if start else Q(fecha_programada__lt=end.date())
-    orders = orders.filter(cq | (~Q(estatus=OrdenMantenimiento.ESTATUS_CERRADA) & nq))
-    total += orders.count()
-    orders = orders.annotate(effective_event=Case(
-        When(estatus=OrdenMantenimiento.ESTATUS_CERRADA, then=F("fecha_cierre")),
-        default=F("fecha_programada"),
-    )).order_by("-effective_event", "-id").values(
-        "id", "folio", "descripcion", "estatus", "creado_en", "fecha_programada", "fecha_cierre", "origen", "plan_ref_id", "numero_factura", "factura_archivo", "costo_repuestos", "costo_mano_obra", "costo_otros",
-        "activo_ref_id", "activo_ref__nombre", "activo_ref__sucursal_id", "activo_ref__sucursal__nombre",
-        "creado_por_id", "creado_por__first_name", "creado_por__last_name", "creado_por__username",
-    )[:candidate_limit]
-    scoped_order_ids = authorized_orders(user).values_list("id", flat=True)
-    linked_order_ids = set(SolicitudFalla.objects.filter(
-        orden_atencion_id__in=scoped_order_ids,
-    ).values_list("orden_atencion_id", flat=True))
-    for item in orders:
-        state = canonical_status("orden", item["estatus"])
-        event = item["fecha_cierre"] if state == "cerrado" and item["fecha_cierre"] else item["fecha_programada"]
-        if _in_period(event, start, end):
-            unreported = item["origen"] in {OrdenMantenimiento.ORIGEN_EMERGENCIA, OrdenMantenimiento.ORIGEN_INICIATIVA} and not item["plan_ref_id"] and item["id"] not in linked_order_ids
-            rows.append(_history_payload(
-                uid=f"orden:{item['id']}", event=event, kind=("sin_reporte" if unreported else "orden"), state=state,
-                branch_id=item["activo_ref__sucursal_id"], branch=item["activo_ref__sucursal__nombre"],
-                subject_id=item["activo_ref_id"], subject=item["activo_ref__nombre"],
-                actor=_history_actor(item["creado_por_id"], " ".join(filter(None, [item["creado_por__first_name"], item["creado_por__last_name"]])), item["creado_por__username"]),
-                origin="sin_reporte" if unreported else item["origen"].lower(), title=item["folio"],
-                description=item["descripcion"], asset_id=item["activo_ref_id"], direct=unreported,
-                invoice=_invoice("orden_factura", item["id"], item["factura_archivo"], item["numero_factura"]),
-                cost=((item["costo_repuestos"] or 0) + (item["costo_mano_obra"] or 0) + (item["costo_otros"] or 0)) if include_costs else None,
-            ))
-
-    reports = authorized_unit_reports(user)
-    if filters.get("tipo") not in {None, "todo", "reporte"}: reports = reports.none()
-    if filters.get("sucursal"): reports = reports.filter(unidad__sucursal_id=filters["sucursal"])
-    if filters.get("unidad"): reports = reports.filter(unidad_id=filters["unidad"])
-    if filters.get("autor"): reports = reports.filter(repartidor__user_id=filters["autor"])
+    queryset = authorized_events(user).filter(_date_range_q("fecha_evento", start, end))
+    if filters.get("tipo") not in {None, "todo"}:
+        queryset = queryset.filter(tipo=filters["tipo"])
+    if filters.get("estado") not in {None, "todo"}:
+        queryset = queryset.filter(estado=filters["estado"])
+    if filters.get("sucursal"):
+        queryset = queryset.filter(sucursal_id=filters["sucursal"])
+    if filters.get("activo"):
+        queryset = queryset.filter(activo_id=filters["activo"])
+    if filters.get("unidad"):
+        queryset = queryset.filter(unidad_id=filters["unidad"])
+    if filters.get("autor"):
+        queryset = queryset.filter(actor_id=filters["autor"])
     if filters.get("q"):
-        reports = reports.filter(
-            Q(tipo__icontains=filters["q"]) |
-            Q(descripcion__icontains=filters["q"]) |
-            Q(unidad__codigo__icontains=filters["q"]) |
-            Q(repartidor__user__first_name__icontains=filters["q"]) |
-            Q(repartidor__user__last_name__icontains=filters["q"]) |
-            Q(repartidor__user__username__icontains=filters["q"])
-        )
-    report_statuses = {"abierto": [ReporteUnidad.ESTATUS_ABIERTO], "en_proceso": [ReporteUnidad.ESTATUS_EN_PROCESO, ReporteUnidad.ESTATUS_PROGRAMADO], "cerrado": [ReporteUnidad.ESTATUS_CERRADO], "cancelado": []}
-    if filters.get("estado") not in {None, "todo"}: reports = reports.filter(estatus__in=report_statuses[filters["estado"]])
-    rcq = Q(estatus=ReporteUnidad.ESTATUS_CERRADO, fecha_cierre__gte=start, fecha_cierre__lt=end) if start else Q(estatus=ReporteUnidad.ESTATUS_CERRADO, fecha_cierre__lt=end)
-    roq = Q(fecha_reporte__gte=start, fecha_reporte__lt=end) if start else Q(fecha_reporte__lt=end)
-    reports = reports.filter(rcq | (Q(estatus=ReporteUnidad.ESTATUS_CERRADO, fecha_cierre__isnull=True) & roq) | (~Q(estatus=ReporteUnidad.ESTATUS_CERRADO) & roq))
-    total += reports.count()
-    reports = reports.annotate(effective_event=Case(
-        When(estatus=ReporteUnidad.ESTATUS_CERRADO, then=Coalesce("fecha_cierre", "fecha_reporte")),
-        default=F("fecha_reporte"),
-    )).order_by("-effective_event", "-id").values(
-        "id", "tipo", "descripcion", "estatus", "fecha_reporte", "fecha_cierre", "repartidor__user_id",
-        "repartidor__user__first_name", "repartidor__user__last_name", "repartidor__user__username",
-        "unidad_id", "unidad__codigo", "unidad__sucursal_id", "unidad__sucursal__nombre",
-    )[:candidate_limit]
-    for item in reports:
-        state = canonical_status("reporte_unidad", item["estatus"])
-        if state == "programado": state = "en_proceso"
-        event = item["fecha_cierre"] if state == "cerrado" and item["fecha_cierre"] else item["fecha_reporte"]
-        if _in_period(event, start, end):
-            rows.append(_history_payload(uid=f"reporte_unidad:{item['id']}", event=event, kind="reporte", state=state,
-                branch_id=item["unidad__sucursal_id"], branch=item["unidad__sucursal__nombre"], subject_id=item["unidad_id"], subject=item["unidad__codigo"],
-                actor=_history_actor(item["repartidor__user_id"], " ".join(filter(None, [item["repartidor__user__first_name"], item["repartidor__user__last_name"]])), item["repartidor__user__username"]),
-                origin="reporte_unidad", title=item["tipo"], description=item["descripcion"], unit_id=item["unidad_id"]))
-
-    for kind, queryset, date_field in (("reparacion", authorized_repairs(user), "fecha_ingreso"), ("servicio_unidad", authorized_unit_services(user), "fecha_servicio")):
-        if filters.get("tipo") not in {None, "todo", kind}:
-            continue
-        if filters.get("sucursal"): queryset = queryset.filter(unidad__sucursal_id=filters["sucursal"])
-        if filters.get("unidad"): queryset = queryset.filter(unidad_id=filters["unidad"])
-        if filters.get("autor"): queryset = queryset.filter(registrado_por_id=filters["autor"])
-        if filters.get("q"):
-            actor_query = (
-                Q(registrado_por__first_name__icontains=filters["q"]) |
-                Q(registrado_por__last_name__icontains=filters["q"]) |
-                Q(registrado_por__username__icontains=filters["q"])
-            )
-            if kind == "reparacion":
-                content_query = Q(descripcion_falla__icontains=filters["q"]) | Q(descripcion_reparacion__icontains=filters["q"]) | Q(unidad__codigo__icontains=filters["q"])
-            else:
-                content_query = Q(tipo_servicio__nombre__icontains=filters["q"]) | Q(notas__icontains=filters["q"]) | Q(unidad__codigo__icontains=filters["q"])
-            queryset = queryset.filter(content_query | actor_query)
-        if start: queryset = queryset.filter(**{f"{date_field}__gte": start.date()})
-        queryset = queryset.filter(**{f"{date_field}__lt": end.date()})
-        if filters.get("estado") not in {None, "todo", "cerrado"}: queryset = queryset.none()
-        total += queryset.count()
-        queryset = queryset.select_related("registrado_por", "unidad", "unidad__sucursal")
-        if kind == "servicio_unidad": queryset = queryset.select_related("tipo_servicio")
-        queryset = queryset.order_by(f"-{date_field}", "-id")[:candidate_limit]
-        for obj in queryset:
-            event = getattr(obj, date_field)
-            if not _in_period(event, start, end): continue
-            is_service = kind == "servicio_unidad"
-            rows.append(_history_payload(uid=f"{kind}:{obj.pk}", event=event, kind=kind, state="cerrado",
-                branch_id=obj.unidad.sucursal_id, branch=obj.unidad.sucursal.nombre, subject_id=obj.unidad_id, subject=obj.unidad.codigo,
-                actor=_history_actor(obj.registrado_por_id, obj.registrado_por.get_full_name() if obj.registrado_por else "", obj.registrado_por.get_username() if obj.registrado_por else ""),
-                origin=kind, parent_uid=(f"reporte_unidad:{obj.reporte_origen_id}" if kind == "reparacion" and obj.reporte_origen_id else None),
-                title=(obj.tipo_servicio.nombre if is_service else obj.descripcion_falla), description=(obj.notas or ("" if is_service else obj.descripcion_reparacion)),
-                unit_id=obj.unidad_id, direct=(is_service or (kind == "reparacion" and not obj.reporte_origen_id)),
-                invoice=_invoice(f"{kind}_factura" if kind == "reparacion" else "servicio_unidad_factura", obj.pk, obj.archivo_factura),
-                cost=((obj.costo if is_service else obj.costo_total) if include_costs else None)))
+        queryset = queryset.filter(texto_busqueda__contains=filters["q"].casefold())
+    return queryset
+
+
+def unified_history_rows(user, *, period, include_costs=False, filters=None, limit=None, offset=0, cursor=None):
+    """Página del historial unificado y total filtrado; una fila del índice es un UID."""
+    queryset = history_events(user, period=period, filters=filters)
+    total = queryset.count()
+    if cursor:
+        queryset = queryset.filter(_after_cursor("fecha_evento", cursor))
+    queryset = queryset.order_by(*HISTORY_ORDER)
+    if limit is not None:
+        queryset = queryset[offset:offset + limit]
+    rows = [_history_payload(
+        uid=event.uid, event=event.fecha_evento, kind=event.tipo, state=event.estado,
+        branch_id=event.sucursal_id, branch=event.sucursal_nombre,
+        subject_id=event.sujeto_id, subject=event.sujeto_nombre,
+        actor={"id": event.actor_id, "label": event.actor_nombre}, origin=event.origen,
+        parent_uid=event.parent_uid or None, title=event.titulo, description=event.descripcion,
+        asset_id=event.activo_id, unit_id=event.unidad_id, direct=event.captura_directa,
+        invoice=event.factura, cost=event.costo if include_costs else None,
+    ) for event in queryset]
     return rows, total
 
 
 def filtered_history_count(user, *, period, filters):
-    """Count a single concrete source without materializing its rows."""
-    kind = filters.get("tipo")
-    definitions = {
-        "servicio_unidad": (authorized_unit_services(user), "fecha_servicio", "tipo_servicio__nombre", "notas"),
-        "reparacion": (authorized_repairs(user), "fecha_ingreso", "descripcion_falla", "descripcion_reparacion"),
-    }
-    if kind not in definitions:
-        return None
-    queryset, date_field, title_field, description_field = definitions[kind]
-    start, end = period_bounds(period)
-    if filters.get("sucursal"): queryset = queryset.filter(unidad__sucursal_id=filters["sucursal"])
-    if filters.get("unidad"): queryset = queryset.filter(unidad_id=filters["unidad"])
-    if start: queryset = queryset.filter(**{f"{date_field}__gte": start.date()})
-    queryset = queryset.filter(**{f"{date_field}__lt": end.date()})
-    if filters.get("q"):
-        queryset = queryset.filter(
-            Q(**{f"{title_field}__icontains": filters["q"]}) |
-            Q(**{f"{description_field}__icontains": filters["q"]}) |
-            Q(unidad__codigo__icontains=filters["q"]) |
-            Q(registrado_por__first_name__icontains=filters["q"]) |
-            Q(registrado_por__last_name__icontains=filters["q"]) |
-            Q(registrado_por__username__icontains=filters["q"])
-        )
-    if filters.get("estado") not in {None, "todo", "cerrado"}:
-        return 0
-    return queryset.count()
+    """Cuenta el historial filtrado sin materializar filas."""
+    return history_events(user, period=period, filters=filters).count()
 
 
 def _history_payload(*, uid, event, kind, state, branch_id, branch, subject_id, subject, actor, origin,
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from activos.models import Activo, OrdenMantenimiento, SolicitudFalla
+from core.models import Sucursal
+from fallas.models import ReporteFalla
+from logistica.models import (
+    ReparacionUnidad, Repartidor, ReporteUnidad, ServicioRealizadoUnidad, TipoServicioUnidad, Unidad,
+)
+from mantenimiento.models import EventoMantenimiento
+from mantenimiento.services_event_index import reindex_events, reindex_indexed, remove_event
+
+
+# El índice se actualiza dentro de la misma transacción que la escritura: la
+# bandeja que el usuario abre justo después de guardar ya lo refleja.
+_SOURCE_MODELS = {
+    ReporteFalla: EventoMantenimiento.FUENTE_FALLA,
+    OrdenMantenimiento: EventoMantenimiento.FUENTE_ORDEN,
+    ReporteUnidad: EventoMantenimiento.FUENTE_REPORTE_UNIDAD,
+    ReparacionUnidad: EventoMantenimiento.FUENTE_REPARACION,
+    ServicioRealizadoUnidad: EventoMantenimiento.FUENTE_SERVICIO_UNIDAD,
+}
+_ACTOR_FIELDS = {"first_name", "last_name", "username"}
+
+
+def _index_source(sender, instance, raw=False, **_kwargs):
+    if raw:
+        return
+    reindex_events(_SOURCE_MODELS[sender], [instance.pk])
+
+
+def _unindex_source(sender, instance, **_kwargs):
+    remove_event(_SOURCE_MODELS[sender], instance.pk)
+
+
+for _model, _fuente in _SOURCE_MODELS.items():
+    post_save.connect(_index_source, sender=_model, dispatch_uid=f"mantenimiento_evento_{_fuente}_save")
+    post_delete.connect(_unindex_source, sender=_model, dispatch_uid=f"mantenimiento_evento_{_fuente}_delete")
+
+
+@receiver(post_delete, sender=ReporteUnidad, dispatch_uid="mantenimiento_evento_reparaciones_huerfanas")
+def _reindex_repairs_of_deleted_report(sender, instance, **_kwargs):
+    # ``reporte_origen`` pasa a NULL con un UPDATE masivo: la reparación queda como captura directa.
+    reindex_indexed(EventoMantenimiento.objects.filter(parent_uid=f"reporte_unidad:{instance.pk}"))
+
+
+@receiver(pre_save, sender=SolicitudFalla, dispatch_uid="mantenimiento_evento_solicitud_previa")
+def _remember_linked_order(sender, instance, raw=False, **_kwargs):
+    previous = None
+    if instance.pk and not raw:
+        previous = SolicitudFalla.objects.filter(pk=instance.pk).values_list("orden_atencion_id", flat=True).first()
+    instance._evento_orden_previa = previous
+
+
+@receiver(post_save, sender=SolicitudFalla, dispatch_uid="mantenimiento_evento_solicitud_save")
+@receiver(post_delete, sender=SolicitudFalla, dispatch_uid="mantenimiento_evento_solicitud_delete")
+def _reindex_linked_orders(sender, instance, raw=False, **_kwargs):
+    # Una orden con solicitud ligada deja de ser "sin reporte".
+    if raw:
+        return
+    order_ids = {instance.orden_atencion_id, getattr(instance, "_evento_orden_previa", None)}
+    reindex_events(EventoMantenimiento.FUENTE_ORDEN, order_ids)
+
+
+@receiver(post_save, sender=Activo, dispatch_uid="mantenimiento_evento_activo_save")
+@receiver(post_delete, sender=Activo, dispatch_uid="mantenimiento_evento_activo_delete")
+def _reindex_asset_events(sender, instance, created=False, raw=False, **_kwargs):
+    if created or raw:
+        return
+    reindex_indexed(EventoMantenimiento.objects.filter(activo_id=instance.pk))
+
+
+@receiver(post_save, sender=Unidad, dispatch_uid="mantenimiento_evento_unidad_save")
+def _reindex_unit_events(sender, instance, created=False, raw=False, **_kwargs):
+    if created or raw:
+        return
+    reindex_indexed(EventoMantenimiento.objects.filter(unidad_id=instance.pk))
+
+
+@receiver(post_save, sender=Sucursal, dispatch_uid="mantenimiento_evento_sucursal_save")
+def _rename_branch_events(sender, instance, created=False, raw=False, **_kwargs):
+    if created or raw:
+        return
+    EventoMantenimiento.objects.filter(sucursal_id=instance.pk).exclude(
+        sucursal_nombre=instance.nombre or ""
+    ).update(sucursal_nombre=instance.nombre or "")
+
+
+@receiver(post_save, sender=get_user_model(), dispatch_uid="mantenimiento_evento_usuario_save")
+def _reindex_actor_events(sender, instance, created=False, raw=False, update_fields=None, **_kwargs):
+    # ``update_last_login`` guarda al usuario en cada inicio de sesión; sólo el nombre importa.
+    if created or raw or (update_fields is not None and not _ACTOR_FIELDS & set(update_fields)):
+        return
+    reindex_indexed(EventoMantenimiento.objects.filter(actor_id=instance.pk))
+
+
+@receiver(post_save, sender=Repartidor, dispatch_uid="mantenimiento_evento_repartidor_save")
+def _reindex_driver_reports(sender, instance, created=False, raw=False, **_kwargs):
+    if created or raw:
+        return
+    reindex_events(
+        EventoMantenimiento.FUENTE_REPORTE_UNIDAD,
+        ReporteUnidad.objects.filter(repartidor_id=instance.pk).values_list("id", flat=True),
+    )
+
+
+@receiver(post_save, sender=TipoServicioUnidad, dispatch_uid="mantenimiento_evento_tipo_servicio_save")
+def _reindex_service_type_events(sender, instance, created=False, raw=False, **_kwargs):
+    if created or raw:
+        return
+    reindex_events(
+        EventoMantenimiento.FUENTE_SERVICIO_UNIDAD,
+        ServicioRealizadoUnidad.objects.filter(tipo_servicio_id=instance.pk).values_list("id", flat=True),
+    )
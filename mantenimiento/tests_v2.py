@@ -29,6 +29,7 @@ from logistica.models import (
     TipoServicioUnidad,
     Unidad,
 )
+from mantenimiento.models import EventoMantenimiento
 from mantenimiento.services_access import (
     authorized_fallas,
     authorized_orders,
@@ -37,7 +38,8 @@ from mantenimiento.services_access import (
     authorized_unit_services,
     can_view_costs,
 )
-from mantenimiento.services_history import canonical_status, period_bounds
+from mantenimiento.services_event_index import reindex_events
+from mantenimiento.services_history import _after_cursor, canonical_status, decode_cursor, encode_cursor, period_bounds
 from mantenimiento.evidence_validation import EvidenceValidationError, validate_evidence_files
 
 
@@ -677,6 +679,7 @@ class MaintenanceInboxV2Tests(TestCase):
             fecha_cierre=event,
         )
         ReporteFalla.objects.filter(pk=report.pk).update(fecha_reporte=event)
+        reindex_events("falla", [report.pk])
         return report
 
     def _closed_order(self, days_ago):
@@ -701,6 +704,7 @@ class MaintenanceInboxV2Tests(TestCase):
         else:
             updates["fecha_cierre"] = None
         ReporteUnidad.objects.filter(pk=report.pk).update(**updates)
+        reindex_events("reporte_unidad", [report.pk])
         return report
 
     def test_closed_count_is_independent_from_page_size_and_includes_all_sources(self):
@@ -809,6 +813,7 @@ class MaintenanceInboxV2Tests(TestCase):
         self._closed_falla(31)
         cancelled = self._closed_falla(2)
         ReporteFalla.objects.filter(pk=cancelled.pk).update(estatus=ReporteFalla.ESTATUS_CANCELADO)
+        reindex_events("falla", [cancelled.pk])
         self._closed_falla(2, branch=self.other_branch)
         limited = get_user_model().objects.create_user("v2-limited", password="test")
         UserProfile.objects.create(user=limited, sucursal=self.branch)
@@ -1257,6 +1262,103 @@ class MaintenanceUnifiedHistoryV2Tests(TestCase):
 
 
 @override_settings(MEDIA_ROOT="/tmp/mantenimiento-v2-test-media")
+class MaintenanceEventIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("index-admin", "index@example.com", "test")
+        cls.actor = get_user_model().objects.create_user("index-actor", first_name="Rosa")
+        cls.branch = Sucursal.objects.create(codigo="IDX", nombre="Índice")
+        cls.asset = Activo.objects.create(nombre="Batidora índice", sucursal=cls.branch)
+        cls.category = CategoriaFalla.objects.create(nombre="Índice")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _falla(self, **extra):
+        return ReporteFalla.objects.create(
+            sucursal=self.branch, categoria=self.category, titulo="Fuga", descripcion="Gotea",
+            activo_relacionado=self.asset, reportado_por=self.actor, **extra,
+        )
+
+    def test_index_follows_source_and_related_writes(self):
+        falla = self._falla()
+        event = EventoMantenimiento.objects.get(uid=f"falla:{falla.pk}")
+        self.assertEqual((event.estado, event.estado_bandeja, event.sucursal_id), ("abierto", "abierto", self.branch.pk))
+
+        falla.estatus = ReporteFalla.ESTATUS_CERRADO
+        falla.fecha_cierre = timezone.now() - timedelta(days=3)
+        falla.save()
+        event.refresh_from_db()
+        self.assertEqual(event.estado, "cerrado")
+        self.assertEqual(event.fecha_evento, falla.fecha_cierre)
+
+        self.asset.nombre = "Batidora planetaria"
+        self.asset.save()
+        self.actor.last_name = "Quintero"
+        self.actor.save()
+        payload = self.client.get("/api/mantenimiento/v2/historial/", {"periodo": "todo", "q": "quintero"}).json()
+        self.assertEqual([row["uid"] for row in payload["results"]], [f"falla:{falla.pk}"])
+        self.assertEqual(payload["results"][0]["sujeto"]["label"], "Batidora planetaria")
+
+        order = OrdenMantenimiento.objects.create(
+            activo_ref=self.asset, origen=OrdenMantenimiento.ORIGEN_EMERGENCIA, descripcion="Sin reporte",
+        )
+        self.assertEqual(EventoMantenimiento.objects.get(uid=f"orden:{order.pk}").tipo, "sin_reporte")
+        SolicitudFalla.objects.create(
+            activo_ref=self.asset, descripcion="Ligada", reportado_por=self.actor, orden_atencion=order,
+        )
+        self.assertEqual(EventoMantenimiento.objects.get(uid=f"orden:{order.pk}").tipo, "orden")
+
+        falla.delete()
+        self.assertFalse(EventoMantenimiento.objects.filter(uid=f"falla:{falla.pk}").exists())
+
+    def test_cursor_pages_cover_history_once_with_constant_queries(self):
+        for days in range(7):
+            falla = self._falla()
+            ReporteFalla.objects.filter(pk=falla.pk).update(fecha_reporte=timezone.now() - timedelta(days=days % 3))
+        call_command("rebuild_maintenance_event_index", stdout=StringIO())
+        expected = self.client.get("/api/mantenimiento/v2/historial/", {"periodo": "todo", "page_size": 100}).json()
+
+        seen, cursor = [], None
+        while True:
+            params = {"periodo": "todo", "page_size": 3, **({"cursor": cursor} if cursor else {})}
+            with CaptureQueriesContext(connection) as queries:
+                page = self.client.get("/api/mantenimiento/v2/historial/", params).json()
+            seen.extend(row["uid"] for row in page["results"])
+            self.assertEqual(page["pagination"]["total"], 7)
+            cursor = page["pagination"]["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, [row["uid"] for row in expected["results"]])
+        self.assertLessEqual(len(queries), 12)
+        self.assertEqual(
+            self.client.get("/api/mantenimiento/v2/historial/", {"cursor": "no-es-cursor"}).status_code, 400
+        )
+
+    def test_history_cursor_leads_with_a_date_bound(self):
+        falla = self._falla()
+        call_command("rebuild_maintenance_event_index", stdout=StringIO())
+        event = EventoMantenimiento.objects.get(uid=f"falla:{falla.pk}")
+        cursor = encode_cursor(event.fecha_evento, event.uid)
+        page = self.client.get("/api/mantenimiento/v2/historial/", {"periodo": "todo", "cursor": cursor}).json()
+        self.assertNotIn(event.uid, [row["uid"] for row in page["results"]])
+
+        sql = str(EventoMantenimiento.objects.filter(_after_cursor("fecha_evento", decode_cursor(cursor))).query)
+        self.assertIn('"mantenimiento_eventomantenimiento"."fecha_evento" <= ', sql)
+
+    def test_inbox_cursor_matches_page_order(self):
+        for days in (1, 2, 2, 4):
+            self._falla(estatus=ReporteFalla.ESTATUS_CERRADO, fecha_cierre=timezone.now() - timedelta(days=days))
+        params = {"estado": "cerrados", "periodo": "30d"}
+        expected = [row["uid"] for row in self.client.get("/api/mantenimiento/v2/bandeja/", params).json()["results"]]
+        first = self.client.get("/api/mantenimiento/v2/bandeja/", {**params, "page_size": 2}).json()
+        second = self.client.get("/api/mantenimiento/v2/bandeja/", {
+            **params, "page_size": 2, "cursor": first["pagination"]["next_cursor"],
+        }).json()
+        self.assertEqual([row["uid"] for row in first["results"] + second["results"]], expected)
+        self.assertFalse(second["pagination"]["has_next"])
+
+
 class MaintenanceDetailV2Tests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -1429,6 +1531,7 @@ class MaintenanceInboxIndependentCountsTests(TestCase):
         category = CategoriaFalla.objects.create(nombre="Conteos independientes")
         old_open = ReporteFalla.objects.create(sucursal=branch, categoria=category, titulo="Vieja", descripcion="Abierta", reportado_por=user)
         ReporteFalla.objects.filter(pk=old_open.pk).update(fecha_reporte=timezone.now() - timedelta(days=180))
+        reindex_events("falla", [old_open.pk])
         recent_closed = ReporteFalla.objects.create(
             sucursal=branch, categoria=category, titulo="Cerrada", descripcion="Atendida",
             estatus=ReporteFalla.ESTATUS_CERRADO, fecha_cierre=timezone.now() - timedelta(days=2), reportado_por=user,
@@ -1,7 +1,8 @@
 """Catch-up Hik-Connect -> ERP: recupera marcajes que el sync de 5 minutos dejo fuera.
 
 La nube se consulta por ventanas diarias para no depender de una pagina global.
-El barrido persiste cada GUID y reenvia el outbox.
+El barrido persiste cada GUID por pagina y un sender en segundo plano reenvia
+el outbox mientras se siguen leyendo paginas (``--serial`` espera al final).
 
 El ERP deduplica por GUID, asi que reintentarlo es seguro.
 """
@@ -17,7 +18,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from config import PAGE_SIZE, TIMEZONE
 from hikconnect_client import HikConnectClient
-from main import build_events, send_and_mark  # configura logging al importarse
+from main import OutboxSender, build_events, send_and_mark  # configura logging al importarse
 from state import (
     init_db,
     quarantine_cloud_record,
@@ -30,6 +31,39 @@ def enviar_por_lotes(events: list[dict], records: list) -> dict[str, int]:
     return send_and_mark(events, records, dry_run=False)
 
 
+def _catchup_pipelined(desde: datetime, hasta: datetime, max_pages: int) -> int:
+    nuevos = 0
+    sender = OutboxSender()
+
+    def process_page(_work_date, _page_index: int, page_records) -> None:
+        nonlocal nuevos
+        events, _selected = build_events(page_records, dry_run=False)
+        nuevos += len(events)
+        sender.notify()
+
+    try:
+        with HikConnectClient(headless=True) as client, sender:
+            records = client.fetch_records_between(
+                start_dt=desde,
+                end_dt=hasta,
+                page_size=PAGE_SIZE,
+                max_pages=max_pages,
+                on_invalid_record=quarantine_cloud_record,
+                on_page_records=process_page,
+            )
+        total = sender.finish()
+    except RuntimeError as exc:
+        log.error("Catch-up detenido: %s", exc)
+        return 1
+    log.info("Registros en la nube dentro de la ventana: %s", len(records))
+    log.info("Marcajes que faltaban en el ERP: %s", nuevos)
+    log.info("Resultado: %s", total)
+    if not records.complete:
+        log.error("Catch-up incompleto: aumente --max-pages para cubrir todo el periodo")
+        return 1
+    return 0
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Catch-up Hik-Connect -> ERP")
     parser.add_argument(
@@ -40,6 +74,7 @@ def main() -> int:
     )
     parser.add_argument("--max-pages", type=int, default=15, help="Paginas de nube a recorrer")
     parser.add_argument("--dry-run", action="store_true", help="No envia ni marca como enviado")
+    parser.add_argument("--serial", action="store_true", help="Envia todo al terminar de leer la nube")
     args = parser.parse_args()
 
     init_db()
@@ -52,6 +87,9 @@ def main() -> int:
         args.max_pages,
     )
 
+    if not args.dry_run and not args.serial:
+        return _catchup_pipelined(desde, hasta, args.max_pages)
+
     with HikConnectClient(headless=True) as client:
         records = client.fetch_records_between(
             start_dt=desde,
@@ -25,6 +25,14 @@ SYNC_INTERVAL_SECONDS = int(os.getenv("SYNC_INTERVAL_SECONDS", "300"))
 LOOKBACK_HOURS = int(os.getenv("LOOKBACK_HOURS", "12"))
 MAX_PAGES = int(os.getenv("MAX_PAGES", "8"))
 PAGE_SIZE = int(os.getenv("PAGE_SIZE", "100"))
+# Envio al ERP: lotes acotados por eventos y bytes; gzip desde cierto tamaño
+# (UPLOAD_GZIP_MIN_BYTES=0 lo desactiva).
+UPLOAD_BATCH_MAX_EVENTS = int(os.getenv("UPLOAD_BATCH_MAX_EVENTS", "100"))
+UPLOAD_BATCH_MAX_BYTES = int(os.getenv("UPLOAD_BATCH_MAX_BYTES", str(512 * 1024)))
+UPLOAD_GZIP_MIN_BYTES = int(os.getenv("UPLOAD_GZIP_MIN_BYTES", "2048"))
+UPLOAD_TIMEOUT_SECONDS = int(os.getenv("UPLOAD_TIMEOUT_SECONDS", "20"))
+# Sender en segundo plano: drena el outbox mientras se siguen leyendo paginas.
+PIPELINED_UPLOAD = os.getenv("PIPELINED_UPLOAD", "true").lower() in {"1", "true", "yes", "on"}
 HEADLESS = os.getenv("HEADLESS", "true").lower() in {"1", "true", "yes", "on"}
 
 DB_PATH = BASE_DIR / os.getenv("DB_PATH", "state.db")
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
+import gzip
+import json
 import logging
+import threading
+from collections.abc import Iterator
 from typing import Any
 from uuid import uuid4
 
 import requests
 
-from config import ERP_API_KEY, ERP_BASE_URL, ERP_ENDPOINT
+from config import (
+    ERP_API_KEY,
+    ERP_BASE_URL,
+    ERP_ENDPOINT,
+    UPLOAD_BATCH_MAX_BYTES,
+    UPLOAD_BATCH_MAX_EVENTS,
+    UPLOAD_GZIP_MIN_BYTES,
+    UPLOAD_TIMEOUT_SECONDS,
+)
 
 log = logging.getLogger("erp_client")
 
+# El receptor v2 rechaza lotes de mas de 100 eventos.
+SERVER_MAX_BATCH_EVENTS = 100
+
+_local = threading.local()
+
 
 def _headers() -> dict[str, str]:
     return {
@@ -19,11 +36,27 @@ def _headers() -> dict[str, str]:
     }
 
 
+def _session() -> requests.Session:
+    """Sesion HTTP persistente por hilo: reutiliza TCP/TLS entre lotes."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(_headers())
+        _local.session = session
+    return session
+
+
+def close_session() -> None:
+    session = getattr(_local, "session", None)
+    if session is not None:
+        session.close()
+    _local.session = None
+
+
 def ping_erp() -> bool:
     try:
-        response = requests.get(
+        response = _session().get(
             f"{ERP_BASE_URL}/health/",
-            headers={"X-API-Key": ERP_API_KEY, "Accept": "application/json"},
             timeout=8,
             allow_redirects=True,
         )
@@ -33,6 +66,42 @@ def ping_erp() -> bool:
         return False
 
 
+def _event_size(event: dict[str, Any]) -> int:
+    return len(json.dumps(event, ensure_ascii=False, separators=(",", ":")).encode("utf-8")) + 1
+
+
+def iter_batches(
+    items: list[Any],
+    *,
+    payload=lambda item: item,
+    max_events: int = UPLOAD_BATCH_MAX_EVENTS,
+    max_bytes: int = UPLOAD_BATCH_MAX_BYTES,
+) -> Iterator[list[Any]]:
+    """
+    Agrupa ``items`` en lotes acotados por numero de eventos y por tamaño del
+    JSON sin comprimir. Un evento que por si solo excede ``max_bytes`` viaja solo.
+    """
+    max_events = max(1, min(max_events, SERVER_MAX_BATCH_EVENTS))
+    batch: list[Any] = []
+    batch_bytes = 0
+    for item in items:
+        size = _event_size(payload(item))
+        if batch and (len(batch) >= max_events or batch_bytes + size > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(item)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def _encode_body(body: dict[str, Any]) -> tuple[bytes, dict[str, str]]:
+    raw = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if UPLOAD_GZIP_MIN_BYTES <= 0 or len(raw) < UPLOAD_GZIP_MIN_BYTES:
+        return raw, {}
+    return gzip.compress(raw, compresslevel=6), {"Content-Encoding": "gzip"}
+
+
 def send_events(events: list[dict[str, Any]]) -> dict[str, Any]:
     if not events:
         return {"contract_version": 2, "batch_id": "", "results": []}
@@ -42,15 +111,18 @@ def send_events(events: list[dict[str, Any]]) -> dict[str, Any]:
         endpoint = f"{endpoint}/v2"
     url = f"{ERP_BASE_URL}{endpoint}/"
     batch_id = str(uuid4())
+    data, extra_headers = _encode_body({"contract_version": 2, "batch_id": batch_id, "events": events})
     try:
-        response = requests.post(
+        response = _session().post(
             url,
-            json={"contract_version": 2, "batch_id": batch_id, "events": events},
-            headers=_headers(),
-            timeout=20,
+            data=data,
+            headers=extra_headers,
+            timeout=UPLOAD_TIMEOUT_SECONDS,
         )
     except Exception as exc:
         log.error("Error enviando eventos al ERP: %s", exc)
+        # Una conexion rota no debe contaminar los siguientes lotes.
+        close_session()
         raise
     if response.status_code != 200:
         raise RuntimeError(f"ERP respondio {response.status_code}: {response.text[:500]}")
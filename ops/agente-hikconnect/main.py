@@ -3,21 +3,31 @@ from __future__ import annotations
 import argparse
 import logging
 import sys
+import threading
 import time
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 
-from config import EMPLOYEE_CODE_ALIASES, LOG_FILE, MAX_PAGES, PAGE_SIZE, SYNC_INTERVAL_SECONDS, TIMEZONE
-from erp_client import ping_erp, send_events
+from config import (
+    EMPLOYEE_CODE_ALIASES,
+    LOG_FILE,
+    MAX_PAGES,
+    PAGE_SIZE,
+    PIPELINED_UPLOAD,
+    SYNC_INTERVAL_SECONDS,
+    TIMEZONE,
+)
+from erp_client import iter_batches, ping_erp, send_events
 from file_importer import load_export_file
 from hikconnect_client import HikConnectClient, record_to_erp_event
 from state import (
     apply_delivery_results,
     day_state_exists,
-    enqueue_event,
+    enqueue_events,
     get_last_sync_time,
-    get_outbox_event,
     init_db,
     list_pending_events,
+    lookup_records,
     mark_delivery_attempt,
     record_cycle_failure,
     record_cycle_success,
@@ -26,7 +36,6 @@ from state import (
     set_discovery_page,
     set_last_sync_time,
     stable_punch_kind,
-    was_sent,
 )
 
 logging.basicConfig(
@@ -39,31 +48,38 @@ log = logging.getLogger("main")
 
 def build_events(records, dry_run: bool) -> tuple[list[dict], list]:
     events = []
+    new_events = []
     selected_records = []
-    dry_seen_days = set()
-    for record in sorted(records, key=lambda item: item.device_time):
-        if was_sent(record.record_guid):
+    seen_days = set()
+    ordered = sorted(records, key=lambda item: item.device_time)
+    closed, outbox = lookup_records([record.record_guid for record in ordered])
+    for record in ordered:
+        if record.record_guid in closed:
             continue
         if dry_run:
             day_key = (record.employee_no, record.device_time.date().isoformat())
             status = (
                 "check_out"
-                if day_key in dry_seen_days
+                if day_key in seen_days
                 or day_state_exists(record.employee_no, record.device_time)
                 else "check_in"
             )
-            dry_seen_days.add(day_key)
+            seen_days.add(day_key)
         else:
-            existing = get_outbox_event(record.record_guid)
+            existing = outbox.get(record.record_guid)
             if existing:
                 events.append(existing["payload"])
                 selected_records.append(record)
                 continue
             employee_no = EMPLOYEE_CODE_ALIASES.get(record.employee_no, record.employee_no)
-            status = stable_punch_kind(employee_no, record.device_time)
+            # Los eventos de la pagina se insertan juntos al final, asi que el
+            # primer marcaje del dia dentro del lote tambien cuenta aqui.
+            day_key = (employee_no, record.device_time.date().isoformat())
+            status = "check_out" if day_key in seen_days else stable_punch_kind(employee_no, record.device_time)
+            seen_days.add(day_key)
         event = record_to_erp_event(record, status)
         if not dry_run:
-            enqueue_event(event)
+            new_events.append(event)
         events.append(event)
         selected_records.append(record)
         if dry_run:
@@ -75,9 +91,41 @@ def build_events(records, dry_run: bool) -> tuple[list[dict], list]:
                 record.name,
                 record.record_guid[:12],
             )
+    enqueue_events(new_events)
     return events, selected_records
 
 
+def _empty_totals() -> dict:
+    return {"acked": 0, "pending": 0, "review": 0, "errors": 0}
+
+
+def _deliver_batch(batch: list[dict], total: dict) -> None:
+    """Envia un lote del outbox y aplica el acuse en una sola transaccion."""
+    event_ids = [item["event_id"] for item in batch]
+    payloads = [item["payload"] for item in batch]
+    mark_delivery_attempt(event_ids)
+    try:
+        response = send_events(payloads)
+        results = response.get("results") if isinstance(response, dict) else None
+        if not isinstance(results, list):
+            raise ValueError("ERP no devolvio results")
+        apply_delivery_results(event_ids, results)
+    except Exception as exc:
+        record_delivery_error(event_ids, str(exc))
+        total["errors"] += len(event_ids)
+        log.error("Lote outbox pendiente tras error ERP: %s", exc)
+        return
+
+    for result in results:
+        outcome = result.get("outcome")
+        if outcome in {"accepted", "duplicate"}:
+            total["acked"] += 1
+        elif outcome == "deferred":
+            total["pending"] += 1
+        else:
+            total["review"] += 1
+
+
 def send_and_mark(
     events: list[dict],
     records: list,
@@ -87,41 +135,93 @@ def send_and_mark(
     if dry_run:
         return {"acked": 0, "pending": 0, "review": 0, "errors": 0, "dry_run": len(events)}
 
-    for event in events:
-        enqueue_event(event)
+    enqueue_events(events)
 
     pending = list_pending_events()
     if attempted_event_ids is not None:
         pending = [item for item in pending if item["event_id"] not in attempted_event_ids]
-    total = {"acked": 0, "pending": 0, "review": 0, "errors": 0}
-    for start in range(0, len(pending), 100):
-        batch = pending[start : start + 100]
-        event_ids = [item["event_id"] for item in batch]
-        payloads = [item["payload"] for item in batch]
+    total = _empty_totals()
+    for batch in iter_batches(pending, payload=lambda item: item["payload"]):
         if attempted_event_ids is not None:
-            attempted_event_ids.update(event_ids)
-        mark_delivery_attempt(event_ids)
+            attempted_event_ids.update(item["event_id"] for item in batch)
+        _deliver_batch(batch, total)
+    return total
+
+
+class OutboxSender:
+    """
+    Drena el outbox en un hilo mientras el scraper sigue leyendo paginas.
+
+    El scraper persiste los eventos de cada pagina y llama ``notify()``; el
+    hilo toma los pendientes en orden de llegada (cursor ``created_at,
+    event_id``) y los manda en lotes acotados. Cada evento se intenta a lo mas
+    una vez por ciclo, igual que en el modo serial, y tras el primer lote
+    fallido deja de enviar hasta el siguiente ciclo. ``finish()`` hace un
+    barrido final (filas que el cursor pudo saltar) y devuelve los totales.
+    """
+
+    def __init__(self, page_limit: int = 500):
+        self.page_limit = page_limit
+        self.total = _empty_totals()
+        self.attempted: set[str] = set()
+        self._cursor: tuple[str, str] | None = None
+        self._wakeup = threading.Event()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="outbox-sender", daemon=True)
+        self._crash: BaseException | None = None
+
+    def __enter__(self) -> "OutboxSender":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._closing.set()
+        self._wakeup.set()
+        self._thread.join()
+
+    def notify(self) -> None:
+        """Avisa que hay eventos nuevos; falla si el envio ya fallo en este ciclo."""
+        self.raise_for_errors()
+        self._wakeup.set()
+
+    def raise_for_errors(self) -> None:
+        if self._crash is not None:
+            raise self._crash
+        if self.total["errors"]:
+            raise RuntimeError(f"ERP dejo {self.total['errors']} evento(s) pendientes")
+
+    def _drain(self) -> None:
+        while not self.total["errors"]:
+            pending = list_pending_events(limit=self.page_limit, after=self._cursor)
+            if not pending:
+                return
+            self._cursor = (pending[-1]["created_at"], pending[-1]["event_id"])
+            fresh = [item for item in pending if item["event_id"] not in self.attempted]
+            for batch in iter_batches(fresh, payload=lambda item: item["payload"]):
+                self.attempted.update(item["event_id"] for item in batch)
+                _deliver_batch(batch, self.total)
+                if self.total["errors"]:
+                    return
+
+    def _run(self) -> None:
         try:
-            response = send_events(payloads)
-            results = response.get("results") if isinstance(response, dict) else None
-            if not isinstance(results, list):
-                raise ValueError("ERP no devolvio results")
-            apply_delivery_results(event_ids, results)
-        except Exception as exc:
-            record_delivery_error(event_ids, str(exc))
-            total["errors"] += len(event_ids)
-            log.error("Lote outbox pendiente tras error ERP: %s", exc)
-            continue
+            while True:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                self._drain()
+                if self._closing.is_set():
+                    return
+        except BaseException as exc:  # noqa: BLE001 - se relanza en el hilo principal
+            self._crash = exc
 
-        for result in results:
-            outcome = result.get("outcome")
-            if outcome in {"accepted", "duplicate"}:
-                total["acked"] += 1
-            elif outcome == "deferred":
-                total["pending"] += 1
-            else:
-                total["review"] += 1
-    return total
+    def finish(self) -> dict:
+        if self._thread.is_alive():
+            self.__exit__(None, None, None)
+        self.raise_for_errors()
+        self._cursor = None
+        self._drain()
+        self.raise_for_errors()
+        return dict(self.total)
 
 
 def test_connectivity(headless: bool) -> bool:
@@ -147,7 +247,12 @@ def test_connectivity(headless: bool) -> bool:
     return True
 
 
-def sync_once(headless: bool, dry_run: bool, since: datetime | None = None) -> dict:
+def sync_once(
+    headless: bool,
+    dry_run: bool,
+    since: datetime | None = None,
+    pipelined: bool = PIPELINED_UPLOAD,
+) -> dict:
     start_dt = since or get_last_sync_time()
     end_dt = datetime.now(TIMEZONE)
     log.info(
@@ -155,11 +260,13 @@ def sync_once(headless: bool, dry_run: bool, since: datetime | None = None) -> d
         start_dt.isoformat(),
         end_dt.isoformat(),
     )
+    pipelined = pipelined and not dry_run
     try:
         result = {"acked": 0, "pending": 0, "review": 0, "errors": 0}
         attempted_event_ids: set[str] = set()
         if dry_run:
             result["dry_run"] = 0
+        sender = OutboxSender() if pipelined else None
 
         def process_page(work_date, page_index: int, page_records) -> None:
             events, selected_records = build_events(page_records, dry_run=dry_run)
@@ -170,6 +277,10 @@ def sync_once(headless: bool, dry_run: bool, since: datetime | None = None) -> d
                 len(page_records),
                 len(events),
             )
+            if sender is not None:
+                # Los eventos ya quedaron durables en build_events.
+                sender.notify()
+                return
             page_result = send_and_mark(
                 events,
                 selected_records,
@@ -185,7 +296,7 @@ def sync_once(headless: bool, dry_run: bool, since: datetime | None = None) -> d
                     f"en fecha {work_date} pagina {page_index}"
                 )
 
-        with HikConnectClient(headless=headless) as client:
+        with HikConnectClient(headless=headless) as client, sender or nullcontext():
             records = client.fetch_records_between(
                 start_dt=start_dt,
                 end_dt=end_dt,
@@ -194,6 +305,8 @@ def sync_once(headless: bool, dry_run: bool, since: datetime | None = None) -> d
                 on_invalid_record=quarantine_cloud_record,
                 on_page_records=process_page,
             )
+        if sender is not None:
+            result = sender.finish()
         log.info("Registros cloud encontrados: %d", len(records))
         if not dry_run:
             if not records.complete:
@@ -238,10 +351,16 @@ def main() -> None:
     parser.add_argument("--import-file", help="Importa CSV/XLSX exportado manualmente desde Attendance")
     parser.add_argument("--dry-run", action="store_true", help="No envia al ERP ni marca registros como enviados")
     parser.add_argument("--headful", action="store_true", help="Abre navegador visible para diagnostico")
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        help="Envia cada pagina antes de leer la siguiente (sin sender en segundo plano)",
+    )
     args = parser.parse_args()
 
     init_db()
     headless = not args.headful
+    pipelined = PIPELINED_UPLOAD and not args.serial
 
     if args.test:
         sys.exit(0 if test_connectivity(headless=headless) else 1)
@@ -250,16 +369,16 @@ def main() -> None:
         return
     if args.backfill_hours:
         since = datetime.now(TIMEZONE) - timedelta(hours=args.backfill_hours)
-        sync_once(headless=headless, dry_run=args.dry_run, since=since)
+        sync_once(headless=headless, dry_run=args.dry_run, since=since, pipelined=pipelined)
         return
     if args.sync_once:
-        sync_once(headless=headless, dry_run=args.dry_run)
+        sync_once(headless=headless, dry_run=args.dry_run, pipelined=pipelined)
         return
 
     log.info("Agente Hik-Connect iniciado. Intervalo: %ds", SYNC_INTERVAL_SECONDS)
     while True:
         try:
-            sync_once(headless=headless, dry_run=False)
+            sync_once(headless=headless, dry_run=False, pipelined=pipelined)
         except Exception as exc:
             log.exception("Error inesperado en sync: %s", exc)
         time.sleep(SYNC_INTERVAL_SECONDS)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -11,9 +12,49 @@ OUTBOX_PENDING = "pending"
 OUTBOX_ACKED = "acked"
 OUTBOX_REVIEW = "review"
 
+_local = threading.local()
+
+
+def _db() -> sqlite3.Connection:
+    """
+    Conexion de larga vida por hilo, en modo WAL.
+
+    WAL deja que el sender lea y marque el outbox mientras el scraper inserta
+    paginas nuevas; ``synchronous=NORMAL`` evita un fsync por transaccion (en
+    WAL sigue siendo durable ante caidas del proceso). Se reabre si cambia
+    ``DB_PATH`` (las pruebas apuntan a una base temporal).
+    """
+    path = str(DB_PATH)
+    con = getattr(_local, "con", None)
+    if con is not None and getattr(_local, "path", None) == path:
+        return con
+    if con is not None:
+        con.close()
+    con = sqlite3.connect(path, timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA busy_timeout=30000")
+    _local.con = con
+    _local.path = path
+    return con
+
+
+def close_db() -> None:
+    con = getattr(_local, "con", None)
+    if con is not None:
+        con.close()
+    _local.con = None
+    _local.path = None
+
+
+def _row_cursor(con: sqlite3.Connection) -> sqlite3.Cursor:
+    cursor = con.cursor()
+    cursor.row_factory = sqlite3.Row
+    return cursor
+
 
 def init_db() -> None:
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         con.execute(
             """
             CREATE TABLE IF NOT EXISTS sync_state (
@@ -95,7 +136,7 @@ def quarantine_cloud_record(record) -> None:
     """Conserva una fila cloud no proyectable antes de permitir avanzar página."""
     now = _now_iso()
     raw_payload = _payload_json(record.raw)
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         con.execute(
             """
             INSERT INTO cloud_record_quarantine (
@@ -119,32 +160,45 @@ def quarantine_cloud_record(record) -> None:
         )
 
 
-def enqueue_event(event: dict[str, Any]) -> bool:
-    """Persiste un evento inmutable; True solo cuando el GUID era nuevo."""
+def _outbox_values(event: dict[str, Any], now: str) -> tuple[str, ...]:
     event_id = str(event.get("event_id") or "").strip()
     if not event_id:
         raise ValueError("event_id es obligatorio")
+    return (
+        event_id,
+        str(event.get("source") or ""),
+        str(event.get("employee_external_id") or ""),
+        str(event.get("occurred_at") or ""),
+        str(event.get("kind") or ""),
+        _payload_json(event),
+        now,
+        now,
+    )
+
+
+def enqueue_events(events: list[dict[str, Any]]) -> int:
+    """Persiste varios eventos en una sola transaccion; devuelve cuantos eran nuevos."""
     now = _now_iso()
-    with sqlite3.connect(DB_PATH) as con:
-        cursor = con.execute(
+    rows = [_outbox_values(event, now) for event in events]
+    if not rows:
+        return 0
+    with _db() as con:
+        before = con.total_changes
+        con.executemany(
             """
             INSERT OR IGNORE INTO event_outbox (
                 event_id, source, employee_no, occurred_at, kind, payload,
                 status, attempts, last_error, created_at, updated_at
             ) VALUES (?, ?, ?, ?, ?, ?, 'pending', 0, '', ?, ?)
             """,
-            (
-                event_id,
-                str(event.get("source") or ""),
-                str(event.get("employee_external_id") or ""),
-                str(event.get("occurred_at") or ""),
-                str(event.get("kind") or ""),
-                _payload_json(event),
-                now,
-                now,
-            ),
+            rows,
         )
-    return cursor.rowcount == 1
+        return con.total_changes - before
+
+
+def enqueue_event(event: dict[str, Any]) -> bool:
+    """Persiste un evento inmutable; True solo cuando el GUID era nuevo."""
+    return enqueue_events([event]) == 1
 
 
 def _outbox_row(row: sqlite3.Row | None) -> dict[str, Any] | None:
@@ -159,26 +213,36 @@ def _outbox_row(row: sqlite3.Row | None) -> dict[str, Any] | None:
 
 
 def get_outbox_event(event_id: str) -> dict[str, Any] | None:
-    with sqlite3.connect(DB_PATH) as con:
-        con.row_factory = sqlite3.Row
-        row = con.execute(
+    with _db() as con:
+        row = _row_cursor(con).execute(
             "SELECT * FROM event_outbox WHERE event_id=?",
             (event_id,),
         ).fetchone()
     return _outbox_row(row)
 
 
-def list_pending_events(limit: int = 1000) -> list[dict[str, Any]]:
-    with sqlite3.connect(DB_PATH) as con:
-        con.row_factory = sqlite3.Row
-        rows = con.execute(
-            """
+def list_pending_events(
+    limit: int = 1000,
+    after: tuple[str, str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Pendientes en orden de llegada. ``after`` es ``(created_at, event_id)`` de
+    la ultima fila leida para continuar sin volver a recorrer el inicio.
+    """
+    where = "status=?"
+    params: tuple[Any, ...] = (OUTBOX_PENDING,)
+    if after is not None:
+        where += " AND (created_at, event_id) > (?, ?)"
+        params += tuple(after)
+    with _db() as con:
+        rows = _row_cursor(con).execute(
+            f"""
             SELECT * FROM event_outbox
-            WHERE status=?
+            WHERE {where}
             ORDER BY created_at, event_id
             LIMIT ?
             """,
-            (OUTBOX_PENDING, limit),
+            (*params, limit),
         ).fetchall()
     return [_outbox_row(row) for row in rows]
 
@@ -193,7 +257,7 @@ def mark_delivery_attempt(event_ids: list[str]) -> None:
     placeholders, params = _where_event_ids(event_ids)
     if not placeholders:
         return
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         con.execute(
             f"""
             UPDATE event_outbox
@@ -208,7 +272,7 @@ def record_delivery_error(event_ids: list[str], error: str) -> None:
     placeholders, params = _where_event_ids(event_ids)
     if not placeholders:
         return
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         con.execute(
             f"""
             UPDATE event_outbox
@@ -231,59 +295,50 @@ def apply_delivery_results(event_ids: list[str], results: list[dict[str, Any]])
         raise ValueError("respuesta ERP con outcome desconocido")
 
     now = _now_iso()
-    with sqlite3.connect(DB_PATH) as con:
-        for item in results:
-            event_id = str(item["event_id"])
-            outcome = str(item["outcome"])
-            reason = str(item.get("reason_code") or outcome)
-            ack_payload = _payload_json(item)
-            if outcome in {"accepted", "duplicate"}:
-                con.execute(
-                    """
-                    UPDATE event_outbox
-                    SET status=?, last_error='', acked_at=?, ack_payload=?, updated_at=?
-                    WHERE event_id=? AND status=?
-                    """,
-                    (
-                        OUTBOX_ACKED,
-                        now,
-                        ack_payload,
-                        now,
-                        event_id,
-                        OUTBOX_PENDING,
-                    ),
-                )
-            elif outcome == "deferred":
-                con.execute(
-                    """
-                    UPDATE event_outbox
-                    SET last_error=?, ack_payload=?, updated_at=?
-                    WHERE event_id=? AND status=?
-                    """,
-                    (reason, ack_payload, now, event_id, OUTBOX_PENDING),
-                )
-            else:
-                con.execute(
-                    """
-                    UPDATE event_outbox
-                    SET status=?, last_error=?, ack_payload=?, updated_at=?
-                    WHERE event_id=? AND status=?
-                    """,
-                    (
-                        OUTBOX_REVIEW,
-                        reason,
-                        ack_payload,
-                        now,
-                        event_id,
-                        OUTBOX_PENDING,
-                    ),
-                )
+    acked, deferred, review = [], [], []
+    for item in results:
+        event_id = str(item["event_id"])
+        outcome = str(item["outcome"])
+        reason = str(item.get("reason_code") or outcome)
+        ack_payload = _payload_json(item)
+        if outcome in {"accepted", "duplicate"}:
+            acked.append((OUTBOX_ACKED, now, ack_payload, now, event_id, OUTBOX_PENDING))
+        elif outcome == "deferred":
+            deferred.append((reason, ack_payload, now, event_id, OUTBOX_PENDING))
+        else:
+            review.append((OUTBOX_REVIEW, reason, ack_payload, now, event_id, OUTBOX_PENDING))
+
+    with _db() as con:
+        con.executemany(
+            """
+            UPDATE event_outbox
+            SET status=?, last_error='', acked_at=?, ack_payload=?, updated_at=?
+            WHERE event_id=? AND status=?
+            """,
+            acked,
+        )
+        con.executemany(
+            """
+            UPDATE event_outbox
+            SET last_error=?, ack_payload=?, updated_at=?
+            WHERE event_id=? AND status=?
+            """,
+            deferred,
+        )
+        con.executemany(
+            """
+            UPDATE event_outbox
+            SET status=?, last_error=?, ack_payload=?, updated_at=?
+            WHERE event_id=? AND status=?
+            """,
+            review,
+        )
 
 
 def stable_punch_kind(employee_no: str, dt: datetime) -> str:
     """Clasifica sin mutar estado; enqueue_event vuelve inmutable el resultado."""
     work_date = dt.date().isoformat()
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         outbox_exists = con.execute(
             """
             SELECT 1 FROM event_outbox
@@ -304,7 +359,7 @@ def stable_punch_kind(employee_no: str, dt: datetime) -> str:
 
 
 def get_discovery_page() -> int:
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         row = con.execute(
             "SELECT value FROM sync_state WHERE key='discovery_page'"
         ).fetchone()
@@ -312,7 +367,7 @@ def get_discovery_page() -> int:
 
 
 def set_discovery_page(page: int) -> None:
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         con.execute(
             "INSERT OR REPLACE INTO sync_state VALUES ('discovery_page', ?)",
             (str(max(1, page)),),
@@ -320,7 +375,7 @@ def set_discovery_page(page: int) -> None:
 
 
 def get_last_sync_time() -> datetime:
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         row = con.execute("SELECT value FROM sync_state WHERE key='last_sync'").fetchone()
     if row:
         return datetime.fromisoformat(row[0]) - timedelta(hours=LOOKBACK_HOURS)
@@ -328,7 +383,7 @@ def get_last_sync_time() -> datetime:
 
 
 def set_last_sync_time(dt: datetime) -> None:
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         con.execute("INSERT OR REPLACE INTO sync_state VALUES ('last_sync', ?)", (dt.isoformat(),))
 
 
@@ -342,7 +397,7 @@ def record_cycle_success(*, completed_at: datetime, last_cloud_record_at: dateti
     }
     if last_cloud_record_at:
         values["last_cloud_record_at"] = last_cloud_record_at.isoformat()
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         con.executemany(
             "INSERT OR REPLACE INTO sync_state(key, value) VALUES (?, ?)",
             values.items(),
@@ -350,7 +405,7 @@ def record_cycle_success(*, completed_at: datetime, last_cloud_record_at: dateti
 
 
 def record_cycle_failure(*, failed_at: datetime, category: str, error: str) -> None:
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         row = con.execute(
             "SELECT value FROM sync_state WHERE key='failure_count'"
         ).fetchone()
@@ -367,7 +422,7 @@ def record_cycle_failure(*, failed_at: datetime, category: str, error: str) -> N
 
 
 def was_sent(record_guid: str) -> bool:
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         legacy = con.execute(
             "SELECT 1 FROM cloud_records_sent WHERE record_guid=?",
             (record_guid,),
@@ -379,8 +434,38 @@ def was_sent(record_guid: str) -> bool:
     return legacy is not None or (outbox is not None and outbox[0] in {OUTBOX_ACKED, OUTBOX_REVIEW})
 
 
+def lookup_records(record_guids: list[str]) -> tuple[set[str], dict[str, dict[str, Any]]]:
+    """
+    Equivalente por lote de ``was_sent`` + ``get_outbox_event``: devuelve los
+    GUID ya cerrados y las filas del outbox existentes, en pocas consultas.
+    """
+    closed: set[str] = set()
+    outbox: dict[str, dict[str, Any]] = {}
+    guids = list(dict.fromkeys(record_guids))
+    with _db() as con:
+        for start in range(0, len(guids), 500):
+            chunk = guids[start : start + 500]
+            placeholders, params = _where_event_ids(chunk)
+            closed.update(
+                row[0]
+                for row in con.execute(
+                    f"SELECT record_guid FROM cloud_records_sent WHERE record_guid IN ({placeholders})",
+                    params,
+                )
+            )
+            for row in _row_cursor(con).execute(
+                f"SELECT * FROM event_outbox WHERE event_id IN ({placeholders})",
+                params,
+            ):
+                item = _outbox_row(row)
+                outbox[item["event_id"]] = item
+                if item["status"] in {OUTBOX_ACKED, OUTBOX_REVIEW}:
+                    closed.add(item["event_id"])
+    return closed, outbox
+
+
 def mark_sent(record_guid: str, employee_no: str, device_time: str) -> None:
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         con.execute(
             "INSERT OR IGNORE INTO cloud_records_sent VALUES (?, ?, ?, ?)",
             (record_guid, employee_no, device_time, datetime.now(TIMEZONE).isoformat()),
@@ -389,7 +474,7 @@ def mark_sent(record_guid: str, employee_no: str, device_time: str) -> None:
 
 def day_state_exists(employee_no: str, dt: datetime) -> bool:
     work_date = dt.date().isoformat()
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         row = con.execute(
             "SELECT 1 FROM employee_day_state WHERE employee_no=? AND work_date=?",
             (employee_no, work_date),
@@ -399,7 +484,7 @@ def day_state_exists(employee_no: str, dt: datetime) -> bool:
 
 def classify_punch(employee_no: str, dt: datetime) -> str:
     work_date = dt.date().isoformat()
-    with sqlite3.connect(DB_PATH) as con:
+    with _db() as con:
         row = con.execute(
             "SELECT first_time, last_time FROM employee_day_state WHERE employee_no=? AND work_date=?",
             (employee_no, work_date),
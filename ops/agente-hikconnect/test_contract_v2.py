@@ -1,6 +1,8 @@
 """Check del contrato HTTP v2. Correr: python3 test_contract_v2.py."""
 from __future__ import annotations
 
+import gzip
+import json
 import sys
 from pathlib import Path
 
@@ -21,36 +23,85 @@ class Response:
         }
 
 
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def post(self, url, data, headers, timeout):
+        self.calls.append({"url": url, "data": data, "headers": headers, "timeout": timeout})
+        return Response()
+
+    def close(self):
+        pass
+
+
+def _body(call) -> dict:
+    data = call["data"]
+    if call["headers"].get("Content-Encoding") == "gzip":
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def _event(guid: str = "guid-v2", device_id: str = "hik-01") -> dict:
+    return {
+        "event_id": guid,
+        "source": "hikconnect_cloud",
+        "employee_external_id": "328",
+        "occurred_at": "2026-07-28T08:00:00-07:00",
+        "kind": "check_in",
+        "device_id": device_id,
+    }
+
+
 def test_envia_contrato_v2_al_endpoint_v2():
-    captured = {}
-    original_post = erp_client.requests.post
+    session = FakeSession()
+    erp_client._local.session = session
     try:
-        def fake_post(url, json, headers, timeout):
-            captured.update(url=url, json=json, timeout=timeout)
-            return Response()
-
-        erp_client.requests.post = fake_post
-        result = erp_client.send_events(
-            [
-                {
-                    "event_id": "guid-v2",
-                    "source": "hikconnect_cloud",
-                    "employee_external_id": "328",
-                    "occurred_at": "2026-07-28T08:00:00-07:00",
-                    "kind": "check_in",
-                    "device_id": "hik-01",
-                }
-            ]
-        )
+        result = erp_client.send_events([_event()])
+        captured = session.calls[0]
+        body = _body(captured)
         assert captured["url"].endswith("/rrhh/api/asistencia-hik/v2/")
-        assert captured["json"]["contract_version"] == 2
-        assert captured["json"]["events"][0]["event_id"] == "guid-v2"
-        assert captured["json"]["batch_id"]
+        assert body["contract_version"] == 2
+        assert body["events"][0]["event_id"] == "guid-v2"
+        assert body["batch_id"]
         assert result["results"][0]["event_id"] == "guid-v2"
     finally:
-        erp_client.requests.post = original_post
+        erp_client._local.session = None
+
+
+def test_lote_grande_viaja_comprimido_por_la_misma_sesion():
+    session = FakeSession()
+    erp_client._local.session = session
+    try:
+        events = [_event(f"guid-{index}", device_id="hik-01" * 20) for index in range(60)]
+        erp_client.send_events(events)
+        erp_client.send_events(events[:1])
+        big, small = session.calls
+        assert big["headers"] == {"Content-Encoding": "gzip"}
+        assert len(big["data"]) < len(json.dumps(events)) / 3
+        assert _body(big)["events"] == events
+        assert small["headers"] == {}
+        assert erp_client._session() is session
+    finally:
+        erp_client._local.session = None
+
+
+def test_lotes_acotados_por_eventos_y_bytes():
+    events = [_event(f"guid-{index}") for index in range(250)]
+    by_count = list(erp_client.iter_batches(events, max_events=100, max_bytes=10**9))
+    assert [len(batch) for batch in by_count] == [100, 100, 50]
+
+    size = erp_client._event_size(events[0])
+    by_bytes = list(erp_client.iter_batches(events[:10], max_events=100, max_bytes=size * 3))
+    assert [len(batch) for batch in by_bytes] == [3, 3, 3, 1]
+    assert [item for batch in by_bytes for item in batch] == events[:10]
+
+    capped = list(erp_client.iter_batches(events, max_events=500, max_bytes=10**9))
+    assert max(len(batch) for batch in capped) == erp_client.SERVER_MAX_BATCH_EVENTS
 
 
 if __name__ == "__main__":
     test_envia_contrato_v2_al_endpoint_v2()
+    test_lote_grande_viaja_comprimido_por_la_misma_sesion()
+    test_lotes_acotados_por_eventos_y_bytes()
     print("OK: contrato HTTP v2")
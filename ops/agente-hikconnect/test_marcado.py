@@ -259,7 +259,7 @@ def test_sync_no_reintenta_un_diferido_en_cada_pagina_del_mismo_ciclo():
         main.HikConnectClient = ClienteDosPaginas
         main.send_events = fake_send
 
-        main.sync_once(headless=True, dry_run=False, since=AHORA)
+        main.sync_once(headless=True, dry_run=False, since=AHORA, pipelined=False)
 
         assert llamadas == [["guid-diferido"], ["guid-aceptado"]]
         assert state.get_outbox_event("guid-diferido")["attempts"] == 1
@@ -268,6 +268,24 @@ def test_sync_no_reintenta_un_diferido_en_cada_pagina_del_mismo_ciclo():
         main.send_events = original_send
         tmp.cleanup()
 
+    tmp = isolated_db()
+    llamadas.clear()
+    try:
+        main.HikConnectClient = ClienteDosPaginas
+        main.send_events = fake_send
+
+        main.sync_once(headless=True, dry_run=False, since=AHORA, pipelined=True)
+
+        # El sender puede juntar ambas paginas en un lote; cada GUID va una vez.
+        enviados = [event_id for ids in llamadas for event_id in ids]
+        assert sorted(enviados) == ["guid-aceptado", "guid-diferido"]
+        assert state.get_outbox_event("guid-diferido")["attempts"] == 1
+        assert state.get_outbox_event("guid-aceptado")["status"] == "acked"
+    finally:
+        main.HikConnectClient = original_client
+        main.send_events = original_send
+        tmp.cleanup()
+
 
 if __name__ == "__main__":
     test_outbox_existe_antes_del_post_y_ack_cierra()
@@ -0,0 +1,186 @@
+"""Checks del envio en paralelo al scraping. Correr: python3 test_uploader.py."""
+from __future__ import annotations
+
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from config import TIMEZONE
+from hikconnect_client import CloudRecord, DiscoveryRecords
+import main
+import state
+
+AHORA = datetime(2026, 7, 28, 8, 0, tzinfo=TIMEZONE)
+
+
+def event(guid: str) -> dict:
+    return {
+        "event_id": guid,
+        "source": "hikconnect_cloud",
+        "employee_external_id": "328",
+        "occurred_at": "2026-07-28T08:00:00-07:00",
+        "kind": "punch",
+        "device_id": "hik-01",
+    }
+
+
+def registro(guid: str, employee_no: str) -> CloudRecord:
+    return CloudRecord(
+        record_guid=guid,
+        employee_no=employee_no,
+        name="Prueba",
+        department="",
+        device_time=AHORA,
+        device_name="Checador",
+        device_serial_no="hik-01",
+        raw={},
+    )
+
+
+def isolated_db():
+    temp_dir = tempfile.TemporaryDirectory()
+    state.DB_PATH = Path(temp_dir.name) / "state.db"
+    state.init_db()
+    return temp_dir
+
+
+def accept_all(outgoing):
+    return {
+        "contract_version": 2,
+        "batch_id": "fake",
+        "results": [{"event_id": item["event_id"], "outcome": "accepted"} for item in outgoing],
+    }
+
+
+def test_conexion_unica_en_wal_y_encolado_por_lote():
+    tmp = isolated_db()
+    try:
+        con = state._db()
+        assert con is state._db()
+        assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        assert state.enqueue_events([event("a"), event("b"), event("c")]) == 3
+        assert state.enqueue_events([event("a"), event("d")]) == 1
+        assert state.enqueue_event(event("d")) is False
+
+        state.apply_delivery_results(["a"], [{"event_id": "a", "outcome": "accepted"}])
+        closed, outbox = state.lookup_records(["a", "b", "zzz"])
+        assert closed == {"a"}
+        assert set(outbox) == {"a", "b"}
+
+        first = state.list_pending_events(limit=2)
+        rest = state.list_pending_events(after=(first[-1]["created_at"], first[-1]["event_id"]))
+        assert [item["event_id"] for item in first + rest] == ["b", "c", "d"]
+    finally:
+        tmp.cleanup()
+
+
+def test_sender_drena_mientras_el_scraper_sigue_leyendo():
+    tmp = isolated_db()
+    original_client = main.HikConnectClient
+    original_send = main.send_events
+    primera_enviada = threading.Event()
+
+    class ClienteLento:
+        def __init__(self, **_kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_args):
+            return None
+
+        def fetch_records_between(self, **kwargs):
+            on_page_records = kwargs["on_page_records"]
+            primero = registro("guid-p1", "328")
+            segundo = registro("guid-p2", "329")
+            on_page_records(AHORA.date(), 1, [primero])
+            # La pagina 1 se entrega antes de que el scraper termine la 2.
+            assert primera_enviada.wait(5), "el sender no drena durante el scraping"
+            assert state.get_outbox_event("guid-p1")["status"] == "acked"
+            on_page_records(AHORA.date(), 2, [segundo])
+            return DiscoveryRecords([primero, segundo], complete=True, next_page=1)
+
+    original_apply = main.apply_delivery_results
+
+    def apply_and_signal(event_ids, results):
+        original_apply(event_ids, results)
+        if "guid-p1" in event_ids:
+            primera_enviada.set()
+
+    try:
+        main.HikConnectClient = ClienteLento
+        main.send_events = accept_all
+        main.apply_delivery_results = apply_and_signal
+
+        result = main.sync_once(headless=True, dry_run=False, since=AHORA, pipelined=True)
+
+        assert result["acked"] == 2
+        assert result["errors"] == 0
+        assert state.get_outbox_event("guid-p2")["status"] == "acked"
+    finally:
+        main.HikConnectClient = original_client
+        main.send_events = original_send
+        main.apply_delivery_results = original_apply
+        tmp.cleanup()
+
+
+def test_error_del_erp_detiene_el_sender_y_falla_el_ciclo():
+    tmp = isolated_db()
+    original_client = main.HikConnectClient
+    original_send = main.send_events
+    llamadas = []
+
+    class ClienteTresPaginas:
+        def __init__(self, **_kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_args):
+            return None
+
+        def fetch_records_between(self, **kwargs):
+            on_page_records = kwargs["on_page_records"]
+            records = [registro(f"guid-{index}", str(300 + index)) for index in range(3)]
+            for index, record in enumerate(records, start=1):
+                on_page_records(AHORA.date(), index, [record])
+            return DiscoveryRecords(records, complete=True, next_page=1)
+
+    def caido(outgoing):
+        llamadas.append([item["event_id"] for item in outgoing])
+        raise TimeoutError("timeout")
+
+    try:
+        main.HikConnectClient = ClienteTresPaginas
+        main.send_events = caido
+        try:
+            main.sync_once(headless=True, dry_run=False, since=AHORA, pipelined=True)
+        except RuntimeError as exc:
+            assert "ERP" in str(exc)
+        else:
+            raise AssertionError("el ciclo debio fallar con el ERP caido")
+
+        assert len(llamadas) == 1, "tras el primer lote fallido no se insiste en el ciclo"
+        # El scraping puede cortarse antes de la ultima pagina; lo leido queda pending.
+        assert state.get_outbox_event("guid-0")["status"] == "pending"
+        for index in range(1, 3):
+            row = state.get_outbox_event(f"guid-{index}")
+            assert row is None or row["status"] == "pending"
+    finally:
+        main.HikConnectClient = original_client
+        main.send_events = original_send
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    test_conexion_unica_en_wal_y_encolado_por_lote()
+    test_sender_drena_mientras_el_scraper_sigue_leyendo()
+    test_error_del_erp_detiene_el_sender_y_falla_el_ciclo()
+    print("OK: los 3 checks del envio en paralelo pasan")
@@ -9,7 +9,6 @@ from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
-from api.ai_gateway_services import invoke_tool, list_allowed_tools, request_tool_approval
 from core.access import primary_role
 from orquestacion.models import (
     ChatConversation,
@@ -223,6 +222,9 @@ def serialize_conversation_detail(conversation: ChatConversation) -> dict[str, A
 
 
 def _build_tool_definitions(user) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+    # El gateway importa los servicios de todos los módulos; se carga al usarse.
+    from api.ai_gateway_services import list_allowed_tools
+
     allowed_tools = list_allowed_tools(user)
     tool_map = {tool["name"]: tool for tool in allowed_tools}
     openai_tools = []
@@ -293,6 +295,8 @@ def _title_from_text(content: str) -> str:
 
 
 def _invoke_chat_tool(*, user, conversation: ChatConversation, user_message: ChatMessage, assistant_message: ChatMessage, tool_meta: dict[str, Any], arguments: dict[str, Any]) -> dict[str, Any]:
+    from api.ai_gateway_services import invoke_tool, request_tool_approval
+
     tool_call = ChatToolCall.objects.create(
         conversation=conversation,
         request_message=user_message,
@@ -105,7 +105,7 @@ class NativeERPChatServiceTests(TestCase):
         self.assertEqual(conversation.title, "¿Qué gasto de insumos tenemos comprometido hoy?")
         self.assertEqual(conversation.state.metadata_json["last_tool_count"], 0)
 
-    @patch("orquestacion.services.chat_service.invoke_tool")
+    @patch("api.ai_gateway_services.invoke_tool")
     @patch("orquestacion.services.chat_service._model_client")
     @patch("orquestacion.services.chat_service._build_tool_definitions")
     def test_execute_chat_turn_records_tool_call_and_result(
@@ -1,4 +1,18 @@
-from rest_framework.pagination import PageNumberPagination
+from __future__ import annotations
+
+import base64
+import json
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardPagination(PageNumberPagination):
@@ -11,3 +25,271 @@ class LargePagination(PageNumberPagination):
     page_size = 200
     page_size_query_param = "page_size"
     max_page_size = 2000
+
+
+def _encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError):
+        raise ValidationError({"cursor": "Cursor inválido."})
+    if not isinstance(payload, dict) or not isinstance(payload.get("v"), list):
+        raise ValidationError({"cursor": "Cursor inválido."})
+    return payload
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por llave compuesta (keyset / seek) para tablas grandes.
+
+    En lugar de ``OFFSET`` + ``COUNT(*)`` filtra por la posición del último
+    renglón entregado sobre un orden estable y único, p. ej.
+    ``(sale_date, id)``, así que cada página cuesta lo mismo sin importar qué
+    tan adentro de la tabla esté el cliente. El último campo del orden debe ser
+    único (normalmente ``id``).
+
+    La vista puede definir ``keyset_ordering`` y ``keyset_change_fields``:
+
+    - ``?cursor=<token>``: página siguiente (el token es opaco).
+    - ``?changed_since=<token>``: modo incremental. Recorre en orden de
+      ``keyset_change_fields`` (p. ej. ``(updated_at, id)``) y entrega solo lo
+      creado/modificado después del token. Cada respuesta trae
+      ``sync_cursor``; el consumidor lo guarda y lo manda en la siguiente
+      sincronización para no releer la tabla completa (``?changed_since=``
+      vacío arranca desde el inicio). Al retomar desde un ``sync_cursor`` se
+      relee un margen de ``POS_BRIDGE_API_CHANGED_SINCE_MARGIN_SECONDS``
+      hacia atrás: una transacción que confirma tarde deja filas con un
+      ``updated_at`` anterior a la marca ya entregada. El consumidor debe
+      tolerar repetidos (upsert por ``id``). Los borrados no se reportan.
+    - ``?pagination=keyset``: primera página en modo cursor.
+    - ``?count=approx``: agrega ``count_estimate`` con la estimación del
+      planeador de PostgreSQL (``pg_class.reltuples`` sin filtros) en vez de un
+      ``COUNT(*)`` exacto.
+
+    Sin ninguno de esos parámetros, si la clase define
+    ``legacy_pagination_class``, la petición se pagina como antes (por número
+    de página) para no romper a los consumidores existentes.
+    """
+
+    page_size = 200
+    page_size_query_param = "page_size"
+    max_page_size = 2000
+    cursor_query_param = "cursor"
+    changed_since_query_param = "changed_since"
+    count_query_param = "count"
+    keyset_ordering: tuple[str, ...] = ("id",)
+    keyset_change_fields: tuple[str, ...] | None = None
+    legacy_pagination_class = None
+
+    def __init__(self):
+        self._legacy = None
+        self.request = None
+        self.next_token = None
+        self.sync_token = None
+        self.count_estimate = None
+        self.mode = "cursor"
+
+    # --- activación ---------------------------------------------------
+    def _keyset_requested(self, request) -> bool:
+        params = request.query_params
+        return (
+            self.cursor_query_param in params
+            or self.changed_since_query_param in params
+            or params.get("pagination") == "keyset"
+        )
+
+    def _use_legacy(self, request) -> bool:
+        return self.legacy_pagination_class is not None and not self._keyset_requested(request)
+
+    # --- orden ----------------------------------------------------------
+    def _ordering(self, view) -> tuple[str, ...]:
+        if self.mode == "changed_since":
+            fields = getattr(view, "keyset_change_fields", None) or self.keyset_change_fields
+            if not fields:
+                raise ValidationError({self.changed_since_query_param: "Este recurso no soporta sincronización incremental."})
+            return tuple(fields)
+        return tuple(getattr(view, "keyset_ordering", None) or self.keyset_ordering)
+
+    @staticmethod
+    def _field_name(term: str) -> str:
+        return term.lstrip("-")
+
+    def _seek_filter(self, ordering: tuple[str, ...], values: list) -> Q:
+        """
+        (a, b, c) > (va, vb, vc) respetando la dirección de cada campo.
+
+        La expansión en ``OR`` no le sirve a PostgreSQL como rango de índice;
+        la cota redundante sobre el primer campo (``a >= va``) sí, y el índice
+        ``(a, b, c)`` se recorre desde la posición del cursor.
+        """
+        leading = self._field_name(ordering[0])
+        bound = "lte" if ordering[0].startswith("-") else "gte"
+        condition = Q()
+        for index, term in enumerate(ordering):
+            name = self._field_name(term)
+            lookup = "lt" if term.startswith("-") else "gt"
+            clause = Q(**{f"{name}__{lookup}": values[index]})
+            for prev_index in range(index):
+                clause &= Q(**{self._field_name(ordering[prev_index]): values[prev_index]})
+            condition |= clause
+        return Q(**{f"{leading}__{bound}": values[0]}) & condition
+
+    def _overlap_filter(self, ordering: tuple[str, ...], values: list) -> Q | None:
+        """Relee el margen de traslape antes de la marca de un ``sync_cursor``."""
+        margin = int(getattr(settings, "POS_BRIDGE_API_CHANGED_SINCE_MARGIN_SECONDS", 0) or 0)
+        if margin <= 0 or ordering[0].startswith("-") or not isinstance(values[0], datetime):
+            return None
+        return Q(**{f"{self._field_name(ordering[0])}__gte": values[0] - timedelta(seconds=margin)})
+
+    def _cursor_values(self, queryset, ordering: tuple[str, ...], payload: dict) -> list:
+        if payload.get("o") != list(ordering) or len(payload["v"]) != len(ordering):
+            raise ValidationError({"cursor": "El cursor no corresponde a este recurso u orden."})
+        values = []
+        for term, raw in zip(ordering, payload["v"]):
+            field = queryset.model._meta.get_field(self._field_name(term))
+            try:
+                values.append(field.to_python(raw))
+            except Exception:
+                raise ValidationError({"cursor": "Cursor inválido."})
+        return values
+
+    def _row_values(self, row, ordering: tuple[str, ...]) -> list:
+        return [_json_value(getattr(row, self._field_name(term))) for term in ordering]
+
+    # --- API de DRF ---------------------------------------------------
+    def get_page_size(self, request) -> int:
+        raw = request.query_params.get(self.page_size_query_param)
+        try:
+            size = int(raw) if raw else self.page_size
+        except (TypeError, ValueError):
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def estimate_count(self, queryset) -> int | None:
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                # reltuples es -1 si la tabla nunca se ha analizado.
+                return max(int(row[0]), 0) if row else None
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        if self._use_legacy(request):
+            self._legacy = self.legacy_pagination_class()
+            return self._legacy.paginate_queryset(queryset, request, view=view)
+        self._legacy = None
+
+        params = request.query_params
+        token = params.get(self.cursor_query_param) or ""
+        since_token = params.get(self.changed_since_query_param)
+        self.mode = "changed_since" if since_token is not None else "cursor"
+        ordering = self._ordering(view)
+
+        if params.get(self.count_query_param) == "approx":
+            self.count_estimate = self.estimate_count(queryset)
+
+        queryset = queryset.order_by(*ordering)
+        position_token = since_token if self.mode == "changed_since" else token
+        if position_token:
+            payload = _decode_cursor(position_token)
+            values = self._cursor_values(queryset, ordering, payload)
+            # Sólo el ``sync_cursor`` (inicio de una sincronización) relee el
+            # margen; las páginas siguientes avanzan sin repetir filas.
+            overlap = self._overlap_filter(ordering, values) if payload.get("s") else None
+            queryset = queryset.filter(overlap if overlap is not None else self._seek_filter(ordering, values))
+
+        page_size = self.get_page_size(request)
+        rows = list(queryset[: page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        position = {"o": list(ordering), "v": self._row_values(rows[-1], ordering)} if rows else None
+        self.next_token = _encode_cursor(position) if has_next and position else None
+        if self.mode == "changed_since":
+            # Sin filas nuevas el consumidor conserva el token que mandó.
+            self.sync_token = _encode_cursor({**position, "s": 1}) if position else (since_token or None)
+        else:
+            self.sync_token = None
+        return rows
+
+    def get_next_link(self):
+        if not self.next_token:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.mode == "changed_since":
+            # En modo incremental la posición viaja en el mismo parámetro.
+            url = remove_query_param(url, self.cursor_query_param)
+            return replace_query_param(url, self.changed_since_query_param, self.next_token)
+        return replace_query_param(url, self.cursor_query_param, self.next_token)
+
+    def get_paginated_response(self, data):
+        if self._legacy is not None:
+            return self._legacy.get_paginated_response(data)
+        payload = OrderedDict(
+            [
+                ("next", self.get_next_link()),
+                ("previous", None),
+                ("next_cursor", self.next_token),
+            ]
+        )
+        if self.mode == "changed_since":
+            payload["sync_cursor"] = self.sync_token
+        if self.count_estimate is not None:
+            payload["count_estimate"] = self.count_estimate
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True},
+                "next_cursor": {"type": "string", "nullable": True},
+                "sync_cursor": {"type": "string", "nullable": True},
+                "count_estimate": {"type": "integer", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        if self._legacy is not None:
+            return self._legacy.get_schema_operation_parameters(view)
+        return [
+            {"name": self.cursor_query_param, "required": False, "in": "query", "schema": {"type": "string"}},
+            {"name": self.changed_since_query_param, "required": False, "in": "query", "schema": {"type": "string"}},
+            {"name": self.count_query_param, "required": False, "in": "query", "schema": {"type": "string", "enum": ["approx"]}},
+            {"name": self.page_size_query_param, "required": False, "in": "query", "schema": {"type": "integer"}},
+        ]
+
+
+class StandardKeysetPagination(KeysetPagination):
+    """Keyset con ``?cursor``/``?changed_since``; sin ellos, igual que ``StandardPagination``."""
+
+    legacy_pagination_class = StandardPagination
@@ -11,7 +11,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
-from pos_bridge.api.pagination import LargePagination, StandardPagination
+from pos_bridge.api.pagination import LargePagination, StandardKeysetPagination
 from pos_bridge.api.serializers.inventory import (
     CurrentStockSerializer,
     InventoryAvailabilitySerializer,
@@ -52,7 +52,9 @@ class InventoryFilter(filters.FilterSet):
 class InventoryViewSet(ReadOnlyModelViewSet):
     serializer_class = PointInventorySnapshotSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardPagination
+    pagination_class = StandardKeysetPagination
+    keyset_ordering = ("-captured_at", "-id")
+    keyset_change_fields = ("id",)
     filterset_class = InventoryFilter
     filter_backends = [
         filters.DjangoFilterBackend,
@@ -12,7 +12,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
-from pos_bridge.api.pagination import StandardPagination
+from pos_bridge.api.pagination import StandardKeysetPagination
 from pos_bridge.api.serializers.sales import (
     PointDailySaleSerializer,
     SalesByGroupSerializer,
@@ -57,7 +57,9 @@ class SalesFilter(filters.FilterSet):
 class SalesViewSet(ReadOnlyModelViewSet):
     serializer_class = PointDailySaleSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardPagination
+    pagination_class = StandardKeysetPagination
+    keyset_ordering = ("-sale_date", "-id")
+    keyset_change_fields = ("updated_at", "id")
     filterset_class = SalesFilter
     filter_backends = [
         filters.DjangoFilterBackend,
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pos_bridge.services.sales_day_close_benchmark import (
+    DEFAULT_START_DATE,
+    BenchmarkConfig,
+    compare_with_baseline,
+    run_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo ERP del cierre de día de ventas (persistencia, pipeline v2, hechos, MV y caché) "
+        "sobre un volumen sintético y lo compara contra una corrida base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--branches", type=int, default=3, help="Sucursales sintéticas.")
+        parser.add_argument("--products", type=int, default=40, help="Productos vendidos por sucursal-día.")
+        parser.add_argument("--days", type=int, default=2, help="Días de venta a cerrar.")
+        parser.add_argument(
+            "--start-date",
+            default=DEFAULT_START_DATE.isoformat(),
+            help="Primer día sintético YYYY-MM-DD (default lejano para no mezclar ventas reales).",
+        )
+        parser.add_argument("--seed", type=int, default=7, help="Semilla de los montos sintéticos.")
+        parser.add_argument("--output", default="", help="Archivo JSON donde guardar el resultado.")
+        parser.add_argument("--baseline", default="", help="JSON de una corrida previa para comparar.")
+        parser.add_argument(
+            "--max-time-ratio",
+            type=float,
+            default=2.0,
+            help="Falla si una etapa tarda más de este múltiplo de la base.",
+        )
+        parser.add_argument(
+            "--max-query-ratio",
+            type=float,
+            default=1.25,
+            help="Falla si una etapa ejecuta más de este múltiplo de las queries base.",
+        )
+        parser.add_argument(
+            "--min-seconds",
+            type=float,
+            default=0.05,
+            help="Etapas base más rápidas que esto no se comparan por tiempo.",
+        )
+        parser.add_argument("--keep-data", action="store_true", help="Conserva los datos sintéticos en la base.")
+
+    def handle(self, *args, **options):
+        try:
+            start_date = datetime.strptime(options["start_date"], "%Y-%m-%d").date()
+        except ValueError as exc:
+            raise CommandError("start-date debe tener formato YYYY-MM-DD.") from exc
+        for label in ("branches", "products", "days"):
+            if int(options[label]) <= 0:
+                raise CommandError(f"{label} debe ser mayor a 0.")
+
+        baseline = None
+        if options["baseline"]:
+            baseline_path = Path(options["baseline"])
+            if not baseline_path.exists():
+                raise CommandError(f"No existe el archivo base: {baseline_path}")
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+        config = BenchmarkConfig(
+            branches=int(options["branches"]),
+            products=int(options["products"]),
+            days=int(options["days"]),
+            start_date=start_date,
+            seed=int(options["seed"]),
+        )
+        result = run_benchmark(config, keep_data=bool(options["keep_data"]))
+
+        for name, row in result["stages"].items():
+            self.stdout.write(
+                f"{name}: {row['seconds']:.3f}s queries={row['queries']} llamadas={row['calls']} "
+                f"ms/llamada={row['ms_per_call']} max={row['max_call_ms']}ms"
+            )
+        self.stdout.write(
+            f"total: {result['totals']['seconds']:.3f}s queries={result['totals']['queries']} "
+            f"filas={result['volume']['sales_rows']}"
+        )
+
+        regressions = []
+        if baseline is not None:
+            regressions = compare_with_baseline(
+                result,
+                baseline,
+                max_time_ratio=options["max_time_ratio"],
+                max_query_ratio=options["max_query_ratio"],
+                min_seconds=options["min_seconds"],
+            )
+            result["comparison"] = {"baseline_commit": baseline.get("commit", ""), "regressions": regressions}
+
+        if options["output"]:
+            output_path = Path(options["output"])
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+            self.stdout.write(f"Resultado guardado en {output_path}")
+
+        if regressions:
+            for row in regressions:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"Regresión {row['stage']}.{row['metric']}: base={row['baseline']} actual={row['current']} "
+                        f"ratio={row['ratio']} limite={row['limit']}"
+                    )
+                )
+            raise CommandError(f"{len(regressions)} regresiones contra la corrida base.")
+        if baseline is not None:
+            self.stdout.write(self.style.SUCCESS("Sin regresiones contra la corrida base."))
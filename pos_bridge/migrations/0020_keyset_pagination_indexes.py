@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+def _concurrent_index(*, model_name: str, table: str, name: str, fields: list[str]):
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[
+            migrations.RunSQL(
+                sql=f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({', '.join(fields)})",
+                reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS {name}",
+            ),
+        ],
+        state_operations=[
+            migrations.AddIndex(
+                model_name=model_name,
+                index=models.Index(fields=fields, name=name),
+            ),
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("pos_bridge", "0019_alter_pointsyncjob_job_type"),
+    ]
+
+    operations = [
+        _concurrent_index(
+            model_name="pointdailysale",
+            table="pos_bridge_daily_sales",
+            name="pbs_keyset_day_idx",
+            fields=["sale_date", "id"],
+        ),
+        _concurrent_index(
+            model_name="pointdailysale",
+            table="pos_bridge_daily_sales",
+            name="pbs_keyset_updated_idx",
+            fields=["updated_at", "id"],
+        ),
+        _concurrent_index(
+            model_name="pointinventorysnapshot",
+            table="pos_bridge_inventory_snapshots",
+            name="pb_inv_keyset_idx",
+            fields=["captured_at", "id"],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_expand_user_module_access_catalog'),
+        ('maestros', '0016_alter_insumo_tipo_item'),
+        ('pos_bridge', '0020_keyset_pagination_indexes'),
+        ('recetas', '0041_receta_grupo_mano_obra'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pointtransferline',
+            index=models.Index(fields=['erp_destination_branch', 'updated_at'], name='pbt_dest_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pointtransferline',
+            index=models.Index(fields=['erp_origin_branch', 'updated_at'], name='pbt_orig_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:30
+
+from django.db import migrations
+
+
+def trigram_index(*, table: str, name: str, column: str):
+    # Solo si maestros 0017 pudo instalar pg_trgm; ver la nota ahí.
+    return migrations.RunSQL(
+        sql=f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (UPPER({column}::text) gin_trgm_ops);
+            END IF;
+        END $$;
+        """,
+        reverse_sql=f"DROP INDEX IF EXISTS {name}",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("maestros", "0017_catalog_search_trigram_indexes"),
+        ("pos_bridge", "0021_transfer_line_updated_indexes"),
+    ]
+
+    operations = [
+        trigram_index(table="pos_bridge_products", name="pbprod_norm_name_trgm", column="normalized_name"),
+        trigram_index(table="pos_bridge_products", name="pbprod_name_trgm", column="name"),
+    ]
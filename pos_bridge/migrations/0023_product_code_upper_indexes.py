@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:00
+
+from django.db import migrations
+
+
+def upper_index(*, table: str, name: str, column: str):
+    # Para ``iexact`` en la búsqueda de catálogo; ver maestros 0019.
+    return migrations.RunSQL(
+        sql=f"CREATE INDEX IF NOT EXISTS {name} ON {table} (UPPER({column}::text))",
+        reverse_sql=f"DROP INDEX IF EXISTS {name}",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pos_bridge", "0022_product_trigram_indexes"),
+    ]
+
+    operations = [
+        upper_index(table="pos_bridge_products", name="pbprod_sku_upper", column="sku"),
+        upper_index(table="pos_bridge_products", name="pbprod_external_id_upper", column="external_id"),
+    ]
@@ -205,6 +205,8 @@ class PointTransferLine(models.Model):
         indexes = [
             models.Index(fields=["received_at", "destination_branch"], name="pbt_recv_dest_idx"),
             models.Index(fields=["transfer_external_id"], name="pbt_transfer_idx"),
+            models.Index(fields=["erp_destination_branch", "updated_at"], name="pbt_dest_updated_idx"),
+            models.Index(fields=["erp_origin_branch", "updated_at"], name="pbt_orig_updated_idx"),
         ]
 
     def __str__(self) -> str:
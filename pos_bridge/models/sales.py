@@ -42,6 +42,8 @@ class PointDailySale(models.Model):
         indexes = [
             models.Index(fields=["sale_date", "branch"], name="pbs_day_branch_idx"),
             models.Index(fields=["sale_date", "product"], name="pbs_day_product_idx"),
+            models.Index(fields=["sale_date", "id"], name="pbs_keyset_day_idx"),
+            models.Index(fields=["updated_at", "id"], name="pbs_keyset_updated_idx"),
         ]
 
     def __str__(self) -> str:
@@ -23,6 +23,7 @@ class PointInventorySnapshot(models.Model):
             models.Index(fields=["branch", "captured_at"]),
             models.Index(fields=["product", "captured_at"]),
             models.Index(fields=["branch", "product", "-captured_at", "-id"], name="pb_inv_latest_idx"),
+            models.Index(fields=["captured_at", "id"], name="pb_inv_keyset_idx"),
         ]
 
     def __str__(self) -> str:
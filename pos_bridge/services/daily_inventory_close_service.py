@@ -3,20 +3,21 @@ from __future__ import annotations
 import unicodedata
 from datetime import date, datetime, time, timedelta, timezone as datetime_timezone
 from decimal import Decimal
+from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
 from django.conf import settings
 from django.db import connection
 from django.db.models import Min, Max
 from django.utils import timezone
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill
-from openpyxl.utils import get_column_letter
 
 from core.branch_catalog import canonical_point_network_branch_qs
 from core.models import Sucursal
 from pos_bridge.models import PointBranch, PointInventorySnapshot
 
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+
 
 ZERO = Decimal("0.000")
 DAILY_CLOSE_CATEGORY_ORDER = [
@@ -163,6 +164,10 @@ class DailyInventoryCloseService:
         }
 
     def build_workbook(self, payload: dict) -> Workbook:
+        from openpyxl import Workbook
+        from openpyxl.styles import Alignment, Font, PatternFill
+        from openpyxl.utils import get_column_letter
+
         wb = Workbook()
         ws = wb.active
         ws.title = "Inventario final"
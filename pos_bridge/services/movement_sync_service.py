@@ -697,6 +697,21 @@ class PointMovementSyncService:
             "unmatched_items": unresolved,
         }
 
+    @staticmethod
+    def _transfer_line_changed(line: PointTransferLine, defaults: dict) -> bool:
+        for name, value in defaults.items():
+            if name == "sync_job":
+                continue
+            field = line._meta.get_field(name)
+            if field.is_relation:
+                current = getattr(line, field.attname)
+                value = value.pk if value is not None else None
+            else:
+                current = getattr(line, name)
+            if current != value:
+                return True
+        return False
+
     @transaction.atomic
     def persist_transfer_lines(self, sync_job: PointSyncJob, extracted_lines: list, *, apply_inventory: bool = True) -> dict:
         staged_created = 0
@@ -712,6 +727,10 @@ class PointMovementSyncService:
         skipped_non_storage = 0
         unresolved = 0
         current_detail_ids_by_transfer: dict[str, set[str]] = {}
+        existing_by_hash = PointTransferLine.objects.in_bulk(
+            [item.source_hash for item in extracted_lines],
+            field_name="source_hash",
+        )
 
         for item in extracted_lines:
             current_detail_ids_by_transfer.setdefault(item.transfer_external_id, set()).add(
@@ -753,12 +772,22 @@ class PointMovementSyncService:
                 "source_endpoint": "/Transfer/GetTransfer",
                 "raw_payload": item.raw_payload,
             }
-            _, created = PointTransferLine.objects.update_or_create(source_hash=item.source_hash, defaults=defaults)
-            if created:
-                staged_created += 1
-            else:
+            existing = existing_by_hash.get(item.source_hash)
+            if existing is not None and not self._transfer_line_changed(existing, defaults):
+                # Sin cambios en Point: sólo se registra el job. updated_at queda intacto
+                # porque logística lo usa como marca de agua del checklist de carga.
+                PointTransferLine.objects.filter(pk=existing.pk).update(sync_job=sync_job)
+                existing.sync_job = sync_job
                 staged_updated += 1
-            line = PointTransferLine.objects.get(source_hash=item.source_hash)
+                line = existing
+            else:
+                _, created = PointTransferLine.objects.update_or_create(source_hash=item.source_hash, defaults=defaults)
+                if created:
+                    staged_created += 1
+                else:
+                    staged_updated += 1
+                line = PointTransferLine.objects.get(source_hash=item.source_hash)
+                existing_by_hash[item.source_hash] = line
             if line.is_insumo and line.insumo is not None and apply_inventory:
                 origin_result = self._upsert_transfer_origin_inventory_movement(line=line)
                 if origin_result == "exit_created":
@@ -818,7 +847,7 @@ class PointMovementSyncService:
                     is_current_snapshot=True,
                 )
                 .exclude(detail_external_id__in=current_detail_ids)
-                .update(is_open=False, is_current_snapshot=False)
+                .update(is_open=False, is_current_snapshot=False, updated_at=timezone.now())
             )
 
         return {
@@ -7,9 +7,17 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.db import connection, transaction
+from django.db.models import QuerySet
 from django.utils import timezone
 
+from core.cache_versions import get_cache_scope_version
 from pos_bridge.models import PointDailySale, PointInventorySnapshot, PointProductionLine, PointSyncJob, PointWasteLine
+from pos_bridge.services.product_month_closure_stages import (
+    CLOSURE_CATALOG_SCOPE,
+    ClosureStageCache,
+    StageSource,
+    partition_filter,
+)
 from pos_bridge.services.sales_category_report_service import PointSalesCategoryReportService
 from pos_bridge.services.sales_matching_service import PointSalesMatchingService
 from recetas.models import (
@@ -50,6 +58,17 @@ CLOSURE_EXCLUDED_META_TOKENS = (
     "letrero",
     "letreros",
 )
+FACT_STAGE_BY_FIELD = {
+    "producido": "production:facts",
+    "vendido": "sales:facts",
+    "merma": "waste:facts",
+}
+STAGE_PRODUCTION_LINES = "production:lines"
+STAGE_WASTE_LINES = "waste:lines"
+STAGE_SALES_POINT_DAILY_OFFICIAL = "sales:point_daily_official"
+STAGE_SALES_BRIDGE_HISTORY = "sales:bridge_history"
+STAGE_CLOSING_INVENTORY = "closing_inventory"
+STAGE_OPENING_SNAPSHOT = "opening_snapshot"
 
 
 class ProductMonthClosureError(Exception):
@@ -79,6 +98,7 @@ class ProductMonthClosureService:
     def __init__(self, matcher: PointSalesMatchingService | None = None):
         self.matcher = matcher or PointSalesMatchingService()
         self.official_sales_report_service = PointSalesCategoryReportService()
+        self._stage_cache: ClosureStageCache | None = None
 
     def build(
         self,
@@ -176,6 +196,7 @@ class ProductMonthClosureService:
         month_end = date(month_start.year, month_start.month, monthrange(month_start.year, month_start.month)[1])
         prev_month_end = month_start - timedelta(days=1)
 
+        self._stage_cache = ClosureStageCache(month_start=month_start)
         fact_meta = self._ensure_month_facts(month_start=month_start, month_end=month_end)
         opening_source, opening_reference_date, openings, opening_meta = self._load_opening(month_start=month_start)
         production = self._load_production(month_start=month_start, month_end=month_end)
@@ -343,6 +364,7 @@ class ProductMonthClosureService:
                 "closing_inventory_meta": closing_meta,
                 "recipe_count": len(recipe_ids),
                 "validation": validation,
+                "stage_cache": self._stage_cache.summary(),
             },
             "totals": totals,
         }
@@ -509,6 +531,81 @@ class ProductMonthClosureService:
         closure.save(update_fields=["metadata", "status", "is_locked", "updated_at"])
         return closure
 
+    def stage_sources(self, *, month: str | date) -> dict[str, StageSource]:
+        """Fuentes partibles por sucursal del mes, por nombre de etapa."""
+        month_start = self._parse_month(month)
+        month_end = date(month_start.year, month_start.month, monthrange(month_start.year, month_start.month)[1])
+        sources = {
+            stage: self._production_facts_source(month_start=month_start, month_end=month_end, field_name=field_name)
+            for field_name, stage in FACT_STAGE_BY_FIELD.items()
+        }
+        sources[STAGE_PRODUCTION_LINES] = self._production_lines_source(month_start=month_start, month_end=month_end)
+        sources[STAGE_WASTE_LINES] = self._waste_lines_source(month_start=month_start, month_end=month_end)
+        sources[STAGE_SALES_POINT_DAILY_OFFICIAL] = self._point_daily_official_source(
+            month_start=month_start,
+            month_end=month_end,
+        )
+        sources[STAGE_SALES_BRIDGE_HISTORY] = self._bridge_history_source(month_start=month_start, month_end=month_end)
+        closing_day, _ = self._resolve_snapshot_day(snapshot_date=month_end)
+        if closing_day is not None:
+            effective_date, day_start, day_end = closing_day
+            sources[STAGE_CLOSING_INVENTORY] = self._snapshot_source(
+                stage=STAGE_CLOSING_INVENTORY,
+                effective_date=effective_date,
+                day_start=day_start,
+                day_end=day_end,
+                split_scope=True,
+            )
+        has_previous_closure = ProductoMonthClosure.objects.filter(
+            month_start=self._previous_month_start(month_start),
+            status__in=[ProductoMonthClosure.STATUS_BUILT, ProductoMonthClosure.STATUS_LOCKED],
+        ).exists()
+        if not has_previous_closure:
+            opening_day, _ = self._resolve_snapshot_day(snapshot_date=month_start - timedelta(days=1))
+            if opening_day is not None:
+                effective_date, day_start, day_end = opening_day
+                sources[STAGE_OPENING_SNAPSHOT] = self._snapshot_source(
+                    stage=STAGE_OPENING_SNAPSHOT,
+                    effective_date=effective_date,
+                    day_start=day_start,
+                    day_end=day_end,
+                    split_scope=False,
+                )
+        return sources
+
+    def plan_stage_units(self, *, month: str | date) -> list[tuple[str, object]]:
+        """Unidades ``(etapa, sucursal)`` vencidas que usaría el preview del mes.
+
+        Las fuentes de respaldo (líneas Point, ventas diarias) solo se planean si
+        la etapa no tiene hechos ``FactProduccionDiaria``.
+        """
+        month_start = self._parse_month(month)
+        sources = self.stage_sources(month=month_start)
+        stage_cache = ClosureStageCache(month_start=month_start)
+        fallbacks = {
+            FACT_STAGE_BY_FIELD["producido"]: (STAGE_PRODUCTION_LINES,),
+            FACT_STAGE_BY_FIELD["merma"]: (STAGE_WASTE_LINES,),
+            FACT_STAGE_BY_FIELD["vendido"]: (STAGE_SALES_POINT_DAILY_OFFICIAL, STAGE_SALES_BRIDGE_HISTORY),
+        }
+        selected = [STAGE_CLOSING_INVENTORY, STAGE_OPENING_SNAPSHOT]
+        for primary, fallback_stages in fallbacks.items():
+            selected.append(primary)
+            if not sources[primary].queryset.exists():
+                selected.extend(fallback_stages)
+        return [
+            (stage, partition)
+            for stage in selected
+            if stage in sources
+            for partition in stage_cache.stale_partitions(sources[stage])
+        ]
+
+    def compute_stage_unit(self, *, month: str | date, stage: str, partition) -> bool:
+        month_start = self._parse_month(month)
+        sources = self.stage_sources(month=month_start)
+        if stage not in sources:
+            raise ProductMonthClosureError(f"Etapa de cierre desconocida o sin datos: {stage}")
+        return ClosureStageCache(month_start=month_start).compute_unit(sources[stage], partition)
+
     def _parse_month(self, month: str | date) -> date:
         if isinstance(month, date):
             return date(month.year, month.month, 1)
@@ -590,72 +687,26 @@ class ProductMonthClosureService:
 
     def _load_opening_from_snapshots(self, *, snapshot_date: date):
         tolerance_days = getattr(settings, "PRODUCT_MONTH_CLOSURE_SNAPSHOT_TOLERANCE_DAYS", self.DEFAULT_SNAPSHOT_TOLERANCE_DAYS)
-        current_timezone = timezone.get_current_timezone()
-        target_start = timezone.make_aware(datetime.combine(snapshot_date, time.min), current_timezone)
-        target_end = timezone.make_aware(datetime.combine(snapshot_date, time.max), current_timezone)
-        before_at = (
-            PointInventorySnapshot.objects.filter(captured_at__lte=target_end)
-            .order_by("-captured_at", "-id")
-            .values_list("captured_at", flat=True)
-            .first()
-        )
-        after_at = (
-            PointInventorySnapshot.objects.filter(captured_at__gte=target_start)
-            .order_by("captured_at", "id")
-            .values_list("captured_at", flat=True)
-            .first()
-        )
-        candidates = [value for value in [before_at, after_at] if value is not None]
-        if not candidates:
+        snapshot_day, _ = self._resolve_snapshot_day(snapshot_date=snapshot_date)
+        if snapshot_day is None:
             raise ProductMonthClosureError(
                 f"No existe snapshot Point para resolver inventario inicial al cierre de {snapshot_date.isoformat()}."
             )
-        selected_at = min(candidates, key=lambda value: abs(value - target_start))
-        effective_date = timezone.localtime(selected_at, current_timezone).date()
-        day_start = timezone.make_aware(datetime.combine(effective_date, time.min), current_timezone)
-        day_end = timezone.make_aware(datetime.combine(effective_date, time.max), current_timezone)
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT DISTINCT ON (branch_id, product_id) id
-                FROM pos_bridge_inventory_snapshots
-                WHERE captured_at >= %s AND captured_at <= %s
-                ORDER BY branch_id, product_id, captured_at DESC, id DESC
-                """,
-                [day_start, day_end],
-            )
-            snapshot_ids = [row[0] for row in cursor.fetchall()]
-        snapshots = (
-            PointInventorySnapshot.objects.select_related("product", "branch")
-            .filter(id__in=snapshot_ids)
-            .order_by("product__name", "branch__name", "id")
+        effective_date, day_start, day_end = snapshot_day
+        source = self._snapshot_source(
+            stage=STAGE_OPENING_SNAPSHOT,
+            effective_date=effective_date,
+            day_start=day_start,
+            day_end=day_end,
+            split_scope=False,
         )
-        if not snapshots.exists():
+        opening_month = snapshot_date + timedelta(days=1)
+        payloads = self._stage_cache_for(date(opening_month.year, opening_month.month, 1)).load(source)
+        buckets, unmatched_products, snapshot_rows = self._merge_snapshot_payloads(payloads)
+        if not snapshot_rows:
             raise ProductMonthClosureError(
                 f"No existe snapshot Point para resolver inventario inicial al cierre de {snapshot_date.isoformat()}."
             )
-
-        buckets: dict[int, _AggregateBucket] = {}
-        unmatched_products: list[str] = []
-        for snap in snapshots:
-            receta = self.matcher.resolve_receta(codigo_point=snap.product.sku, point_name=snap.product.name)
-            if receta is None:
-                unmatched_products.append(snap.product.name)
-                continue
-            parent_receta, qty, issue_note, is_derived = self._canonical_recipe_quantity(receta=receta, quantity=Decimal(str(snap.stock or 0)))
-            if parent_receta is None:
-                continue
-            bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
-            bucket.value += qty
-            bucket.snapshot_count += 1
-            if issue_note:
-                bucket.has_catalog_issue = True
-                bucket.issue_notes.add(issue_note)
-            if is_derived:
-                bucket.derived_value += qty
-            else:
-                bucket.direct_value += qty
-
         if not buckets:
             raise ProductMonthClosureError(
                 f"Los snapshots Point de {snapshot_date.isoformat()} no pudieron homologarse a recetas ERP."
@@ -674,51 +725,28 @@ class ProductMonthClosureService:
         }
 
     def _load_closing_inventory(self, *, month_end: date):
-        snapshot_ids, snapshot_meta = self._latest_snapshot_ids_near_date(snapshot_date=month_end)
-        if not snapshot_ids:
+        snapshot_day, snapshot_meta = self._resolve_snapshot_day(snapshot_date=month_end)
+        if snapshot_day is None:
             snapshot_meta["warnings"] = ["No existe snapshot Point para inventario final del mes."]
             return {}, snapshot_meta
 
-        snapshots = (
-            PointInventorySnapshot.objects.select_related("product", "branch", "branch__erp_branch")
-            .filter(id__in=snapshot_ids)
-            .order_by("product__name", "branch__name", "id")
+        effective_date, day_start, day_end = snapshot_day
+        source = self._snapshot_source(
+            stage=STAGE_CLOSING_INVENTORY,
+            effective_date=effective_date,
+            day_start=day_start,
+            day_end=day_end,
+            split_scope=True,
         )
-
-        buckets: dict[int, _AggregateBucket] = {}
-        unmatched_products: list[str] = []
-        for snap in snapshots:
-            receta = self.matcher.resolve_receta(codigo_point=snap.product.sku, point_name=snap.product.name)
-            if receta is None:
-                unmatched_products.append(snap.product.name)
-                continue
-            parent_receta, qty, issue_note, is_derived = self._canonical_recipe_quantity(
-                receta=receta,
-                quantity=Decimal(str(snap.stock or 0)),
-            )
-            if parent_receta is None:
-                continue
-            bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
-            bucket.value += qty
-            bucket.snapshot_count += 1
-            if self._is_cedis_inventory_scope(snap):
-                bucket.cedis_value += qty
-            else:
-                bucket.sucursales_value += qty
-            if issue_note:
-                bucket.has_catalog_issue = True
-                bucket.issue_notes.add(issue_note)
-            if is_derived:
-                bucket.derived_value += qty
-            else:
-                bucket.direct_value += qty
-
+        payloads = self._stage_cache_for(date(month_end.year, month_end.month, 1)).load(source)
+        buckets, unmatched_products, snapshot_rows = self._merge_snapshot_payloads(payloads)
         snapshot_meta["unmatched_products"] = unmatched_products[:50]
-        snapshot_meta["snapshot_rows"] = len(snapshot_ids)
+        snapshot_meta["snapshot_rows"] = snapshot_rows
         snapshot_meta["matched_recipe_count"] = len(buckets)
         return buckets, snapshot_meta
 
-    def _latest_snapshot_ids_near_date(self, *, snapshot_date: date):
+    def _resolve_snapshot_day(self, *, snapshot_date: date):
+        """Día con snapshot Point más cercano a ``snapshot_date``; ``(None, meta)`` si no hay ninguno."""
         tolerance_days = getattr(settings, "PRODUCT_MONTH_CLOSURE_SNAPSHOT_TOLERANCE_DAYS", self.DEFAULT_SNAPSHOT_TOLERANCE_DAYS)
         current_timezone = timezone.get_current_timezone()
         target_start = timezone.make_aware(datetime.combine(snapshot_date, time.min), current_timezone)
@@ -737,7 +765,7 @@ class ProductMonthClosureService:
         )
         candidates = [value for value in [before_at, after_at] if value is not None]
         if not candidates:
-            return [], {
+            return None, {
                 "snapshot_date": snapshot_date.isoformat(),
                 "snapshot_effective_date": "",
                 "snapshot_tolerance_days": int(tolerance_days),
@@ -752,19 +780,8 @@ class ProductMonthClosureService:
         effective_date = timezone.localtime(selected_at, current_timezone).date()
         day_start = timezone.make_aware(datetime.combine(effective_date, time.min), current_timezone)
         day_end = timezone.make_aware(datetime.combine(effective_date, time.max), current_timezone)
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT DISTINCT ON (branch_id, product_id) id
-                FROM pos_bridge_inventory_snapshots
-                WHERE captured_at >= %s AND captured_at <= %s
-                ORDER BY branch_id, product_id, captured_at DESC, id DESC
-                """,
-                [day_start, day_end],
-            )
-            snapshot_ids = [row[0] for row in cursor.fetchall()]
         days_from_target = abs((effective_date - snapshot_date).days)
-        return snapshot_ids, {
+        return (effective_date, day_start, day_end), {
             "snapshot_date": snapshot_date.isoformat(),
             "snapshot_effective_date": effective_date.isoformat(),
             "snapshot_tolerance_days": int(tolerance_days),
@@ -772,9 +789,76 @@ class ProductMonthClosureService:
             "snapshot_within_tolerance": bool(days_from_target <= int(tolerance_days)),
             "snapshot_fallback_used": effective_date != snapshot_date,
             "snapshot_days_from_target": days_from_target,
-            "snapshot_rows": len(snapshot_ids),
         }
 
+    def _snapshot_source(
+        self,
+        *,
+        stage: str,
+        effective_date: date,
+        day_start: datetime,
+        day_end: datetime,
+        split_scope: bool,
+    ) -> StageSource:
+        return StageSource(
+            stage=stage,
+            queryset=PointInventorySnapshot.objects.filter(captured_at__gte=day_start, captured_at__lte=day_end),
+            partition_field="branch_id",
+            context=effective_date.isoformat(),
+            compute=lambda branch_id: self._compute_snapshot_unit(
+                day_start=day_start,
+                day_end=day_end,
+                branch_id=branch_id,
+                split_scope=split_scope,
+            ),
+        )
+
+    def _compute_snapshot_unit(self, *, day_start: datetime, day_end: datetime, branch_id, split_scope: bool) -> dict:
+        """Último snapshot del día por producto de una sucursal, homologado a receta padre."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT DISTINCT ON (product_id) id
+                FROM pos_bridge_inventory_snapshots
+                WHERE captured_at >= %s AND captured_at <= %s AND branch_id = %s
+                ORDER BY product_id, captured_at DESC, id DESC
+                """,
+                [day_start, day_end, branch_id],
+            )
+            snapshot_ids = [row[0] for row in cursor.fetchall()]
+        snapshots = (
+            PointInventorySnapshot.objects.select_related("product", "branch", "branch__erp_branch")
+            .filter(id__in=snapshot_ids)
+            .order_by("product__name", "id")
+        )
+        buckets: dict[int, _AggregateBucket] = {}
+        unmatched_products: list[str] = []
+        for snap in snapshots:
+            receta = self.matcher.resolve_receta(codigo_point=snap.product.sku, point_name=snap.product.name)
+            if receta is None:
+                unmatched_products.append(snap.product.name)
+                continue
+            parent_receta, qty, issue_note, is_derived = self._canonical_recipe_quantity(
+                receta=receta,
+                quantity=Decimal(str(snap.stock or 0)),
+            )
+            if parent_receta is None:
+                continue
+            bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
+            bucket.snapshot_count += 1
+            if split_scope:
+                if self._is_cedis_inventory_scope(snap):
+                    bucket.cedis_value += qty
+                else:
+                    bucket.sucursales_value += qty
+            self._add_to_bucket(bucket, qty=qty, issue_note=issue_note, is_derived=is_derived, count_row=False)
+        return {"buckets": buckets, "unmatched_products": unmatched_products, "snapshot_rows": len(snapshot_ids)}
+
+    def _merge_snapshot_payloads(self, payloads: list[dict]) -> tuple[dict[int, _AggregateBucket], list[str], int]:
+        buckets = self._merge_buckets(payload["buckets"] for payload in payloads)
+        unmatched_products = sorted(name for payload in payloads for name in payload["unmatched_products"])
+        return buckets, unmatched_products, sum(int(payload["snapshot_rows"]) for payload in payloads)
+
     def _is_cedis_inventory_scope(self, snapshot: PointInventorySnapshot) -> bool:
         branch = snapshot.branch
         erp_branch = getattr(branch, "erp_branch", None)
@@ -796,37 +880,25 @@ class ProductMonthClosureService:
         )
         if fact_buckets:
             return fact_buckets
+        return self._load_stage(
+            month_start,
+            self._production_lines_source(month_start=month_start, month_end=month_end),
+        )
 
-        buckets: dict[int, _AggregateBucket] = {}
-        rows = (
-            PointProductionLine.objects.select_related("receta")
-            .filter(
-                production_date__gte=month_start,
-                production_date__lte=month_end,
-                receta__isnull=False,
-                receta__tipo=Receta.TIPO_PRODUCTO_FINAL,
-            )
-            .exclude(receta__modo_costeo=Receta.MODO_COSTEO_SERVICIO)
-            .order_by("id")
+    def _production_lines_source(self, *, month_start: date, month_end: date) -> StageSource:
+        queryset = PointProductionLine.objects.filter(
+            production_date__gte=month_start,
+            production_date__lte=month_end,
+            receta__isnull=False,
+            receta__tipo=Receta.TIPO_PRODUCTO_FINAL,
+        ).exclude(receta__modo_costeo=Receta.MODO_COSTEO_SERVICIO)
+        return self._movement_source(
+            stage=STAGE_PRODUCTION_LINES,
+            queryset=queryset,
+            partition_field="branch_id",
+            version_field="updated_at",
+            quantity_field="produced_quantity",
         )
-        for row in rows:
-            parent_receta, qty, issue_note, is_derived = self._canonical_recipe_quantity(
-                receta=row.receta,
-                quantity=Decimal(str(row.produced_quantity or 0)),
-            )
-            if parent_receta is None:
-                continue
-            bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
-            bucket.value += qty
-            bucket.row_count += 1
-            if issue_note:
-                bucket.has_catalog_issue = True
-                bucket.issue_notes.add(issue_note)
-            if is_derived:
-                bucket.derived_value += qty
-            else:
-                bucket.direct_value += qty
-        return buckets
 
     def _load_sales(self, *, month_start: date, month_end: date):
         sales_source_mode = str(
@@ -884,34 +956,10 @@ class ProductMonthClosureService:
         return self._load_sales_from_bridge_history(month_start=month_start, month_end=month_end)
 
     def _load_sales_from_point_daily_sales_official(self, *, month_start: date, month_end: date):
-        buckets: dict[int, _AggregateBucket] = {}
-        rows = (
-            PointDailySale.objects.select_related("receta")
-            .filter(
-                sale_date__gte=month_start,
-                sale_date__lte=month_end,
-                receta__isnull=False,
-                source_endpoint=OFFICIAL_POINT_DAILY_SOURCE,
-            )
-            .order_by("id")
+        buckets = self._load_stage(
+            month_start,
+            self._point_daily_official_source(month_start=month_start, month_end=month_end),
         )
-        for row in rows:
-            parent_receta, qty, issue_note, is_derived = self._canonical_recipe_quantity(
-                receta=row.receta,
-                quantity=Decimal(str(row.quantity or 0)),
-            )
-            if parent_receta is None:
-                continue
-            bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
-            bucket.value += qty
-            bucket.row_count += 1
-            if is_derived:
-                bucket.derived_value += qty
-            else:
-                bucket.direct_value += qty
-            if issue_note:
-                bucket.has_catalog_issue = True
-                bucket.issue_notes.add(issue_note)
         return buckets, {
             "source": OFFICIAL_POINT_DAILY_SOURCE,
             "mode": "official_point_daily_sales",
@@ -919,35 +967,26 @@ class ProductMonthClosureService:
             "end_date": month_end.isoformat(),
         }
 
+    def _point_daily_official_source(self, *, month_start: date, month_end: date) -> StageSource:
+        queryset = PointDailySale.objects.filter(
+            sale_date__gte=month_start,
+            sale_date__lte=month_end,
+            receta__isnull=False,
+            source_endpoint=OFFICIAL_POINT_DAILY_SOURCE,
+        )
+        return self._movement_source(
+            stage=STAGE_SALES_POINT_DAILY_OFFICIAL,
+            queryset=queryset,
+            partition_field="branch_id",
+            version_field="updated_at",
+            quantity_field="quantity",
+        )
+
     def _load_sales_from_bridge_history(self, *, month_start: date, month_end: date):
-        buckets: dict[int, _AggregateBucket] = {}
-        rows = (
-            VentaHistorica.objects.select_related("receta")
-            .filter(
-                fecha__gte=month_start,
-                fecha__lte=month_end,
-                fuente=POINT_BRIDGE_SALES_SOURCE,
-                receta__isnull=False,
-            )
-            .order_by("id")
+        buckets = self._load_stage(
+            month_start,
+            self._bridge_history_source(month_start=month_start, month_end=month_end),
         )
-        for row in rows:
-            parent_receta, qty, issue_note, is_derived = self._canonical_recipe_quantity(
-                receta=row.receta,
-                quantity=Decimal(str(row.cantidad or 0)),
-            )
-            if parent_receta is None:
-                continue
-            bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
-            bucket.value += qty
-            bucket.row_count += 1
-            if is_derived:
-                bucket.derived_value += qty
-            else:
-                bucket.direct_value += qty
-            if issue_note:
-                bucket.has_catalog_issue = True
-                bucket.issue_notes.add(issue_note)
         return buckets, {
             "source": POINT_BRIDGE_SALES_SOURCE,
             "mode": "bridge_history",
@@ -955,7 +994,32 @@ class ProductMonthClosureService:
             "end_date": month_end.isoformat(),
         }
 
+    def _bridge_history_source(self, *, month_start: date, month_end: date) -> StageSource:
+        queryset = VentaHistorica.objects.filter(
+            fecha__gte=month_start,
+            fecha__lte=month_end,
+            fuente=POINT_BRIDGE_SALES_SOURCE,
+            receta__isnull=False,
+        )
+        return self._movement_source(
+            stage=STAGE_SALES_BRIDGE_HISTORY,
+            queryset=queryset,
+            partition_field="sucursal_id",
+            version_field="actualizado_en",
+            quantity_field="cantidad",
+        )
+
     def _load_sales_from_official_monthly_report(self, *, month_start: date, month_end: date):
+        # El reporte oficial es de toda la cadena y viene de Point: se memoiza por
+        # mes y versión de catálogo durante una ventana corta en lugar de partirse.
+        return self._stage_cache_for(month_start).memo(
+            name="sales:official_report",
+            version=str(get_cache_scope_version(CLOSURE_CATALOG_SCOPE)),
+            builder=lambda: self._fetch_official_monthly_sales(month_start=month_start, month_end=month_end),
+            timeout=int(getattr(settings, "PRODUCT_MONTH_CLOSURE_OFFICIAL_REPORT_CACHE_SECONDS", 900) or 0),
+        )
+
+    def _fetch_official_monthly_sales(self, *, month_start: date, month_end: date):
         report = self.official_sales_report_service.fetch_report(
             start_date=month_start,
             end_date=month_end,
@@ -980,15 +1044,7 @@ class ProductMonthClosureService:
             if parent_receta is None:
                 continue
             bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
-            bucket.value += qty
-            bucket.row_count += 1
-            if is_derived:
-                bucket.derived_value += qty
-            else:
-                bucket.direct_value += qty
-            if issue_note:
-                bucket.has_catalog_issue = True
-                bucket.issue_notes.add(issue_note)
+            self._add_to_bucket(bucket, qty=qty, issue_note=issue_note, is_derived=is_derived)
         return buckets, {
             "source": OFFICIAL_CATEGORY_REPORT_SOURCE,
             "mode": "official_monthly_report",
@@ -1008,33 +1064,19 @@ class ProductMonthClosureService:
         )
         if fact_buckets:
             return fact_buckets
+        return self._load_stage(month_start, self._waste_lines_source(month_start=month_start, month_end=month_end))
 
+    def _waste_lines_source(self, *, month_start: date, month_end: date) -> StageSource:
         start_dt = timezone.make_aware(datetime.combine(month_start, time.min), timezone.get_current_timezone())
         end_dt = timezone.make_aware(datetime.combine(month_end, time.max), timezone.get_current_timezone())
-        buckets: dict[int, _AggregateBucket] = {}
-        rows = (
-            PointWasteLine.objects.select_related("receta")
-            .filter(movement_at__gte=start_dt, movement_at__lte=end_dt, receta__isnull=False)
-            .order_by("id")
+        queryset = PointWasteLine.objects.filter(movement_at__gte=start_dt, movement_at__lte=end_dt, receta__isnull=False)
+        return self._movement_source(
+            stage=STAGE_WASTE_LINES,
+            queryset=queryset,
+            partition_field="branch_id",
+            version_field="updated_at",
+            quantity_field="quantity",
         )
-        for row in rows:
-            parent_receta, qty, issue_note, is_derived = self._canonical_recipe_quantity(
-                receta=row.receta,
-                quantity=Decimal(str(row.quantity or 0)),
-            )
-            if parent_receta is None:
-                continue
-            bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
-            bucket.value += qty
-            bucket.row_count += 1
-            if is_derived:
-                bucket.derived_value += qty
-            else:
-                bucket.direct_value += qty
-            if issue_note:
-                bucket.has_catalog_issue = True
-                bucket.issue_notes.add(issue_note)
-        return buckets
 
     def _ensure_month_facts(self, *, month_start: date, month_end: date) -> dict[str, object]:
         existing_rows = FactProduccionDiaria.objects.filter(fecha__gte=month_start, fecha__lte=month_end).count()
@@ -1108,35 +1150,100 @@ class ProductMonthClosureService:
         month_end: date,
         field_name: str,
     ) -> dict[int, _AggregateBucket]:
-        buckets: dict[int, _AggregateBucket] = {}
-        rows = (
-            FactProduccionDiaria.objects.select_related("receta")
-            .filter(
-                fecha__gte=month_start,
-                fecha__lte=month_end,
-                receta__isnull=False,
-                **{f"{field_name}__gt": 0},
-            )
-            .order_by("id")
+        return self._load_stage(
+            month_start,
+            self._production_facts_source(month_start=month_start, month_end=month_end, field_name=field_name),
         )
-        for row in rows:
-            parent_receta, qty, issue_note, is_derived = self._canonical_recipe_quantity(
-                receta=row.receta,
-                quantity=Decimal(str(getattr(row, field_name) or 0)),
-            )
-            if parent_receta is None:
-                continue
-            bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
-            bucket.value += qty
+
+    def _production_facts_source(self, *, month_start: date, month_end: date, field_name: str) -> StageSource:
+        queryset = FactProduccionDiaria.objects.filter(
+            fecha__gte=month_start,
+            fecha__lte=month_end,
+            receta__isnull=False,
+            **{f"{field_name}__gt": 0},
+        )
+        return self._movement_source(
+            stage=FACT_STAGE_BY_FIELD[field_name],
+            queryset=queryset,
+            partition_field="sucursal_id",
+            version_field="actualizado_en",
+            quantity_field=field_name,
+        )
+
+    def _movement_source(
+        self,
+        *,
+        stage: str,
+        queryset: QuerySet,
+        partition_field: str,
+        version_field: str,
+        quantity_field: str,
+    ) -> StageSource:
+        def compute(partition) -> dict[int, _AggregateBucket]:
+            rows = queryset.filter(**partition_filter(partition_field, partition)).select_related("receta").order_by("id")
+            buckets: dict[int, _AggregateBucket] = {}
+            for row in rows:
+                parent_receta, qty, issue_note, is_derived = self._canonical_recipe_quantity(
+                    receta=row.receta,
+                    quantity=Decimal(str(getattr(row, quantity_field) or 0)),
+                )
+                if parent_receta is None:
+                    continue
+                bucket = buckets.setdefault(parent_receta.id, _AggregateBucket())
+                self._add_to_bucket(bucket, qty=qty, issue_note=issue_note, is_derived=is_derived)
+            return buckets
+
+        return StageSource(
+            stage=stage,
+            queryset=queryset,
+            partition_field=partition_field,
+            version_field=version_field,
+            compute=compute,
+        )
+
+    def _stage_cache_for(self, month_start: date) -> ClosureStageCache:
+        if self._stage_cache is not None and self._stage_cache.month_start == month_start:
+            return self._stage_cache
+        return ClosureStageCache(month_start=month_start)
+
+    def _load_stage(self, month_start: date, source: StageSource) -> dict[int, _AggregateBucket]:
+        return self._merge_buckets(self._stage_cache_for(month_start).load(source))
+
+    def _add_to_bucket(
+        self,
+        bucket: _AggregateBucket,
+        *,
+        qty: Decimal,
+        issue_note: str,
+        is_derived: bool,
+        count_row: bool = True,
+    ) -> None:
+        bucket.value += qty
+        if count_row:
             bucket.row_count += 1
-            if is_derived:
-                bucket.derived_value += qty
-            else:
-                bucket.direct_value += qty
-            if issue_note:
-                bucket.has_catalog_issue = True
-                bucket.issue_notes.add(issue_note)
-        return buckets
+        if is_derived:
+            bucket.derived_value += qty
+        else:
+            bucket.direct_value += qty
+        if issue_note:
+            bucket.has_catalog_issue = True
+            bucket.issue_notes.add(issue_note)
+
+    def _merge_buckets(self, parts) -> dict[int, _AggregateBucket]:
+        merged: dict[int, _AggregateBucket] = {}
+        for buckets in parts:
+            for receta_id, bucket in buckets.items():
+                target = merged.setdefault(receta_id, _AggregateBucket())
+                target.value += bucket.value
+                target.row_count += bucket.row_count
+                target.direct_value += bucket.direct_value
+                target.derived_value += bucket.derived_value
+                target.cedis_value += bucket.cedis_value
+                target.sucursales_value += bucket.sucursales_value
+                target.snapshot_count += bucket.snapshot_count
+                target.has_catalog_issue = target.has_catalog_issue or bucket.has_catalog_issue
+                target.issue_notes.update(bucket.issue_notes or set())
+        return merged
 
     def _canonical_recipe_quantity(self, *, receta: Receta, quantity: Decimal):
         parent_receta, qty, issue_note, is_derived, _source = resolve_closure_recipe_quantity(receta, quantity)
@@ -0,0 +1,183 @@
+"""Entradas del cierre mensual de producto por etapa y sucursal.
+
+Cada etapa del cierre (producción, ventas, merma, inventario inicial y final)
+se parte en unidades ``(etapa, sucursal)``. La versión de una unidad sale de una
+sola consulta agrupada por sucursal (filas, id máximo y última actualización)
+más el scope ``cierre_catalogo``, que cambia con recetas, equivalencias,
+presentaciones derivadas y aliases Point. El resultado de cada unidad se
+memoiza en caché con su versión: un preview después de una corrección pequeña
+solo recalcula la sucursal y etapa afectadas.
+
+Las unidades vencidas se pueden calcular en paralelo en Celery
+(``pos_bridge.month_closure_stage_unit``); el preview reutiliza lo que ya esté
+calculado y resuelve en línea el resto.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, QuerySet
+
+from core.cache_versions import get_cache_scope_version
+
+logger = logging.getLogger(__name__)
+
+CLOSURE_STAGE_CACHE_PREFIX = "erp:closure-stage"
+CLOSURE_CATALOG_SCOPE = "cierre_catalogo"
+
+
+@dataclass(frozen=True)
+class StageSource:
+    stage: str
+    queryset: QuerySet
+    partition_field: str
+    compute: Callable[[Any], Any]
+    version_field: str = ""
+    # Distingue entradas de la misma etapa que dependen de un dato resuelto
+    # (p. ej. el día efectivo del snapshot).
+    context: str = ""
+
+
+def stage_cache_enabled() -> bool:
+    return bool(getattr(settings, "PRODUCT_MONTH_CLOSURE_STAGE_CACHE_ENABLED", False))
+
+
+def _stage_cache_timeout() -> int | None:
+    # 0 guarda sin expiración; la versión de cada unidad ya invalida lo vencido.
+    return int(getattr(settings, "PRODUCT_MONTH_CLOSURE_STAGE_CACHE_SECONDS", 7 * 24 * 60 * 60) or 0) or None
+
+
+def partition_filter(partition_field: str, partition) -> dict[str, Any]:
+    if partition is None:
+        return {f"{partition_field}__isnull": True}
+    return {partition_field: partition}
+
+
+def partition_versions(source: StageSource) -> dict[Any, str]:
+    """Versión de cada sucursal con filas en la etapa, en una sola consulta."""
+    aggregates = {"rows": Count("id"), "max_id": Max("id")}
+    if source.version_field:
+        aggregates["max_ts"] = Max(source.version_field)
+    catalog_version = get_cache_scope_version(CLOSURE_CATALOG_SCOPE)
+    versions = {}
+    for row in source.queryset.order_by().values(source.partition_field).annotate(**aggregates):
+        max_ts = row.get("max_ts")
+        versions[row[source.partition_field]] = ":".join(
+            [
+                str(catalog_version),
+                str(row["rows"]),
+                str(row["max_id"]),
+                max_ts.isoformat() if max_ts else "",
+            ]
+        )
+    return versions
+
+
+def _sorted_partitions(partitions) -> list:
+    return sorted(partitions, key=lambda value: (value is None, value))
+
+
+class ClosureStageCache:
+    """Memo de unidades ``(etapa, sucursal)`` de un mes; lleva conteo de reuso."""
+
+    def __init__(self, *, month_start: date):
+        self.month_start = month_start
+        self.enabled = stage_cache_enabled()
+        self.stats = {"units": 0, "reused": 0, "computed": 0}
+        self.computed_units: list[str] = []
+
+    def unit_key(self, source: StageSource, partition) -> str:
+        parts = [CLOSURE_STAGE_CACHE_PREFIX, f"{self.month_start:%Y-%m}", source.stage]
+        if source.context:
+            parts.append(source.context)
+        parts.append("none" if partition is None else str(partition))
+        return ":".join(parts)
+
+    def _get_many(self, keys: list[str]) -> dict[str, Any]:
+        if not self.enabled or not keys:
+            return {}
+        try:
+            return cache.get_many(keys)
+        except Exception:
+            logger.warning("No se pudieron leer entradas del cierre en caché", exc_info=True)
+            return {}
+
+    def _set_many(self, records: dict[str, Any]) -> None:
+        if not self.enabled or not records:
+            return
+        try:
+            cache.set_many(records, timeout=_stage_cache_timeout())
+        except Exception:
+            logger.warning("No se pudieron guardar entradas del cierre en caché", exc_info=True)
+
+    def load(self, source: StageSource) -> list[Any]:
+        """Resultado de cada sucursal de la etapa; recalcula solo las vencidas."""
+        versions = partition_versions(source)
+        keys = {partition: self.unit_key(source, partition) for partition in versions}
+        cached = self._get_many(list(keys.values()))
+        payloads = []
+        to_store = {}
+        for partition in _sorted_partitions(versions):
+            self.stats["units"] += 1
+            record = cached.get(keys[partition])
+            if record and record.get("version") == versions[partition]:
+                self.stats["reused"] += 1
+                payloads.append(record["payload"])
+                continue
+            payload = source.compute(partition)
+            self.stats["computed"] += 1
+            self.computed_units.append(f"{source.stage}:{'none' if partition is None else partition}")
+            to_store[keys[partition]] = {"version": versions[partition], "payload": payload}
+            payloads.append(payload)
+        self._set_many(to_store)
+        return payloads
+
+    def stale_partitions(self, source: StageSource) -> list:
+        versions = partition_versions(source)
+        if not self.enabled:
+            return _sorted_partitions(versions)
+        keys = {partition: self.unit_key(source, partition) for partition in versions}
+        cached = self._get_many(list(keys.values()))
+        return _sorted_partitions(
+            partition
+            for partition, version in versions.items()
+            if (cached.get(keys[partition]) or {}).get("version") != version
+        )
+
+    def compute_unit(self, source: StageSource, partition) -> bool:
+        """Calcula y guarda una unidad; ``False`` si la sucursal ya no tiene filas."""
+        version = partition_versions(source).get(partition)
+        if version is None:
+            return False
+        self._set_many({self.unit_key(source, partition): {"version": version, "payload": source.compute(partition)}})
+        return True
+
+    def memo(self, *, name: str, version: str, builder: Callable[[], Any], timeout: int | None) -> Any:
+        """Memo de una entrada que no se parte por sucursal (p. ej. el reporte oficial)."""
+        key = ":".join([CLOSURE_STAGE_CACHE_PREFIX, f"{self.month_start:%Y-%m}", name])
+        record = self._get_many([key]).get(key)
+        if record and record.get("version") == version:
+            self.stats["reused"] += 1
+            return record["payload"]
+        payload = builder()
+        self.stats["computed"] += 1
+        self.computed_units.append(name)
+        if self.enabled and timeout:
+            try:
+                cache.set(key, {"version": version, "payload": payload}, timeout=timeout)
+            except Exception:
+                logger.warning("No se pudo guardar %s en caché", key, exc_info=True)
+        return payload
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            **self.stats,
+            "computed_units": self.computed_units[:50],
+        }
@@ -6,7 +6,6 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from django.utils import timezone
-from rapidfuzz import fuzz
 
 from maestros.models import Insumo
 from pos_bridge.config import load_point_bridge_settings
@@ -260,6 +259,8 @@ class PointRecipeGapAuditService:
         }
 
     def _score_candidate(self, *, product_code: str, product_name: str, candidate_code: str, candidate_name: str) -> float:
+        from rapidfuzz import fuzz
+
         name_score = max(
             float(fuzz.token_set_ratio(product_name, candidate_name)),
             float(fuzz.partial_ratio(product_name, candidate_name)),
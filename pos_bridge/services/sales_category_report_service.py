@@ -3,15 +3,18 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date, datetime, time
 from pathlib import Path
+from typing import TYPE_CHECKING
 from urllib.parse import urlencode, urljoin
 
-import pandas as pd
 from django.utils import timezone
 
 from pos_bridge.config import PointBridgeSettings, load_point_bridge_settings
 from pos_bridge.services.point_http_session_service import PointHttpSessionService
 from pos_bridge.utils.helpers import decimal_from_value, safe_slug
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 @dataclass
 class PointSalesCategoryReportResult:
@@ -190,6 +193,8 @@ class PointSalesCategoryReportService:
         return branches
 
     def parse_report(self, *, report_path: str) -> PointSalesCategoryParsedReport:
+        import pandas as pd
+
         path = Path(report_path)
         workbook = pd.ExcelFile(path)
         detail_rows = self._parse_detail_sheet(path=path, sheet_names=workbook.sheet_names)
@@ -197,6 +202,8 @@ class PointSalesCategoryReportService:
         return PointSalesCategoryParsedReport(rows=detail_rows, summary=summary, report_path=str(path))
 
     def _parse_detail_sheet(self, *, path: Path, sheet_names: list[str]) -> list[dict]:
+        import pandas as pd
+
         for sheet_name in sheet_names:
             dataframe = pd.read_excel(path, sheet_name=sheet_name, header=None)
             rows = self._extract_detail_rows_from_dataframe(dataframe)
@@ -205,6 +212,8 @@ class PointSalesCategoryReportService:
         return []
 
     def _parse_summary_sheet(self, *, path: Path, sheet_names: list[str]) -> dict:
+        import pandas as pd
+
         for sheet_name in sheet_names:
             dataframe = pd.read_excel(path, sheet_name=sheet_name, header=None)
             for _, row in dataframe.iterrows():
@@ -226,6 +235,8 @@ class PointSalesCategoryReportService:
         }
 
     def _extract_detail_rows_from_dataframe(self, dataframe: pd.DataFrame) -> list[dict]:
+        import pandas as pd
+
         rows: list[dict] = []
         current_category = ""
         header_found = False
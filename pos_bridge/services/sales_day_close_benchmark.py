@@ -0,0 +1,386 @@
+"""Benchmark reproducible del cierre de día de ventas del lado ERP.
+
+Genera un volumen sintético (N sucursales × M productos × D días) en la base
+local y mide, por etapa, tiempo de pared y número de queries:
+
+- ``persist_daily_sales``: ``PointSyncService.persist_daily_sales`` por sucursal-día;
+- ``process_task``: ``PointSalesRebuildService.process_task`` con un reporte
+  sintético en disco (sin tocar Point);
+- ``rebuild_sales_facts``: reconstrucción de ``FactVentaDiaria`` para el rango;
+- ``mv_refresh``: refresh de ``mv_dashboard_daily_ops``;
+- ``cache_invalidation``: bump de los scopes ``ventas`` y ``dashboard``.
+
+El resultado es un dict serializable a JSON; ``compare_with_baseline`` lo
+contrasta contra una corrida previa con umbrales configurables de tiempo y
+queries para detectar cambios que dupliquen la ventana nocturna.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.cache_versions import bump_cache_scopes
+from core.models import Sucursal
+from pos_bridge.models import PointBranch, PointSalesExtractionTask, PointSyncJob
+from pos_bridge.services.sales_extractor import ExtractedBranchDailySales
+from pos_bridge.services.sales_pipeline import PointSalesRebuildService, PointSalesTaskQueueService
+from pos_bridge.services.sync_service import PointSyncService
+from recetas.models import Receta
+
+BENCHMARK_VERSION = 1
+DEFAULT_START_DATE = date(2090, 1, 1)
+STAGES = (
+    "persist_daily_sales",
+    "process_task",
+    "rebuild_sales_facts",
+    "mv_refresh",
+    "cache_invalidation",
+)
+
+
+@dataclass(frozen=True)
+class BenchmarkConfig:
+    branches: int = 3
+    products: int = 40
+    days: int = 2
+    # Fecha lejana por default: el rango sintético no se mezcla con ventas reales.
+    start_date: date = DEFAULT_START_DATE
+    seed: int = 7
+    prefix: str = "BENCH"
+
+    @property
+    def end_date(self) -> date:
+        return self.start_date + timedelta(days=self.days - 1)
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["start_date"] = self.start_date.isoformat()
+        return data
+
+
+@dataclass
+class StageResult:
+    name: str
+    calls: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    queries: int = 0
+    max_call_ms: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "rows": self.rows,
+            "seconds": round(self.seconds, 4),
+            "queries": self.queries,
+            "ms_per_call": round(self.seconds * 1000 / self.calls, 2) if self.calls else 0.0,
+            "max_call_ms": round(self.max_call_ms, 2),
+        }
+
+
+@dataclass
+class BenchmarkFixture:
+    config: BenchmarkConfig
+    sucursales: list[Sucursal] = field(default_factory=list)
+    branches: list[PointBranch] = field(default_factory=list)
+    recetas: list[Receta] = field(default_factory=list)
+    sync_job: PointSyncJob | None = None
+
+    def business_days(self) -> list[date]:
+        return [self.config.start_date + timedelta(days=offset) for offset in range(self.config.days)]
+
+
+def generate_fixture(config: BenchmarkConfig) -> BenchmarkFixture:
+    """Crea sucursales, sucursales Point y recetas vendibles para el benchmark."""
+    fixture = BenchmarkFixture(config=config)
+    for index in range(1, config.branches + 1):
+        codigo = f"{config.prefix}{index:03d}"
+        sucursal, _ = Sucursal.objects.get_or_create(codigo=codigo, defaults={"nombre": f"{config.prefix} Sucursal {index:03d}"})
+        branch, _ = PointBranch.objects.update_or_create(
+            external_id=codigo,
+            defaults={"name": sucursal.nombre, "erp_branch": sucursal},
+        )
+        fixture.sucursales.append(sucursal)
+        fixture.branches.append(branch)
+    for index in range(1, config.products + 1):
+        codigo_point = f"{config.prefix}-{index:05d}"
+        receta = Receta.objects.filter(codigo_point=codigo_point).first()
+        if receta is None:
+            receta = Receta.objects.create(
+                nombre=f"{config.prefix} Producto {index:05d}",
+                codigo_point=codigo_point,
+                tipo=Receta.TIPO_PRODUCTO_FINAL,
+                familia="Pasteles",
+                categoria="Pasteles",
+                hash_contenido=f"benchmark-{config.prefix.lower()}-{index:05d}",
+            )
+        fixture.recetas.append(receta)
+    fixture.sync_job = PointSyncJob.objects.create(
+        job_type=PointSyncJob.JOB_TYPE_SALES,
+        status=PointSyncJob.STATUS_RUNNING,
+        parameters={"pipeline_code": PointSalesTaskQueueService.PIPELINE_CODE, "benchmark": config.as_dict()},
+    )
+    return fixture
+
+
+def _synthetic_amounts(rng: random.Random) -> dict[str, Decimal]:
+    quantity = Decimal(rng.randint(1, 40))
+    price = Decimal(rng.randint(25, 650))
+    gross = quantity * price
+    discount = (gross * Decimal(rng.choice((0, 0, 0, 5, 10))) / Decimal("100")).quantize(Decimal("0.01"))
+    total = gross - discount
+    tax = (total * Decimal("0.08")).quantize(Decimal("0.01"))
+    return {
+        "quantity": quantity,
+        "gross_amount": gross,
+        "discount_amount": discount,
+        "total_amount": total,
+        "tax_amount": tax,
+        "net_amount": total - tax,
+    }
+
+
+def build_sales_rows(fixture: BenchmarkFixture, branch: PointBranch, sale_date: date) -> list[dict]:
+    """Filas con la forma de ``PointSalesExtractor``; deterministas por semilla, sucursal y día."""
+    rng = random.Random(f"{fixture.config.seed}:{branch.external_id}:{sale_date.isoformat()}")
+    rows = []
+    for receta in fixture.recetas:
+        amounts = _synthetic_amounts(rng)
+        rows.append(
+            {
+                "external_id": receta.codigo_point,
+                "sku": receta.codigo_point,
+                "name": receta.nombre,
+                "category": "Pasteles",
+                "family": "Pasteles",
+                "tickets": rng.randint(1, 25),
+                "raw_payload": {"benchmark": True, "sku": receta.codigo_point},
+                "source_endpoint": "/Report/VentasCategorias",
+                **amounts,
+            }
+        )
+    return rows
+
+
+def build_report_rows(fixture: BenchmarkFixture, branch: PointBranch, sale_date: date) -> list[dict]:
+    """Las mismas ventas con las columnas del reporte por categorías de Point."""
+    return [
+        {
+            "Categoria": row["category"],
+            "Codigo": row["sku"],
+            "Nombre": row["name"],
+            "Cantidad": str(row["quantity"]),
+            "Bruto": str(row["gross_amount"]),
+            "Descuento": str(row["discount_amount"]),
+            "Venta": str(row["total_amount"]),
+            "IVA": str(row["tax_amount"]),
+            "Venta_neta": str(row["net_amount"]),
+        }
+        for row in build_sales_rows(fixture, branch, sale_date)
+    ]
+
+
+class SyntheticReportService:
+    """Sustituye la descarga de Point por un archivo local y filas ya parseadas."""
+
+    def __init__(self, fixture: BenchmarkFixture, workdir: Path):
+        self.fixture = fixture
+        self.workdir = workdir
+        self.http_session_service = SimpleNamespace(
+            create=lambda **kwargs: SimpleNamespace(session=SimpleNamespace(close=lambda: None))
+        )
+        self._branches = {branch.external_id: branch for branch in fixture.branches}
+        self._rows_by_path: dict[str, list[dict]] = {}
+
+    def fetch_report_with_session(self, *, start_date, branch_external_id=None, **kwargs):
+        branch = self._branches[branch_external_id]
+        rows = build_report_rows(self.fixture, branch, start_date)
+        path = self.workdir / f"{branch.external_id}_{start_date.isoformat()}.xls"
+        path.write_bytes(hashlib.sha256(repr(rows).encode("utf-8")).digest())
+        self._rows_by_path[str(path)] = rows
+        return SimpleNamespace(report_path=str(path), request_url="benchmark://point/report")
+
+    def parse_report(self, *, report_path: str):
+        rows = self._rows_by_path[str(report_path)]
+        return SimpleNamespace(rows=rows, summary={"rows": len(rows)})
+
+
+def _measure(stage: StageResult, fn: Callable[[], int | None]) -> None:
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        rows = fn()
+        elapsed = time.perf_counter() - started
+    stage.calls += 1
+    stage.rows += int(rows or 0)
+    stage.seconds += elapsed
+    stage.queries += len(queries.captured_queries)
+    stage.max_call_ms = max(stage.max_call_ms, elapsed * 1000)
+
+
+def _git_commit() -> str:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return completed.stdout.strip() if completed.returncode == 0 else ""
+
+
+def run_stages(fixture: BenchmarkFixture) -> dict[str, StageResult]:
+    stages = {name: StageResult(name=name) for name in STAGES}
+    sync_service = PointSyncService()
+    days = fixture.business_days()
+
+    for sale_date in days:
+        for branch in fixture.branches:
+            sales_result = ExtractedBranchDailySales(
+                branch={"external_id": branch.external_id, "name": branch.name, "status": branch.status, "metadata": {}},
+                sale_date=sale_date,
+                sales_rows=build_sales_rows(fixture, branch, sale_date),
+                captured_at=timezone.now(),
+                raw_export_path="",
+            )
+            _measure(
+                stages["persist_daily_sales"],
+                lambda: sync_service.persist_daily_sales(fixture.sync_job, sales_result)["sales_rows"],
+            )
+
+    with tempfile.TemporaryDirectory(prefix="sales_day_close_benchmark_") as workdir:
+        rebuild_service = PointSalesRebuildService(
+            report_service=SyntheticReportService(fixture, Path(workdir)),
+            sync_service=sync_service,
+        )
+        session_cache: dict[str, object] = {}
+        for sale_date in days:
+            for branch in fixture.branches:
+                task = PointSalesExtractionTask.objects.create(
+                    sync_job=fixture.sync_job,
+                    branch=branch,
+                    sale_date=sale_date,
+                    credito_scope="null",
+                    status=PointSalesExtractionTask.STATUS_RUNNING,
+                    attempts=1,
+                )
+                _measure(
+                    stages["process_task"],
+                    lambda: rebuild_service.process_task(task=task, session_cache=session_cache)["normalized_rows"],
+                )
+
+    from reportes.analytics_service import rebuild_sales_facts, refresh_dashboard_daily_ops_materialized_view
+
+    _measure(
+        stages["rebuild_sales_facts"],
+        lambda: rebuild_sales_facts(start_date=fixture.config.start_date, end_date=fixture.config.end_date),
+    )
+    _measure(stages["mv_refresh"], lambda: refresh_dashboard_daily_ops_materialized_view(concurrently=False))
+    _measure(stages["cache_invalidation"], lambda: len(bump_cache_scopes("ventas", "dashboard")))
+    return stages
+
+
+def run_benchmark(config: BenchmarkConfig, *, keep_data: bool = False) -> dict:
+    """Corre el benchmark completo; por default revierte todo lo que generó."""
+    started_at = timezone.now()
+    started = time.perf_counter()
+    with transaction.atomic():
+        fixture_started = time.perf_counter()
+        fixture = generate_fixture(config)
+        fixture_seconds = time.perf_counter() - fixture_started
+        stages = run_stages(fixture)
+        if not keep_data:
+            transaction.set_rollback(True)
+    total_seconds = sum(stage.seconds for stage in stages.values())
+    return {
+        "benchmark": "sales_day_close",
+        "version": BENCHMARK_VERSION,
+        "commit": _git_commit(),
+        "started_at": started_at.isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "server_version": getattr(connection, "pg_version", None),
+        },
+        "config": config.as_dict(),
+        "volume": {
+            "branch_days": config.branches * config.days,
+            "sales_rows": config.branches * config.days * config.products,
+        },
+        "fixture_seconds": round(fixture_seconds, 4),
+        "wall_seconds": round(time.perf_counter() - started, 4),
+        "stages": {name: stage.as_dict() for name, stage in stages.items()},
+        "totals": {
+            "seconds": round(total_seconds, 4),
+            "queries": sum(stage.queries for stage in stages.values()),
+        },
+        "kept_data": keep_data,
+    }
+
+
+def compare_with_baseline(
+    current: dict,
+    baseline: dict,
+    *,
+    max_time_ratio: float = 2.0,
+    max_query_ratio: float = 1.25,
+    min_seconds: float = 0.05,
+) -> list[dict]:
+    """Regresiones por etapa y total contra una corrida previa.
+
+    El tiempo solo cuenta si la etapa base supera ``min_seconds`` (ruido del
+    reloj); las queries son deterministas y se comparan siempre.
+    """
+    if baseline.get("config") != current.get("config"):
+        return [
+            {
+                "stage": "config",
+                "metric": "config",
+                "baseline": baseline.get("config"),
+                "current": current.get("config"),
+                "ratio": None,
+                "limit": None,
+            }
+        ]
+    pairs = [(name, row, (baseline.get("stages") or {}).get(name)) for name, row in (current.get("stages") or {}).items()]
+    pairs.append(("total", current.get("totals") or {}, baseline.get("totals")))
+    regressions = []
+    for name, row, base in pairs:
+        if not base:
+            continue
+        checks = [("queries", max_query_ratio, 0)]
+        if float(base.get("seconds") or 0) >= min_seconds:
+            checks.append(("seconds", max_time_ratio, min_seconds))
+        for metric, limit, floor in checks:
+            base_value = float(base.get(metric) or 0)
+            current_value = float(row.get(metric) or 0)
+            ratio = current_value / base_value if base_value else (float("inf") if current_value > floor else 1.0)
+            if ratio > limit:
+                regressions.append(
+                    {
+                        "stage": name,
+                        "metric": metric,
+                        "baseline": base_value,
+                        "current": current_value,
+                        "ratio": round(ratio, 3) if ratio != float("inf") else None,
+                        "limit": limit,
+                    }
+                )
+    return regressions
@@ -11,6 +11,7 @@ from django.utils import timezone
 
 from core.cache_versions import bump_cache_scopes
 from core.audit import log_event
+from core.bulk_upsert import bulk_upsert
 from core.branch_catalog import resolver_sucursal_por_texto
 from core.models import Sucursal
 from pos_bridge.config import load_point_bridge_settings
@@ -23,6 +24,7 @@ from pos_bridge.models import (
     PointProduct,
     PointSyncJob,
 )
+from pos_bridge.models.product import _normalize_name
 from pos_bridge.services.alert_service import PointAlertService
 from pos_bridge.services.inventory_extractor import PointInventoryExtractor
 from pos_bridge.services.point_inventory_cost_capture_service import PointInventoryCostCaptureService
@@ -165,14 +167,31 @@ class PointSyncService:
         branch = self._upsert_branch(branch_result.branch)
         snapshots_to_create = []
         products_seen = 0
+        # Un solo upsert por lote: los productos sin cambios no se reescriben.
+        products = bulk_upsert(
+            PointProduct,
+            [
+                {
+                    "external_id": row["external_id"],
+                    "sku": row["sku"],
+                    "name": row["name"],
+                    "normalized_name": _normalize_name(row["name"]),
+                    "category": row["category"],
+                    "active": True,
+                    "metadata": row.get("metadata") or {},
+                }
+                for row in branch_result.inventory_rows
+            ],
+            unique_fields=["external_id"],
+            update_fields=["sku", "name", "normalized_name", "category", "active", "metadata"],
+        )
 
         for row in branch_result.inventory_rows:
-            product = self._upsert_product(row)
             products_seen += 1
             snapshots_to_create.append(
                 PointInventorySnapshot(
                     branch=branch,
-                    product=product,
+                    product_id=products.ids_by_key[(str(row["external_id"]),)],
                     stock=row["stock"],
                     min_stock=row["min_stock"],
                     max_stock=row["max_stock"],
@@ -6,9 +6,11 @@ from pos_bridge.tasks.celery_tasks import (
     task_daily_sales_sync,
     task_ecommerce_webhook_delivery,
     task_inventory_sync,
+    task_month_closure_stage_unit,
     task_monthly_product_closure,
     task_open_transfer_sync,
     task_operations_automation_cycle,
+    task_prepare_month_closure_stages,
     task_purchase_resale_cost_sync,
     task_production_sync,
     task_product_recipe_sync,
@@ -29,9 +31,11 @@ __all__ = (
     "task_daily_sales_sync",
     "task_ecommerce_webhook_delivery",
     "task_inventory_sync",
+    "task_month_closure_stage_unit",
     "task_monthly_product_closure",
     "task_open_transfer_sync",
     "task_operations_automation_cycle",
+    "task_prepare_month_closure_stages",
     "task_purchase_resale_cost_sync",
     "task_production_sync",
     "task_product_recipe_sync",
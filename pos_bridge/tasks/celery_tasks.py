@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import logging
 from datetime import date
 from decimal import Decimal
 
-from celery import shared_task
+from celery import chord, group, shared_task
 from django.conf import settings
 from django.core.cache import cache
 from django.core.management import call_command
@@ -13,23 +14,27 @@ from django.utils import timezone
 from core.audit import log_event
 from pos_bridge.models import PointDailyBranchIndicator, PointSyncJob
 from pos_bridge.services.open_transfer_sync_service import OpenTransferSyncService
+from pos_bridge.services.product_month_closure_service import ProductMonthClosureService
 from pos_bridge.services.product_recipe_sync_service import PointProductRecipeSyncService
 from pos_bridge.services.realtime_inventory_service import deliver_ecommerce_webhook, run_realtime_inventory_sync
 from pos_bridge.tasks.retry_failed_jobs import retry_failed_jobs
 from pos_bridge.tasks.run_attendance_sync import run_attendance_sync
 from pos_bridge.tasks.run_daily_sales_sync import run_daily_sales_sync
 from pos_bridge.tasks.run_inventory_sync import run_inventory_sync
-from pos_bridge.tasks.run_monthly_product_closure import run_monthly_product_closure
+from pos_bridge.tasks.run_monthly_product_closure import _resolve_target_month, run_monthly_product_closure
 from pos_bridge.tasks.run_production_sync import run_production_sync
 from pos_bridge.tasks.run_product_recipe_sync import run_product_recipe_sync
 from pos_bridge.tasks.run_recipe_gap_audit import run_recipe_gap_audit
 from pos_bridge.tasks.run_transfer_sync import run_transfer_sync
 from pos_bridge.tasks.run_waste_sync import run_waste_sync
 from pos_bridge.tasks.run_weekly_cost_snapshot import run_weekly_cost_snapshot
+from recetas.models import ProductoMonthClosure
 from reportes.analytics_service import refresh_dashboard_full_materialized_view
 from reportes.dashboard_full_dataset import get_materialized_dashboard_full_payload
 from reportes.models import AnalyticAuditLog, FactVentaDiaria
 
+logger = logging.getLogger(__name__)
+
 
 @shared_task(name="pos_bridge.delivery_note_sync", acks_late=True)
 def delivery_note_sync(*, lookback_days: int = 7):
@@ -270,10 +275,35 @@ def task_monthly_product_closure(
     lock_after_build: bool = False,
     sync_inventory_before_build: bool = False,
     triggered_by_id: int | None = None,
+    stages_prepared: bool = False,
 ):
+    target_month = _resolve_target_month(month=month)
+    # Con inventario por sincronizar las unidades de snapshot quedarían vencidas:
+    # en ese caso el cierre se construye directo.
+    if not stages_prepared and not sync_inventory_before_build and _parallel_closure_stages_enabled():
+        closure_exists = ProductoMonthClosure.objects.filter(month_start=target_month).exists()
+        units = [] if closure_exists and not rebuild else ProductMonthClosureService().plan_stage_units(month=target_month)
+        if units:
+            month_key = target_month.strftime("%Y-%m")
+            build = task_monthly_product_closure.si(
+                month=month_key,
+                rebuild=rebuild,
+                lock_after_build=lock_after_build,
+                triggered_by_id=triggered_by_id,
+                stages_prepared=True,
+            )
+            # Las unidades no propagan errores; si aun así el chord o la
+            # construcción fallan (worker perdido, límite duro), la falla queda
+            # registrada y la siguiente corrida recalcula lo que falte.
+            build.link_error(
+                task_monthly_product_closure_failed.s(month=month_key, triggered_by_id=triggered_by_id)
+            )
+            chord(_closure_stage_signatures(month_key, units))(build)
+            return {"action": "stages_dispatched", "month": month_key, "stage_units": len(units)}
+
     user = _resolve_user(triggered_by_id)
     return run_monthly_product_closure(
-        month=month,
+        month=target_month,
         triggered_by=user,
         rebuild=rebuild,
         lock_after_build=lock_after_build,
@@ -281,6 +311,51 @@ def task_monthly_product_closure(
     )
 
 
+@shared_task(name="pos_bridge.monthly_product_closure_failed")
+def task_monthly_product_closure_failed(request, exc, traceback, *, month: str, triggered_by_id: int | None = None):
+    """Errback del chord del cierre: registra la falla sin volver a construir."""
+    logger.error("No se construyó el cierre mensual %s (tarea %s): %s", month, getattr(request, "id", ""), exc)
+    log_event(
+        _resolve_user(triggered_by_id),
+        "MONTHLY_PRODUCT_CLOSURE_FAILED",
+        "recetas.ProductoMonthClosure",
+        month,
+        {"month": month, "task_id": getattr(request, "id", ""), "error": str(exc)},
+    )
+    return {"month": month, "built": False, "error": str(exc)}
+
+
+def _parallel_closure_stages_enabled() -> bool:
+    return bool(getattr(settings, "PRODUCT_MONTH_CLOSURE_PARALLEL_STAGES", False)) and bool(
+        getattr(settings, "PRODUCT_MONTH_CLOSURE_STAGE_CACHE_ENABLED", False)
+    )
+
+
+def _closure_stage_signatures(month: str, units):
+    return [task_month_closure_stage_unit.si(month=month, stage=stage, partition=partition) for stage, partition in units]
+
+
+@shared_task(name="pos_bridge.month_closure_stage_unit", acks_late=True)
+def task_month_closure_stage_unit(*, month: str, stage: str, partition=None):
+    # Una unidad fallida no debe tumbar el chord: el cierre la recalcula en línea.
+    try:
+        stored = ProductMonthClosureService().compute_stage_unit(month=month, stage=stage, partition=partition)
+    except Exception as exc:
+        logger.exception("Falló la unidad %s/%s del cierre %s; se recalculará al construir.", stage, partition, month)
+        return {"month": month, "stage": stage, "partition": partition, "stored": False, "error": str(exc)}
+    return {"month": month, "stage": stage, "partition": partition, "stored": stored}
+
+
+@shared_task(name="pos_bridge.prepare_month_closure_stages", acks_late=True)
+def task_prepare_month_closure_stages(*, month: str | None = None):
+    """Calcula en paralelo las unidades vencidas para que el siguiente preview sea incremental."""
+    month_key = _resolve_target_month(month=month).strftime("%Y-%m")
+    units = ProductMonthClosureService().plan_stage_units(month=month_key)
+    if units:
+        group(_closure_stage_signatures(month_key, units)).apply_async()
+    return {"month": month_key, "stage_units": len(units)}
+
+
 @shared_task(
     name="pos_bridge.product_recipe_sync",
     bind=True,
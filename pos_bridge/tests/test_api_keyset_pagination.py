@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from pos_bridge.api.pagination import _decode_cursor
+from pos_bridge.models import PointBranch, PointDailySale, PointInventorySnapshot, PointProduct, PointSyncJob
+
+
+class PosBridgeKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="pos_keyset_user", password="test12345", is_staff=True)
+        self.client.force_authenticate(self.user)
+        self.branch = PointBranch.objects.create(external_id="1", name="MATRIZ", status=PointBranch.STATUS_ACTIVE)
+        self.products = [
+            PointProduct.objects.create(external_id=str(100 + index), sku=f"0{100 + index}", name=f"Producto {index}")
+            for index in range(3)
+        ]
+        base_day = date(2026, 3, 1)
+        # Dos ventas por día para que el desempate por id sea necesario.
+        self.sales = [
+            PointDailySale.objects.create(
+                branch=self.branch,
+                product=self.products[index % 2],
+                sale_date=base_day + timedelta(days=index // 2),
+                total_amount=Decimal("10"),
+            )
+            for index in range(7)
+        ]
+
+    def _walk(self, url: str) -> list[int]:
+        ids: list[int] = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+            ids.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_default_listing_keeps_page_number_contract(self):
+        response = self.client.get("/api/pos-bridge/sales/?page_size=2")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 7)
+        self.assertNotIn("next_cursor", response.data)
+
+    def test_cursor_walk_returns_every_row_once_in_stable_order(self):
+        ids = self._walk("/api/pos-bridge/sales/?pagination=keyset&page_size=3")
+
+        expected = list(
+            PointDailySale.objects.order_by("-sale_date", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_cursor_respects_filters_and_rejects_tampered_tokens(self):
+        first = self.client.get("/api/pos-bridge/sales/?pagination=keyset&page_size=1&start_date=2026-03-03")
+        self.assertEqual(len(first.data["results"]), 1)
+        ids = self._walk(first.data["next"]) + [first.data["results"][0]["id"]]
+        self.assertEqual(
+            sorted(ids),
+            sorted(PointDailySale.objects.filter(sale_date__gte=date(2026, 3, 3)).values_list("id", flat=True)),
+        )
+
+        response = self.client.get("/api/pos-bridge/sales/?cursor=no-es-un-cursor")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        inventory_cursor = self._inventory_cursor()
+        response = self.client.get(f"/api/pos-bridge/sales/?cursor={inventory_cursor}")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_seek_bounds_the_leading_field_for_index_range_scans(self):
+        first = self.client.get("/api/pos-bridge/sales/?pagination=keyset&page_size=3")
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(first.data["next"])
+        last_row = first.data["results"][-1]
+
+        seek_sql = next(query["sql"] for query in captured.captured_queries if "pos_bridge_daily_sales" in query["sql"])
+        self.assertIn(f'"pos_bridge_daily_sales"."sale_date" <= \'{last_row["sale_date"]}\'', seek_sql)
+
+    @override_settings(POS_BRIDGE_API_CHANGED_SINCE_MARGIN_SECONDS=0)
+    def test_changed_since_returns_only_new_or_updated_rows(self):
+        first = self.client.get("/api/pos-bridge/sales/?changed_since=&page_size=500")
+        self.assertEqual(len(first.data["results"]), 7)
+        sync_cursor = first.data["sync_cursor"]
+        self.assertTrue(sync_cursor)
+
+        idle = self.client.get(f"/api/pos-bridge/sales/?changed_since={sync_cursor}")
+        self.assertEqual(idle.data["results"], [])
+        self.assertEqual(idle.data["sync_cursor"], sync_cursor)
+
+        updated = self.sales[0]
+        updated.total_amount = Decimal("99")
+        updated.save()
+        created = PointDailySale.objects.create(
+            branch=self.branch,
+            product=self.products[2],
+            sale_date=date(2026, 2, 1),
+            total_amount=Decimal("5"),
+        )
+
+        delta = self.client.get(f"/api/pos-bridge/sales/?changed_since={sync_cursor}")
+        self.assertEqual([row["id"] for row in delta.data["results"]], [updated.id, created.id])
+        self.assertNotEqual(delta.data["sync_cursor"], sync_cursor)
+
+    @override_settings(POS_BRIDGE_API_CHANGED_SINCE_MARGIN_SECONDS=120)
+    def test_changed_since_rereads_the_margin_for_late_commits(self):
+        first = self.client.get("/api/pos-bridge/sales/?changed_since=&page_size=500")
+        sync_cursor = first.data["sync_cursor"]
+        self.assertEqual(_decode_cursor(sync_cursor)["s"], 1)
+        delivered_at = PointDailySale.objects.order_by("-updated_at").values_list("updated_at", flat=True).first()
+
+        # Fila que se confirma después de la sincronización con un ``updated_at`` anterior.
+        late = PointDailySale.objects.create(
+            branch=self.branch,
+            product=self.products[2],
+            sale_date=date(2026, 2, 1),
+            total_amount=Decimal("5"),
+        )
+        PointDailySale.objects.filter(pk=late.pk).update(updated_at=delivered_at - timedelta(seconds=30))
+        PointDailySale.objects.exclude(pk=late.pk).update(updated_at=delivered_at - timedelta(hours=1))
+        PointDailySale.objects.filter(pk=self.sales[-1].pk).update(updated_at=delivered_at)
+
+        delta = self._walk(f"/api/pos-bridge/sales/?changed_since={sync_cursor}&page_size=1")
+
+        self.assertEqual(delta, [late.id, self.sales[-1].id])
+
+    def test_approximate_count_is_optional(self):
+        response = self.client.get("/api/pos-bridge/sales/?pagination=keyset&count=approx&start_date=2026-03-02")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data["count_estimate"], int)
+        self.assertNotIn("count", response.data)
+
+    def _inventory_cursor(self) -> str:
+        sync_job = PointSyncJob.objects.create(
+            job_type=PointSyncJob.JOB_TYPE_INVENTORY,
+            status=PointSyncJob.STATUS_SUCCESS,
+            triggered_by=self.user,
+        )
+        for offset in range(2):
+            PointInventorySnapshot.objects.create(
+                branch=self.branch,
+                product=self.products[0],
+                stock=Decimal("1"),
+                captured_at=timezone.now() - timedelta(minutes=offset),
+                sync_job=sync_job,
+            )
+        response = self.client.get("/api/pos-bridge/inventory/?pagination=keyset&page_size=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["next_cursor"]
@@ -487,6 +487,51 @@ class PointMovementSyncServiceTests(TestCase):
         self.assertEqual(job.result_summary["inventory_entries_created"], 1)
         self.assertEqual(job.result_summary["skipped_non_storage_branch"], 0)
 
+    def test_resync_sin_cambios_no_mueve_updated_at_de_la_linea(self):
+        transfer_line = FakeTransferLine(
+            origin_branch={"external_id": "8", "name": "CEDIS", "status": "ACTIVE", "metadata": {}},
+            destination_branch={"external_id": "3", "name": "Matriz", "status": "ACTIVE", "metadata": {}},
+            transfer_external_id="40001",
+            detail_external_id="500001",
+            registered_at=datetime(2026, 3, 20, 8, 0, tzinfo=timezone.utc),
+            sent_at=datetime(2026, 3, 20, 9, 0, tzinfo=timezone.utc),
+            received_at=None,
+            requested_by="Matriz",
+            sent_by="CEDIS",
+            received_by="",
+            item_name="Pastel marca de agua",
+            item_code="MARCA-01",
+            unit="PZA",
+            unit_cost=Decimal("10.000000"),
+            requested_quantity=Decimal("4.000"),
+            sent_quantity=Decimal("4.000"),
+            received_quantity=Decimal("0.000"),
+            is_insumo=False,
+            is_received=False,
+            is_cancelled=False,
+            is_finalized=False,
+            raw_payload={"transfer": {"isEnviado": True}},
+            source_hash="transfer-marca-agua-1",
+            is_open=True,
+        )
+        extractor = FakeTransferExtractor([transfer_line])
+        service = PointMovementSyncService(transfer_extractor=extractor)
+        service.run_transfer_sync(start_date=date(2026, 3, 20), end_date=date(2026, 3, 20), apply_inventory=False)
+        original = PointTransferLine.objects.get(source_hash="transfer-marca-agua-1")
+
+        job = service.run_transfer_sync(start_date=date(2026, 3, 20), end_date=date(2026, 3, 20), apply_inventory=False)
+
+        line = PointTransferLine.objects.get(pk=original.pk)
+        self.assertEqual(line.updated_at, original.updated_at)
+        self.assertEqual(line.sync_job_id, job.id)
+
+        extractor.rows = [replace(transfer_line, sent_quantity=Decimal("3.000"))]
+        service.run_transfer_sync(start_date=date(2026, 3, 20), end_date=date(2026, 3, 20), apply_inventory=False)
+
+        line.refresh_from_db()
+        self.assertGreater(line.updated_at, original.updated_at)
+        self.assertEqual(line.sent_quantity, Decimal("3.000"))
+
     def test_transferencia_almacen_cedis_posterior_al_corte_crea_doble_partida_idempotente(self):
         insumo = Insumo.objects.create(
             nombre="Insumo doble partida",
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core.cache_versions import bump_cache_scopes
+from core.models import AuditLog, Sucursal
+from pos_bridge.models import PointBranch, PointInventorySnapshot, PointProduct, PointSyncJob
+from pos_bridge.services.product_month_closure_service import ProductMonthClosureService
+from pos_bridge.services.product_month_closure_stages import ClosureStageCache
+from pos_bridge.tasks.celery_tasks import (
+    task_month_closure_stage_unit,
+    task_monthly_product_closure,
+    task_monthly_product_closure_failed,
+)
+from recetas.models import ProductoMonthClosure, Receta
+from reportes.models import FactProduccionDiaria
+
+
+@override_settings(
+    PRODUCT_MONTH_CLOSURE_SALES_SOURCE_MODE="BRIDGE_HISTORY",
+    PRODUCT_MONTH_CLOSURE_STAGE_CACHE_ENABLED=True,
+    PRODUCT_MONTH_CLOSURE_PARALLEL_STAGES=True,
+)
+class ProductMonthClosureStagesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        sync_job = PointSyncJob.objects.create(
+            job_type=PointSyncJob.JOB_TYPE_INVENTORY,
+            status=PointSyncJob.STATUS_SUCCESS,
+        )
+        self.receta = Receta.objects.create(
+            nombre="Pastel Etapas Mediano",
+            codigo_point="ETP-M",
+            tipo=Receta.TIPO_PRODUCTO_FINAL,
+            hash_contenido="hash-etapas-mediano",
+        )
+        product = PointProduct.objects.create(external_id="etp-m", sku="ETP-M", name=self.receta.nombre)
+        self.sucursales = []
+        for code in ("ETPA", "ETPB"):
+            sucursal = Sucursal.objects.create(codigo=code, nombre=f"Sucursal {code}")
+            branch = PointBranch.objects.create(external_id=code, name=sucursal.nombre, erp_branch=sucursal)
+            self.sucursales.append(sucursal)
+            for captured_day, stock in ((datetime(2025, 8, 31, 22), "2"), (datetime(2025, 9, 30, 22), "3")):
+                PointInventorySnapshot.objects.create(
+                    branch=branch,
+                    product=product,
+                    stock=Decimal(stock),
+                    sync_job=sync_job,
+                    captured_at=timezone.make_aware(captured_day, timezone.get_current_timezone()),
+                )
+            FactProduccionDiaria.objects.create(
+                fecha=date(2025, 9, 10),
+                sucursal=sucursal,
+                receta=self.receta,
+                producido=Decimal("10"),
+            )
+            FactProduccionDiaria.objects.create(
+                fecha=date(2025, 9, 11),
+                sucursal=sucursal,
+                receta=self.receta,
+                vendido=Decimal("6"),
+            )
+
+    def _preview(self):
+        plan = ProductMonthClosureService().preview(month="2025-09")
+        return plan["line_rows"][0], plan["metadata"]["stage_cache"]
+
+    def test_preview_reutiliza_unidades_y_recalcula_solo_la_sucursal_corregida(self):
+        line, stats = self._preview()
+        self.assertEqual(line["inventario_inicial_teorico"], Decimal("4"))
+        self.assertEqual(line["produccion_mes"], Decimal("20"))
+        self.assertEqual(line["venta_total_equivalente"], Decimal("12"))
+        self.assertEqual(line["inventario_final_point_total"], Decimal("6"))
+        self.assertEqual(stats["reused"], 0)
+        self.assertEqual(stats["computed"], stats["units"])
+
+        line, stats = self._preview()
+        self.assertEqual(stats["computed"], 0)
+        self.assertEqual(line["produccion_mes"], Decimal("20"))
+
+        corrected = FactProduccionDiaria.objects.get(sucursal=self.sucursales[1], producido__gt=0)
+        corrected.producido = Decimal("15")
+        corrected.save()
+        line, stats = self._preview()
+        self.assertEqual(stats["computed_units"], [f"production:facts:{self.sucursales[1].id}"])
+        self.assertEqual(line["produccion_mes"], Decimal("25"))
+
+        with override_settings(PRODUCT_MONTH_CLOSURE_STAGE_CACHE_ENABLED=False):
+            uncached_line, uncached_stats = self._preview()
+        self.assertFalse(uncached_stats["enabled"])
+        self.assertEqual(uncached_line, line)
+
+        bump_cache_scopes("cierre_catalogo")
+        _, stats = self._preview()
+        self.assertEqual(stats["reused"], 0)
+
+    def test_planea_y_calcula_unidades_vencidas_para_celery(self):
+        service = ProductMonthClosureService()
+        units = service.plan_stage_units(month="2025-09")
+        stages = {stage for stage, _ in units}
+        self.assertEqual(
+            stages,
+            {"production:facts", "sales:facts", "closing_inventory", "opening_snapshot"},
+        )
+        self.assertEqual(len(units), 8)
+
+        for stage, partition in units:
+            self.assertTrue(service.compute_stage_unit(month="2025-09", stage=stage, partition=partition))
+        self.assertEqual(service.plan_stage_units(month="2025-09"), [])
+        self.assertEqual(self._preview()[1]["computed"], 0)
+
+    def test_cierre_mensual_reparte_unidades_en_un_chord(self):
+        with patch("pos_bridge.tasks.celery_tasks.chord") as chord_mock:
+            result = task_monthly_product_closure.run(month="2025-09")
+
+        self.assertEqual(result, {"action": "stages_dispatched", "month": "2025-09", "stage_units": 8})
+        signatures = chord_mock.call_args.args[0]
+        self.assertEqual(len(signatures), 8)
+        self.assertEqual(signatures[0].task, "pos_bridge.month_closure_stage_unit")
+        callback = chord_mock.return_value.call_args.args[0]
+        self.assertTrue(callback.kwargs["stages_prepared"])
+        errback = callback.options["link_error"][0]
+        self.assertEqual(errback["task"], "pos_bridge.monthly_product_closure_failed")
+        self.assertEqual(errback["kwargs"], {"month": "2025-09", "triggered_by_id": None})
+
+    def test_falla_del_chord_se_registra_sin_reconstruir(self):
+        request = type("Request", (), {"id": "chord-123"})()
+        with patch("pos_bridge.tasks.celery_tasks.run_monthly_product_closure") as build_mock, self.assertLogs(
+            "pos_bridge.tasks.celery_tasks", level="ERROR"
+        ):
+            result = task_monthly_product_closure_failed.run(request, RuntimeError("worker perdido"), None, month="2025-09")
+
+        build_mock.assert_not_called()
+        self.assertEqual(result, {"month": "2025-09", "built": False, "error": "worker perdido"})
+        event = AuditLog.objects.get(action="MONTHLY_PRODUCT_CLOSURE_FAILED")
+        self.assertEqual(event.object_id, "2025-09")
+        self.assertEqual(event.payload["task_id"], "chord-123")
+
+    def test_unidad_fallida_no_impide_construir_el_cierre(self):
+        units = ProductMonthClosureService().plan_stage_units(month="2025-09")
+        compute_unit = ClosureStageCache.compute_unit
+        calls = []
+
+        def flaky_compute(cache_self, source, partition):
+            calls.append(partition)
+            if len(calls) == 1:
+                raise RuntimeError("Point no respondió")
+            return compute_unit(cache_self, source, partition)
+
+        with patch.object(ClosureStageCache, "compute_unit", flaky_compute), self.assertLogs(
+            "pos_bridge.tasks.celery_tasks", level="ERROR"
+        ):
+            results = [task_month_closure_stage_unit.run(month="2025-09", stage=stage, partition=partition) for stage, partition in units]
+
+        self.assertFalse(results[0]["stored"])
+        self.assertEqual(results[0]["error"], "Point no respondió")
+        self.assertTrue(all(result["stored"] for result in results[1:]))
+        self.assertEqual(ProductMonthClosureService().plan_stage_units(month="2025-09"), [units[0]])
+
+        task_monthly_product_closure.run(month="2025-09", stages_prepared=True)
+
+        self.assertTrue(ProductoMonthClosure.objects.filter(month_start=date(2025, 9, 1)).exists())
+        self.assertEqual(ProductMonthClosureService().plan_stage_units(month="2025-09"), [])
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from pos_bridge.models import PointDailySale, PointSalesExtractionTask
+from pos_bridge.services.sales_day_close_benchmark import (
+    STAGES,
+    BenchmarkConfig,
+    compare_with_baseline,
+    run_benchmark,
+)
+from reportes.models import FactVentaDiaria
+
+
+class SalesDayCloseBenchmarkTests(TestCase):
+    def setUp(self):
+        self.config = BenchmarkConfig(branches=2, products=3, days=2, start_date=date(2090, 1, 1))
+
+    def test_mide_cada_etapa_y_revierte_los_datos_sinteticos(self):
+        result = run_benchmark(self.config)
+
+        self.assertEqual(list(result["stages"]), list(STAGES))
+        self.assertEqual(result["volume"], {"branch_days": 4, "sales_rows": 12})
+        self.assertEqual(result["stages"]["persist_daily_sales"]["calls"], 4)
+        self.assertEqual(result["stages"]["persist_daily_sales"]["rows"], 12)
+        self.assertEqual(result["stages"]["process_task"]["rows"], 12)
+        self.assertGreater(result["stages"]["rebuild_sales_facts"]["rows"], 0)
+        for name in ("persist_daily_sales", "process_task", "rebuild_sales_facts", "mv_refresh"):
+            self.assertGreater(result["stages"][name]["queries"], 0)
+        self.assertEqual(result["totals"]["queries"], sum(row["queries"] for row in result["stages"].values()))
+        json.dumps(result)
+
+        self.assertFalse(PointDailySale.objects.filter(sale_date__gte=date(2090, 1, 1)).exists())
+        self.assertFalse(PointSalesExtractionTask.objects.filter(sale_date__gte=date(2090, 1, 1)).exists())
+        self.assertFalse(FactVentaDiaria.objects.filter(fecha__gte=date(2090, 1, 1)).exists())
+
+    def test_compara_contra_la_base_con_umbrales(self):
+        base = {
+            "config": self.config.as_dict(),
+            "stages": {
+                "persist_daily_sales": {"seconds": 1.0, "queries": 100},
+                "cache_invalidation": {"seconds": 0.001, "queries": 2},
+            },
+            "totals": {"seconds": 1.0, "queries": 102},
+        }
+        current = {
+            "config": self.config.as_dict(),
+            "stages": {
+                "persist_daily_sales": {"seconds": 2.5, "queries": 110},
+                "cache_invalidation": {"seconds": 0.01, "queries": 2},
+            },
+            "totals": {"seconds": 2.51, "queries": 112},
+        }
+
+        regressions = compare_with_baseline(current, base)
+        self.assertEqual(
+            [(row["stage"], row["metric"]) for row in regressions],
+            [("persist_daily_sales", "seconds"), ("total", "seconds")],
+        )
+        self.assertEqual(compare_with_baseline(current, base, max_time_ratio=3.0), [])
+        self.assertEqual(
+            compare_with_baseline(current, {**base, "config": {**base["config"], "products": 9}})[0]["stage"],
+            "config",
+        )
+
+    def test_comando_guarda_json_y_falla_con_regresion(self):
+        with TemporaryDirectory() as tmpdir:
+            output = Path(tmpdir) / "run.json"
+            call_command(
+                "benchmark_sales_day_close",
+                "--branches=1",
+                "--products=2",
+                "--days=1",
+                f"--output={output}",
+                stdout=StringIO(),
+            )
+            result = json.loads(output.read_text(encoding="utf-8"))
+            self.assertEqual(result["config"]["products"], 2)
+
+            result["stages"]["persist_daily_sales"]["queries"] = 1
+            baseline = Path(tmpdir) / "base.json"
+            baseline.write_text(json.dumps(result), encoding="utf-8")
+            with self.assertRaisesMessage(CommandError, "regresiones"):
+                call_command(
+                    "benchmark_sales_day_close",
+                    "--branches=1",
+                    "--products=2",
+                    "--days=1",
+                    f"--baseline={baseline}",
+                    stdout=StringIO(),
+                )
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:30
+
+from django.db import migrations
+
+
+def trigram_index(*, table: str, name: str, column: str):
+    # Solo si maestros 0017 pudo instalar pg_trgm; ver la nota ahí.
+    return migrations.RunSQL(
+        sql=f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (UPPER({column}::text) gin_trgm_ops);
+            END IF;
+        END $$;
+        """,
+        reverse_sql=f"DROP INDEX IF EXISTS {name}",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("maestros", "0017_catalog_search_trigram_indexes"),
+        ("recetas", "0041_receta_grupo_mano_obra"),
+    ]
+
+    operations = [
+        trigram_index(table="recetas_receta", name="receta_nombre_norm_trgm", column="nombre_normalizado"),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recetas", "0042_receta_trigram_index"),
+    ]
+
+    operations = [
+        # Para ``codigo_point__iexact`` en la búsqueda de catálogo; ver maestros 0019.
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS receta_codigo_point_upper ON recetas_receta (UPPER(codigo_point::text))",
+            reverse_sql="DROP INDEX IF EXISTS receta_codigo_point_upper",
+        ),
+    ]
@@ -25,7 +25,6 @@ from recetas.models import (
     SolicitudReabastoCedis,
     SolicitudReabastoCedisLinea,
 )
-from recetas.views.reabasto import _consolidado_reabasto_por_fecha, _upsert_plan_reabasto_cedis
 
 
 logger = logging.getLogger(__name__)
@@ -49,6 +48,9 @@ class ConsolidadoNocturnoCedisService:
         forzar_recalculo: bool = False,
         fecha_transferencias: date | None = None,
     ) -> ConsolidadoNocturnoCEDIS:
+        # reabasto.py son ~20k líneas de vistas; el worker de Celery no las carga al arrancar.
+        from recetas.views.reabasto import _consolidado_reabasto_por_fecha, _upsert_plan_reabasto_cedis
+
         fecha_operacion = fecha_operacion or timezone.localdate()
         fecha_transferencias = fecha_transferencias or (fecha_operacion - timedelta(days=1))
         consolidado_existente = ConsolidadoNocturnoCEDIS.objects.filter(fecha_operacion=fecha_operacion).first()
@@ -171,6 +173,8 @@ class ConsolidadoNocturnoCedisService:
         return sync_job
 
     def get_resumen(self, *, fecha_operacion: date | None = None) -> dict:
+        from recetas.views.reabasto import _consolidado_reabasto_por_fecha
+
         fecha_operacion = fecha_operacion or timezone.localdate()
         consolidado = ConsolidadoNocturnoCEDIS.objects.filter(fecha_operacion=fecha_operacion).first()
         rows = _consolidado_reabasto_por_fecha(fecha_operacion)
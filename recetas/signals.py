@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.db import OperationalError, ProgrammingError
+from django.db import OperationalError, ProgrammingError, transaction
 
+from core.cache_versions import bump_cache_scopes
+from maestros.models import Insumo, InsumoAlias
 from recetas.models import Receta, RecetaPresentacion
 from recetas.utils.derived_insumos import sync_presentacion_insumo, sync_receta_derivados
+from recetas.utils.matching import descartar_indice_matching_en_transaccion
 
 
 @receiver(post_save, sender=Receta, dispatch_uid="recetas_sync_derivados_on_receta_save")
@@ -42,3 +45,21 @@ def deactivate_derivado_on_presentacion_delete(sender, instance: RecetaPresentac
         return
     except Exception:
         return
+
+
+@receiver(post_save, sender=Insumo, dispatch_uid="recetas_invalidar_matching_on_insumo_save")
+@receiver(post_delete, sender=Insumo, dispatch_uid="recetas_invalidar_matching_on_insumo_delete")
+def descartar_indice_matching_on_insumo(sender, **kwargs):
+    # El scope "insumos" ya lo sube core.signals al confirmar; aquí sólo se
+    # descarta el índice de la transacción en curso para que el siguiente
+    # renglón del import vea el insumo recién creado, sin otro incremento.
+    descartar_indice_matching_en_transaccion()
+
+
+@receiver(post_save, sender=InsumoAlias, dispatch_uid="recetas_invalidar_matching_on_alias_save")
+@receiver(post_delete, sender=InsumoAlias, dispatch_uid="recetas_invalidar_matching_on_alias_delete")
+def invalidar_indice_matching_on_alias(sender, **kwargs):
+    # Los alias no invalidan ningún scope en core; el índice de matching se
+    # versiona con "insumos".
+    descartar_indice_matching_en_transaccion()
+    transaction.on_commit(lambda: bump_cache_scopes("insumos"))
@@ -14,7 +14,6 @@ from django.utils import timezone
 from config.email_backends import retrieve_resend_email
 from recetas.models import ConsolidadoNocturnoCEDIS
 from recetas.services.consolidado_service import ConsolidadoNocturnoCedisService
-from recetas.views.reabasto import _build_solicitudes_sucursal_workbook
 
 
 logger = logging.getLogger(__name__)
@@ -86,6 +85,8 @@ def enviar_solicitudes_sucursal_cedis(
     consolidado: ConsolidadoNocturnoCEDIS,
     forzar_envio: bool = False,
 ) -> dict:
+    from recetas.views.reabasto import _build_solicitudes_sucursal_workbook
+
     metadata = consolidado.metadata or {}
     if metadata.get("solicitudes_sucursal_email_sent_at") and not forzar_envio:
         return {
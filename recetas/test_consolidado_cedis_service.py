@@ -166,7 +166,7 @@ class ConsolidadoNocturnoCedisServiceTests(TestCase):
             metadata={"transfer_request_date": "2026-05-09"},
         )
 
-        with patch("recetas.tasks.consolidado_nocturno._build_solicitudes_sucursal_workbook", return_value=Workbook()):
+        with patch("recetas.views.reabasto._build_solicitudes_sucursal_workbook", return_value=Workbook()):
             result = enviar_solicitudes_sucursal_cedis(consolidado=consolidado, forzar_envio=True)
 
         self.assertEqual(result["recipients"], ["produccion.carolina@pollyanasdolce.com"])
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+from rapidfuzz import fuzz, process
+
+from maestros.models import Insumo, InsumoAlias
+from recetas.utils.matching import indice_matching_insumos, match_insumo, match_insumos
+from recetas.utils.normalizacion import normalizar_nombre
+
+
+class IndiceMatchingInsumosTests(TestCase):
+    def setUp(self):
+        for nombre in [
+            "Harina de trigo",
+            "Harina integral",
+            "Azucar refinada",
+            "Azucar glass",
+            "Chocolate blanco en barra",
+            "Chocolate semiamargo",
+            "Pan de muerto chico",
+            "Pan de muerto grande",
+            "Mantequilla sin sal",
+            "Leche entera",
+            "Leche evaporada",
+        ]:
+            Insumo.objects.create(nombre=nombre)
+        # Dos insumos con el mismo nombre: gana el de menor id, como .first().
+        self.duplicado = Insumo.objects.create(nombre="Vainilla liquida")
+        Insumo.objects.create(nombre="Vainilla liquida")
+        Insumo.objects.create(nombre="Crema batida", activo=False)
+        InsumoAlias.objects.create(nombre="Harina 000", insumo=Insumo.objects.get(nombre="Harina de trigo"))
+        self.consultas = [
+            "",
+            "Harina 000",
+            "HARINA DE TRIGO",
+            "chocolate blanco",
+            "late blanco en",
+            "Harina de trigoo",
+            "Azucar glas",
+            "pan de muerto chica",
+            "Pan muerto grande",
+            "vainilla liquid",
+            "Crema batida",
+            "zzz qqq",
+            "leche",
+        ]
+
+    def test_lote_coincide_con_match_insumo(self):
+        lote = match_insumos(self.consultas)
+
+        for consulta in self.consultas:
+            with self.subTest(consulta=consulta):
+                self.assertEqual(lote[consulta], match_insumo(consulta))
+        self.assertEqual(lote["Harina 000"][2], "ALIAS")
+        self.assertEqual(lote["chocolate blanco"][2], "CONTAINS")
+        self.assertEqual(indice_matching_insumos().exactos["vainilla liquida"], self.duplicado.id)
+        self.assertEqual(lote["Crema batida"][0], None)
+
+    def test_fuzzy_conserva_scores_y_desempate_de_extract_one(self):
+        nombres = list(Insumo.objects.filter(activo=True).order_by("id").values_list("nombre_normalizado", flat=True))
+        indice = indice_matching_insumos()
+        columnas = indice.columnas_fuzzy(frozenset())
+        consultas = [normalizar_nombre(consulta) for consulta in self.consultas if consulta]
+
+        for consulta, (nombre, score) in zip(consultas, indice.mejores_fuzzy(consultas, columnas)):
+            esperado_nombre, esperado_score, _ = process.extractOne(consulta, nombres, scorer=fuzz.ratio)
+            self.assertEqual((nombre, score), (esperado_nombre, esperado_score))
+
+    def test_presentacion_requerida_filtra_candidatos(self):
+        insumo, _, method = match_insumo("pan de muerto chica")
+
+        self.assertEqual(insumo.nombre, "Pan de muerto chico")
+        self.assertEqual(method, "FUZZY")
+        self.assertEqual(match_insumo("rosca de reyes"), (None, 0.0, "NO_MATCH"))
+
+    def test_alta_de_insumo_invalida_el_indice(self):
+        self.assertEqual(match_insumo("Cocoa alcalina")[2], "NO_MATCH")
+
+        Insumo.objects.create(nombre="Cocoa alcalina en polvo")
+
+        self.assertEqual(match_insumos(["Cocoa alcalina"])["Cocoa alcalina"][2], "CONTAINS")
+        self.assertEqual(match_insumos(["Cocoa alcalin polvo"])["Cocoa alcalin polvo"][2], "FUZZY")
+
+    def test_alta_dentro_de_transaccion_se_ve_en_el_siguiente_renglon(self):
+        with transaction.atomic():
+            self.assertEqual(match_insumos(["Cocoa alcalina"])["Cocoa alcalina"][2], "NO_MATCH")
+            Insumo.objects.create(nombre="Cocoa alcalina en polvo")
+            self.assertEqual(match_insumos(["Cocoa alcalina"])["Cocoa alcalina"][2], "CONTAINS")
+            InsumoAlias.objects.create(nombre="Cacao holandes", insumo=Insumo.objects.get(nombre="Cocoa alcalina en polvo"))
+            self.assertEqual(match_insumos(["Cacao holandes"])["Cacao holandes"][2], "ALIAS")
+
+    def test_guardar_insumo_sube_el_scope_una_sola_vez(self):
+        with mock.patch("core.signals.bump_cache_scopes") as core_bump, mock.patch("recetas.signals.bump_cache_scopes") as recetas_bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                Insumo.objects.create(nombre="Grenetina en polvo")
+            recetas_bump.assert_not_called()
+            core_bump.assert_called_once_with("insumos", "inventario", "dashboard")
+
+            with self.captureOnCommitCallbacks(execute=True):
+                InsumoAlias.objects.create(nombre="Grenetina", insumo=Insumo.objects.get(nombre="Grenetina en polvo"))
+            recetas_bump.assert_called_once_with("insumos")
@@ -1,6 +1,10 @@
 from django.urls import path
-from . import views
-from .views import consolidado_cedis as consolidado_views
+
+from core.lazy_urls import lazy_views
+
+# plan.py, mrp.py y reabasto.py se importan con su primera petición.
+views = lazy_views("recetas.views")
+consolidado_views = lazy_views("recetas.views.consolidado_cedis")
 
 app_name = "recetas"
 
@@ -1,7 +1,12 @@
-from typing import Optional, Tuple
-from rapidfuzz import fuzz, process
+from functools import cached_property, lru_cache
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from django.db import connection
+
+from core.cache_versions import get_cache_scope_version
 from maestros.models import Insumo, InsumoAlias
-from maestros.utils.canonical_catalog import canonical_insumo
+from maestros.utils.canonical_catalog import _atomic_runtime_cache, _atomic_runtime_caches, _current_outer_atomic_block, canonical_insumo
 from .normalizacion import normalizar_nombre
 
 PRESENTATION_TOKENS = (
@@ -26,6 +31,121 @@ def _extract_presentation_tokens(nombre_norm: str) -> set[str]:
     return found
 
 
+FUZZY_CDIST_CHUNK = 256
+
+
+def _trigramas(texto: str) -> set[str]:
+    return {texto[index : index + 3] for index in range(len(texto) - 2)}
+
+
+def _permite_contains(nombre_norm: str) -> bool:
+    # Evita falsos positivos como "pan" -> "pan de muerto".
+    return len(nombre_norm.split()) >= 2 and len(nombre_norm) >= 8
+
+
+class IndiceMatchingInsumos:
+    """Catálogo activo pre-normalizado para matching en lote.
+
+    Reproduce las mismas reglas de match_insumo: los nombres van en orden de id,
+    que es el desempate de ``.first()``, y el fuzzy conserva el primer máximo.
+    """
+
+    def __init__(self, filas: list[tuple[int, str]]):
+        self.ids = [insumo_id for insumo_id, _ in filas]
+        self.nombres = [nombre or "" for _, nombre in filas]
+        self.exactos: dict[str, int] = {}
+        for insumo_id, nombre in zip(self.ids, self.nombres):
+            self.exactos.setdefault(nombre, insumo_id)
+        # Nombres únicos en orden de primera aparición; el match fuzzy resuelve
+        # después al menor id con ese nombre, igual que la consulta original.
+        self.fuzzy_nombres = list(self.exactos)
+        self.fuzzy_presentaciones = [frozenset(_extract_presentation_tokens(nombre)) for nombre in self.fuzzy_nombres]
+
+    @cached_property
+    def alias(self) -> dict[str, int]:
+        return dict(
+            InsumoAlias.objects.filter(insumo__activo=True).values_list("nombre_normalizado", "insumo_id")
+        )
+
+    @cached_property
+    def trigramas(self) -> dict[str, set[int]]:
+        indice: dict[str, set[int]] = {}
+        for posicion, nombre in enumerate(self.nombres):
+            for trigrama in _trigramas(nombre):
+                indice.setdefault(trigrama, set()).add(posicion)
+        return indice
+
+    def contiene(self, nombre_norm: str) -> int | None:
+        listas = [self.trigramas.get(trigrama, set()) for trigrama in _trigramas(nombre_norm)]
+        if not listas:
+            return None
+        listas.sort(key=len)
+        candidatos = set(listas[0]).intersection(*listas[1:])
+        for posicion in sorted(candidatos):
+            if nombre_norm in self.nombres[posicion]:
+                return self.ids[posicion]
+        return None
+
+    def columnas_fuzzy(self, presentaciones: frozenset[str]) -> list[int]:
+        return [
+            columna
+            for columna, disponibles in enumerate(self.fuzzy_presentaciones)
+            if presentaciones.issubset(disponibles)
+        ]
+
+    def mejores_fuzzy(self, consultas: list[str], columnas: list[int]) -> list[tuple[str, float]]:
+        """Mejor nombre y score ``fuzz.ratio`` por consulta usando ``cdist`` en bloques."""
+        from rapidfuzz import fuzz, process
+
+        nombres = [self.fuzzy_nombres[columna] for columna in columnas]
+        resultados: list[tuple[str, float]] = []
+        for inicio in range(0, len(consultas), FUZZY_CDIST_CHUNK):
+            scores = process.cdist(
+                consultas[inicio : inicio + FUZZY_CDIST_CHUNK],
+                nombres,
+                scorer=fuzz.ratio,
+                dtype=np.float64,
+            )
+            # argmax devuelve el primer máximo, como extractOne.
+            for fila, mejor in zip(scores, scores.argmax(axis=1)):
+                resultados.append((nombres[mejor], float(fila[mejor])))
+        return resultados
+
+
+def _construir_indice_matching_insumos() -> IndiceMatchingInsumos:
+    return IndiceMatchingInsumos(
+        list(Insumo.objects.filter(activo=True).order_by("id").values_list("id", "nombre_normalizado"))
+    )
+
+
+@lru_cache(maxsize=4)
+def _indice_matching_insumos_cacheado(version: int) -> IndiceMatchingInsumos:
+    return _construir_indice_matching_insumos()
+
+
+def indice_matching_insumos() -> IndiceMatchingInsumos:
+    """Índice vigente para la versión actual del scope de caché ``insumos``."""
+    version = get_cache_scope_version("insumos")
+    atomic_cache = _atomic_runtime_cache()
+    if connection.in_atomic_block and atomic_cache is None:
+        return _construir_indice_matching_insumos()
+    if atomic_cache is not None:
+        key = ("indice_matching_insumos", version)
+        if key not in atomic_cache:
+            atomic_cache[key] = _construir_indice_matching_insumos()
+        return atomic_cache[key]
+    return _indice_matching_insumos_cacheado(version)
+
+
+def descartar_indice_matching_en_transaccion() -> None:
+    """Olvida el índice construido dentro de la transacción en curso."""
+    outer_atomic = _current_outer_atomic_block()
+    atomic_cache = _atomic_runtime_caches.get(outer_atomic) if outer_atomic is not None else None
+    if atomic_cache:
+        for key in [key for key in atomic_cache if key[0] == "indice_matching_insumos"]:
+            del atomic_cache[key]
+
+
 def match_insumo(nombre_origen: str, score_threshold: float = 75.0) -> Tuple[Optional[Insumo], float, str]:
     """Matching en 3 pasos: EXACT, CONTAINS, FUZZY."""
     nombre_norm = normalizar_nombre(nombre_origen)
@@ -45,38 +165,71 @@ def match_insumo(nombre_origen: str, score_threshold: float = 75.0) -> Tuple[Opt
         return (canonical_insumo(insumo) or insumo, 100.0, "EXACT")
 
     # 2) Contains solo para términos suficientemente específicos.
-    # Evita falsos positivos como "pan" -> "pan de muerto".
-    tokens = nombre_norm.split()
-    allow_contains = len(tokens) >= 2 and len(nombre_norm) >= 8
-    if allow_contains:
+    if _permite_contains(nombre_norm):
         insumo = Insumo.objects.filter(nombre_normalizado__icontains=nombre_norm, activo=True).first()
         if insumo:
             return (canonical_insumo(insumo) or insumo, 95.0, "CONTAINS")
 
-    # 3) Fuzzy
-    nombres = list(Insumo.objects.filter(activo=True).values_list("nombre_normalizado", flat=True))
-    if not nombres:
+    # 3) Fuzzy sobre el índice pre-normalizado del catálogo.
+    indice = indice_matching_insumos()
+    columnas = indice.columnas_fuzzy(frozenset(required_presentations))
+    if not columnas:
         return (None, 0.0, "NO_MATCH")
-    if required_presentations:
-        nombres = [
-            n
-            for n in nombres
-            if required_presentations.issubset(_extract_presentation_tokens(n))
-        ]
-        if not nombres:
-            return (None, 0.0, "NO_MATCH")
 
-    best = process.extractOne(nombre_norm, nombres, scorer=fuzz.ratio)
-    if not best:
-        return (None, 0.0, "NO_MATCH")
-
-    best_name, score, _ = best
+    best_name, score = indice.mejores_fuzzy([nombre_norm], columnas)[0]
     if score >= score_threshold:
         insumo = Insumo.objects.filter(nombre_normalizado=best_name, activo=True).first()
         return (canonical_insumo(insumo) or insumo, float(score), "FUZZY")
 
     return (None, float(score), "NO_MATCH")
 
+
+def match_insumos(
+    nombres_origen: Iterable[str], score_threshold: float = 75.0
+) -> dict[str, Tuple[Optional[Insumo], float, str]]:
+    """Versión en lote de match_insumo: mismo resultado por nombre, un solo índice."""
+    indice = indice_matching_insumos()
+    resultados: dict[str, Tuple[Optional[int], float, str]] = {}
+    pendientes: dict[frozenset[str], list[tuple[str, str]]] = {}
+    for nombre_origen in nombres_origen:
+        if nombre_origen in resultados:
+            continue
+        nombre_norm = normalizar_nombre(nombre_origen)
+        if not nombre_norm:
+            resultados[nombre_origen] = (None, 0.0, "NO_MATCH")
+            continue
+        if nombre_norm in indice.alias:
+            resultados[nombre_origen] = (indice.alias[nombre_norm], 100.0, "ALIAS")
+        elif nombre_norm in indice.exactos:
+            resultados[nombre_origen] = (indice.exactos[nombre_norm], 100.0, "EXACT")
+        elif _permite_contains(nombre_norm) and (insumo_id := indice.contiene(nombre_norm)) is not None:
+            resultados[nombre_origen] = (insumo_id, 95.0, "CONTAINS")
+        else:
+            presentaciones = frozenset(_extract_presentation_tokens(nombre_norm))
+            resultados[nombre_origen] = (None, 0.0, "NO_MATCH")
+            pendientes.setdefault(presentaciones, []).append((nombre_origen, nombre_norm))
+
+    for presentaciones, consultas in pendientes.items():
+        columnas = indice.columnas_fuzzy(presentaciones)
+        if not columnas:
+            continue
+        mejores = indice.mejores_fuzzy([nombre_norm for _, nombre_norm in consultas], columnas)
+        for (nombre_origen, _), (best_name, score) in zip(consultas, mejores):
+            if score >= score_threshold:
+                resultados[nombre_origen] = (indice.exactos[best_name], score, "FUZZY")
+            else:
+                resultados[nombre_origen] = (None, score, "NO_MATCH")
+
+    insumos = Insumo.objects.filter(activo=True).in_bulk(
+        {insumo_id for insumo_id, _, _ in resultados.values() if insumo_id is not None}
+    )
+    matches: dict[str, Tuple[Optional[Insumo], float, str]] = {}
+    for nombre_origen, (insumo_id, score, method) in resultados.items():
+        insumo = insumos.get(insumo_id) if insumo_id is not None else None
+        matches[nombre_origen] = (canonical_insumo(insumo) or insumo, float(score), method)
+    return matches
+
+
 def clasificar_match(score: float) -> str:
     if score >= 90:
         return "AUTO_APPROVED"
@@ -14,7 +14,7 @@ from maestros.models import CostoInsumo, Insumo, UnidadMedida
 from maestros.utils.canonical_catalog import canonical_insumo, latest_costo_canonico
 from recetas.models import LineaReceta, Receta
 from recetas.utils.costeo_versionado import asegurar_version_costeo
-from recetas.utils.matching import clasificar_match, match_insumo
+from recetas.utils.matching import clasificar_match, match_insumo, match_insumos
 from recetas.utils.normalizacion import normalizar_nombre
 from recetas.utils.subsection_costing import find_parent_cost_for_stage
 
@@ -306,13 +306,15 @@ def import_template(filepath: str, replace_existing: bool = False) -> TemplateIm
             if str(r.get("unidad") or "").strip()
         }
     )
-    match_cache: dict[str, tuple[Any, float, str]] = {}
-    for ingrediente in {
-        str(r.get("ingrediente") or "").strip()
-        for r in rows
-        if str(r.get("ingrediente") or "").strip()
-    }:
-        match_cache[ingrediente] = match_insumo(ingrediente)
+    match_cache: dict[str, tuple[Any, float, str]] = match_insumos(
+        sorted(
+            {
+                str(r.get("ingrediente") or "").strip()
+                for r in rows
+                if str(r.get("ingrediente") or "").strip()
+            }
+        )
+    )
     cost_cache: dict[int, Decimal | None] = _latest_cost_by_insumos(
         {
             int(insumo.id)
@@ -52,6 +52,7 @@ from maestros.utils.canonical_catalog import (
     canonicalized_insumo_selector,
     latest_costo_canonico,
 )
+from maestros.utils.catalog_search import buscar_insumos
 from ..models import (
     Receta,
     RecetaAgrupacionAddon,
@@ -8951,13 +8952,17 @@ def matching_insumos_search(request: HttpRequest) -> JsonResponse:
         limit = 20
     limit = max(1, min(limit, 100))
 
-    queryset = Insumo.objects.filter(activo=True).select_related("unidad_base")
     if q:
-        queryset = queryset.filter(nombre__icontains=q)
+        insumos = [
+            result.objeto
+            for result in buscar_insumos(q, limit=limit * 5, queryset=Insumo.objects.select_related("unidad_base"))
+        ]
+    else:
+        # Desempate por id: con nombres iguales, el backend de BD decide el orden
+        # y el canónico resuelto variaba entre Postgres y SQLite.
+        insumos = Insumo.objects.filter(activo=True).select_related("unidad_base").order_by("nombre", "id")[: limit * 5]
     grouped = {}
-    # Desempate por id: con nombres iguales, el backend de BD decide el orden
-    # y el canónico resuelto variaba entre Postgres y SQLite.
-    for insumo in queryset.order_by("nombre", "id")[: limit * 5]:
+    for insumo in insumos:
         key = insumo.nombre_normalizado or normalizar_nombre(insumo.nombre or "")
         grouped.setdefault(key, []).append(insumo)
 
@@ -29,7 +29,7 @@ from rapidfuzz import fuzz
 from compras.models import OrdenCompra, RecepcionCompra, SolicitudCompra
 from control.models import MermaPOS
 from core.access import can_manage_compras, can_view_recetas, is_branch_capture_only
-from core.audit import log_event
+from core.audit import audit_batch, log_event
 from core.branch_catalog import resolver_sucursal_por_texto
 from core.models import Sucursal, sucursales_operativas
 from inventario.models import UBICACION_CEDIS, ExistenciaInsumo, MovimientoInventario
@@ -9225,6 +9225,7 @@ def _mark_plan_closed(plan: PlanProduccion, acted_by) -> bool:
 
 
 @transaction.atomic
+@audit_batch()
 def _apply_plan_consumption(plan: PlanProduccion, acted_by) -> dict[str, int]:
     explosion = _plan_explosion(plan)
     stats = {
@@ -19123,6 +19124,7 @@ def plan_produccion_cerrar(request: HttpRequest, plan_id: int) -> HttpResponse:
     return redirect(f"{reverse('recetas:plan_produccion')}?plan_id={plan.id}")
 
 
+@audit_batch()
 def _generar_solicitudes_compra_desde_plan(
     plan: PlanProduccion,
     user,
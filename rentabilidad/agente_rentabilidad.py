@@ -12,8 +12,11 @@ Se ejecuta desde:
   3. Cuando se guarda un nuevo registro vía API
 """
 
+import hashlib
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from decimal import Decimal
 from django.conf import settings
 
@@ -25,6 +28,10 @@ MARGEN_NETO_MINIMO     = getattr(settings, "RENT_MARGEN_NETO_MIN",     15.0)
 ROI_OBJETIVO_ANUAL     = getattr(settings, "RENT_ROI_OBJETIVO",        25.0)
 PAYBACK_MAXIMO_MESES   = getattr(settings, "RENT_PAYBACK_MAX_MESES",   36)
 
+AGENTE_MODELO            = "gpt-4o-mini"
+AGENTE_MAX_WORKERS       = getattr(settings, "RENT_AGENTE_MAX_WORKERS",       4)
+AGENTE_TIMEOUT_SEGUNDOS  = getattr(settings, "RENT_AGENTE_TIMEOUT_SEGUNDOS",  60)
+
 
 SYSTEM_PROMPT = """
 Eres el analista financiero interno de Pollyana's Dolce, una cadena de pastelerías en Sinaloa, México.
@@ -121,72 +128,118 @@ def _construir_contexto(rent) -> str:
     return "\n".join(lines)
 
 
-def analizar_sucursal(rent, guardar=True) -> dict:
+def huella_contexto(contexto: str) -> str:
+    """
+    Huella estable del análisis: modelo + prompt + contexto numérico.
+    Si no cambia, el diagnóstico guardado sigue vigente y no se vuelve a pedir.
+    """
+    payload = "\n".join([AGENTE_MODELO, SYSTEM_PROMPT, contexto])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _crear_cliente():
+    from openai import OpenAI
+
+    return OpenAI(api_key=settings.OPENAI_API_KEY, timeout=AGENTE_TIMEOUT_SEGUNDOS)
+
+
+def _solicitar_diagnostico(client, contexto: str) -> dict:
+    """Llamada bloqueante al modelo. No toca la BD: es seguro correrla en un hilo."""
+    response = client.chat.completions.create(
+        model=AGENTE_MODELO,
+        temperature=0.3,
+        max_tokens=800,
+        timeout=AGENTE_TIMEOUT_SEGUNDOS,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user",   "content": contexto},
+        ],
+    )
+    raw = response.choices[0].message.content.strip()
+    return json.loads(raw)
+
+
+def _resultado_json_invalido() -> dict:
+    return {
+        "diagnostico": "No se pudo generar diagnóstico automático. Revisa manualmente.",
+        "recomendaciones": [],
+        "alerta_nivel": 1,
+        "resumen_ejecutivo": "Diagnóstico no disponible.",
+    }
+
+
+def _resultado_error(error) -> dict:
+    return {
+        "diagnostico": f"Error del agente: {str(error)}",
+        "recomendaciones": [],
+        "alerta_nivel": 1,
+        "resumen_ejecutivo": "Error en diagnóstico.",
+    }
+
+
+def _guardar_resultado(rent, resultado: dict, huella: str) -> None:
+    """
+    Persiste el diagnóstico. `huella` vacía marca el resultado como no
+    reutilizable (fallback por error), para que la siguiente corrida lo reintente.
+    """
+    rent.diagnostico_ia     = resultado.get("diagnostico", "")
+    rent.recomendaciones_ia = resultado.get("recomendaciones", [])
+    rent.alerta_nivel       = resultado.get("alerta_nivel", 0)
+    rent.calculado_por_agente = True
+    rent.huella_contexto_ia = huella
+    rent.save(update_fields=[
+        "diagnostico_ia", "recomendaciones_ia",
+        "alerta_nivel", "calculado_por_agente", "huella_contexto_ia",
+    ])
+
+
+def analizar_sucursal(rent, guardar=True, client=None) -> dict:
     """
     Llama al agente IA para diagnosticar una SucursalRentabilidad.
 
     Args:
         rent: instancia de SucursalRentabilidad
         guardar: si True, persiste el diagnóstico en el objeto
+        client: cliente compatible con OpenAI (inyectable en pruebas)
 
     Returns:
         dict con diagnostico, recomendaciones, alerta_nivel, resumen_ejecutivo
     """
-    from openai import OpenAI
-
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    client = client or _crear_cliente()
     contexto = _construir_contexto(rent)
+    huella = huella_contexto(contexto)
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.3,
-            max_tokens=800,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user",   "content": contexto},
-            ],
-        )
-        raw = response.choices[0].message.content.strip()
-        resultado = json.loads(raw)
+        resultado = _solicitar_diagnostico(client, contexto)
 
     except json.JSONDecodeError as e:
         logger.error(f"[AgentRentabilidad] JSON inválido para {rent}: {e}")
-        resultado = {
-            "diagnostico": "No se pudo generar diagnóstico automático. Revisa manualmente.",
-            "recomendaciones": [],
-            "alerta_nivel": 1,
-            "resumen_ejecutivo": "Diagnóstico no disponible.",
-        }
+        resultado = _resultado_json_invalido()
+        huella = ""
     except Exception as e:
         logger.exception(f"[AgentRentabilidad] Error para {rent}: {e}")
-        resultado = {
-            "diagnostico": f"Error del agente: {str(e)}",
-            "recomendaciones": [],
-            "alerta_nivel": 1,
-            "resumen_ejecutivo": "Error en diagnóstico.",
-        }
+        resultado = _resultado_error(e)
+        huella = ""
 
     if guardar:
-        rent.diagnostico_ia     = resultado.get("diagnostico", "")
-        rent.recomendaciones_ia = resultado.get("recomendaciones", [])
-        rent.alerta_nivel       = resultado.get("alerta_nivel", 0)
-        rent.calculado_por_agente = True
-        rent.save(update_fields=[
-            "diagnostico_ia", "recomendaciones_ia",
-            "alerta_nivel", "calculado_por_agente",
-        ])
+        _guardar_resultado(rent, resultado, huella)
 
     return resultado
 
 
-def analizar_todas_sucursales(periodo=None):
+def analizar_todas_sucursales(periodo=None, *, forzar=False, max_workers=None, timeout=None, client=None):
     """
     Analiza todas las sucursales para un periodo dado.
     Si periodo es None, usa el mes actual.
 
-    Llamada desde Celery:
-        analizar_todas_sucursales.apply_async(args=[periodo])
+    - Las sucursales cuya huella de contexto no cambió reutilizan el
+      diagnóstico guardado (salvo `forzar=True`).
+    - Las demás se mandan al modelo en un pool acotado de hilos; cada
+      sucursal tiene su propio timeout y un fallo no afecta a las demás.
+    - Las escrituras a BD ocurren en el hilo que llama (conexión y
+      transacción del caller), nunca en los hilos del pool.
+
+    Llamada desde Celery: rentabilidad.tasks_rentabilidad.analizar_rentabilidad_periodo_con_ia
     """
     from .models import SucursalRentabilidad  # import local para evitar circular
     from datetime import date
@@ -195,14 +248,76 @@ def analizar_todas_sucursales(periodo=None):
         hoy = date.today()
         periodo = hoy.replace(day=1)
 
-    qs = SucursalRentabilidad.objects.filter(periodo=periodo)
+    max_workers = max(1, int(max_workers or AGENTE_MAX_WORKERS))
+    timeout = float(timeout or AGENTE_TIMEOUT_SEGUNDOS)
+
+    qs = SucursalRentabilidad.objects.filter(periodo=periodo).select_related("sucursal")
     resultados = []
+    pendientes = []
     for rent in qs:
         try:
-            r = analizar_sucursal(rent, guardar=True)
-            resultados.append({"sucursal": str(rent.sucursal), "estado": rent.estado, "ok": True})
+            contexto = _construir_contexto(rent)
         except Exception as e:
             resultados.append({"sucursal": str(rent.sucursal), "error": str(e), "ok": False})
-            logger.error(f"[AgentRentabilidad] Fallo en {rent}: {e}")
+            logger.error(f"[AgentRentabilidad] Contexto inválido en {rent}: {e}")
+            continue
+        huella = huella_contexto(contexto)
+        if not forzar and rent.calculado_por_agente and rent.huella_contexto_ia == huella:
+            resultados.append({
+                "sucursal": str(rent.sucursal), "estado": rent.estado, "ok": True, "reutilizado": True,
+            })
+            continue
+        pendientes.append((rent, contexto, huella))
+
+    if not pendientes:
+        return resultados
+
+    try:
+        client = client or _crear_cliente()
+    except Exception as e:
+        logger.exception(f"[AgentRentabilidad] No se pudo crear el cliente IA: {e}")
+        for rent, _contexto, _huella in pendientes:
+            resultados.append({"sucursal": str(rent.sucursal), "error": str(e), "ok": False})
+        return resultados
+
+    workers = min(max_workers, len(pendientes))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rentabilidad-ia")
+    futures = [
+        (executor.submit(_solicitar_diagnostico, client, contexto), rent, huella)
+        for rent, contexto, huella in pendientes
+    ]
+    # Cada sucursal tiene `timeout` segundos una vez que le toca hilo; el
+    # límite global cubre las "oleadas" cuando hay más sucursales que hilos.
+    oleadas = -(-len(pendientes) // workers)
+    deadline = time.monotonic() + timeout * oleadas
+    try:
+        for future, rent, huella in futures:
+            try:
+                resultado = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                logger.error(f"[AgentRentabilidad] Timeout en {rent} tras {timeout:.0f}s")
+                resultados.append({"sucursal": str(rent.sucursal), "error": "timeout", "ok": False})
+                continue
+            except json.JSONDecodeError as e:
+                logger.error(f"[AgentRentabilidad] JSON inválido para {rent}: {e}")
+                _guardar_resultado(rent, _resultado_json_invalido(), "")
+                resultados.append({"sucursal": str(rent.sucursal), "error": f"JSON inválido: {e}", "ok": False})
+                continue
+            except Exception as e:
+                logger.error(f"[AgentRentabilidad] Fallo en {rent}: {e}")
+                _guardar_resultado(rent, _resultado_error(e), "")
+                resultados.append({"sucursal": str(rent.sucursal), "error": str(e), "ok": False})
+                continue
+            try:
+                _guardar_resultado(rent, resultado, huella)
+            except Exception as e:
+                logger.exception(f"[AgentRentabilidad] No se pudo guardar {rent}: {e}")
+                resultados.append({"sucursal": str(rent.sucursal), "error": str(e), "ok": False})
+                continue
+            resultados.append({"sucursal": str(rent.sucursal), "estado": rent.estado, "ok": True})
+    finally:
+        # No esperar hilos colgados: su resultado ya se reportó como timeout.
+        executor.shutdown(wait=False, cancel_futures=True)
 
     return resultados
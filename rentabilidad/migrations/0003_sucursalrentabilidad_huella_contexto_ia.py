@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentabilidad', '0002_sucursalrentabilidad_costo_reventa'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sucursalrentabilidad',
+            name='huella_contexto_ia',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 del contexto enviado al agente; si no cambia se reutiliza el diagnóstico', max_length=64),
+        ),
+    ]
@@ -263,6 +263,8 @@ class SucursalRentabilidad(models.Model):
         help_text="Lista de acciones recomendadas por el agente")
     alerta_nivel       = models.IntegerField(default=0,
         help_text="0=ok, 1=atención, 2=urgente")
+    huella_contexto_ia = models.CharField(max_length=64, blank=True, default="",
+        help_text="SHA-256 del contexto enviado al agente; si no cambia se reutiliza el diagnóstico")
 
     # ------------------------------------------------------------------ #
     # Control
@@ -7,6 +7,7 @@ Importing them here registers their original task names with the worker.
 """
 
 from .tasks_rentabilidad import (  # noqa: F401
+    analizar_rentabilidad_periodo_con_ia,
     analizar_sucursal_con_ia,
     recalcular_rentabilidad_mensual,
     recalcular_rentabilidad_periodo_actual,
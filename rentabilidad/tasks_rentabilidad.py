@@ -307,6 +307,40 @@ def analizar_sucursal_con_ia(rent_pk):
         return {"ok": False, "error": str(e)}
 
 
+@shared_task
+def analizar_rentabilidad_periodo_con_ia(year=None, month=None, forzar=False):
+    """
+    Analiza con IA todas las sucursales de un periodo (por defecto el mes
+    cerrado). Las sucursales sin cambios reutilizan su diagnóstico y el resto
+    corre en paralelo, así que tarda lo que la sucursal más lenta.
+    """
+    from .agente_rentabilidad import analizar_todas_sucursales
+
+    hoy = timezone.localdate()
+    if year is None or month is None:
+        if hoy.month == 1:
+            year, month = hoy.year - 1, 12
+        else:
+            year, month = hoy.year, hoy.month - 1
+
+    periodo = date(year, month, 1)
+    resultados = analizar_todas_sucursales(periodo=periodo, forzar=forzar)
+    reutilizadas = sum(1 for r in resultados if r.get("reutilizado"))
+    fallidas = sum(1 for r in resultados if not r.get("ok"))
+    logger.info(
+        f"[RentabilidadIA] {periodo.strftime('%B %Y')}: {len(resultados)} sucursales, "
+        f"{reutilizadas} reutilizadas, {fallidas} con error"
+    )
+    return {
+        "periodo": str(periodo),
+        "ok": fallidas == 0,
+        "total": len(resultados),
+        "reutilizadas": reutilizadas,
+        "fallidas": fallidas,
+        "resultados": resultados,
+    }
+
+
 """
 =============================================================
 MIGRACIÓN  — Agregar al final de tu migration más reciente
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import json
+import threading
 from datetime import date
 from decimal import Decimal
+from types import SimpleNamespace
 
 from django.contrib.auth.models import Group, User
 from django.test import TestCase
@@ -11,6 +14,7 @@ from core.access import ROLE_LECTURA, ROLE_VENTAS
 from core.models import Sucursal
 from pos_bridge.models import PointBranch, PointDailySale, PointProduct
 from reportes.models import ProductoReventaCostoHistoricoMensual
+from rentabilidad.agente_rentabilidad import analizar_todas_sucursales, huella_contexto
 from rentabilidad.models_rentabilidad import SucursalRentabilidad
 from rentabilidad.tasks_rentabilidad import recalcular_rentabilidad_mensual
 
@@ -94,3 +98,117 @@ class RentabilidadCostoReventaTests(TestCase):
         self.assertEqual(rentabilidad.costo_reventa, Decimal("37.50"))
         self.assertEqual(rentabilidad.costo_variable_total, Decimal("37.50"))
         self.assertEqual(rentabilidad.margen_bruto, Decimal("52.50"))
+
+
+class _FakeModelClient:
+    """Cliente local compatible con `client.chat.completions.create` de OpenAI."""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.llamadas = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        contexto = kwargs["messages"][-1]["content"]
+        self.llamadas.append(contexto)
+        content = self.responder(contexto)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _respuesta_ok(contexto):
+    return json.dumps(
+        {
+            "diagnostico": "Diagnóstico de prueba.",
+            "recomendaciones": [{"prioridad": 1, "accion": "Revisar renta", "impacto": "alto"}],
+            "alerta_nivel": 1,
+            "resumen_ejecutivo": "Ok.",
+        }
+    )
+
+
+class AnalizarTodasSucursalesBatchTests(TestCase):
+    def setUp(self):
+        self.periodo = date(2026, 3, 1)
+        self.rents = []
+        for codigo in ("MAT", "CEN", "NTE"):
+            sucursal = Sucursal.objects.create(codigo=codigo, nombre=f"Sucursal {codigo}", activa=True)
+            self.rents.append(
+                SucursalRentabilidad.objects.create(
+                    sucursal=sucursal,
+                    periodo=self.periodo,
+                    ventas_brutas=Decimal("1000.00"),
+                    costo_materia_prima=Decimal("300.00"),
+                    renta=Decimal("100.00"),
+                )
+            )
+
+    def test_reuses_stored_analysis_when_fingerprint_matches(self):
+        client = _FakeModelClient(_respuesta_ok)
+        primera = analizar_todas_sucursales(periodo=self.periodo, client=client)
+        self.assertEqual(len(client.llamadas), 3)
+        self.assertTrue(all(r["ok"] and not r.get("reutilizado") for r in primera))
+
+        cambiada = self.rents[0]
+        cambiada.refresh_from_db()
+        cambiada.renta = Decimal("250.00")
+        cambiada.save()
+
+        client = _FakeModelClient(_respuesta_ok)
+        segunda = analizar_todas_sucursales(periodo=self.periodo, client=client)
+
+        self.assertEqual(len(client.llamadas), 1)
+        self.assertIn("Sucursal MAT", client.llamadas[0])
+        self.assertEqual(sum(1 for r in segunda if r.get("reutilizado")), 2)
+        cambiada.refresh_from_db()
+        self.assertEqual(cambiada.huella_contexto_ia, huella_contexto(client.llamadas[0]))
+
+        client = _FakeModelClient(_respuesta_ok)
+        analizar_todas_sucursales(periodo=self.periodo, client=client, forzar=True)
+        self.assertEqual(len(client.llamadas), 3)
+
+    def test_failure_in_one_branch_is_isolated_and_retried_next_run(self):
+        def responder(contexto):
+            if "Sucursal CEN" in contexto:
+                raise RuntimeError("rate limit")
+            return _respuesta_ok(contexto)
+
+        resultados = analizar_todas_sucursales(periodo=self.periodo, client=_FakeModelClient(responder))
+
+        por_sucursal = {r["sucursal"]: r for r in resultados}
+        self.assertFalse(por_sucursal["CEN - Sucursal CEN"]["ok"])
+        self.assertTrue(por_sucursal["MAT - Sucursal MAT"]["ok"])
+        self.assertTrue(por_sucursal["NTE - Sucursal NTE"]["ok"])
+        fallida = SucursalRentabilidad.objects.get(sucursal__codigo="CEN", periodo=self.periodo)
+        self.assertEqual(fallida.huella_contexto_ia, "")
+
+        client = _FakeModelClient(_respuesta_ok)
+        analizar_todas_sucursales(periodo=self.periodo, client=client)
+        self.assertEqual(len(client.llamadas), 1)
+        self.assertIn("Sucursal CEN", client.llamadas[0])
+
+    def test_branches_run_concurrently_and_slow_branch_times_out(self):
+        barrera = threading.Barrier(2, timeout=2)
+        liberar = threading.Event()
+
+        def responder(contexto):
+            if "Sucursal NTE" in contexto:
+                liberar.wait(2)
+                return _respuesta_ok(contexto)
+            # Solo pasa si MAT y CEN están en vuelo al mismo tiempo.
+            barrera.wait()
+            return _respuesta_ok(contexto)
+
+        try:
+            resultados = analizar_todas_sucursales(
+                periodo=self.periodo,
+                client=_FakeModelClient(responder),
+                max_workers=3,
+                timeout=0.5,
+            )
+        finally:
+            liberar.set()
+
+        por_sucursal = {r["sucursal"]: r for r in resultados}
+        self.assertTrue(por_sucursal["MAT - Sucursal MAT"]["ok"])
+        self.assertTrue(por_sucursal["CEN - Sucursal CEN"]["ok"])
+        self.assertEqual(por_sucursal["NTE - Sucursal NTE"], {"sucursal": "NTE - Sucursal NTE", "error": "timeout", "ok": False})
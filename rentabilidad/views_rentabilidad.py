@@ -20,6 +20,7 @@ import calendar
 
 from .models_rentabilidad import SucursalRentabilidad, EstadoRentabilidad
 from core.access import can_manage_rentabilidad, can_view_rentabilidad
+from core.db_routing import replica_view
 from ventas.services.sales_read_service import (
     get_point_sales_period_summary,
     get_point_sales_product_panel_rows,
@@ -319,6 +320,7 @@ def _build_alertas_panel(sucursales_data, productos_panel, gastos_panel, max_sal
 
 
 @login_required
+@replica_view()
 def dashboard_rentabilidad(request):
     _require_view_rentabilidad(request.user)
     periodo = _get_periodo(request)
@@ -14,6 +14,8 @@ from reportes.models import (
     EmpresaResultadoMensual,
     ExpansionPolicyConfig,
     ExpansionZoneScore,
+    ForecastBacktestResult,
+    ForecastBacktestRun,
     ForecastCalibrationProfile,
     GastoOperativoMensual,
     GastoRecurrente,
@@ -414,6 +416,30 @@ class ForecastCalibrationProfileAdmin(admin.ModelAdmin):
     search_fields = ("familia", "sucursal__codigo", "sucursal__nombre")
 
 
+@admin.register(ForecastBacktestRun)
+class ForecastBacktestRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "reference_date", "status", "series_count", "origins", "step_days", "workers", "elapsed_seconds", "created_at")
+    list_filter = ("status", "reference_date")
+
+
+@admin.register(ForecastBacktestResult)
+class ForecastBacktestResultAdmin(admin.ModelAdmin):
+    list_display = (
+        "run",
+        "method",
+        "horizon_days",
+        "sucursal",
+        "familia",
+        "observations",
+        "mape_pct",
+        "wape_pct",
+        "bias_pct",
+        "fit_seconds",
+    )
+    list_filter = ("method", "horizon_days", "sucursal")
+    search_fields = ("familia", "sucursal__codigo")
+
+
 @admin.register(Alert)
 class AlertAdmin(admin.ModelAdmin):
     list_display = (
@@ -27,6 +27,7 @@ from reportes.models import (
     ForecastInput,
     ProductoCostoOperativoMensual,
 )
+from reportes.consumo_teorico_service import refresh_consumo_teorico
 from reportes.dashboard_full_dataset import (
     ALLOWED_MONTH_WINDOWS,
     build_dashboard_full_payload,
@@ -92,6 +93,7 @@ class RefreshSummary:
     production_rows: int = 0
     forecast_rows: int = 0
     calibration_rows: int = 0
+    consumption_rows: int = 0
 
 
 def mark_analytics_dirty(
@@ -147,6 +149,7 @@ def mark_analytics_dirty_for_range(
     include_inventory: bool = False,
     include_production: bool = False,
     include_forecast: bool = False,
+    include_consumption: bool = False,
     reason: str,
 ) -> None:
     datasets: list[str] = []
@@ -160,6 +163,8 @@ def mark_analytics_dirty_for_range(
         datasets.append(AnalyticRefreshWindow.DATASET_SNAPSHOT_FLOW)
     if include_forecast:
         datasets.append(AnalyticRefreshWindow.DATASET_FORECAST)
+    if include_consumption:
+        datasets.append(AnalyticRefreshWindow.DATASET_CONSUMO_TEORICO)
     for dataset in datasets:
         mark_analytics_dirty(dataset=dataset, date_from=start_date, date_to=end_date, reason=reason)
 
@@ -909,6 +914,7 @@ def refresh_incremental(*, reference_date: date | None = None, lookback_days: in
     summary.calibration_rows = int(
         rebuild_forecast_calibration_profiles(reference_date=reference_date).get("segments") or 0
     )
+    summary.consumption_rows = refresh_consumo_teorico(start_date=start_date, end_date=reference_date)
     audit_sales_fact_consistency(start_date=start_date, end_date=reference_date)
     refresh_dashboard_daily_ops_materialized_view()
     refresh_dashboard_full_materialized_view()
@@ -938,6 +944,7 @@ def full_rebuild(*, start_date: date | None = None, end_date: date | None = None
     summary.calibration_rows = int(
         rebuild_forecast_calibration_profiles(reference_date=end_date).get("segments") or 0
     )
+    summary.consumption_rows = refresh_consumo_teorico(start_date=start_date, end_date=end_date)
     audit_sales_fact_consistency(start_date=start_date, end_date=end_date)
     refresh_dashboard_daily_ops_materialized_view()
     refresh_dashboard_full_materialized_view()
@@ -10,7 +10,7 @@ from django.db import transaction
 from django.db.models import Sum
 
 from compras.models import SolicitudCompra
-from core.audit import log_event
+from core.audit import audit_batch, log_event
 from core.models import Sucursal
 from inventario.models import ExistenciaInsumo
 from maestros.models import CostoInsumo, Insumo
@@ -290,6 +290,7 @@ def _priority_score(
     return score.quantize(Decimal("0.01"))
 
 
+@audit_batch()
 def generate_purchase_requests_from_production(
     target_date: date,
     *,
@@ -0,0 +1,397 @@
+"""
+Consumo teórico diario de insumos (``FactConsumoTeoricoDiario``).
+
+Cada receta planeada, vendida o mermada se explota a varios niveles: un insumo
+interno con receta de preparación se sustituye por las líneas de esa
+preparación escaladas por su rendimiento, hasta llegar a insumos de compra.
+Las filas guardan el insumo hoja (el de la línea de receta), no el canónico:
+quien lee las canonicaliza con el mapa vigente, el mismo que aplica a las
+existencias, así que reagrupar, renombrar o desactivar insumos del catálogo no
+deja ids canónicos viejos en el hecho. Lo que sí cambia la explosión (tipo de
+insumo, su preparación, la BOM) marca pendientes las fechas de las recetas
+afectadas.
+
+El hecho se mantiene con ventanas ``AnalyticRefreshWindow`` del dataset
+``FACT_CONSUMO_TEORICO``. Las ventanas pendientes las reconstruye el refresh
+analítico de Celery y quedan ``DONE``; la unión de ventanas ``DONE`` (fusionadas
+al registrarse) es la cobertura del hecho. Al consultar un rango solo se
+reconstruye lo que cae dentro de él: los huecos sin cobertura y el tramo de las
+ventanas pendientes que lo cruza; el resto de la ventana sigue pendiente.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Q, Sum
+
+from control.models import MermaPOS, VentaPOS
+from maestros.models import Insumo
+from recetas.models import LineaReceta, PlanProduccionItem, Receta
+from recetas.utils.costeo_snapshot import resolve_preparation_recipe_for_insumo
+from reportes.models import AnalyticRefreshWindow, FactConsumoTeoricoDiario
+from reportes.production_projection_supply_service import _convert_quantity, _line_unit
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+DATASET = AnalyticRefreshWindow.DATASET_CONSUMO_TEORICO
+# Serializa reconstrucciones concurrentes del hecho (refresh y reportes a la vez).
+_REBUILD_LOCK_ID = 804_117_041
+_OPEN_STATUSES = [AnalyticRefreshWindow.STATUS_PENDING, AnalyticRefreshWindow.STATUS_ERROR]
+
+
+class BomExploder:
+    """Vector de insumos hoja por unidad de receta, con preparaciones explotadas."""
+
+    def __init__(self):
+        self._vectors: dict[int, dict[int, Decimal]] = {}
+        self._preparations: dict[int, Receta | None] = {}
+
+    def _preparation(self, insumo: Insumo) -> Receta | None:
+        if insumo.id not in self._preparations:
+            self._preparations[insumo.id] = resolve_preparation_recipe_for_insumo(insumo)
+        return self._preparations[insumo.id]
+
+    def vector(self, receta_id: int, _active: tuple[int, ...] = ()) -> dict[int, Decimal]:
+        if receta_id in self._vectors:
+            return self._vectors[receta_id]
+        active = (*_active, receta_id)
+        totals: dict[int, Decimal] = defaultdict(lambda: ZERO)
+        lines = LineaReceta.objects.filter(
+            receta_id=receta_id,
+            insumo_id__isnull=False,
+            cantidad__isnull=False,
+        ).select_related("insumo__unidad_base", "unidad")
+        for line in lines:
+            quantity = Decimal(str(line.cantidad))
+            child = self._explode_preparation(line, quantity, active)
+            if child is None:
+                totals[line.insumo_id] += quantity
+                continue
+            for insumo_id, amount in child.items():
+                totals[insumo_id] += amount
+        self._vectors[receta_id] = dict(totals)
+        return self._vectors[receta_id]
+
+    def _explode_preparation(self, line: LineaReceta, quantity: Decimal, active: tuple[int, ...]) -> dict[int, Decimal] | None:
+        """Insumos de la preparación para ``quantity`` del insumo interno; ``None`` si queda como hoja."""
+        insumo = line.insumo
+        if insumo.tipo_item != Insumo.TIPO_INTERNO or quantity <= ZERO:
+            return None
+        preparation = self._preparation(insumo)
+        if preparation is None or preparation.id in active:
+            return None
+        yield_qty = Decimal(str(preparation.rendimiento_cantidad or 0))
+        line_unit = _line_unit(line)
+        required = _convert_quantity(
+            quantity,
+            source_unit=line_unit,
+            target_unit=preparation.rendimiento_unidad or line_unit,
+        )
+        if required is None or yield_qty <= ZERO:
+            return None
+        child = self.vector(preparation.id, active)
+        if not child:
+            return None
+        multiplier = required / yield_qty
+        return {insumo_id: amount * multiplier for insumo_id, amount in child.items()}
+
+
+def _lock_rebuild() -> None:
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [_REBUILD_LOCK_ID])
+
+
+def rebuild_consumo_teorico(*, start_date: date, end_date: date, exploder: BomExploder | None = None) -> int:
+    exploder = exploder or BomExploder()
+    sources = [
+        (
+            FactConsumoTeoricoDiario.FUENTE_PLAN,
+            PlanProduccionItem.objects.filter(plan__fecha_produccion__range=(start_date, end_date))
+            .values("plan__fecha_produccion", "receta_id")
+            .annotate(total=Sum("cantidad")),
+            "plan__fecha_produccion",
+            None,
+        ),
+        (
+            FactConsumoTeoricoDiario.FUENTE_VENTA,
+            VentaPOS.objects.filter(fecha__range=(start_date, end_date), receta__isnull=False)
+            .values("fecha", "sucursal_id", "receta_id")
+            .annotate(total=Sum("cantidad")),
+            "fecha",
+            "sucursal_id",
+        ),
+        (
+            FactConsumoTeoricoDiario.FUENTE_MERMA,
+            MermaPOS.objects.filter(fecha__range=(start_date, end_date), receta__isnull=False)
+            .values("fecha", "sucursal_id", "receta_id")
+            .annotate(total=Sum("cantidad")),
+            "fecha",
+            "sucursal_id",
+        ),
+    ]
+    buckets: dict[tuple[date, int | None, int, str], Decimal] = defaultdict(lambda: ZERO)
+    for fuente, rows, day_field, branch_field in sources:
+        for row in rows:
+            total = Decimal(str(row.get("total") or 0))
+            if not total:
+                continue
+            branch_id = row[branch_field] if branch_field else None
+            for insumo_id, per_unit in exploder.vector(int(row["receta_id"])).items():
+                buckets[(row[day_field], branch_id, insumo_id, fuente)] += total * per_unit
+
+    fact_rows = [
+        FactConsumoTeoricoDiario(fecha=day, sucursal_id=branch_id, insumo_id=insumo_id, fuente=fuente, cantidad=amount)
+        for (day, branch_id, insumo_id, fuente), amount in buckets.items()
+        if amount
+    ]
+    with transaction.atomic():
+        _lock_rebuild()
+        FactConsumoTeoricoDiario.objects.filter(fecha__range=(start_date, end_date)).delete()
+        if fact_rows:
+            FactConsumoTeoricoDiario.objects.bulk_create(fact_rows, batch_size=1000)
+    return len(fact_rows)
+
+
+def _record_coverage(
+    *,
+    start_date: date,
+    end_date: date,
+    reason: str,
+    window: AnalyticRefreshWindow | None = None,
+) -> AnalyticRefreshWindow:
+    """Marca el rango como cubierto fusionando las ventanas ``DONE`` que lo tocan en una sola fila."""
+    one_day = timedelta(days=1)
+    with transaction.atomic():
+        touching = list(
+            AnalyticRefreshWindow.objects.select_for_update()
+            .filter(
+                dataset=DATASET,
+                status=AnalyticRefreshWindow.STATUS_DONE,
+                date_from__lte=end_date + one_day,
+                date_to__gte=start_date - one_day,
+            )
+            .exclude(pk=window.pk if window is not None else None)
+            .order_by("date_from", "id")
+        )
+        merged_from = min([start_date, *(row.date_from for row in touching)])
+        merged_to = max([end_date, *(row.date_to for row in touching)])
+        if window is None:
+            window = touching.pop(0) if touching else AnalyticRefreshWindow(dataset=DATASET)
+        window.date_from, window.date_to = merged_from, merged_to
+        window.reason = reason[:160]
+        window.status = AnalyticRefreshWindow.STATUS_DONE
+        window.last_error = ""
+        window.save()
+        if touching:
+            AnalyticRefreshWindow.objects.filter(pk__in=[row.pk for row in touching]).delete()
+    return window
+
+
+def _merge_ranges(ranges: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    merged: list[tuple[date, date]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _release_slice(window: AnalyticRefreshWindow, *, date_from: date, date_to: date) -> None:
+    """Quita de una ventana pendiente el tramo ya reconstruido; lo que quede fuera sigue pendiente."""
+    before = (window.date_from, date_from - timedelta(days=1)) if window.date_from < date_from else None
+    after = (date_to + timedelta(days=1), window.date_to) if window.date_to > date_to else None
+    if before is None and after is None:
+        _record_coverage(start_date=window.date_from, end_date=window.date_to, reason=window.reason, window=window)
+        return
+    if before and after:
+        AnalyticRefreshWindow.objects.create(
+            dataset=DATASET,
+            date_from=after[0],
+            date_to=after[1],
+            reason=window.reason,
+            metadata=window.metadata,
+            status=window.status,
+            last_error=window.last_error,
+        )
+    window.date_from, window.date_to = before or after
+    window.save(update_fields=["date_from", "date_to", "updated_at"])
+
+
+def refresh_consumo_teorico_windows(
+    *,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    exploder: BomExploder | None = None,
+) -> int:
+    """Reconstruye las ventanas pendientes del dataset (todas o las que tocan el rango)."""
+    windows = AnalyticRefreshWindow.objects.filter(dataset=DATASET, status__in=_OPEN_STATUSES).order_by("date_from", "id")
+    if date_from and date_to:
+        windows = windows.filter(date_from__lte=date_to, date_to__gte=date_from)
+    exploder = exploder or BomExploder()
+    rows = 0
+    for window in windows:
+        try:
+            rows += rebuild_consumo_teorico(start_date=window.date_from, end_date=window.date_to, exploder=exploder)
+        except Exception as exc:
+            window.status = AnalyticRefreshWindow.STATUS_ERROR
+            window.last_error = str(exc)[:1000]
+            window.save(update_fields=["status", "last_error", "updated_at"])
+            raise
+        _record_coverage(start_date=window.date_from, end_date=window.date_to, reason=window.reason, window=window)
+    return rows
+
+
+def coverage_gaps(*, date_from: date, date_to: date) -> list[tuple[date, date]]:
+    covered = AnalyticRefreshWindow.objects.filter(
+        dataset=DATASET,
+        status=AnalyticRefreshWindow.STATUS_DONE,
+        date_from__lte=date_to,
+        date_to__gte=date_from,
+    ).order_by("date_from").values_list("date_from", "date_to")
+    gaps: list[tuple[date, date]] = []
+    cursor = date_from
+    for window_from, window_to in covered:
+        if window_from > cursor:
+            gaps.append((cursor, min(window_from - timedelta(days=1), date_to)))
+        cursor = max(cursor, window_to + timedelta(days=1))
+        if cursor > date_to:
+            break
+    if cursor <= date_to:
+        gaps.append((cursor, date_to))
+    return gaps
+
+
+def ensure_consumo_teorico(*, date_from: date, date_to: date) -> dict[str, int]:
+    """Deja el hecho vigente para el rango sin salirse de él.
+
+    Corre dentro de reportes: una ventana pendiente de años (un cambio de BOM
+    de una preparación) solo se reconstruye en el tramo pedido y el resto queda
+    para el refresh de Celery.
+    """
+    windows = list(
+        AnalyticRefreshWindow.objects.filter(
+            dataset=DATASET,
+            status__in=_OPEN_STATUSES,
+            date_from__lte=date_to,
+            date_to__gte=date_from,
+        ).order_by("date_from", "id")
+    )
+    gaps = coverage_gaps(date_from=date_from, date_to=date_to)
+    segments = _merge_ranges(
+        [(max(window.date_from, date_from), min(window.date_to, date_to)) for window in windows] + gaps
+    )
+    exploder = BomExploder()
+    rows = 0
+    for segment_from, segment_to in segments:
+        rows += rebuild_consumo_teorico(start_date=segment_from, end_date=segment_to, exploder=exploder)
+        _record_coverage(start_date=segment_from, end_date=segment_to, reason="cobertura consumo teórico")
+    for window in windows:
+        _release_slice(window, date_from=date_from, date_to=date_to)
+    if segments:
+        logger.debug("Consumo teórico construido en %s tramos entre %s y %s", len(segments), date_from, date_to)
+    return {"rows": rows, "gaps": len(gaps)}
+
+
+def refresh_consumo_teorico(*, start_date: date, end_date: date) -> int:
+    """Paso del refresh analítico: ventanas pendientes más el rango de lookback."""
+    exploder = BomExploder()
+    rows = refresh_consumo_teorico_windows(exploder=exploder)
+    rows += rebuild_consumo_teorico(start_date=start_date, end_date=end_date, exploder=exploder)
+    _record_coverage(start_date=start_date, end_date=end_date, reason="refresh analítico")
+    return rows
+
+
+def recipes_affected_by_bom_change(receta: Receta) -> set[int]:
+    """La receta y, si es preparación, las que la usan como insumo interno (a cualquier nivel)."""
+    affected = {receta.id}
+    pending = [receta] if receta.tipo == Receta.TIPO_PREPARACION else []
+    while pending:
+        preparation = pending.pop()
+        # Mismos criterios que ``resolve_preparation_recipe_for_insumo``, de insumo a receta.
+        matches = Q(codigo=f"DERIVADO:RECETA:{preparation.id}:PREPARACION")
+        if preparation.codigo_point:
+            matches |= Q(codigo_point__iexact=preparation.codigo_point)
+        if preparation.nombre_normalizado:
+            matches |= Q(nombre_normalizado=preparation.nombre_normalizado)
+            matches |= Q(nombre_point__iexact=preparation.nombre)
+        users = (
+            Receta.objects.filter(
+                lineas__insumo__in=Insumo.objects.filter(matches, tipo_item=Insumo.TIPO_INTERNO),
+            )
+            .exclude(id__in=affected)
+            .only("id", "tipo", "codigo_point", "nombre", "nombre_normalizado")
+            .distinct()
+        )
+        for user in users:
+            affected.add(user.id)
+            if user.tipo == Receta.TIPO_PREPARACION:
+                pending.append(user)
+    return affected
+
+
+def mark_consumo_teorico_dirty_for_recipe(receta_id: int, *, reason: str, previous: dict | None = None) -> None:
+    """
+    Un cambio de BOM afecta el historial de la receta y de las recetas que usan la preparación.
+
+    ``previous`` trae ``tipo``, ``codigo_point`` y ``nombre_normalizado`` de
+    antes del cambio: los insumos que resolvían a la preparación con esos
+    valores y ya no lo hacen también cambian su explosión.
+    """
+    receta = Receta.objects.filter(pk=receta_id).only("id", "tipo", "codigo_point", "nombre", "nombre_normalizado").first()
+    if receta is None:
+        return
+    recipe_ids = recipes_affected_by_bom_change(receta)
+    if previous:
+        recipe_ids |= recipes_affected_by_bom_change(Receta(id=receta.id, nombre=receta.nombre, **previous))
+    _mark_recipes_dirty(recipe_ids, reason=reason)
+
+
+def mark_consumo_teorico_dirty_for_insumo(insumo_id: int, *, reason: str) -> None:
+    """
+    Un cambio de tipo o de la preparación a la que resuelve el insumo cambia la
+    explosión de las recetas que lo usan (y, si son preparaciones, de las que
+    las usan a ellas).
+    """
+    recipe_ids: set[int] = set()
+    users = (
+        Receta.objects.filter(lineas__insumo_id=insumo_id)
+        .only("id", "tipo", "codigo_point", "nombre", "nombre_normalizado")
+        .distinct()
+    )
+    for receta in users:
+        if receta.id not in recipe_ids:
+            recipe_ids |= recipes_affected_by_bom_change(receta)
+    _mark_recipes_dirty(recipe_ids, reason=reason)
+
+
+def _mark_recipes_dirty(recipe_ids: set[int], *, reason: str) -> None:
+    from reportes.analytics_service import mark_analytics_dirty
+
+    if not recipe_ids:
+        return
+    bounds = []
+    for queryset, field in (
+        (PlanProduccionItem.objects.filter(receta_id__in=recipe_ids), "plan__fecha_produccion"),
+        (VentaPOS.objects.filter(receta_id__in=recipe_ids), "fecha"),
+        (MermaPOS.objects.filter(receta_id__in=recipe_ids), "fecha"),
+    ):
+        first = queryset.order_by(field).values_list(field, flat=True).first()
+        last = queryset.order_by(f"-{field}").values_list(field, flat=True).first()
+        if first and last:
+            bounds.append((first, last))
+    if bounds:
+        mark_analytics_dirty(
+            dataset=DATASET,
+            date_from=min(first for first, _ in bounds),
+            date_to=max(last for _, last in bounds),
+            reason=reason,
+        )
@@ -7,11 +7,13 @@ from datetime import date, datetime, time, timedelta
 from decimal import Decimal, InvalidOperation
 from functools import lru_cache
 import json
+import logging
 from pathlib import Path
 import sys
 
 from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Count, Max, Min, Q, Sum
 from django.utils import timezone
 from unidecode import unidecode
@@ -31,6 +33,15 @@ from pos_bridge.services.sales_matching_service import PointSalesMatchingService
 from recetas.models import RecetaCostoSemanal
 from reportes.models import FactVentaDiaria, SnapshotFlujoCentralMensual, SnapshotLedgerInventarioMensual
 from reportes.dashboard_production_dataset import get_dashboard_production_dataset
+from reportes.panel_precompute import (
+    PanelSpec,
+    acquire_refresh_lock,
+    panel_status,
+    precompute_enabled,
+    rebuild_panel,
+    release_refresh_lock,
+    serve_panel,
+)
 from ventas.services.sales_canonical_source import canonical_point_sales_range_total
 
 
@@ -42,6 +53,8 @@ RECENT_POINT_SOURCE = "/Report/VentasCategorias"
 OFFICIAL_PARTIAL_CACHE_PATH = Path("storage/pos_bridge/reports/official_partial_sales_cache.json")
 DASHBOARD_CACHE_TTL_SECONDS = int(getattr(settings, "ERP_DASHBOARD_CACHE_TTL_SECONDS", 900) or 900)
 
+logger = logging.getLogger(__name__)
+
 
 def _to_decimal(value, default: str = "0") -> Decimal:
     try:
@@ -2761,33 +2774,181 @@ def build_branch_pricing_panel(*, year: int | None = None, branch_id: int | None
     }
 
 
-def build_executive_bi_panels(
+EXECUTIVE_PANEL_SPECS: dict[str, PanelSpec] = {
+    spec.name: spec
+    for spec in (
+        PanelSpec("forecast_panel", build_sales_forecast_panel, ("ventas",), ("FactVentaDiaria", "PointDailyBranchIndicator")),
+        PanelSpec("yoy_panel", build_monthly_yoy_panel, ("ventas",), ("PointMonthlySalesOfficial", "PointDailySale")),
+        PanelSpec(
+            "profitability_panel",
+            build_profitability_panel,
+            ("ventas", "insumos"),
+            ("FactVentaDiaria", "RecetaCostoSemanal"),
+        ),
+        PanelSpec(
+            "branch_contribution_panel",
+            build_branch_contribution_panel,
+            ("ventas", "presupuesto"),
+            ("ProductoSucursalContribucionMensual",),
+        ),
+        PanelSpec(
+            "branch_pricing_panel",
+            build_branch_pricing_panel,
+            ("ventas", "presupuesto"),
+            ("ProductoSucursalContribucionMensual",),
+        ),
+        PanelSpec(
+            "production_sales_panel",
+            build_production_vs_sales_panel,
+            ("ventas",),
+            ("PointProductionLine", "PointDailySale"),
+        ),
+        PanelSpec(
+            "central_flow_panel",
+            build_central_flow_panel,
+            ("ventas", "inventario"),
+            ("SnapshotFlujoCentralMensual", "PointTransferLine"),
+        ),
+        PanelSpec(
+            "inventory_ledger_panel",
+            build_monthly_inventory_ledger_panel,
+            ("ventas", "inventario"),
+            ("SnapshotLedgerInventarioMensual", "PointInventorySnapshot"),
+        ),
+        PanelSpec(
+            "budget_operating_panel",
+            build_budget_operating_panel,
+            ("ventas", "presupuesto"),
+            ("PresupuestoLineaMensual", "EmpresaResultadoMensual", "ProductoPricingDecisionMensual"),
+        ),
+    )
+}
+
+
+def _executive_panel_requests(
     *,
-    latest_date: date | None = None,
-    months: int = 6,
-    branch_id: int | None = None,
-    action_filter: str | None = None,
-    budget_month: int | None = None,
-) -> dict[str, object]:
+    latest_date: date | None,
+    months: int,
+    branch_id: int | None,
+    action_filter: str | None,
+    budget_month: int | None,
+) -> tuple[date, dict[str, tuple[dict[str, object], dict[str, object]]]]:
+    """Fecha de corte y, por panel, ``(identidad, parámetros)``.
+
+    La identidad distingue variantes del mismo panel (ventana, sucursal, filtro);
+    las fechas de corte resueltas van solo en los parámetros, así que al avanzar
+    el corte se sirve el resultado anterior mientras se recalcula.
+    """
     trusted_sales_latest = latest_date or _sales_cutoff_date() or (timezone.localdate() - timedelta(days=1))
     yoy_latest_date = max(
         trusted_sales_latest,
         _partial_sales_cache_latest_end() or trusted_sales_latest,
     )
     common_flow_date = _common_flow_cutoff_date() or trusted_sales_latest
-    return {
-        "latest_cutoff_date": trusted_sales_latest,
-        "forecast_panel": build_sales_forecast_panel(latest_date=trusted_sales_latest),
-        "yoy_panel": build_monthly_yoy_panel(latest_date=yoy_latest_date, months=months),
-        "profitability_panel": build_profitability_panel(latest_date=trusted_sales_latest),
-        "branch_contribution_panel": build_branch_contribution_panel(year=trusted_sales_latest.year),
-        "branch_pricing_panel": build_branch_pricing_panel(
-            year=trusted_sales_latest.year,
-            branch_id=branch_id,
-            action_filter=action_filter,
+    anchor = {"anchor": latest_date.isoformat()} if latest_date else {}
+    requests = {
+        "forecast_panel": ({}, {"latest_date": trusted_sales_latest}),
+        "yoy_panel": ({"months": months}, {"latest_date": yoy_latest_date, "months": months}),
+        "profitability_panel": ({}, {"latest_date": trusted_sales_latest}),
+        "branch_contribution_panel": ({}, {"year": trusted_sales_latest.year}),
+        "branch_pricing_panel": (
+            {"branch_id": branch_id, "action_filter": action_filter or ""},
+            {"year": trusted_sales_latest.year, "branch_id": branch_id, "action_filter": action_filter},
         ),
-        "production_sales_panel": build_production_vs_sales_panel(latest_date=common_flow_date),
-        "central_flow_panel": build_central_flow_panel(latest_date=common_flow_date, months=months),
-        "inventory_ledger_panel": build_monthly_inventory_ledger_panel(latest_date=common_flow_date, months=months),
-        "budget_operating_panel": build_budget_operating_panel(year=trusted_sales_latest.year, selected_month=budget_month),
+        "production_sales_panel": ({}, {"latest_date": common_flow_date}),
+        "central_flow_panel": ({"months": months}, {"latest_date": common_flow_date, "months": months}),
+        "inventory_ledger_panel": ({"months": months}, {"latest_date": common_flow_date, "months": months}),
+        "budget_operating_panel": (
+            {"selected_month": budget_month},
+            {"year": trusted_sales_latest.year, "selected_month": budget_month},
+        ),
+    }
+    return trusted_sales_latest, {
+        name: ({**anchor, **identity}, params) for name, (identity, params) in requests.items()
     }
+
+
+def _enqueue_panel_refresh(panels: list[str], request_kwargs: dict[str, object]) -> None:
+    from reportes.tasks import task_precompute_executive_panels
+
+    if not acquire_refresh_lock("executive", request_kwargs):
+        return
+    try:
+        task_precompute_executive_panels.delay(panels=panels, **request_kwargs)
+    except Exception:
+        # Sin broker se sigue sirviendo el último resultado; el beat lo recalcula.
+        logger.warning("No se pudo encolar el precálculo de paneles ejecutivos.", exc_info=True)
+        release_refresh_lock("executive", request_kwargs)
+
+
+def build_executive_bi_panels(
+    *,
+    latest_date: date | None = None,
+    months: int = 6,
+    branch_id: int | None = None,
+    action_filter: str | None = None,
+    budget_month: int | None = None,
+) -> dict[str, object]:
+    trusted_sales_latest, requests = _executive_panel_requests(
+        latest_date=latest_date,
+        months=months,
+        branch_id=branch_id,
+        action_filter=action_filter,
+        budget_month=budget_month,
+    )
+    panels: dict[str, object] = {"latest_cutoff_date": trusted_sales_latest}
+    if not precompute_enabled():
+        for name, (_identity, params) in requests.items():
+            panels[name] = EXECUTIVE_PANEL_SPECS[name].builder(**params)
+        return panels
+
+    stale_panels = []
+    for name, (identity, params) in requests.items():
+        panels[name], stale = serve_panel(EXECUTIVE_PANEL_SPECS[name], identity=identity, params=params)
+        if stale:
+            stale_panels.append(name)
+    if stale_panels:
+        request_kwargs = {
+            "latest_date": latest_date.isoformat() if latest_date else None,
+            "months": months,
+            "branch_id": branch_id,
+            "action_filter": action_filter,
+            "budget_month": budget_month,
+        }
+        transaction.on_commit(lambda: _enqueue_panel_refresh(stale_panels, request_kwargs))
+    return panels
+
+
+def refresh_executive_panels(
+    *,
+    panels: list[str] | None = None,
+    latest_date: date | None = None,
+    months: int = 6,
+    branch_id: int | None = None,
+    action_filter: str | None = None,
+    budget_month: int | None = None,
+    force: bool = False,
+) -> dict[str, dict[str, object]]:
+    """Reconstruye los paneles vencidos (o todos con ``force``) y devuelve su estado."""
+    _latest, requests = _executive_panel_requests(
+        latest_date=latest_date,
+        months=months,
+        branch_id=branch_id,
+        action_filter=action_filter,
+        budget_month=budget_month,
+    )
+    summary: dict[str, dict[str, object]] = {}
+    for name, (identity, params) in requests.items():
+        if panels and name not in panels:
+            continue
+        spec = EXECUTIVE_PANEL_SPECS[name]
+        rebuilt = False
+        if force or panel_status(spec, identity=identity, params=params)["stale"]:
+            try:
+                rebuild_panel(spec, identity=identity, params=params)
+                rebuilt = True
+            except Exception:
+                # El error queda en el registro del panel; se sigue con los demás.
+                pass
+        summary[name] = {**panel_status(spec, identity=identity, params=params), "rebuilt": rebuilt}
+    return summary
@@ -0,0 +1,131 @@
+"""
+Motor de arreglos para el pronóstico diario por sucursal/receta.
+
+Las series diarias se cargan una sola vez en matrices densas (clave × día) y
+las ventanas, factores y métricas de todas las claves se calculan en bloque
+con NumPy. Un día sin venta vale cero, igual que ``series.get(day, ZERO)`` en
+el cálculo escalar. ``Decimal`` solo aparece al construir las filas de salida
+(``decimal_at``), con el mismo redondeo bancario del contexto por defecto.
+"""
+
+from __future__ import annotations
+
+import warnings
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+ROBUST_HIGH_MULTIPLIER = 2.25
+# Dígitos que se descartan antes de redondear para que el ruido binario de
+# float64 no cambie el lado de un empate (p. ej. 1.0005 -> 1.000499999...).
+_NOISE_DECIMALS = 6
+
+
+class DailyMatrix:
+    """Cantidades e ingresos diarios por clave; la columna 0 es ``start``."""
+
+    def __init__(self, keys: list, start: date, end: date):
+        self.keys = list(keys)
+        self.start = start
+        self.positions = {key: index for index, key in enumerate(self.keys)}
+        days = max((end - start).days + 1, 1)
+        self.qty = np.zeros((len(self.keys), days), dtype=np.float64)
+        self.revenue = np.zeros((len(self.keys), days), dtype=np.float64)
+
+    @property
+    def days(self) -> int:
+        return self.qty.shape[1]
+
+    def day_index(self, day: date) -> int:
+        return (day - self.start).days
+
+    def weekday(self, day_indexes: np.ndarray) -> np.ndarray:
+        return (self.start.weekday() + np.asarray(day_indexes)) % 7
+
+    def set(self, key, day: date, qty, revenue=0) -> None:
+        column = self.day_index(day)
+        if 0 <= column < self.days:
+            row = self.positions[key]
+            self.qty[row, column] = float(qty or 0)
+            self.revenue[row, column] = float(revenue or 0)
+
+    def positive_days_before(self, rows: np.ndarray, anchors: np.ndarray) -> np.ndarray:
+        """Días con venta positiva estrictamente antes de cada ancla."""
+        counts = np.concatenate(
+            [np.zeros((self.qty.shape[0], 1), dtype=np.int64), np.cumsum(self.qty > 0, axis=1)],
+            axis=1,
+        )
+        return counts[rows, np.clip(anchors, 0, self.days)]
+
+
+def gather(values: np.ndarray, rows: np.ndarray, anchors: np.ndarray, offsets) -> np.ndarray:
+    """
+    ``values[row, anchor - offset]`` para cada observación.
+
+    ``offsets`` es común (1-D) o uno por observación (2-D); fuera de la matriz vale cero.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets.ndim == 1:
+        offsets = offsets[None, :]
+    columns = np.asarray(anchors, dtype=np.int64)[:, None] - offsets
+    inside = (columns >= 0) & (columns < values.shape[1])
+    picked = values[np.asarray(rows)[:, None], np.clip(columns, 0, values.shape[1] - 1)]
+    return np.where(inside, picked, 0.0)
+
+
+def window(values: np.ndarray, rows: np.ndarray, anchors: np.ndarray, start_offset: int, end_offset: int) -> np.ndarray:
+    return gather(values, rows, anchors, np.arange(start_offset, end_offset + 1))
+
+
+def mean(values: np.ndarray) -> np.ndarray:
+    if values.shape[1] == 0:
+        return np.zeros(values.shape[0])
+    return values.mean(axis=1)
+
+
+def stddev(values: np.ndarray) -> np.ndarray:
+    """Desviación poblacional por fila."""
+    if values.shape[1] == 0:
+        return np.zeros(values.shape[0])
+    return values.std(axis=1)
+
+
+def robust_values(values: np.ndarray, high_multiplier: float = ROBUST_HIGH_MULTIPLIER) -> np.ndarray:
+    """Topa los picos positivos a ``mediana_positiva × high_multiplier`` por fila."""
+    positive = values > 0
+    with warnings.catch_warnings():
+        # Filas sin ningún día positivo no se topan.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(np.where(positive, values, np.nan), axis=1)
+    median = np.nan_to_num(median, nan=0.0)[:, None]
+    return np.where(positive & (median > 0), np.minimum(values, median * high_multiplier), values)
+
+
+def robust_mean(values: np.ndarray) -> np.ndarray:
+    return mean(robust_values(values))
+
+
+def robust_stddev(values: np.ndarray) -> np.ndarray:
+    return stddev(robust_values(values))
+
+
+def ratio_or(numerator: np.ndarray, denominator: np.ndarray, *, default: float = 0.0) -> np.ndarray:
+    """``numerator / denominator`` donde el denominador es positivo; ``default`` en otro caso."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, default)
+
+
+def quantize(values, places: int) -> np.ndarray:
+    """Redondeo a ``places`` decimales con empates al par, como ``Decimal.quantize``."""
+    scale = 10.0**places
+    return np.rint(np.round(np.asarray(values, dtype=np.float64) * scale, _NOISE_DECIMALS)) / scale
+
+
+def decimal_at(value, places: int) -> Decimal:
+    number = float(quantize(value, places)) + 0.0
+    return Decimal(repr(number)).quantize(Decimal(1).scaleb(-places))
+
+
+def decimals_at(values, places: int) -> list[Decimal]:
+    return [decimal_at(value, places) for value in np.ravel(quantize(values, places))]
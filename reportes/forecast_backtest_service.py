@@ -0,0 +1,632 @@
+"""
+Backtest rolling-origin de los motores de forecast.
+
+Para cada origen ``o`` se pronostican los días ``o .. o + H - 1`` usando sólo
+ventas anteriores a ``o`` y se comparan contra la venta real de
+``FactVentaDiaria`` por sucursal/receta. Métodos comparados:
+
+- ``forecast-diario``: el motor de ``reportes/forecast_service`` (8 semanas),
+  con el perfil de calibración vigente en cada origen (el último
+  ``ForecastCalibrationProfile`` con ``reference_date`` anterior al origen).
+- ``forecast-operativo``: el mismo motor con la ventana de 3 semanas y el
+  redondeo a piezas de ``proyecciones_engine.calcular_proyeccion_operativa``,
+  calibrado igual.
+  El uplift de eventos y el escalamiento al total diario dependen del rango
+  completo y no entran al backtest.
+- ``ets``, ``prophet`` y ``promedio-simple``: los ajustes por serie de
+  ``ventas/services/pronostico_engine``. Prophet sólo corre si está instalado y
+  la serie tiene al menos 60 días, igual que ``_calcular_serie``.
+
+Los motores de arreglos se evalúan en bloque; los ajustes por serie se reparten
+en un pool de procesos de hasta ``FORECAST_BACKTEST_MAX_WORKERS``. Por método,
+horizonte y segmento (global, sucursal, familia) se guardan MAPE, WAPE, sesgo y
+tiempo de ajuste, para elegir método por segmento con evidencia.
+
+Un método que no pronostica una celda (Prophet con poca historia, un ajuste
+que falla) no puede competir con ventaja por saltarse las series difíciles:
+además de sus métricas propias, cada resultado guarda en ``metadata`` su
+cobertura y el WAPE/sesgo sobre las celdas (clave, origen, día) que todos los
+métodos comparables del segmento pronosticaron. Un método es comparable en un
+segmento si lo cubre al menos en ``MIN_COVERAGE_PCT``: Prophet sin historia en
+una familia no deja a esa familia sin celdas comunes. La recomendación usa esas
+métricas comunes y descarta métodos con cobertura menor a ``MIN_COVERAGE_PCT``.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+import django
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from recetas.models import Receta
+from reportes import forecast_arrays as fa
+from reportes.forecast_calibration_service import load_latest_calibration_profiles
+from reportes.forecast_service import (
+    DEFAULT_LOOKBACK_WEEKS,
+    _calibration_key,
+    _forecast_arrays,
+    _profile_settings,
+    _settings_arrays,
+)
+from reportes.models import (
+    AnalyticAuditLog,
+    FactVentaDiaria,
+    ForecastBacktestResult,
+    ForecastBacktestRun,
+    ForecastCalibrationProfile,
+)
+from ventas.services import pronostico_engine
+from ventas.services.proyecciones_engine import THREE_WEEK_LOOKBACK
+
+
+DEFAULT_HORIZONS = (1, 7, 14)
+DEFAULT_ORIGINS = 8
+DEFAULT_STEP_DAYS = 7
+DEFAULT_HISTORY_DAYS = 365
+DEFAULT_TOLERANCE_PCT = Decimal("1.00")
+MIN_COVERAGE_PCT = Decimal("90.00")
+MIN_POSITIVE_DAYS = 14
+# Ventana más larga que lee ``_forecast_arrays`` hacia atrás desde el ancla.
+ARRAY_WINDOW_DAYS = 56
+PROPHET_MIN_OBSERVATIONS = 60
+
+ARRAY_METHODS = {
+    ForecastBacktestResult.METHOD_FORECAST_DIARIO: DEFAULT_LOOKBACK_WEEKS,
+    ForecastBacktestResult.METHOD_FORECAST_OPERATIVO: THREE_WEEK_LOOKBACK,
+}
+SERIES_METHODS = (
+    ForecastBacktestResult.METHOD_ETS,
+    ForecastBacktestResult.METHOD_PROPHET,
+    ForecastBacktestResult.METHOD_PROMEDIO_SIMPLE,
+)
+DEFAULT_METHODS = tuple(method for method, _label in ForecastBacktestResult.METHOD_CHOICES)
+
+LEVEL_GLOBAL = "global"
+LEVEL_BRANCH = "sucursal"
+LEVEL_FAMILY = "familia"
+
+
+def _init_worker() -> None:
+    django.setup()
+
+
+def _series_forecasts(job: tuple) -> dict[str, dict[str, object]]:
+    """
+    Ajusta los métodos por serie de una clave en cada origen.
+
+    ``job`` = (venta diaria, fecha de la columna 0, columnas de origen, horizonte
+    máximo, días de historia, métodos). Por método regresa la matriz
+    orígenes × horizonte (NaN donde el método no aplica), los segundos de
+    ajuste, el número de ajustes y las etiquetas que reportó el motor.
+    """
+    import pandas as pd
+
+    values, start, origin_columns, max_horizon, history_days, methods = job
+    output = {
+        method: {
+            "forecast": np.full((len(origin_columns), max_horizon), np.nan),
+            "seconds": 0.0,
+            "fits": 0,
+            "labels": Counter(),
+        }
+        for method in methods
+    }
+    for position, column in enumerate(origin_columns):
+        history = values[max(column - history_days, 0) : column]
+        positive = np.flatnonzero(history > 0)
+        if not len(positive):
+            continue
+        # Igual que ``_series_from_history``: la serie arranca en la primera venta.
+        history = history[positive[0] :]
+        index = pd.date_range(start + timedelta(days=int(column) - len(history)), periods=len(history), freq="D")
+        serie_df = pd.DataFrame({"ds": index, "y": history})
+        origin = start + timedelta(days=int(column))
+        target_days = [origin + timedelta(days=offset) for offset in range(max_horizon)]
+        for method in methods:
+            if method == ForecastBacktestResult.METHOD_PROPHET and (
+                not pronostico_engine.PROPHET_AVAILABLE or len(serie_df) < PROPHET_MIN_OBSERVATIONS
+            ):
+                continue
+            started = time.perf_counter()
+            try:
+                if method == ForecastBacktestResult.METHOD_PROPHET:
+                    result = pronostico_engine._calcular_producto_prophet(
+                        serie_df, target_days, pronostico_engine.festivos_pollyanas()
+                    )
+                elif method == ForecastBacktestResult.METHOD_ETS:
+                    result = pronostico_engine._calcular_serie_ets(serie_df, target_days)
+                else:
+                    average = pronostico_engine._simple_average_forecast(pd.Series(history, index=index), max_horizon)
+                    result = {"recomendado": np.ceil(average.to_numpy(dtype=float)), "metodo": method}
+            except Exception:
+                output[method]["labels"]["error"] += 1
+                continue
+            output[method]["seconds"] += time.perf_counter() - started
+            output[method]["fits"] += 1
+            output[method]["labels"][result.get("metodo") or method] += 1
+            output[method]["forecast"][position] = np.asarray(result["recomendado"], dtype=np.float64)[:max_horizon]
+    return output
+
+
+def _calibration_profiles_as_of(origin_days: list[date]) -> tuple[list[dict], list[date | None]]:
+    """
+    Perfiles de calibración que el motor diario habría usado en cada origen.
+
+    Un perfil con ``reference_date`` R ya vio la venta de R, así que en el
+    origen ``o`` sólo vale el último con R < o.
+    """
+    reference_dates = sorted(
+        ForecastCalibrationProfile.objects.filter(reference_date__lt=origin_days[-1])
+        .values_list("reference_date", flat=True)
+        .distinct()
+    )
+    loaded: dict[date, dict] = {}
+    profiles, used = [], []
+    for origin in origin_days:
+        position = bisect_left(reference_dates, origin)
+        reference = reference_dates[position - 1] if position else None
+        if reference is not None and reference not in loaded:
+            loaded[reference] = load_latest_calibration_profiles(reference_date=reference)[0]
+        profiles.append(loaded.get(reference, {}))
+        used.append(reference)
+    return profiles, used
+
+
+def _array_method_forecasts(
+    matrix: fa.DailyMatrix,
+    key_rows: np.ndarray,
+    origin_columns: np.ndarray,
+    max_horizon: int,
+    lookback_weeks: int,
+    *,
+    whole_units: bool,
+    families: list[str],
+    calibration_profiles: list[dict],
+) -> np.ndarray:
+    """
+    Pronóstico claves × orígenes × horizonte con el motor de arreglos.
+
+    Con el ancla en el origen, el pronóstico sólo cambia con el día de la semana
+    del objetivo: se calcula una vez por día de la semana y se replica. Cada
+    celda toma el perfil de ``calibration_profiles[origen]`` con la misma clave
+    que ``build_daily_forecast_context``.
+    """
+    leads = min(max_horizon, 7)
+    forecast = np.zeros((len(key_rows), len(origin_columns), max_horizon))
+    for position, column in enumerate(origin_columns):
+        rows = np.repeat(key_rows, leads)
+        anchors = np.full(len(rows), column, dtype=np.int64)
+        weekdays = np.tile(matrix.weekday(column + np.arange(leads)), len(key_rows))
+        avg_28 = fa.mean(fa.window(matrix.qty, key_rows, np.full(len(key_rows), column, dtype=np.int64), 1, 28))
+        target_days = [matrix.start + timedelta(days=int(column) + lead) for lead in range(leads)]
+        calibration_keys = [
+            _calibration_key(matrix.keys[row], {"family": family}, target_day, avg)
+            for row, family, avg in zip(key_rows, families, avg_28)
+            for target_day in target_days
+        ]
+        profiles = calibration_profiles[position]
+        settings_by_key = {key: _profile_settings(profiles.get(key)) for key in set(calibration_keys)}
+        params = _settings_arrays([settings_by_key[key] for key in calibration_keys])
+        by_weekday = _forecast_arrays(matrix, rows, anchors, weekdays, lookback_weeks, params)["forecast_qty"]
+        forecast[:, position, :] = by_weekday.reshape(len(key_rows), leads)[:, np.arange(max_horizon) % leads]
+    return np.ceil(forecast) if whole_units else forecast
+
+
+def _segment_codes(values: list) -> tuple[list, np.ndarray]:
+    segments = sorted(set(values), key=lambda value: (value is None, str(value)))
+    positions = {segment: index for index, segment in enumerate(segments)}
+    return segments, np.asarray([positions[value] for value in values], dtype=np.int64)
+
+
+def _key_metrics(forecast: np.ndarray, actual: np.ndarray, horizon: int) -> dict[str, np.ndarray]:
+    """Sumas por clave sobre orígenes y días ``< horizon``; NaN = sin pronóstico."""
+    forecast = forecast[:, :, :horizon]
+    actual = actual[:, :, :horizon]
+    valid = ~np.isnan(forecast)
+    error = np.where(valid, np.nan_to_num(forecast) - actual, 0.0)
+    observed = np.where(valid, actual, 0.0)
+    with_sales = valid & (actual > 0)
+    ape = np.where(with_sales, np.abs(error) / np.where(actual > 0, actual, 1.0), 0.0)
+    return {
+        "observations": valid.sum(axis=(1, 2)).astype(np.float64),
+        "actual": observed.sum(axis=(1, 2)),
+        "forecast": np.where(valid, np.nan_to_num(forecast), 0.0).sum(axis=(1, 2)),
+        "abs_error": np.abs(error).sum(axis=(1, 2)),
+        "error": error.sum(axis=(1, 2)),
+        "ape": ape.sum(axis=(1, 2)),
+        "ape_count": with_sales.sum(axis=(1, 2)).astype(np.float64),
+    }
+
+
+def _pct_or_none(numerator: float, denominator: float) -> Decimal | None:
+    if denominator <= 0:
+        return None
+    return fa.decimal_at(numerator / denominator * 100, 2)
+
+
+def _parse_methods(methods) -> list[str]:
+    selected = list(dict.fromkeys(methods or DEFAULT_METHODS))
+    unknown = [method for method in selected if method not in DEFAULT_METHODS]
+    if unknown:
+        raise ValueError(f"Métodos de forecast no soportados: {', '.join(unknown)}.")
+    return selected
+
+
+def run_forecast_backtest(
+    *,
+    reference_date: date | None = None,
+    horizons=DEFAULT_HORIZONS,
+    origins: int = DEFAULT_ORIGINS,
+    step_days: int = DEFAULT_STEP_DAYS,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    sucursal_ids=None,
+    receta_ids=None,
+    methods=None,
+    max_workers: int | None = None,
+    user=None,
+) -> ForecastBacktestRun:
+    """
+    Corre el backtest y persiste un ``ForecastBacktestRun`` con sus resultados.
+
+    ``reference_date`` es el último día con venta real que se evalúa (default:
+    ayer); el último origen es ``reference_date - max(horizons) + 1`` y los
+    anteriores retroceden ``step_days``.
+    """
+    reference_date = reference_date or timezone.localdate() - timedelta(days=1)
+    horizons = sorted({int(horizon) for horizon in horizons if int(horizon) > 0})
+    if not horizons:
+        raise ValueError("Se requiere al menos un horizonte positivo.")
+    if origins <= 0 or step_days <= 0:
+        raise ValueError("origins y step_days deben ser positivos.")
+    methods = _parse_methods(methods)
+    sucursal_ids = sorted({int(value) for value in sucursal_ids or []})
+    receta_ids = sorted({int(value) for value in receta_ids or []})
+    if max_workers is None:
+        max_workers = getattr(settings, "FORECAST_BACKTEST_MAX_WORKERS", 1)
+
+    max_horizon = horizons[-1]
+    last_origin = reference_date - timedelta(days=max_horizon - 1)
+    origin_days = [last_origin - timedelta(days=step_days * index) for index in reversed(range(origins))]
+    history_start = origin_days[0] - timedelta(days=max(history_days, ARRAY_WINDOW_DAYS))
+
+    run = ForecastBacktestRun.objects.create(
+        reference_date=reference_date,
+        horizons=horizons,
+        methods=methods,
+        origins=origins,
+        step_days=step_days,
+        history_days=history_days,
+        sucursal_ids=sucursal_ids,
+        receta_ids=receta_ids,
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+    started = time.perf_counter()
+    try:
+        results, metadata = _evaluate(
+            run,
+            history_start=history_start,
+            reference_date=reference_date,
+            origin_days=origin_days,
+            horizons=horizons,
+            history_days=history_days,
+            methods=methods,
+            max_workers=max_workers,
+        )
+    except Exception as exc:
+        run.status = ForecastBacktestRun.STATUS_ERROR
+        run.error = str(exc)[:2000]
+        run.elapsed_seconds = fa.decimal_at(time.perf_counter() - started, 3)
+        run.finished_at = timezone.now()
+        run.save(update_fields=["status", "error", "elapsed_seconds", "finished_at"])
+        raise
+
+    with transaction.atomic():
+        ForecastBacktestResult.objects.bulk_create(results, batch_size=500)
+        run.status = ForecastBacktestRun.STATUS_OK
+        run.series_count = metadata.pop("series_count")
+        run.workers = metadata.pop("workers")
+        run.metadata = metadata
+        run.elapsed_seconds = fa.decimal_at(time.perf_counter() - started, 3)
+        run.finished_at = timezone.now()
+        run.save(update_fields=["status", "series_count", "workers", "metadata", "elapsed_seconds", "finished_at"])
+        AnalyticAuditLog.objects.create(
+            audit_type="FORECAST_BACKTEST",
+            status=AnalyticAuditLog.STATUS_OK,
+            date_from=origin_days[0],
+            date_to=reference_date,
+            discrepancy_count=0,
+            message="Backtest rolling-origin de forecast actualizado",
+            payload={
+                "run_id": run.id,
+                "series": run.series_count,
+                "global": [
+                    {
+                        "method": row.method,
+                        "horizon_days": row.horizon_days,
+                        "wape_pct": str(row.wape_pct) if row.wape_pct is not None else None,
+                        "fit_seconds": str(row.fit_seconds),
+                    }
+                    for row in results
+                    if row.metadata.get("level") == LEVEL_GLOBAL
+                ],
+            },
+        )
+    return run
+
+
+def _evaluate(
+    run: ForecastBacktestRun,
+    *,
+    history_start: date,
+    reference_date: date,
+    origin_days: list[date],
+    horizons: list[int],
+    history_days: int,
+    methods: list[str],
+    max_workers: int,
+) -> tuple[list[ForecastBacktestResult], dict[str, object]]:
+    queryset = FactVentaDiaria.objects.filter(
+        fecha__range=(history_start, reference_date),
+        receta_id__isnull=False,
+        sucursal_id__isnull=False,
+        receta__tipo=Receta.TIPO_PRODUCTO_FINAL,
+    )
+    if run.sucursal_ids:
+        queryset = queryset.filter(sucursal_id__in=run.sucursal_ids)
+    if run.receta_ids:
+        queryset = queryset.filter(receta_id__in=run.receta_ids)
+    sales_rows = list(
+        queryset.values("fecha", "sucursal_id", "receta_id", "receta__familia")
+        .annotate(total=Sum("cantidad"))
+        .order_by("sucursal_id", "receta_id", "fecha")
+    )
+    family_by_key: dict[tuple[int, int], str] = {}
+    for row in sales_rows:
+        key = (int(row["sucursal_id"]), int(row["receta_id"]))
+        family_by_key[key] = (row.get("receta__familia") or "SIN_FAMILIA").strip()[:120]
+    matrix = fa.DailyMatrix(list(family_by_key), history_start, reference_date)
+    for row in sales_rows:
+        matrix.set((int(row["sucursal_id"]), int(row["receta_id"])), row["fecha"], row.get("total"))
+
+    max_horizon = horizons[-1]
+    origin_columns = np.asarray([matrix.day_index(day) for day in origin_days], dtype=np.int64)
+    all_rows = np.arange(len(matrix.keys), dtype=np.int64)
+    key_rows = all_rows[
+        matrix.positive_days_before(all_rows, np.full(len(all_rows), origin_columns[0])) >= MIN_POSITIVE_DAYS
+    ]
+    keys = [matrix.keys[row] for row in key_rows]
+    actual = fa.gather(
+        matrix.qty,
+        np.repeat(key_rows, len(origin_columns)),
+        np.tile(origin_columns, len(key_rows)),
+        -np.arange(max_horizon),
+    ).reshape(len(key_rows), len(origin_columns), max_horizon)
+
+    forecasts: dict[str, np.ndarray] = {}
+    key_seconds: dict[str, np.ndarray] = {}
+    key_fits: dict[str, np.ndarray] = {}
+    labels: dict[str, Counter] = {}
+    calibration_profiles, calibration_dates = (
+        _calibration_profiles_as_of(origin_days) if keys and set(methods) & set(ARRAY_METHODS) else ([], [])
+    )
+    for method in methods:
+        if method not in ARRAY_METHODS or not keys:
+            continue
+        method_started = time.perf_counter()
+        forecasts[method] = _array_method_forecasts(
+            matrix,
+            key_rows,
+            origin_columns,
+            max_horizon,
+            ARRAY_METHODS[method],
+            whole_units=method == ForecastBacktestResult.METHOD_FORECAST_OPERATIVO,
+            families=[family_by_key[key] for key in keys],
+            calibration_profiles=calibration_profiles,
+        )
+        # Un solo cálculo en bloque: el tiempo se reparte parejo entre las claves.
+        key_seconds[method] = np.full(len(keys), (time.perf_counter() - method_started) / len(keys))
+        key_fits[method] = np.full(len(keys), len(origin_columns), dtype=np.float64)
+        labels[method] = Counter({method: len(keys) * len(origin_columns)})
+
+    series_methods = [method for method in methods if method in SERIES_METHODS]
+    workers = 1
+    if series_methods and keys:
+        jobs = [
+            (matrix.qty[row], matrix.start, origin_columns, max_horizon, history_days, series_methods)
+            for row in key_rows
+        ]
+        workers = max(1, min(int(max_workers), len(jobs)))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                outputs = list(executor.map(_series_forecasts, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        else:
+            outputs = [_series_forecasts(job) for job in jobs]
+        for method in series_methods:
+            forecasts[method] = np.stack([output[method]["forecast"] for output in outputs])
+            key_seconds[method] = np.asarray([output[method]["seconds"] for output in outputs])
+            key_fits[method] = np.asarray([output[method]["fits"] for output in outputs], dtype=np.float64)
+            labels[method] = sum((output[method]["labels"] for output in outputs), Counter())
+
+    coverage = {
+        method: float((~np.isnan(forecast)).mean() * 100) if forecast.size else 0.0
+        for method, forecast in forecasts.items()
+    }
+    levels = []
+    for level, segment_values in (
+        (LEVEL_GLOBAL, [(None, "")] * len(keys)),
+        (LEVEL_BRANCH, [(key[0], "") for key in keys]),
+        (LEVEL_FAMILY, [(None, family_by_key[key]) for key in keys]),
+    ):
+        segments, codes = _segment_codes(segment_values)
+        levels.append((level, segments, codes, *_segment_common_cells(forecasts, codes, len(segments))))
+    comparable = [method for method in methods if method in levels[0][3] and levels[0][3][method].all()]
+    results: list[ForecastBacktestResult] = []
+    for method in methods:
+        if method not in forecasts:
+            continue
+        for horizon in horizons:
+            metrics = _key_metrics(forecasts[method], actual, horizon)
+            metrics["series"] = (metrics["observations"] > 0).astype(np.float64)
+            metrics["seconds"] = key_seconds[method]
+            metrics["fits"] = key_fits[method]
+            metrics["cells"] = np.full(len(keys), float(len(origin_columns) * horizon))
+            for level, segments, codes, comparable_keys, common in levels:
+                level_metrics = dict(metrics)
+                if method in comparable_keys:
+                    shared_cells = common & comparable_keys[method][:, None, None]
+                    shared = _key_metrics(np.where(shared_cells, forecasts[method], np.nan), actual, horizon)
+                    level_metrics.update(
+                        {f"common_{name}": shared[name] for name in ("observations", "actual", "abs_error", "error")}
+                    )
+                totals = {
+                    name: np.bincount(codes, weights=values, minlength=len(segments))
+                    for name, values in level_metrics.items()
+                }
+                for index, (sucursal_id, familia) in enumerate(segments):
+                    if totals["observations"][index] <= 0:
+                        continue
+                    fits = int(totals["fits"][index])
+                    seconds = float(totals["seconds"][index])
+                    results.append(
+                        ForecastBacktestResult(
+                            run=run,
+                            method=method,
+                            horizon_days=horizon,
+                            sucursal_id=sucursal_id,
+                            familia=familia,
+                            series_count=int(totals["series"][index]),
+                            observations=int(totals["observations"][index]),
+                            actual_units=fa.decimal_at(totals["actual"][index], 3),
+                            forecast_units=fa.decimal_at(totals["forecast"][index], 3),
+                            mape_pct=_pct_or_none(totals["ape"][index], totals["ape_count"][index]),
+                            wape_pct=_pct_or_none(totals["abs_error"][index], totals["actual"][index]),
+                            bias_pct=_pct_or_none(totals["error"][index], totals["actual"][index]),
+                            fits=fits,
+                            fit_seconds=fa.decimal_at(seconds, 4),
+                            metadata={
+                                "level": level,
+                                "avg_fit_ms": float(fa.decimal_at(seconds / fits * 1000, 3)) if fits else None,
+                                **_comparison_metadata(totals, index),
+                            },
+                        )
+                    )
+
+    skipped = [method for method in methods if method not in key_fits or not key_fits[method].sum()]
+    metadata = {
+        "series_count": len(keys),
+        "workers": workers,
+        "origin_days": [day.isoformat() for day in origin_days],
+        "method_labels": {method: dict(counter) for method, counter in labels.items()},
+        "skipped_methods": skipped,
+        "coverage_pct": {method: round(value, 2) for method, value in coverage.items()},
+        "comparable_methods": comparable,
+        "calibration_reference_dates": [day.isoformat() if day else None for day in calibration_dates],
+        "prophet_available": bool(pronostico_engine.PROPHET_AVAILABLE),
+        "ets_available": pronostico_engine.ETS_AVAILABLE,
+    }
+    return results, metadata
+
+
+def _segment_common_cells(
+    forecasts: dict[str, np.ndarray], codes: np.ndarray, segment_count: int
+) -> tuple[dict[str, np.ndarray], np.ndarray | None]:
+    """
+    Métodos comparables y celdas comunes de un nivel, segmento por segmento.
+
+    Regresa, por método, qué claves caen en un segmento que el método cubre al
+    menos en ``MIN_COVERAGE_PCT``, y la máscara claves × orígenes × horizonte de
+    celdas que pronosticaron todos los comparables del segmento de cada clave.
+    """
+    if not forecasts:
+        return {}, None
+    shape = next(iter(forecasts.values())).shape
+    cells = np.bincount(codes, minlength=segment_count) * float(np.prod(shape[1:]))
+    comparable_keys: dict[str, np.ndarray] = {}
+    common = np.ones(shape, dtype=bool)
+    for method, forecast in forecasts.items():
+        valid = ~np.isnan(forecast)
+        covered = np.bincount(codes, weights=valid.sum(axis=(1, 2)), minlength=segment_count)
+        segment_ok = covered * 100 >= np.maximum(cells, 1) * float(MIN_COVERAGE_PCT)
+        comparable_keys[method] = segment_ok[codes]
+        common &= valid | ~comparable_keys[method][:, None, None]
+    return comparable_keys, common
+
+
+def _comparison_metadata(totals: dict[str, np.ndarray], index: int) -> dict[str, object]:
+    coverage = _pct_or_none(totals["observations"][index], totals["cells"][index])
+    payload: dict[str, object] = {"coverage_pct": float(coverage) if coverage is not None else 0.0}
+    if "common_observations" not in totals:
+        return {**payload, "common_observations": 0, "common_wape_pct": None, "common_bias_pct": None}
+    wape = _pct_or_none(totals["common_abs_error"][index], totals["common_actual"][index])
+    bias = _pct_or_none(totals["common_error"][index], totals["common_actual"][index])
+    return {
+        **payload,
+        "common_observations": int(totals["common_observations"][index]),
+        "common_wape_pct": float(wape) if wape is not None else None,
+        "common_bias_pct": float(bias) if bias is not None else None,
+    }
+
+
+def recommend_methods(
+    run: ForecastBacktestRun,
+    *,
+    horizon_days: int,
+    level: str = LEVEL_FAMILY,
+    tolerance_pct: Decimal = DEFAULT_TOLERANCE_PCT,
+    min_coverage_pct: Decimal = MIN_COVERAGE_PCT,
+) -> list[dict[str, object]]:
+    """
+    Método sugerido por segmento para un horizonte.
+
+    Los métodos se comparan por su WAPE sobre las celdas que todos
+    pronosticaron, y sólo compiten los que cubren al menos ``min_coverage_pct``
+    del segmento. Entre los que quedan a ``tolerance_pct`` puntos o menos del
+    mejor, se sugiere el de menor costo de ajuste: así un Prophet que no mejora
+    de forma material a ETS o al promedio no se paga.
+    """
+    by_segment: dict[tuple[int | None, str], list[tuple[Decimal, ForecastBacktestResult]]] = {}
+    for row in run.results.filter(horizon_days=horizon_days).select_related("sucursal"):
+        metadata = row.metadata or {}
+        if metadata.get("level") != level or metadata.get("common_wape_pct") is None:
+            continue
+        if Decimal(str(metadata.get("coverage_pct") or 0)) < min_coverage_pct:
+            continue
+        wape = Decimal(str(metadata["common_wape_pct"])).quantize(Decimal("0.01"))
+        by_segment.setdefault((row.sucursal_id, row.familia), []).append((wape, row))
+
+    recommendations = []
+    for rows in by_segment.values():
+        best_wape, best = min(rows, key=lambda item: item[0])
+        candidates = [item for item in rows if item[0] <= best_wape + tolerance_pct]
+        chosen_wape, chosen = min(candidates, key=lambda item: (item[1].metadata.get("avg_fit_ms") or 0.0, item[0]))
+        common_bias = chosen.metadata.get("common_bias_pct")
+        recommendations.append(
+            {
+                "sucursal": best.sucursal,
+                "familia": best.familia,
+                "best_method": best.method,
+                "best_wape_pct": best_wape,
+                "recommended_method": chosen.method,
+                "recommended_wape_pct": chosen_wape,
+                "recommended_bias_pct": Decimal(str(common_bias)).quantize(Decimal("0.01")) if common_bias is not None else None,
+                "recommended_avg_fit_ms": chosen.metadata.get("avg_fit_ms"),
+                "recommended_coverage_pct": chosen.metadata.get("coverage_pct"),
+                "best_avg_fit_ms": best.metadata.get("avg_fit_ms"),
+                "compared_observations": chosen.metadata.get("common_observations"),
+                "series_count": chosen.series_count,
+            }
+        )
+    return sorted(
+        recommendations,
+        key=lambda item: (item["sucursal"].codigo if item["sucursal"] else "", item["familia"]),
+    )
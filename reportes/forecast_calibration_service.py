@@ -1,15 +1,15 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from dataclasses import dataclass
 from datetime import date, timedelta
 from decimal import Decimal, InvalidOperation
-from math import sqrt
 
+import numpy as np
 from django.db import transaction
 from django.db.models import Max, Sum
 from django.utils import timezone
 
+from reportes import forecast_arrays as fa
 from reportes.models import AnalyticAuditLog, FactVentaDiaria, ForecastCalibrationProfile, ProductionExecutionLog
 
 
@@ -39,20 +39,6 @@ def _safe_div(numerator: Decimal, denominator: Decimal) -> Decimal:
     return numerator / denominator
 
 
-def _mean(values: list[Decimal]) -> Decimal:
-    if not values:
-        return ZERO
-    return sum(values, ZERO) / Decimal(len(values))
-
-
-def _stddev(values: list[Decimal]) -> Decimal:
-    if not values:
-        return ZERO
-    mean_value = _mean(values)
-    variance = sum((value - mean_value) ** 2 for value in values) / Decimal(len(values))
-    return Decimal(str(sqrt(float(variance)))) if variance > ZERO else ZERO
-
-
 def _clamp(value: Decimal, floor: Decimal, ceiling: Decimal) -> Decimal:
     return max(floor, min(value, ceiling))
 
@@ -73,71 +59,69 @@ def rotation_band_for_avg(avg_28: Decimal) -> str:
     )
 
 
-def _history_window(series: dict[date, Decimal], target_day: date, start_offset: int, end_offset: int) -> list[Decimal]:
-    return [series.get(target_day - timedelta(days=offset), ZERO) for offset in range(start_offset, end_offset + 1)]
-
-
-def _same_weekday_history(series: dict[date, Decimal], target_day: date, lookback_weeks: int) -> list[Decimal]:
-    return [series.get(target_day - timedelta(days=7 * week), ZERO) for week in range(1, lookback_weeks + 1)]
-
-
-def _weekday_factor(series: dict[date, Decimal], target_day: date, lookback_weeks: int) -> Decimal:
-    weekday_values = _same_weekday_history(series, target_day, lookback_weeks)
-    trailing_values = _history_window(series, target_day, 1, max(lookback_weeks * 7, 7))
-    weekday_avg = _mean(weekday_values)
-    trailing_avg = _mean(trailing_values)
-    if weekday_avg <= ZERO or trailing_avg <= ZERO:
-        return ONE
-    return _clamp(weekday_avg / trailing_avg, Decimal("0.70"), Decimal("1.35"))
-
-
-def _trend_factor(series: dict[date, Decimal], target_day: date) -> Decimal:
-    recent_14 = _mean(_history_window(series, target_day, 1, 14))
-    previous_14 = _mean(_history_window(series, target_day, 15, 28))
-    if recent_14 <= ZERO or previous_14 <= ZERO:
-        return ONE
-    return _clamp(recent_14 / previous_14, Decimal("0.75"), Decimal("1.30"))
-
-
-def _weighted_average(
-    series: dict[date, Decimal],
-    target_day: date,
-    recent_weight: Decimal,
-    mid_weight: Decimal,
-    older_weight: Decimal,
-) -> Decimal:
-    recent_14 = _mean(_history_window(series, target_day, 1, 14))
-    previous_14 = _mean(_history_window(series, target_day, 15, 28))
-    older_28 = _mean(_history_window(series, target_day, 29, 56))
-    return (recent_14 * recent_weight) + (previous_14 * mid_weight) + (older_28 * older_weight)
-
-
-def _segment_key(
-    *,
-    branch_id: int,
-    family: str,
-    target_day: date,
-    avg_28: Decimal,
-) -> tuple[int, str, str, str]:
-    return (
-        int(branch_id),
-        (family or "SIN_FAMILIA").strip()[:120],
-        weekly_pattern_for_day(target_day),
-        rotation_band_for_avg(avg_28),
-    )
+def _observation_arrays(matrix: fa.DailyMatrix, rows: np.ndarray, anchors: np.ndarray) -> dict[str, np.ndarray]:
+    """Ventanas 14/14/28 y factores sin tope de picos para cada observación (clave, día)."""
+    qty = matrix.qty
+    recent_14 = fa.mean(fa.window(qty, rows, anchors, 1, 14))
+    previous_14 = fa.mean(fa.window(qty, rows, anchors, 15, 28))
+    window_28 = fa.window(qty, rows, anchors, 1, 28)
+    weekday_avg = fa.mean(fa.gather(qty, rows, anchors, 7 * np.arange(1, 9)))
+    trailing_avg = fa.mean(fa.window(qty, rows, anchors, 1, 56))
+    return {
+        "actual": fa.gather(qty, rows, anchors, [0])[:, 0],
+        "recent_14": recent_14,
+        "previous_14": previous_14,
+        "older_28": fa.mean(fa.window(qty, rows, anchors, 29, 56)),
+        "avg_28": fa.mean(window_28),
+        "stddev_28": fa.stddev(window_28),
+        "weekday_factor": np.where(
+            (weekday_avg > 0) & (trailing_avg > 0),
+            np.clip(fa.ratio_or(weekday_avg, trailing_avg), 0.70, 1.35),
+            1.0,
+        ),
+        "trend_factor": np.where(
+            (recent_14 > 0) & (previous_14 > 0),
+            np.clip(fa.ratio_or(recent_14, previous_14), 0.75, 1.30),
+            1.0,
+        ),
+    }
 
 
-@dataclass(slots=True)
-class _Observation:
-    segment_key: tuple[int, str, str, str]
-    actual: Decimal
-    recent_14: Decimal
-    previous_14: Decimal
-    older_28: Decimal
-    avg_28: Decimal
-    stddev_28: Decimal
-    weekday_factor: Decimal
-    trend_factor: Decimal
+def _segment_codes(
+    matrix: fa.DailyMatrix,
+    families: list[str],
+    family_by_key: dict[tuple[int, int], str],
+    rows: np.ndarray,
+    anchors: np.ndarray,
+    avg_28: np.ndarray,
+) -> tuple[np.ndarray, list[tuple[int, str, str, str]]]:
+    """
+    Segmento (sucursal, familia, patrón semanal, rotación) de cada observación.
+
+    Los segmentos quedan en el orden en que aparece su primera observación.
+    """
+    if rows.size == 0:
+        return np.zeros(0, dtype=np.int64), []
+    family_codes = {family: index for index, family in enumerate(families)}
+    branch = np.asarray([key[0] for key in matrix.keys], dtype=np.int64)[rows]
+    family = np.asarray([family_codes[family_by_key[key]] for key in matrix.keys], dtype=np.int64)[rows]
+    thu_sun = (matrix.weekday(anchors) > 2).astype(np.int64)
+    high_rotation = (fa.quantize(avg_28, 6) >= float(ROTATION_THRESHOLD)).astype(np.int64)
+    codes = np.stack([branch, family, thu_sun, high_rotation], axis=1)
+    unique_codes, first_index, inverse = np.unique(codes, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first_index, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    segment_keys = [
+        (
+            int(code[0]),
+            families[code[1]],
+            ForecastCalibrationProfile.PATTERN_THU_SUN if code[2] else ForecastCalibrationProfile.PATTERN_MON_WED,
+            ForecastCalibrationProfile.ROTATION_HIGH if code[3] else ForecastCalibrationProfile.ROTATION_LOW,
+        )
+        for code in unique_codes[order]
+    ]
+    return rank[np.ravel(inverse)], segment_keys
 
 
 def _segment_params_from_metrics(
@@ -191,22 +175,6 @@ def _segment_params_from_metrics(
     }
 
 
-def _apply_calibrated_forecast(observation: _Observation, params: dict[str, Decimal]) -> tuple[Decimal, Decimal, Decimal]:
-    base_weighted = (
-        (observation.recent_14 * params["recent_weight"])
-        + (observation.previous_14 * params["mid_weight"])
-        + (observation.older_28 * params["older_weight"])
-    )
-    forecast_qty = max(base_weighted * observation.weekday_factor * observation.trend_factor * params["bias_adjustment"], ZERO)
-    segment_error_pct = min(abs(params["bias_adjustment"] - ONE), Decimal("0.15"))
-    dynamic_buffer = max(
-        observation.stddev_28 * params["buffer_multiplier"],
-        forecast_qty * (segment_error_pct + Decimal("0.12")),
-    )
-    buffer_units = min(dynamic_buffer, forecast_qty * Decimal("0.65"))
-    return forecast_qty, max(forecast_qty - buffer_units, ZERO), forecast_qty + buffer_units
-
-
 def _load_execution_feedback_map(reference_date: date) -> dict[tuple[int, str, str], dict[str, Decimal]]:
     start_date = reference_date - timedelta(days=28)
     rows = (
@@ -340,92 +308,80 @@ def rebuild_forecast_calibration_profiles(
         .annotate(total=Sum("cantidad"))
         .order_by("sucursal_id", "receta_id", "fecha")
     )
-    series_by_key: dict[tuple[int, int], dict[date, Decimal]] = defaultdict(dict)
     family_by_key: dict[tuple[int, int], str] = {}
     for row in sales_rows:
         key = (int(row["sucursal_id"]), int(row["receta_id"]))
         family_by_key[key] = (row.get("receta__familia") or "SIN_FAMILIA").strip()[:120]
-        series_by_key[key][row["fecha"]] = _to_decimal(row.get("total"))
+    matrix = fa.DailyMatrix(list(family_by_key), history_start, reference_date)
+    for row in sales_rows:
+        matrix.set((int(row["sucursal_id"]), int(row["receta_id"])), row["fecha"], row.get("total"))
 
-    segment_aggregates: dict[tuple[int, str, str, str], dict[str, Decimal]] = defaultdict(
-        lambda: {
-            "actual": ZERO,
-            "abs_error_before": ZERO,
-            "signed_error_before": ZERO,
-            "hits_before": ZERO,
-            "observations": ZERO,
-            "volatility_total": ZERO,
-        }
-    )
-    observations: list[_Observation] = []
+    # Observaciones clave × día de validación, en el mismo orden que el recorrido por serie.
     validation_start = reference_date - timedelta(days=max(validation_days - 1, 0))
-    for key, series in series_by_key.items():
-        branch_id = key[0]
-        family = family_by_key.get(key, "SIN_FAMILIA")
-        for target_day in (validation_start + timedelta(days=index) for index in range(validation_days)):
-            if target_day > reference_date:
-                continue
-            prior_positive_days = sum(1 for day, qty in series.items() if day < target_day and qty > ZERO)
-            if prior_positive_days < 14:
-                continue
-            recent_14 = _mean(_history_window(series, target_day, 1, 14))
-            previous_14 = _mean(_history_window(series, target_day, 15, 28))
-            older_28 = _mean(_history_window(series, target_day, 29, 56))
-            avg_28 = _mean(_history_window(series, target_day, 1, 28))
-            stddev_28 = _stddev(_history_window(series, target_day, 1, 28))
-            weekday_factor = _weekday_factor(series, target_day, 8)
-            trend_factor = _trend_factor(series, target_day)
-            base_forecast = max(
-                _weighted_average(series, target_day, DEFAULT_RECENT_WEIGHT, DEFAULT_MID_WEIGHT, DEFAULT_OLDER_WEIGHT)
-                * weekday_factor
-                * trend_factor,
-                ZERO,
-            )
-            base_buffer = min(stddev_28, base_forecast * Decimal("0.35"))
-            actual = series.get(target_day, ZERO)
-            segment_key = _segment_key(branch_id=branch_id, family=family, target_day=target_day, avg_28=avg_28)
-            aggregate = segment_aggregates[segment_key]
-            aggregate["actual"] += actual
-            aggregate["abs_error_before"] += abs(base_forecast - actual)
-            aggregate["signed_error_before"] += (base_forecast - actual)
-            if max(base_forecast - base_buffer, ZERO) <= actual <= base_forecast + base_buffer:
-                aggregate["hits_before"] += ONE
-            aggregate["observations"] += ONE
-            if avg_28 > ZERO:
-                aggregate["volatility_total"] += _safe_div(stddev_28, avg_28)
-            observations.append(
-                _Observation(
-                    segment_key=segment_key,
-                    actual=actual,
-                    recent_14=recent_14,
-                    previous_14=previous_14,
-                    older_28=older_28,
-                    avg_28=avg_28,
-                    stddev_28=stddev_28,
-                    weekday_factor=weekday_factor,
-                    trend_factor=trend_factor,
-                )
-            )
+    target_days = [
+        day
+        for day in (validation_start + timedelta(days=index) for index in range(validation_days))
+        if day <= reference_date
+    ]
+    rows = np.repeat(np.arange(len(matrix.keys), dtype=np.int64), len(target_days))
+    anchors = np.tile(np.asarray([matrix.day_index(day) for day in target_days], dtype=np.int64), len(matrix.keys))
+    eligible = matrix.positive_days_before(rows, anchors) >= 14
+    rows, anchors = rows[eligible], anchors[eligible]
+    features = _observation_arrays(matrix, rows, anchors)
+    actual = features["actual"]
+    base_forecast = np.maximum(
+        (
+            features["recent_14"] * float(DEFAULT_RECENT_WEIGHT)
+            + features["previous_14"] * float(DEFAULT_MID_WEIGHT)
+            + features["older_28"] * float(DEFAULT_OLDER_WEIGHT)
+        )
+        * features["weekday_factor"]
+        * features["trend_factor"],
+        0.0,
+    )
+    base_buffer = np.minimum(features["stddev_28"], base_forecast * 0.35)
+    hits_before = (np.maximum(base_forecast - base_buffer, 0.0) <= actual) & (actual <= base_forecast + base_buffer)
+
+    segment_of, segment_keys = _segment_codes(
+        matrix,
+        sorted(set(family_by_key.values())),
+        family_by_key,
+        rows,
+        anchors,
+        features["avg_28"],
+    )
+    segment_count = len(segment_keys)
+
+    def _by_segment(weights) -> np.ndarray:
+        return np.bincount(segment_of, weights=np.asarray(weights, dtype=np.float64), minlength=segment_count)
+
+    segment_actual = _by_segment(actual)
+    segment_abs_error = _by_segment(np.abs(base_forecast - actual))
+    segment_signed_error = _by_segment(base_forecast - actual)
+    segment_hits_before = _by_segment(hits_before)
+    segment_observations = np.bincount(segment_of, minlength=segment_count)
+    segment_volatility = _by_segment(fa.ratio_or(features["stddev_28"], features["avg_28"]))
 
     execution_feedback_map = _load_execution_feedback_map(reference_date)
-    profile_params: dict[tuple[int, str, str, str], dict[str, Decimal]] = {}
+    profile_params: dict[int, dict[str, Decimal]] = {}
     profile_rows: list[ForecastCalibrationProfile] = []
-    for segment_key, aggregate in segment_aggregates.items():
-        actual = aggregate["actual"]
-        observations_count = int(aggregate["observations"])
-        if observations_count <= 0 or actual <= ZERO:
+    for segment, segment_key in enumerate(segment_keys):
+        actual_total = segment_actual[segment]
+        observations_count = int(segment_observations[segment])
+        if observations_count <= 0 or actual_total <= 0:
             continue
-        wape_before = (_safe_div(aggregate["abs_error_before"], actual) * HUNDRED).quantize(Decimal("0.01"))
-        bias_pct = (_safe_div(aggregate["signed_error_before"], actual) * HUNDRED).quantize(Decimal("0.01"))
-        hit_before = (_safe_div(aggregate["hits_before"], aggregate["observations"]) * HUNDRED).quantize(Decimal("0.01"))
-        volatility_pct = (_safe_div(aggregate["volatility_total"], aggregate["observations"]) * HUNDRED).quantize(Decimal("0.01"))
+        wape_before = fa.decimal_at(segment_abs_error[segment] / actual_total * 100, 2)
+        bias_pct = fa.decimal_at(segment_signed_error[segment] / actual_total * 100, 2)
+        hit_before = fa.decimal_at(segment_hits_before[segment] / observations_count * 100, 2)
+        volatility_ratio = segment_volatility[segment] / observations_count
+        volatility_pct = fa.decimal_at(volatility_ratio * 100, 2)
         execution_feedback = execution_feedback_map.get(segment_key[:3], {})
         execution_gap_pct = _to_decimal(execution_feedback.get("execution_gap_pct"))
         adoption_pct = _to_decimal(execution_feedback.get("adoption_pct"), "100")
         waste_rate_pct = _to_decimal(execution_feedback.get("waste_rate_pct"))
         params = _segment_params_from_metrics(
             {
-                "volatility_ratio": _safe_div(aggregate["volatility_total"], aggregate["observations"]),
+                "volatility_ratio": fa.decimal_at(volatility_ratio, 6),
                 "bias_pct": bias_pct,
                 "hit_rate": hit_before,
             },
@@ -433,7 +389,7 @@ def rebuild_forecast_calibration_profiles(
             adoption_pct,
             waste_rate_pct,
         )
-        profile_params[segment_key] = params
+        profile_params[segment] = params
         profile_rows.append(
             ForecastCalibrationProfile(
                 reference_date=reference_date,
@@ -464,49 +420,47 @@ def rebuild_forecast_calibration_profiles(
             )
         )
 
-    after_metrics: dict[tuple[int, str, str, str], dict[str, Decimal]] = defaultdict(
-        lambda: {"actual": ZERO, "abs_error_after": ZERO, "hits_after": ZERO, "observations": ZERO}
-    )
-    for observation in observations:
-        params = profile_params.get(observation.segment_key)
-        if params is None:
-            continue
-        forecast_after, min_after, max_after = _apply_calibrated_forecast(observation, params)
-        metrics = after_metrics[observation.segment_key]
-        metrics["actual"] += observation.actual
-        metrics["abs_error_after"] += abs(forecast_after - observation.actual)
-        if min_after <= observation.actual <= max_after:
-            metrics["hits_after"] += ONE
-        metrics["observations"] += ONE
-
-    global_before_actual = ZERO
-    global_before_error = ZERO
-    global_after_error = ZERO
-    global_before_hits = ZERO
-    global_after_hits = ZERO
-    global_observations = ZERO
-    for profile in profile_rows:
-        segment_key = (
-            int(profile.sucursal_id),
-            profile.familia,
-            profile.weekly_pattern,
-            profile.rotation_band,
+    # Pronóstico calibrado: los parámetros de cada segmento se reparten a sus observaciones.
+    calibrated = np.asarray([segment in profile_params for segment in range(segment_count)], dtype=bool)
+    params_by_segment = {
+        name: np.asarray(
+            [float(profile_params[segment][name]) if segment in profile_params else 0.0 for segment in range(segment_count)],
+            dtype=np.float64,
+        )[segment_of]
+        for name in ("recent_weight", "mid_weight", "older_weight", "bias_adjustment", "buffer_multiplier")
+    }
+    forecast_after = np.maximum(
+        (
+            features["recent_14"] * params_by_segment["recent_weight"]
+            + features["previous_14"] * params_by_segment["mid_weight"]
+            + features["older_28"] * params_by_segment["older_weight"]
         )
-        segment_before = segment_aggregates[segment_key]
-        segment_after = after_metrics.get(segment_key, {})
-        actual = segment_before["actual"]
-        profile.wape_after_pct = (
-            _safe_div(segment_after.get("abs_error_after", ZERO), actual) * HUNDRED
-        ).quantize(Decimal("0.01")) if actual > ZERO else ZERO
-        profile.hit_rate_after_pct = (
-            _safe_div(segment_after.get("hits_after", ZERO), segment_after.get("observations", ZERO)) * HUNDRED
-        ).quantize(Decimal("0.01")) if segment_after.get("observations", ZERO) > ZERO else ZERO
-        global_before_actual += actual
-        global_before_error += segment_before["abs_error_before"]
-        global_after_error += segment_after.get("abs_error_after", ZERO)
-        global_before_hits += segment_before["hits_before"]
-        global_after_hits += segment_after.get("hits_after", ZERO)
-        global_observations += segment_before["observations"]
+        * features["weekday_factor"]
+        * features["trend_factor"]
+        * params_by_segment["bias_adjustment"],
+        0.0,
+    )
+    segment_error_pct = np.minimum(np.abs(params_by_segment["bias_adjustment"] - 1.0), 0.15)
+    buffer_after = np.minimum(
+        np.maximum(features["stddev_28"] * params_by_segment["buffer_multiplier"], forecast_after * (segment_error_pct + 0.12)),
+        forecast_after * 0.65,
+    )
+    hits_after = (np.maximum(forecast_after - buffer_after, 0.0) <= actual) & (actual <= forecast_after + buffer_after)
+    observation_calibrated = calibrated[segment_of]
+    segment_abs_error_after = _by_segment(np.where(observation_calibrated, np.abs(forecast_after - actual), 0.0))
+    segment_hits_after = _by_segment(observation_calibrated & hits_after)
+
+    calibrated_segments = np.flatnonzero(calibrated)
+    for profile, segment in zip(profile_rows, calibrated_segments):
+        actual_total = segment_actual[segment]
+        profile.wape_after_pct = fa.decimal_at(segment_abs_error_after[segment] / actual_total * 100, 2)
+        profile.hit_rate_after_pct = fa.decimal_at(segment_hits_after[segment] / segment_observations[segment] * 100, 2)
+    global_before_actual = float(segment_actual[calibrated_segments].sum())
+    global_before_error = float(segment_abs_error[calibrated_segments].sum())
+    global_after_error = float(segment_abs_error_after[calibrated_segments].sum())
+    global_before_hits = float(segment_hits_before[calibrated_segments].sum())
+    global_after_hits = float(segment_hits_after[calibrated_segments].sum())
+    global_observations = int(segment_observations[calibrated_segments].sum())
 
     with transaction.atomic():
         ForecastCalibrationProfile.objects.filter(reference_date=reference_date).delete()
@@ -516,19 +470,19 @@ def rebuild_forecast_calibration_profiles(
     summary = {
         "reference_date": reference_date.isoformat(),
         "segments": len(profile_rows),
-        "wape_before_pct": (_safe_div(global_before_error, global_before_actual) * HUNDRED).quantize(Decimal("0.01"))
-        if global_before_actual > ZERO
+        "wape_before_pct": fa.decimal_at(global_before_error / global_before_actual * 100, 2)
+        if global_before_actual > 0
         else ZERO,
-        "wape_after_pct": (_safe_div(global_after_error, global_before_actual) * HUNDRED).quantize(Decimal("0.01"))
-        if global_before_actual > ZERO
+        "wape_after_pct": fa.decimal_at(global_after_error / global_before_actual * 100, 2)
+        if global_before_actual > 0
         else ZERO,
-        "hit_rate_before_pct": (_safe_div(global_before_hits, global_observations) * HUNDRED).quantize(Decimal("0.01"))
-        if global_observations > ZERO
+        "hit_rate_before_pct": fa.decimal_at(global_before_hits / global_observations * 100, 2)
+        if global_observations > 0
         else ZERO,
-        "hit_rate_after_pct": (_safe_div(global_after_hits, global_observations) * HUNDRED).quantize(Decimal("0.01"))
-        if global_observations > ZERO
+        "hit_rate_after_pct": fa.decimal_at(global_after_hits / global_observations * 100, 2)
+        if global_observations > 0
         else ZERO,
-        "observations": int(global_observations),
+        "observations": global_observations,
     }
     top_improved = sorted(
         profile_rows,
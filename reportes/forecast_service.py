@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-from collections import defaultdict
 from datetime import date, timedelta
 from decimal import Decimal, InvalidOperation
-from math import sqrt
 
+import numpy as np
 from django.db.models import Max, Sum
 from django.utils import timezone
 
 from recetas.models import Receta
+from reportes import forecast_arrays as fa
 from reportes.forecast_calibration_service import (
     DEFAULT_BIAS_ADJUSTMENT,
     DEFAULT_BUFFER_MULTIPLIER,
@@ -37,12 +37,6 @@ def _to_decimal(value, default: str = "0") -> Decimal:
         return Decimal(default)
 
 
-def _safe_div(numerator: Decimal, denominator: Decimal) -> Decimal:
-    if denominator <= ZERO:
-        return ZERO
-    return numerator / denominator
-
-
 def _quantize_units(value: Decimal) -> Decimal:
     return value.quantize(Decimal("0.001"))
 
@@ -51,130 +45,12 @@ def _quantize_money(value: Decimal) -> Decimal:
     return value.quantize(Decimal("0.01"))
 
 
-def _clamp(value: Decimal, floor: Decimal, ceiling: Decimal) -> Decimal:
-    return max(floor, min(value, ceiling))
-
-
 def _limit_rows(rows: list[dict[str, object]], top_n: int | None) -> list[dict[str, object]]:
     if top_n is None or top_n <= 0:
         return rows
     return rows[:top_n]
 
 
-def _mean(values: list[Decimal]) -> Decimal:
-    if not values:
-        return ZERO
-    return sum(values, ZERO) / Decimal(len(values))
-
-
-def _median(values: list[Decimal]) -> Decimal:
-    ordered = sorted(value for value in values if value > ZERO)
-    if not ordered:
-        return ZERO
-    middle = len(ordered) // 2
-    if len(ordered) % 2:
-        return ordered[middle]
-    return (ordered[middle - 1] + ordered[middle]) / Decimal("2")
-
-
-def _robust_values(values: list[Decimal], *, high_multiplier: Decimal = Decimal("2.25")) -> list[Decimal]:
-    median_value = _median(values)
-    if median_value <= ZERO:
-        return values
-    ceiling = median_value * high_multiplier
-    return [min(value, ceiling) if value > ZERO else value for value in values]
-
-
-def _robust_mean(values: list[Decimal], *, high_multiplier: Decimal = Decimal("2.25")) -> Decimal:
-    return _mean(_robust_values(values, high_multiplier=high_multiplier))
-
-
-def _stddev(values: list[Decimal]) -> Decimal:
-    if not values:
-        return ZERO
-    robust_values = _robust_values(values)
-    mean_value = _mean(robust_values)
-    variance = sum((value - mean_value) ** 2 for value in robust_values) / Decimal(len(robust_values))
-    return Decimal(str(sqrt(float(variance)))) if variance > ZERO else ZERO
-
-
-def _history_window(series: dict[date, dict[str, Decimal]], target_day: date, start_offset: int, end_offset: int) -> list[Decimal]:
-    return [
-        _to_decimal((series.get(target_day - timedelta(days=offset)) or {}).get("qty"))
-        for offset in range(start_offset, end_offset + 1)
-    ]
-
-
-def _same_weekday_history(
-    series: dict[date, dict[str, Decimal]],
-    target_day: date,
-    lookback_weeks: int,
-    history_anchor: date | None = None,
-) -> list[Decimal]:
-    if history_anchor is None:
-        return [
-            _to_decimal((series.get(target_day - timedelta(days=7 * week)) or {}).get("qty"))
-            for week in range(1, lookback_weeks + 1)
-        ]
-    values = []
-    cursor = history_anchor - timedelta(days=1)
-    while len(values) < lookback_weeks and cursor >= history_anchor - timedelta(days=lookback_weeks * 14):
-        if cursor.weekday() == target_day.weekday():
-            values.append(_to_decimal((series.get(cursor) or {}).get("qty")))
-        cursor -= timedelta(days=1)
-    return values
-
-
-def _weighted_moving_average(
-    series: dict[date, dict[str, Decimal]],
-    target_day: date,
-    recent_weight: Decimal = DEFAULT_RECENT_WEIGHT,
-    mid_weight: Decimal = DEFAULT_MID_WEIGHT,
-    older_weight: Decimal = DEFAULT_OLDER_WEIGHT,
-) -> Decimal:
-    recent_14 = _robust_mean(_history_window(series, target_day, 1, 14))
-    previous_14 = _robust_mean(_history_window(series, target_day, 15, 28))
-    older_28 = _robust_mean(_history_window(series, target_day, 29, 56))
-    return (recent_14 * recent_weight) + (previous_14 * mid_weight) + (older_28 * older_weight)
-
-
-def _weekday_factor(
-    series: dict[date, dict[str, Decimal]],
-    target_day: date,
-    lookback_weeks: int,
-    history_anchor: date | None = None,
-) -> Decimal:
-    history_anchor = history_anchor or target_day
-    weekday_values = _same_weekday_history(series, target_day, lookback_weeks, history_anchor)
-    trailing_values = _history_window(series, history_anchor, 1, max(lookback_weeks * 7, 7))
-    weekday_avg = _robust_mean(weekday_values)
-    trailing_avg = _robust_mean(trailing_values)
-    if weekday_avg <= ZERO or trailing_avg <= ZERO:
-        return ONE
-    return _clamp(weekday_avg / trailing_avg, Decimal("0.70"), Decimal("1.35"))
-
-
-def _trend_factor(series: dict[date, dict[str, Decimal]], target_day: date) -> tuple[Decimal, Decimal]:
-    recent_14 = _robust_mean(_history_window(series, target_day, 1, 14))
-    previous_14 = _robust_mean(_history_window(series, target_day, 15, 28))
-    if recent_14 <= ZERO or previous_14 <= ZERO:
-        return ONE, ZERO
-    ratio = _clamp(recent_14 / previous_14, Decimal("0.75"), Decimal("1.30"))
-    return ratio, ((ratio - ONE) * HUNDRED).quantize(Decimal("0.01"))
-
-
-def _recent_avg_price(series: dict[date, dict[str, Decimal]], target_day: date) -> Decimal:
-    trailing_rows = [
-        series.get(target_day - timedelta(days=offset), {})
-        for offset in range(1, 29)
-    ]
-    total_qty = sum(_to_decimal(row.get("qty")) for row in trailing_rows)
-    total_revenue = sum(_to_decimal(row.get("revenue")) for row in trailing_rows)
-    if total_qty <= ZERO:
-        return ZERO
-    return total_revenue / total_qty
-
-
 def _latest_contribution_map(keys: set[tuple[int, int]]) -> dict[tuple[int, int], dict[str, Decimal]]:
     if not keys:
         return {}
@@ -207,60 +83,132 @@ def _latest_contribution_map(keys: set[tuple[int, int]]) -> dict[tuple[int, int]
     }
 
 
+def _profile_settings(calibration_profile: dict[str, Decimal] | None) -> dict[str, Decimal]:
+    calibration_profile = calibration_profile or {}
+    return {
+        "recent_weight": _to_decimal(calibration_profile.get("recent_weight"), str(DEFAULT_RECENT_WEIGHT)),
+        "mid_weight": _to_decimal(calibration_profile.get("mid_weight"), str(DEFAULT_MID_WEIGHT)),
+        "older_weight": _to_decimal(calibration_profile.get("older_weight"), str(DEFAULT_OLDER_WEIGHT)),
+        "bias_adjustment": _to_decimal(calibration_profile.get("bias_adjustment"), str(DEFAULT_BIAS_ADJUSTMENT)),
+        "buffer_multiplier": _to_decimal(calibration_profile.get("buffer_multiplier"), str(DEFAULT_BUFFER_MULTIPLIER)),
+        "segment_wape_pct": _to_decimal(
+            calibration_profile.get("wape_after_pct") or calibration_profile.get("wape_before_pct")
+        ),
+        "execution_gap_pct": _to_decimal(calibration_profile.get("execution_gap_pct")),
+    }
+
+
+def _settings_arrays(settings: list[dict[str, Decimal]]) -> dict[str, np.ndarray]:
+    names = _profile_settings(None).keys()
+    return {name: np.asarray([float(item[name]) for item in settings], dtype=np.float64) for name in names}
+
+
+def _calibration_key(
+    key: tuple[int, int],
+    labels: dict[str, object],
+    target_day: date,
+    avg_28: float,
+) -> tuple[int, str, str, str]:
+    return (
+        int(key[0]),
+        (labels.get("family") or "SIN_FAMILIA").strip()[:120],
+        weekly_pattern_for_day(target_day),
+        rotation_band_for_avg(fa.decimal_at(avg_28, 6)),
+    )
+
+
+def _forecast_arrays(
+    matrix: fa.DailyMatrix,
+    rows: np.ndarray,
+    anchors: np.ndarray,
+    target_weekdays: np.ndarray,
+    lookback_weeks: int,
+    params: dict[str, np.ndarray],
+) -> dict[str, np.ndarray]:
+    """
+    Pronóstico de todas las observaciones (clave, día ancla) a la vez.
+
+    Ventanas 14/14/28 con media robusta ponderada, factor del mismo día de la
+    semana contra el promedio de ``lookback_weeks`` semanas, factor de
+    tendencia y buffer por volatilidad, error reciente y brecha de ejecución.
+    Las cantidades se redondean a 0.001 donde el cálculo escalar lo hacía.
+    """
+    qty = matrix.qty
+    recent_14 = fa.robust_mean(fa.window(qty, rows, anchors, 1, 14))
+    previous_14 = fa.robust_mean(fa.window(qty, rows, anchors, 15, 28))
+    older_28 = fa.robust_mean(fa.window(qty, rows, anchors, 29, 56))
+    weighted_avg = (
+        recent_14 * params["recent_weight"]
+        + previous_14 * params["mid_weight"]
+        + older_28 * params["older_weight"]
+    )
+
+    # Mismo día de la semana que el objetivo, hacia atrás desde el día previo al ancla.
+    first_offset = (matrix.weekday(anchors) - target_weekdays - 1) % 7 + 1
+    weekday_offsets = first_offset[:, None] + 7 * np.arange(lookback_weeks)[None, :]
+    same_weekday_avg = fa.robust_mean(fa.gather(qty, rows, anchors, weekday_offsets))
+    trailing_avg = fa.robust_mean(fa.window(qty, rows, anchors, 1, max(lookback_weeks * 7, 7)))
+    weekday_factor = np.where(
+        (same_weekday_avg > 0) & (trailing_avg > 0),
+        np.clip(fa.ratio_or(same_weekday_avg, trailing_avg), 0.70, 1.35),
+        1.0,
+    )
+    trend_factor = np.where(
+        (recent_14 > 0) & (previous_14 > 0),
+        np.clip(fa.ratio_or(recent_14, previous_14), 0.75, 1.30),
+        1.0,
+    )
+
+    window_28 = fa.window(qty, rows, anchors, 1, 28)
+    stddev_28 = fa.robust_stddev(window_28)
+    base_forecast = weighted_avg * weekday_factor * trend_factor * params["bias_adjustment"]
+    forecast_qty = fa.quantize(np.maximum(base_forecast, 0.0), 3)
+    dynamic_error_factor = np.minimum(params["segment_wape_pct"] / 100 * 0.35, 0.25)
+    execution_guard = np.minimum(params["execution_gap_pct"] / 100 * 0.20, 0.10)
+    raw_buffer = np.maximum(
+        stddev_28 * params["buffer_multiplier"],
+        forecast_qty * (0.12 + dynamic_error_factor + execution_guard),
+    )
+    buffer_units = fa.quantize(np.minimum(raw_buffer, forecast_qty * 0.65), 3)
+    avg_price = fa.ratio_or(fa.window(matrix.revenue, rows, anchors, 1, 28).sum(axis=1), window_28.sum(axis=1))
+    return {
+        "weighted_avg": weighted_avg,
+        "weekday_factor": weekday_factor,
+        "trend_factor": trend_factor,
+        "forecast_qty": forecast_qty,
+        "forecast_min_qty": fa.quantize(np.maximum(forecast_qty - buffer_units, 0.0), 3),
+        "forecast_max_qty": fa.quantize(forecast_qty + buffer_units, 3),
+        "buffer_units": buffer_units,
+        "avg_price": avg_price,
+        "recent_avg_7": fa.robust_mean(fa.window(qty, rows, anchors, 1, 7)),
+        "recent_avg_28": fa.robust_mean(window_28),
+        "same_weekday_avg": same_weekday_avg,
+        "stddev_28": stddev_28,
+    }
+
+
 def _build_forecast_row(
     *,
     key: tuple[int, int],
     labels: dict[str, object],
-    series: dict[date, dict[str, Decimal]],
+    metrics: dict[str, np.ndarray],
+    position: int,
     target_day: date,
-    history_anchor: date | None = None,
-    lookback_weeks: int = DEFAULT_LOOKBACK_WEEKS,
+    settings: dict[str, Decimal],
     contribution: dict[str, Decimal] | None,
-    calibration_profile: dict[str, Decimal] | None,
+    history_days: int,
 ) -> dict[str, object]:
-    history_anchor = history_anchor or target_day
-    recent_avg_28 = _robust_mean(_history_window(series, history_anchor, 1, 28))
-    weekly_pattern = weekly_pattern_for_day(target_day)
-    rotation_band = rotation_band_for_avg(recent_avg_28)
-    calibration_profile = calibration_profile or {}
-    recent_weight = _to_decimal(calibration_profile.get("recent_weight"), str(DEFAULT_RECENT_WEIGHT))
-    mid_weight = _to_decimal(calibration_profile.get("mid_weight"), str(DEFAULT_MID_WEIGHT))
-    older_weight = _to_decimal(calibration_profile.get("older_weight"), str(DEFAULT_OLDER_WEIGHT))
-    bias_adjustment = _to_decimal(calibration_profile.get("bias_adjustment"), str(DEFAULT_BIAS_ADJUSTMENT))
-    buffer_multiplier = _to_decimal(calibration_profile.get("buffer_multiplier"), str(DEFAULT_BUFFER_MULTIPLIER))
-    segment_wape_pct = _to_decimal(calibration_profile.get("wape_after_pct") or calibration_profile.get("wape_before_pct"))
-    execution_gap_pct = _to_decimal(calibration_profile.get("execution_gap_pct"))
-
-    weighted_avg = _weighted_moving_average(
-        series,
-        history_anchor,
-        recent_weight=recent_weight,
-        mid_weight=mid_weight,
-        older_weight=older_weight,
-    )
-    weekday_factor = _weekday_factor(series, target_day, lookback_weeks, history_anchor)
-    trend_factor, trend_pct = _trend_factor(series, history_anchor)
-    stddev_28 = _stddev(_history_window(series, history_anchor, 1, 28))
-    base_forecast = weighted_avg * weekday_factor * trend_factor * bias_adjustment
-    forecast_qty = _quantize_units(max(base_forecast, ZERO))
-    dynamic_error_factor = min((segment_wape_pct / HUNDRED) * Decimal("0.35"), Decimal("0.25"))
-    execution_guard = min((execution_gap_pct / HUNDRED) * Decimal("0.20"), Decimal("0.10"))
-    raw_buffer = max(
-        stddev_28 * buffer_multiplier,
-        forecast_qty * (Decimal("0.12") + dynamic_error_factor + execution_guard),
-    )
-    buffer_units = _quantize_units(min(raw_buffer, forecast_qty * Decimal("0.65")))
-    forecast_min = _quantize_units(max(forecast_qty - buffer_units, ZERO))
-    forecast_max = _quantize_units(forecast_qty + buffer_units)
-    avg_price = _recent_avg_price(series, history_anchor)
-    forecast_amount = _quantize_money(forecast_qty * avg_price)
-    recent_avg_7 = _robust_mean(_history_window(series, history_anchor, 1, 7))
-    same_weekday_avg = _robust_mean(_same_weekday_history(series, target_day, lookback_weeks, history_anchor))
+    value = {name: values[position] for name, values in metrics.items()}
+    recent_weight = settings["recent_weight"]
+    mid_weight = settings["mid_weight"]
+    older_weight = settings["older_weight"]
+    bias_adjustment = settings["bias_adjustment"]
+    buffer_multiplier = settings["buffer_multiplier"]
     contribution = contribution or {}
     why = (
-        f"Promedio ponderado {weighted_avg.quantize(Decimal('0.01'))} pzs con pesos "
+        f"Promedio ponderado {fa.decimal_at(value['weighted_avg'], 2)} pzs con pesos "
         f"{recent_weight.quantize(Decimal('0.01'))}/{mid_weight.quantize(Decimal('0.01'))}/{older_weight.quantize(Decimal('0.01'))}, "
-        f"ajuste día {weekday_factor.quantize(Decimal('0.01'))}x, "
+        f"ajuste día {fa.decimal_at(value['weekday_factor'], 2)}x, "
         f"sesgo {((bias_adjustment - ONE) * HUNDRED).quantize(Decimal('0.01'))}% y buffer {buffer_multiplier.quantize(Decimal('0.01'))}x."
     )
     return {
@@ -271,88 +219,80 @@ def _build_forecast_row(
         "recipe_name": labels["recipe_name"],
         "family": labels["family"],
         "category": labels["category"],
-        "forecast_qty": forecast_qty,
-        "forecast_min_qty": forecast_min,
-        "forecast_max_qty": forecast_max,
-        "forecast_amount": forecast_amount,
-        "buffer_units": buffer_units,
-        "trend_pct": trend_pct,
-        "trend_factor": trend_factor.quantize(Decimal("0.0001")),
-        "weekday_factor": weekday_factor.quantize(Decimal("0.0001")),
-        "recent_avg_7": _quantize_units(recent_avg_7),
-        "recent_avg_28": _quantize_units(recent_avg_28),
-        "same_weekday_avg": _quantize_units(same_weekday_avg),
-        "stddev_28": _quantize_units(stddev_28),
-        "weekly_pattern": weekly_pattern,
-        "rotation_band": rotation_band,
+        "forecast_qty": fa.decimal_at(value["forecast_qty"], 3),
+        "forecast_min_qty": fa.decimal_at(value["forecast_min_qty"], 3),
+        "forecast_max_qty": fa.decimal_at(value["forecast_max_qty"], 3),
+        "forecast_amount": fa.decimal_at(value["forecast_qty"] * value["avg_price"], 2),
+        "buffer_units": fa.decimal_at(value["buffer_units"], 3),
+        "trend_pct": fa.decimal_at((value["trend_factor"] - 1) * 100, 2),
+        "trend_factor": fa.decimal_at(value["trend_factor"], 4),
+        "weekday_factor": fa.decimal_at(value["weekday_factor"], 4),
+        "recent_avg_7": fa.decimal_at(value["recent_avg_7"], 3),
+        "recent_avg_28": fa.decimal_at(value["recent_avg_28"], 3),
+        "same_weekday_avg": fa.decimal_at(value["same_weekday_avg"], 3),
+        "stddev_28": fa.decimal_at(value["stddev_28"], 3),
+        "weekly_pattern": weekly_pattern_for_day(target_day),
+        "rotation_band": rotation_band_for_avg(fa.decimal_at(value["recent_avg_28"], 6)),
         "bias_adjustment": bias_adjustment.quantize(Decimal("0.0001")),
         "buffer_multiplier": buffer_multiplier.quantize(Decimal("0.0001")),
-        "segment_wape_pct": segment_wape_pct.quantize(Decimal("0.01")),
-        "execution_gap_pct": execution_gap_pct.quantize(Decimal("0.01")),
-        "avg_price": _quantize_money(avg_price),
+        "segment_wape_pct": settings["segment_wape_pct"].quantize(Decimal("0.01")),
+        "execution_gap_pct": settings["execution_gap_pct"].quantize(Decimal("0.01")),
+        "avg_price": fa.decimal_at(value["avg_price"], 2),
         "margin_pct": _to_decimal(contribution.get("margin_pct")),
         "contribution_unit": _to_decimal(contribution.get("contribution_unit")),
         "contribution_total": _to_decimal(contribution.get("contribution_total")),
-        "history_days": sum(1 for day in series if day < history_anchor and _to_decimal((series.get(day) or {}).get("qty")) > ZERO),
+        "history_days": history_days,
         "why": why,
     }
 
 
 def _build_backtest_summary(
     *,
-    candidates: list[tuple[tuple[int, int], dict[str, object], dict[date, dict[str, Decimal]]]],
+    matrix: fa.DailyMatrix,
+    candidates: list[tuple[tuple[int, int], dict[str, object]]],
     reference_date: date,
     lookback_weeks: int,
     validation_days: int,
     calibration_profiles: dict[tuple[int, str, str, str], dict[str, Decimal]] | None = None,
 ) -> dict[str, object]:
     calibration_profiles = calibration_profiles or {}
-    total_actual = ZERO
-    total_abs_error = ZERO
-    hits = 0
-    observations = 0
-    for key, labels, series in candidates:
-        for offset in range(validation_days, 0, -1):
-            target_day = reference_date - timedelta(days=offset)
-            if sum(1 for day in series if day < target_day and _to_decimal((series.get(day) or {}).get("qty")) > ZERO) < 14:
-                continue
-            contribution = {
-                "margin_pct": ZERO,
-                "contribution_unit": ZERO,
-                "contribution_total": ZERO,
-            }
-            avg_28 = _mean(_history_window(series, target_day, 1, 28))
-            calibration_key = (
-                int(key[0]),
-                (labels.get("family") or "SIN_FAMILIA").strip()[:120],
-                weekly_pattern_for_day(target_day),
-                rotation_band_for_avg(avg_28),
-            )
-            row = _build_forecast_row(
-                key=key,
-                labels=labels,
-                series=series,
-                target_day=target_day,
-                history_anchor=target_day,
-                lookback_weeks=lookback_weeks,
-                contribution=contribution,
-                calibration_profile=calibration_profiles.get(calibration_key),
+    target_days = [reference_date - timedelta(days=offset) for offset in range(validation_days, 0, -1)]
+    rows = np.repeat(
+        np.asarray([matrix.positions[key] for key, _ in candidates], dtype=np.int64),
+        len(target_days),
+    )
+    anchors = np.tile(np.asarray([matrix.day_index(day) for day in target_days], dtype=np.int64), len(candidates))
+    eligible = matrix.positive_days_before(rows, anchors) >= 14
+    rows, anchors = rows[eligible], anchors[eligible]
+    avg_28 = fa.mean(fa.window(matrix.qty, rows, anchors, 1, 28))
+    labels_by_row = {matrix.positions[key]: labels for key, labels in candidates}
+    settings = [
+        _profile_settings(
+            calibration_profiles.get(
+                _calibration_key(
+                    matrix.keys[row],
+                    labels_by_row[row],
+                    matrix.start + timedelta(days=int(anchor)),
+                    avg,
+                )
             )
-            actual = _to_decimal((series.get(target_day) or {}).get("qty"))
-            forecast_qty = _to_decimal(row.get("forecast_qty"))
-            total_actual += actual
-            total_abs_error += abs(forecast_qty - actual)
-            if _to_decimal(row.get("forecast_min_qty")) <= actual <= _to_decimal(row.get("forecast_max_qty")):
-                hits += 1
-            observations += 1
-    wape = (_safe_div(total_abs_error, total_actual) * HUNDRED).quantize(Decimal("0.01")) if total_actual > ZERO else ZERO
-    hit_rate = (_safe_div(Decimal(hits), Decimal(observations)) * HUNDRED).quantize(Decimal("0.01")) if observations else ZERO
+        )
+        for row, anchor, avg in zip(rows, anchors, avg_28)
+    ]
+    metrics = _forecast_arrays(matrix, rows, anchors, matrix.weekday(anchors), lookback_weeks, _settings_arrays(settings))
+    actual = fa.gather(matrix.qty, rows, anchors, [0])[:, 0]
+    total_actual = float(actual.sum())
+    total_abs_error = float(np.abs(metrics["forecast_qty"] - actual).sum())
+    hits = int(((metrics["forecast_min_qty"] <= actual) & (actual <= metrics["forecast_max_qty"])).sum())
+    observations = int(rows.size)
+    wape = fa.decimal_at(total_abs_error / total_actual * 100, 2) if total_actual > 0 else ZERO
+    hit_rate = fa.decimal_at(hits / observations * 100, 2) if observations else ZERO
     return {
         "observations": observations,
         "wape_pct": wape,
         "interval_hit_rate_pct": hit_rate,
-        "total_actual_units": _quantize_units(total_actual),
-        "absolute_error_units": _quantize_units(total_abs_error),
+        "total_actual_units": fa.decimal_at(total_actual, 3),
+        "absolute_error_units": fa.decimal_at(total_abs_error, 3),
     }
 
 
@@ -394,9 +334,8 @@ def build_daily_forecast_context(
         .order_by("sucursal__codigo", "receta__nombre", "fecha")
     )
 
-    series_by_key: dict[tuple[int, int], dict[date, dict[str, Decimal]]] = defaultdict(dict)
     labels_by_key: dict[tuple[int, int], dict[str, object]] = {}
-    recent_revenue_by_key: dict[tuple[int, int], Decimal] = defaultdict(lambda: ZERO)
+    recent_keys: set[tuple[int, int]] = set()
     for row in sales_rows:
         key = (int(row["sucursal_id"]), int(row["receta_id"]))
         labels_by_key[key] = {
@@ -406,51 +345,62 @@ def build_daily_forecast_context(
             "family": row.get("receta__familia") or "",
             "category": row.get("receta__categoria") or "",
         }
-        day = row["fecha"]
-        qty = _to_decimal(row.get("qty"))
-        revenue = _to_decimal(row.get("revenue"))
-        margin = _to_decimal(row.get("margin"))
-        series_by_key[key][day] = {"qty": qty, "revenue": revenue, "margin": margin}
-        if day >= history_anchor - timedelta(days=28):
-            recent_revenue_by_key[key] += revenue
+        if row["fecha"] >= history_anchor - timedelta(days=28):
+            recent_keys.add(key)
+    matrix = fa.DailyMatrix(list(labels_by_key), history_start, history_end)
+    for row in sales_rows:
+        matrix.set((int(row["sucursal_id"]), int(row["receta_id"])), row["fecha"], row.get("qty"), row.get("revenue"))
 
+    recent_start = max(matrix.day_index(history_anchor - timedelta(days=28)), 0)
+    # Redondeo a 6 decimales para que montos iguales empaten igual que en Decimal.
+    recent_revenue = np.round(matrix.revenue[:, recent_start:].sum(axis=1), 6)
     ranked_keys = sorted(
-        recent_revenue_by_key,
-        key=lambda key: (recent_revenue_by_key[key], key[0], key[1]),
+        recent_keys,
+        key=lambda key: (recent_revenue[matrix.positions[key]], key[0], key[1]),
         reverse=True,
     )
     selected_keys = ranked_keys if top_n is None or top_n <= 0 else ranked_keys[:top_n]
     contribution_map = _latest_contribution_map(set(selected_keys))
     calibration_profiles, calibration_summary = load_latest_calibration_profiles(reference_date=reference_date)
-    rows: list[dict[str, object]] = []
-    backtest_candidates: list[tuple[tuple[int, int], dict[str, object], dict[date, dict[str, Decimal]]]] = []
-    for key in selected_keys:
-        series = series_by_key[key]
-        if sum(1 for day in series if day < history_anchor and _to_decimal((series.get(day) or {}).get("qty")) > ZERO) < 14:
-            continue
-        avg_28 = _mean(_history_window(series, history_anchor, 1, 28))
-        calibration_key = (
-            int(key[0]),
-            (labels_by_key[key].get("family") or "SIN_FAMILIA").strip()[:120],
-            weekly_pattern_for_day(target_date),
-            rotation_band_for_avg(avg_28),
-        )
-        row = _build_forecast_row(
+
+    positions = np.asarray([matrix.positions[key] for key in selected_keys], dtype=np.int64)
+    anchors = np.full(positions.size, matrix.day_index(history_anchor), dtype=np.int64)
+    history_days = matrix.positive_days_before(positions, anchors)
+    eligible = history_days >= 14
+    forecast_keys = [key for key, keep in zip(selected_keys, eligible) if keep]
+    positions, anchors, history_days = positions[eligible], anchors[eligible], history_days[eligible]
+    avg_28 = fa.mean(fa.window(matrix.qty, positions, anchors, 1, 28))
+    settings = [
+        _profile_settings(calibration_profiles.get(_calibration_key(key, labels_by_key[key], target_date, avg)))
+        for key, avg in zip(forecast_keys, avg_28)
+    ]
+    metrics = _forecast_arrays(
+        matrix,
+        positions,
+        anchors,
+        np.full(positions.size, target_date.weekday(), dtype=np.int64),
+        lookback_weeks,
+        _settings_arrays(settings),
+    )
+    rows: list[dict[str, object]] = [
+        _build_forecast_row(
             key=key,
             labels=labels_by_key[key],
-            series=series,
+            metrics=metrics,
+            position=index,
             target_day=target_date,
-            history_anchor=history_anchor,
-            lookback_weeks=lookback_weeks,
+            settings=settings[index],
             contribution=contribution_map.get(key),
-            calibration_profile=calibration_profiles.get(calibration_key),
+            history_days=int(history_days[index]),
         )
-        rows.append(row)
-        backtest_candidates.append((key, labels_by_key[key], series))
+        for index, key in enumerate(forecast_keys)
+    ]
+    backtest_candidates = [(key, labels_by_key[key]) for key in forecast_keys]
     rows.sort(key=lambda row: (_to_decimal(row.get("forecast_amount")), _to_decimal(row.get("forecast_qty"))), reverse=True)
     total_units = sum((_to_decimal(row.get("forecast_qty")) for row in rows), ZERO)
     total_amount = sum((_to_decimal(row.get("forecast_amount")) for row in rows), ZERO)
     validation = _build_backtest_summary(
+        matrix=matrix,
         candidates=backtest_candidates[: min(len(backtest_candidates), 25)],
         reference_date=reference_date,
         lookback_weeks=lookback_weeks,
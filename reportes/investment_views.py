@@ -15,7 +15,6 @@ from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
-from openpyxl import Workbook
 
 from compras.models import OrdenCompra, RecepcionCompra
 from core.models import Sucursal
@@ -35,6 +34,7 @@ from reportes.models import (
 from reportes.services_expansion_decision import ExpansionDecisionService
 from reportes.services_expansion_forecast import ExpansionForecastService, recomendar_apertura
 from reportes.services_expansion_calibration import ExpansionCalibrationService
+from reportes.services_expansion_montecarlo import ExpansionMonteCarloService
 from reportes.services_expansion_simulations import ExpansionSimulationRegistryService
 from reportes.services_investment_projects import (
     ProyectoInversionScenarioService,
@@ -594,6 +594,8 @@ def _export_simulation_pdf(report_payload: dict[str, object]) -> HttpResponse:
 
 
 def _export_simulation_xlsx(report_payload: dict[str, object]) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     summary_ws = wb.active
     summary_ws.title = "Resumen"
@@ -682,6 +684,8 @@ def _calibration_report_lines(calibration_context: dict[str, object]) -> list[st
 
 
 def _export_calibration_xlsx(calibration_context: dict[str, object]) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Calibracion"
@@ -813,6 +817,8 @@ def _project_report_lines(context: dict[str, object], report_key: str) -> list[s
 
 
 def _export_project_xlsx(context: dict[str, object], report_key: str) -> HttpResponse:
+    from openpyxl import Workbook
+
     project = context["project"]
     wb = Workbook()
     ws = wb.active
@@ -1887,9 +1893,35 @@ def api_bamoa_guamuchil_benchmark(request: HttpRequest) -> JsonResponse:
         return JsonResponse({"ok": False, "error": str(exc)}, status=500)
 
 
+@login_required
+def api_expansion_montecarlo(request: HttpRequest) -> JsonResponse:
+    """Bandas P10/P50/P90 de VAN, TIR y payback para una apertura, muestreadas del histórico comparable."""
+    _require_reportes_access(request.user)
+    inputs = _simulator_inputs_from_request(request)
+    base_project = None
+    if inputs["base_project_id"]:
+        base_project = get_object_or_404(ProyectoInversion, pk=inputs["base_project_id"])
+    seed_raw = (request.GET.get("seed") or "").strip()
+    discount_raw = (request.GET.get("discount_rate") or "").strip()
+    payload = ExpansionMonteCarloService().simulate(
+        base_project=base_project,
+        tipo_proyecto=ProyectoInversion.TIPO_APERTURA_SUCURSAL,
+        investment_estimate=inputs["investment_estimate"],
+        monthly_rent=inputs["monthly_rent"],
+        sales_adjustment_pct=inputs["sales_adjustment_pct"],
+        annual_discount_rate=_parse_decimal(discount_raw) if discount_raw else None,
+        iterations=_parse_int(request.GET.get("iterations"), default=ExpansionMonteCarloService.DEFAULT_ITERATIONS),
+        horizon_months=_parse_int(request.GET.get("horizon_months"), default=ExpansionMonteCarloService.DEFAULT_HORIZON_MONTHS),
+        seed=_parse_int(seed_raw) if seed_raw else None,
+    )
+    return JsonResponse({"ok": True, "simulation": payload})
+
+
 @login_required
 def proyecto_viabilidad_export_excel(request: HttpRequest, project_id: int) -> HttpResponse:
     """Exporta el análisis de viabilidad del proyecto a Excel."""
+    from openpyxl import Workbook
+
     _require_reportes_access(request.user)
     project = get_object_or_404(ProyectoInversion, pk=project_id)
     escenarios = list(project.escenarios.all().order_by("tipo_escenario", "nombre"))
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reportes.executive_panels import EXECUTIVE_PANEL_SPECS, refresh_executive_panels
+
+
+class Command(BaseCommand):
+    help = "Recalcula los paneles ejecutivos de BI vencidos y muestra su frescura y tiempo de construcción."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--panel", action="append", dest="panels", help="Panel a recalcular (repetible)")
+        parser.add_argument("--months", type=int, default=6, help="Ventana de meses de los paneles")
+        parser.add_argument("--force", action="store_true", help="Recalcula aunque el panel esté vigente")
+
+    def handle(self, *args, **options):
+        panels = options.get("panels") or None
+        unknown = sorted(set(panels or []) - set(EXECUTIVE_PANEL_SPECS))
+        if unknown:
+            raise CommandError(f"Paneles desconocidos: {', '.join(unknown)}")
+
+        summary = refresh_executive_panels(
+            panels=panels,
+            months=max(1, int(options.get("months") or 6)),
+            force=bool(options.get("force")),
+        )
+        for name, row in summary.items():
+            age = "-" if row["age_seconds"] is None else f"{row['age_seconds']}s"
+            line = (
+                f"{name}: {'recalculado' if row['rebuilt'] else 'vigente'} "
+                f"duracion={row['duration_ms']}ms antiguedad={age} vencido={row['stale']}"
+            )
+            if row["last_error"]:
+                self.stdout.write(self.style.ERROR(f"{line} error={row['last_error']}"))
+            else:
+                self.stdout.write(line)
@@ -31,7 +31,8 @@ class Command(BaseCommand):
                 self.style.NOTICE(
                     "Full rebuild analytics "
                     f"sales={summary.sales_rows} inventory={summary.inventory_rows} "
-                    f"production={summary.production_rows} forecast={summary.forecast_rows}"
+                    f"production={summary.production_rows} forecast={summary.forecast_rows} "
+                    f"consumo_teorico={summary.consumption_rows}"
                 )
             )
         else:
@@ -40,7 +41,8 @@ class Command(BaseCommand):
                 self.style.NOTICE(
                     "Incremental analytics "
                     f"sales={summary.sales_rows} inventory={summary.inventory_rows} "
-                    f"production={summary.production_rows} forecast={summary.forecast_rows}"
+                    f"production={summary.production_rows} forecast={summary.forecast_rows} "
+                    f"consumo_teorico={summary.consumption_rows}"
                 )
             )
 
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reportes.forecast_backtest_service import (
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_HORIZONS,
+    DEFAULT_METHODS,
+    DEFAULT_ORIGINS,
+    DEFAULT_STEP_DAYS,
+    LEVEL_GLOBAL,
+    recommend_methods,
+    run_forecast_backtest,
+)
+
+
+class Command(BaseCommand):
+    help = "Corre un backtest rolling-origin de los motores de forecast y guarda MAPE/WAPE/sesgo y tiempo de ajuste."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reference-date", help="Último día con venta real a evaluar YYYY-MM-DD. Default: ayer.")
+        parser.add_argument(
+            "--horizon",
+            action="append",
+            type=int,
+            default=[],
+            help=f"Horizonte en días. Puede repetirse. Default: {', '.join(str(h) for h in DEFAULT_HORIZONS)}.",
+        )
+        parser.add_argument("--origins", type=int, default=DEFAULT_ORIGINS, help="Número de orígenes rolling.")
+        parser.add_argument("--step-days", type=int, default=DEFAULT_STEP_DAYS, help="Días entre orígenes.")
+        parser.add_argument(
+            "--history-days",
+            type=int,
+            default=DEFAULT_HISTORY_DAYS,
+            help="Días de historia para los ajustes por serie (ETS/Prophet).",
+        )
+        parser.add_argument("--sucursal-id", action="append", type=int, default=[], help="Sucursal. Puede repetirse.")
+        parser.add_argument("--receta-id", action="append", type=int, default=[], help="Receta. Puede repetirse.")
+        parser.add_argument(
+            "--method",
+            action="append",
+            choices=DEFAULT_METHODS,
+            default=[],
+            help="Método a evaluar. Puede repetirse. Default: todos.",
+        )
+        parser.add_argument("--workers", type=int, help="Procesos para los ajustes por serie.")
+
+    def handle(self, *args, **options):
+        reference_date = self._parse_date(options.get("reference_date"))
+        try:
+            run = run_forecast_backtest(
+                reference_date=reference_date,
+                horizons=options.get("horizon") or DEFAULT_HORIZONS,
+                origins=options["origins"],
+                step_days=options["step_days"],
+                history_days=options["history_days"],
+                sucursal_ids=options.get("sucursal_id"),
+                receta_ids=options.get("receta_id"),
+                methods=options.get("method") or None,
+                max_workers=options.get("workers"),
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        global_rows = run.results.filter(sucursal__isnull=True, familia="").order_by("horizon_days", "wape_pct")
+        payload = {
+            "run_id": run.id,
+            "reference_date": run.reference_date.isoformat(),
+            "series": run.series_count,
+            "workers": run.workers,
+            "elapsed_seconds": str(run.elapsed_seconds),
+            "skipped_methods": run.metadata.get("skipped_methods") or [],
+            "global": [
+                {
+                    "method": row.method,
+                    "horizon_days": row.horizon_days,
+                    "mape_pct": str(row.mape_pct) if row.mape_pct is not None else None,
+                    "wape_pct": str(row.wape_pct) if row.wape_pct is not None else None,
+                    "bias_pct": str(row.bias_pct) if row.bias_pct is not None else None,
+                    "fit_seconds": str(row.fit_seconds),
+                }
+                for row in global_rows
+                if row.metadata.get("level") == LEVEL_GLOBAL
+            ],
+            "recommended": [
+                {
+                    "family": item["familia"],
+                    "method": item["recommended_method"],
+                    "wape_pct": str(item["recommended_wape_pct"]),
+                    "best_method": item["best_method"],
+                }
+                for item in recommend_methods(run, horizon_days=run.horizons[-1])
+            ],
+        }
+        self.stdout.write(json.dumps(payload, ensure_ascii=False, indent=2))
+
+    def _parse_date(self, raw_value: str | None) -> date | None:
+        if not raw_value:
+            return None
+        try:
+            return date.fromisoformat(str(raw_value).strip())
+        except ValueError as exc:
+            raise CommandError("--reference-date debe venir en formato YYYY-MM-DD.") from exc
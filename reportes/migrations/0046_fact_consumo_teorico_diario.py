@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_expand_user_module_access_catalog'),
+        ('maestros', '0017_catalog_search_trigram_indexes'),
+        ('reportes', '0045_fuente_unica_presupuesto'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='analyticrefreshwindow',
+            name='dataset',
+            field=models.CharField(choices=[('FACT_VENTAS', 'Fact ventas'), ('FACT_INVENTARIO', 'Fact inventario'), ('FACT_PRODUCCION', 'Fact producción'), ('FORECAST_INPUTS', 'Forecast inputs'), ('SNAPSHOT_LEDGER', 'Snapshot ledger'), ('SNAPSHOT_FLOW', 'Snapshot flujo central'), ('FACT_CONSUMO_TEORICO', 'Fact consumo teórico')], db_index=True, max_length=40),
+        ),
+        migrations.CreateModel(
+            name='FactConsumoTeoricoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(db_index=True)),
+                ('fuente', models.CharField(choices=[('PLAN', 'Plan de producción'), ('VENTA_POS', 'Venta POS'), ('MERMA_POS', 'Merma POS')], max_length=20)),
+                ('cantidad', models.DecimalField(decimal_places=6, default=0, max_digits=24)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('insumo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facts_consumo_teorico_diario', to='maestros.insumo')),
+                ('sucursal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='facts_consumo_teorico_diario', to='core.sucursal')),
+            ],
+            options={
+                'verbose_name': 'Fact consumo teórico diario',
+                'verbose_name_plural': 'Facts consumo teórico diario',
+                'ordering': ['-fecha', 'fuente', 'insumo_id', 'id'],
+                'indexes': [models.Index(fields=['fecha', 'fuente', 'sucursal'], name='rfact_cons_day_src_idx')],
+                'unique_together': {('fecha', 'sucursal', 'insumo', 'fuente')},
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_expand_user_module_access_catalog'),
+        ('reportes', '0046_fact_consumo_teorico_diario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastBacktestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reference_date', models.DateField(db_index=True)),
+                ('horizons', models.JSONField(blank=True, default=list)),
+                ('methods', models.JSONField(blank=True, default=list)),
+                ('origins', models.PositiveIntegerField(default=0)),
+                ('step_days', models.PositiveIntegerField(default=7)),
+                ('history_days', models.PositiveIntegerField(default=0)),
+                ('sucursal_ids', models.JSONField(blank=True, default=list)),
+                ('receta_ids', models.JSONField(blank=True, default=list)),
+                ('series_count', models.PositiveIntegerField(default=0)),
+                ('workers', models.PositiveIntegerField(default=1)),
+                ('elapsed_seconds', models.DecimalField(decimal_places=3, default=0, max_digits=12)),
+                ('status', models.CharField(choices=[('RUNNING', 'En proceso'), ('OK', 'OK'), ('ERROR', 'Error')], db_index=True, default='RUNNING', max_length=16)),
+                ('error', models.TextField(blank=True, default='')),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='forecast_backtest_runs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Backtest de forecast',
+                'verbose_name_plural': 'Backtests de forecast',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ForecastBacktestResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('forecast-diario', 'Forecast diario (reportes)'), ('forecast-operativo', 'Forecast operativo 3 semanas (proyecciones)'), ('ets', 'ETS estacional (pronóstico)'), ('prophet', 'Prophet (pronóstico)'), ('promedio-simple', 'Promedio mismo día (línea base)')], db_index=True, max_length=40)),
+                ('horizon_days', models.PositiveSmallIntegerField()),
+                ('familia', models.CharField(blank=True, db_index=True, default='', max_length=120)),
+                ('series_count', models.PositiveIntegerField(default=0)),
+                ('observations', models.PositiveIntegerField(default=0)),
+                ('actual_units', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('forecast_units', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('mape_pct', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('wape_pct', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('bias_pct', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('fits', models.PositiveIntegerField(default=0)),
+                ('fit_seconds', models.DecimalField(decimal_places=4, default=0, max_digits=12)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('sucursal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='forecast_backtest_results', to='core.sucursal')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='reportes.forecastbacktestrun')),
+            ],
+            options={
+                'verbose_name': 'Resultado de backtest de forecast',
+                'verbose_name_plural': 'Resultados de backtest de forecast',
+                'ordering': ['run', 'horizon_days', 'sucursal__codigo', 'familia', 'wape_pct'],
+                'indexes': [models.Index(fields=['run', 'horizon_days', 'method'], name='rfcstbt_run_horizon_idx')],
+                'unique_together': {('run', 'method', 'horizon_days', 'sucursal', 'familia')},
+            },
+        ),
+    ]
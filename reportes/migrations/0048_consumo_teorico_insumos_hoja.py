@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:00
+
+from django.db import migrations
+from django.db.models import Max, Min
+
+
+def marcar_consumo_teorico_pendiente(apps, schema_editor):
+    # Las filas existentes guardan el insumo canónico de cuando se escribieron;
+    # el refresh analítico las reconstruye con insumos hoja.
+    FactConsumoTeoricoDiario = apps.get_model("reportes", "FactConsumoTeoricoDiario")
+    AnalyticRefreshWindow = apps.get_model("reportes", "AnalyticRefreshWindow")
+    bounds = FactConsumoTeoricoDiario.objects.aggregate(date_from=Min("fecha"), date_to=Max("fecha"))
+    if bounds["date_from"] is None:
+        return
+    AnalyticRefreshWindow.objects.create(
+        dataset="FACT_CONSUMO_TEORICO",
+        date_from=bounds["date_from"],
+        date_to=bounds["date_to"],
+        reason="consumo teórico con insumos hoja",
+        status="PENDING",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reportes", "0047_forecast_backtest"),
+    ]
+
+    operations = [
+        migrations.RunPython(marcar_consumo_teorico_pendiente, migrations.RunPython.noop),
+    ]
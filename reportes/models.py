@@ -1338,6 +1338,48 @@ class FactProduccionDiaria(models.Model):
         return f"{self.fecha} · {self.receta or 'Sin receta'}"
 
 
+class FactConsumoTeoricoDiario(models.Model):
+    """Consumo teórico de insumo hoja por día, sucursal y fuente, con BOM explotado a varios niveles."""
+
+    FUENTE_PLAN = "PLAN"
+    FUENTE_VENTA = "VENTA_POS"
+    FUENTE_MERMA = "MERMA_POS"
+    FUENTE_CHOICES = [
+        (FUENTE_PLAN, "Plan de producción"),
+        (FUENTE_VENTA, "Venta POS"),
+        (FUENTE_MERMA, "Merma POS"),
+    ]
+
+    fecha = models.DateField(db_index=True)
+    sucursal = models.ForeignKey(
+        "core.Sucursal",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="facts_consumo_teorico_diario",
+    )
+    insumo = models.ForeignKey(
+        "maestros.Insumo",
+        on_delete=models.CASCADE,
+        related_name="facts_consumo_teorico_diario",
+    )
+    fuente = models.CharField(max_length=20, choices=FUENTE_CHOICES)
+    cantidad = models.DecimalField(max_digits=24, decimal_places=6, default=0)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-fecha", "fuente", "insumo_id", "id"]
+        verbose_name = "Fact consumo teórico diario"
+        verbose_name_plural = "Facts consumo teórico diario"
+        unique_together = [("fecha", "sucursal", "insumo", "fuente")]
+        indexes = [
+            models.Index(fields=["fecha", "fuente", "sucursal"], name="rfact_cons_day_src_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.fecha} · {self.fuente} · {self.insumo_id} · {self.cantidad}"
+
+
 class SnapshotLedgerInventarioMensual(models.Model):
     month_start = models.DateField(unique=True, db_index=True)
     month_end = models.DateField()
@@ -1528,6 +1570,99 @@ class ForecastCalibrationProfile(models.Model):
         return f"{self.reference_date} · {branch_label} · {family_label}"
 
 
+class ForecastBacktestRun(models.Model):
+    STATUS_RUNNING = "RUNNING"
+    STATUS_OK = "OK"
+    STATUS_ERROR = "ERROR"
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, "En proceso"),
+        (STATUS_OK, "OK"),
+        (STATUS_ERROR, "Error"),
+    ]
+
+    reference_date = models.DateField(db_index=True)
+    horizons = models.JSONField(default=list, blank=True)
+    methods = models.JSONField(default=list, blank=True)
+    origins = models.PositiveIntegerField(default=0)
+    step_days = models.PositiveIntegerField(default=7)
+    history_days = models.PositiveIntegerField(default=0)
+    sucursal_ids = models.JSONField(default=list, blank=True)
+    receta_ids = models.JSONField(default=list, blank=True)
+    series_count = models.PositiveIntegerField(default=0)
+    workers = models.PositiveIntegerField(default=1)
+    elapsed_seconds = models.DecimalField(max_digits=12, decimal_places=3, default=0)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_RUNNING, db_index=True)
+    error = models.TextField(blank=True, default="")
+    metadata = models.JSONField(default=dict, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="forecast_backtest_runs",
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        verbose_name = "Backtest de forecast"
+        verbose_name_plural = "Backtests de forecast"
+
+    def __str__(self) -> str:
+        return f"Backtest {self.reference_date} · {self.status}"
+
+
+class ForecastBacktestResult(models.Model):
+    METHOD_FORECAST_DIARIO = "forecast-diario"
+    METHOD_FORECAST_OPERATIVO = "forecast-operativo"
+    METHOD_ETS = "ets"
+    METHOD_PROPHET = "prophet"
+    METHOD_PROMEDIO_SIMPLE = "promedio-simple"
+    METHOD_CHOICES = [
+        (METHOD_FORECAST_DIARIO, "Forecast diario (reportes)"),
+        (METHOD_FORECAST_OPERATIVO, "Forecast operativo 3 semanas (proyecciones)"),
+        (METHOD_ETS, "ETS estacional (pronóstico)"),
+        (METHOD_PROPHET, "Prophet (pronóstico)"),
+        (METHOD_PROMEDIO_SIMPLE, "Promedio mismo día (línea base)"),
+    ]
+
+    run = models.ForeignKey(ForecastBacktestRun, on_delete=models.CASCADE, related_name="results")
+    method = models.CharField(max_length=40, choices=METHOD_CHOICES, db_index=True)
+    horizon_days = models.PositiveSmallIntegerField()
+    sucursal = models.ForeignKey(
+        "core.Sucursal",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="forecast_backtest_results",
+    )
+    familia = models.CharField(max_length=120, blank=True, default="", db_index=True)
+    series_count = models.PositiveIntegerField(default=0)
+    observations = models.PositiveIntegerField(default=0)
+    actual_units = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    forecast_units = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    mape_pct = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    wape_pct = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    bias_pct = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    fits = models.PositiveIntegerField(default=0)
+    fit_seconds = models.DecimalField(max_digits=12, decimal_places=4, default=0)
+    metadata = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ["run", "horizon_days", "sucursal__codigo", "familia", "wape_pct"]
+        verbose_name = "Resultado de backtest de forecast"
+        verbose_name_plural = "Resultados de backtest de forecast"
+        unique_together = [("run", "method", "horizon_days", "sucursal", "familia")]
+        indexes = [
+            models.Index(fields=["run", "horizon_days", "method"], name="rfcstbt_run_horizon_idx"),
+        ]
+
+    def __str__(self) -> str:
+        branch_label = self.sucursal.codigo if self.sucursal_id else "GLOBAL"
+        return f"{self.method} · {self.horizon_days}d · {branch_label} · {self.familia or 'TODAS'}"
+
+
 class AnalyticRefreshWindow(models.Model):
     DATASET_SALES = "FACT_VENTAS"
     DATASET_INVENTORY = "FACT_INVENTARIO"
@@ -1535,6 +1670,7 @@ class AnalyticRefreshWindow(models.Model):
     DATASET_FORECAST = "FORECAST_INPUTS"
     DATASET_SNAPSHOT_LEDGER = "SNAPSHOT_LEDGER"
     DATASET_SNAPSHOT_FLOW = "SNAPSHOT_FLOW"
+    DATASET_CONSUMO_TEORICO = "FACT_CONSUMO_TEORICO"
     DATASET_CHOICES = [
         (DATASET_SALES, "Fact ventas"),
         (DATASET_INVENTORY, "Fact inventario"),
@@ -1542,6 +1678,7 @@ class AnalyticRefreshWindow(models.Model):
         (DATASET_FORECAST, "Forecast inputs"),
         (DATASET_SNAPSHOT_LEDGER, "Snapshot ledger"),
         (DATASET_SNAPSHOT_FLOW, "Snapshot flujo central"),
+        (DATASET_CONSUMO_TEORICO, "Fact consumo teórico"),
     ]
 
     STATUS_PENDING = "PENDING"
@@ -0,0 +1,189 @@
+"""Precálculo en segundo plano de paneles de BI.
+
+Cada panel declara los scopes de ``core.cache_versions`` de los que depende. El
+último resultado bueno se guarda sin expiración junto con su huella: versiones
+de esos scopes más los parámetros resueltos (p. ej. la fecha de corte). Al
+servir un panel:
+
+- sin resultado previo se construye en línea (solo la primera vez);
+- con la huella vigente se sirve tal cual;
+- si cambió la huella o el resultado superó ``REPORTES_PANEL_MAX_AGE_SECONDS``
+  se sirve el último bueno marcado como vencido y el llamador encola su
+  reconstrucción (``reportes.precompute_executive_panels``).
+
+El panel servido lleva ``precompute`` (computed_at, stale, duration_ms) y cada
+registro conserva la duración y el último error de su construcción.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.cache_versions import get_cache_scope_version
+
+logger = logging.getLogger(__name__)
+
+PANEL_CACHE_PREFIX = "erp:panel-precompute"
+
+
+@dataclass(frozen=True)
+class PanelSpec:
+    name: str
+    builder: Callable[..., dict]
+    scopes: tuple[str, ...]
+    # Solo documental: tablas que alimentan el panel, para el estado y el comando.
+    datasets: tuple[str, ...] = ()
+
+
+def precompute_enabled() -> bool:
+    return bool(getattr(settings, "REPORTES_PANEL_PRECOMPUTE_ENABLED", False))
+
+
+def _max_age_seconds() -> int:
+    return int(getattr(settings, "REPORTES_PANEL_MAX_AGE_SECONDS", 6 * 60 * 60) or 0)
+
+
+def _stable(value: Any) -> str:
+    def default(item):
+        if isinstance(item, (date, datetime)):
+            return item.isoformat()
+        return str(item)
+
+    return json.dumps(value, sort_keys=True, default=default)
+
+
+def _digest(identity: dict[str, Any]) -> str:
+    return hashlib.sha1(_stable(identity).encode("utf-8")).hexdigest()[:16]
+
+
+def panel_cache_key(spec: PanelSpec, identity: dict[str, Any]) -> str:
+    return f"{PANEL_CACHE_PREFIX}:{spec.name}:{_digest(identity)}"
+
+
+def panel_fingerprint(spec: PanelSpec, params: dict[str, Any]) -> str:
+    versions = {scope: get_cache_scope_version(scope) for scope in spec.scopes}
+    return _stable({"scopes": versions, "params": params})
+
+
+def _cache_get(key: str):
+    try:
+        return cache.get(key)
+    except Exception:
+        return None
+
+
+def _cache_set(key: str, value) -> None:
+    try:
+        cache.set(key, value, timeout=None)
+    except Exception:
+        logger.warning("No se pudo guardar el panel precalculado %s", key, exc_info=True)
+
+
+def is_stale(spec: PanelSpec, record: dict | None, params: dict[str, Any]) -> bool:
+    if not record or "payload" not in record:
+        return True
+    if record.get("fingerprint") != panel_fingerprint(spec, params):
+        return True
+    max_age = _max_age_seconds()
+    computed_at = record.get("computed_at")
+    return bool(max_age and computed_at and (timezone.now() - computed_at).total_seconds() > max_age)
+
+
+def rebuild_panel(spec: PanelSpec, *, identity: dict[str, Any], params: dict[str, Any]) -> dict:
+    """Construye el panel y guarda el registro; si falla, conserva el último bueno."""
+    key = panel_cache_key(spec, identity)
+    # La huella se toma antes de construir: un cambio durante la construcción
+    # deja el registro vencido en lugar de marcar como vigente datos previos.
+    fingerprint = panel_fingerprint(spec, params)
+    started = time.monotonic()
+    attempted_at = timezone.now()
+    try:
+        payload = spec.builder(**params)
+    except Exception as exc:
+        duration_ms = round((time.monotonic() - started) * 1000, 1)
+        logger.exception("Falló el precálculo del panel %s", spec.name)
+        record = dict(_cache_get(key) or {})
+        record.update(last_error=str(exc)[:500], last_attempt_at=attempted_at, last_duration_ms=duration_ms)
+        _cache_set(key, record)
+        raise
+    duration_ms = round((time.monotonic() - started) * 1000, 1)
+    record = {
+        "payload": payload,
+        "fingerprint": fingerprint,
+        "computed_at": attempted_at,
+        "duration_ms": duration_ms,
+        "last_duration_ms": duration_ms,
+        "last_attempt_at": attempted_at,
+        "last_error": "",
+        "identity": identity,
+        "params": params,
+    }
+    _cache_set(key, record)
+    logger.info("Panel %s precalculado en %.1f ms", spec.name, duration_ms)
+    return record
+
+
+def _served(record: dict, *, stale: bool) -> dict:
+    payload = dict(record["payload"])
+    payload["precompute"] = {
+        "computed_at": record.get("computed_at"),
+        "stale": stale,
+        "duration_ms": record.get("duration_ms"),
+    }
+    return payload
+
+
+def serve_panel(spec: PanelSpec, *, identity: dict[str, Any], params: dict[str, Any]) -> tuple[dict, bool]:
+    """Devuelve ``(panel, vencido)``; solo construye en línea si nunca se ha calculado."""
+    record = _cache_get(panel_cache_key(spec, identity))
+    if not record or "payload" not in record:
+        return _served(rebuild_panel(spec, identity=identity, params=params), stale=False), False
+    stale = is_stale(spec, record, params)
+    return _served(record, stale=stale), stale
+
+
+def panel_status(spec: PanelSpec, *, identity: dict[str, Any], params: dict[str, Any]) -> dict[str, Any]:
+    record = _cache_get(panel_cache_key(spec, identity)) or {}
+    computed_at = record.get("computed_at")
+    return {
+        "panel": spec.name,
+        "scopes": list(spec.scopes),
+        "datasets": list(spec.datasets),
+        "computed_at": computed_at,
+        "age_seconds": int((timezone.now() - computed_at).total_seconds()) if computed_at else None,
+        "stale": is_stale(spec, record, params),
+        "duration_ms": record.get("duration_ms"),
+        "last_duration_ms": record.get("last_duration_ms"),
+        "last_attempt_at": record.get("last_attempt_at"),
+        "last_error": record.get("last_error", ""),
+    }
+
+
+def _lock_key(name: str, identity: dict[str, Any]) -> str:
+    return f"{PANEL_CACHE_PREFIX}:lock:{name}:{_digest(identity)}"
+
+
+def acquire_refresh_lock(name: str, identity: dict[str, Any]) -> bool:
+    key = _lock_key(name, identity)
+    timeout = int(getattr(settings, "REPORTES_PANEL_REFRESH_LOCK_SECONDS", 600) or 600)
+    try:
+        return bool(cache.add(key, 1, timeout=timeout))
+    except Exception:
+        return True
+
+
+def release_refresh_lock(name: str, identity: dict[str, Any]) -> None:
+    try:
+        cache.delete(_lock_key(name, identity))
+    except Exception:
+        pass
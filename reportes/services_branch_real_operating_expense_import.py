@@ -7,7 +7,6 @@ from pathlib import Path
 
 from django.db import transaction
 from django.utils import timezone
-from openpyxl import load_workbook
 
 from core.audit import log_event
 from core.models import Sucursal
@@ -147,6 +146,8 @@ class BranchRealOperatingExpenseImportService:
         }
 
     def _load_sheet_rows(self, workbook_path: Path, *, sheet_name: str | None = None) -> tuple[str, list[dict[str, object]]]:
+        from openpyxl import load_workbook
+
         workbook = load_workbook(filename=workbook_path, data_only=True)
         selected_sheet = sheet_name or (DEFAULT_SHEET_NAME if DEFAULT_SHEET_NAME in workbook.sheetnames else workbook.sheetnames[0])
         if selected_sheet not in workbook.sheetnames:
@@ -4,13 +4,12 @@ from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
 import re
-from urllib.parse import unquote
 
 from django.db import models, transaction
-from openpyxl import load_workbook
 
 from reportes.models import PresupuestoImport, PresupuestoLineaMensual
-from reportes.services_budget_import import GeneralBudgetImportService, _safe_ratio, _sha256, _to_decimal
+from reportes.services_budget_import import GeneralBudgetImportService, _safe_ratio, _to_decimal
+from reportes.services_budget_workbook import ParsedWorkbook, load_budget_workbook, load_budget_workbooks
 
 
 @dataclass
@@ -74,13 +73,12 @@ class TrustedBudgetDetailImportService:
         self,
         *,
         path: Path,
-        workbook_formula,
-        workbook_values,
+        workbook: ParsedWorkbook,
         sheet_name: str,
         kind: str,
     ) -> tuple[int, int, int, int, set[str]]:
-        ws_formula = workbook_formula[sheet_name]
-        ws_values = workbook_values[sheet_name]
+        ws_formula = workbook.formulas[sheet_name]
+        ws_values = workbook.values[sheet_name]
         title = self._general._find_title(ws_formula)
         year = self._general._resolve_year(path, title)
         annual_cols, monthly_templates, data_start_row = self._general._parse_layout(ws_formula)
@@ -88,7 +86,7 @@ class TrustedBudgetDetailImportService:
         if not monthly_groups:
             raise ValueError(f"No pude encontrar bloques mensuales válidos en {path.name} / {sheet_name}.")
 
-        file_hash = _sha256(path)
+        file_hash = workbook.sha256
         import_obj, created = PresupuestoImport.objects.update_or_create(
             tipo=PresupuestoImport.TIPO_DETALLE,
             fuente_nombre=path.name,
@@ -202,16 +200,15 @@ class TrustedBudgetDetailImportService:
         periods: set[str] = set()
         sheets_imported: list[str] = []
 
-        for path in self._iter_expected_files(folder):
-            workbook_formula = load_workbook(path, read_only=True, data_only=False)
-            workbook_values = load_workbook(path, read_only=True, data_only=True)
+        # La lectura (el costo dominante) se reparte entre procesos; la escritura sigue en esta transacción.
+        workbooks = load_budget_workbooks(self._iter_expected_files(folder))
+        for path, workbook in workbooks.items():
             for sheet_name, kind in self.SHEET_CONFIG[path.name].items():
-                if sheet_name not in workbook_formula.sheetnames:
+                if sheet_name not in workbook.sheetnames:
                     continue
                 result = self._import_sheet(
                     path=path,
-                    workbook_formula=workbook_formula,
-                    workbook_values=workbook_values,
+                    workbook=workbook,
                     sheet_name=sheet_name,
                     kind=kind,
                 )
@@ -238,9 +235,8 @@ class TrustedBudgetDetailImportService:
             raise FileNotFoundError(path)
 
         expected_sheets = self.expected_sheets_for_file(path.name)
-        workbook_formula = load_workbook(path, read_only=True, data_only=False)
-        workbook_values = load_workbook(path, read_only=True, data_only=True)
-        missing_sheets = [sheet_name for sheet_name in expected_sheets if sheet_name not in workbook_formula.sheetnames]
+        workbook = load_budget_workbook(path)
+        missing_sheets = [sheet_name for sheet_name in expected_sheets if sheet_name not in workbook.sheetnames]
         if missing_sheets:
             raise ValueError(
                 f"{path.name} no contiene todas las hojas esperadas: {', '.join(missing_sheets)}."
@@ -256,8 +252,7 @@ class TrustedBudgetDetailImportService:
         for sheet_name, kind in expected_sheets.items():
             result = self._import_sheet(
                 path=path,
-                workbook_formula=workbook_formula,
-                workbook_values=workbook_values,
+                workbook=workbook,
                 sheet_name=sheet_name,
                 kind=kind,
             )
@@ -322,6 +317,13 @@ class BudgetGeneralAuditService:
 
     def __init__(self) -> None:
         self._general = GeneralBudgetImportService()
+        self._workbooks: dict[Path, ParsedWorkbook] = {}
+
+    def _workbook(self, path: Path) -> ParsedWorkbook:
+        # Cada libro se lee una vez por auditoría aunque varias revisiones lo consulten.
+        if path not in self._workbooks:
+            self._workbooks[path] = load_budget_workbook(path)
+        return self._workbooks[path]
 
     def _normalize(self, text: str) -> str:
         return " ".join((text or "").strip().upper().replace(".", "").split())
@@ -444,11 +446,9 @@ class BudgetGeneralAuditService:
             "rows": rows,
         }
 
-    def _resolve_external_targets(self, workbook) -> dict[str, Path]:
+    def _resolve_external_targets(self, workbook: ParsedWorkbook) -> dict[str, Path]:
         mapping: dict[str, Path] = {}
-        for index, link in enumerate(getattr(workbook, "_external_links", []), start=1):
-            target = getattr(getattr(link, "file_link", None), "Target", "") or ""
-            target_name = Path(unquote(target)).name
+        for index, target_name in enumerate(workbook.external_links, start=1):
             if target_name:
                 mapping[str(index)] = Path(target_name)
         return mapping
@@ -458,13 +458,11 @@ class BudgetGeneralAuditService:
         if not admin_path.exists():
             return {"reviewed_cells": 0, "mismatch_count": 0, "missing_source_count": 0, "mismatches": []}
 
-        admin_formula_wb = load_workbook(admin_path, data_only=False, read_only=True)
-        admin_values_wb = load_workbook(admin_path, data_only=True, read_only=True)
-        admin_formula_ws = admin_formula_wb["GENERAL"]
-        admin_values_ws = admin_values_wb["GENERAL"]
+        admin_wb = self._workbook(admin_path)
+        admin_formula_ws = admin_wb.formulas["GENERAL"]
+        admin_values_ws = admin_wb.values["GENERAL"]
         _, monthly_templates, data_start_row = self._general._parse_layout(admin_formula_ws)
-        external_targets = self._resolve_external_targets(admin_formula_wb)
-        source_books: dict[str, object] = {}
+        external_targets = self._resolve_external_targets(admin_wb)
         reviewed_cells = 0
         mismatch_count = 0
         missing_source_count = 0
@@ -513,10 +511,7 @@ class BudgetGeneralAuditService:
                         }
                     )
                     continue
-                source_book = source_books.get(source_name.name)
-                if source_book is None:
-                    source_book = load_workbook(source_path, data_only=True, read_only=True)
-                    source_books[source_name.name] = source_book
+                source_book = self._workbook(source_path).values
                 if sheet_name not in source_book.sheetnames:
                     mismatch_count += 1
                     mismatches.append(
@@ -563,9 +558,9 @@ class BudgetGeneralAuditService:
         if not admin_path.exists() or not nomina_path.exists():
             return []
 
-        admin_formula = load_workbook(admin_path, data_only=False, read_only=True)["GENERAL"]
-        admin_values = load_workbook(admin_path, data_only=True, read_only=True)["GENERAL"]
-        nomina_values = load_workbook(nomina_path, data_only=True, read_only=True)["GENERAL"]
+        admin_formula = self._workbook(admin_path).formulas["GENERAL"]
+        admin_values = self._workbook(admin_path).values["GENERAL"]
+        nomina_values = self._workbook(nomina_path).values["GENERAL"]
 
         findings: list[dict[str, object]] = []
         for row_index in range(5, admin_values.max_row + 1):
@@ -599,8 +594,14 @@ class BudgetGeneralAuditService:
 
     def audit_folder(self, folder_path: str | Path) -> dict[str, object]:
         folder = Path(folder_path).expanduser().resolve()
-        sales_wb = load_workbook(folder / "PRESUPUESTO DE GASTOS VENTAS 2026 AUTORIZADO.xlsx", data_only=True, read_only=True)
-        nomina_wb = load_workbook(folder / "PRESUPUESTO NOMINA 2026 AUTORIZADO.xlsx", data_only=True, read_only=True)
+        sales_path = folder / "PRESUPUESTO DE GASTOS VENTAS 2026 AUTORIZADO.xlsx"
+        nomina_path = folder / "PRESUPUESTO NOMINA 2026 AUTORIZADO.xlsx"
+        admin_path = folder / "PRESUPUESTO ADMINISTRACIÓN 2026.xlsx"
+        self._workbooks.update(
+            load_budget_workbooks([sales_path, nomina_path] + ([admin_path] if admin_path.exists() else []))
+        )
+        sales_wb = self._workbooks[sales_path].values
+        nomina_wb = self._workbooks[nomina_path].values
 
         def d(v) -> float:
             return float(v or 0)
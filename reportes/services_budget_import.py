@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import hashlib
 import re
 from dataclasses import dataclass
 from datetime import date
@@ -8,9 +7,9 @@ from decimal import Decimal
 from pathlib import Path
 
 from django.db import transaction
-from openpyxl import load_workbook
 
 from reportes.models import PresupuestoImport, PresupuestoLineaMensual
+from reportes.services_budget_workbook import ParsedWorkbook, file_sha256, load_budget_workbook, load_budget_workbooks
 
 
 SPANISH_MONTHS = {
@@ -59,11 +58,7 @@ def _safe_ratio(numerator: Decimal, denominator: Decimal) -> Decimal:
 
 
 def _sha256(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as fh:
-        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
+    return file_sha256(path)
 
 
 @dataclass
@@ -165,18 +160,18 @@ class GeneralBudgetImportService:
         flat_result = [(month_number, columns) for month_number, columns in flat_headers.items() if columns]
         return annual_cols, flat_result, 4
 
-    @transaction.atomic
     def import_workbook(self, workbook_path: str | Path) -> GeneralBudgetImportSummary:
         path = Path(workbook_path).expanduser().resolve()
         if not path.exists():
             raise FileNotFoundError(path)
+        return self._import_parsed(path, load_budget_workbook(path))
 
-        wb_formula = load_workbook(path, read_only=True, data_only=False)
-        if self.SHEET_NAME not in wb_formula.sheetnames:
+    @transaction.atomic
+    def _import_parsed(self, path: Path, workbook: ParsedWorkbook) -> GeneralBudgetImportSummary:
+        if self.SHEET_NAME not in workbook.sheetnames:
             raise ValueError(f"{path.name} no contiene hoja '{self.SHEET_NAME}'.")
-        wb_values = load_workbook(path, read_only=True, data_only=True)
-        ws_formula = wb_formula[self.SHEET_NAME]
-        ws_values = wb_values[self.SHEET_NAME]
+        ws_formula = workbook.formulas[self.SHEET_NAME]
+        ws_values = workbook.values[self.SHEET_NAME]
 
         title = self._find_title(ws_formula)
         year = self._resolve_year(path, title)
@@ -185,7 +180,7 @@ class GeneralBudgetImportService:
         if not monthly_groups:
             raise ValueError(f"No pude encontrar bloques mensuales válidos en {path.name}.")
 
-        file_hash = _sha256(path)
+        file_hash = workbook.sha256
         import_obj, created = PresupuestoImport.objects.update_or_create(
             tipo=PresupuestoImport.TIPO_GENERAL,
             fuente_nombre=path.name,
@@ -284,9 +279,10 @@ class GeneralBudgetImportService:
 
         totals = GeneralBudgetImportSummary(0, 0, 0, 0, [])
         periods: set[str] = set()
-        for path in sorted(folder.glob("*.xlsx")):
+        workbooks = load_budget_workbooks(sorted(folder.glob("*.xlsx")))
+        for path, workbook in workbooks.items():
             try:
-                summary = self.import_workbook(path)
+                summary = self._import_parsed(path, workbook)
             except ValueError:
                 continue
             totals.imports_created += summary.imports_created
@@ -0,0 +1,268 @@
+"""
+Lectura de libros de presupuesto en una sola pasada.
+
+Los importadores y la auditoría de presupuesto abrían cada libro dos veces
+(``data_only=False`` para fórmulas y ``data_only=True`` para valores) y leían
+con ``worksheet.cell()`` en modo ``read_only``, que vuelve a recorrer el XML de
+la hoja en cada llamada. Aquí cada hoja se recorre una vez con el parser de
+openpyxl guardando, por celda, el valor calculado y la fórmula, y el resultado
+queda en una cuadrícula en memoria con la misma interfaz que usan los servicios
+(``sheetnames``, ``wb[hoja]``, ``ws.cell(fila, columna).value``,
+``ws["B5"].value``, ``max_row``/``max_column``).
+
+Los libros independientes se leen en un pool de procesos y cada libro leído se
+guarda en disco por hash SHA-256: al reimportar la carpeta después de corregir
+un archivo, sólo ese archivo se vuelve a leer.
+
+Este módulo no importa modelos: los procesos del pool sólo necesitan openpyxl.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import unquote
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Sube cuando cambie la forma de ``ParsedWorkbook`` para no leer caché vieja.
+PARSER_VERSION = 1
+
+
+@lru_cache(maxsize=1)
+def _dual_worksheet_parser():
+    """Parser de openpyxl que conserva el valor calculado y, además, la fórmula."""
+    from openpyxl.worksheet._reader import FORMULA_TAG, WorkSheetParser
+
+    class _DualWorkSheetParser(WorkSheetParser):
+        def __init__(self, *args, **kwargs):
+            kwargs["data_only"] = True
+            super().__init__(*args, **kwargs)
+
+        def parse_cell(self, element):
+            cell = super().parse_cell(element)
+            if element.find(FORMULA_TAG) is not None:
+                # ``parse_formula`` traduce las fórmulas compartidas igual que con ``data_only=False``.
+                cell["formula"] = self.parse_formula(element)
+            return cell
+
+    return _DualWorkSheetParser
+
+
+@dataclass
+class ParsedSheet:
+    title: str
+    max_row: int
+    max_column: int
+    values: dict[int, dict[int, object]] = field(default_factory=dict)
+    formulas: dict[tuple[int, int], object] = field(default_factory=dict)
+
+
+@dataclass
+class ParsedWorkbook:
+    name: str
+    sha256: str
+    sheetnames: list[str]
+    sheets: dict[str, ParsedSheet]
+    # Destino de cada vínculo externo en el orden de ``[n]`` de las fórmulas.
+    external_links: list[str] = field(default_factory=list)
+
+    @property
+    def formulas(self) -> "WorkbookView":
+        return WorkbookView(self, formulas=True)
+
+    @property
+    def values(self) -> "WorkbookView":
+        return WorkbookView(self, formulas=False)
+
+
+class _Cell:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class SheetView:
+    """Hoja leída vista como fórmulas (igual que ``data_only=False``) o como valores calculados."""
+
+    def __init__(self, sheet: ParsedSheet, *, formulas: bool):
+        self._sheet = sheet
+        self._formulas = formulas
+        self.title = sheet.title
+        self.max_row = sheet.max_row
+        self.max_column = sheet.max_column
+
+    def cell(self, row: int, column: int) -> _Cell:
+        if self._formulas and (row, column) in self._sheet.formulas:
+            return _Cell(self._sheet.formulas[(row, column)])
+        return _Cell(self._sheet.values.get(row, {}).get(column))
+
+    def __getitem__(self, coordinate: str) -> _Cell:
+        from openpyxl.utils.cell import coordinate_to_tuple
+
+        return self.cell(*coordinate_to_tuple(coordinate))
+
+
+class WorkbookView:
+    def __init__(self, workbook: ParsedWorkbook, *, formulas: bool):
+        self.workbook = workbook
+        self.sheetnames = list(workbook.sheetnames)
+        self._formulas = formulas
+
+    def __getitem__(self, sheet_name: str) -> SheetView:
+        if sheet_name not in self.workbook.sheets:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+        return SheetView(self.workbook.sheets[sheet_name], formulas=self._formulas)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_sheet(workbook, worksheet) -> ParsedSheet:
+    values: dict[int, dict[int, object]] = {}
+    formulas: dict[tuple[int, int], object] = {}
+    last_row = 0
+    last_column = 0
+    source = worksheet._get_source()
+    try:
+        parser = _dual_worksheet_parser()(
+            source,
+            workbook.shared_strings,
+            epoch=workbook.epoch,
+            date_formats=workbook._date_formats,
+            timedelta_formats=workbook._timedelta_formats,
+        )
+        for _, cells in parser.parse():
+            for cell in cells:
+                row, column = cell["row"], cell["column"]
+                if "formula" in cell:
+                    formulas[(row, column)] = cell["formula"]
+                if cell["value"] is not None:
+                    values.setdefault(row, {})[column] = cell["value"]
+                elif "formula" not in cell:
+                    continue
+                last_row = max(last_row, row)
+                last_column = max(last_column, column)
+    finally:
+        source.close()
+    # Se respeta la dimensión declarada por el libro, igual que ``read_only``.
+    return ParsedSheet(
+        title=worksheet.title,
+        max_row=worksheet.max_row or last_row,
+        max_column=worksheet.max_column or last_column,
+        values=values,
+        formulas=formulas,
+    )
+
+
+def parse_workbook(path: str | Path, sha256: str | None = None) -> ParsedWorkbook:
+    """Lee todas las hojas de ``path`` una sola vez (valores y fórmulas)."""
+    from openpyxl import load_workbook
+
+    path = Path(path)
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheets = {name: _parse_sheet(workbook, workbook[name]) for name in workbook.sheetnames}
+        external_links = [
+            Path(unquote(getattr(getattr(link, "file_link", None), "Target", "") or "")).name
+            for link in getattr(workbook, "_external_links", [])
+        ]
+        return ParsedWorkbook(
+            name=path.name,
+            sha256=sha256 or file_sha256(path),
+            sheetnames=list(workbook.sheetnames),
+            sheets=sheets,
+            external_links=external_links,
+        )
+    finally:
+        workbook.close()
+
+
+def _cache_root() -> Path | None:
+    if not getattr(settings, "BUDGET_WORKBOOK_CACHE_ENABLED", False):
+        return None
+    return Path(settings.BUDGET_WORKBOOK_CACHE_ROOT)
+
+
+def _cache_path(root: Path, sha256: str) -> Path:
+    return root / f"v{PARSER_VERSION}-{sha256}.pickle"
+
+
+def _read_cache(root: Path | None, sha256: str) -> ParsedWorkbook | None:
+    if root is None:
+        return None
+    path = _cache_path(root, sha256)
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as fh:
+            return pickle.load(fh)
+    except Exception:
+        logger.warning("Caché de libro de presupuesto ilegible: %s", path, exc_info=True)
+        return None
+
+
+def _write_cache(root: Path | None, parsed: ParsedWorkbook) -> None:
+    if root is None:
+        return
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(parsed, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, _cache_path(root, parsed.sha256))
+    except OSError:
+        logger.warning("No pude guardar la caché del libro %s", parsed.name, exc_info=True)
+
+
+def load_budget_workbooks(paths, *, max_workers: int | None = None) -> dict[Path, ParsedWorkbook]:
+    """
+    Lee varios libros y los regresa por ruta.
+
+    Los que ya están en caché (mismo hash) no se vuelven a leer; los demás se
+    reparten en un pool de procesos de hasta ``BUDGET_WORKBOOK_MAX_WORKERS``.
+    """
+    paths = list(dict.fromkeys(Path(p) for p in paths))
+    root = _cache_root()
+    parsed: dict[Path, ParsedWorkbook] = {}
+    pending: list[tuple[Path, str]] = []
+    for path in paths:
+        sha256 = file_sha256(path)
+        cached = _read_cache(root, sha256)
+        if cached is not None:
+            cached.name = path.name
+            parsed[path] = cached
+        else:
+            pending.append((path, sha256))
+
+    if max_workers is None:
+        max_workers = getattr(settings, "BUDGET_WORKBOOK_MAX_WORKERS", 4)
+    workers = min(max_workers, len(pending))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(parse_workbook, *zip(*pending)))
+    else:
+        results = [parse_workbook(path, sha256) for path, sha256 in pending]
+    for (path, _), workbook in zip(pending, results):
+        _write_cache(root, workbook)
+        parsed[path] = workbook
+    return {path: parsed[path] for path in paths}
+
+
+def load_budget_workbook(path: str | Path) -> ParsedWorkbook:
+    return load_budget_workbooks([path], max_workers=1)[Path(path)]
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from decimal import Decimal
+import logging
+
+import numpy as np
+from django.utils import timezone
+
+from reportes import services_investment_math as investment_math
+from reportes.models import ProyectoInversion, ProyectoInversionSnapshotMensual
+from reportes.services_expansion_forecast import ExpansionForecastService
+from reportes.services_investment_projects import _as_decimal, _month_start
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+FOUR_PLACES = Decimal("0.0001")
+
+
+class ExpansionMonteCarloService:
+    """
+    Bandas de resultado para una apertura a partir del histórico de sucursales comparables.
+
+    El pronóstico determinista (escenario base de ``ExpansionForecastService``)
+    fija el nivel estable de ventas, gasto, deuda e inversión. Cada simulación
+    toma de los proyectos comparables:
+
+    - una curva de arranque completa (ventas del mes *k* desde apertura entre
+      su nivel estable), para conservar la forma real de la rampa;
+    - un nivel relativo de ventas estables (qué tanto vende una sucursal
+      frente al promedio de sus pares);
+    - un margen bruto observado en algún mes comparable;
+    - un multiplicador de gasto operativo por mes (gasto del mes entre el
+      promedio de ese proyecto).
+
+    Todo se evalúa en matrices (simulaciones × meses) con el motor de
+    ``services_investment_math``; los resultados regresan como ``Decimal``.
+    """
+
+    DEFAULT_ITERATIONS = 2000
+    DEFAULT_HORIZON_MONTHS = 36
+    MAX_ITERATIONS = 20000
+    # Con MAX_ITERATIONS la matriz de 120 meses ronda 19 MB por arreglo.
+    MAX_HORIZON_MONTHS = 120
+    STEADY_WINDOW = 3
+    MIN_PEER_MONTHS = 4
+    RAMP_RATIO_CAP = 3.0
+
+    def simulate(
+        self,
+        *,
+        base_project: ProyectoInversion | None = None,
+        tipo_proyecto: str = "",
+        investment_estimate: Decimal | None = None,
+        monthly_rent: Decimal | None = None,
+        sales_adjustment_pct: Decimal | None = None,
+        annual_discount_rate: Decimal | None = None,
+        iterations: int = DEFAULT_ITERATIONS,
+        horizon_months: int = DEFAULT_HORIZON_MONTHS,
+        seed: int | None = None,
+    ) -> dict[str, object]:
+        iterations = min(max(int(iterations or self.DEFAULT_ITERATIONS), 1), self.MAX_ITERATIONS)
+        horizon_months = min(max(int(horizon_months or self.DEFAULT_HORIZON_MONTHS), 1), self.MAX_HORIZON_MONTHS)
+        forecast = ExpansionForecastService().forecast(
+            base_project=base_project,
+            tipo_proyecto=tipo_proyecto,
+            investment_estimate=investment_estimate,
+            monthly_rent=monthly_rent,
+            sales_adjustment_pct=sales_adjustment_pct,
+        )
+        outputs = forecast["outputs"]
+        data_gaps = list(forecast["data_gaps"])
+        investment = _as_decimal(forecast["inputs"]["investment_estimate"])
+        steady_sales = outputs["projected_sales"]
+        if steady_sales is None or outputs["projected_operating_expenses"] is None or investment <= ZERO:
+            data_gaps.append("Sin base determinista completa (ventas, gasto e inversión) no se puede simular.")
+            return self._empty_payload(forecast, iterations, horizon_months, seed, data_gaps)
+
+        history = self._peer_history(
+            tipo_proyecto=forecast["tipo_proyecto"],
+            exclude_project_id=base_project.pk if base_project is not None else None,
+        )
+        if not history["ramps"]:
+            data_gaps.append("No hay proyectos comparables con suficientes meses desde apertura; la rampa es plana.")
+        rng = np.random.default_rng(seed)
+        gross_margin = float(
+            (outputs["projected_gross_profit"] or ZERO) / steady_sales if steady_sales > ZERO else ZERO
+        )
+
+        ramps = self._sample_ramps(rng, history["ramps"], iterations, horizon_months)
+        levels = self._sample(rng, history["levels"], (iterations, 1), default=1.0)
+        margins = self._sample(rng, history["margins"], (iterations, 1), default=gross_margin)
+        costs = self._sample(rng, history["cost_ratios"], (iterations, horizon_months), default=1.0)
+
+        sales = float(steady_sales) * levels * ramps
+        operating = sales * margins - float(outputs["projected_operating_expenses"]) * costs
+        free_cashflow = operating - float(outputs["projected_debt_service"] or ZERO)
+        recovery_rate = float(forecast["historical_reference"]["recovery_rate_pct"] or Decimal("100")) / 100
+        recoveries = np.maximum(free_cashflow, 0.0) * (recovery_rate if recovery_rate > 0 else 1.0)
+
+        discount_rate = annual_discount_rate
+        if discount_rate is None and base_project is not None:
+            discount_rate = base_project.discount_rate
+        valuation = np.concatenate([np.full((iterations, 1), -float(investment)), free_cashflow], axis=1)
+        npv = (
+            investment_math.npv(valuation, float(discount_rate))
+            if _as_decimal(discount_rate) > ZERO
+            else np.full(iterations, np.nan)
+        )
+        if _as_decimal(discount_rate) <= ZERO:
+            data_gaps.append("Discount rate no configurada; VAN no disponible en la simulación.")
+        irr = investment_math.annual_irr_pct(valuation)
+        payback = investment_math.cumulative_payback(float(investment), recoveries)
+        year_one = min(12, horizon_months)
+        recovery_pct_year_1 = np.minimum(recoveries[:, :year_one].sum(axis=1) / float(investment) * 100, 100)
+
+        target = int(forecast["peer_summary"]["average_payback_target"] or 0)
+        if base_project is not None and base_project.payback_objetivo_meses:
+            target = int(base_project.payback_objetivo_meses)
+        sales_bands = investment_math.percentile_bands(sales)
+        recovery_bands = investment_math.percentile_bands(np.cumsum(recoveries, axis=1))
+
+        payload = {
+            "iterations": iterations,
+            "horizon_months": horizon_months,
+            "seed": seed,
+            "peer_projects": history["project_count"],
+            "peer_months": history["month_count"],
+            "investment": investment_math.decimal_or_none(investment),
+            "deterministic": {
+                "projected_sales": steady_sales,
+                "projected_free_cashflow": outputs["projected_free_cashflow"],
+                "projected_payback_months": outputs["projected_payback_months"],
+            },
+            "bands": {
+                "npv": self._band(npv),
+                "irr_pct": self._band(irr, FOUR_PLACES),
+                "payback_months": self._band(payback),
+                "recovery_pct_year_1": self._band(recovery_pct_year_1),
+                "monthly_free_cashflow": self._band(free_cashflow.mean(axis=1)),
+            },
+            "probabilities": {
+                "positive_npv_pct": self._share(npv > 0, valid=np.isfinite(npv)),
+                "payback_within_horizon_pct": self._share(np.isfinite(payback)),
+                "payback_within_target_pct": self._share(payback <= target) if target > 0 else None,
+            },
+            "payback_target_months": target or None,
+            "monthly_bands": [
+                {
+                    "month_index": month + 1,
+                    "sales": {key: investment_math.decimal_or_none(values[month]) for key, values in sales_bands.items()},
+                    "recovery_cumulative": {
+                        key: investment_math.decimal_or_none(values[month]) for key, values in recovery_bands.items()
+                    },
+                }
+                for month in range(horizon_months)
+            ],
+            "data_gaps": sorted(set(data_gaps)),
+            "generated_at": timezone.now(),
+        }
+        logger.info(
+            "Monte Carlo expansión tipo=%s iteraciones=%s horizonte=%s pares=%s",
+            forecast["tipo_proyecto"],
+            iterations,
+            horizon_months,
+            history["project_count"],
+        )
+        return payload
+
+    def _peer_history(self, *, tipo_proyecto: str, exclude_project_id: int | None) -> dict[str, object]:
+        queryset = ProyectoInversionSnapshotMensual.objects.filter(
+            proyecto__fecha_apertura__isnull=False,
+            ventas_mensuales__gt=0,
+        ).exclude(proyecto__estatus=ProyectoInversion.ESTATUS_CANCELADO)
+        if tipo_proyecto:
+            queryset = queryset.filter(proyecto__tipo_proyecto=tipo_proyecto)
+        if exclude_project_id is not None:
+            queryset = queryset.exclude(proyecto_id=exclude_project_id)
+        series: dict[int, list[tuple]] = {}
+        for row in queryset.order_by("proyecto_id", "periodo").values_list(
+            "proyecto_id",
+            "proyecto__fecha_apertura",
+            "periodo",
+            "ventas_mensuales",
+            "utilidad_bruta",
+            "gastos_operativos",
+        ):
+            project_id, opened, period, sales, gross_profit, expenses = row
+            if period >= _month_start(opened):
+                series.setdefault(project_id, []).append((float(sales), gross_profit, expenses))
+
+        ramps: list[np.ndarray] = []
+        steady_levels: list[float] = []
+        margins: list[float] = []
+        cost_ratios: list[float] = []
+        month_count = 0
+        for rows in series.values():
+            sales = np.asarray([item[0] for item in rows], dtype=np.float64)
+            month_count += len(rows)
+            margins.extend(float(item[1]) / item[0] for item in rows if item[1] is not None)
+            expenses = np.asarray([float(item[2]) for item in rows if item[2] is not None and item[2] > 0])
+            if expenses.size:
+                cost_ratios.extend(expenses / expenses.mean())
+            if len(rows) < self.MIN_PEER_MONTHS:
+                continue
+            steady = sales[-self.STEADY_WINDOW :].mean()
+            ramps.append(np.clip(sales / steady, 0.0, self.RAMP_RATIO_CAP))
+            steady_levels.append(steady)
+        levels = np.asarray(steady_levels) / np.mean(steady_levels) if steady_levels else np.asarray([])
+        return {
+            "ramps": ramps,
+            "levels": levels,
+            "margins": np.asarray(margins, dtype=np.float64),
+            "cost_ratios": np.asarray(cost_ratios, dtype=np.float64),
+            "project_count": len(series),
+            "month_count": month_count,
+        }
+
+    def _sample_ramps(self, rng, ramps: list[np.ndarray], iterations: int, horizon_months: int) -> np.ndarray:
+        if not ramps:
+            return np.ones((iterations, horizon_months))
+        # Curvas más cortas que el horizonte se completan con su nivel estable (1.0).
+        curves = np.ones((len(ramps), horizon_months))
+        for index, ramp in enumerate(ramps):
+            length = min(len(ramp), horizon_months)
+            curves[index, :length] = ramp[:length]
+        return curves[rng.integers(0, len(ramps), size=iterations)]
+
+    def _sample(self, rng, values: np.ndarray, shape: tuple[int, int], *, default: float) -> np.ndarray:
+        if not len(values):
+            return np.full(shape, default)
+        return rng.choice(values, size=shape, replace=True)
+
+    def _band(self, samples, pattern: Decimal = investment_math.TWO_PLACES) -> dict[str, Decimal | None]:
+        return {
+            key: investment_math.decimal_or_none(value, pattern)
+            for key, value in investment_math.percentile_bands(samples).items()
+        }
+
+    def _share(self, condition, *, valid=None) -> Decimal | None:
+        condition = np.asarray(condition)
+        if valid is not None:
+            if not np.any(valid):
+                return None
+            condition = condition[valid]
+        return investment_math.decimal_or_none(condition.mean() * 100)
+
+    def _empty_payload(self, forecast, iterations, horizon_months, seed, data_gaps) -> dict[str, object]:
+        return {
+            "iterations": iterations,
+            "horizon_months": horizon_months,
+            "seed": seed,
+            "peer_projects": 0,
+            "peer_months": 0,
+            "investment": forecast["inputs"]["investment_estimate"],
+            "deterministic": {
+                "projected_sales": forecast["outputs"]["projected_sales"],
+                "projected_free_cashflow": forecast["outputs"]["projected_free_cashflow"],
+                "projected_payback_months": forecast["outputs"]["projected_payback_months"],
+            },
+            "bands": {},
+            "probabilities": {},
+            "payback_target_months": None,
+            "monthly_bands": [],
+            "data_gaps": sorted(set(data_gaps)),
+            "generated_at": timezone.now(),
+        }
@@ -0,0 +1,159 @@
+"""
+Motor financiero vectorizado para proyectos de inversión.
+
+VAN, TIR, payback y anualidad se calculan con NumPy sobre matrices
+(proyectos o escenarios × meses), así que evaluar un portafolio completo o
+miles de simulaciones cuesta lo mismo que un puñado de filas. Los flujos son
+mensuales; las tasas anuales llegan en puntos porcentuales como en el modelo.
+
+El cálculo es en ``float64``; ``decimal_or_none`` y ``decimals`` regresan a
+``Decimal`` cuantizado en la frontera, igual que el resto de los servicios.
+"""
+
+from __future__ import annotations
+
+import warnings
+from collections.abc import Sequence
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+import numpy as np
+
+TWO_PLACES = Decimal("0.01")
+FOUR_PLACES = Decimal("0.0001")
+
+IRR_LOW = -0.99
+IRR_HIGH = 10.0
+IRR_ITERATIONS = 80
+IRR_TOLERANCE = 1e-4
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+
+def cashflow_matrix(rows: Sequence[Sequence]) -> np.ndarray:
+    """Apila series de flujos de distinta longitud; los meses faltantes valen cero y no alteran VAN ni TIR."""
+    width = max((len(row) for row in rows), default=0)
+    matrix = np.zeros((len(rows), width), dtype=np.float64)
+    for index, row in enumerate(rows):
+        if len(row):
+            matrix[index, : len(row)] = np.asarray([float(value) for value in row], dtype=np.float64)
+    return matrix
+
+
+def monthly_rate(annual_rate_pct) -> np.ndarray:
+    return np.asarray(annual_rate_pct, dtype=np.float64) / 1200.0
+
+
+def _discounted_sum(cashflows: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    periods = np.arange(cashflows.shape[-1], dtype=np.float64)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        factors = np.exp(-np.multiply.outer(np.log1p(rates), periods))
+        return np.sum(cashflows * factors, axis=-1)
+
+
+def npv(cashflows, annual_rate_pct) -> np.ndarray:
+    """VAN por fila; ``annual_rate_pct`` es escalar o una tasa por fila. Tasas no positivas dan ``nan``."""
+    flows = np.atleast_2d(np.asarray(cashflows, dtype=np.float64))
+    rates = np.broadcast_to(monthly_rate(annual_rate_pct), flows.shape[:1]).astype(np.float64)
+    result = _discounted_sum(flows, rates)
+    result[rates <= 0] = np.nan
+    return result
+
+
+def irr(cashflows) -> np.ndarray:
+    """
+    TIR mensual por fila con bisección vectorizada en [-0.99, 10].
+
+    Filas sin cambio de signo, con menos de dos flujos o cuyo VAN se desborda
+    dan ``nan``. Cada fila deja de iterar al llegar a ``|VAN| <= 1e-4``.
+    """
+    flows = np.atleast_2d(np.asarray(cashflows, dtype=np.float64))
+    rows = flows.shape[0]
+    valid = (flows.shape[1] >= 2) & np.any(flows < 0, axis=1) & np.any(flows > 0, axis=1)
+    low = np.full(rows, IRR_LOW)
+    high = np.full(rows, IRR_HIGH)
+    result = np.full(rows, np.nan)
+    active = valid.copy()
+    for _ in range(IRR_ITERATIONS):
+        if not active.any():
+            break
+        mid = (low + high) / 2
+        value = _discounted_sum(flows[active], mid[active])
+        index = np.flatnonzero(active)
+        broken = ~np.isfinite(value)
+        converged = ~broken & (np.abs(value) <= IRR_TOLERANCE)
+        result[index[converged]] = mid[index[converged]]
+        active[index[broken | converged]] = False
+        valid[index[broken]] = False
+        moving = ~broken & ~converged
+        positive = moving & (value > 0)
+        low[index[positive]] = mid[index[positive]]
+        high[index[moving & ~positive]] = mid[index[moving & ~positive]]
+    pending = active & valid
+    result[pending] = (low[pending] + high[pending]) / 2
+    return result
+
+
+def annual_irr_pct(cashflows) -> np.ndarray:
+    """TIR mensual expresada como tasa anual nominal en puntos porcentuales (× 1200)."""
+    return irr(cashflows) * 1200.0
+
+
+def annuity_payment(principal, annual_rate_pct, months) -> np.ndarray:
+    principal = np.asarray(principal, dtype=np.float64)
+    months = np.asarray(months, dtype=np.float64)
+    rate = monthly_rate(annual_rate_pct)
+    principal, rate, months = np.broadcast_arrays(principal, rate, months)
+    payment = np.zeros(principal.shape, dtype=np.float64)
+    applies = (principal > 0) & (months > 0)
+    flat = applies & (rate == 0)
+    payment[flat] = principal[flat] / months[flat]
+    amortized = applies & (rate != 0)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        denominator = 1.0 - np.power(1.0 + rate[amortized], -months[amortized])
+        values = principal[amortized] * rate[amortized] / denominator
+    payment[amortized] = np.where(denominator == 0, 0.0, values)
+    return payment
+
+
+def simple_payback(investment, monthly_recovery) -> np.ndarray:
+    """Meses para recuperar ``investment`` con una recuperación mensual constante; ``nan`` si no aplica."""
+    investment = np.asarray(investment, dtype=np.float64)
+    monthly_recovery = np.asarray(monthly_recovery, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = investment / monthly_recovery
+    return np.where((investment > 0) & (monthly_recovery > 0), result, np.nan)
+
+
+def cumulative_payback(investment, recoveries) -> np.ndarray:
+    """Primer mes (1-based) en que la recuperación acumulada cubre ``investment``; ``nan`` si no ocurre."""
+    recoveries = np.atleast_2d(np.asarray(recoveries, dtype=np.float64))
+    investment = np.broadcast_to(np.asarray(investment, dtype=np.float64), recoveries.shape[:1])
+    reached = np.cumsum(recoveries, axis=1) >= investment[:, None]
+    month = np.argmax(reached, axis=1).astype(np.float64) + 1
+    return np.where(reached.any(axis=1) & (investment > 0), month, np.nan)
+
+
+def percentile_bands(samples, percentiles: Sequence[int] = DEFAULT_PERCENTILES, axis: int = 0) -> dict[str, np.ndarray]:
+    """Percentiles ignorando ``nan`` (simulaciones sin resultado), como ``{"p10": ..., "p50": ...}``."""
+    samples = np.asarray(samples, dtype=np.float64)
+    with warnings.catch_warnings():
+        # Una columna sin ningún resultado finito da ``nan`` en vez de advertencia.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        values = np.nanpercentile(samples, percentiles, axis=axis)
+    return {f"p{pct}": values[index] for index, pct in enumerate(percentiles)}
+
+
+def decimal_or_none(value, pattern: Decimal = TWO_PLACES) -> Decimal | None:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not np.isfinite(number):
+        return None
+    try:
+        return Decimal(repr(number)).quantize(pattern, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        return None
+
+
+def decimals(values, pattern: Decimal = TWO_PLACES) -> list[Decimal | None]:
+    return [decimal_or_none(value, pattern) for value in np.ravel(np.asarray(values, dtype=np.float64))]
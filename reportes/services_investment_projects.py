@@ -12,6 +12,7 @@ from django.utils import timezone
 
 from core.audit import log_event
 from pos_bridge.models import PointDailySale
+from reportes import services_investment_math as investment_math
 from reportes.models import (
     CentroCosto,
     ExpansionPolicyConfig,
@@ -415,55 +416,11 @@ def _forecast_payback_metrics(
     }
 
 
-def _npv_from_cashflows(cashflows: list[Decimal], annual_discount_rate: Decimal) -> Decimal | None:
-    if not cashflows:
-        return None
-    rate_ratio = _ratio_from_percentage_points(annual_discount_rate)
-    if rate_ratio <= ZERO:
-        return None
-    monthly_rate = rate_ratio / Decimal("12")
-    total = ZERO
-    for index, cashflow in enumerate(cashflows):
-        total += cashflow / ((Decimal("1") + monthly_rate) ** Decimal(index))
-    return _quantize(total)
-
-
-def _irr_from_cashflows(cashflows: list[Decimal]) -> Decimal | None:
-    if len(cashflows) < 2:
-        return None
-    if not any(value < ZERO for value in cashflows) or not any(value > ZERO for value in cashflows):
-        return None
-
-    low = Decimal("-0.99")
-    high = Decimal("10")
-    for _ in range(80):
-        mid = (low + high) / Decimal("2")
-        npv = ZERO
-        for index, cashflow in enumerate(cashflows):
-            try:
-                npv += cashflow / ((Decimal("1") + mid) ** Decimal(index))
-            except Exception:
-                return None
-        if abs(npv) <= Decimal("0.0001"):
-            return _quantize(mid * Decimal("1200"), FOUR_PLACES)
-        if npv > ZERO:
-            low = mid
-        else:
-            high = mid
-    return _quantize(((low + high) / Decimal("2")) * Decimal("1200"), FOUR_PLACES)
-
-
 def _annuity_payment(principal: Decimal, annual_rate: Decimal, months: int) -> Decimal:
     if principal <= ZERO or months <= 0:
         return ZERO
-    monthly_rate = _ratio_from_percentage_points(annual_rate) / Decimal("12")
-    if monthly_rate == ZERO:
-        return _quantize(principal / Decimal(months))
-    numerator = principal * monthly_rate
-    denominator = Decimal("1") - (Decimal("1") + monthly_rate) ** Decimal(-months)
-    if denominator == ZERO:
-        return ZERO
-    return _quantize(numerator / denominator)
+    payment = investment_math.annuity_payment(float(principal), float(_as_decimal(annual_rate)), months)
+    return investment_math.decimal_or_none(payment) or ZERO
 
 
 @dataclass
@@ -909,6 +866,8 @@ class ProyectoInversionRefreshService:
         cashflow_history: list[Decimal] = []
         sales_history: list[Decimal] = []
         snapshot_series: list[dict[str, Decimal | None | date]] = []
+        valuation_rows: list[list[Decimal]] = []
+        pending_snapshots: list[tuple[date, dict[str, object]]] = []
         financial_series_complete = True
 
         for month_index, period in enumerate(month_starts):
@@ -1029,13 +988,9 @@ class ProyectoInversionRefreshService:
                 months_elapsed=month_index + 1,
             )
 
-            valuation_cashflows = [investment_real * Decimal("-1")] + cashflow_history
-            van = None
-            tir = None
-            if _as_decimal(project.discount_rate) > ZERO:
-                van = _npv_from_cashflows(valuation_cashflows, _as_decimal(project.discount_rate))
-                tir = _irr_from_cashflows(valuation_cashflows)
-            else:
+            # VAN/TIR de cada corte se evalúan juntos al terminar el recorrido.
+            valuation_rows.append([investment_real * Decimal("-1")] + cashflow_history)
+            if _as_decimal(project.discount_rate) <= ZERO:
                 data_gaps.append("Discount rate no configurada; VAN/TIR no disponibles.")
 
             data_gaps.extend(health_issues)
@@ -1091,8 +1046,8 @@ class ProyectoInversionRefreshService:
                 "data_source": data_source,
                 "health_score": health_score,
                 "health_status": health_status,
-                "van": van,
-                "tir": _clamp_pct(tir),
+                "van": None,
+                "tir": None,
                 "fuentes": {
                     "ventas_source": sales_payload["source"],
                     "gastos_source": expense_payload["source"],
@@ -1107,6 +1062,16 @@ class ProyectoInversionRefreshService:
                 },
                 "calculado_en": timezone.now(),
             }
+            pending_snapshots.append((period, snapshot_defaults))
+
+        if valuation_rows and _as_decimal(project.discount_rate) > ZERO:
+            valuation = investment_math.cashflow_matrix(valuation_rows)
+            van_values = investment_math.decimals(investment_math.npv(valuation, float(project.discount_rate)))
+            tir_values = investment_math.decimals(investment_math.annual_irr_pct(valuation), FOUR_PLACES)
+            for (_, snapshot_defaults), van, tir in zip(pending_snapshots, van_values, tir_values):
+                snapshot_defaults["van"] = van
+                snapshot_defaults["tir"] = _clamp_pct(tir)
+        for period, snapshot_defaults in pending_snapshots:
             snapshot, created = ProyectoInversionSnapshotMensual.objects.update_or_create(
                 proyecto=project,
                 periodo=period,
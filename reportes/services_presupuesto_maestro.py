@@ -11,7 +11,6 @@ from typing import Iterable
 from django.db import transaction
 from django.db.models import Q, Sum
 from django.utils.text import slugify
-from openpyxl import load_workbook
 
 from core.branch_catalog import indice_sucursales_por_texto, resolver_sucursal_por_texto
 from core.models import Sucursal
@@ -282,6 +281,8 @@ class PresupuestoMaestroImportService:
             yield from csv.DictReader(fh)
 
     def _xlsx_rows(self, path: Path, area_code: str = "") -> Iterable[dict[str, object]]:
+        from openpyxl import load_workbook
+
         workbook = load_workbook(path, read_only=True, data_only=True)
         if area_code == "nomina":
             # El archivo de nómina trae GENERAL (total empresa) + hojas por
@@ -3,10 +3,11 @@ from __future__ import annotations
 from datetime import date, datetime
 
 from django.db import transaction
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
+from control.models import MermaPOS, VentaPOS
 from inventario.models import AjusteInventario, ExistenciaInsumo, MovimientoInventario
 from maestros.models import CostoInsumo, Insumo
 from pos_bridge.historical_freeze import is_frozen
@@ -21,7 +22,12 @@ from pos_bridge.models import (
     PointTransferLine,
     PointWasteLine,
 )
+from recetas.models import LineaReceta, PlanProduccion, PlanProduccionItem, Receta
 from reportes.analytics_service import mark_analytics_dirty_for_range
+from reportes.consumo_teorico_service import (
+    mark_consumo_teorico_dirty_for_insumo,
+    mark_consumo_teorico_dirty_for_recipe,
+)
 from ventas.models import VentaAutoritativaPoint
 
 
@@ -145,3 +151,96 @@ def _mark_flow_refresh(instance, **_kwargs) -> None:
         include_production=True,
         reason=f"{instance.__class__.__name__} changed",
     )
+
+
+@receiver(post_save, sender=VentaPOS)
+@receiver(post_delete, sender=VentaPOS)
+@receiver(post_save, sender=MermaPOS)
+@receiver(post_delete, sender=MermaPOS)
+@receiver(post_save, sender=PlanProduccionItem)
+@receiver(post_delete, sender=PlanProduccionItem)
+def _mark_consumption_refresh(instance, **_kwargs) -> None:
+    if isinstance(instance, PlanProduccionItem):
+        day = _local_day(
+            PlanProduccion.objects.filter(pk=instance.plan_id).values_list("fecha_produccion", flat=True).first()
+        )
+    else:
+        day = _local_day(getattr(instance, "fecha", None))
+    _mark_after_commit(
+        start_date=day,
+        end_date=day,
+        include_consumption=True,
+        reason=f"{instance.__class__.__name__} changed",
+    )
+
+
+# Campos que cambian la explosión de BOM; un guardado que no los toca (costos,
+# estatus de matching, notas) no invalida el consumo teórico. En ``Insumo`` son
+# el tipo y los que resuelven su preparación; reagrupar o desactivar no cuenta
+# porque el hecho guarda insumos hoja y se canonicaliza al leer.
+_BOM_FIELDS = {
+    Receta: ("tipo", "codigo_point", "nombre_normalizado", "rendimiento_cantidad", "rendimiento_unidad_id"),
+    LineaReceta: ("receta_id", "insumo_id", "cantidad", "unidad_id"),
+    Insumo: ("tipo_item", "codigo", "codigo_point", "nombre", "nombre_point"),
+}
+# Campos de ``Receta`` con que un insumo interno resuelve a su preparación.
+_RECETA_MAPPING_FIELDS = ("tipo", "codigo_point", "nombre_normalizado")
+
+
+def _bom_values(instance) -> tuple:
+    return tuple(getattr(instance, field) for field in _BOM_FIELDS[instance.__class__])
+
+
+@receiver(pre_save, sender=Receta)
+@receiver(pre_save, sender=LineaReceta)
+@receiver(pre_save, sender=Insumo)
+def _remember_bom_values(sender, instance, raw=False, update_fields=None, **_kwargs) -> None:
+    instance._bom_values_previos = None
+    if raw or not instance.pk:
+        return
+    fields = _BOM_FIELDS[sender]
+    if update_fields is not None and not {field.removesuffix("_id") for field in update_fields} & {
+        field.removesuffix("_id") for field in fields
+    }:
+        # Un ``update_fields`` sin campos de BOM no la cambia: no hace falta leer la fila.
+        instance._bom_values_previos = _bom_values(instance)
+        return
+    instance._bom_values_previos = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+@receiver(post_save, sender=Receta)
+@receiver(post_save, sender=LineaReceta)
+@receiver(post_delete, sender=LineaReceta)
+def _mark_recipe_consumption_refresh(instance, signal=None, raw=False, created=False, **_kwargs) -> None:
+    if raw:
+        return
+    previous = getattr(instance, "_bom_values_previos", None)
+    if signal is post_save and not created and previous == _bom_values(instance):
+        return
+    reason = f"{instance.__class__.__name__} changed"
+    if isinstance(instance, Receta):
+        fields = _BOM_FIELDS[Receta]
+        previous_mapping = None
+        if previous and signal is post_save:
+            previous_mapping = {field: previous[fields.index(field)] for field in _RECETA_MAPPING_FIELDS}
+            if previous_mapping == {field: getattr(instance, field) for field in _RECETA_MAPPING_FIELDS}:
+                previous_mapping = None
+        transaction.on_commit(
+            lambda: mark_consumo_teorico_dirty_for_recipe(instance.id, reason=reason, previous=previous_mapping)
+        )
+        return
+    # Una línea movida de receta cambia la BOM de las dos.
+    receta_ids = {instance.receta_id, previous[0] if previous and signal is post_save else instance.receta_id}
+    for receta_id in receta_ids:
+        transaction.on_commit(lambda receta_id=receta_id: mark_consumo_teorico_dirty_for_recipe(receta_id, reason=reason))
+
+
+@receiver(post_save, sender=Insumo)
+def _mark_insumo_consumption_refresh(instance, raw=False, created=False, **_kwargs) -> None:
+    # Un insumo nuevo aún no está en ninguna receta, y solo los internos se explotan.
+    previous = getattr(instance, "_bom_values_previos", None)
+    if raw or created or previous == _bom_values(instance):
+        return
+    if Insumo.TIPO_INTERNO not in {instance.tipo_item, previous[0] if previous else None}:
+        return
+    transaction.on_commit(lambda: mark_consumo_teorico_dirty_for_insumo(instance.id, reason="Insumo changed"))
@@ -306,3 +306,51 @@ def task_conciliar_combustible_mensual(self):
         fail_silently=False,
     )
     return {"periodo": datos["periodo"], "facturas": len(datos["facturas"]), "diferencia": str(datos["diferencia"])}
+
+
+@shared_task(name="reportes.precompute_executive_panels")
+def task_precompute_executive_panels(
+    panels: list[str] | None = None,
+    latest_date: str | None = None,
+    months: int = 6,
+    branch_id: int | None = None,
+    action_filter: str | None = None,
+    budget_month: int | None = None,
+    force: bool = False,
+) -> dict:
+    """Recalcula los paneles ejecutivos de BI vencidos (ver reportes/panel_precompute.py).
+
+    Lo encola el tablero al servir un panel vencido y el beat lo corre con la
+    ventana por defecto para tenerlos listos después de cada refresco de datos.
+    """
+    from reportes.executive_panels import refresh_executive_panels
+    from reportes.panel_precompute import release_refresh_lock
+
+    request_kwargs = {
+        "latest_date": latest_date,
+        "months": months,
+        "branch_id": branch_id,
+        "action_filter": action_filter,
+        "budget_month": budget_month,
+    }
+    try:
+        summary = refresh_executive_panels(
+            panels=panels,
+            latest_date=date.fromisoformat(latest_date) if latest_date else None,
+            months=months,
+            branch_id=branch_id,
+            action_filter=action_filter,
+            budget_month=budget_month,
+            force=force,
+        )
+    finally:
+        release_refresh_lock("executive", request_kwargs)
+    return {
+        name: {
+            "rebuilt": row["rebuilt"],
+            "stale": row["stale"],
+            "duration_ms": row["duration_ms"],
+            "last_error": row["last_error"],
+        }
+        for name, row in summary.items()
+    }
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from openpyxl import Workbook, load_workbook
+
+from reportes.services_budget_workbook import load_budget_workbooks, parse_workbook
+
+
+def _build_book(path: Path, *, amount: Decimal = Decimal("10000")) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "GENERAL"
+    ws["B1"] = "PRESUPUESTO GENERAL 2026"
+    ws["F3"] = "ENERO"
+    ws["F4"] = "PRESUPUESTADO"
+    ws.append(["4001", "Sueldo", None, None, None, amount])
+    ws.append(["4002", "Renta", None, None, None, Decimal("5000")])
+    ws["F7"] = "=SUM(F5:F6)"
+    ws["F8"] = "=[4]GENERAL!B4"
+    wb.create_sheet("DETALLE")["A1"] = "Sin fórmulas"
+    wb.save(path)
+
+
+class BudgetWorkbookParserTests(SimpleTestCase):
+    def test_una_pasada_equivale_a_las_dos_lecturas_de_openpyxl(self):
+        with TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "PRESUPUESTO ADMINISTRACIÓN 2026.xlsx"
+            _build_book(path)
+
+            parsed = parse_workbook(path)
+            expected_formulas = load_workbook(path, read_only=True, data_only=False)
+            expected_values = load_workbook(path, read_only=True, data_only=True)
+
+            self.assertEqual(parsed.sheetnames, expected_formulas.sheetnames)
+            for sheet_name in parsed.sheetnames:
+                for view, expected in ((parsed.formulas, expected_formulas), (parsed.values, expected_values)):
+                    ws = view[sheet_name]
+                    reference = expected[sheet_name]
+                    self.assertEqual((ws.max_row, ws.max_column), (reference.max_row, reference.max_column))
+                    for row_index, row in enumerate(reference.iter_rows(values_only=True), start=1):
+                        for column_index, value in enumerate(row, start=1):
+                            self.assertEqual(ws.cell(row_index, column_index).value, value)
+            self.assertEqual(parsed.formulas["GENERAL"]["F8"].value, "=[4]GENERAL!B4")
+            self.assertIsNone(parsed.values["GENERAL"]["F8"].value)
+
+    def test_cache_por_hash_solo_relee_el_libro_que_cambio(self):
+        with TemporaryDirectory() as tmpdir, TemporaryDirectory() as cache_dir:
+            first = Path(tmpdir) / "PRESUPUESTO NOMINA 2026 AUTORIZADO.xlsx"
+            second = Path(tmpdir) / "PRESUPUESTO LOGISTICA 2026.xlsx"
+            _build_book(first)
+            _build_book(second, amount=Decimal("3000"))
+
+            with override_settings(BUDGET_WORKBOOK_CACHE_ENABLED=True, BUDGET_WORKBOOK_CACHE_ROOT=cache_dir), patch(
+                "reportes.services_budget_workbook.parse_workbook", wraps=parse_workbook
+            ) as parser:
+                load_budget_workbooks([first, second], max_workers=1)
+                self.assertEqual(parser.call_count, 2)
+
+                cached = load_budget_workbooks([first, second], max_workers=1)
+                self.assertEqual(parser.call_count, 2)
+                self.assertEqual(cached[second].values["GENERAL"].cell(5, 6).value, 3000)
+
+                _build_book(second, amount=Decimal("3500"))
+                reloaded = load_budget_workbooks([first, second], max_workers=1)
+
+            self.assertEqual(parser.call_count, 3)
+            self.assertEqual(parser.call_args.args[0], second)
+            self.assertEqual(reloaded[second].values["GENERAL"].cell(5, 6).value, 3500)
+
+    def test_cache_apagado_en_pruebas_y_fuera_del_repositorio(self):
+        self.assertFalse(settings.BUDGET_WORKBOOK_CACHE_ENABLED)
+        root = Path(settings.BUDGET_WORKBOOK_CACHE_ROOT).resolve()
+        self.assertNotIn(Path(settings.BASE_DIR).resolve(), root.parents)
+
+    def test_pool_de_procesos_conserva_orden_y_contenido(self):
+        with TemporaryDirectory() as tmpdir:
+            paths = [Path(tmpdir) / f"PRESUPUESTO {index} 2026.xlsx" for index in range(3)]
+            for index, path in enumerate(paths):
+                _build_book(path, amount=Decimal(1000 * (index + 1)))
+
+            parallel = load_budget_workbooks(paths, max_workers=3)
+            serial = load_budget_workbooks(paths, max_workers=1)
+
+            self.assertEqual(list(parallel), paths)
+            self.assertEqual(parallel, serial)
+            self.assertEqual([book.values["GENERAL"].cell(5, 6).value for book in parallel.values()], [1000, 2000, 3000])
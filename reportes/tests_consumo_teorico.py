@@ -0,0 +1,274 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from control.models import MermaPOS, VentaPOS
+from core.models import Sucursal
+from maestros.models import Insumo, UnidadMedida
+from recetas.models import LineaReceta, PlanProduccion, PlanProduccionItem, Receta
+from reportes.consumo_teorico_service import (
+    BomExploder,
+    coverage_gaps,
+    ensure_consumo_teorico,
+    rebuild_consumo_teorico,
+    refresh_consumo_teorico_windows,
+)
+from reportes.models import AnalyticRefreshWindow, FactConsumoTeoricoDiario
+
+
+class ConsumoTeoricoTests(TestCase):
+    def setUp(self):
+        self.day = date(2026, 3, 10)
+        self.sucursal = Sucursal.objects.create(codigo="CTEO", nombre="Consumo Teórico", activa=True)
+        self.kg = UnidadMedida.objects.create(
+            codigo="kg-cteo",
+            nombre="Kilogramo consumo teórico",
+            tipo=UnidadMedida.TIPO_MASA,
+            factor_to_base=Decimal("1000"),
+        )
+        self.gr = UnidadMedida.objects.create(
+            codigo="g-cteo",
+            nombre="Gramo consumo teórico",
+            tipo=UnidadMedida.TIPO_MASA,
+            factor_to_base=Decimal("1"),
+        )
+        self.harina = Insumo.objects.create(
+            nombre="Harina Consumo Teorico", unidad_base=self.kg, activo=True, codigo_point="CTEO-HAR"
+        )
+        self.harina_variante = Insumo.objects.create(nombre="HARINA CONSUMO TEORICO", unidad_base=self.kg, activo=True)
+        self.azucar = Insumo.objects.create(nombre="Azucar Consumo Teorico", unidad_base=self.kg, activo=True)
+        self.batida = Insumo.objects.create(
+            nombre="Batida Consumo Teorico",
+            unidad_base=self.gr,
+            tipo_item=Insumo.TIPO_INTERNO,
+            codigo_point="CTEO-BAT",
+            activo=True,
+        )
+        # La batida rinde 2 kg con 1 kg de harina (variante) y 0.5 kg de azúcar.
+        self.preparacion = Receta.objects.create(
+            nombre="Batida consumo teórico",
+            codigo_point="CTEO-BAT",
+            tipo=Receta.TIPO_PREPARACION,
+            rendimiento_cantidad=Decimal("2"),
+            rendimiento_unidad=self.kg,
+            hash_contenido="hash-cteo-batida",
+        )
+        self._linea(self.preparacion, 1, self.harina_variante, "1", self.kg)
+        self._linea(self.preparacion, 2, self.azucar, "0.5", self.kg)
+        # Cada pastel usa 500 g de batida y 0.1 kg de azúcar directo.
+        self.pastel = Receta.objects.create(
+            nombre="Pastel consumo teórico",
+            tipo=Receta.TIPO_PRODUCTO_FINAL,
+            hash_contenido="hash-cteo-pastel",
+        )
+        self._linea(self.pastel, 1, self.batida, "500", self.gr)
+        self._linea(self.pastel, 2, self.azucar, "0.1", self.kg)
+
+    def _linea(self, receta, posicion, insumo, cantidad, unidad):
+        return LineaReceta.objects.create(
+            receta=receta,
+            posicion=posicion,
+            insumo=insumo,
+            insumo_texto=insumo.nombre,
+            cantidad=Decimal(cantidad),
+            unidad=unidad,
+            unidad_texto=unidad.codigo,
+            match_status=LineaReceta.STATUS_AUTO,
+        )
+
+    def _venta(self, day, cantidad):
+        return VentaPOS.objects.create(
+            fecha=day,
+            sucursal=self.sucursal,
+            receta=self.pastel,
+            cantidad=Decimal(cantidad),
+            tickets=1,
+            monto_total=Decimal("100"),
+        )
+
+    def _facts(self, fuente):
+        return {
+            row.insumo_id: row.cantidad
+            for row in FactConsumoTeoricoDiario.objects.filter(fuente=fuente)
+        }
+
+    def test_explota_preparaciones_a_insumos_hoja(self):
+        vector = BomExploder().vector(self.pastel.id)
+
+        self.assertEqual(set(vector), {self.harina_variante.id, self.azucar.id})
+        self.assertEqual(vector[self.harina_variante.id], Decimal("0.25"))
+        self.assertEqual(vector[self.azucar.id], Decimal("0.225"))
+
+    def test_ensure_construye_huecos_por_fuente_y_registra_cobertura(self):
+        self._venta(self.day, "4")
+        MermaPOS.objects.create(fecha=self.day, sucursal=self.sucursal, receta=self.pastel, cantidad=Decimal("2"))
+        plan = PlanProduccion.objects.create(nombre="Plan consumo teórico", fecha_produccion=self.day)
+        PlanProduccionItem.objects.create(plan=plan, receta=self.pastel, cantidad=Decimal("10"))
+
+        result = ensure_consumo_teorico(date_from=self.day, date_to=self.day)
+
+        self.assertEqual(result["gaps"], 1)
+        self.assertEqual(self._facts(FactConsumoTeoricoDiario.FUENTE_VENTA)[self.harina_variante.id], Decimal("1"))
+        self.assertEqual(self._facts(FactConsumoTeoricoDiario.FUENTE_MERMA)[self.azucar.id], Decimal("0.45"))
+        plan_row = FactConsumoTeoricoDiario.objects.get(fuente=FactConsumoTeoricoDiario.FUENTE_PLAN, insumo=self.harina_variante)
+        self.assertIsNone(plan_row.sucursal_id)
+        self.assertEqual(plan_row.cantidad, Decimal("2.5"))
+        self.assertEqual(coverage_gaps(date_from=self.day, date_to=self.day), [])
+        self.assertEqual(ensure_consumo_teorico(date_from=self.day, date_to=self.day), {"rows": 0, "gaps": 0})
+        self.assertEqual(
+            coverage_gaps(date_from=self.day - timedelta(days=2), date_to=self.day + timedelta(days=1)),
+            [
+                (self.day - timedelta(days=2), self.day - timedelta(days=1)),
+                (self.day + timedelta(days=1), self.day + timedelta(days=1)),
+            ],
+        )
+
+    def test_cambios_de_venta_y_preparacion_marcan_ventanas_pendientes(self):
+        ensure_consumo_teorico(date_from=self.day, date_to=self.day)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._venta(self.day, "2")
+        pending = AnalyticRefreshWindow.objects.get(
+            dataset=AnalyticRefreshWindow.DATASET_CONSUMO_TEORICO,
+            status=AnalyticRefreshWindow.STATUS_PENDING,
+        )
+        self.assertEqual((pending.date_from, pending.date_to), (self.day, self.day))
+
+        ensure_consumo_teorico(date_from=self.day, date_to=self.day)
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, AnalyticRefreshWindow.STATUS_DONE)
+        self.assertEqual(self._facts(FactConsumoTeoricoDiario.FUENTE_VENTA)[self.harina_variante.id], Decimal("0.5"))
+
+        self._venta(self.day + timedelta(days=3), "1")
+        with self.captureOnCommitCallbacks(execute=True):
+            linea = self.preparacion.lineas.get(insumo=self.harina_variante)
+            linea.cantidad = Decimal("2")
+            linea.save()
+        pending = AnalyticRefreshWindow.objects.get(
+            dataset=AnalyticRefreshWindow.DATASET_CONSUMO_TEORICO,
+            status=AnalyticRefreshWindow.STATUS_PENDING,
+        )
+        self.assertEqual((pending.date_from, pending.date_to), (self.day, self.day + timedelta(days=3)))
+
+        refresh_consumo_teorico_windows()
+        self.assertEqual(
+            FactConsumoTeoricoDiario.objects.get(
+                fuente=FactConsumoTeoricoDiario.FUENTE_VENTA, insumo=self.harina_variante, fecha=self.day
+            ).cantidad,
+            Decimal("1"),
+        )
+        self.assertEqual(
+            FactConsumoTeoricoDiario.objects.filter(fecha=self.day + timedelta(days=3)).count(),
+            2,
+        )
+
+    def _pending_windows(self):
+        return list(
+            AnalyticRefreshWindow.objects.filter(
+                dataset=AnalyticRefreshWindow.DATASET_CONSUMO_TEORICO,
+                status=AnalyticRefreshWindow.STATUS_PENDING,
+            )
+            .order_by("date_from")
+            .values_list("date_from", "date_to")
+        )
+
+    def test_cambio_de_preparacion_solo_marca_recetas_que_la_usan(self):
+        galleta = Receta.objects.create(nombre="Galleta consumo teórico", tipo=Receta.TIPO_PRODUCTO_FINAL, hash_contenido="hash-cteo-galleta")
+        self._linea(galleta, 1, self.harina, "0.2", self.kg)
+        VentaPOS.objects.create(
+            fecha=self.day - timedelta(days=60),
+            sucursal=self.sucursal,
+            receta=galleta,
+            cantidad=Decimal("5"),
+            tickets=1,
+            monto_total=Decimal("50"),
+        )
+        self._venta(self.day, "1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.preparacion.sheet_name = "Batidas"
+            self.preparacion.save()
+            linea = self.preparacion.lineas.get(insumo=self.azucar)
+            linea.match_status = LineaReceta.STATUS_AUTO
+            linea.save()
+        self.assertEqual(self._pending_windows(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.preparacion.rendimiento_cantidad = Decimal("4")
+            self.preparacion.save()
+        self.assertEqual(self._pending_windows(), [(self.day, self.day)])
+
+    def test_cambio_de_tipo_o_preparacion_de_un_insumo_marca_las_recetas_que_lo_usan(self):
+        self._venta(self.day, "1")
+        ensure_consumo_teorico(date_from=self.day, date_to=self.day)
+        # La sincronía de la preparación ya reescribió el código y nombre de la batida.
+        self.batida.refresh_from_db()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.batida.activo = False
+            self.batida.save()
+            self.azucar.nombre_point = "AZUCAR CT"
+            self.azucar.save(update_fields=["nombre_point"])
+        # Desactivar no cambia la explosión y una materia prima no resuelve a preparaciones.
+        self.assertEqual(self._pending_windows(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.batida.tipo_item = Insumo.TIPO_MATERIA_PRIMA
+            self.batida.save()
+        self.assertEqual(self._pending_windows(), [(self.day, self.day)])
+
+    def test_cambio_de_codigo_de_la_preparacion_marca_a_quien_resolvia_con_el_anterior(self):
+        self._venta(self.day, "1")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.preparacion.codigo_point = "CTEO-BAT-2"
+            self.preparacion.save()
+
+        self.assertEqual(self._pending_windows(), [(self.day, self.day)])
+
+    def test_consulta_reconstruye_solo_su_tramo_de_una_ventana_larga(self):
+        AnalyticRefreshWindow.objects.create(
+            dataset=AnalyticRefreshWindow.DATASET_CONSUMO_TEORICO,
+            date_from=self.day - timedelta(days=30),
+            date_to=self.day + timedelta(days=30),
+            reason="LineaReceta changed",
+        )
+
+        with mock.patch(
+            "reportes.consumo_teorico_service.rebuild_consumo_teorico", wraps=rebuild_consumo_teorico
+        ) as rebuild:
+            ensure_consumo_teorico(date_from=self.day, date_to=self.day + timedelta(days=1))
+
+        self.assertEqual(
+            [(call.kwargs["start_date"], call.kwargs["end_date"]) for call in rebuild.call_args_list],
+            [(self.day, self.day + timedelta(days=1))],
+        )
+        self.assertEqual(
+            self._pending_windows(),
+            [
+                (self.day - timedelta(days=30), self.day - timedelta(days=1)),
+                (self.day + timedelta(days=2), self.day + timedelta(days=30)),
+            ],
+        )
+        self.assertEqual(coverage_gaps(date_from=self.day, date_to=self.day + timedelta(days=1)), [])
+
+        refresh_consumo_teorico_windows()
+        self.assertEqual(self._pending_windows(), [])
+        done = AnalyticRefreshWindow.objects.filter(
+            dataset=AnalyticRefreshWindow.DATASET_CONSUMO_TEORICO,
+            status=AnalyticRefreshWindow.STATUS_DONE,
+        )
+        self.assertEqual(
+            list(done.values_list("date_from", "date_to")),
+            [(self.day - timedelta(days=30), self.day + timedelta(days=30))],
+        )
+
+    def test_cobertura_contigua_se_fusiona_en_una_ventana(self):
+        for offset in range(5):
+            ensure_consumo_teorico(date_from=self.day + timedelta(days=offset), date_to=self.day + timedelta(days=offset))
+
+        done = AnalyticRefreshWindow.objects.filter(
+            dataset=AnalyticRefreshWindow.DATASET_CONSUMO_TEORICO,
+            status=AnalyticRefreshWindow.STATUS_DONE,
+        )
+        self.assertEqual(list(done.values_list("date_from", "date_to")), [(self.day, self.day + timedelta(days=4))])
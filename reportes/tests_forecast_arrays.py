@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from reportes import forecast_arrays as fa
+from reportes.forecast_service import _forecast_arrays, _profile_settings, _settings_arrays
+
+
+class ForecastArraysTests(SimpleTestCase):
+    def setUp(self):
+        self.start = date(2026, 1, 1)
+        self.matrix = fa.DailyMatrix([(1, 10), (1, 11)], self.start, date(2026, 3, 31))
+        for offset in range(90):
+            day = self.start + timedelta(days=offset)
+            self.matrix.set((1, 10), day, Decimal("4") if day.weekday() < 5 else Decimal("10"), Decimal("40"))
+            if offset % 3 == 0:
+                self.matrix.set((1, 11), day, Decimal("2.5"), Decimal("30"))
+        # Pico aislado que la media robusta debe topar.
+        self.matrix.set((1, 10), date(2026, 3, 25), Decimal("80"), Decimal("800"))
+
+    def test_ventanas_fuera_de_la_matriz_valen_cero(self):
+        rows = np.asarray([0, 1])
+        anchors = np.asarray([2, 2])
+
+        values = fa.window(self.matrix.qty, rows, anchors, 1, 4)
+
+        self.assertEqual(values.shape, (2, 4))
+        np.testing.assert_array_equal(values[:, 2:], 0.0)
+        np.testing.assert_array_equal(self.matrix.positive_days_before(rows, anchors), [2, 1])
+
+    def test_media_robusta_topa_picos_a_la_mediana_positiva(self):
+        values = np.asarray([[4, 4, 80, 0, 10], [0, 0, 0, 0, 0]], dtype=np.float64)
+
+        robust = fa.robust_mean(values)
+
+        # Mediana positiva 7 -> tope 15.75.
+        self.assertAlmostEqual(robust[0], (4 + 4 + 15.75 + 0 + 10) / 5)
+        self.assertEqual(robust[1], 0.0)
+
+    def test_decimal_at_redondea_empates_al_par_como_decimal(self):
+        self.assertEqual(fa.decimal_at(1.0005, 3), Decimal("1.000"))
+        self.assertEqual(fa.decimal_at(1.0015, 3), Decimal("1.002"))
+        self.assertEqual(fa.decimal_at(0.1 + 0.2, 2), Decimal("0.30"))
+        self.assertEqual(str(fa.decimal_at(-0.0, 3)), "0.000")
+
+    def test_pronostico_por_lote_equivale_a_evaluar_cada_clave(self):
+        anchor = self.matrix.day_index(date(2026, 3, 28))
+        target_weekday = date(2026, 3, 28).weekday()
+        params = _settings_arrays([_profile_settings(None), _profile_settings(None)])
+
+        batched = _forecast_arrays(
+            self.matrix, np.asarray([0, 1]), np.asarray([anchor, anchor]), np.asarray([target_weekday] * 2), 8, params
+        )
+        single = _forecast_arrays(
+            self.matrix,
+            np.asarray([1]),
+            np.asarray([anchor]),
+            np.asarray([target_weekday]),
+            8,
+            _settings_arrays([_profile_settings(None)]),
+        )
+
+        self.assertEqual(batched["forecast_qty"][1], single["forecast_qty"][0])
+        # Sábado: el factor de día refleja el fin de semana más alto.
+        self.assertGreater(batched["weekday_factor"][0], 1.0)
+        self.assertLessEqual(batched["forecast_min_qty"][0], batched["forecast_qty"][0])
+        self.assertLessEqual(batched["forecast_qty"][0], batched["forecast_max_qty"][0])
+        self.assertAlmostEqual(batched["avg_price"][1], 12.0)
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core.models import Sucursal
+from recetas.models import Receta
+from reportes.forecast_backtest_service import (
+    LEVEL_BRANCH,
+    LEVEL_FAMILY,
+    LEVEL_GLOBAL,
+    _key_metrics,
+    _segment_common_cells,
+    recommend_methods,
+    run_forecast_backtest,
+)
+from reportes.models import (
+    AnalyticAuditLog,
+    FactVentaDiaria,
+    ForecastBacktestResult,
+    ForecastBacktestRun,
+    ForecastCalibrationProfile,
+)
+from ventas.services import pronostico_engine
+
+
+ZERO = Decimal("0")
+
+
+class ForecastBacktestMetricsTests(SimpleTestCase):
+    def test_metricas_por_clave_ignoran_dias_sin_pronostico(self):
+        forecast = np.asarray([[[2.0, np.nan, 6.0]], [[5.0, 5.0, 5.0]]])
+        actual = np.asarray([[[4.0, 3.0, 0.0]], [[5.0, 4.0, 6.0]]])
+
+        metrics = _key_metrics(forecast, actual, 3)
+
+        np.testing.assert_array_equal(metrics["observations"], [2, 3])
+        np.testing.assert_array_equal(metrics["actual"], [4, 15])
+        np.testing.assert_array_equal(metrics["abs_error"], [8, 2])
+        np.testing.assert_array_equal(metrics["error"], [4, 0])
+        # El día con venta cero no entra al MAPE.
+        np.testing.assert_array_equal(metrics["ape_count"], [1, 3])
+        self.assertAlmostEqual(metrics["ape"][0], 0.5)
+
+        first_day = _key_metrics(forecast, actual, 1)
+        np.testing.assert_array_equal(first_day["observations"], [1, 1])
+
+
+    def test_celdas_comunes_por_segmento_ignoran_metodos_sin_cobertura_ahi(self):
+        full = np.ones((10, 1, 2))
+        partial = full.copy()
+        partial[9] = np.nan
+        codes = np.asarray([0] * 9 + [1])
+
+        comparable, common = _segment_common_cells({"a": full, "b": partial}, codes, 2)
+
+        # "b" cubre 90% del total pero nada del segundo segmento: ahí no recorta las celdas comunes.
+        np.testing.assert_array_equal(comparable["b"], [True] * 9 + [False])
+        self.assertTrue(common.all())
+        global_comparable, global_common = _segment_common_cells({"a": full, "b": partial}, np.zeros(10, dtype=int), 1)
+        self.assertTrue(global_comparable["b"].all())
+        self.assertFalse(global_common[9].any())
+
+
+class ForecastBacktestServiceTests(TestCase):
+    def setUp(self):
+        self.reference_date = date(2026, 6, 30)
+        self.branch = Sucursal.objects.create(codigo="SUC-BT", nombre="Sucursal Backtest")
+        self.cake = Receta.objects.create(
+            nombre="Pastel Backtest",
+            codigo_point="PBT01",
+            tipo=Receta.TIPO_PRODUCTO_FINAL,
+            familia="Pastel",
+            hash_contenido="hash-backtest-cake",
+        )
+        self.cookie = Receta.objects.create(
+            nombre="Galleta Backtest",
+            codigo_point="GBT01",
+            tipo=Receta.TIPO_PRODUCTO_FINAL,
+            familia="Galletas",
+            hash_contenido="hash-backtest-cookie",
+        )
+        facts = []
+        for offset in range(150):
+            day = self.reference_date - timedelta(days=offset)
+            # Serie semanal exacta: el promedio del mismo día la reproduce sin error.
+            cake_qty = Decimal("20") if day.weekday() >= 5 else Decimal("10")
+            cookie_qty = Decimal("6") + Decimal(day.weekday())
+            for recipe, qty in ((self.cake, cake_qty), (self.cookie, cookie_qty)):
+                facts.append(
+                    FactVentaDiaria(
+                        fecha=day,
+                        sucursal=self.branch,
+                        receta=recipe,
+                        producto_clave=recipe.codigo_point,
+                        producto_nombre=recipe.nombre,
+                        cantidad=qty,
+                        venta_bruta=qty * Decimal("50"),
+                        descuento=ZERO,
+                        venta_total=qty * Decimal("50"),
+                        venta_neta=qty * Decimal("50"),
+                        source_kind=FactVentaDiaria.SOURCE_AUTHORITATIVE,
+                    )
+                )
+        FactVentaDiaria.objects.bulk_create(facts)
+
+    def _global_rows(self, run: ForecastBacktestRun, horizon: int) -> dict[str, ForecastBacktestResult]:
+        return {
+            row.method: row
+            for row in run.results.filter(horizon_days=horizon)
+            if row.metadata.get("level") == LEVEL_GLOBAL
+        }
+
+    def test_backtest_persiste_metricas_por_metodo_horizonte_y_segmento(self):
+        run = run_forecast_backtest(
+            reference_date=self.reference_date,
+            horizons=[7, 1],
+            origins=3,
+            step_days=7,
+            max_workers=1,
+        )
+
+        run.refresh_from_db()
+        self.assertEqual(run.status, ForecastBacktestRun.STATUS_OK)
+        self.assertEqual(run.horizons, [1, 7])
+        self.assertEqual(run.series_count, 2)
+        self.assertEqual(len(run.metadata["origin_days"]), 3)
+        self.assertEqual(run.metadata["origin_days"][-1], "2026-06-24")
+
+        weekly = self._global_rows(run, 7)
+        self.assertIn(ForecastBacktestResult.METHOD_FORECAST_DIARIO, weekly)
+        self.assertIn(ForecastBacktestResult.METHOD_FORECAST_OPERATIVO, weekly)
+        baseline = weekly[ForecastBacktestResult.METHOD_PROMEDIO_SIMPLE]
+        self.assertEqual(baseline.observations, 2 * 3 * 7)
+        self.assertEqual(baseline.wape_pct, Decimal("0.00"))
+        self.assertEqual(baseline.bias_pct, Decimal("0.00"))
+        self.assertEqual(baseline.fits, 2 * 3)
+        self.assertEqual(self._global_rows(run, 1)[baseline.method].observations, 2 * 3)
+        # El motor diario topa el factor de fin de semana en 1.35: subpronostica sábado y domingo.
+        self.assertGreater(weekly[ForecastBacktestResult.METHOD_FORECAST_DIARIO].wape_pct, ZERO)
+        if not pronostico_engine.PROPHET_AVAILABLE:
+            self.assertNotIn(ForecastBacktestResult.METHOD_PROPHET, weekly)
+            self.assertIn(ForecastBacktestResult.METHOD_PROPHET, run.metadata["skipped_methods"])
+
+        families = {
+            row.familia
+            for row in run.results.filter(horizon_days=7, method=baseline.method)
+            if row.metadata.get("level") == LEVEL_FAMILY
+        }
+        self.assertEqual(families, {"Pastel", "Galletas"})
+        self.assertTrue(
+            run.results.filter(horizon_days=7, sucursal=self.branch, familia="").exists(),
+        )
+        self.assertTrue(AnalyticAuditLog.objects.filter(audit_type="FORECAST_BACKTEST").exists())
+
+        recommendations = recommend_methods(run, horizon_days=7)
+        self.assertEqual({item["familia"] for item in recommendations}, families)
+        for item in recommendations:
+            self.assertLessEqual(item["recommended_wape_pct"], item["best_wape_pct"] + Decimal("1.00"))
+        self.assertEqual(len(recommend_methods(run, horizon_days=7, level=LEVEL_BRANCH)), 1)
+
+    def test_metodo_que_se_salta_series_no_compite_en_la_recomendacion(self):
+        def ets_sin_galletas(serie_df, target_days):
+            # Falla en la serie de galletas y acierta exacto en la de pasteles.
+            if serie_df["y"].max() <= 12:
+                raise ValueError("no converge")
+            return {"recomendado": [20 if day.weekday() >= 5 else 10 for day in target_days], "metodo": "ets"}
+
+        methods = [
+            ForecastBacktestResult.METHOD_ETS,
+            ForecastBacktestResult.METHOD_FORECAST_DIARIO,
+            ForecastBacktestResult.METHOD_PROMEDIO_SIMPLE,
+        ]
+        with patch.object(pronostico_engine, "_calcular_serie_ets", ets_sin_galletas):
+            run = run_forecast_backtest(
+                reference_date=self.reference_date, horizons=[7], origins=2, methods=methods, max_workers=1
+            )
+
+        weekly = self._global_rows(run, 7)
+        ets = weekly[ForecastBacktestResult.METHOD_ETS]
+        self.assertEqual(ets.wape_pct, Decimal("0.00"))
+        self.assertEqual(ets.metadata["coverage_pct"], 50.0)
+        self.assertIsNone(ets.metadata["common_wape_pct"])
+        self.assertEqual(run.metadata["coverage_pct"][ForecastBacktestResult.METHOD_ETS], 50.0)
+        self.assertNotIn(ForecastBacktestResult.METHOD_ETS, run.metadata["comparable_methods"])
+        diario = weekly[ForecastBacktestResult.METHOD_FORECAST_DIARIO]
+        self.assertEqual(diario.metadata["coverage_pct"], 100.0)
+        self.assertEqual(diario.metadata["common_observations"], diario.observations)
+        self.assertEqual(Decimal(str(diario.metadata["common_wape_pct"])), diario.wape_pct)
+
+        recommendations = recommend_methods(run, horizon_days=7, level=LEVEL_GLOBAL)
+        self.assertEqual(len(recommendations), 1)
+        self.assertEqual(recommendations[0]["best_method"], ForecastBacktestResult.METHOD_PROMEDIO_SIMPLE)
+        # Por familia, ETS compite sólo donde cubre el segmento.
+        by_family = {item["familia"]: item for item in recommend_methods(run, horizon_days=7)}
+        self.assertNotEqual(by_family["Galletas"]["recommended_method"], ForecastBacktestResult.METHOD_ETS)
+        self.assertNotEqual(by_family["Galletas"]["best_method"], ForecastBacktestResult.METHOD_ETS)
+        pastel_ets = next(
+            row
+            for row in run.results.filter(horizon_days=7, method=ForecastBacktestResult.METHOD_ETS, familia="Pastel")
+            if row.metadata.get("level") == LEVEL_FAMILY
+        )
+        self.assertEqual(pastel_ets.metadata["common_observations"], pastel_ets.observations)
+        self.assertEqual(pastel_ets.metadata["common_wape_pct"], 0.0)
+
+    def test_forecast_diario_usa_la_calibracion_vigente_en_cada_origen(self):
+        methods = [ForecastBacktestResult.METHOD_FORECAST_DIARIO]
+        kwargs = {"reference_date": self.reference_date, "horizons": [7], "origins": 2, "methods": methods}
+        raw = self._global_rows(run_forecast_backtest(max_workers=1, **kwargs), 7)[methods[0]]
+
+        first_origin = date(2026, 6, 17)
+        for reference_date, bias in ((first_origin - timedelta(days=1), "1.5000"), (first_origin, "3.0000")):
+            for pattern, _label in ForecastCalibrationProfile.PATTERN_CHOICES:
+                ForecastCalibrationProfile.objects.create(
+                    reference_date=reference_date,
+                    sucursal=self.branch,
+                    familia="Pastel",
+                    weekly_pattern=pattern,
+                    rotation_band=ForecastCalibrationProfile.ROTATION_HIGH,
+                    recent_weight=Decimal("0.55"),
+                    mid_weight=Decimal("0.30"),
+                    older_weight=Decimal("0.15"),
+                    bias_adjustment=Decimal(bias),
+                )
+        run = run_forecast_backtest(max_workers=1, **kwargs)
+
+        # El perfil del mismo día del origen ya vio esa venta: sólo aplica desde el origen siguiente.
+        self.assertEqual(run.metadata["origin_days"], ["2026-06-17", "2026-06-24"])
+        self.assertEqual(run.metadata["calibration_reference_dates"], ["2026-06-16", "2026-06-17"])
+        calibrated = self._global_rows(run, 7)[methods[0]]
+        self.assertGreater(calibrated.forecast_units, raw.forecast_units)
+        self.assertLess(calibrated.forecast_units, raw.forecast_units * Decimal("2.25"))
+
+    def test_pool_de_procesos_da_el_mismo_resultado_que_en_serie(self):
+        methods = [ForecastBacktestResult.METHOD_ETS, ForecastBacktestResult.METHOD_PROMEDIO_SIMPLE]
+        kwargs = {"reference_date": self.reference_date, "horizons": [7], "origins": 2, "methods": methods}
+
+        serial = run_forecast_backtest(max_workers=1, **kwargs)
+        parallel = run_forecast_backtest(max_workers=2, **kwargs)
+
+        self.assertEqual(parallel.workers, 2)
+        serial_rows = self._global_rows(serial, 7)
+        for method, row in self._global_rows(parallel, 7).items():
+            self.assertEqual(row.forecast_units, serial_rows[method].forecast_units, method)
+            self.assertEqual(row.wape_pct, serial_rows[method].wape_pct, method)
+
+    def test_metodo_desconocido_no_crea_corrida(self):
+        with self.assertRaises(ValueError):
+            run_forecast_backtest(reference_date=self.reference_date, methods=["arima"])
+
+        self.assertFalse(ForecastBacktestRun.objects.exists())
+
+    def test_comando_y_vista_de_resultados(self):
+        out = StringIO()
+        call_command(
+            "run_forecast_backtest",
+            "--reference-date",
+            self.reference_date.isoformat(),
+            "--horizon",
+            "7",
+            "--origins",
+            "2",
+            "--method",
+            ForecastBacktestResult.METHOD_PROMEDIO_SIMPLE,
+            "--method",
+            ForecastBacktestResult.METHOD_FORECAST_DIARIO,
+            stdout=out,
+        )
+        payload = json.loads(out.getvalue())
+        self.assertEqual(payload["series"], 2)
+        self.assertEqual({row["method"] for row in payload["global"]}, {"promedio-simple", "forecast-diario"})
+
+        user = User.objects.create_user(username="dg_backtest", password="pass123")
+        user.groups.add(Group.objects.get_or_create(name="DG")[0])
+        self.client.login(username="dg_backtest", password="pass123")
+        response = self.client.get(reverse("reportes:forecast_backtest"), {"run_id": payload["run_id"], "horizonte": "7"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Promedio mismo día")
+        self.assertEqual(len(response.context["recommendations"]), 2)
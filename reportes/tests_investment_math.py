@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+from django.contrib.auth.models import Group, User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from reportes import services_investment_math as investment_math
+from reportes.models import ProyectoInversion, ProyectoInversionSnapshotMensual
+from reportes.services_expansion_montecarlo import ExpansionMonteCarloService
+from reportes.services_investment_projects import _annuity_payment
+
+
+def _reference_npv(cashflows: list[Decimal], annual_rate: Decimal) -> Decimal:
+    monthly_rate = annual_rate / Decimal("1200")
+    total = sum(cashflow / ((Decimal("1") + monthly_rate) ** index) for index, cashflow in enumerate(cashflows))
+    return total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _reference_irr(cashflows: list[Decimal]) -> Decimal | None:
+    """Bisección en ``Decimal`` que usaba el refresh antes del motor vectorizado."""
+    if not any(value < 0 for value in cashflows) or not any(value > 0 for value in cashflows):
+        return None
+    low, high = Decimal("-0.99"), Decimal("10")
+    for _ in range(80):
+        mid = (low + high) / 2
+        npv = sum(cashflow / ((Decimal("1") + mid) ** index) for index, cashflow in enumerate(cashflows))
+        if abs(npv) <= Decimal("0.0001"):
+            return (mid * 1200).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+        if npv > 0:
+            low = mid
+        else:
+            high = mid
+    return (((low + high) / 2) * 1200).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+
+
+class InvestmentMathTests(SimpleTestCase):
+    CASHFLOWS = [
+        [Decimal("-240000"), Decimal("18000"), Decimal("26000"), Decimal("31000"), Decimal("35000"), Decimal("38000")],
+        [Decimal("-150000"), Decimal("-5000"), Decimal("12000"), Decimal("40000"), Decimal("52000"), Decimal("61000"), Decimal("64000")],
+        [Decimal("-90000"), Decimal("4000"), Decimal("-2500"), Decimal("3000")],
+        [Decimal("-100"), Decimal("50"), Decimal("60")],
+    ]
+
+    def test_npv_y_tir_coinciden_con_la_referencia_decimal(self):
+        matrix = investment_math.cashflow_matrix(self.CASHFLOWS)
+        npv_values = investment_math.decimals(investment_math.npv(matrix, 14))
+        irr_values = investment_math.decimals(investment_math.annual_irr_pct(matrix), Decimal("0.0001"))
+
+        for cashflows, npv_value, irr_value in zip(self.CASHFLOWS, npv_values, irr_values):
+            self.assertEqual(npv_value, _reference_npv(cashflows, Decimal("14")))
+            self.assertEqual(irr_value, _reference_irr(cashflows))
+
+    def test_filas_vectorizadas_equivalen_a_evaluar_una_por_una(self):
+        matrix = investment_math.cashflow_matrix(self.CASHFLOWS)
+        batched = investment_math.annual_irr_pct(matrix)
+        single = [investment_math.annual_irr_pct([row])[0] for row in self.CASHFLOWS]
+
+        np.testing.assert_allclose(batched, single, equal_nan=True)
+        self.assertTrue(np.isnan(investment_math.npv(matrix, 0)).all())
+
+    def test_payback_acumulado_y_anualidad(self):
+        payback = investment_math.cumulative_payback([100, 100, 100], [[40, 40, 40], [10, 10, 10], [100, 0, 0]])
+
+        self.assertEqual(investment_math.decimals(payback), [Decimal("3.00"), None, Decimal("1.00")])
+        self.assertEqual(_annuity_payment(Decimal("100000"), Decimal("12"), 24), Decimal("4707.35"))
+        self.assertEqual(_annuity_payment(Decimal("12000"), Decimal("0"), 12), Decimal("1000.00"))
+
+
+class ExpansionMonteCarloServiceTests(TestCase):
+    def setUp(self):
+        ramps = {
+            "Sucursal Rampa Rápida": (Decimal("240000"), [Decimal("0.7"), Decimal("0.85"), Decimal("0.95"), Decimal("1"), Decimal("1"), Decimal("1.02")]),
+            "Sucursal Rampa Lenta": (Decimal("260000"), [Decimal("0.4"), Decimal("0.55"), Decimal("0.7"), Decimal("0.85"), Decimal("0.95"), Decimal("1")]),
+            "Sucursal Estable": (Decimal("220000"), [Decimal("0.9"), Decimal("0.95"), Decimal("1"), Decimal("1"), Decimal("1.01"), Decimal("1")]),
+        }
+        for index, (name, (investment, curve)) in enumerate(ramps.items()):
+            project = ProyectoInversion.objects.create(
+                nombre_proyecto=name,
+                tipo_proyecto=ProyectoInversion.TIPO_APERTURA_SUCURSAL,
+                fecha_inicio=date(2025, 9, 1),
+                fecha_apertura=date(2025, 10, 1),
+                monto_inversion_planeado=investment,
+                monto_inversion_real=investment,
+                payback_objetivo_meses=14,
+            )
+            steady_sales = Decimal("150000") + Decimal(index * 20000)
+            for month, ratio in enumerate(curve):
+                period = date(2025, 10 + month, 1) if month < 3 else date(2026, month - 2, 1)
+                sales = steady_sales * ratio
+                expenses = Decimal("62000") + Decimal(month * 500)
+                free_cashflow = sales * Decimal("0.66") - expenses - Decimal("4000")
+                ProyectoInversionSnapshotMensual.objects.create(
+                    proyecto=project,
+                    periodo=period,
+                    periodo_fin=period + timedelta(days=27),
+                    ventas_mensuales=sales,
+                    utilidad_bruta=sales * Decimal("0.66"),
+                    gastos_operativos=expenses,
+                    utilidad_operativa=sales * Decimal("0.66") - expenses,
+                    servicio_deuda=Decimal("4000"),
+                    flujo_libre=free_cashflow,
+                    flujo_para_recuperacion=max(free_cashflow, Decimal("0")),
+                    payback_real_meses=Decimal("14"),
+                    payback_forecast_meses=Decimal("14"),
+                    health_score=80,
+                    data_source=ProyectoInversionSnapshotMensual.DATA_SOURCE_FACT,
+                    confidence_score=100,
+                )
+
+    def test_bandas_son_reproducibles_y_ordenadas(self):
+        service = ExpansionMonteCarloService()
+        kwargs = {
+            "investment_estimate": Decimal("240000"),
+            "annual_discount_rate": Decimal("14"),
+            "iterations": 500,
+            "horizon_months": 24,
+            "seed": 7,
+        }
+        first = service.simulate(**kwargs)
+        second = service.simulate(**kwargs)
+
+        self.assertEqual(first["bands"], second["bands"])
+        self.assertEqual(first["peer_projects"], 3)
+        self.assertEqual(len(first["monthly_bands"]), 24)
+        for key in ("npv", "payback_months", "monthly_free_cashflow"):
+            band = first["bands"][key]
+            self.assertLessEqual(band["p10"], band["p50"], key)
+            self.assertLessEqual(band["p50"], band["p90"], key)
+        self.assertIsInstance(first["bands"]["npv"]["p50"], Decimal)
+        # La rampa muestreada arranca por debajo del nivel estable de ventas.
+        self.assertLess(first["monthly_bands"][0]["sales"]["p50"], first["monthly_bands"][-1]["sales"]["p50"])
+        self.assertEqual(first["payback_target_months"], 14)
+
+    def test_sin_inversion_no_simula(self):
+        ProyectoInversion.objects.all().delete()
+
+        payload = ExpansionMonteCarloService().simulate(iterations=50, seed=1)
+
+        self.assertEqual(payload["bands"], {})
+        self.assertTrue(payload["data_gaps"])
+
+    def test_api_regresa_bandas(self):
+        user = User.objects.create_user(username="director_mc", password="pass123")
+        user.groups.add(Group.objects.get_or_create(name="DG")[0])
+        self.client.login(username="director_mc", password="pass123")
+
+        response = self.client.get(
+            reverse("reportes:api_expansion_montecarlo"),
+            {"investment_estimate": "240000", "discount_rate": "14", "iterations": "200", "seed": "3"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()["simulation"]
+        self.assertEqual(payload["iterations"], 200)
+        self.assertIn("p50", payload["bands"]["irr_pct"])
+
+    def test_iteraciones_y_horizonte_se_acotan(self):
+        user = User.objects.create_user(username="director_mc_limite", password="pass123")
+        user.groups.add(Group.objects.get_or_create(name="DG")[0])
+        self.client.login(username="director_mc_limite", password="pass123")
+
+        response = self.client.get(
+            reverse("reportes:api_expansion_montecarlo"),
+            {"investment_estimate": "240000", "iterations": "999999", "horizon_months": "1000000", "seed": "3"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()["simulation"]
+        self.assertEqual(payload["iterations"], ExpansionMonteCarloService.MAX_ITERATIONS)
+        self.assertEqual(payload["horizon_months"], ExpansionMonteCarloService.MAX_HORIZON_MONTHS)
+        self.assertEqual(len(payload["monthly_bands"]), ExpansionMonteCarloService.MAX_HORIZON_MONTHS)
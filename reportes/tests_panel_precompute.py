@@ -0,0 +1,132 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.cache_versions import bump_cache_scopes
+from reportes import executive_panels
+from reportes.panel_precompute import PanelSpec, panel_cache_key, panel_status, rebuild_panel, serve_panel
+from reportes.tasks import task_precompute_executive_panels
+
+
+class ConstructorFalso:
+    def __init__(self):
+        self.llamadas = []
+        self.falla = False
+
+    def __call__(self, **params):
+        self.llamadas.append(params)
+        if self.falla:
+            raise RuntimeError("fuente caída")
+        return {"valor": len(self.llamadas), **params}
+
+
+@override_settings(REPORTES_PANEL_PRECOMPUTE_ENABLED=True, REPORTES_PANEL_MAX_AGE_SECONDS=3600)
+class PanelPrecomputeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.builder = ConstructorFalso()
+        self.spec = PanelSpec("panel_prueba", self.builder, ("ventas",), ("FactVentaDiaria",))
+        self.identity = {"months": 6}
+        self.params = {"latest_date": date(2026, 3, 31), "months": 6}
+
+    def _servir(self, params=None):
+        return serve_panel(self.spec, identity=self.identity, params=params or self.params)
+
+    def test_sirve_el_ultimo_bueno_y_marca_vencido_al_cambiar_un_scope(self):
+        panel, stale = self._servir()
+        self.assertEqual((panel["valor"], stale), (1, False))
+        self.assertFalse(panel["precompute"]["stale"])
+        self.assertIsNotNone(panel["precompute"]["duration_ms"])
+
+        self.assertEqual(self._servir()[0]["valor"], 1)
+        bump_cache_scopes("inventario")
+        self.assertFalse(self._servir()[1])
+
+        bump_cache_scopes("ventas")
+        panel, stale = self._servir()
+        self.assertTrue(stale)
+        self.assertTrue(panel["precompute"]["stale"])
+        self.assertEqual(panel["valor"], 1)
+        self.assertEqual(len(self.builder.llamadas), 1)
+
+        rebuild_panel(self.spec, identity=self.identity, params=self.params)
+        panel, stale = self._servir()
+        self.assertEqual((panel["valor"], stale), (2, False))
+
+    def test_nueva_fecha_de_corte_o_antiguedad_vencen_el_panel(self):
+        self._servir()
+        nuevo_corte = {**self.params, "latest_date": date(2026, 4, 1)}
+        panel, stale = self._servir(nuevo_corte)
+        self.assertTrue(stale)
+        self.assertEqual(panel["latest_date"], date(2026, 3, 31))
+
+        key = panel_cache_key(self.spec, self.identity)
+        record = cache.get(key)
+        record["computed_at"] = timezone.now() - timedelta(hours=2)
+        cache.set(key, record, timeout=None)
+        self.assertTrue(self._servir()[1])
+        self.assertGreaterEqual(panel_status(self.spec, identity=self.identity, params=self.params)["age_seconds"], 7200)
+
+    def test_error_de_construccion_conserva_el_ultimo_resultado(self):
+        self._servir()
+        self.builder.falla = True
+        with self.assertRaises(RuntimeError), self.assertLogs("reportes.panel_precompute", level="ERROR"):
+            rebuild_panel(self.spec, identity=self.identity, params=self.params)
+
+        estado = panel_status(self.spec, identity=self.identity, params=self.params)
+        self.assertEqual(estado["last_error"], "fuente caída")
+        self.assertEqual(self._servir()[0]["valor"], 1)
+
+
+@override_settings(REPORTES_PANEL_PRECOMPUTE_ENABLED=True)
+class ExecutivePanelsPrecomputeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.builders = {name: ConstructorFalso() for name in executive_panels.EXECUTIVE_PANEL_SPECS}
+        specs = {
+            name: PanelSpec(name, self.builders[name], spec.scopes, spec.datasets)
+            for name, spec in executive_panels.EXECUTIVE_PANEL_SPECS.items()
+        }
+        for target in (
+            patch.dict(executive_panels.EXECUTIVE_PANEL_SPECS, specs),
+            patch("reportes.executive_panels._sales_cutoff_date", return_value=date(2026, 3, 31)),
+            patch("reportes.executive_panels._partial_sales_cache_latest_end", return_value=None),
+            patch("reportes.executive_panels._common_flow_cutoff_date", return_value=date(2026, 3, 30)),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def test_solo_encola_los_paneles_que_dependen_del_scope_cambiado(self):
+        panels = executive_panels.build_executive_bi_panels(months=3)
+        self.assertEqual(panels["latest_cutoff_date"], date(2026, 3, 31))
+        self.assertEqual(panels["central_flow_panel"]["latest_date"], date(2026, 3, 30))
+        self.assertEqual(panels["yoy_panel"]["months"], 3)
+
+        bump_cache_scopes("presupuesto")
+        with patch("reportes.tasks.task_precompute_executive_panels.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                executive_panels.build_executive_bi_panels(months=3)
+            with self.captureOnCommitCallbacks(execute=True):
+                executive_panels.build_executive_bi_panels(months=3)
+
+        delay.assert_called_once()
+        self.assertEqual(
+            sorted(delay.call_args.kwargs["panels"]),
+            ["branch_contribution_panel", "branch_pricing_panel", "budget_operating_panel"],
+        )
+        self.assertEqual(delay.call_args.kwargs["months"], 3)
+
+        summary = task_precompute_executive_panels(**delay.call_args.kwargs)
+        self.assertTrue(summary["budget_operating_panel"]["rebuilt"])
+        self.assertNotIn("forecast_panel", summary)
+        self.assertEqual(len(self.builders["budget_operating_panel"].llamadas), 2)
+        self.assertEqual(len(self.builders["forecast_panel"].llamadas), 1)
+
+        with patch("reportes.tasks.task_precompute_executive_panels.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                panels = executive_panels.build_executive_bi_panels(months=3)
+        delay.assert_not_called()
+        self.assertFalse(panels["budget_operating_panel"]["precompute"]["stale"])
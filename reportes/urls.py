@@ -2,6 +2,7 @@ from django.urls import path
 
 from . import views
 from . import investment_views
+from . import views_forecast_backtest
 from . import views_mano_obra_area
 from . import views_presupuesto_real
 from . import views_presupuesto_catalogos
@@ -93,6 +94,7 @@ urlpatterns = [
     path("mermas-devoluciones/", views.mermas_devoluciones, name="mermas_devoluciones"),
     path("auditoria-insumos/", views.auditoria_insumos, name="auditoria_insumos"),
     path("proyeccion-produccion/", views.proyeccion_produccion, name="proyeccion_produccion"),
+    path("forecast-backtest/", views_forecast_backtest.forecast_backtest, name="forecast_backtest"),
     path("presupuestos/importar/", views.presupuesto_importar_por_area, name="presupuesto_importar_por_area"),
     path(
         "gastos-operativos/captura-manual/",
@@ -152,6 +154,11 @@ urlpatterns = [
         investment_views.api_bamoa_guamuchil_benchmark,
         name="api_bamoa_guamuchil_benchmark",
     ),
+    path(
+        "expansion/api/montecarlo/",
+        investment_views.api_expansion_montecarlo,
+        name="api_expansion_montecarlo",
+    ),
     path(
         "inversiones/",
         investment_views.inversiones_portafolio,
@@ -10,7 +10,6 @@ from urllib.parse import urlencode
 from calendar import monthrange
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from openpyxl import Workbook
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.cache import cache
@@ -37,6 +36,7 @@ from core.access import (
     has_any_role,
 )
 from core.audit import log_event
+from core.db_routing import replica_view
 from core.cache_versions import get_or_set_versioned_cache
 from core.branch_catalog import eligible_operational_branch_qs
 from proyecciones.models import ProyeccionProduccion
@@ -111,6 +111,7 @@ from .services_reporte_diario import _armar_cuerpo, construir_y_enviar_reporte_d
 BI_SALES_CACHE_GENERATION = "bi-sales-v2"
 from .daily_operational_closure_service import build_daily_operational_closure
 from .forecast_service import build_daily_forecast_context
+from .panel_precompute import precompute_enabled as panel_precompute_enabled
 from .production_projection_supply_service import build_projection_supply_context
 from .production_supply_service import build_production_supply_context
 from .executive_panels import (
@@ -3160,6 +3161,8 @@ def _export_consumo_csv(rows, date_from: str, date_to: str, tipo: str) -> HttpRe
 
 
 def _export_consumo_xlsx(rows, date_from: str, date_to: str, tipo: str) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Consumo"
@@ -3288,6 +3291,8 @@ def _export_faltantes_csv(rows, nivel: str) -> HttpResponse:
 
 
 def _export_faltantes_xlsx(rows, nivel: str) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Faltantes"
@@ -4662,6 +4667,8 @@ def auditoria_insumos(request: HttpRequest) -> HttpResponse:
 
 
 def _export_auditoria_insumos_xlsx(rows: list[ConsumoInsumoMensual], *, periodo: date) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Auditoria insumos"
@@ -4789,6 +4796,8 @@ def _weekly_projection_rows(rows: list[ProyeccionProduccion], dates: list[date])
 
 
 def _export_proyeccion_xlsx(rows: list[ProyeccionProduccion], *, mode: str, target_date: date) -> HttpResponse:
+    from openpyxl import Workbook
+
     workbook = Workbook()
     sheet = workbook.active
     sheet.title = "Proyección producción"
@@ -5048,6 +5057,8 @@ def _export_bi_csv(snapshot: dict) -> HttpResponse:
 
 
 def _export_bi_xlsx(snapshot: dict) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "BI"
@@ -5151,6 +5162,8 @@ def _export_branch_bi_csv(branch_panel: dict[str, object], contribution_panel: d
 
 
 def _export_branch_bi_xlsx(branch_panel: dict[str, object], contribution_panel: dict[str, object]) -> HttpResponse:
+    from openpyxl import Workbook
+
     branch_slug = str(branch_panel.get("selected_branch_code") or "sucursal").lower()
     wb = Workbook()
     summary_ws = wb.active
@@ -5286,6 +5299,8 @@ def _export_branches_bi_csv(contribution_panel: dict[str, object]) -> HttpRespon
 
 
 def _export_branches_bi_xlsx(contribution_panel: dict[str, object]) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Sucursales"
@@ -5680,6 +5695,8 @@ def _export_product_closure_csv(context: dict[str, object]) -> HttpResponse:
 
 
 def _export_product_closure_xlsx(context: dict[str, object]) -> HttpResponse:
+    from openpyxl import Workbook
+
     wb = Workbook()
     summary_ws = wb.active
     summary_ws.title = "Resumen"
@@ -5839,6 +5856,7 @@ def cierre_producto(request: HttpRequest) -> HttpResponse:
 
 
 @login_required
+@replica_view("analytics")
 def bi(request: HttpRequest) -> HttpResponse:
     if not can_view_reportes(request.user):
         raise PermissionDenied("No tienes permisos para ver Reportes.")
@@ -5867,23 +5885,31 @@ def bi(request: HttpRequest) -> HttpResponse:
         builder=lambda: compute_bi_snapshot(period_days=period_days, months_window=months_window),
         parts=(period_days, months_window),
     )
-    executive_panels = _bi_cached_value(
-        runtime_cache=bi_runtime_cache,
-        section="executive-panels",
-        builder=lambda: build_executive_bi_panels(
+    def build_panels():
+        return build_executive_bi_panels(
             months=months_window,
             branch_id=branch_id,
             action_filter=action_filter,
             budget_month=budget_month,
-        ),
-        parts=(
-            months_window,
-            branch_id or 0,
-            action_filter or "all",
-            budget_month or 0,
-            timezone.localdate().isoformat(),
-        ),
-    )
+        )
+
+    if panel_precompute_enabled():
+        # Ya se sirven precalculados; cachearlos aquí congelaría un resultado
+        # vencido aunque el precálculo ya lo hubiera reemplazado.
+        executive_panels = build_panels()
+    else:
+        executive_panels = _bi_cached_value(
+            runtime_cache=bi_runtime_cache,
+            section="executive-panels",
+            builder=build_panels,
+            parts=(
+                months_window,
+                branch_id or 0,
+                action_filter or "all",
+                budget_month or 0,
+                timezone.localdate().isoformat(),
+            ),
+        )
 
     export_format = (request.GET.get("export") or "").lower()
     if branch_id and export_format == "csv":
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import get_object_or_404, render
+
+from core.access import can_view_reportes
+from reportes.forecast_backtest_service import LEVEL_BRANCH, LEVEL_FAMILY, LEVEL_GLOBAL, recommend_methods
+from reportes.models import ForecastBacktestResult, ForecastBacktestRun
+
+LEVELS = {
+    LEVEL_FAMILY: "Familia",
+    LEVEL_BRANCH: "Sucursal",
+}
+
+
+def _entero_o_none(valor: str | None) -> int | None:
+    try:
+        return int(valor) if valor else None
+    except (TypeError, ValueError):
+        return None
+
+
+@login_required
+def forecast_backtest(request: HttpRequest) -> HttpResponse:
+    """Resultados del último backtest de forecast (o del indicado en ``run_id``)."""
+    if not can_view_reportes(request.user):
+        raise PermissionDenied("No tienes permisos para ver Reportes.")
+
+    runs = list(ForecastBacktestRun.objects.order_by("-created_at", "-id")[:12])
+    run_id = _entero_o_none(request.GET.get("run_id"))
+    if run_id:
+        run = get_object_or_404(ForecastBacktestRun, id=run_id)
+    else:
+        run = next((item for item in runs if item.status == ForecastBacktestRun.STATUS_OK), None)
+
+    horizons = list(run.horizons or []) if run else []
+    horizon = _entero_o_none(request.GET.get("horizonte"))
+    if horizon not in horizons:
+        horizon = horizons[-1] if horizons else None
+    level = request.GET.get("nivel") if request.GET.get("nivel") in LEVELS else LEVEL_FAMILY
+
+    global_rows = []
+    recommendations = []
+    if run and horizon:
+        method_labels = dict(ForecastBacktestResult.METHOD_CHOICES)
+        engine_labels = (run.metadata or {}).get("method_labels") or {}
+        for row in run.results.filter(horizon_days=horizon, sucursal__isnull=True, familia="").order_by("wape_pct"):
+            if row.metadata.get("level") != LEVEL_GLOBAL:
+                continue
+            row.method_label = method_labels.get(row.method, row.method)
+            row.engine_labels = ", ".join(f"{label}: {count}" for label, count in engine_labels.get(row.method, {}).items())
+            global_rows.append(row)
+        recommendations = recommend_methods(run, horizon_days=horizon, level=level)
+
+    context = {
+        "runs": runs,
+        "run": run,
+        "horizons": horizons,
+        "selected_horizon": horizon,
+        "levels": LEVELS,
+        "selected_level": level,
+        "global_rows": global_rows,
+        "recommendations": recommendations,
+        "skipped_methods": (run.metadata or {}).get("skipped_methods") or [] if run else [],
+    }
+    return render(request, "reportes/forecast_backtest.html", context)
@@ -17,9 +17,6 @@ from django.db.models.functions import TruncMonth
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.utils import timezone
 from django.views.generic import TemplateView
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill
-from openpyxl.utils import get_column_letter
 
 from control.models import MermaMensualSucursal
 from core.access import can_view_reportes
@@ -367,6 +364,10 @@ class ProducidoVsVendidoMermaView(LoginRequiredMixin, TemplateView):
         return response
 
     def _export_xlsx(self, context: dict[str, Any]) -> HttpResponse:
+        from openpyxl import Workbook
+        from openpyxl.styles import Alignment, Font, PatternFill
+        from openpyxl.utils import get_column_letter
+
         period = _filename_period(context)
         workbook = Workbook()
         sheet = workbook.active
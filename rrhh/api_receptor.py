@@ -3,6 +3,7 @@ from __future__ import annotations
 import hmac
 import json
 import logging
+import zlib
 
 from django.conf import settings
 from django.http import JsonResponse
@@ -39,6 +40,28 @@ def _auth_ok(request) -> bool:
     return False
 
 
+def _request_body(request) -> bytes:
+    """
+    Cuerpo crudo; descomprime ``Content-Encoding: gzip`` (el agente comprime
+    lotes grandes). El tamaño descomprimido se acota igual que un POST normal.
+    """
+    body = request.body or b""
+    encoding = (request.headers.get("Content-Encoding") or "").strip().lower()
+    if not encoding or encoding == "identity":
+        return body
+    if encoding != "gzip":
+        raise ValueError(f"Content-Encoding no soportado: {encoding}")
+    limit = getattr(settings, "DATA_UPLOAD_MAX_MEMORY_SIZE", None) or 2_621_440
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(body, limit + 1)
+    except zlib.error as exc:
+        raise ValueError("cuerpo gzip invalido") from exc
+    if len(data) > limit or decompressor.unconsumed_tail:
+        raise ValueError("cuerpo gzip excede el tamaño permitido")
+    return data
+
+
 @csrf_exempt
 @require_POST
 def receptor_asistencia_hik(request):
@@ -64,8 +87,10 @@ def receptor_asistencia_hik_v2(request):
         return JsonResponse({"error": "No autorizado"}, status=401)
 
     try:
-        body = json.loads(request.body or b"{}")
-    except json.JSONDecodeError:
+        body = json.loads(_request_body(request) or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "JSON invalido", "error_code": "invalid_json"}, status=400)
+    if not isinstance(body, dict):
         return JsonResponse({"error": "JSON invalido", "error_code": "invalid_json"}, status=400)
 
     if body.get("contract_version") != CONTRACT_VERSION:
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 from io import BytesIO
+from typing import TYPE_CHECKING
 
 from django.http import HttpResponse
-from openpyxl import Workbook
 
 from rrhh.models import PrenominaMovimiento
 
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+
 
 XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 MOVIMIENTOS_HEADERS = [
@@ -55,6 +58,8 @@ def build_movimientos_contpaqi_rows(corte):
 
 
 def export_movimientos_contpaqi_xlsx(corte):
+    from openpyxl import Workbook
+
     workbook = Workbook()
     sheet = workbook.active
     sheet.title = "Movimientos_CONTPAQi"
@@ -64,6 +69,8 @@ def export_movimientos_contpaqi_xlsx(corte):
 
 
 def export_revision_xlsx(corte):
+    from openpyxl import Workbook
+
     workbook = Workbook()
     resumen_sheet = workbook.active
     resumen_sheet.title = "Resumen"
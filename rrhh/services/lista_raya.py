@@ -7,9 +7,10 @@ from dataclasses import dataclass, field
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import pandas as pd
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 PERCEPCION = "PERCEPCION"
@@ -93,6 +94,8 @@ class ListaRayaParseResult:
 
 
 def parse_lista_raya_xls(path: str | Path) -> ListaRayaParseResult:
+    import pandas as pd
+
     source = Path(path)
     file_bytes = source.read_bytes()
     source_hash = hashlib.sha256(file_bytes).hexdigest()
@@ -504,6 +507,8 @@ def _decimal(value: Any) -> Decimal:
 
 
 def _clean(value: Any) -> str:
+    import pandas as pd
+
     if pd.isna(value):
         return ""
     return str(value).strip()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import gzip
 import json
 from uuid import uuid4
 
@@ -223,6 +224,29 @@ class HikIngestaV2Tests(TestCase):
         self.assertEqual(self._ledger().objects.count(), 0)
         self.assertEqual(AsistenciaEmpleado.objects.count(), 0)
 
+    def test_lote_gzip_se_descomprime_y_gzip_corrupto_es_json_invalido(self):
+        event = self._event(event_id="guid-gzip")
+        body = json.dumps({"contract_version": 2, "batch_id": str(uuid4()), "events": [event]})
+
+        response = self.client.post(
+            self.endpoint,
+            data=gzip.compress(body.encode("utf-8")),
+            content_type="application/json",
+            HTTP_CONTENT_ENCODING="gzip",
+            HTTP_X_API_KEY="hik-v2-test-key",
+        )
+        self.assertEqual(self._single_result(response)["outcome"], "accepted")
+
+        response = self.client.post(
+            self.endpoint,
+            data=b"no-es-gzip",
+            content_type="application/json",
+            HTTP_CONTENT_ENCODING="gzip",
+            HTTP_X_API_KEY="hik-v2-test-key",
+        )
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(response.json()["error_code"], "invalid_json")
+
     def test_dos_marcajes_legitimos_cercanos_se_conservan_y_proyectan(self):
         entrada = self._event(
             event_id="guid-close-check-in",
@@ -17,7 +17,6 @@ from django.urls import reverse
 from django.utils.dateparse import parse_date
 from django.utils import timezone
 from django.views.decorators.http import require_POST
-from openpyxl import Workbook
 
 from core.access import can_manage_rrhh, can_view_rrhh
 
@@ -135,6 +134,8 @@ def _export_csv(rows: list[list]) -> HttpResponse:
 
 
 def _export_xlsx(rows: list[list]) -> HttpResponse:
+    from openpyxl import Workbook
+
     workbook = Workbook()
     sheet = workbook.active
     sheet.title = "reporte_asistencia"
@@ -8,6 +8,7 @@ fi
 
 : "${BOOTSTRAP_ROLES_ON_START:=1}"
 : "${COLLECTSTATIC_ON_START:=1}"
+: "${INDEX_MAINTENANCE_EVENTS_ON_START:=1}"
 
 if [ "${RUNNING_ON_RAILWAY}" = "1" ]; then
   # El proceso web de Railway debe quedar sano rápido y no iniciar sincronizadores ni bootstrap externos.
@@ -41,6 +42,13 @@ else
   echo "Skipping Point branch bootstrap on start"
 fi
 
+if [ "${INDEX_MAINTENANCE_EVENTS_ON_START}" = "1" ]; then
+  echo "Indexing maintenance events (initial load only)..."
+  python manage.py rebuild_maintenance_event_index --only-empty
+else
+  echo "Skipping maintenance event index load on start"
+fi
+
 if [ "${COLLECTSTATIC_ON_START}" = "1" ]; then
   echo "Collecting static files..."
   python manage.py collectstatic --noinput
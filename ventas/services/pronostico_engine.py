@@ -6,28 +6,36 @@ from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
 from decimal import Decimal
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
 
 import numpy as np
-import pandas as pd
 from django.db.models import Avg, Max, Min, Q, Sum
 
 from core.models import Sucursal
 from pos_bridge.models import PointProduct, PointSalesDailyProductFact
 from recetas.models import Receta
 
-try:
-    from prophet import Prophet
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# pandas, prophet y statsmodels tardan segundos en importarse; este módulo lo
+# importan las tareas de Celery y las vistas de ventas, así que se cargan en el
+# primer pronóstico y no al arrancar el proceso.
+PROPHET_AVAILABLE = find_spec("prophet") is not None  # optional production dependency.
+ETS_AVAILABLE = find_spec("statsmodels") is not None
 
-    PROPHET_AVAILABLE = True
-except ImportError:  # pragma: no cover - optional production dependency.
-    PROPHET_AVAILABLE = False
 
-try:
-    from statsmodels.tsa.exponential_smoothing.ets import ETSModel
-    from statsmodels.tsa.seasonal import STL
-except ImportError:  # pragma: no cover - production dependency is installed in the container.
-    ETSModel = None
-    STL = None
+@lru_cache(maxsize=1)
+def _statsmodels_models():
+    try:
+        from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+        from statsmodels.tsa.seasonal import STL
+    except ImportError:  # pragma: no cover - production dependency is installed in the container.
+        return None, None
+    return ETSModel, STL
 
 
 HISTORY_START = date(2022, 1, 1)
@@ -52,56 +60,64 @@ FECHAS_ESPECIALES_FIJAS = {
     (12, 31): "Año Nuevo",
 }
 FECHAS_ESPECIALES = {**FECHAS_ESPECIALES_FIJAS, (6, 21): FATHER_DAY_NAME}
-FESTIVOS_POLLYANAS = pd.DataFrame(
-    {
-        "holiday": ["dia_madres"] * 3
-        + ["dia_nino"] * 3
-        + ["dia_padre"] * 3
-        + ["navidad"] * 3
-        + ["nochebuena"] * 3
-        + ["año_nuevo"] * 3
-        + ["reyes"] * 3
-        + ["san_valentin"] * 3
-        + ["halloween"] * 3
-        + ["dia_muertos"] * 3,
-        "ds": pd.to_datetime(
-            [
-                "2024-05-12",
-                "2025-05-10",
-                "2026-05-10",
-                "2024-04-30",
-                "2025-04-30",
-                "2026-04-30",
-                "2024-06-16",
-                "2025-06-15",
-                "2026-06-21",
-                "2024-12-25",
-                "2025-12-25",
-                "2026-12-25",
-                "2024-12-24",
-                "2025-12-24",
-                "2026-12-24",
-                "2024-12-31",
-                "2025-12-31",
-                "2026-12-31",
-                "2024-01-06",
-                "2025-01-06",
-                "2026-01-06",
-                "2024-02-14",
-                "2025-02-14",
-                "2026-02-14",
-                "2024-10-31",
-                "2025-10-31",
-                "2026-10-31",
-                "2024-11-02",
-                "2025-11-02",
-                "2026-11-02",
-            ]
-        ),
-        "lower_window": [0] * 30,
-        "upper_window": [1] * 30,
-    }
-)
+
+
+@lru_cache(maxsize=1)
+def festivos_pollyanas() -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "holiday": ["dia_madres"] * 3
+            + ["dia_nino"] * 3
+            + ["dia_padre"] * 3
+            + ["navidad"] * 3
+            + ["nochebuena"] * 3
+            + ["año_nuevo"] * 3
+            + ["reyes"] * 3
+            + ["san_valentin"] * 3
+            + ["halloween"] * 3
+            + ["dia_muertos"] * 3,
+            "ds": pd.to_datetime(
+                [
+                    "2024-05-12",
+                    "2025-05-10",
+                    "2026-05-10",
+                    "2024-04-30",
+                    "2025-04-30",
+                    "2026-04-30",
+                    "2024-06-16",
+                    "2025-06-15",
+                    "2026-06-21",
+                    "2024-12-25",
+                    "2025-12-25",
+                    "2026-12-25",
+                    "2024-12-24",
+                    "2025-12-24",
+                    "2026-12-24",
+                    "2024-12-31",
+                    "2025-12-31",
+                    "2026-12-31",
+                    "2024-01-06",
+                    "2025-01-06",
+                    "2026-01-06",
+                    "2024-02-14",
+                    "2025-02-14",
+                    "2026-02-14",
+                    "2024-10-31",
+                    "2025-10-31",
+                    "2026-10-31",
+                    "2024-11-02",
+                    "2025-11-02",
+                    "2026-11-02",
+                ]
+            ),
+            "lower_window": [0] * 30,
+            "upper_window": [1] * 30,
+        }
+    )
+
+
 ORDEN_CATEGORIAS = [
     "Bollo",
     "Empanadas",
@@ -342,6 +358,10 @@ def _is_special_context_day(target_day: date) -> bool:
 
 
 def _calcular_producto_prophet(serie_df: pd.DataFrame, fechas_rango: list[date], festivos_df: pd.DataFrame) -> dict:
+    import pandas as pd
+
+    from prophet import Prophet
+
     logging.getLogger("prophet").setLevel(logging.WARNING)
     logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
 
@@ -421,6 +441,8 @@ def _calcular_producto_prophet(serie_df: pd.DataFrame, fechas_rango: list[date],
 
 
 def _calcular_serie_ets(serie_df: pd.DataFrame, fechas_rango: list[date]) -> dict:
+    import pandas as pd
+
     if not fechas_rango:
         return {"recomendado": [], "conservador": [], "agresivo": [], "confianza": 0.0, "metodo": "sin-fechas"}
 
@@ -468,7 +490,7 @@ def _calcular_serie_ets(serie_df: pd.DataFrame, fechas_rango: list[date]) -> dic
 def _calcular_serie(serie_df: pd.DataFrame, fechas_rango: list[date]) -> dict:
     if PROPHET_AVAILABLE and len(serie_df) >= 60:
         try:
-            return _calcular_producto_prophet(serie_df, fechas_rango, FESTIVOS_POLLYANAS)
+            return _calcular_producto_prophet(serie_df, fechas_rango, festivos_pollyanas())
         except Exception:
             pass
     return _calcular_serie_ets(serie_df, fechas_rango)
@@ -606,6 +628,7 @@ def _prediction_interval_columns(frame: pd.DataFrame) -> tuple[np.ndarray | None
 
 
 def _fit_ets(series: pd.Series, horizon: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, float, str]:
+    ETSModel, _ = _statsmodels_models()
     if ETSModel is None or horizon <= 0 or series.sum() <= 0:
         forecast = _simple_average_forecast(series, horizon).to_numpy(dtype=float)
         return forecast * 0.90, forecast, forecast * 1.12, 0.45, "promedio-simple"
@@ -641,6 +664,8 @@ def _fit_ets(series: pd.Series, horizon: int) -> tuple[np.ndarray, np.ndarray, n
 
 
 def _simple_average_forecast(series: pd.Series, horizon: int) -> pd.Series:
+    import pandas as pd
+
     if horizon <= 0:
         return pd.Series(dtype=float)
     if series.empty:
@@ -660,6 +685,8 @@ def _simple_average_forecast(series: pd.Series, horizon: int) -> pd.Series:
 
 
 def _series_from_history(history: dict[date, Decimal], *, end_date: date) -> pd.Series:
+    import pandas as pd
+
     positive_dates = [day for day, qty in history.items() if qty > 0]
     start_date = min(positive_dates) if positive_dates else end_date
     index = pd.date_range(start=start_date, end=end_date, freq="D")
@@ -668,6 +695,8 @@ def _series_from_history(history: dict[date, Decimal], *, end_date: date) -> pd.
 
 
 def _history_dataframe(series: pd.Series, special_days: set[tuple[int, int]]) -> pd.DataFrame:
+    import pandas as pd
+
     frame = pd.DataFrame({"fecha": series.index, "qty": series.to_numpy(dtype=float)})
     frame["dia_semana"] = frame["fecha"].dt.weekday
     frame["semana_año"] = frame["fecha"].dt.isocalendar().week.astype(int)
@@ -690,6 +719,8 @@ def _stl_trend_ratio(
     trend_start: date,
     history_end: date,
 ) -> float:
+    import pandas as pd
+
     positive_values = series[series > 0]
     alpha = max(float(positive_values.mean()) * 0.1, 1.0) if not positive_values.empty else 1.0
     recent_fallback = _window_average_from_history(history, trend_start, history_end)
@@ -697,6 +728,7 @@ def _stl_trend_ratio(
     comparable_end = history_end - timedelta(days=364)
     comparable_fallback = _window_average_from_history(history, comparable_start, comparable_end)
 
+    _, STL = _statsmodels_models()
     if STL is None or len(series) < 60 or series.sum() <= 0:
         ratio = (float(recent_fallback) + alpha) / (float(comparable_fallback) + alpha)
         return _clamp(ratio, SPECIAL_RATIO_MIN, SPECIAL_RATIO_MAX)
@@ -898,6 +930,8 @@ def calcular_pronostico(
     sucursal_ids: set[int] | list[int] | None = None,
     skus_incluidos: set[str] | list[str] | None = None,
 ) -> dict:
+    import pandas as pd
+
     selected_days = list(_date_range(fecha_inicio, fecha_fin))
     if not selected_days:
         return _empty_result(fecha_inicio, fecha_fin)
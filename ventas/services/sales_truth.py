@@ -8,7 +8,6 @@ import re
 from typing import Any
 import warnings
 
-import pandas as pd
 from django.db.models import Q, Sum
 from unidecode import unidecode
 
@@ -349,6 +348,8 @@ def import_authoritative_point_category_report(path: str) -> dict[str, Any]:
         DeprecationWarning,
         stacklevel=2,
     )
+    import pandas as pd
+
     raw = pd.read_excel(path, header=None, sheet_name=0)
     title = ""
     for row_idx in range(min(6, len(raw.index))):
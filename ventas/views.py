@@ -15,9 +15,6 @@ from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.decorators.http import require_POST
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill
-from openpyxl.utils import get_column_letter
 
 from core.access import ROLE_ADMIN, ROLE_COMPRAS, ROLE_DG, ROLE_PRODUCCION, has_any_role
 from core.models import Sucursal
@@ -434,6 +431,8 @@ def _safe_sheet_title(raw_title: str, used_titles: set[str]) -> str:
 
 
 def _style_row(ws, row_number: int, *, fill: str | None = None, font_color: str = "000000", bold: bool = False):
+    from openpyxl.styles import Alignment, Font, PatternFill
+
     row_fill = PatternFill("solid", fgColor=fill) if fill else None
     row_font = Font(color=font_color, bold=bold)
     for cell in ws[row_number]:
@@ -450,6 +449,9 @@ def _product_day_value(product: dict, fecha_iso: str, escenario: str = "recomend
 
 
 def _write_pronostico_sheet(ws, *, title: str, subtitle: str, fechas: list[str], categorias: list[dict]):
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
     ws["A1"] = title
     ws["A1"].font = Font(color="7B1A48", bold=True, size=14)
     ws["A2"] = subtitle
@@ -523,6 +525,9 @@ def _write_pronostico_sheet(ws, *, title: str, subtitle: str, fechas: list[str],
 
 
 def _write_escenarios_sheet(ws, *, title: str, subtitle: str, categorias: list[dict]):
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
     ws["A1"] = title
     ws["A1"].font = Font(color="7B1A48", bold=True, size=14)
     ws["A2"] = subtitle
@@ -704,6 +709,9 @@ def _apply_manual_adjustments(resultados: dict, post_data) -> tuple[dict, dict]:
 
 
 def _write_adjustments_sheet(ws, *, rows: list[dict], totals: dict):
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
     ws["A1"] = "Ajustes de ventas"
     ws["A1"].font = Font(color="7B1A48", bold=True, size=14)
     ws.append([])
@@ -744,6 +752,8 @@ def _write_adjustments_sheet(ws, *, rows: list[dict], totals: dict):
 
 
 def _build_pronostico_excel_response(pronostico: PronosticoGuardado) -> HttpResponse:
+    from openpyxl import Workbook
+
     resultados = pronostico.resultado_json or {}
     fechas = resultados.get("fechas") or []
     resumen = resultados.get("resumen") or {}